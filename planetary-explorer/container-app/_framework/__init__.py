@@ -5,6 +5,7 @@ rediscovered the hard way:
 
 * AOAI vs Foundry endpoint discrimination — :class:`LlmClient`
 * gpt-5 parameter sanitisation — :class:`LlmClient.chat`
+* One pooled, cached, metered client per deployment — :func:`get_llm_client`
 * On-behalf-of token plumbing — :class:`OBOContextMixin`
 * Fan-out/fan-in without deadlock — :class:`FanOutExecutor`
 
@@ -12,13 +13,13 @@ New agents should subclass / compose these primitives instead of
 copy-pasting the same plumbing into yet another module. See
 ``agents/_templates/simple_qa/`` for a minimal worked example.
 
-This package is **additive**: nothing in the existing agent tree
-imports from here yet. Migration is one agent at a time.
+Every Azure OpenAI call in the app goes through :func:`get_llm_client`;
+the other primitives are adopted one agent at a time.
 """
 
 from .executors import CriticExecutor, CriticVerdict, PlannerExecutor, PlanResult
 from .fan_out import FanOutExecutor, FanOutResult
-from .llm_client import LlmClient, LlmEndpointKind
+from .llm_client import LlmClient, LlmEndpointKind, get_llm_client
 from .obo import OBOContextMixin, extract_user_assertion
 from .sse_trace import merge_with_trace
 
@@ -33,5 +34,6 @@ __all__ = [
     "PlannerExecutor",
     "PlanResult",
     "extract_user_assertion",
+    "get_llm_client",
     "merge_with_trace",
 ]
@@ -13,25 +13,68 @@ We strip them when the deployment name looks like gpt-5.
 Auth is API key by default (``AZURE_OPENAI_API_KEY``); when absent we
 fall back to ``DefaultAzureCredential`` via the SDK's bearer token
 provider.
+
+Process-wide gateway
+--------------------
+About 25 call sites used to build their own ``AsyncAzureOpenAI`` /
+``AzureOpenAI`` client, several of them per request (a fresh TLS
+connection pool and credential for every formatting or review call).
+``get_llm_client(deployment)`` now returns one shared ``LlmClient`` per
+deployment:
+
+  - **pooled SDK clients**: one ``AsyncAzureOpenAI`` per event loop (httpx
+    async pools are loop-bound) and one thread-safe ``AzureOpenAI``,
+    created on first use and reused; one credential for the process
+  - **response cache**: deterministic prompts (``temperature=0``) are
+    cached exact-match on a hash of the full request, in the
+    ``llm-responses`` namespace of :mod:`result_cache`
+  - **coalescing**: identical non-streaming requests already in flight
+    share one upstream call
+  - **metrics**: per-deployment requests, cache hits, coalesced calls,
+    errors, prompt/completion tokens and latency percentiles, reported on
+    ``/api/health``
+
+``create()`` / ``create_sync()`` take the same keyword arguments as
+``client.chat.completions.create`` (``embed()`` those of
+``client.embeddings.create``) so existing call sites move over without
+reshaping their requests.
+
+Config:
+  LLM_RESPONSE_CACHE              on/off (default on)
+  LLM_RESPONSE_CACHE_MAX_ENTRIES  cached responses (default 512)
+  LLM_RESPONSE_CACHE_TTL_S        cached response lifetime (default 3600)
 """
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import json
 import logging
 import os
+import threading
+import time
+import weakref
+from collections import deque
 from enum import Enum
-from typing import Any
+from typing import Any, Callable
 
 logger = logging.getLogger(__name__)
 
 # Lazy SDK import — many agents already pull this in, but the framework
 # should not force ``openai`` on environments that don't use it.
 try:
-    from openai import AsyncAzureOpenAI
+    from openai import AsyncAzureOpenAI, AzureOpenAI
 
     _SDK_AVAILABLE = True
 except Exception:  # noqa: BLE001
     _SDK_AVAILABLE = False
 
+_COG_SCOPE = "https://cognitiveservices.azure.com/.default"
+_DEFAULT_API_VERSION = "2024-10-21"
+_DISABLED_VALUES = {"0", "false", "no", "off"}
+# Per-request transport options: passed to the SDK but not part of the cache key.
+_TRANSPORT_KEYS = ("timeout", "extra_headers")
+
 
 class LlmEndpointKind(str, Enum):
     AOAI = "aoai"          # Azure OpenAI data-plane endpoint
@@ -49,8 +92,166 @@ def _is_restricted(model: str) -> bool:
     return any(p in m for p in _RESTRICTED_PATTERNS)
 
 
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+def _resolve_endpoint() -> tuple[str, LlmEndpointKind]:
+    """``AZURE_OPENAI_ENDPOINT`` (preferred) or ``AZURE_AI_PROJECT_ENDPOINT``."""
+    endpoint = (os.getenv("AZURE_OPENAI_ENDPOINT") or "").strip()
+    if endpoint:
+        return endpoint, LlmEndpointKind.AOAI
+    endpoint = (os.getenv("AZURE_AI_PROJECT_ENDPOINT") or "").strip()
+    if endpoint:
+        return endpoint, LlmEndpointKind.FOUNDRY
+    raise RuntimeError(
+        "LlmClient: set AZURE_OPENAI_ENDPOINT (preferred) or "
+        "AZURE_AI_PROJECT_ENDPOINT"
+    )
+
+
+def _resolve_api_key() -> str | None:
+    """``AZURE_OPENAI_API_KEY`` (or legacy ``AZURE_OPENAI_KEY``) unless managed identity is forced."""
+    if (os.getenv("AZURE_OPENAI_USE_MANAGED_IDENTITY") or "").lower() == "true":
+        return None
+    return (os.getenv("AZURE_OPENAI_API_KEY") or os.getenv("AZURE_OPENAI_KEY") or "").strip() or None
+
+
+_token_provider: Callable[[], str] | None = None
+_token_provider_lock = threading.Lock()
+
+
+def _get_token_provider() -> Callable[[], str]:
+    """One ``DefaultAzureCredential`` bearer provider for the process (sync; works for both SDK clients).
+
+    Uses the cloud's Cognitive Services scope (commercial or government).
+    """
+    global _token_provider
+    with _token_provider_lock:
+        if _token_provider is None:
+            from azure.identity import DefaultAzureCredential, get_bearer_token_provider
+
+            try:
+                from cloud_config import cloud_cfg
+
+                scope = cloud_cfg.cognitive_services_scope
+            except Exception:  # noqa: BLE001
+                scope = _COG_SCOPE
+            _token_provider = get_bearer_token_provider(DefaultAzureCredential(), scope)
+        return _token_provider
+
+
+# ---------------------------------------------------------------------------
+# Metrics
+# ---------------------------------------------------------------------------
+
+
+class _DeploymentMetrics:
+    """Counters and recent latencies for one deployment (guarded by ``_metrics_lock``)."""
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.cache_hits = 0
+        self.coalesced = 0
+        self.errors = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.latencies_ms: deque[float] = deque(maxlen=512)
+
+    def snapshot(self) -> dict[str, Any]:
+        lat = sorted(self.latencies_ms)
+
+        def pct(p: float) -> float | None:
+            return round(lat[min(len(lat) - 1, int(p * len(lat)))], 1) if lat else None
+
+        return {
+            "requests": self.requests,
+            "cache_hits": self.cache_hits,
+            "coalesced": self.coalesced,
+            "upstream_calls": self.requests - self.cache_hits - self.coalesced,
+            "errors": self.errors,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "latency_ms_p50": pct(0.5),
+            "latency_ms_p95": pct(0.95),
+            "latency_ms_max": round(lat[-1], 1) if lat else None,
+        }
+
+
+_metrics: dict[str, _DeploymentMetrics] = {}
+_metrics_lock = threading.Lock()
+
+
+def _record(model: str, **counts: int) -> None:
+    with _metrics_lock:
+        m = _metrics.setdefault(model, _DeploymentMetrics())
+        for name, n in counts.items():
+            setattr(m, name, getattr(m, name) + n)
+
+
+def _record_call(model: str, started: float, response: Any) -> None:
+    usage = getattr(response, "usage", None)
+    with _metrics_lock:
+        m = _metrics.setdefault(model, _DeploymentMetrics())
+        m.latencies_ms.append((time.perf_counter() - started) * 1000.0)
+        m.prompt_tokens += int(getattr(usage, "prompt_tokens", 0) or 0)
+        m.completion_tokens += int(getattr(usage, "completion_tokens", 0) or 0)
+
+
+# ---------------------------------------------------------------------------
+# Response cache
+# ---------------------------------------------------------------------------
+
+_responses = None
+_responses_lock = threading.Lock()
+
+
+def _response_cache():
+    """The ``llm-responses`` result_cache namespace, or ``None`` when disabled."""
+    global _responses
+    if (os.getenv("LLM_RESPONSE_CACHE") or "").strip().lower() in _DISABLED_VALUES:
+        return None
+    with _responses_lock:
+        if _responses is None:
+            import result_cache
+
+            # Completion objects never JSON-pack, so a disk tier could only
+            # add a blocking sqlite miss to every lookup on the event loop.
+            _responses = result_cache.namespace(
+                "llm-responses",
+                max_entries=int(_env_float("LLM_RESPONSE_CACHE_MAX_ENTRIES", 512)),
+                ttl_s=_env_float("LLM_RESPONSE_CACHE_TTL_S", 3600.0),
+                memory_only=True,
+            )
+        return _responses
+
+
+def _request_key(kwargs: dict[str, Any]) -> str:
+    blob = json.dumps(kwargs, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def _deterministic(requested: dict[str, Any]) -> bool:
+    """Cache only prompts the caller asked to be deterministic (single choice, temperature 0)."""
+    return requested.get("temperature") == 0 and requested.get("n", 1) == 1
+
+
+class _SyncFlight:
+    """One blocking upstream call that other threads wait on."""
+
+    __slots__ = ("done", "value", "error")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: BaseException | None = None
+
+
 class LlmClient:
-    """One-call wrapper around ``AsyncAzureOpenAI``."""
+    """Chat completions for one deployment over pooled SDK clients."""
 
     def __init__(
         self,
@@ -67,26 +268,43 @@ class LlmClient:
         self.api_version = api_version
         self.api_key = api_key
         self.deployment = deployment
+        self._lock = threading.Lock()
+        self._async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Any]" = weakref.WeakKeyDictionary()
+        self._sync_client: Any = None
+        self._inflight: dict[tuple[int, str], asyncio.Future] = {}
+        self._sync_inflight: dict[str, _SyncFlight] = {}
+
+    # ----- pooled SDK clients -----------------------------------------------
 
+    def _client_kwargs(self) -> dict[str, Any]:
         kwargs: dict[str, Any] = {
-            "azure_endpoint": endpoint,
-            "api_version": api_version,
+            "azure_endpoint": self.endpoint,
+            "api_version": self.api_version,
         }
-        if api_key:
-            kwargs["api_key"] = api_key
+        if self.api_key:
+            kwargs["api_key"] = self.api_key
         else:
             # Fall back to DefaultAzureCredential via SDK helper.
-            from azure.identity.aio import DefaultAzureCredential
-            from openai.lib.azure import AsyncAzureADTokenProvider  # type: ignore
-
-            cred = DefaultAzureCredential()
+            kwargs["azure_ad_token_provider"] = _get_token_provider()
+        return kwargs
 
-            async def _token_provider() -> str:
-                tok = await cred.get_token("https://cognitiveservices.azure.com/.default")
-                return tok.token
+    @property
+    def _client(self) -> Any:
+        """``AsyncAzureOpenAI`` for the running event loop (created once per loop)."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            client = self._async_clients.get(loop)
+            if client is None:
+                client = self._async_clients[loop] = AsyncAzureOpenAI(**self._client_kwargs())
+            return client
 
-            kwargs["azure_ad_token_provider"] = _token_provider  # type: ignore[assignment]
-        self._client = AsyncAzureOpenAI(**kwargs)
+    @property
+    def sync_client(self) -> Any:
+        """Shared thread-safe ``AzureOpenAI`` for synchronous call sites."""
+        with self._lock:
+            if self._sync_client is None:
+                self._sync_client = AzureOpenAI(**self._client_kwargs())
+            return self._sync_client
 
     @classmethod
     def from_env(cls, *, deployment_env: str = "AZURE_OPENAI_DEPLOYMENT") -> "LlmClient":
@@ -96,37 +314,172 @@ class LlmClient:
             1. ``AZURE_OPENAI_ENDPOINT`` — preferred (AOAI data-plane)
             2. ``AZURE_AI_PROJECT_ENDPOINT`` — Foundry project fallback
 
-        Raises ``RuntimeError`` if neither is set.
+        Returns the process-wide client for the deployment (see
+        :func:`get_llm_client`). Raises ``RuntimeError`` if neither endpoint
+        is set.
         """
-        endpoint = (os.getenv("AZURE_OPENAI_ENDPOINT") or "").strip()
-        kind = LlmEndpointKind.AOAI
-        if not endpoint:
-            endpoint = (os.getenv("AZURE_AI_PROJECT_ENDPOINT") or "").strip()
-            kind = LlmEndpointKind.FOUNDRY
-        if not endpoint:
-            raise RuntimeError(
-                "LlmClient: set AZURE_OPENAI_ENDPOINT (preferred) or "
-                "AZURE_AI_PROJECT_ENDPOINT"
-            )
-        api_version = os.getenv("AZURE_OPENAI_API_VERSION", "2024-10-21")
-        api_key = (os.getenv("AZURE_OPENAI_API_KEY") or "").strip() or None
         deployment = (os.getenv(deployment_env) or "").strip()
         if not deployment:
             raise RuntimeError(f"LlmClient: {deployment_env} must be set")
-        logger.info(
-            "LlmClient configured: kind=%s endpoint=%s deployment=%s auth=%s",
-            kind.value,
-            endpoint,
-            deployment,
-            "key" if api_key else "managed-identity",
-        )
-        return cls(
-            endpoint=endpoint,
-            kind=kind,
-            api_version=api_version,
-            api_key=api_key,
-            deployment=deployment,
-        )
+        return get_llm_client(deployment)
+
+    # ----- requests ---------------------------------------------------------
+
+    def _prepare(self, kwargs: dict[str, Any]) -> tuple[dict[str, Any], str | None, bool]:
+        """Fill in the model and strip restricted params.
+
+        Returns ``(kwargs, key, cacheable)``: ``key`` identifies the request
+        for coalescing (``None`` for streams), ``cacheable`` whether the
+        caller asked for a deterministic answer.
+        """
+        requested = dict(kwargs)
+        kwargs = dict(kwargs)
+        model = kwargs.get("model") or self.deployment
+        kwargs["model"] = requested["model"] = model
+        if _is_restricted(model):
+            removed = [k for k in _SAMPLING_KEYS if k in kwargs]
+            for k in removed:
+                kwargs.pop(k, None)
+            if removed:
+                logger.debug(
+                    "LlmClient: model %s is restricted; stripped %s",
+                    model,
+                    removed,
+                )
+        if kwargs.get("stream"):
+            return kwargs, None, False
+        for k in _TRANSPORT_KEYS:
+            requested.pop(k, None)
+        key = _request_key({"endpoint": self.endpoint, "api_version": self.api_version, **requested})
+        return kwargs, key, _deterministic(requested)
+
+    async def create(self, **kwargs: Any) -> Any:
+        """``chat.completions.create`` through the gateway (``model`` defaults to this deployment).
+
+        Deterministic requests are served from the response cache; identical
+        requests in flight share one upstream call. Streaming requests go
+        straight through.
+        """
+        kwargs, key, cacheable = self._prepare(kwargs)
+        model = kwargs["model"]
+        _record(model, requests=1)
+        cache = _response_cache() if cacheable else None
+        if cache is not None:
+            hit = cache.get(key)
+            if hit is not None:
+                _record(model, cache_hits=1)
+                return hit
+        if key is None:
+            return await self._call(kwargs)
+
+        loop = asyncio.get_running_loop()
+        pending = self._inflight.get((id(loop), key))
+        if pending is not None:
+            _record(model, coalesced=1)
+            try:
+                return await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                if not pending.cancelled() or asyncio.current_task().cancelling():
+                    raise
+                # the caller that owned the request was cancelled: ask ourselves
+                return await self._call(kwargs)
+
+        pending = self._inflight[(id(loop), key)] = loop.create_future()
+        try:
+            response = await self._call(kwargs)
+        except asyncio.CancelledError:
+            pending.cancel()
+            raise
+        except BaseException as exc:
+            pending.set_exception(exc)
+            pending.exception()  # mark retrieved when nobody was waiting
+            raise
+        else:
+            pending.set_result(response)
+            if cache is not None:
+                cache.put(key, response)
+            return response
+        finally:
+            self._inflight.pop((id(loop), key), None)
+
+    async def _call(self, kwargs: dict[str, Any]) -> Any:
+        model = kwargs["model"]
+        started = time.perf_counter()
+        try:
+            response = await self._client.chat.completions.create(**kwargs)
+        except Exception:
+            _record(model, errors=1)
+            raise
+        _record_call(model, started, response)
+        return response
+
+    def create_sync(self, **kwargs: Any) -> Any:
+        """Blocking :meth:`create` for sync call sites (tools running in worker threads).
+
+        Same rules as :meth:`create`: only deterministic requests touch the
+        response cache; identical requests in flight on other threads share
+        one upstream call.
+        """
+        kwargs, key, cacheable = self._prepare(kwargs)
+        model = kwargs["model"]
+        _record(model, requests=1)
+        cache = _response_cache() if cacheable else None
+        if cache is not None:
+            hit = cache.get(key)
+            if hit is not None:
+                _record(model, cache_hits=1)
+                return hit
+        if key is None:
+            return self._call_sync(kwargs)
+
+        with self._lock:
+            flight = self._sync_inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._sync_inflight[key] = _SyncFlight()
+        if not leader:
+            _record(model, coalesced=1)
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = self._call_sync(kwargs)
+        except BaseException as exc:
+            flight.error = exc
+            raise
+        finally:
+            with self._lock:
+                self._sync_inflight.pop(key, None)
+            flight.done.set()
+        if cache is not None:
+            cache.put(key, flight.value)
+        return flight.value
+
+    def _call_sync(self, kwargs: dict[str, Any]) -> Any:
+        model = kwargs["model"]
+        started = time.perf_counter()
+        try:
+            response = self.sync_client.chat.completions.create(**kwargs)
+        except Exception:
+            _record(model, errors=1)
+            raise
+        _record_call(model, started, response)
+        return response
+
+    async def embed(self, **kwargs: Any) -> Any:
+        """``embeddings.create`` over the pooled client (``model`` defaults to this deployment); metered, not cached."""
+        model = kwargs.setdefault("model", self.deployment)
+        _record(model, requests=1)
+        started = time.perf_counter()
+        try:
+            response = await self._client.embeddings.create(**kwargs)
+        except Exception:
+            _record(model, errors=1)
+            raise
+        _record_call(model, started, response)
+        return response
 
     async def chat(
         self,
@@ -140,8 +493,7 @@ class LlmClient:
         **extra: Any,
     ) -> Any:
         """Run a chat completion. Strips sampling params for restricted models."""
-        model = deployment or self.deployment
-        kwargs: dict[str, Any] = {"model": model, "messages": messages}
+        kwargs: dict[str, Any] = {"model": deployment or self.deployment, "messages": messages}
         if temperature is not None:
             kwargs["temperature"] = temperature
         if top_p is not None:
@@ -151,18 +503,72 @@ class LlmClient:
         if response_format is not None:
             kwargs["response_format"] = response_format
         kwargs.update(extra)
-
-        if _is_restricted(model):
-            removed = [k for k in _SAMPLING_KEYS if k in kwargs]
-            for k in removed:
-                kwargs.pop(k, None)
-            if removed:
-                logger.debug(
-                    "LlmClient: model %s is restricted; stripped %s",
-                    model,
-                    removed,
-                )
-        return await self._client.chat.completions.create(**kwargs)
+        return await self.create(**kwargs)
 
     async def aclose(self) -> None:
-        await self._client.close()
+        """Close the running loop's pooled client (the next call opens a new one)."""
+        with self._lock:
+            client = self._async_clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.close()
+
+
+# ---------------------------------------------------------------------------
+# Process-wide registry
+# ---------------------------------------------------------------------------
+
+_clients: dict[tuple[str, str, str], LlmClient] = {}
+_clients_lock = threading.Lock()
+
+
+def get_llm_client(
+    deployment: str | None = None,
+    *,
+    api_version: str | None = None,
+    endpoint: str | None = None,
+) -> LlmClient:
+    """Return the process-wide :class:`LlmClient` for ``deployment``.
+
+    ``deployment`` defaults to ``AZURE_OPENAI_DEPLOYMENT``; ``api_version``
+    to ``AZURE_OPENAI_API_VERSION`` (else 2024-10-21); ``endpoint`` to the
+    env resolution described on :meth:`LlmClient.from_env`. Raises
+    ``RuntimeError`` when no endpoint or deployment is configured.
+    """
+    deployment = (deployment or os.getenv("AZURE_OPENAI_DEPLOYMENT") or "").strip()
+    if not deployment:
+        raise RuntimeError("LlmClient: AZURE_OPENAI_DEPLOYMENT must be set")
+    api_version = api_version or os.getenv("AZURE_OPENAI_API_VERSION", _DEFAULT_API_VERSION)
+    if endpoint:
+        kind = LlmEndpointKind.FOUNDRY if "/api/projects/" in endpoint else LlmEndpointKind.AOAI
+    else:
+        endpoint, kind = _resolve_endpoint()
+    key = (endpoint, api_version, deployment)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            api_key = _resolve_api_key()
+            client = _clients[key] = LlmClient(
+                endpoint=endpoint,
+                kind=kind,
+                api_version=api_version,
+                api_key=api_key,
+                deployment=deployment,
+            )
+            logger.info(
+                "LlmClient configured: kind=%s endpoint=%s deployment=%s auth=%s",
+                kind.value,
+                endpoint,
+                deployment,
+                "key" if api_key else "managed-identity",
+            )
+        return client
+
+
+def stats() -> dict[str, Any]:
+    """Per-deployment gateway metrics plus response-cache counters."""
+    with _metrics_lock:
+        deployments = {name: m.snapshot() for name, m in sorted(_metrics.items())}
+    with _clients_lock:
+        n_clients = len(_clients)
+    cache = _responses.stats() if _responses is not None else None
+    return {"clients": n_clients, "deployments": deployments, "response_cache": cache}
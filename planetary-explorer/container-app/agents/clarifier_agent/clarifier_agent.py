@@ -23,8 +23,7 @@ import logging
 import os
 from typing import Optional
 
-from openai import AsyncAzureOpenAI
-from azure.identity import DefaultAzureCredential, get_bearer_token_provider
+from _framework.llm_client import LlmClient, get_llm_client
 
 from prompts.clarifier_prompt import (
     CLARIFIER_SYSTEM_PROMPT,
@@ -127,30 +126,12 @@ class ClarifierAgent:
                 "AZURE_OPENAI_ENDPOINT to be set."
             )
         self.api_version = api_version
-        self._client: Optional[AsyncAzureOpenAI] = None
 
     # ------------------------------------------------------------------
     # Lazy LLM client
     # ------------------------------------------------------------------
-    def _get_client(self) -> AsyncAzureOpenAI:
-        if self._client is not None:
-            return self._client
-        api_key = os.environ.get("AZURE_OPENAI_API_KEY") or None
-        token_provider = None
-        if not api_key:
-            token_provider = get_bearer_token_provider(
-                DefaultAzureCredential(),
-                "https://cognitiveservices.azure.com/.default",
-            )
-        # api_key must be None (not "") so the OpenAI SDK falls through
-        # to azure_ad_token_provider for managed-identity auth.
-        self._client = AsyncAzureOpenAI(
-            azure_endpoint=self.endpoint,
-            api_key=api_key,
-            azure_ad_token_provider=token_provider,
-            api_version=self.api_version,
-        )
-        return self._client
+    def _get_client(self) -> LlmClient:
+        return get_llm_client(self.deployment, api_version=self.api_version, endpoint=self.endpoint)
 
     # ------------------------------------------------------------------
     # Public entry point
@@ -183,7 +164,7 @@ class ClarifierAgent:
             )
 
             client = self._get_client()
-            response = await client.chat.completions.create(
+            response = await client.create(
                 model=self.deployment,
                 messages=[
                     {"role": "system", "content": CLARIFIER_SYSTEM_PROMPT},
@@ -14,8 +14,7 @@ import os
 import time
 from typing import Optional
 
-from openai import AsyncAzureOpenAI
-from azure.identity import DefaultAzureCredential, get_bearer_token_provider
+from _framework.llm_client import LlmClient, get_llm_client
 
 from .contextual_models import ContextualInput, ContextualResult
 
@@ -65,29 +64,9 @@ class ContextualAgent:
                 "AZURE_AI_PROJECT_ENDPOINT to be set."
             )
         self.api_version = api_version
-        self._client: Optional[AsyncAzureOpenAI] = None
-
-    def _get_client(self) -> AsyncAzureOpenAI:
-        if self._client is not None:
-            return self._client
-        api_key = os.environ.get("AZURE_OPENAI_API_KEY") or None
-        token_provider = None
-        if not api_key:
-            token_provider = get_bearer_token_provider(
-                DefaultAzureCredential(),
-                "https://cognitiveservices.azure.com/.default",
-            )
-        # NOTE: must pass api_key=None (not "") so the OpenAI SDK falls
-        # through to azure_ad_token_provider. An empty string is treated as
-        # an explicit (invalid) credential and triggers
-        # "Missing credentials. Please pass an `api_key`..." failures.
-        self._client = AsyncAzureOpenAI(
-            azure_endpoint=self.endpoint,
-            api_key=api_key,
-            azure_ad_token_provider=token_provider,
-            api_version=self.api_version,
-        )
-        return self._client
+
+    def _get_client(self) -> LlmClient:
+        return get_llm_client(self.deployment, api_version=self.api_version, endpoint=self.endpoint)
 
     async def run(self, payload: ContextualInput) -> ContextualResult:
         started = time.time()
@@ -111,7 +90,7 @@ class ContextualAgent:
             # deployments only accept the default temperature (1); passing
             # any other value returns HTTP 400 and bubbles up as the
             # user-visible "LLM call failed" sentinel.
-            resp = await client.chat.completions.create(
+            resp = await client.create(
                 model=self.deployment,
                 messages=messages,
             )
@@ -21,6 +21,8 @@ from datetime import datetime, timedelta
 
 from azure.identity import DefaultAzureCredential, get_bearer_token_provider
 
+from pipeline.session_store import session_map
+
 logger = logging.getLogger(__name__)
 
 
@@ -356,7 +358,9 @@ class EnhancedVisionAgent:
 
     def __init__(self):
         """Initialize the vision agent (lazy — actual setup on first use)."""
-        self.sessions: Dict[str, VisionSession] = {}
+        # Shared session store (see pipeline.session_store) so any worker or
+        # replica can resume a conversation's Agent Service thread.
+        self.sessions = session_map("vision", VisionSession)
         self.memory_ttl = timedelta(minutes=30)
         self._agents_client = None
         self._agent_id: Optional[str] = None
@@ -446,8 +450,9 @@ class EnhancedVisionAgent:
 
     async def _get_or_create_session(self, session_id: str) -> VisionSession:
         """Get existing session or create a new one with a new Agent Service thread."""
-        if session_id in self.sessions:
-            return self.sessions[session_id]
+        session = await self.sessions.aget(session_id)
+        if session is not None:
+            return session
 
         await self._ensure_initialized()
 
@@ -455,7 +460,7 @@ class EnhancedVisionAgent:
         thread = await self._agents_client.threads.create()
 
         session = VisionSession(session_id=session_id, thread_id=thread.id)
-        self.sessions[session_id] = session
+        await self.sessions.aset(session_id, session)
         logger.info(f"Created vision session: {session_id} -> thread: {thread.id}")
         return session
 
@@ -467,12 +472,15 @@ class EnhancedVisionAgent:
                 if hasattr(session, key) and value is not None:
                     setattr(session, key, value)
             session.updated_at = datetime.utcnow()
+            self.sessions[session_id] = session
 
     def get_or_create_session(self, session_id: str) -> VisionSession:
         """Synchronous version — get session or create a placeholder (thread created on analyze)."""
-        if session_id not in self.sessions:
-            self.sessions[session_id] = VisionSession(session_id=session_id)
-        return self.sessions[session_id]
+        session = self.sessions.get(session_id)
+        if session is None:
+            session = VisionSession(session_id=session_id)
+            self.sessions[session_id] = session
+        return session
 
     async def analyze(
         self,
@@ -522,6 +530,7 @@ class EnhancedVisionAgent:
                     stac_items = (covering + others)[:5]
                     logger.info(f"Trimmed STAC items to {len(stac_items)} (covering pin: {len(covering)})")
                 session.stac_items = stac_items
+            await self.sessions.aset(session_id, session)
 
             # ================================================================
             # SET MODULE-LEVEL CONTEXT FOR STANDALONE TOOL FUNCTIONS
@@ -900,6 +909,7 @@ class EnhancedVisionAgent:
             session.last_analysis = response_text
             session.add_turn("user", user_query)
             session.add_turn("assistant", response_text)
+            await self.sessions.aset(session_id, session)
 
             return {
                 "response": response_text,
@@ -924,7 +934,7 @@ class EnhancedVisionAgent:
             # Fallback to direct Azure OpenAI when Agent Service is unavailable
             logger.info("[SYNC] Agent Service unavailable — falling back to direct Azure OpenAI Vision API")
             try:
-                session = self.sessions.get(session_id)
+                session = await self.sessions.aget(session_id)
                 if not session:
                     # Create a minimal session for fallback (agent init may have failed before session creation)
                     session = VisionSession(session_id=session_id)
@@ -1152,6 +1162,8 @@ class EnhancedVisionAgent:
                     session.last_analysis = analysis_text
                     session.add_turn("user", user_query)
                     session.add_turn("assistant", analysis_text)
+                    if await self.sessions.aget(session.session_id) is not None:
+                        await self.sessions.aset(session.session_id, session)
 
                     return {
                         "response": analysis_text,
@@ -1172,15 +1184,12 @@ class EnhancedVisionAgent:
             return None
 
     def cleanup_old_sessions(self, max_age_minutes: int = 30):
-        """Remove sessions older than max_age_minutes."""
-        now = datetime.utcnow()
-        expired = [
-            sid for sid, session in self.sessions.items()
-            if (now - session.updated_at).total_seconds() > max_age_minutes * 60
-        ]
-        for sid in expired:
-            del self.sessions[sid]
-            logger.info(f"Cleaned up expired vision session: {sid}")
+        """Remove sessions idle for more than max_age_minutes."""
+        # updated_at changes only alongside a write-back, so the store's write
+        # time stands in for it without loading each session
+        purged = self.sessions.purge_idle(max_age_minutes * 60)
+        if purged:
+            logger.info(f"Cleaned up {purged} expired vision session(s)")
 
     async def cleanup(self):
         """Cleanup agent resources on shutdown."""
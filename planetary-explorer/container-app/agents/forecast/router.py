@@ -105,13 +105,6 @@ async def route(
                     "Forecast LLM router failed (%s); falling back to all-GLOBAL.",
                     exc,
                 )
-            finally:
-                # Best-effort close. The LlmClient holds an httpx pool;
-                # leaking is harmless across one request but noisy in tests.
-                try:
-                    await client.aclose()
-                except Exception:  # noqa: BLE001
-                    pass
 
     # ── Mode 3: no LLM / no query → preserve legacy "all GLOBAL" behavior ──
     eligible = [p for p in providers if Capability.GLOBAL in p.capabilities]
@@ -130,7 +123,7 @@ async def route(
 # LLM routing internals
 # ──────────────────────────────────────────────────────────────────────
 def _try_llm_client():
-    """Construct an LlmClient from env, or return None.
+    """Return the process-wide LlmClient from env, or None.
 
     Lazy import so the forecast package doesn't hard-depend on the
     `_framework` package or `openai` SDK.
@@ -16,8 +16,7 @@ import logging
 import os
 from typing import Optional
 
-from openai import AsyncAzureOpenAI
-from azure.identity import DefaultAzureCredential, get_bearer_token_provider
+from _framework.llm_client import LlmClient, get_llm_client
 
 from prompts.layer2_clarifier_prompt import (
     LAYER2_CLARIFIER_SYSTEM_PROMPT,
@@ -95,27 +94,9 @@ class Layer2ClarifierAgent:
                 "AZURE_AI_PROJECT_ENDPOINT to be set."
             )
         self.api_version = api_version
-        self._client: Optional[AsyncAzureOpenAI] = None
-
-    def _get_client(self) -> AsyncAzureOpenAI:
-        if self._client is not None:
-            return self._client
-        api_key = os.environ.get("AZURE_OPENAI_API_KEY") or None
-        token_provider = None
-        if not api_key:
-            token_provider = get_bearer_token_provider(
-                DefaultAzureCredential(),
-                "https://cognitiveservices.azure.com/.default",
-            )
-        # api_key must be None (not "") so the OpenAI SDK falls through
-        # to azure_ad_token_provider for managed-identity auth.
-        self._client = AsyncAzureOpenAI(
-            azure_endpoint=self.endpoint,
-            api_key=api_key,
-            azure_ad_token_provider=token_provider,
-            api_version=self.api_version,
-        )
-        return self._client
+
+    def _get_client(self) -> LlmClient:
+        return get_llm_client(self.deployment, api_version=self.api_version, endpoint=self.endpoint)
 
     async def decide(self, payload: Layer2ClarifierInput) -> Layer2ClarifierDecision:
         try:
@@ -139,7 +120,7 @@ class Layer2ClarifierAgent:
             )
 
             client = self._get_client()
-            response = await client.chat.completions.create(
+            response = await client.create(
                 model=self.deployment,
                 messages=[
                     {"role": "system", "content": LAYER2_CLARIFIER_SYSTEM_PROMPT},
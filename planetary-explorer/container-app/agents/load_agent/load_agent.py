@@ -21,8 +21,7 @@ import os
 import re
 from typing import Any, Dict, List, Optional
 
-from openai import AsyncAzureOpenAI
-from azure.identity import DefaultAzureCredential, get_bearer_token_provider
+from _framework.llm_client import LlmClient, get_llm_client
 
 from prompts.load_agent_prompt import (
     LOAD_AGENT_SYSTEM_PROMPT,
@@ -379,26 +378,9 @@ class LoadAgent:
                 "AZURE_OPENAI_ENDPOINT to be set."
             )
         self.api_version = api_version
-        self._client: Optional[AsyncAzureOpenAI] = None
-
-    def _get_client(self) -> AsyncAzureOpenAI:
-        if self._client is not None:
-            return self._client
-        api_key = os.environ.get("AZURE_OPENAI_API_KEY") or None
-        token_provider = None
-        if not api_key:
-            token_provider = get_bearer_token_provider(
-                DefaultAzureCredential(),
-                "https://cognitiveservices.azure.com/.default",
-            )
-        # api_key must be None (not "") so the SDK falls through to MI auth.
-        self._client = AsyncAzureOpenAI(
-            azure_endpoint=self.endpoint,
-            api_key=api_key,
-            azure_ad_token_provider=token_provider,
-            api_version=self.api_version,
-        )
-        return self._client
+
+    def _get_client(self) -> LlmClient:
+        return get_llm_client(self.deployment, api_version=self.api_version, endpoint=self.endpoint)
 
     async def plan(self, payload: LoadAgentInput) -> LoadPlan:
         """Plan a STAC load. Always returns a LoadPlan with a non-empty chat_summary.
@@ -468,7 +450,7 @@ class LoadAgent:
                 extra["reasoning_effort"] = "minimal"
             else:
                 extra["temperature"] = 0.0
-            response = await client.chat.completions.create(
+            response = await client.create(
                 model=self.deployment,
                 messages=[
                     {"role": "system", "content": LOAD_AGENT_SYSTEM_PROMPT},
@@ -41,6 +41,8 @@ from typing import List, Optional
 
 from pydantic import BaseModel, Field
 
+from _framework.llm_client import LlmClient, get_llm_client
+
 logger = logging.getLogger(__name__)
 
 
@@ -247,33 +249,14 @@ class QuerySplitter:
             or os.getenv("AZURE_AI_PROJECT_ENDPOINT")
         )
         self.api_version = api_version
-        self._client = None
 
-    def _get_client(self):
-        if self._client is not None:
-            return self._client
+    def _get_client(self) -> LlmClient:
         if not self.endpoint:
             raise RuntimeError(
                 "QuerySplitter requires AZURE_AI_PROJECT_ENDPOINT or "
                 "AZURE_OPENAI_ENDPOINT to be set."
             )
-        from openai import AsyncAzureOpenAI
-        from azure.identity import DefaultAzureCredential, get_bearer_token_provider
-
-        api_key = os.environ.get("AZURE_OPENAI_API_KEY") or None
-        token_provider = None
-        if not api_key:
-            token_provider = get_bearer_token_provider(
-                DefaultAzureCredential(),
-                "https://cognitiveservices.azure.com/.default",
-            )
-        self._client = AsyncAzureOpenAI(
-            azure_endpoint=self.endpoint,
-            api_key=api_key,
-            azure_ad_token_provider=token_provider,
-            api_version=self.api_version,
-        )
-        return self._client
+        return get_llm_client(self.deployment, api_version=self.api_version, endpoint=self.endpoint)
 
     async def split(self, query: str) -> SplitDecision:
         """Return a SplitDecision. Fails open to is_multi_part=false."""
@@ -288,7 +271,7 @@ class QuerySplitter:
             # 2) LLM call
             client = self._get_client()
             user_prompt = SPLITTER_USER_PROMPT_TEMPLATE.format(query=query.strip())
-            response = await client.chat.completions.create(
+            response = await client.create(
                 model=self.deployment,
                 messages=[
                     {"role": "system", "content": SPLITTER_SYSTEM_PROMPT},
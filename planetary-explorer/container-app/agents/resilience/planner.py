@@ -54,12 +54,12 @@ except Exception as exc:  # pragma: no cover
         return fn
 
 try:
-    from azure.identity import DefaultAzureCredential, get_bearer_token_provider
-    from openai import AsyncAzureOpenAI
+    import openai  # noqa: F401  (SDK presence check)
     OPENAI_AVAILABLE = True
 except Exception:  # pragma: no cover
     OPENAI_AVAILABLE = False
-    AsyncAzureOpenAI = None  # type: ignore
+
+from _framework.llm_client import LlmClient, get_llm_client
 
 from .tools import TOOL_DISPATCH, TOOL_SCHEMAS
 from .workflow import assess_resilience
@@ -95,42 +95,19 @@ class PlannerDossier:
 
 
 # ─────────────────────────────────────────────────────────────────────────
-# Lazy AOAI client (mirrors clarifier_agent's pattern)
+# AOAI client (process-wide LLM gateway)
 # ─────────────────────────────────────────────────────────────────────────
-_client_singleton: "AsyncAzureOpenAI | None" = None
-
-
-def _get_aoai_client() -> "AsyncAzureOpenAI":
-    """Build (and cache) an AOAI client using managed-identity by default."""
-    global _client_singleton
-    if _client_singleton is not None:
-        return _client_singleton
+def _get_aoai_client() -> "LlmClient":
+    """The shared gateway client for the planner deployment."""
     if not OPENAI_AVAILABLE:
         raise RuntimeError("openai SDK not installed; planner requires it.")
-    # Prefer the AOAI data-plane endpoint. The AI Foundry project endpoint
-    # (AZURE_AI_PROJECT_ENDPOINT, https://*.services.ai.azure.com/api/projects/...)
-    # is a different service and AsyncAzureOpenAI cannot speak to it — using
-    # it returns 401 "audience is incorrect (https://ai.azure.com)" because
-    # Foundry routes through a different token audience and API surface.
-    endpoint = os.getenv("AZURE_OPENAI_ENDPOINT") or os.getenv("AZURE_AI_PROJECT_ENDPOINT")
-    if not endpoint:
-        raise RuntimeError(
-            "PlannerExecutor requires AZURE_OPENAI_ENDPOINT (or AZURE_AI_PROJECT_ENDPOINT)."
-        )
-    api_key = os.getenv("AZURE_OPENAI_API_KEY") or None
-    token_provider = None
-    if not api_key:
-        token_provider = get_bearer_token_provider(
-            DefaultAzureCredential(),
-            "https://cognitiveservices.azure.com/.default",
-        )
-    _client_singleton = AsyncAzureOpenAI(
-        azure_endpoint=endpoint,
-        api_key=api_key,
-        azure_ad_token_provider=token_provider,
+    # The gateway prefers the AOAI data-plane endpoint: the AI Foundry
+    # project endpoint (AZURE_AI_PROJECT_ENDPOINT) returns 401 "audience is
+    # incorrect (https://ai.azure.com)" for chat.completions calls.
+    return get_llm_client(
+        _planner_deployment(),
         api_version=os.getenv("AZURE_OPENAI_API_VERSION", "2024-12-01-preview"),
     )
-    return _client_singleton
 
 
 def _planner_deployment() -> str:
@@ -189,7 +166,7 @@ class RouterExecutor(Executor):  # type: ignore[misc]
             # NOTE: gpt-5 requires ``max_completion_tokens`` (not ``max_tokens``)
             # and only accepts the default temperature; passing ``temperature``
             # or ``max_tokens`` to gpt-5 returns HTTP 400 unsupported_parameter.
-            resp = await client.chat.completions.create(
+            resp = await client.create(
                 model=_planner_deployment(),
                 messages=[
                     {"role": "system", "content": ROUTER_SYSTEM},
@@ -470,7 +447,7 @@ class PlannerExecutor(Executor):  # type: ignore[misc]
             # CSV" instead of using `query_facilities` / `simulate_outage`.
             # After the first hop, let it decide when it's done.
             tool_choice: Any = "required" if hop == 0 else "auto"
-            resp = await client.chat.completions.create(
+            resp = await client.create(
                 model=_planner_deployment(),
                 messages=messages,
                 tools=TOOL_SCHEMAS,
@@ -517,7 +494,7 @@ class PlannerExecutor(Executor):  # type: ignore[misc]
             "role": "user",
             "content": "You've hit the tool-call budget. Produce the final JSON dossier now.",
         })
-        resp = await client.chat.completions.create(
+        resp = await client.create(
             model=_planner_deployment(),
             messages=messages,
         )
@@ -608,7 +585,7 @@ class PlannerExecutor(Executor):  # type: ignore[misc]
             "    no inline source links."
         )
         try:
-            resp = await client.chat.completions.create(
+            resp = await client.create(
                 model=_planner_deployment(),
                 messages=[
                     {"role": "system", "content": synth_system},
@@ -8,6 +8,16 @@ ensembles via a paid provider, but the call signature here is the same:
 
 so swapping in a different provider is a one-file change.
 
+Region assessments can cover hundreds of facilities, so by default points
+are fetched in *batched* mode: Open-Meteo accepts comma-separated
+``latitude`` / ``longitude`` lists, so coordinates are snapped to a small
+grid (facilities on one campus share a cell), the uncached cells are
+packed into multi-location requests of ``RESILIENCE_OPEN_METEO_BATCH_SIZE``
+points, and at most ``RESILIENCE_OPEN_METEO_CONCURRENCY`` requests run at
+once. A 300-facility wildfire run is ~12 HTTP calls instead of 600.
+Set ``RESILIENCE_OPEN_METEO_BATCH=0`` to fall back to one request per
+point (same concurrency bound).
+
 Free tier reference: https://open-meteo.com/en/docs
 """
 
@@ -16,11 +26,14 @@ from __future__ import annotations
 import asyncio
 import logging
 import os
+import time
 from dataclasses import dataclass, field
 from typing import Any
 
 import httpx
 
+import http_pool
+
 logger = logging.getLogger(__name__)
 
 OPEN_METEO_URL = os.getenv(
@@ -32,8 +45,11 @@ OPEN_METEO_AQI_URL = os.getenv(
     "https://air-quality-api.open-meteo.com/v1/air-quality",
 )
 
-# httpx timeout — Open-Meteo is fast (~200 ms), but we batch up to 10
-# requests concurrently so the upper bound matters during cold starts.
+# httpx timeout — Open-Meteo is fast (~200 ms), but a multi-location
+# request is slower and several run concurrently, so the upper bound
+# matters during cold starts.
+# Applied per request; the client itself is the shared ``open-meteo``
+# pool from :mod:`http_pool` so keep-alive survives across assessments.
 _HTTPX_TIMEOUT = httpx.Timeout(15.0, connect=5.0)
 
 # Cache: { (round(lat,2), round(lng,2), horizon, kind): (loaded_at, payload) }
@@ -43,6 +59,50 @@ _CACHE: dict[tuple, tuple[float, dict[str, Any]]] = {}
 _CACHE_TTL_SEC = 900   # 15 minutes is fine for a 7-day forecast
 
 
+def _env_int(name: str, default: int) -> int:
+    try:
+        return max(1, int(os.getenv(name) or default))
+    except ValueError:
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name) or default)
+    except ValueError:
+        return default
+
+
+# Batched mode knobs (read per call so tests / ops can flip them live).
+def _batch_enabled() -> bool:
+    return os.getenv("RESILIENCE_OPEN_METEO_BATCH", "1").strip().lower() not in {"0", "false", "off", "no"}
+
+
+def _batch_size() -> int:
+    return _env_int("RESILIENCE_OPEN_METEO_BATCH_SIZE", 50)
+
+
+def _max_concurrency() -> int:
+    return _env_int("RESILIENCE_OPEN_METEO_CONCURRENCY", 4)
+
+
+def _grid_deg() -> float:
+    # 0.01° ≈ 1.1 km — the same resolution the cache key already rounds to,
+    # and well below Open-Meteo's native model grid.
+    return max(0.0, _env_float("RESILIENCE_OPEN_METEO_GRID_DEG", 0.01))
+
+
+_FORECAST_DAILY_VARS = ",".join([
+    "temperature_2m_max",
+    "temperature_2m_min",
+    "apparent_temperature_max",
+    "precipitation_sum",
+    "wind_speed_10m_max",
+    "wind_gusts_10m_max",
+    "relative_humidity_2m_max",
+])
+
+
 @dataclass
 class FacilityForecast:
     """Per-facility forecast bundle returned by :func:`fetch_forecasts`."""
@@ -63,6 +123,41 @@ def _cache_key(lat: float, lng: float, horizon: int, kind: str) -> tuple:
     return (round(lat, 2), round(lng, 2), int(horizon), kind)
 
 
+def _cache_get(key: tuple, now: float) -> dict[str, Any] | None:
+    cached = _CACHE.get(key)
+    if cached and (now - cached[0]) < _CACHE_TTL_SEC:
+        return cached[1]
+    return None
+
+
+def _forecast_params(lat: Any, lng: Any, horizon: int) -> dict[str, Any]:
+    return {
+        "latitude": lat,
+        "longitude": lng,
+        "daily": _FORECAST_DAILY_VARS,
+        "temperature_unit": "fahrenheit",
+        "wind_speed_unit": "mph",
+        "precipitation_unit": "inch",
+        "forecast_days": horizon,
+        "timezone": "auto",
+    }
+
+
+def _aqi_params(lat: Any, lng: Any, horizon: int) -> dict[str, Any]:
+    # Open-Meteo's air-quality API doesn't accept a `daily=` aggregation
+    # parameter (returns HTTP 400). Fetch hourly PM2.5 + US AQI and roll
+    # them up to per-day maxima client-side (``_aqi_hourly_to_daily``) so
+    # the rest of the pipeline can keep reading ``aqi_daily`` with the
+    # same shape as the forecast endpoint.
+    return {
+        "latitude": lat,
+        "longitude": lng,
+        "hourly": "pm2_5,us_aqi",
+        "forecast_days": horizon,
+        "timezone": "auto",
+    }
+
+
 async def _fetch_one(
     client: httpx.AsyncClient,
     *,
@@ -77,36 +172,14 @@ async def _fetch_one(
     request failed; the error is logged but not raised — partial-failure is
     acceptable for the MVP.
     """
-    import time
-
     now = time.time()
     fc_key = _cache_key(lat, lng, horizon, "fc")
     aqi_key = _cache_key(lat, lng, horizon, "aqi")
 
-    cached_fc = _CACHE.get(fc_key)
-    if cached_fc and (now - cached_fc[0]) < _CACHE_TTL_SEC:
-        fc_payload = cached_fc[1]
-    else:
-        params = {
-            "latitude": lat,
-            "longitude": lng,
-            "daily": ",".join([
-                "temperature_2m_max",
-                "temperature_2m_min",
-                "apparent_temperature_max",
-                "precipitation_sum",
-                "wind_speed_10m_max",
-                "wind_gusts_10m_max",
-                "relative_humidity_2m_max",
-            ]),
-            "temperature_unit": "fahrenheit",
-            "wind_speed_unit": "mph",
-            "precipitation_unit": "inch",
-            "forecast_days": horizon,
-            "timezone": "auto",
-        }
+    fc_payload = _cache_get(fc_key, now)
+    if fc_payload is None:
         try:
-            r = await client.get(OPEN_METEO_URL, params=params)
+            r = await client.get(OPEN_METEO_URL, params=_forecast_params(lat, lng, horizon), timeout=_HTTPX_TIMEOUT)
             r.raise_for_status()
             fc_payload = r.json()
             _CACHE[fc_key] = (now, fc_payload)
@@ -117,27 +190,14 @@ async def _fetch_one(
     if not include_aqi:
         return fc_payload, {}
 
-    cached_aqi = _CACHE.get(aqi_key)
-    if cached_aqi and (now - cached_aqi[0]) < _CACHE_TTL_SEC:
-        return fc_payload, cached_aqi[1]
+    aqi_payload = _cache_get(aqi_key, now)
+    if aqi_payload is not None:
+        return fc_payload, aqi_payload
 
-    # Open-Meteo's air-quality API doesn't accept a `daily=` aggregation
-    # parameter (returns HTTP 400). Fetch hourly PM2.5 + US AQI and roll
-    # them up to per-day maxima client-side so the rest of the pipeline
-    # can keep reading ``aqi_daily`` with the same shape as the forecast
-    # endpoint.
-    aqi_params = {
-        "latitude": lat,
-        "longitude": lng,
-        "hourly": ",".join(["pm2_5", "us_aqi"]),
-        "forecast_days": horizon,
-        "timezone": "auto",
-    }
     try:
-        r = await client.get(OPEN_METEO_AQI_URL, params=aqi_params)
+        r = await client.get(OPEN_METEO_AQI_URL, params=_aqi_params(lat, lng, horizon), timeout=_HTTPX_TIMEOUT)
         r.raise_for_status()
-        hourly_payload = r.json()
-        aqi_payload = _aqi_hourly_to_daily(hourly_payload)
+        aqi_payload = _aqi_hourly_to_daily(r.json())
         _CACHE[aqi_key] = (now, aqi_payload)
     except Exception as exc:  # noqa: BLE001 — partial failure is OK
         logger.warning("[RESILIENCE] open-meteo aqi lat=%.3f lng=%.3f failed: %s", lat, lng, exc)
@@ -189,16 +249,139 @@ def _aqi_hourly_to_daily(payload: dict[str, Any]) -> dict[str, Any]:
     }
 
 
+# ---------------------------------------------------------------------------
+# Batched multi-location mode
+# ---------------------------------------------------------------------------
+
+
+def _grid_cell(lat: float, lng: float, grid: float) -> tuple[float, float]:
+    """Snap a point to the dedup grid (``grid <= 0`` keeps exact coords)."""
+    if grid <= 0:
+        return (lat, lng)
+    return (round(round(lat / grid) * grid, 6), round(round(lng / grid) * grid, 6))
+
+
+def _chunks(items: list[Any], size: int) -> list[list[Any]]:
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+async def _fetch_chunk(
+    client: httpx.AsyncClient,
+    url: str,
+    params_fn: Any,
+    coords: list[tuple[float, float]],
+    horizon: int,
+    kind: str,
+    sem: asyncio.Semaphore,
+) -> list[dict[str, Any]]:
+    """One multi-location request; returns one payload per coordinate.
+
+    Open-Meteo answers a multi-coordinate request with a JSON list in
+    request order (a single object when only one coordinate was sent).
+    A failed or malformed response yields ``{}`` for every coordinate in
+    the chunk — the same partial-failure contract as :func:`_fetch_one`.
+    """
+    params = params_fn(
+        ",".join(f"{lat:.4f}" for lat, _ in coords),
+        ",".join(f"{lng:.4f}" for _, lng in coords),
+        horizon,
+    )
+    async with sem:
+        try:
+            r = await client.get(url, params=params, timeout=_HTTPX_TIMEOUT)
+            r.raise_for_status()
+            body = r.json()
+        except Exception as exc:  # noqa: BLE001 — partial failure is OK
+            logger.warning("[RESILIENCE] open-meteo %s batch of %d failed: %s", kind, len(coords), exc)
+            return [{} for _ in coords]
+    payloads = body if isinstance(body, list) else [body]
+    if len(payloads) != len(coords):
+        logger.warning(
+            "[RESILIENCE] open-meteo %s batch returned %d locations for %d requested",
+            kind, len(payloads), len(coords),
+        )
+        return [{} for _ in coords]
+    return [p if isinstance(p, dict) else {} for p in payloads]
+
+
+async def _fetch_batched(
+    client: httpx.AsyncClient,
+    coords: list[tuple[float, float]],
+    *,
+    horizon: int,
+    include_aqi: bool,
+) -> list[tuple[dict[str, Any], dict[str, Any]]]:
+    """Batched counterpart of ``gather(_fetch_one(...))`` over ``coords``.
+
+    Points are deduplicated on the ``RESILIENCE_OPEN_METEO_GRID_DEG`` grid;
+    each unique cell is requested once (at the first input point that
+    falls in it) and served from ``_CACHE`` when fresh. Results are fanned
+    back out in input order.
+    """
+    now = time.time()
+    grid = _grid_deg()
+    size = _batch_size()
+    sem = asyncio.Semaphore(_max_concurrency())
+
+    cell_of = [_grid_cell(lat, lng, grid) for lat, lng in coords]
+    # cell -> representative (first input) coordinate, in first-seen order
+    rep: dict[tuple[float, float], tuple[float, float]] = {}
+    for cell, xy in zip(cell_of, coords):
+        rep.setdefault(cell, xy)
+
+    kinds: list[tuple[str, str, Any, Any]] = [("fc", OPEN_METEO_URL, _forecast_params, None)]
+    if include_aqi:
+        kinds.append(("aqi", OPEN_METEO_AQI_URL, _aqi_params, _aqi_hourly_to_daily))
+
+    resolved: dict[str, dict[tuple[float, float], dict[str, Any]]] = {}
+    jobs = []
+    job_meta = []
+    for kind, url, params_fn, post in kinds:
+        found: dict[tuple[float, float], dict[str, Any]] = {}
+        missing: list[tuple[float, float]] = []
+        for cell in rep:
+            hit = _cache_get(_cache_key(cell[0], cell[1], horizon, kind), now)
+            if hit is not None:
+                found[cell] = hit
+            else:
+                missing.append(cell)
+        resolved[kind] = found
+        for chunk in _chunks(missing, size):
+            jobs.append(_fetch_chunk(client, url, params_fn, [rep[c] for c in chunk], horizon, kind, sem))
+            job_meta.append((kind, post, chunk))
+
+    if jobs:
+        logger.info(
+            "[RESILIENCE] open-meteo batched: %d points -> %d cells, %d requests",
+            len(coords), len(rep), len(jobs),
+        )
+    for (kind, post, chunk), payloads in zip(job_meta, await asyncio.gather(*jobs)):
+        for cell, payload in zip(chunk, payloads):
+            if payload and post is not None:
+                payload = post(payload)
+            if payload:
+                _CACHE[_cache_key(cell[0], cell[1], horizon, kind)] = (now, payload)
+            resolved[kind][cell] = payload
+
+    return [
+        (resolved["fc"].get(cell, {}), resolved["aqi"].get(cell, {}) if include_aqi else {})
+        for cell in cell_of
+    ]
+
+
 async def fetch_forecasts(
     points: list[dict[str, Any]],
     *,
     horizon_days: int = 7,
     include_aqi: bool = True,
+    batched: bool | None = None,
 ) -> list[FacilityForecast]:
     """Fetch daily forecasts for a batch of points concurrently.
 
     ``points`` is a list of dicts with ``facility_id``, ``lat``, ``lng``.
     Returns one :class:`FacilityForecast` per input row, in the same order.
+    ``batched`` overrides ``RESILIENCE_OPEN_METEO_BATCH`` (multi-location
+    requests vs one request per point).
     On a per-point failure the corresponding result has empty ``daily`` and
     populated ``error`` — the caller decides how to surface that to the
     user (the MVP just downgrades the affected hazard score to ``low``).
@@ -206,18 +389,21 @@ async def fetch_forecasts(
     if not points:
         return []
 
-    async with httpx.AsyncClient(timeout=_HTTPX_TIMEOUT) as client:
-        tasks = [
-            _fetch_one(
-                client,
-                lat=float(p["lat"]),
-                lng=float(p["lng"]),
-                horizon=horizon_days,
-                include_aqi=include_aqi,
-            )
-            for p in points
-        ]
-        results = await asyncio.gather(*tasks, return_exceptions=False)
+    client = http_pool.get_httpx_client(http_pool.POOL_OPEN_METEO)
+    coords = [(float(p["lat"]), float(p["lng"])) for p in points]
+    if batched is None:
+        batched = _batch_enabled()
+
+    if batched:
+        results = await _fetch_batched(client, coords, horizon=horizon_days, include_aqi=include_aqi)
+    else:
+        sem = asyncio.Semaphore(_max_concurrency())
+
+        async def _bounded(lat: float, lng: float) -> tuple[dict[str, Any], dict[str, Any]]:
+            async with sem:
+                return await _fetch_one(client, lat=lat, lng=lng, horizon=horizon_days, include_aqi=include_aqi)
+
+        results = await asyncio.gather(*(_bounded(lat, lng) for lat, lng in coords))
 
     out: list[FacilityForecast] = []
     for p, (fc, aqi) in zip(points, results):
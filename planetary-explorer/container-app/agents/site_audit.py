@@ -17,7 +17,9 @@ audit returns a weighted overall score and a flat evidence list with a
 
 Reads the 5 Delta tables we materialized in OneLake directly via the
 deltalake library + OBO storage token (no SQL endpoint, no DAX, no Spark).
-DataFrames are cached in-process for 1 hour.
+DataFrames are cached in-process for 1 hour, each with a spatial index
+(``agents.spatial_index``) that is rebuilt only when the Delta version
+changes, so the distance-based scorers never scan a whole table.
 """
 
 from __future__ import annotations
@@ -36,6 +38,8 @@ from deltalake import DeltaTable
 
 import fabric_client
 import weather_client
+from raster_env import raster_tool
+from agents.spatial_index import EARTH_RADIUS_MI, SpatialIndex
 
 logger = logging.getLogger(__name__)
 
@@ -93,6 +97,11 @@ _TABLE_CACHE: dict[str, tuple[float, pd.DataFrame]] = {}
 # ``pd.DataFrame`` and other callers (e.g. ``site_intel.executors``) don't
 # need to change.
 _TABLE_VERSIONS: dict[str, int | None] = {}
+# { table_name: SpatialIndex } over the cached DataFrame's lat/lng columns.
+# Built by ``_load_table``; a TTL reload that lands on the same Delta
+# version re-uses the existing index instead of rebuilding it, and every
+# audit (including batch audits of many sites) queries the same index.
+_SPATIAL_INDEXES: dict[str, SpatialIndex] = {}
 _CACHE_TTL_SECONDS = 3600
 _CACHE_LOCK = asyncio.Lock()
 
@@ -101,9 +110,6 @@ _CACHE_LOCK = asyncio.Lock()
 # Geometry helpers
 # ──────────────────────────────────────────────────────────────────────────────
 
-EARTH_RADIUS_MI = 3958.7613
-
-
 def _haversine_mi(
     lat1: float, lon1: float, lat2: pd.Series, lon2: pd.Series
 ) -> pd.Series:
@@ -121,6 +127,29 @@ def _haversine_mi(
     return 2 * EARTH_RADIUS_MI * a.clip(0, 1).map(math.sqrt).map(math.asin)
 
 
+def _index_table(table: str, df: pd.DataFrame, version: int | None) -> SpatialIndex | None:
+    """Build (or re-use) the spatial index for a freshly loaded table. Blocking."""
+    if not {"latitude", "longitude"} <= set(df.columns):
+        return None
+    prev = _SPATIAL_INDEXES.get(table)
+    if prev is not None and version is not None and prev.version == version and len(prev.frame) == len(df):
+        prev.rebind(df)
+        return prev
+    return SpatialIndex(df, version)
+
+
+def _spatial_index(df: pd.DataFrame) -> SpatialIndex:
+    """Index for ``df``: the cached one when ``df`` came from ``_load_table``.
+
+    Frames that were not loaded through the cache (tests, ad-hoc callers)
+    get a throwaway index, which is still a single vectorized pass.
+    """
+    for idx in _SPATIAL_INDEXES.values():
+        if idx.frame is df:
+            return idx
+    return SpatialIndex(df)
+
+
 # ──────────────────────────────────────────────────────────────────────────────
 # Delta table loading
 # ──────────────────────────────────────────────────────────────────────────────
@@ -258,11 +287,16 @@ async def _load_table(
             # Refresh OBO token (the previous one may now be near expiry) and retry once.
             token = await fabric_client.exchange_user_token(user_assertion, STORAGE_SCOPE)
             df, version = await asyncio.to_thread(_read)
+        index = await asyncio.to_thread(_index_table, table, df, version)
         _TABLE_CACHE[table] = (time.time(), df)
         _TABLE_VERSIONS[table] = version
+        if index is not None:
+            _SPATIAL_INDEXES[table] = index
+        else:
+            _SPATIAL_INDEXES.pop(table, None)
         logger.info(
-            "[SITE_AUDIT] loaded Delta table %s: %d rows (v=%s)",
-            table, len(df), version,
+            "[SITE_AUDIT] loaded Delta table %s: %d rows (v=%s, index=%s)",
+            table, len(df), version, index.backend if index is not None else "none",
         )
         return df
 # ──────────────────────────────────────────────────────────────────────────────
@@ -293,15 +327,13 @@ def _score_power(
     if power_df.empty:
         return DimensionResult(0.0, "no power infrastructure data available", [])
 
-    df = power_df.copy()
-    df["distance_mi"] = _haversine_mi(lat, lng, df["latitude"], df["longitude"])
-
-    subs = df[df["type"] == "substation"].nsmallest(5, "distance_mi")
+    index = _spatial_index(power_df)
+    subs = index.subset("type", "substation").query(lat, lng, k=5)
     nearest_sub = subs.iloc[0] if not subs.empty else None
 
-    hv_lines = df[
-        (df["type"] == "transmission_line") & (df["distance_mi"] <= GRID_HV_RADIUS_MI)
-    ]
+    hv_lines = index.subset("type", "transmission_line").query(
+        lat, lng, radius_mi=GRID_HV_RADIUS_MI, sort_by_distance=False,
+    )
     line_count = len(hv_lines)
     max_voltage = hv_lines["voltage_kv"].max() if not hv_lines.empty else 0
 
@@ -359,9 +391,7 @@ def _score_water(
     if water_df.empty:
         return DimensionResult(0.0, "no water assets in dataset", [])
 
-    df = water_df.copy()
-    df["distance_mi"] = _haversine_mi(lat, lng, df["latitude"], df["longitude"])
-    nearby = df[df["distance_mi"] <= WATER_SEARCH_RADIUS_MI].nsmallest(5, "distance_mi")
+    nearby = _spatial_index(water_df).query(lat, lng, k=5, radius_mi=WATER_SEARCH_RADIUS_MI)
     if nearby.empty:
         return DimensionResult(
             10.0,
@@ -396,9 +426,7 @@ def _score_competition(
     if dc_df.empty:
         return DimensionResult(50.0, "existing-DC dataset empty", [])
 
-    df = dc_df.copy()
-    df["distance_mi"] = _haversine_mi(lat, lng, df["latitude"], df["longitude"])
-    nearby = df[df["distance_mi"] <= COMPETITION_RADIUS_MI].nsmallest(20, "distance_mi")
+    nearby = _spatial_index(dc_df).query(lat, lng, k=20, radius_mi=COMPETITION_RADIUS_MI)
     n = len(nearby)
     # 0 nearby → 100 (uncongested); 10+ → 30 (saturated)
     score = max(30.0, 100 - n * 7)
@@ -422,9 +450,7 @@ def _score_parcel_match(
     if sites_df.empty:
         return DimensionResult(50.0, "no EPA candidate sites in dataset", [])
 
-    df = sites_df.copy()
-    df["distance_mi"] = _haversine_mi(lat, lng, df["latitude"], df["longitude"])
-    near = df[df["distance_mi"] <= PARCEL_MATCH_RADIUS_MI].nsmallest(3, "distance_mi")
+    near = _spatial_index(sites_df).query(lat, lng, k=3, radius_mi=PARCEL_MATCH_RADIUS_MI)
     if near.empty:
         return DimensionResult(
             50.0,
@@ -462,8 +488,9 @@ def _score_parcel_match(
 #                            7=built 8=bare 9=snow 11=rangeland.
 #   • cop-dem-glo-30        — Copernicus 30 m global DEM (elevation in meters).
 #
-# Strategy: STAC search at the point, take the most-recent item, sign with
-# `planetary_computer.sign()` so the COG href is presigned, open with rasterio
+# Strategy: STAC search at the point (through the shared `stac_item_cache`,
+# so repeat audits of a site skip the catalog), take the most-recent item,
+# signed with `planetary_computer.sign()` so the COG href is presigned, open with rasterio
 # and read the single pixel under (lat, lng). All blocking I/O runs in a
 # thread; this keeps the MPC sampling parallel to the Lakehouse loads.
 
@@ -518,6 +545,7 @@ def _discover_dynamic_collections(user_query: str | None) -> list[str]:
     return out
 
 
+@raster_tool
 def _sample_mpc_pixels_blocking(
     lat: float,
     lng: float,
@@ -531,23 +559,23 @@ def _sample_mpc_pixels_blocking(
     is skipped for dynamic matches because they may be vector,
     multi-band, or otherwise not point-sample-friendly.
     """
-    import planetary_computer as pc
-    from pystac_client import Client
     import rasterio
 
-    catalog = Client.open("https://planetarycomputer.microsoft.com/api/stac/v1")
+    from stac_item_cache import STATIC_COLLECTION_TTL_S, search_items
+
+    endpoint = "https://planetarycomputer.microsoft.com/api/stac/v1"
     point = {"type": "Point", "coordinates": [lng, lat]}
 
     out: dict[str, Any] = {}
 
     # — Land cover —
     try:
-        s = catalog.search(
-            collections=["io-lulc-9-class"], intersects=point, max_items=1
+        items = search_items(
+            endpoint, collections=["io-lulc-9-class"], intersects=point, max_items=1,
+            ttl_s=STATIC_COLLECTION_TTL_S,
         )
-        items = list(s.items())
         if items:
-            it = pc.sign(items[0])
+            it = items[0]
             asset = it.assets.get("data") or next(iter(it.assets.values()))
             with rasterio.open(asset.href) as ds:
                 vals = list(ds.sample([(lng, lat)]))
@@ -565,12 +593,12 @@ def _sample_mpc_pixels_blocking(
 
     # — Elevation —
     try:
-        s = catalog.search(
-            collections=["cop-dem-glo-30"], intersects=point, max_items=1
+        items = search_items(
+            endpoint, collections=["cop-dem-glo-30"], intersects=point, max_items=1,
+            ttl_s=STATIC_COLLECTION_TTL_S,
         )
-        items = list(s.items())
         if items:
-            it = pc.sign(items[0])
+            it = items[0]
             asset = it.assets.get("data") or next(iter(it.assets.values()))
             with rasterio.open(asset.href) as ds:
                 vals = list(ds.sample([(lng, lat)]))
@@ -589,12 +617,12 @@ def _sample_mpc_pixels_blocking(
     # months a pixel was observed as water 1984-present. >50 means the
     # site is in permanent water; >10 means seasonally flooded.
     try:
-        s = catalog.search(
-            collections=["jrc-gsw"], intersects=point, max_items=1
+        items = search_items(
+            endpoint, collections=["jrc-gsw"], intersects=point, max_items=1,
+            ttl_s=STATIC_COLLECTION_TTL_S,
         )
-        items = list(s.items())
         if items:
-            it = pc.sign(items[0])
+            it = items[0]
             asset = (
                 it.assets.get("occurrence")
                 or it.assets.get("data")
@@ -626,10 +654,10 @@ def _sample_mpc_pixels_blocking(
         matches: list[dict[str, Any]] = []
         for cid in extra_collections:
             try:
-                s = catalog.search(
-                    collections=[cid], intersects=point, max_items=1
+                items = search_items(
+                    endpoint, collections=[cid], intersects=point, max_items=1,
+                    sign=False,
                 )
-                items = list(s.items())
                 if not items:
                     matches.append({
                         "collection": cid,
@@ -678,6 +706,18 @@ async def _score_hazards_with_mpc(
     samples_task = asyncio.to_thread(_sample_mpc_pixels_blocking, lat, lng, extra)
     weather_task = weather_client.fetch_climate_indicators(lat, lng)
     samples, weather = await asyncio.gather(samples_task, weather_task)
+    return _hazards_from_samples(samples, weather)
+
+
+def _hazards_from_samples(
+    samples: dict[str, Any], weather: dict[str, Any] | None
+) -> DimensionResult:
+    """Pure scoring half of :func:`_score_hazards_with_mpc`.
+
+    ``samples`` is one point's output of ``_sample_mpc_pixels_blocking``
+    (or of the batch sampler in ``agents.site_audit_batch``) and
+    ``weather`` its Open-Meteo climatology, or ``None``.
+    """
     lulc = samples.get("lulc")
     dem = samples.get("dem")
     gsw = samples.get("surface_water")
@@ -797,6 +837,20 @@ async def _score_precedent_with_search(
     # Generic utility / energy infrastructure permitting query — retrieves
     # relevant precedent across substation, transmission, generation, BESS,
     # and data-center filings in the `permitting-docs` index.
+    hits, fallback = await _fetch_precedent_hits(user_assertion, workspace_id, claimed_mw)
+    if fallback is not None:
+        return fallback
+    return _precedent_from_hits(hits, lat, lng)
+
+
+async def _fetch_precedent_hits(
+    user_assertion: str, workspace_id: str, claimed_mw: float
+) -> tuple[list[dict[str, Any]], DimensionResult | None]:
+    """Run the precedent search. Returns ``(hits, None)`` or ``([], fallback)``.
+
+    The query depends only on ``claimed_mw``, so batch audits issue it once
+    per distinct capacity and score every site from the same hits.
+    """
     query = f"{int(claimed_mw)} MW energy infrastructure interconnection permitting site approval"
     try:
         hits = await fabric_client.search_documents(
@@ -813,15 +867,21 @@ async def _score_precedent_with_search(
     except fabric_client.FabricNotConfigured:
         # Permitting corpus not wired in this environment — fall back to a
         # neutral baseline rather than leaking env-var names into the UI.
-        return DimensionResult(
+        return [], DimensionResult(
             50.0,
             "no permitting precedent available for this site",
             [],
         )
     except Exception as exc:  # noqa: BLE001
         logger.warning("[SITE_AUDIT] AI Search call failed: %s", exc)
-        return DimensionResult(50.0, f"permitting search error: {exc}", [])
+        return [], DimensionResult(50.0, f"permitting search error: {exc}", [])
+    return list(hits or []), None
+
 
+def _precedent_from_hits(
+    hits: list[dict[str, Any]], lat: float, lng: float
+) -> DimensionResult:
+    """Score one site against the precedent search hits (pure)."""
     if not hits:
         return DimensionResult(
             40.0,
@@ -1011,6 +1071,23 @@ def _build_provenance(
 # Public entry point
 # ──────────────────────────────────────────────────────────────────────────────
 
+# Overall score: weighted average reflecting siting team priorities.
+# Power dominates because grid is the binding constraint; precedent is
+# included as a regulatory-confidence factor.
+AUDIT_WEIGHTS: dict[str, float] = {
+    "power": 0.35,
+    "water": 0.15,
+    "hazards": 0.15,
+    "competition": 0.10,
+    "parcel": 0.10,
+    "precedent": 0.15,
+}
+
+
+def _overall_score(scores: dict[str, float]) -> float:
+    """Weighted overall score from per-dimension scores keyed like ``AUDIT_WEIGHTS``."""
+    return sum(scores[dim] * w for dim, w in AUDIT_WEIGHTS.items())
+
 
 async def audit_site(
     *,
@@ -1056,25 +1133,15 @@ async def audit_site(
     competition_r = _score_competition(lat, lng, dcs)
     parcel_r = _score_parcel_match(lat, lng, sites)
 
-    # Overall score: weighted average reflecting siting team priorities.
-    # Power dominates because grid is the binding constraint; precedent is
-    # included as a regulatory-confidence factor.
-    weights = {
-        "power": 0.35,
-        "water": 0.15,
-        "hazards": 0.15,
-        "competition": 0.10,
-        "parcel": 0.10,
-        "precedent": 0.15,
-    }
-    overall = (
-        power_r.score * weights["power"]
-        + water_r.score * weights["water"]
-        + hazards_r.score * weights["hazards"]
-        + competition_r.score * weights["competition"]
-        + parcel_r.score * weights["parcel"]
-        + precedent_r.score * weights["precedent"]
-    )
+    weights = dict(AUDIT_WEIGHTS)
+    overall = _overall_score({
+        "power": power_r.score,
+        "water": water_r.score,
+        "hazards": hazards_r.score,
+        "competition": competition_r.score,
+        "parcel": parcel_r.score,
+        "precedent": precedent_r.score,
+    })
 
     return {
         "input": {"lat": lat, "lng": lng, "claimed_mw": claimed_mw},
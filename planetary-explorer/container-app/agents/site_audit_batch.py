@@ -0,0 +1,494 @@
+"""
+Bulk site audit — score many candidate sites against the same data in one pass.
+
+:func:`agents.site_audit.audit_site` answers one (lat, lng) per call, and
+every call re-runs the MPC raster sampling, the Open-Meteo climatology
+and the AI Search precedent query for that point. Looping it over a few
+thousand candidates from the resilience planner or the M365 tools takes
+hours. :func:`audit_sites_batch` produces the same per-dimension scores
+for a whole list of sites while sharing the work:
+
+    Fabric Lakehouse   →  the four Delta tables load once; the
+                          distance-based scorers query each table's cached
+                          ``SpatialIndex`` (vectorized NumPy / BallTree)
+    Planetary Computer →  one STAC search per anchor collection for all
+                          points (MultiPoint, chunked), then each COG is
+                          opened once and sampled at every point inside it
+    Open-Meteo ERA5    →  one climatology call per 0.25° ERA5 cell,
+                          bounded concurrency, pooled session
+    Azure AI Search    →  one precedent query per distinct ``claimed_mw``
+
+Results come back ranked by overall score (ties keep input order). The
+``/api/sites/audit/batch`` route streams them as NDJSON via
+:func:`iter_ndjson`.
+
+Config:
+  SITE_AUDIT_BATCH_MAX_SITES     reject larger batches (default 5000)
+  SITE_AUDIT_BATCH_CONCURRENCY   concurrent climatology calls (default 8)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import math
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Any, Iterable, Iterator, Sequence
+
+from raster_env import raster_tool
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CLAIMED_MW = 200.0
+
+# STAC ``intersects`` MultiPoint size per search request.
+_STAC_POINTS_PER_SEARCH = 100
+# ERA5 native grid; sites in one cell share a climatology call.
+_ERA5_CELL_DEG = 0.25
+
+
+def _max_sites() -> int:
+    try:
+        return max(1, int(os.getenv("SITE_AUDIT_BATCH_MAX_SITES") or 5000))
+    except ValueError:
+        return 5000
+
+
+def _concurrency() -> int:
+    try:
+        return max(1, int(os.getenv("SITE_AUDIT_BATCH_CONCURRENCY") or 8))
+    except ValueError:
+        return 8
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Input parsing
+# ──────────────────────────────────────────────────────────────────────────────
+
+
+@dataclass
+class BatchSite:
+    """One candidate site in a batch request."""
+
+    site_id: str
+    lat: float
+    lng: float
+    claimed_mw: float
+    properties: dict[str, Any] = field(default_factory=dict)
+
+
+def _coerce_site(raw: dict[str, Any], index: int, default_mw: float, props: dict[str, Any] | None = None) -> BatchSite:
+    try:
+        lat = float(raw["lat"])
+        lng = float(raw["lng"])
+    except (KeyError, TypeError, ValueError):
+        raise ValueError(f"site {index}: lat and lng (floats) are required")
+    if not (math.isfinite(lat) and math.isfinite(lng) and -90 <= lat <= 90 and -180 <= lng <= 180):
+        raise ValueError(f"site {index}: lat/lng out of range")
+    props = dict(props if props is not None else raw)
+    try:
+        mw = float(props.get("claimed_mw") or default_mw)
+    except (TypeError, ValueError):
+        raise ValueError(f"site {index}: claimed_mw must be a number")
+    site_id = props.get("id") or props.get("site_id") or props.get("name") or f"site-{index}"
+    return BatchSite(site_id=str(site_id), lat=lat, lng=lng, claimed_mw=mw, properties=props)
+
+
+def parse_sites(body: Any, *, default_mw: float = DEFAULT_CLAIMED_MW) -> list[BatchSite]:
+    """Normalize a batch request body into :class:`BatchSite` rows.
+
+    Accepts a bare list of ``{lat, lng, claimed_mw?, id?}`` objects, an
+    object with a ``sites`` list, or a GeoJSON ``FeatureCollection`` of
+    ``Point`` features (``claimed_mw`` / ``id`` / ``name`` read from
+    ``properties``; a feature-level ``id`` is used when present). Raises
+    ``ValueError`` with a caller-facing message on malformed input.
+    """
+    if isinstance(body, dict) and body.get("type") == "FeatureCollection":
+        raw_sites = []
+        for i, feat in enumerate(body.get("features") or []):
+            geom = (feat or {}).get("geometry") or {}
+            coords = geom.get("coordinates") or []
+            if geom.get("type") != "Point" or len(coords) < 2:
+                raise ValueError(f"feature {i}: only Point geometries are supported")
+            props = dict(feat.get("properties") or {})
+            if feat.get("id") is not None:
+                props.setdefault("id", feat["id"])
+            raw_sites.append(({"lat": coords[1], "lng": coords[0]}, props))
+    else:
+        items = body.get("sites") if isinstance(body, dict) else body
+        if not isinstance(items, list):
+            raise ValueError("expected a list of sites, {\"sites\": [...]}, or a GeoJSON FeatureCollection")
+        raw_sites = [(s if isinstance(s, dict) else {}, None) for s in items]
+
+    if not raw_sites:
+        raise ValueError("no sites supplied")
+    if len(raw_sites) > _max_sites():
+        raise ValueError(f"batch too large: {len(raw_sites)} sites (max {_max_sites()})")
+    return [_coerce_site(raw, i, default_mw, props) for i, (raw, props) in enumerate(raw_sites)]
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# MPC raster sampling, grouped per STAC item
+# ──────────────────────────────────────────────────────────────────────────────
+
+
+def _group_points_by_item(
+    points: Sequence[tuple[float, float]], items: Iterable[Any]
+) -> list[tuple[Any, list[int]]]:
+    """Assign each (lat, lng) to the first item (in search order) it intersects.
+
+    Mirrors the single-site sampler, which takes ``items[0]`` of a point
+    search. Returns ``[(item, [point indices])]``; points covered by no
+    item are left out.
+    """
+    import numpy as np
+    import shapely
+    from shapely.geometry import shape
+
+    lats = np.array([p[0] for p in points], dtype=float)
+    lngs = np.array([p[1] for p in points], dtype=float)
+    pending = np.arange(len(points))
+    groups: list[tuple[Any, list[int]]] = []
+    for item in items:
+        if not len(pending):
+            break
+        geom = getattr(item, "geometry", None)
+        if not geom:
+            continue
+        hit = shapely.intersects_xy(shape(geom), lngs[pending], lats[pending])
+        if hit.any():
+            groups.append((item, pending[hit].tolist()))
+            pending = pending[~hit]
+    return groups
+
+
+def _search_items(catalog: Any, collection: str, points: Sequence[tuple[float, float]]) -> list[Any]:
+    """All items of ``collection`` touching any point, in search order, de-duplicated."""
+    seen: set[str] = set()
+    out: list[Any] = []
+    for start in range(0, len(points), _STAC_POINTS_PER_SEARCH):
+        chunk = points[start:start + _STAC_POINTS_PER_SEARCH]
+        geom = {"type": "MultiPoint", "coordinates": [[lng, lat] for lat, lng in chunk]}
+        for item in catalog.search(collections=[collection], intersects=geom).items():
+            if item.id not in seen:
+                seen.add(item.id)
+                out.append(item)
+    return out
+
+
+def _lulc_sample(item: Any, asset: Any, value: Any) -> dict[str, Any]:
+    from agents.site_audit import LULC_CLASS_NAMES
+
+    cls = int(value[0])
+    return {
+        "class_code": cls,
+        "class_name": LULC_CLASS_NAMES.get(cls, f"class_{cls}"),
+        "collection": "io-lulc-9-class",
+        "item_id": item.id,
+        "item_datetime": item.datetime.isoformat() if item.datetime else None,
+        "asset_href": asset.href.split("?", 1)[0],
+    }
+
+
+def _dem_sample(item: Any, asset: Any, value: Any) -> dict[str, Any]:
+    elev = float(value[0])
+    return {
+        "elevation_m": round(elev, 1),
+        "collection": "cop-dem-glo-30",
+        "item_id": item.id,
+        "asset_href": asset.href.split("?", 1)[0],
+    }
+
+
+def _gsw_sample(item: Any, asset: Any, value: Any) -> dict[str, Any]:
+    occ_raw = float(value[0])
+    # JRC uses 255 for "no data"; clamp anything >100 to None.
+    occ = round(occ_raw, 1) if 0.0 <= occ_raw <= 100.0 else None
+    return {
+        "occurrence_pct": occ,
+        "collection": "jrc-gsw",
+        "item_id": item.id,
+        "item_datetime": item.datetime.isoformat() if item.datetime else None,
+        "asset_href": asset.href.split("?", 1)[0],
+    }
+
+
+# (samples key, collection, preferred asset keys, value -> sample dict)
+_ANCHOR_READERS = (
+    ("lulc", "io-lulc-9-class", ("data",), _lulc_sample),
+    ("dem", "cop-dem-glo-30", ("data",), _dem_sample),
+    ("surface_water", "jrc-gsw", ("occurrence", "data"), _gsw_sample),
+)
+
+
+@raster_tool
+def _sample_mpc_pixels_batch_blocking(
+    points: Sequence[tuple[float, float]],
+    extra_collections: list[str] | None = None,
+) -> list[dict[str, Any]]:
+    """Batch counterpart of ``site_audit._sample_mpc_pixels_blocking``.
+
+    Returns one samples dict per point with the same keys and shapes, so
+    ``site_audit._hazards_from_samples`` scores it unchanged. Each COG is
+    opened once and sampled at all of its points in one ``ds.sample`` call.
+    Runs in a worker thread.
+    """
+    import rasterio
+    from pystac_client import Client
+
+    import sas_signer
+    from agents.site_audit import _PC_PUBLIC_STAC_BASE
+
+    catalog = Client.open(_PC_PUBLIC_STAC_BASE)
+    out: list[dict[str, Any]] = [{} for _ in points]
+
+    for key, collection, asset_keys, build in _ANCHOR_READERS:
+        try:
+            groups = _group_points_by_item(points, _search_items(catalog, collection, points))
+            signed_items = sas_signer.sign([item for item, _ in groups])
+        except Exception as exc:  # noqa: BLE001 — non-fatal for the audit
+            for sample in out:
+                sample[f"{key}_error"] = str(exc)[:200]
+            continue
+        for (item, idxs), signed in zip(groups, signed_items):
+            try:
+                asset = next(
+                    (signed.assets[k] for k in asset_keys if k in signed.assets),
+                    None,
+                ) or next(iter(signed.assets.values()))
+                with rasterio.open(asset.href) as ds:
+                    values = list(ds.sample([(points[i][1], points[i][0]) for i in idxs]))
+                for i, value in zip(idxs, values):
+                    out[i][key] = build(item, asset, value)
+            except Exception as exc:  # noqa: BLE001
+                for i in idxs:
+                    out[i][f"{key}_error"] = str(exc)[:200]
+
+    for cid in extra_collections or []:
+        try:
+            groups = _group_points_by_item(points, _search_items(catalog, cid, points))
+        except Exception as exc:  # noqa: BLE001
+            for sample in out:
+                sample.setdefault("dynamic_matches", []).append({"collection": cid, "error": str(exc)[:200]})
+            continue
+        matched: dict[int, Any] = {i: item for item, idxs in groups for i in idxs}
+        for i, sample in enumerate(out):
+            item = matched.get(i)
+            sample.setdefault("dynamic_matches", []).append(
+                {
+                    "collection": cid,
+                    "item_id": item.id,
+                    "item_datetime": item.datetime.isoformat() if item.datetime else None,
+                    "asset_keys": list(item.assets.keys())[:8],
+                }
+                if item is not None
+                else {"collection": cid, "item_id": None, "note": "no items intersect the audit point"}
+            )
+    return out
+
+
+async def _climatology_batch(points: Sequence[tuple[float, float]]) -> list[dict[str, Any] | None]:
+    """One Open-Meteo archive call per ERA5 cell, fanned back out per point."""
+    import http_pool
+    import weather_client
+
+    cells: dict[tuple[int, int], tuple[float, float]] = {}
+    cell_of = []
+    for lat, lng in points:
+        cell = (round(lat / _ERA5_CELL_DEG), round(lng / _ERA5_CELL_DEG))
+        cells.setdefault(cell, (lat, lng))
+        cell_of.append(cell)
+
+    session = http_pool.get_session(http_pool.POOL_OPEN_METEO)
+    sem = asyncio.Semaphore(_concurrency())
+
+    async def _one(lat: float, lng: float) -> dict[str, Any] | None:
+        async with sem:
+            return await weather_client.fetch_climate_indicators(lat, lng, session=session)
+
+    results = await asyncio.gather(*(_one(lat, lng) for lat, lng in cells.values()))
+    by_cell = dict(zip(cells, results))
+    return [by_cell[c] for c in cell_of]
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Scoring + ranking
+# ──────────────────────────────────────────────────────────────────────────────
+
+
+def _score_fabric_blocking(
+    sites: Sequence[BatchSite], tables: dict[str, Any]
+) -> list[dict[str, Any]]:
+    """Power / water / competition / parcel for every site. Runs in a thread."""
+    from agents import site_audit
+
+    out = []
+    for s in sites:
+        out.append({
+            "power": site_audit._score_power(s.lat, s.lng, s.claimed_mw, tables["power_infrastructure"]),
+            "water": site_audit._score_water(s.lat, s.lng, tables["water_assets"]),
+            "competition": site_audit._score_competition(s.lat, s.lng, tables["existing_data_centers"]),
+            "parcel": site_audit._score_parcel_match(s.lat, s.lng, tables["candidate_sites"]),
+        })
+    return out
+
+
+def rank_results(results: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Sort by overall score (desc, input order on ties) and set ``rank``."""
+    ranked = sorted(
+        enumerate(results),
+        key=lambda ir: (-(ir[1]["scores"].get("overall") or 0.0), ir[0]),
+    )
+    out = []
+    for rank, (_, r) in enumerate(ranked, start=1):
+        out.append({"rank": rank, **r})
+    return out
+
+
+async def audit_sites_batch(
+    *,
+    user_assertion: str,
+    sites: Sequence[BatchSite],
+    user_query: str | None = None,
+    workspace_id: str | None = None,
+    lakehouse_id: str | None = None,
+    include_hazards: bool = True,
+    include_precedent: bool = True,
+    include_evidence: bool = False,
+) -> dict[str, Any]:
+    """Audit every site in ``sites``; returns ``{"results": [...ranked], ...}``.
+
+    Each result carries the same ``scores`` / ``summaries`` keys as
+    :func:`agents.site_audit.audit_site` (``evidence`` only when
+    ``include_evidence``). Dimensions that are switched off score the
+    neutral 50 and say so in their summary, so rankings stay comparable
+    within one batch.
+    """
+    from agents import site_audit
+
+    t0 = time.perf_counter()
+    ws = workspace_id or site_audit.DEFAULT_WORKSPACE_ID
+    lh = lakehouse_id or site_audit.DEFAULT_LAKEHOUSE_ID
+    points = [(s.lat, s.lng) for s in sites]
+    table_names = ("candidate_sites", "power_infrastructure", "water_assets", "existing_data_centers")
+
+    async def _hazards() -> list[site_audit.DimensionResult]:
+        if not include_hazards:
+            return [site_audit.DimensionResult(50.0, "hazard sampling skipped for this batch", [])] * len(sites)
+        extra = site_audit._discover_dynamic_collections(user_query)
+        samples, weather = await asyncio.gather(
+            asyncio.to_thread(_sample_mpc_pixels_batch_blocking, points, extra),
+            _climatology_batch(points),
+        )
+        return [site_audit._hazards_from_samples(s, w) for s, w in zip(samples, weather)]
+
+    async def _precedent() -> list[site_audit.DimensionResult]:
+        if not include_precedent:
+            return [site_audit.DimensionResult(50.0, "precedent search skipped for this batch", [])] * len(sites)
+        capacities = sorted({s.claimed_mw for s in sites})
+        fetched = await asyncio.gather(*(
+            site_audit._fetch_precedent_hits(user_assertion, ws, mw) for mw in capacities
+        ))
+        by_mw = dict(zip(capacities, fetched))
+        out = []
+        for s in sites:
+            hits, fallback = by_mw[s.claimed_mw]
+            out.append(fallback if fallback is not None else site_audit._precedent_from_hits(hits, s.lat, s.lng))
+        return out
+
+    *frames, hazards, precedent = await asyncio.gather(
+        *(site_audit._load_table(t, user_assertion, ws, lh) for t in table_names),
+        _hazards(),
+        _precedent(),
+    )
+    tables = dict(zip(table_names, frames))
+    fabric = await asyncio.to_thread(_score_fabric_blocking, sites, tables)
+
+    results = []
+    for s, dims, hz, pr in zip(sites, fabric, hazards, precedent):
+        dims = {**dims, "hazards": hz, "precedent": pr}
+        overall = site_audit._overall_score({k: d.score for k, d in dims.items()})
+        row: dict[str, Any] = {
+            "site_id": s.site_id,
+            "input": {"lat": s.lat, "lng": s.lng, "claimed_mw": s.claimed_mw},
+            "scores": {
+                "power": round(dims["power"].score, 1),
+                "water": round(dims["water"].score, 1),
+                "hazards": round(hz.score, 1),
+                "competition": round(dims["competition"].score, 1),
+                "parcel_match": round(dims["parcel"].score, 1),
+                "precedent": round(pr.score, 1),
+                "overall": round(overall, 1),
+            },
+            "summaries": {
+                "power": dims["power"].summary,
+                "water": dims["water"].summary,
+                "hazards": hz.summary,
+                "competition": dims["competition"].summary,
+                "parcel_match": dims["parcel"].summary,
+                "precedent": pr.summary,
+            },
+        }
+        if include_evidence:
+            row["evidence"] = (
+                dims["power"].evidence + dims["water"].evidence + dims["competition"].evidence
+                + dims["parcel"].evidence + hz.evidence + pr.evidence
+            )
+        results.append(row)
+
+    elapsed_ms = round((time.perf_counter() - t0) * 1000.0, 1)
+    logger.info("[SITE_AUDIT] batch of %d sites scored in %.0f ms", len(sites), elapsed_ms)
+    return {
+        "results": rank_results(results),
+        "weights": dict(site_audit.AUDIT_WEIGHTS),
+        "data_provenance": site_audit._build_provenance(
+            fabric_tables=list(tables.items()),
+            hazards_evidence=hazards[0].evidence if hazards else [],
+            user_query=user_query,
+        ),
+        "lakehouse": {"workspace_id": ws, "lakehouse_id": lh},
+        "elapsed_ms": elapsed_ms,
+    }
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# NDJSON
+# ──────────────────────────────────────────────────────────────────────────────
+
+
+def _json_safe(obj: Any) -> Any:
+    """Replace NaN / Inf floats with None (strict JSON), recursively."""
+    if isinstance(obj, float):
+        return obj if math.isfinite(obj) else None
+    if isinstance(obj, dict):
+        return {k: _json_safe(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_json_safe(v) for v in obj]
+    return obj
+
+
+def iter_ndjson(batch: dict[str, Any]) -> Iterator[bytes]:
+    """Encode a batch result as NDJSON lines.
+
+    One ``{"type": "site", "rank": n, ...}`` line per site in ranked
+    order, then a single ``{"type": "summary", ...}`` trailer with the
+    weights, provenance and timing.
+    """
+    results = batch.get("results") or []
+    for row in results:
+        yield (json.dumps(_json_safe({"type": "site", **row}), allow_nan=False) + "\n").encode("utf-8")
+    summary = {k: v for k, v in batch.items() if k != "results"}
+    summary.update({"type": "summary", "sites": len(results)})
+    yield (json.dumps(_json_safe(summary), allow_nan=False) + "\n").encode("utf-8")
+
+
+__all__ = [
+    "BatchSite",
+    "audit_sites_batch",
+    "iter_ndjson",
+    "parse_sites",
+    "rank_results",
+]
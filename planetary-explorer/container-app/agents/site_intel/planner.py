@@ -132,39 +132,18 @@ def _default_plan(spec: SiteSpec, engine: str = "default", reasoning: str = "")
 
 async def _llm_plan(spec: SiteSpec) -> PlannedSpec:
     """Call Azure OpenAI to produce a tailored plan. Raises on any error."""
-    endpoint = (
-        os.getenv("AZURE_AI_PROJECT_ENDPOINT")
-        or os.getenv("AZURE_OPENAI_ENDPOINT")
-    )
-    if not endpoint:
-        raise RuntimeError("AZURE_OPENAI_ENDPOINT / AZURE_AI_PROJECT_ENDPOINT not set")
-
-    from openai import AsyncAzureOpenAI
-    from azure.identity import DefaultAzureCredential, get_bearer_token_provider
-
-    api_key = os.environ.get("AZURE_OPENAI_API_KEY") or None
-    token_provider = None
-    if not api_key:
-        token_provider = get_bearer_token_provider(
-            DefaultAzureCredential(),
-            "https://cognitiveservices.azure.com/.default",
-        )
-    client = AsyncAzureOpenAI(
-        azure_endpoint=endpoint,
-        api_key=api_key,
-        azure_ad_token_provider=token_provider,
-        api_version=os.getenv("AZURE_OPENAI_API_VERSION", "2024-10-21"),
-    )
+    from _framework.llm_client import get_llm_client
 
     deployment = os.getenv("SITE_PLANNER_DEPLOYMENT") or os.getenv(
         "AZURE_OPENAI_DEPLOYMENT_NAME", "gpt-5"
     )
+    client = get_llm_client(deployment)
     user_msg = (
         f"Site: ({spec.lat:.4f}, {spec.lng:.4f}), proposed asset capacity {spec.claimed_mw} MW.\n"
         f"User question: {spec.user_query or '(no specific question — full utility-siting audit)'}\n"
     )
 
-    response = await client.chat.completions.create(
+    response = await client.create(
         model=deployment,
         messages=[
             {"role": "system", "content": _PLANNER_SYSTEM_PROMPT},
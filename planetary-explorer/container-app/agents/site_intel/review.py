@@ -165,33 +165,12 @@ _REVIEW_SCHEMA: dict[str, Any] = {
 
 async def _llm_review(dossier: dict[str, Any]) -> dict[str, Any]:
     """Run the critique LLM. Raises on any error."""
-    endpoint = (
-        os.getenv("AZURE_AI_PROJECT_ENDPOINT")
-        or os.getenv("AZURE_OPENAI_ENDPOINT")
-    )
-    if not endpoint:
-        raise RuntimeError("AZURE_OPENAI_ENDPOINT / AZURE_AI_PROJECT_ENDPOINT not set")
-
-    from openai import AsyncAzureOpenAI
-    from azure.identity import DefaultAzureCredential, get_bearer_token_provider
-
-    api_key = os.environ.get("AZURE_OPENAI_API_KEY") or None
-    token_provider = None
-    if not api_key:
-        token_provider = get_bearer_token_provider(
-            DefaultAzureCredential(),
-            "https://cognitiveservices.azure.com/.default",
-        )
-    client = AsyncAzureOpenAI(
-        azure_endpoint=endpoint,
-        api_key=api_key,
-        azure_ad_token_provider=token_provider,
-        api_version=os.getenv("AZURE_OPENAI_API_VERSION", "2024-10-21"),
-    )
+    from _framework.llm_client import get_llm_client
 
     deployment = os.getenv("SITE_REVIEW_DEPLOYMENT") or os.getenv(
         "AZURE_OPENAI_DEPLOYMENT_NAME", "gpt-5"
     )
+    client = get_llm_client(deployment)
     # Trim the dossier we send to the model — we only want scores + summaries,
     # not the full evidence dump (which is large and not needed for critique).
     compact = {
@@ -200,7 +179,7 @@ async def _llm_review(dossier: dict[str, Any]) -> dict[str, Any]:
         "skipped_dimensions": dossier.get("skipped_dimensions"),
         "planner": dossier.get("planner"),
     }
-    response = await client.chat.completions.create(
+    response = await client.create(
         model=deployment,
         messages=[
             {"role": "system", "content": _REVIEW_SYSTEM_PROMPT},
@@ -0,0 +1,166 @@
+"""Spatial index over a DataFrame's ``latitude`` / ``longitude`` columns.
+
+The site-audit scorers used to ``copy()`` a whole cached Delta table and
+compute a per-row haversine against every row on each audit. Power
+infrastructure alone can be hundreds of thousands of rows, and batch
+audits repeat that scan per candidate site.
+
+:class:`SpatialIndex` is built once per table snapshot (see
+``agents.site_audit._load_table``) and answers nearest-k and
+within-radius queries by returning only the matching rows, with a
+``distance_mi`` column, ordered exactly as ``nsmallest(k, "distance_mi")``
+would order them (distance, then original row order).
+
+Backed by a scikit-learn ``BallTree`` (haversine metric on radians) when
+the table is large enough for it to pay off; small tables, or images
+without scikit-learn, use a vectorized numpy scan. Candidate distances
+are always recomputed with the same haversine formula, so results do not
+depend on which backend answered.
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+EARTH_RADIUS_MI = 3958.7613
+
+# Below this many rows a numpy scan beats BallTree construction + query.
+_BALLTREE_MIN_ROWS = 512
+# Relative slack on tree radii so float rounding in the tree's own metric
+# never drops a row that the exact miles comparison would keep.
+_RADIUS_SLACK = 1e-9
+
+
+def haversine_mi(
+    lat_r: float, lng_r: float, lats_r: np.ndarray, lngs_r: np.ndarray
+) -> np.ndarray:
+    """Great-circle distance (miles) from one point to many; inputs in radians."""
+    dlat = lats_r - lat_r
+    dlng = lngs_r - lng_r
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat_r) * np.cos(lats_r) * np.sin(dlng / 2) ** 2
+    return 2 * EARTH_RADIUS_MI * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+
+def _ball_tree(coords_r: np.ndarray) -> Any | None:
+    try:
+        from sklearn.neighbors import BallTree
+    except ImportError:  # pragma: no cover — scikit-learn is in requirements.txt
+        logger.info("[SPATIAL] scikit-learn unavailable; using numpy scan")
+        return None
+    return BallTree(coords_r, metric="haversine")
+
+
+class SpatialIndex:
+    """Nearest-k / within-radius lookups over one DataFrame snapshot.
+
+    ``version`` is the Delta version the frame was read at; the owner
+    compares it to decide whether a reload needs a rebuild. Rows with
+    missing or non-numeric coordinates are never returned (they would
+    have produced a NaN distance in the old per-row scan).
+    """
+
+    __slots__ = ("frame", "version", "_pos", "_lat_r", "_lng_r", "_tree", "_subsets")
+
+    def __init__(
+        self,
+        frame: pd.DataFrame,
+        version: int | None = None,
+        *,
+        positions: np.ndarray | None = None,
+    ) -> None:
+        self.frame = frame
+        self.version = version
+        lat = pd.to_numeric(frame["latitude"], errors="coerce").to_numpy(dtype=float)
+        lng = pd.to_numeric(frame["longitude"], errors="coerce").to_numpy(dtype=float)
+        pos = np.arange(len(frame)) if positions is None else np.asarray(positions, dtype=np.intp)
+        pos = pos[np.isfinite(lat[pos]) & np.isfinite(lng[pos])]
+        self._pos = pos
+        self._lat_r = np.radians(lat[pos])
+        self._lng_r = np.radians(lng[pos])
+        self._tree = (
+            _ball_tree(np.column_stack([self._lat_r, self._lng_r]))
+            if len(pos) >= _BALLTREE_MIN_ROWS
+            else None
+        )
+        self._subsets: dict[tuple[str, Any], SpatialIndex] = {}
+
+    def __len__(self) -> int:
+        return len(self._pos)
+
+    @property
+    def backend(self) -> str:
+        return "balltree" if self._tree is not None else "numpy"
+
+    def rebind(self, frame: pd.DataFrame) -> None:
+        """Point this index (and its subsets) at a reloaded copy of the same snapshot."""
+        self.frame = frame
+        for sub in self._subsets.values():
+            sub.rebind(frame)
+
+    def subset(self, column: str, value: Any) -> "SpatialIndex":
+        """Index over the rows where ``frame[column] == value`` (built once, cached)."""
+        key = (column, value)
+        sub = self._subsets.get(key)
+        if sub is None:
+            mask = self.frame[column].to_numpy()[self._pos] == value
+            sub = SpatialIndex(self.frame, self.version, positions=self._pos[mask])
+            self._subsets[key] = sub
+        return sub
+
+    def _candidates(self, lat_r: float, lng_r: float, k: int | None, radius_mi: float | None) -> np.ndarray:
+        """Local row numbers that can be in the answer (superset; exact filter follows)."""
+        if self._tree is None:
+            return np.arange(len(self._pos))
+        point = np.array([[lat_r, lng_r]])
+        if radius_mi is not None:
+            r = radius_mi / EARTH_RADIUS_MI * (1 + _RADIUS_SLACK)
+            return self._tree.query_radius(point, r=r)[0]
+        # Nearest-k: re-query out to the k-th distance so rows tied with
+        # the k-th are all candidates and the row-order tiebreak holds.
+        dist, _ = self._tree.query(point, k=min(k, len(self._pos)))
+        r = float(dist[0][-1]) * (1 + _RADIUS_SLACK) + 1e-15
+        return self._tree.query_radius(point, r=r)[0]
+
+    def query(
+        self,
+        lat: float,
+        lng: float,
+        *,
+        k: int | None = None,
+        radius_mi: float | None = None,
+        sort_by_distance: bool = True,
+    ) -> pd.DataFrame:
+        """Rows near (lat, lng) plus a ``distance_mi`` column.
+
+        ``radius_mi`` keeps rows at or within that distance; ``k`` keeps the
+        k nearest (after the radius filter). Rows come back nearest first,
+        ties in original row order — or purely in row order when
+        ``sort_by_distance`` is false. Only the returned rows are copied.
+        """
+        if k is None and radius_mi is None:
+            raise ValueError("query needs k and/or radius_mi")
+        if len(self._pos) == 0 or (k is not None and k <= 0):
+            return self.frame.iloc[[]].assign(distance_mi=pd.Series(dtype=float))
+
+        lat_r, lng_r = np.radians(float(lat)), np.radians(float(lng))
+        local = self._candidates(lat_r, lng_r, k, radius_mi)
+        dist = haversine_mi(lat_r, lng_r, self._lat_r[local], self._lng_r[local])
+        pos = self._pos[local]
+        if radius_mi is not None:
+            keep = dist <= radius_mi
+            pos, dist = pos[keep], dist[keep]
+        order = np.lexsort((pos, dist))
+        if k is not None:
+            order = order[:k]
+        if not sort_by_distance:
+            order = order[np.argsort(pos[order], kind="stable")]
+        return self.frame.iloc[pos[order]].assign(distance_mi=dist[order])
+
+
+__all__ = ["EARTH_RADIUS_MI", "SpatialIndex", "haversine_mi"]
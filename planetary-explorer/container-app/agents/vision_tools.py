@@ -25,6 +25,8 @@ from typing import Dict, Any, Optional, List, Set, Callable
 from datetime import datetime
 from calendar import monthrange
 
+from raster_env import gdal_env, raster_tool
+
 logger = logging.getLogger(__name__)
 
 
@@ -40,9 +42,7 @@ _session_context: Dict[str, Any] = {
     'tile_urls': [],
 }
 
-_vision_client = None
 _tool_calls: List[Dict[str, Any]] = []
-_AzureOpenAI = None
 
 
 def set_session_context(
@@ -86,40 +86,20 @@ def _log_tool_call(tool_name: str, args: Dict[str, Any], result_preview: str = "
 
 
 # ============================================================================
-# VISION CLIENT (lazy singleton)
+# VISION CLIENT (shared LLM gateway)
 # ============================================================================
 
-def _load_openai():
-    """Lazy load Azure OpenAI SDK."""
-    global _AzureOpenAI
-    if _AzureOpenAI is None:
-        try:
-            from openai import AzureOpenAI
-            _AzureOpenAI = AzureOpenAI
-        except ImportError as e:
-            logger.warning(f"Azure OpenAI SDK not available: {e}")
-
-
 def _get_vision_client():
-    """Get or create the Azure OpenAI client for vision and knowledge calls."""
-    global _vision_client
-    if _vision_client is None:
-        _load_openai()
-        if _AzureOpenAI is None:
-            return None
-        from azure.identity import DefaultAzureCredential, get_bearer_token_provider
-        from cloud_config import cloud_cfg
-        credential = DefaultAzureCredential()
-        token_provider = get_bearer_token_provider(
-            credential, cloud_cfg.cognitive_services_scope
-        )
-        _vision_client = _AzureOpenAI(
-            azure_ad_token_provider=token_provider,
+    """Shared gateway client for vision and knowledge calls (None when unavailable)."""
+    try:
+        from _framework.llm_client import get_llm_client
+        return get_llm_client(
+            os.getenv("AZURE_OPENAI_DEPLOYMENT_NAME", "gpt-5"),
             api_version=os.getenv("AZURE_OPENAI_API_VERSION", "2025-01-01-preview"),
-            azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
-            timeout=120.0
         )
-    return _vision_client
+    except Exception as e:
+        logger.warning(f"Azure OpenAI client not available: {e}")
+        return None
 
 
 # ============================================================================
@@ -136,25 +116,18 @@ def _sample_cog_sync(cog_url: str, latitude: float, longitude: float,
     try:
         import rasterio
         from rasterio.session import AWSSession
-        import planetary_computer as pc
+        import sas_signer
 
         # Sign the URL if from Planetary Computer
         if 'blob.core.windows.net' in cog_url:
             try:
-                signed_url = pc.sign(cog_url)
+                signed_url = sas_signer.sign(cog_url)
             except Exception:
                 signed_url = cog_url
         else:
             signed_url = cog_url
 
-        env_options = {
-            'GDAL_DISABLE_READDIR_ON_OPEN': 'EMPTY_DIR',
-            'CPL_VSIL_CURL_ALLOWED_EXTENSIONS': '.tif,.TIF,.tiff,.TIFF',
-            'GDAL_HTTP_TIMEOUT': '30',
-            'GDAL_HTTP_MAX_RETRY': '3',
-        }
-
-        with rasterio.Env(**env_options):
+        with gdal_env(CPL_VSIL_CURL_ALLOWED_EXTENSIONS='.tif,.TIF,.tiff,.TIFF'):
             with rasterio.open(signed_url) as src:
                 crs = str(src.crs)
 
@@ -233,81 +206,85 @@ def _parse_tile_url(tile_url: str) -> Dict[str, str]:
     }
 
 
-def _compute_ndvi_sync(red_url: str, nir_url: str, bbox: Optional[List[float]] = None) -> Dict[str, Any]:
-    """Compute NDVI statistics from RED and NIR band COG URLs (synchronous)."""
+def _read_ndvi_overview_sync(red_url: str, nir_url: str):
+    """Decimated (<=512 px) RED/NIR reads of whole scenes via GDAL overviews (worker thread)."""
+    import rasterio
+    import numpy as np
+
+    with gdal_env(CPL_VSIL_CURL_ALLOWED_EXTENSIONS='.tif,.TIF,.tiff,.TIFF'):
+        with rasterio.open(red_url) as red_src, rasterio.open(nir_url) as nir_src:
+            out_shape = (min(512, red_src.height), min(512, red_src.width))
+            red_data = red_src.read(1, out_shape=out_shape).astype(np.float32)
+            nir_data = nir_src.read(1, out_shape=out_shape).astype(np.float32)
+            return red_data, nir_data, red_src.nodata, nir_src.nodata
+
+
+async def _compute_ndvi(red_url: str, nir_url: str, bbox: Optional[List[float]] = None) -> Dict[str, Any]:
+    """Compute NDVI statistics from RED and NIR band COG URLs.
+
+    Windowed reads go through the async COG reader; whole-scene overviews
+    are a GDAL read in a worker thread. Either way the event loop is free.
+    """
     try:
-        import rasterio
-        from rasterio.windows import from_bounds
-        from rasterio.warp import transform_bounds
-        import planetary_computer as pc
+        import asyncio
         import numpy as np
+        import sas_signer
+        from cog_reader import read_bbox
 
         try:
-            signed_red = pc.sign(red_url) if 'blob.core.windows.net' in red_url else red_url
-            signed_nir = pc.sign(nir_url) if 'blob.core.windows.net' in nir_url else nir_url
+            signed_red, signed_nir = await asyncio.to_thread(sas_signer.sign, [red_url, nir_url])
         except Exception:
             signed_red, signed_nir = red_url, nir_url
 
-        env_options = {
-            'GDAL_DISABLE_READDIR_ON_OPEN': 'EMPTY_DIR',
-            'CPL_VSIL_CURL_ALLOWED_EXTENSIONS': '.tif,.TIF,.tiff,.TIFF',
-            'GDAL_HTTP_TIMEOUT': '30',
-            'GDAL_HTTP_MAX_RETRY': '3',
-        }
-
-        with rasterio.Env(**env_options):
-            with rasterio.open(signed_red) as red_src, rasterio.open(signed_nir) as nir_src:
-                if bbox:
-                    # Reproject bbox from EPSG:4326 to raster's native CRS if needed
-                    if red_src.crs and str(red_src.crs) != 'EPSG:4326':
-                        reprojected = transform_bounds('EPSG:4326', red_src.crs, *bbox)
-                    else:
-                        reprojected = bbox
-                    window = from_bounds(*reprojected, red_src.transform)
-                    red_data = red_src.read(1, window=window).astype(np.float32)
-                    nir_data = nir_src.read(1, window=window).astype(np.float32)
-                else:
-                    out_shape = (min(512, red_src.height), min(512, red_src.width))
-                    red_data = red_src.read(1, out_shape=out_shape).astype(np.float32)
-                    nir_data = nir_src.read(1, out_shape=out_shape).astype(np.float32)
-
-                red_nodata = red_src.nodata or 0
-                nir_nodata = nir_src.nodata or 0
-                valid_mask = (red_data != red_nodata) & (nir_data != nir_nodata)
-                valid_mask &= (red_data > 0) | (nir_data > 0)
-
-                if not np.any(valid_mask):
-                    return {'error': 'No valid pixels found'}
-
-                denominator = nir_data + red_data
-                denominator[denominator == 0] = np.nan
-                ndvi = (nir_data - red_data) / denominator
-                ndvi_valid = np.clip(ndvi[valid_mask], -1, 1)
-                ndvi_valid = ndvi_valid[~np.isnan(ndvi_valid)]
-
-                if len(ndvi_valid) == 0:
-                    return {'error': 'No valid NDVI values computed'}
-
-                dense_veg = np.sum(ndvi_valid > 0.6) / len(ndvi_valid) * 100
-                moderate_veg = np.sum((ndvi_valid > 0.2) & (ndvi_valid <= 0.6)) / len(ndvi_valid) * 100
-                sparse_veg = np.sum((ndvi_valid > 0) & (ndvi_valid <= 0.2)) / len(ndvi_valid) * 100
-                non_veg = np.sum(ndvi_valid <= 0) / len(ndvi_valid) * 100
+        if bbox:
+            red_win, nir_win = await asyncio.gather(read_bbox(signed_red, bbox), read_bbox(signed_nir, bbox))
+            if red_win is None or nir_win is None:
+                return {'error': 'No valid pixels found'}
+            red_data = red_win.data.astype(np.float32)
+            nir_data = nir_win.data.astype(np.float32)
+            red_nodata, nir_nodata = red_win.nodata, nir_win.nodata
+        else:
+            red_data, nir_data, red_nodata, nir_nodata = await asyncio.to_thread(
+                _read_ndvi_overview_sync, signed_red, signed_nir
+            )
 
-                return {
-                    'min': float(np.min(ndvi_valid)),
-                    'max': float(np.max(ndvi_valid)),
-                    'mean': float(np.mean(ndvi_valid)),
-                    'std': float(np.std(ndvi_valid)),
-                    'median': float(np.median(ndvi_valid)),
-                    'valid_pixels': int(len(ndvi_valid)),
-                    'total_pixels': int(red_data.size),
-                    'classification': {
-                        'dense_vegetation': round(dense_veg, 1),
-                        'moderate_vegetation': round(moderate_veg, 1),
-                        'sparse_vegetation': round(sparse_veg, 1),
-                        'non_vegetation': round(non_veg, 1)
-                    }
-                }
+        red_nodata = red_nodata or 0
+        nir_nodata = nir_nodata or 0
+        valid_mask = (red_data != red_nodata) & (nir_data != nir_nodata)
+        valid_mask &= (red_data > 0) | (nir_data > 0)
+
+        if not np.any(valid_mask):
+            return {'error': 'No valid pixels found'}
+
+        denominator = nir_data + red_data
+        denominator[denominator == 0] = np.nan
+        ndvi = (nir_data - red_data) / denominator
+        ndvi_valid = np.clip(ndvi[valid_mask], -1, 1)
+        ndvi_valid = ndvi_valid[~np.isnan(ndvi_valid)]
+
+        if len(ndvi_valid) == 0:
+            return {'error': 'No valid NDVI values computed'}
+
+        dense_veg = np.sum(ndvi_valid > 0.6) / len(ndvi_valid) * 100
+        moderate_veg = np.sum((ndvi_valid > 0.2) & (ndvi_valid <= 0.6)) / len(ndvi_valid) * 100
+        sparse_veg = np.sum((ndvi_valid > 0) & (ndvi_valid <= 0.2)) / len(ndvi_valid) * 100
+        non_veg = np.sum(ndvi_valid <= 0) / len(ndvi_valid) * 100
+
+        return {
+            'min': float(np.min(ndvi_valid)),
+            'max': float(np.max(ndvi_valid)),
+            'mean': float(np.mean(ndvi_valid)),
+            'std': float(np.std(ndvi_valid)),
+            'median': float(np.median(ndvi_valid)),
+            'valid_pixels': int(len(ndvi_valid)),
+            'total_pixels': int(red_data.size),
+            'classification': {
+                'dense_vegetation': round(dense_veg, 1),
+                'moderate_vegetation': round(moderate_veg, 1),
+                'sparse_vegetation': round(sparse_veg, 1),
+                'non_vegetation': round(non_veg, 1)
+            }
+        }
 
     except ImportError as e:
         return {'error': f'rasterio not available: {e}'}
@@ -365,8 +342,9 @@ Guidelines:
 - If you can't see something clearly, say so"""
 
         deployment = os.getenv("AZURE_OPENAI_DEPLOYMENT_NAME", "gpt-5")
-        response = client.chat.completions.create(
+        response = client.create_sync(
             model=deployment,
+            timeout=120.0,
             messages=[
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": [
@@ -391,7 +369,8 @@ Guidelines:
 # TOOL 2: ANALYZE RASTER
 # ============================================================================
 
-def analyze_raster(metric_type: str = "general") -> str:
+@raster_tool
+async def analyze_raster(metric_type: str = "general") -> str:
     """Get quantitative metrics from loaded raster data like elevation, slope, NDVI,
     or sea surface temperature (SST). Use for numerical questions about terrain
     statistics, temperature values, measurements, and calculations.
@@ -473,7 +452,7 @@ def analyze_raster(metric_type: str = "general") -> str:
 
                 if red_url and nir_url:
                     logger.info(f"[CHART] Computing NDVI from {item.get('collection')}...")
-                    ndvi_stats = _compute_ndvi_sync(red_url, nir_url)
+                    ndvi_stats = await _compute_ndvi(red_url, nir_url)
 
                     if 'error' in ndvi_stats:
                         results.append(f"\n**NDVI Analysis:** Error: {ndvi_stats['error']}")
@@ -915,6 +894,7 @@ def analyze_biomass(analysis_type: str = "general") -> str:
 # TOOL 10: SAMPLE RASTER VALUE (most complex tool)
 # ============================================================================
 
+@raster_tool
 def sample_raster_value(data_type: str = "auto") -> str:
     """Extract the actual pixel/raster value from loaded satellite data at a specific
     location. Returns the numeric value (e.g., SST in Celsius, elevation in meters,
@@ -1342,7 +1322,7 @@ def sample_raster_value(data_type: str = "auto") -> str:
             if collection_id:
                 try:
                     import httpx
-                    import planetary_computer as pc
+                    import sas_signer
                     buf = 0.5
                     pin_bbox = [lng - buf, lat - buf, lng + buf, lat + buf]
                     is_optical_coll = any(kw in collection_id.lower() for kw in ['sentinel-2', 'landsat', 'hls', 's30', 'l30'])
@@ -1360,7 +1340,7 @@ def sample_raster_value(data_type: str = "auto") -> str:
                             for feature in resp.json().get("features", []):
                                 if point_in_bbox(lat, lng, feature.get('bbox')):
                                     try:
-                                        signed = pc.sign(feature)
+                                        signed = sas_signer.sign(feature)
                                     except Exception:
                                         signed = feature
                                     assets = signed.get('assets', {})
@@ -1475,17 +1455,12 @@ def sample_raster_value(data_type: str = "auto") -> str:
                 nc_href = assets.get(asset_key, {}).get('href', '') if isinstance(assets.get(asset_key), dict) else ''
                 if nc_href:
                     try:
-                        import planetary_computer as pc
-                        signed_url = pc.sign(nc_href) if 'blob.core.windows.net' in nc_href else nc_href
+                        import sas_signer
+                        signed_url = sas_signer.sign(nc_href) if 'blob.core.windows.net' in nc_href else nc_href
                         # Use rasterio's NETCDF driver — read the last band (most recent day)
                         import rasterio
                         netcdf_path = f"NETCDF:{signed_url}:{asset_key}"
-                        env_options = {
-                            'GDAL_DISABLE_READDIR_ON_OPEN': 'EMPTY_DIR',
-                            'GDAL_HTTP_TIMEOUT': '60',
-                            'GDAL_HTTP_MAX_RETRY': '3',
-                        }
-                        with rasterio.Env(**env_options):
+                        with gdal_env(GDAL_HTTP_TIMEOUT='60'):
                             with rasterio.open(netcdf_path) as src:
                                 # NEX-GDDP lon is 0-360; convert if needed
                                 sample_lng = lng if lng >= 0 else lng + 360
@@ -1618,7 +1593,7 @@ def sample_raster_value(data_type: str = "auto") -> str:
             if collection_id and (is_ndvi_sampling or is_optical_coll):
                 try:
                     import httpx
-                    import planetary_computer as pc
+                    import sas_signer
                     buf = 0.05  # ~5km buffer around pin
                     pin_bbox = [lng - buf, lat - buf, lng + buf, lat + buf]
                     already_tried = {item.get('id', '') for item in stac_items}
@@ -1656,7 +1631,7 @@ def sample_raster_value(data_type: str = "auto") -> str:
                                     continue
 
                                 try:
-                                    signed = pc.sign(feature)
+                                    signed = sas_signer.sign(feature)
                                 except Exception:
                                     signed = feature
 
@@ -1819,8 +1794,9 @@ Context:
 Guidelines: Provide accurate, educational answers. Include relevant facts. Be concise but informative."""
 
         deployment = os.getenv("AZURE_OPENAI_DEPLOYMENT_NAME", "gpt-5")
-        response = client.chat.completions.create(
+        response = client.create_sync(
             model=deployment,
+            timeout=120.0,
             messages=[
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": question}
@@ -1872,8 +1848,9 @@ def identify_features(feature_type: str) -> str:
 For each feature: name, type, notable characteristics. Be specific."""
 
         deployment = os.getenv("AZURE_OPENAI_DEPLOYMENT_NAME", "gpt-5")
-        response = client.chat.completions.create(
+        response = client.create_sync(
             model=deployment,
+            timeout=120.0,
             messages=[{"role": "user", "content": [
                 {"type": "text", "text": prompt},
                 {"type": "image_url", "image_url": {"url": f"data:image/png;base64,{image_data}", "detail": "high"}}
@@ -2058,6 +2035,7 @@ def _summarize_stac_results(features: List[Dict], time_period: str) -> str:
     return "\n".join(lines)
 
 
+@raster_tool
 def compare_temporal(location: str, time_period_1: str, time_period_2: str,
                      analysis_focus: str = "surface reflectance") -> str:
     """Compare satellite imagery between two different time periods to detect changes.
@@ -2133,8 +2111,9 @@ def compare_temporal(location: str, time_period_1: str, time_period_2: str,
             summary_2 = _summarize_stac_results(features_2, time_period_2)
             deployment = os.getenv("AZURE_OPENAI_DEPLOYMENT_NAME", "gpt-5")
             try:
-                resp = client.chat.completions.create(
+                resp = client.create_sync(
                     model=deployment,
+                    timeout=120.0,
                     messages=[
                         {"role": "system", "content": f"""Geospatial analyst comparing imagery.
 Location: {location}, Collection: {collection}, Focus: {analysis_focus}
@@ -0,0 +1,688 @@
+"""Async Cloud-Optimized GeoTIFF window reader.
+
+The raster tools used to call ``rasterio.open(href).read(window=...)``
+straight from agent tool functions, and ``AsyncFunctionTool`` runs a
+plain function on the event loop -- so one slow blob read stalled every
+other request on the worker. GDAL also fetches the blocks of a window one
+after another over ``/vsicurl/``.
+
+This reader does the I/O on the loop and only the CPU work off it:
+
+* **Header** -- the first ``COG_HEADER_BYTES`` (default 64 KiB) are
+  fetched with one range request and the full-resolution IFD is parsed
+  (classic TIFF and BigTIFF, either byte order). A COG keeps its IFD and
+  tile index at the front, so this is nearly always the only request;
+  tag data past the prefix is range-fetched on demand. Parsed headers are
+  cached per href (SAS query string ignored).
+* **Blocks** -- the tiles (or strips) under the window are sorted by file
+  offset and adjacent ones merged when the gap is under
+  ``COG_RANGE_MERGE_GAP`` bytes; the ranges are fetched concurrently on
+  the shared ``blob`` pool in :mod:`http_pool`.
+* **Decode** -- decompression + predictor undo run in a bounded thread
+  pool (``COG_DECODE_WORKERS``, default 4); zlib and NumPy release the
+  GIL, so the loop keeps serving while tiles decode.
+
+Supported: uncompressed and DEFLATE blocks, predictors 1/2/3, 8-64 bit
+integer and float samples, chunky or planar interleave, north-up
+geotransforms (tiepoint + scale or a non-rotated ModelTransformation) and
+EPSG-coded CRSs. Anything else (LZW, JPEG, ZSTD, rotated or user-defined
+CRSs) raises :class:`CogUnsupported`; :func:`read_bbox` then falls back
+to ``rasterio`` in a worker thread, so callers never lose a read.
+
+Windows are integer pixel windows: the bbox is snapped outward
+(floor/ceil) to whole pixels and clipped to the image, matching
+:mod:`geoint.dem_tiles`.
+
+Config:
+  COG_HEADER_BYTES        initial header fetch (default 65536)
+  COG_RANGE_MERGE_GAP     max gap between merged block ranges (default 65536)
+  COG_RANGE_CONCURRENCY   concurrent range requests per read (default 16)
+  COG_DECODE_WORKERS      decode threads (default 4)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import os
+import struct
+import threading
+import zlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+import raster_env
+
+logger = logging.getLogger(__name__)
+
+PixelWindow = Tuple[int, int, int, int]  # row0, col0, row1, col1 (exclusive)
+FetchRange = Callable[[str, int, int], Awaitable[bytes]]  # (href, start, end_exclusive)
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+class CogUnsupported(Exception):
+    """The file uses an encoding or georeferencing this reader does not handle."""
+
+
+# ---------------------------------------------------------------------------
+# TIFF constants
+# ---------------------------------------------------------------------------
+
+# field type -> (struct code, size)
+_TYPES: Dict[int, Tuple[str, int]] = {
+    1: ("B", 1), 2: ("c", 1), 3: ("H", 2), 4: ("I", 4), 5: ("II", 8),
+    6: ("b", 1), 7: ("B", 1), 8: ("h", 2), 9: ("i", 4), 10: ("ii", 8),
+    11: ("f", 4), 12: ("d", 8), 16: ("Q", 8), 17: ("q", 8), 18: ("Q", 8),
+}
+
+_IMAGE_WIDTH = 256
+_IMAGE_LENGTH = 257
+_BITS_PER_SAMPLE = 258
+_COMPRESSION = 259
+_STRIP_OFFSETS = 273
+_SAMPLES_PER_PIXEL = 277
+_ROWS_PER_STRIP = 278
+_STRIP_BYTE_COUNTS = 279
+_PLANAR_CONFIG = 284
+_PREDICTOR = 317
+_TILE_WIDTH = 322
+_TILE_LENGTH = 323
+_TILE_OFFSETS = 324
+_TILE_BYTE_COUNTS = 325
+_SAMPLE_FORMAT = 339
+_MODEL_PIXEL_SCALE = 33550
+_MODEL_TIEPOINT = 33922
+_MODEL_TRANSFORMATION = 34264
+_GEO_KEY_DIRECTORY = 34735
+_GDAL_NODATA = 42113
+
+_COMPRESSION_NONE = 1
+_COMPRESSION_DEFLATE = {8, 32946}
+
+_GT_MODEL_TYPE = 1024
+_GT_RASTER_TYPE = 1025
+_GEOGRAPHIC_TYPE = 2048
+_PROJECTED_CS_TYPE = 3072
+_RASTER_PIXEL_IS_POINT = 2
+
+_DTYPES = {
+    (1, 8): "u1", (1, 16): "u2", (1, 32): "u4", (1, 64): "u8",
+    (2, 8): "i1", (2, 16): "i2", (2, 32): "i4", (2, 64): "i8",
+    (3, 32): "f4", (3, 64): "f8",
+}
+
+
+# ---------------------------------------------------------------------------
+# Header
+# ---------------------------------------------------------------------------
+
+
+@dataclass(frozen=True)
+class CogHeader:
+    """Full-resolution image layout + georeferencing of one COG."""
+
+    width: int
+    height: int
+    bands: int
+    dtype: np.dtype  # file byte order
+    block_width: int
+    block_height: int
+    tiled: bool
+    planar: bool
+    compression: int
+    predictor: int
+    offsets: np.ndarray
+    byte_counts: np.ndarray
+    transform: Tuple[float, float, float, float, float, float]  # a, b, c, d, e, f
+    epsg: Optional[int]
+    nodata: Optional[float]
+
+    @property
+    def blocks_across(self) -> int:
+        return math.ceil(self.width / self.block_width)
+
+    @property
+    def blocks_down(self) -> int:
+        return math.ceil(self.height / self.block_height)
+
+    def window_for_bounds(self, bounds: Sequence[float]) -> Optional[PixelWindow]:
+        """Pixel window covering ``[west, south, east, north]`` (CRS units), or None."""
+        a, _, c, _, e, f = self.transform
+        west, south, east, north = (float(v) for v in bounds)
+        col0 = math.floor((west - c) / a + 1e-9)
+        col1 = math.ceil((east - c) / a - 1e-9)
+        row0 = math.floor((north - f) / e + 1e-9)
+        row1 = math.ceil((south - f) / e - 1e-9)
+        row0, col0 = max(0, row0), max(0, col0)
+        row1, col1 = min(self.height, row1), min(self.width, col1)
+        if row1 <= row0 or col1 <= col0:
+            return None
+        return row0, col0, row1, col1
+
+
+    def window_transform(self, window: PixelWindow) -> Tuple[float, float, float, float, float, float]:
+        """Geotransform of the top-left pixel of ``window``."""
+        a, b, c, d, e, f = self.transform
+        row0, col0 = window[0], window[1]
+        return a, b, c + col0 * a, d, e, f + row0 * e
+
+
+@dataclass(frozen=True)
+class RasterWindow:
+    """One band under a bbox: pixels, the file's nodata and the window geotransform."""
+
+    data: np.ndarray
+    nodata: Optional[float]
+    transform: Tuple[float, float, float, float, float, float]
+
+    @property
+    def res(self) -> Tuple[float, float]:
+        return abs(self.transform[0]), abs(self.transform[4])
+
+
+class _Source:
+    """Header bytes from offset 0, with on-demand range fetches past the prefix."""
+
+    def __init__(self, href: str, prefix: bytes, fetch: FetchRange) -> None:
+        self.href = href
+        self.prefix = prefix
+        self._fetch = fetch
+
+    async def read(self, offset: int, size: int) -> bytes:
+        if offset + size <= len(self.prefix):
+            return self.prefix[offset:offset + size]
+        data = await self._fetch(self.href, offset, offset + size)
+        if len(data) < size:
+            raise CogUnsupported(f"short read at {offset} ({len(data)}/{size} bytes)")
+        return data[:size]
+
+
+async def _parse_header(source: _Source) -> CogHeader:
+    head = await source.read(0, 16)
+    if head[:2] == b"II":
+        bo = "<"
+    elif head[:2] == b"MM":
+        bo = ">"
+    else:
+        raise CogUnsupported("not a TIFF file")
+    (version,) = struct.unpack(bo + "H", head[2:4])
+    if version == 42:
+        big = False
+        (ifd_offset,) = struct.unpack(bo + "I", head[4:8])
+        count_fmt, entry_size, inline = "H", 12, 4
+    elif version == 43:
+        big = True
+        (ifd_offset,) = struct.unpack(bo + "Q", head[8:16])
+        count_fmt, entry_size, inline = "Q", 20, 8
+    else:
+        raise CogUnsupported(f"unknown TIFF version {version}")
+
+    count_size = struct.calcsize(count_fmt)
+    (n_entries,) = struct.unpack(bo + count_fmt, await source.read(ifd_offset, count_size))
+    raw = await source.read(ifd_offset + count_size, n_entries * entry_size)
+
+    tags: Dict[int, Any] = {}
+    for i in range(n_entries):
+        entry = raw[i * entry_size:(i + 1) * entry_size]
+        if big:
+            tag, ftype, count = struct.unpack(bo + "HHQ", entry[:12])
+            value_field = entry[12:20]
+        else:
+            tag, ftype, count = struct.unpack(bo + "HHI", entry[:8])
+            value_field = entry[8:12]
+        if ftype not in _TYPES:
+            continue
+        code, size = _TYPES[ftype]
+        nbytes = size * count
+        if nbytes <= inline:
+            data = value_field[:nbytes]
+        else:
+            (offset,) = struct.unpack(bo + ("Q" if big else "I"), value_field)
+            data = await source.read(offset, nbytes)
+        tags[tag] = _decode_value(data, ftype, count, bo)
+
+    return _header_from_tags(tags, bo)
+
+
+def _decode_value(data: bytes, ftype: int, count: int, bo: str) -> Any:
+    if ftype == 2:
+        return data.split(b"\0", 1)[0].decode("ascii", "replace")
+    if ftype in (5, 10):
+        pairs = np.frombuffer(data, dtype=bo + ("u4" if ftype == 5 else "i4")).reshape(-1, 2)
+        return (pairs[:, 0] / np.where(pairs[:, 1] == 0, 1, pairs[:, 1])).tolist()
+    code, size = _TYPES[ftype]
+    kind = {"B": "u1", "b": "i1", "H": "u2", "h": "i2", "I": "u4", "i": "i4",
+            "Q": "u8", "q": "i8", "f": "f4", "d": "f8"}[code]
+    return np.frombuffer(data, dtype=bo + kind, count=count)
+
+
+def _scalar(tags: Dict[int, Any], tag: int, default: Optional[int] = None) -> Optional[int]:
+    value = tags.get(tag)
+    if value is None:
+        return default
+    return int(value[0])
+
+
+def _header_from_tags(tags: Dict[int, Any], bo: str) -> CogHeader:
+    width = _scalar(tags, _IMAGE_WIDTH)
+    height = _scalar(tags, _IMAGE_LENGTH)
+    if not width or not height:
+        raise CogUnsupported("missing image dimensions")
+    bands = _scalar(tags, _SAMPLES_PER_PIXEL, 1)
+
+    bits = {int(b) for b in tags.get(_BITS_PER_SAMPLE, [1])}
+    formats = {int(f) for f in tags.get(_SAMPLE_FORMAT, [1])}
+    if len(bits) != 1 or len(formats) != 1:
+        raise CogUnsupported("mixed sample types")
+    kind = _DTYPES.get((formats.pop(), bits.pop()))
+    if kind is None:
+        raise CogUnsupported("unsupported sample type")
+
+    compression = _scalar(tags, _COMPRESSION, 1)
+    if compression != _COMPRESSION_NONE and compression not in _COMPRESSION_DEFLATE:
+        raise CogUnsupported(f"compression {compression}")
+    predictor = _scalar(tags, _PREDICTOR, 1)
+    if predictor not in (1, 2, 3):
+        raise CogUnsupported(f"predictor {predictor}")
+
+    if _TILE_OFFSETS in tags:
+        block_w, block_h = _scalar(tags, _TILE_WIDTH), _scalar(tags, _TILE_LENGTH)
+        offsets, counts = tags[_TILE_OFFSETS], tags.get(_TILE_BYTE_COUNTS)
+    elif _STRIP_OFFSETS in tags:
+        block_w, block_h = width, min(_scalar(tags, _ROWS_PER_STRIP, height), height)
+        offsets, counts = tags[_STRIP_OFFSETS], tags.get(_STRIP_BYTE_COUNTS)
+    else:
+        raise CogUnsupported("no tile or strip offsets")
+    if counts is None or len(counts) != len(offsets):
+        raise CogUnsupported("missing block byte counts")
+
+    transform = _geotransform(tags)
+    epsg, pixel_is_point = _geokeys(tags)
+    if pixel_is_point:
+        # GDAL's convention: a PixelIsPoint tiepoint is the pixel centre.
+        a, b, c, d, e, f = transform
+        transform = (a, b, c - a / 2, d, e, f - e / 2)
+
+    nodata = None
+    if _GDAL_NODATA in tags:
+        try:
+            nodata = float(str(tags[_GDAL_NODATA]).strip())
+        except ValueError:
+            nodata = None
+
+    return CogHeader(
+        width=width,
+        height=height,
+        bands=bands,
+        dtype=np.dtype(bo + kind),
+        block_width=block_w,
+        block_height=block_h,
+        tiled=_TILE_OFFSETS in tags,
+        planar=_scalar(tags, _PLANAR_CONFIG, 1) == 2,
+        compression=compression,
+        predictor=predictor,
+        offsets=np.asarray(offsets, dtype=np.int64),
+        byte_counts=np.asarray(counts, dtype=np.int64),
+        transform=transform,
+        epsg=epsg,
+        nodata=nodata,
+    )
+
+
+def _geotransform(tags: Dict[int, Any]) -> Tuple[float, float, float, float, float, float]:
+    if _MODEL_TRANSFORMATION in tags:
+        m = [float(v) for v in tags[_MODEL_TRANSFORMATION]]
+        if m[1] or m[4]:
+            raise CogUnsupported("rotated geotransform")
+        return m[0], 0.0, m[3], 0.0, m[5], m[7]
+    if _MODEL_PIXEL_SCALE in tags and _MODEL_TIEPOINT in tags:
+        sx, sy = (float(v) for v in tags[_MODEL_PIXEL_SCALE][:2])
+        i, j, _, x, y, _ = (float(v) for v in tags[_MODEL_TIEPOINT][:6])
+        return sx, 0.0, x - i * sx, 0.0, -sy, y + j * sy
+    raise CogUnsupported("no geotransform")
+
+
+def _geokeys(tags: Dict[int, Any]) -> Tuple[Optional[int], bool]:
+    keys = tags.get(_GEO_KEY_DIRECTORY)
+    if keys is None or len(keys) < 4:
+        return None, False
+    values: Dict[int, int] = {}
+    for n in range(int(keys[3])):
+        key_id, location, _, value = (int(v) for v in keys[4 + 4 * n:8 + 4 * n])
+        if location == 0:
+            values[key_id] = value
+    model = values.get(_GT_MODEL_TYPE)
+    epsg = values.get(_PROJECTED_CS_TYPE) if model == 1 else values.get(_GEOGRAPHIC_TYPE)
+    if epsg == 32767:  # user-defined
+        epsg = None
+    return epsg, values.get(_GT_RASTER_TYPE) == _RASTER_PIXEL_IS_POINT
+
+
+# ---------------------------------------------------------------------------
+# Block decode (runs in the decode pool)
+# ---------------------------------------------------------------------------
+
+
+def _decode_block(header: CogHeader, raw: bytes, rows: int) -> np.ndarray:
+    """Decode one tile/strip to ``(rows, block_width, samples)`` in native byte order."""
+    if header.compression in _COMPRESSION_DEFLATE:
+        raw = zlib.decompress(raw)
+    samples = 1 if header.planar else header.bands
+    width = header.block_width
+    itemsize = header.dtype.itemsize
+    need = rows * width * samples * itemsize
+    if len(raw) < need:
+        raise CogUnsupported(f"block too short ({len(raw)}/{need} bytes)")
+
+    if header.predictor == 3:
+        # Floating-point predictor: each row is byte-differenced after being
+        # split into byte planes, most significant byte first regardless of
+        # the file byte order.
+        row_bytes = np.frombuffer(raw, dtype=np.uint8, count=need).reshape(rows, need // rows)
+        planes = np.cumsum(row_bytes, axis=1, dtype=np.uint8).reshape(rows, itemsize, width * samples)
+        # reversing the planes while interleaving yields little-endian values
+        swapped = np.ascontiguousarray(planes[:, ::-1, :].transpose(0, 2, 1))
+        arr = swapped.view(np.dtype("<" + header.dtype.kind + str(itemsize))).reshape(rows, width, samples)
+        return arr.astype(header.dtype.newbyteorder("="), copy=False)
+    arr = np.frombuffer(raw, dtype=header.dtype, count=rows * width * samples).reshape(rows, width, samples)
+    arr = arr.astype(header.dtype.newbyteorder("="))
+    if header.predictor == 2:
+        arr = np.cumsum(arr, axis=1, dtype=arr.dtype)
+    return arr
+
+
+# ---------------------------------------------------------------------------
+# Reader
+# ---------------------------------------------------------------------------
+
+
+async def _http_fetch_range(href: str, start: int, end: int) -> bytes:
+    import http_pool
+
+    session = http_pool.get_session(http_pool.POOL_BLOB)
+    async with session.get(href, headers={"Range": f"bytes={start}-{end - 1}"}) as resp:
+        resp.raise_for_status()
+        body = await resp.read()
+    if resp.status == 200:  # server ignored the Range header
+        return body[start:end]
+    return body
+
+
+def _cache_key(href: str) -> str:
+    return href.split("?", 1)[0]
+
+
+class CogReader:
+    """Async COG window reads with a header cache and a bounded decode pool."""
+
+    def __init__(
+        self,
+        *,
+        fetch_range: FetchRange = _http_fetch_range,
+        header_bytes: int = 65536,
+        merge_gap: int = 65536,
+        max_concurrency: int = 16,
+        decode_workers: int = 4,
+        header_cache_size: int = 256,
+    ) -> None:
+        self._fetch = fetch_range
+        self.header_bytes = max(16, int(header_bytes))
+        self.merge_gap = max(0, int(merge_gap))
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.header_cache_size = max(1, int(header_cache_size))
+        self._pool = ThreadPoolExecutor(max_workers=max(1, int(decode_workers)), thread_name_prefix="cog-decode")
+        self._headers: "OrderedDict[str, CogHeader]" = OrderedDict()
+        self._pending: Dict[str, "asyncio.Future[CogHeader]"] = {}
+        self._lock = threading.Lock()
+        self.header_hits = 0
+        self.header_fetches = 0
+        self.range_requests = 0
+        self.bytes_fetched = 0
+        self.blocks_decoded = 0
+
+    async def _fetch_counted(self, href: str, start: int, end: int) -> bytes:
+        data = await self._fetch(href, start, end)
+        self.range_requests += 1
+        self.bytes_fetched += len(data)
+        raster_env.record_fetch(len(data))
+        return data
+
+    async def header(self, href: str) -> CogHeader:
+        """Parsed full-resolution IFD for ``href`` (cached)."""
+        key = _cache_key(href)
+        with self._lock:
+            cached = self._headers.get(key)
+            if cached is not None:
+                self._headers.move_to_end(key)
+                self.header_hits += 1
+                return cached
+            pending = self._pending.get(key)
+            if pending is None or pending.get_loop() is not asyncio.get_running_loop():
+                # single flight: concurrent first reads of one file share a fetch
+                pending = asyncio.ensure_future(self._load_header(href, key))
+                self._pending[key] = pending
+        try:
+            return await asyncio.shield(pending)
+        finally:
+            if pending.done():
+                with self._lock:
+                    if self._pending.get(key) is pending:
+                        del self._pending[key]
+
+    async def _load_header(self, href: str, key: str) -> CogHeader:
+        prefix = await self._fetch_counted(href, 0, self.header_bytes)
+        header = await _parse_header(_Source(href, prefix, self._fetch_counted))
+        self.header_fetches += 1
+        with self._lock:
+            self._headers[key] = header
+            while len(self._headers) > self.header_cache_size:
+                self._headers.popitem(last=False)
+        return header
+
+    def _plan(self, header: CogHeader, window: PixelWindow, band: int) -> List[Tuple[int, int, int]]:
+        """``(block_index, block_row, block_col)`` for every block under ``window``."""
+        row0, col0, row1, col1 = window
+        per_band = header.blocks_across * header.blocks_down
+        base = (band - 1) * per_band if header.planar else 0
+        out = []
+        for br in range(row0 // header.block_height, (row1 - 1) // header.block_height + 1):
+            for bc in range(col0 // header.block_width, (col1 - 1) // header.block_width + 1):
+                out.append((base + br * header.blocks_across + bc, br, bc))
+        return out
+
+    def _ranges(self, header: CogHeader, indexes: Sequence[int]) -> List[Tuple[int, int, List[int]]]:
+        """Merge block byte ranges into ``(start, end, [block_index, ...])`` requests."""
+        spans = sorted(
+            (int(header.offsets[i]), int(header.offsets[i] + header.byte_counts[i]), i)
+            for i in indexes
+            if header.byte_counts[i] > 0
+        )
+        merged: List[Tuple[int, int, List[int]]] = []
+        for start, end, idx in spans:
+            if merged and start - merged[-1][1] <= self.merge_gap:
+                s, e, members = merged[-1]
+                merged[-1] = (s, max(e, end), members + [idx])
+            else:
+                merged.append((start, end, [idx]))
+        return merged
+
+    async def read_window(self, href: str, window: PixelWindow, *, band: int = 1) -> np.ndarray:
+        """Read ``band`` (1-based) for an integer pixel window, native byte order."""
+        header = await self.header(href)
+        if not 1 <= band <= header.bands:
+            raise ValueError(f"band {band} out of range (1..{header.bands})")
+        row0, col0, row1, col1 = window
+        fill = header.nodata if _representable(header.nodata, header.dtype) else 0
+        out = np.full((row1 - row0, col1 - col0), fill, dtype=header.dtype.newbyteorder("="))
+
+        plan = self._plan(header, window, band)
+        positions = {idx: (br, bc) for idx, br, bc in plan}
+        requests = self._ranges(header, [idx for idx, _, _ in plan])
+        sem = asyncio.Semaphore(self.max_concurrency)
+        loop = asyncio.get_running_loop()
+        sample = 0 if header.planar else band - 1
+
+        async def fetch_and_place(start: int, end: int, members: List[int]) -> None:
+            async with sem:
+                data = memoryview(await self._fetch_counted(href, start, end))
+            for idx in members:
+                br, bc = positions[idx]
+                off = int(header.offsets[idx]) - start
+                raw = data[off:off + int(header.byte_counts[idx])]
+                # tiles are always padded to full size; the last strip is not
+                rows = header.block_height if header.tiled else min(
+                    header.block_height, header.height - br * header.block_height
+                )
+                block = await loop.run_in_executor(self._pool, _decode_block, header, raw, rows)
+                self.blocks_decoded += 1
+                _place(out, block[:, :, sample], window, br * header.block_height, bc * header.block_width)
+
+        await asyncio.gather(*(fetch_and_place(s, e, m) for s, e, m in requests))
+        return out
+
+    async def read_bounds(
+        self,
+        href: str,
+        bounds: Sequence[float],
+        *,
+        band: int = 1,
+        bounds_crs: str = "EPSG:4326",
+    ) -> Tuple[Optional[np.ndarray], CogHeader, Optional[PixelWindow]]:
+        """Read the window covering ``bounds``; array is None when it misses the image."""
+        header = await self.header(href)
+        native = _to_native_bounds(bounds, bounds_crs, header.epsg)
+        window = header.window_for_bounds(native)
+        if window is None:
+            return None, header, None
+        return await self.read_window(href, window, band=band), header, window
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            headers = len(self._headers)
+        return {
+            "headers": headers,
+            "header_hits": self.header_hits,
+            "header_fetches": self.header_fetches,
+            "range_requests": self.range_requests,
+            "bytes_fetched": self.bytes_fetched,
+            "blocks_decoded": self.blocks_decoded,
+        }
+
+
+def _representable(value: Optional[float], dtype: np.dtype) -> bool:
+    if value is None:
+        return False
+    if dtype.kind == "f":
+        return True
+    if not math.isfinite(value) or not float(value).is_integer():
+        return False
+    info = np.iinfo(dtype)
+    return info.min <= value <= info.max
+
+
+def _place(out: np.ndarray, block: np.ndarray, window: PixelWindow, block_row0: int, block_col0: int) -> None:
+    row0, col0, row1, col1 = window
+    r0, r1 = max(row0, block_row0), min(row1, block_row0 + block.shape[0])
+    c0, c1 = max(col0, block_col0), min(col1, block_col0 + block.shape[1])
+    if r1 <= r0 or c1 <= c0:
+        return
+    out[r0 - row0:r1 - row0, c0 - col0:c1 - col0] = block[r0 - block_row0:r1 - block_row0, c0 - block_col0:c1 - block_col0]
+
+
+def _to_native_bounds(bounds: Sequence[float], bounds_crs: str, epsg: Optional[int]) -> Sequence[float]:
+    if epsg is None:
+        raise CogUnsupported("CRS without an EPSG code")
+    if bounds_crs.upper() == f"EPSG:{epsg}":
+        return bounds
+    # Pure coordinate math (PROJ), no I/O -- fine to run on the loop.
+    from rasterio.warp import transform_bounds
+
+    return transform_bounds(bounds_crs, f"EPSG:{epsg}", *bounds)
+
+
+# ---------------------------------------------------------------------------
+# rasterio fallback + module API
+# ---------------------------------------------------------------------------
+
+
+def _read_bbox_rasterio(href: str, bbox: Sequence[float], band: int, bbox_crs: str) -> Optional[RasterWindow]:
+    """Blocking GDAL read with the same integer-window convention (worker thread)."""
+    import rasterio
+    from rasterio.warp import transform_bounds
+    from rasterio.windows import Window
+
+    with rasterio.open(href) as src:
+        native = transform_bounds(bbox_crs, src.crs, *bbox) if src.crs else bbox
+        t = src.transform
+        grid = CogHeader(
+            width=src.width, height=src.height, bands=src.count, dtype=np.dtype(src.dtypes[band - 1]),
+            block_width=1, block_height=1, tiled=True, planar=False, compression=0, predictor=1,
+            offsets=np.empty(0, np.int64), byte_counts=np.empty(0, np.int64),
+            transform=(t.a, t.b, t.c, t.d, t.e, t.f), epsg=None, nodata=src.nodata,
+        )
+        window = grid.window_for_bounds(native)
+        if window is None:
+            return None
+        row0, col0, row1, col1 = window
+        data = src.read(band, window=Window(col0, row0, col1 - col0, row1 - row0))
+        return RasterWindow(data, src.nodata, grid.window_transform(window))
+
+
+_reader: Optional[CogReader] = None
+
+
+def get_cog_reader() -> CogReader:
+    """Return the process-wide :class:`CogReader` (lazy)."""
+    global _reader
+    if _reader is None:
+        _reader = CogReader(
+            header_bytes=_env_int("COG_HEADER_BYTES", 65536),
+            merge_gap=_env_int("COG_RANGE_MERGE_GAP", 65536),
+            max_concurrency=_env_int("COG_RANGE_CONCURRENCY", 16),
+            decode_workers=_env_int("COG_DECODE_WORKERS", 4),
+        )
+    return _reader
+
+
+async def read_bbox(
+    href: str,
+    bbox: Sequence[float],
+    *,
+    band: int = 1,
+    bbox_crs: str = "EPSG:4326",
+) -> Optional[RasterWindow]:
+    """Read ``band`` under ``bbox`` from a (signed) COG href.
+
+    Returns None when the bbox misses the image. Unsupported encodings fall
+    back to rasterio in a worker thread.
+    """
+    reader = get_cog_reader()
+    try:
+        data, header, window = await reader.read_bounds(href, bbox, band=band, bounds_crs=bbox_crs)
+    except CogUnsupported as exc:
+        logger.info(f"[COG] {_cache_key(href)}: {exc}; reading with rasterio")
+        return await asyncio.to_thread(_read_bbox_rasterio, href, bbox, band, bbox_crs)
+    if data is None:
+        return None
+    return RasterWindow(data, header.nodata, header.window_transform(window))
+
+
+__all__ = [
+    "CogHeader",
+    "CogReader",
+    "CogUnsupported",
+    "RasterWindow",
+    "get_cog_reader",
+    "read_bbox",
+]
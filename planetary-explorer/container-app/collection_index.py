@@ -23,16 +23,32 @@ Design summary (from MCPProobjective.md):
       embedding (optional)
   * API:
       lookup_exact(token, mode)  -> id | None  (live-inventory check, no regex)
-      search(query, mode, k=8)   -> [Candidate]  (semantic or lexical)
+      search(query, mode, k=8)   -> [Candidate]  (semantic, lexical or hybrid)
       get(id, mode)              -> CollectionMeta | None
       snapshot(mode)             -> list[CollectionMeta]
 
+Embedding vectors are persisted in :mod:`embedding_store` keyed by
+``hash(deployment, embed text)``, so a refresh only calls AOAI for new or
+changed collections and a new replica can warm from disk. The raw
+collection lists of the last successful fetch are saved in the same file:
+the first load builds from them (no catalog round trip) and, once they
+are older than the TTL, serves them while a background refresh runs.
+Query vectors go through the in-memory ``QueryEmbeddingCache`` from the
+same module.
+
 Embeddings are **opt-in**: if ``AZURE_OPENAI_EMBEDDING_DEPLOYMENT`` is
 unset (or the call fails), ``search()`` falls back to a deterministic
 lexical scorer (tokenized Jaccard + keyword/id overlap) so the index
 remains useful in unit tests and offline dev. The selector treats both
 paths identically -- it just consumes ranked candidates.
 
+Search is vectorized per snapshot: each refresh builds a ``_SearchIndex``
+per mode holding a row-normalized float32 embedding matrix and an
+inverted token index over the lexical fields, so a query is one
+matrix-vector product plus posting-list lookups instead of a Python loop
+over every collection. ``tests/bench_collection_index.py`` compares it
+against the original per-row loop (``_cosine`` / ``_lexical_score``).
+
 This module **never** consults a hardcoded keyword table or regex.
 The only string-matching it does is against the live inventory.
 """
@@ -49,6 +65,9 @@ from dataclasses import dataclass, field
 from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
 
 import aiohttp
+import numpy as np
+
+from embedding_store import embedding_key, get_embedding_store, get_query_embedding_cache
 
 logger = logging.getLogger(__name__)
 
@@ -99,7 +118,7 @@ class Candidate:
 
     meta: CollectionMeta
     score: float
-    method: str  # "semantic" | "lexical"
+    method: str  # "semantic" | "lexical" | "hybrid"
 
 
 # ---------------------------------------------------------------------------
@@ -129,6 +148,9 @@ class _Snapshot:
     by_mode: Dict[Mode, Tuple[CollectionMeta, ...]]
     by_id: Dict[Mode, Dict[str, CollectionMeta]]
     errors: Dict[Mode, Optional[str]]
+    # Built once per refresh; see ``_SearchIndex``. Missing modes are
+    # built lazily by ``search_index`` so hand-made snapshots still work.
+    indexes: Dict[Mode, "_SearchIndex"] = field(default_factory=dict, repr=False)
 
     @classmethod
     def empty(cls) -> "_Snapshot":
@@ -139,6 +161,13 @@ class _Snapshot:
             errors={m: "not refreshed yet" for m in _VALID_MODES},
         )
 
+    def search_index(self, mode: Mode) -> "_SearchIndex":
+        idx = self.indexes.get(mode)
+        if idx is None:
+            idx = _SearchIndex.build(self.by_mode.get(mode, ()))
+            self.indexes[mode] = idx
+        return idx
+
     def is_fresh(self, ttl: float) -> bool:
         return self.refreshed_at > 0 and (time.time() - self.refreshed_at) < ttl
 
@@ -246,41 +275,22 @@ async def _embed_texts(texts: Sequence[str]) -> List[Optional[List[float]]]:
     if not deployment or not texts:
         return [None] * len(texts)
 
-    try:
-        from openai import AsyncAzureOpenAI
-    except Exception as exc:  # openai package missing in some test envs
-        logger.warning("[COLLECTION-INDEX] openai SDK unavailable: %s", exc)
-        return [None] * len(texts)
-
     endpoint = (os.getenv("AZURE_OPENAI_ENDPOINT") or "").strip()
-    api_key = (os.getenv("AZURE_OPENAI_API_KEY") or "").strip()
     api_version = (os.getenv("AZURE_OPENAI_API_VERSION") or "2024-02-01").strip()
     if not endpoint:
         logger.info("[COLLECTION-INDEX] AZURE_OPENAI_ENDPOINT unset; skipping embeddings")
         return [None] * len(texts)
 
-    client_kwargs: Dict[str, Any] = {
-        "azure_endpoint": endpoint,
-        "api_version": api_version,
-    }
-    if api_key:
-        client_kwargs["api_key"] = api_key
-    else:
-        # Use AAD via DefaultAzureCredential when no key is configured.
-        try:
-            from azure.identity.aio import DefaultAzureCredential, get_bearer_token_provider
-            cred = DefaultAzureCredential()
-            client_kwargs["azure_ad_token_provider"] = get_bearer_token_provider(
-                cred, "https://cognitiveservices.azure.com/.default"
-            )
-        except Exception as exc:
-            logger.warning("[COLLECTION-INDEX] AOAI AAD provider unavailable: %s", exc)
-            return [None] * len(texts)
+    try:
+        from _framework.llm_client import get_llm_client
+        client = get_llm_client(deployment, api_version=api_version, endpoint=endpoint)
+    except Exception as exc:  # openai package missing in some test envs
+        logger.warning("[COLLECTION-INDEX] LLM client unavailable: %s", exc)
+        return [None] * len(texts)
 
     try:
-        client = AsyncAzureOpenAI(**client_kwargs)
         # Single batched call; AOAI embedding endpoints accept arrays.
-        resp = await client.embeddings.create(model=deployment, input=list(texts))
+        resp = await client.embed(model=deployment, input=list(texts))
     except Exception as exc:
         logger.warning("[COLLECTION-INDEX] embedding call failed: %s", exc)
         return [None] * len(texts)
@@ -297,6 +307,48 @@ async def _embed_texts(texts: Sequence[str]) -> List[Optional[List[float]]]:
     return out
 
 
+async def _embed_texts_cached(texts: Sequence[str]) -> List[Optional[List[float]]]:
+    """``_embed_texts`` behind the content-addressed :mod:`embedding_store`.
+
+    Only texts with no stored vector for the current deployment are sent
+    to AOAI; successful new vectors are written back. With the store
+    disabled this is exactly ``_embed_texts``.
+    """
+    deployment = _embedding_deployment()
+    store = get_embedding_store() if deployment else None
+    if store is None or not texts:
+        return await _embed_texts(texts)
+
+    keys = [embedding_key(deployment, t) for t in texts]
+    stored = await store.get_many(keys)
+    missing = [i for i, key in enumerate(keys) if key not in stored]
+    fresh = await _embed_texts([texts[i] for i in missing]) if missing else []
+    new_vectors: Dict[str, List[float]] = {}
+    for i, vec in zip(missing, fresh):
+        if vec:
+            stored[keys[i]] = vec
+            new_vectors[keys[i]] = vec
+    await store.put_many(new_vectors)
+    logger.info(
+        "[COLLECTION-INDEX] embeddings: %d from store, %d embedded, %d failed",
+        len(texts) - len(missing), len(new_vectors), len(missing) - len(new_vectors),
+    )
+    return [stored.get(key) for key in keys]
+
+
+async def _embed_query(query: str) -> Optional[List[float]]:
+    """Embed one user query through the shared LRU/TTL query cache."""
+
+    async def _one(text: str) -> Optional[List[float]]:
+        embeds = await _embed_texts([text])
+        return embeds[0] if embeds else None
+
+    deployment = _embedding_deployment()
+    if not deployment:
+        return await _one(query)
+    return await get_query_embedding_cache().get_or_embed(deployment, query, _one)
+
+
 def _cosine(a: Sequence[float], b: Sequence[float]) -> float:
     if not a or not b or len(a) != len(b):
         return 0.0
@@ -326,10 +378,7 @@ def _lexical_score(query_tokens: set[str], m: CollectionMeta) -> float:
     """
     if not query_tokens:
         return 0.0
-    id_tokens = _token_set(m.id) | _token_set(m.id.replace("-", " "))
-    title_tokens = _token_set(m.title)
-    desc_tokens = _token_set(m.description)
-    kw_tokens = set(m.keywords) | {t for k in m.keywords for t in _tokenize(k)}
+    id_tokens, title_tokens, kw_tokens, desc_tokens = _lexical_fields(m)
 
     def jacc(a: set[str], b: set[str]) -> float:
         if not a or not b:
@@ -345,6 +394,199 @@ def _lexical_score(query_tokens: set[str], m: CollectionMeta) -> float:
     )
 
 
+# ---------------------------------------------------------------------------
+# Vectorized per-snapshot search index
+# ---------------------------------------------------------------------------
+
+# Lexical fields in ``_lexical_score`` order, with the same weights.
+_LEXICAL_WEIGHTS = np.array([4.0, 3.0, 1.5, 1.0], dtype=np.float64)
+
+_FUSION_MODES = ("raw", "rrf")
+
+
+def _lexical_fields(m: CollectionMeta) -> Tuple[set, set, set, set]:
+    """Token sets for (id, title, keywords, description) -- see ``_lexical_score``."""
+    return (
+        _token_set(m.id) | _token_set(m.id.replace("-", " ")),
+        _token_set(m.title),
+        set(m.keywords) | {t for k in m.keywords for t in _tokenize(k)},
+        _token_set(m.description),
+    )
+
+
+def _fusion_mode() -> str:
+    mode = (os.getenv("COLLECTION_INDEX_FUSION") or "raw").strip().lower()
+    return mode if mode in _FUSION_MODES else "raw"
+
+
+def _rrf_k() -> float:
+    try:
+        return float(os.getenv("COLLECTION_INDEX_RRF_K") or 60.0)
+    except ValueError:
+        return 60.0
+
+
+def _ranks(scores: np.ndarray) -> np.ndarray:
+    """1-based rank of each row by descending score (stable on ties)."""
+    order = np.argsort(-scores, kind="stable")
+    ranks = np.empty(len(scores), dtype=np.float64)
+    ranks[order] = np.arange(1, len(scores) + 1)
+    return ranks
+
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the ``k`` best positive scores, best first.
+
+    ``argpartition`` finds the k-th best score in O(n); every row tied
+    with it is kept before the final sort so the result matches a stable
+    ``sorted(..., reverse=True)[:k]`` over rows in snapshot order.
+    """
+    positive = np.flatnonzero(scores > 0)
+    if k <= 0 or positive.size == 0:
+        return positive[:0]
+    if positive.size > k:
+        pos_scores = scores[positive]
+        kth = pos_scores[np.argpartition(-pos_scores, k - 1)[k - 1]]
+        positive = positive[pos_scores >= kth]
+    order = np.lexsort((positive, -scores[positive]))
+    return positive[order][:k]
+
+
+class _SearchIndex:
+    """Immutable search structures for one mode of one snapshot.
+
+    * ``matrix`` -- ``(n_embedded, dim)`` float32, rows L2-normalized, so
+      cosine similarity against a normalized query is one ``matrix @ q``.
+      ``embedded`` maps matrix rows back to positions in ``rows``. Rows
+      whose embedding is missing (or has a different dimension from the
+      majority) are scored lexically, as before.
+    * ``postings`` -- per lexical field, ``token -> int32 row positions``.
+      Jaccard against a query token set only needs the intersection size,
+      which falls out of summing posting hits, plus the precomputed
+      ``field_sizes``.
+    """
+
+    __slots__ = ("rows", "matrix", "embedded", "postings", "field_sizes")
+
+    def __init__(
+        self,
+        rows: Tuple[CollectionMeta, ...],
+        matrix: np.ndarray,
+        embedded: np.ndarray,
+        postings: Tuple[Dict[str, np.ndarray], ...],
+        field_sizes: np.ndarray,
+    ) -> None:
+        self.rows = rows
+        self.matrix = matrix
+        self.embedded = embedded
+        self.postings = postings
+        self.field_sizes = field_sizes
+
+    @classmethod
+    def build(cls, rows: Sequence[CollectionMeta]) -> "_SearchIndex":
+        rows = tuple(rows)
+        n = len(rows)
+
+        dims = [len(r.embedding) for r in rows if r.embedding]
+        dim = max(set(dims), key=dims.count) if dims else 0
+        embedded = np.array(
+            [i for i, r in enumerate(rows) if r.embedding and len(r.embedding) == dim],
+            dtype=np.int64,
+        )
+        if embedded.size:
+            matrix = np.asarray([rows[i].embedding for i in embedded], dtype=np.float32)
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            np.divide(matrix, norms, out=matrix, where=norms > 0)
+        else:
+            matrix = np.zeros((0, 0), dtype=np.float32)
+
+        lists: Tuple[Dict[str, List[int]], ...] = tuple({} for _ in _LEXICAL_WEIGHTS)
+        field_sizes = np.zeros((len(_LEXICAL_WEIGHTS), n), dtype=np.float64)
+        for i, r in enumerate(rows):
+            for f, tokens in enumerate(_lexical_fields(r)):
+                field_sizes[f, i] = len(tokens)
+                for t in tokens:
+                    lists[f].setdefault(t, []).append(i)
+        postings = tuple(
+            {t: np.asarray(ix, dtype=np.int32) for t, ix in d.items()} for d in lists
+        )
+        return cls(rows, matrix, embedded, postings, field_sizes)
+
+    @property
+    def dim(self) -> int:
+        return int(self.matrix.shape[1]) if self.matrix.ndim == 2 else 0
+
+    @property
+    def has_embeddings(self) -> bool:
+        return self.embedded.size > 0
+
+    def lexical_scores(self, query_tokens: set) -> np.ndarray:
+        """Vector of ``_lexical_score(query_tokens, row)`` for every row."""
+        n = len(self.rows)
+        if not query_tokens or n == 0:
+            return np.zeros(n, dtype=np.float64)
+        inter = np.zeros((len(_LEXICAL_WEIGHTS), n), dtype=np.float64)
+        for f, postings in enumerate(self.postings):
+            for t in query_tokens:
+                hit = postings.get(t)
+                if hit is not None:
+                    inter[f, hit] += 1.0
+        union = len(query_tokens) + self.field_sizes - inter
+        jacc = np.divide(inter, union, out=np.zeros_like(inter), where=inter > 0)
+        return _LEXICAL_WEIGHTS @ jacc
+
+    def semantic_scores(self, query_vec: Sequence[float]) -> Optional[np.ndarray]:
+        """Cosine per embedded row (aligned with ``embedded``), or None."""
+        if not self.has_embeddings or len(query_vec) != self.dim:
+            return None
+        q = np.asarray(query_vec, dtype=np.float32)
+        qn = float(np.linalg.norm(q))
+        if qn <= 0:
+            return np.zeros(self.embedded.size, dtype=np.float32)
+        return self.matrix @ (q / qn)
+
+    def rank(
+        self,
+        query_tokens: set,
+        query_vec: Optional[Sequence[float]],
+        *,
+        k: int,
+        fusion: str = "raw",
+    ) -> List[Candidate]:
+        n = len(self.rows)
+        lexical = self.lexical_scores(query_tokens)
+        semantic = self.semantic_scores(query_vec) if query_vec is not None else None
+
+        # ``semantic_rows`` marks rows whose score is a cosine (raw mode).
+        semantic_rows: Optional[np.ndarray] = None
+        label = "lexical"
+        if semantic is None:
+            scores = lexical
+        elif fusion == "rrf":
+            # Reciprocal-rank fusion: raw cosine and Jaccard live on
+            # different scales, their ranks do not.
+            rrf_k = _rrf_k()
+            sem_full = np.zeros(n, dtype=np.float64)
+            sem_full[self.embedded] = semantic
+            scores = np.zeros(n, dtype=np.float64)
+            for part in (sem_full, lexical):
+                hit = part > 0
+                scores[hit] += 1.0 / (rrf_k + _ranks(part)[hit])
+            label = "hybrid"
+        else:
+            # Legacy mixing: embedded rows use cosine, the rest Jaccard.
+            scores = lexical.copy()
+            scores[self.embedded] = semantic
+            semantic_rows = np.zeros(n, dtype=bool)
+            semantic_rows[self.embedded] = True
+
+        out: List[Candidate] = []
+        for i in _top_k(scores, k):
+            method = "semantic" if semantic_rows is not None and semantic_rows[i] else label
+            out.append(Candidate(meta=self.rows[i], score=float(scores[i]), method=method))
+        return out
+
+
 # ---------------------------------------------------------------------------
 # CollectionIndex
 # ---------------------------------------------------------------------------
@@ -373,6 +615,9 @@ class CollectionIndex:
     async def ensure_loaded(self) -> _Snapshot:
         """Block-load on first call; otherwise return the cached snapshot.
 
+        The first load uses the persisted collection lists when there are
+        any, and only fetches the catalogs when there are none.
+
         After the cache goes stale, returns the stale snapshot immediately
         and kicks off a background refresh -- callers never block on TTL
         rollover.
@@ -381,8 +626,8 @@ class CollectionIndex:
         if snap.refreshed_at == 0.0:
             async with self._lock:
                 if self._snapshot.refreshed_at == 0.0:
-                    self._snapshot = await self._refresh_now()
-            return self._snapshot
+                    self._snapshot = await self._load_persisted() or await self._refresh_now()
+            snap = self._snapshot
         if not snap.is_fresh(self._ttl):
             self._kick_background_refresh()
         return snap
@@ -431,47 +676,45 @@ class CollectionIndex:
         mode: Mode,
         *,
         k: int = 8,
+        fusion: Optional[str] = None,
     ) -> List[Candidate]:
         """Return the top-``k`` collections ranked by relevance to ``query``.
 
         Uses cosine over cached embeddings when available; otherwise falls
-        back to lexical Jaccard on tokenized fields. Mixed-mode (some rows
-        embedded, others not) is supported: each row is scored by whichever
-        method it has data for, then ranked by the resulting numeric score.
-        Embedding scores and lexical scores are NOT normalized against each
-        other -- if you depend on cross-row comparability, run with
-        embeddings on for all rows (production) or off for all (tests).
+        back to lexical Jaccard on tokenized fields. ``fusion`` (default
+        ``COLLECTION_INDEX_FUSION``, else ``"raw"``) picks how the two mix:
+
+          * ``"raw"`` -- each row is scored by whichever method it has data
+            for, then ranked by the resulting numeric score. Embedding and
+            lexical scores are NOT normalized against each other.
+          * ``"rrf"`` -- reciprocal-rank fusion of the semantic and lexical
+            rankings over every row (``method="hybrid"``), so the two
+            signals are comparable. Equivalent to lexical when no query
+            embedding is available.
         """
         snap = await self.ensure_loaded()
-        rows = snap.by_mode.get(mode, ())
-        if not rows or not query:
+        if mode not in snap.by_mode or not query:
+            return []
+        index = snap.search_index(mode)
+        if not index.rows:
             return []
 
         # Try to embed the query when any row has an embedding to compare against.
-        any_embedded = any(r.embedding is not None for r in rows)
         query_vec: Optional[List[float]] = None
-        if any_embedded:
-            embeds = await _embed_texts([query])
-            query_vec = embeds[0] if embeds else None
-
-        q_tokens = _token_set(query)
-        results: List[Candidate] = []
-        for r in rows:
-            if query_vec is not None and r.embedding is not None:
-                score = _cosine(query_vec, r.embedding)
-                method = "semantic"
-            else:
-                score = _lexical_score(q_tokens, r)
-                method = "lexical"
-            if score > 0:
-                results.append(Candidate(meta=r, score=score, method=method))
-
-        results.sort(key=lambda c: c.score, reverse=True)
-        return results[:k]
+        if index.has_embeddings:
+            query_vec = await _embed_query(query)
+
+        return index.rank(
+            _token_set(query),
+            query_vec,
+            k=k,
+            fusion=(fusion or _fusion_mode()).lower(),
+        )
 
     async def health(self) -> Dict[str, Any]:
         """Return a small dict describing the current snapshot for /api/_debug."""
         snap = await self.ensure_loaded()
+        store = get_embedding_store()
         return {
             "refreshed_at": snap.refreshed_at,
             "age_seconds": (time.time() - snap.refreshed_at) if snap.refreshed_at else None,
@@ -483,6 +726,9 @@ class CollectionIndex:
                 m: sum(1 for c in snap.by_mode.get(m, ()) if c.embedding is not None)
                 for m in _VALID_MODES
             },
+            # stats() counts rows with a blocking sqlite query
+            "embedding_store": await asyncio.to_thread(store.stats) if store is not None else None,
+            "query_embedding_cache": get_query_embedding_cache().stats(),
         }
 
     # ----- internals -------------------------------------------------------
@@ -507,7 +753,8 @@ class CollectionIndex:
         """Fetch both catalogs, normalize, embed, return a new snapshot.
 
         Errors per-source are isolated: a failure to reach Pro never
-        breaks the public inventory, and vice versa.
+        breaks the public inventory, and vice versa. Sources that loaded
+        cleanly are persisted for the next replica's first load.
         """
         t0 = time.time()
         async with aiohttp.ClientSession() as session:
@@ -516,12 +763,68 @@ class CollectionIndex:
             (public_rows, public_err) = await public_task
             (pro_rows, pro_err) = await pro_task
 
-        # Embed all rows in one batched call when possible.
+        store = get_embedding_store()
+        if store is not None:
+            for source, rows, err in (("public", public_rows, public_err), ("pro", pro_rows, pro_err)):
+                if err is None:
+                    await store.put_collections(source, [r.raw for r in rows])
+
+        snap = await self._build_snapshot(
+            public_rows, pro_rows, {"public": public_err, "pro": pro_err}, refreshed_at=time.time()
+        )
+        logger.info(
+            "[COLLECTION-INDEX] refreshed in %.2fs (public=%d, pro=%d, embeddings=%s)",
+            time.time() - t0,
+            len(snap.by_mode["public"]),
+            len(snap.by_mode["pro"]),
+            sum(1 for ms in snap.by_mode.values() for r in ms if r.embedding is not None),
+        )
+        return snap
+
+    async def _load_persisted(self) -> Optional[_Snapshot]:
+        """Snapshot from the collection lists in :mod:`embedding_store`, if any.
+
+        ``refreshed_at`` is the oldest save time, so a list older than the
+        TTL is served while :meth:`ensure_loaded` refreshes it.
+        """
+        store = get_embedding_store()
+        saved = await store.get_collections() if store is not None else {}
+        if "public" not in saved:
+            return None
+        rows: Dict[Mode, List[CollectionMeta]] = {"public": [], "pro": []}
+        for source, (_, cols) in saved.items():
+            if source in rows:
+                rows[source] = [m for m in (_to_meta(c, source) for c in cols if isinstance(c, dict)) if m]
+        snap = await self._build_snapshot(
+            rows["public"],
+            rows["pro"],
+            {"public": None, "pro": None},
+            refreshed_at=min(saved_at for saved_at, _ in saved.values()),
+        )
+        logger.info(
+            "[COLLECTION-INDEX] loaded persisted inventory (public=%d, pro=%d, age=%.0fs)",
+            len(snap.by_mode["public"]),
+            len(snap.by_mode["pro"]),
+            time.time() - snap.refreshed_at,
+        )
+        return snap
+
+    async def _build_snapshot(
+        self,
+        public_rows: Sequence[CollectionMeta],
+        pro_rows: Sequence[CollectionMeta],
+        errors: Dict[Mode, Optional[str]],
+        *,
+        refreshed_at: float,
+    ) -> _Snapshot:
+        """Attach embeddings and build the per-mode search indexes."""
+        # Embed all rows in one batched call when possible; unchanged rows
+        # come straight from the on-disk store.
         all_rows = list(public_rows) + list(pro_rows)
         embeds: List[Optional[List[float]]] = []
         if all_rows and _embedding_deployment():
             try:
-                embeds = await _embed_texts([_build_embed_text(r) for r in all_rows])
+                embeds = await _embed_texts_cached([_build_embed_text(r) for r in all_rows])
             except Exception as exc:
                 logger.warning("[COLLECTION-INDEX] embedding batch failed: %s", exc)
                 embeds = [None] * len(all_rows)
@@ -550,20 +853,13 @@ class CollectionIndex:
             by_mode[r.source] = by_mode[r.source] + (r,)
             by_id[r.source][r.id] = r
 
-        snap = _Snapshot(
-            refreshed_at=time.time(),
+        return _Snapshot(
+            refreshed_at=refreshed_at,
             by_mode=by_mode,
             by_id=by_id,
-            errors={"public": public_err, "pro": pro_err},
+            errors=errors,
+            indexes={m: _SearchIndex.build(rows) for m, rows in by_mode.items()},
         )
-        logger.info(
-            "[COLLECTION-INDEX] refreshed in %.2fs (public=%d, pro=%d, embeddings=%s)",
-            time.time() - t0,
-            len(by_mode["public"]),
-            len(by_mode["pro"]),
-            sum(1 for r in enriched if r.embedding is not None),
-        )
-        return snap
 
     async def _load_public(
         self, session: aiohttp.ClientSession
@@ -639,6 +935,7 @@ def reset_collection_index_for_tests() -> None:
     """Drop the cached singleton. Tests only -- do not call from app code."""
     global _singleton
     _singleton = None
+    get_query_embedding_cache().clear()
 
 
 __all__ = [
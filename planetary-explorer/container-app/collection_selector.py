@@ -338,28 +338,13 @@ async def _llm_pick(
     endpoint = (os.getenv("AZURE_OPENAI_ENDPOINT") or "").strip()
     if not deployment or not endpoint:
         return None
+    api_version = (os.getenv("AZURE_OPENAI_API_VERSION") or "2024-02-01").strip()
     try:
-        from openai import AsyncAzureOpenAI
+        from _framework.llm_client import get_llm_client
+        client = get_llm_client(deployment, api_version=api_version, endpoint=endpoint)
     except Exception as exc:
-        logger.warning("[COLLECTION-SELECTOR] openai SDK unavailable: %s", exc)
+        logger.warning("[COLLECTION-SELECTOR] LLM client unavailable: %s", exc)
         return None
-    api_version = (os.getenv("AZURE_OPENAI_API_VERSION") or "2024-02-01").strip()
-    api_key = (os.getenv("AZURE_OPENAI_API_KEY") or "").strip() or None
-    kwargs: Dict[str, Any] = {
-        "azure_endpoint": endpoint,
-        "api_version": api_version,
-        "api_key": api_key,
-    }
-    if not api_key:
-        try:
-            from azure.identity.aio import DefaultAzureCredential, get_bearer_token_provider
-            kwargs["azure_ad_token_provider"] = get_bearer_token_provider(
-                DefaultAzureCredential(),
-                "https://cognitiveservices.azure.com/.default",
-            )
-        except Exception as exc:
-            logger.warning("[COLLECTION-SELECTOR] AAD provider unavailable: %s", exc)
-            return None
     # Model-aware kwargs: gpt-5/o1/o3/o4 reject `temperature` and
     # `max_tokens`; gpt-4o family rejects `reasoning_effort`. Mirror
     # the LoadAgent shim so a single deployment env switch can't
@@ -372,8 +357,7 @@ async def _llm_pick(
         extra["temperature"] = 0.0
         extra["max_tokens"] = 400
     try:
-        client = AsyncAzureOpenAI(**kwargs)
-        resp = await client.chat.completions.create(
+        resp = await client.create(
             model=deployment,
             messages=_build_llm_prompt(query, mode, cands),
             response_format={"type": "json_object"},
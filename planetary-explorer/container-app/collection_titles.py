@@ -34,6 +34,8 @@ from typing import Dict, Iterable, Optional, Tuple
 
 import aiohttp
 
+import http_pool
+
 logger = logging.getLogger(__name__)
 
 
@@ -220,12 +222,12 @@ async def refresh_now(force: bool = False) -> Tuple[int, int]:
             or ""
         )
 
-        async with aiohttp.ClientSession() as session:
-            public_result, pro_result = await asyncio.gather(
-                _fetch_one(session, mpc_url, "MPC"),
-                _fetch_one(session, mpc_pro_url, "MPC-Pro") if mpc_pro_url else _noop(),
-                return_exceptions=True,
-            )
+        public_result, pro_result = await asyncio.gather(
+            _fetch_one(http_pool.get_session(http_pool.POOL_STAC), mpc_url, "MPC"),
+            _fetch_one(http_pool.get_session(http_pool.POOL_PRO), mpc_pro_url, "MPC-Pro")
+            if mpc_pro_url else _noop(),
+            return_exceptions=True,
+        )
 
         added = 0
         if isinstance(public_result, dict) and public_result:
@@ -0,0 +1,411 @@
+"""Embedding caches: content-addressed on-disk store + in-memory query cache.
+
+``CollectionIndex`` refreshes every ``COLLECTION_INDEX_TTL_SECONDS`` and
+used to re-embed the whole inventory each time, even though almost every
+collection's ``_build_embed_text`` output is unchanged between refreshes
+(and between replicas). This store keys each vector by
+``sha256(deployment + "\\0" + text)`` so only new or edited collections
+hit Azure OpenAI, and a fresh container with the file on a mounted
+volume warms its index without a single embedding call.
+
+Storage is one SQLite file (stdlib, WAL mode) with float32 blobs:
+
+    embeddings(key TEXT PRIMARY KEY, dim INTEGER, vec BLOB, last_used REAL)
+    collections(source TEXT PRIMARY KEY, payload TEXT, saved_at REAL)
+
+Rows beyond ``COLLECTION_EMBED_CACHE_MAX_ROWS`` are pruned oldest
+``last_used`` first. ``collections`` holds the last successfully fetched
+raw ``/collections`` list per source (JSON), so a new replica can build
+its index before the catalogs answer. All I/O runs via ``asyncio.to_thread``; any SQLite
+error is logged and treated as a miss so the store can never break a
+refresh.
+
+:class:`QueryEmbeddingCache` is the per-process counterpart for *query*
+text: ``CollectionIndex.search`` embeds the raw user query on every call,
+and the same query is commonly searched several times per request (the
+selector's shadow + v2 paths, the debug endpoint). It is an LRU with a
+TTL, keyed on normalized text + deployment, and concurrent misses for
+the same key share one in-flight embedding call.
+
+Config:
+  COLLECTION_EMBED_CACHE_PATH      file path (default: <tmp>/earth-copilot/
+                                   collection-embeddings.sqlite3);
+                                   ``off`` disables the store
+  COLLECTION_EMBED_CACHE_MAX_ROWS  row cap (default 20000)
+  COLLECTION_QUERY_EMBED_CACHE_SIZE  query LRU entries (default 1024)
+  COLLECTION_QUERY_EMBED_TTL_S       query entry lifetime (default 3600)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+import re
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_DISABLED_VALUES = {"off", "none", "false", "0"}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS embeddings (
+    key TEXT PRIMARY KEY,
+    dim INTEGER NOT NULL,
+    vec BLOB NOT NULL,
+    last_used REAL NOT NULL
+)
+"""
+
+_SCHEMA_COLLECTIONS = """
+CREATE TABLE IF NOT EXISTS collections (
+    source TEXT PRIMARY KEY,
+    payload TEXT NOT NULL,
+    saved_at REAL NOT NULL
+)
+"""
+
+
+def embedding_key(deployment: str, text: str) -> str:
+    """Stable content address for ``text`` embedded by ``deployment``."""
+    h = hashlib.sha256()
+    h.update(deployment.encode("utf-8"))
+    h.update(b"\0")
+    h.update(text.encode("utf-8"))
+    return h.hexdigest()
+
+
+class EmbeddingStore:
+    """SQLite-backed ``key -> vector`` map. Safe to share across coroutines."""
+
+    def __init__(self, path: str, *, max_rows: int = 20000) -> None:
+        self.path = Path(path)
+        self.max_rows = max(1, int(max_rows))
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.errors = 0
+        self._ready = False
+
+    # ----- sync internals (run in a worker thread) -------------------------
+
+    def _connect(self) -> sqlite3.Connection:
+        if not self._ready:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.path), timeout=5.0)
+        if not self._ready:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(_SCHEMA)
+            conn.execute(_SCHEMA_COLLECTIONS)
+            conn.commit()
+            self._ready = True
+        return conn
+
+    def _get_many(self, keys: Sequence[str]) -> Dict[str, List[float]]:
+        out: Dict[str, List[float]] = {}
+        conn = self._connect()
+        try:
+            # SQLite caps bound parameters (999 on older builds).
+            for start in range(0, len(keys), 500):
+                chunk = list(keys[start:start + 500])
+                marks = ",".join("?" * len(chunk))
+                rows = conn.execute(
+                    f"SELECT key, dim, vec FROM embeddings WHERE key IN ({marks})", chunk
+                ).fetchall()
+                for key, dim, blob in rows:
+                    vec = np.frombuffer(blob, dtype=np.float32)
+                    if vec.size == dim:
+                        out[key] = vec.tolist()
+            if out:
+                now = time.time()
+                conn.executemany(
+                    "UPDATE embeddings SET last_used = ? WHERE key = ?",
+                    [(now, k) for k in out],
+                )
+                conn.commit()
+        finally:
+            conn.close()
+        return out
+
+    def _put_many(self, items: Mapping[str, Sequence[float]]) -> None:
+        now = time.time()
+        rows = []
+        for key, vec in items.items():
+            arr = np.asarray(vec, dtype=np.float32)
+            rows.append((key, int(arr.size), arr.tobytes(), now))
+        conn = self._connect()
+        try:
+            conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, dim, vec, last_used) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            conn.execute(
+                "DELETE FROM embeddings WHERE key IN ("
+                " SELECT key FROM embeddings ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.max_rows,),
+            )
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _put_collections(self, source: str, payload: str) -> None:
+        conn = self._connect()
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO collections (source, payload, saved_at) VALUES (?, ?, ?)",
+                (source, payload, time.time()),
+            )
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _get_collections(self) -> Dict[str, Tuple[float, List[Dict[str, Any]]]]:
+        if not self.path.exists():
+            return {}
+        conn = self._connect()
+        try:
+            rows = conn.execute("SELECT source, payload, saved_at FROM collections").fetchall()
+        finally:
+            conn.close()
+        return {source: (saved_at, json.loads(payload)) for source, payload, saved_at in rows}
+
+    def _count(self) -> int:
+        if not self.path.exists():
+            return 0
+        conn = self._connect()
+        try:
+            return int(conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0])
+        finally:
+            conn.close()
+
+    # ----- async API -------------------------------------------------------
+
+    async def get_many(self, keys: Sequence[str]) -> Dict[str, List[float]]:
+        """Return the cached vectors for whichever ``keys`` are present."""
+        if not keys:
+            return {}
+        try:
+            found = await asyncio.to_thread(self._get_many, keys)
+        except (sqlite3.Error, OSError) as exc:
+            self.errors += 1
+            logger.warning("[EMBED-STORE] read failed (%s): %s", self.path, exc)
+            found = {}
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        return found
+
+    async def put_many(self, items: Mapping[str, Sequence[float]]) -> None:
+        """Persist ``key -> vector`` pairs (overwrites, then prunes)."""
+        if not items:
+            return
+        try:
+            await asyncio.to_thread(self._put_many, items)
+            self.writes += len(items)
+        except (sqlite3.Error, OSError) as exc:
+            self.errors += 1
+            logger.warning("[EMBED-STORE] write failed (%s): %s", self.path, exc)
+
+    async def put_collections(self, source: str, collections: Sequence[Mapping[str, Any]]) -> None:
+        """Persist the raw collection list last fetched from ``source``."""
+        try:
+            await asyncio.to_thread(self._put_collections, source, json.dumps(list(collections)))
+        except (sqlite3.Error, OSError, TypeError, ValueError) as exc:
+            self.errors += 1
+            logger.warning("[EMBED-STORE] collection list write failed (%s): %s", self.path, exc)
+
+    async def get_collections(self) -> Dict[str, Tuple[float, List[Dict[str, Any]]]]:
+        """``source -> (saved_at, raw collections)`` for every persisted source."""
+        try:
+            return await asyncio.to_thread(self._get_collections)
+        except (sqlite3.Error, OSError, ValueError) as exc:
+            self.errors += 1
+            logger.warning("[EMBED-STORE] collection list read failed (%s): %s", self.path, exc)
+            return {}
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters plus the row count (blocking sqlite; call via ``asyncio.to_thread``)."""
+        try:
+            entries: Optional[int] = self._count()
+        except (sqlite3.Error, OSError):
+            entries = None
+        return {
+            "path": str(self.path),
+            "entries": entries,
+            "max_rows": self.max_rows,
+            "hits": self.hits,
+            "misses": self.misses,
+            "writes": self.writes,
+            "errors": self.errors,
+        }
+
+
+# ---------------------------------------------------------------------------
+# In-memory query embedding cache
+# ---------------------------------------------------------------------------
+
+_WS_RE = re.compile(r"\s+")
+
+
+def normalize_query(text: str) -> str:
+    """Case-fold and collapse whitespace; the query cache key space."""
+    return _WS_RE.sub(" ", (text or "").strip()).casefold()
+
+
+EmbedOne = Callable[[str], Awaitable[Optional[List[float]]]]
+
+
+class QueryEmbeddingCache:
+    """Async-safe LRU + TTL map of ``(deployment, normalized query) -> vector``.
+
+    Failed embeddings (``None``) are not cached, so a transient AOAI error
+    is retried on the next query. Waiters on an in-flight call are
+    shielded: one caller being cancelled never cancels the shared call.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_entries: int = 1024,
+        ttl_s: float = 3600.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_entries = max(1, int(max_entries))
+        self.ttl_s = float(ttl_s)
+        self._clock = clock
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, Tuple[float, ...]]]" = OrderedDict()
+        self._inflight: Dict[Tuple[str, str], "asyncio.Future[Optional[List[float]]]"] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    def _get(self, key: Tuple[str, str]) -> Optional[Tuple[float, ...]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        stored_at, vec = entry
+        if self._clock() - stored_at >= self.ttl_s:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return vec
+
+    def _put(self, key: Tuple[str, str], vec: Sequence[float]) -> None:
+        self._entries[key] = (self._clock(), tuple(vec))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def _fill(self, key: Tuple[str, str], text: str, embed: EmbedOne) -> Optional[List[float]]:
+        try:
+            vec = await embed(text)
+        finally:
+            self._inflight.pop(key, None)
+        if vec:
+            self._put(key, vec)
+        return vec
+
+    async def get_or_embed(self, deployment: str, text: str, embed: EmbedOne) -> Optional[List[float]]:
+        """Return the cached vector for ``text`` or embed it once via ``embed``."""
+        key = (deployment, normalize_query(text))
+        vec = self._get(key)
+        if vec is not None:
+            self.hits += 1
+            return list(vec)
+        pending = self._inflight.get(key)
+        if pending is not None:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            pending = asyncio.ensure_future(self._fill(key, text, embed))
+            self._inflight[key] = pending
+        return await asyncio.shield(pending)
+
+    def clear(self) -> None:
+        """Drop all entries and zero the counters (in-flight calls finish)."""
+        self._entries.clear()
+        self.hits = self.misses = self.coalesced = self.evictions = 0
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_s": self.ttl_s,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "inflight": len(self._inflight),
+            "hit_rate": round((self.hits + self.coalesced) / lookups, 4) if lookups else None,
+        }
+
+
+# ---------------------------------------------------------------------------
+# Module singletons
+# ---------------------------------------------------------------------------
+
+_store: Optional[EmbeddingStore] = None
+_store_path: Optional[str] = None
+
+
+def _configured_path() -> Optional[str]:
+    raw = os.getenv("COLLECTION_EMBED_CACHE_PATH")
+    if raw is None:
+        return os.path.join(tempfile.gettempdir(), "earth-copilot", "collection-embeddings.sqlite3")
+    raw = raw.strip()
+    if not raw or raw.lower() in _DISABLED_VALUES:
+        return None
+    return raw
+
+
+def get_embedding_store() -> Optional[EmbeddingStore]:
+    """Return the shared store, or ``None`` when disabled by config."""
+    global _store, _store_path
+    path = _configured_path()
+    if path is None:
+        return None
+    if _store is None or _store_path != path:
+        try:
+            max_rows = int(os.getenv("COLLECTION_EMBED_CACHE_MAX_ROWS") or 20000)
+        except ValueError:
+            max_rows = 20000
+        _store = EmbeddingStore(path, max_rows=max_rows)
+        _store_path = path
+    return _store
+
+
+_query_cache: Optional[QueryEmbeddingCache] = None
+
+
+def get_query_embedding_cache() -> QueryEmbeddingCache:
+    """Return the process-wide :class:`QueryEmbeddingCache` (lazy)."""
+    global _query_cache
+    if _query_cache is None:
+        try:
+            size = int(os.getenv("COLLECTION_QUERY_EMBED_CACHE_SIZE") or 1024)
+            ttl = float(os.getenv("COLLECTION_QUERY_EMBED_TTL_S") or 3600.0)
+        except ValueError:
+            size, ttl = 1024, 3600.0
+        _query_cache = QueryEmbeddingCache(max_entries=size, ttl_s=ttl)
+    return _query_cache
+
+
+__all__ = [
+    "EmbeddingStore",
+    "QueryEmbeddingCache",
+    "embedding_key",
+    "get_embedding_store",
+    "get_query_embedding_cache",
+    "normalize_query",
+]
@@ -23,6 +23,11 @@ from pathlib import Path
 import hashlib
 import time
 
+import http_pool  # [NET] App-lifetime pooled upstream HTTP sessions
+import raster_env  # [NET] Process-wide GDAL I/O profile + per-tool read stats
+import raster_pool  # [NET] Shared bounded worker pool for geoint raster work
+import stream_proxy  # [NET] Chunked pass-through for proxied tiles / TileJSON
+
 # Import Planetary Explorer modules
 from semantic_translator import SemanticQueryTranslator
 from titiler_config import get_tile_scale  # Legacy tile scale function
@@ -34,6 +39,9 @@ from quickstart_cache import (
     get_quickstart_location,
     get_quickstart_stats
 )  # [LAUNCH] Pre-computed cache for demo queries
+from query_understanding_cache import get_query_understanding_stats  # Learned cache for repeated queries
+from renders_resolver import get_renders_resolver  # Non-blocking STAC renders (preset) cache
+from tile_prefetcher import get_tile_prefetcher  # Viewport tile warm-up for first paint
 from cloud_config import cloud_cfg  # [CLOUD] Cloud environment configuration (Commercial/Government)
 
 # Microsoft Teams Bot integration (optional — requires botbuilder-core)
@@ -279,7 +287,8 @@ def build_tile_url_params(collection_id: str, query_context: str = None) -> str:
 
 # Import Planetary Computer authentication
 try:
-    import planetary_computer
+    import planetary_computer  # noqa: F401 — availability probe; signing goes through sas_signer
+    import sas_signer
     PLANETARY_COMPUTER_AVAILABLE = True
     logging.info("[OK] Planetary Computer authentication available")
 except ImportError as e:
@@ -344,6 +353,11 @@ cors_origins_str = os.environ.get("CORS_ORIGINS", "*")
 cors_origins = [origin.strip() for origin in cors_origins_str.split(",")] if cors_origins_str != "*" else ["*"]
 logger.info(f"[LOCK] CORS configured for origins: {cors_origins}")
 
+# One raster-pool session per request: fair-share quota for the geoint tools'
+# raster work, and queued work is cancelled if the client goes away.
+# Registered first, so it sits innermost, directly around the routes.
+app.add_middleware(raster_pool.RasterRequestMiddleware)
+
 # Add CORS middleware (must be outermost — runs first on requests, last on responses)
 app.add_middleware(
     CORSMiddleware,
@@ -785,9 +799,9 @@ async def execute_direct_stac_search(stac_query: Dict[str, Any], stac_endpoint:
         # represent "data exists somewhere in this region" not "complete coverage".
         # Instead, we let the search run and handle empty results with helpful messages.
         
-        timeout = aiohttp.ClientTimeout(total=60)
-        
-        async with aiohttp.ClientSession(timeout=timeout) as session:
+        # Pooled keep-alive session (60s default timeout, same as the old
+        # per-call session) -- see http_pool.
+        async with http_pool.session(http_pool.POOL_PRO if is_pro else http_pool.POOL_STAC) as session:
             # MPC Pro short-circuit: AAD bearer + api-version handled by
             # pro_stac_client. Produces the same shape as the public path,
             # but without TileSelector / coverage heuristics (those are
@@ -1082,6 +1096,28 @@ async def _warm_pro_collection_inventory():
         logger.warning("[PRO-WARM] failed to schedule warm-up: %s", exc)
 
 
+@app.on_event("shutdown")
+async def _close_http_pools():
+    """Close the pooled upstream HTTP sessions opened by ``http_pool``.
+
+    Keep-alive connections otherwise outlive the event loop and surface
+    as ``Unclosed client session`` warnings on container stop.
+    """
+    try:
+        await http_pool.shutdown()
+    except Exception as exc:  # pragma: no cover - defensive
+        logger.warning("[HTTP-POOL] shutdown failed: %s", exc)
+
+
+@app.on_event("shutdown")
+async def _close_raster_pool():
+    """Cancel queued raster work and let the ``raster_pool`` workers exit."""
+    try:
+        raster_pool.shutdown()
+    except Exception as exc:  # pragma: no cover - defensive
+        logger.warning("[RASTER] pool shutdown failed: %s", exc)
+
+
 @app.on_event("shutdown")
 async def _close_mcp_catalog_client():
     """Release the MPC MCP sidecar session cleanly on container stop.
@@ -1137,6 +1173,25 @@ async def _prewarm_collection_index():
         logger.warning("[COLLECTION-INDEX] pre-warm failed (selector will lazy-init): %s", exc)
 
 
+@app.on_event("startup")
+async def _prefetch_render_configs():
+    """Seed the STAC ``renders`` cache in the background.
+
+    ``clean_tilejson_urls`` reads every result collection's renders
+    block; seeding it from the CollectionIndex snapshot (which already
+    carries the raw collection documents) means those lookups are
+    served from memory instead of a STAC fetch per cold collection.
+    Detached so startup is not delayed; fail-open.
+    """
+    async def _run():
+        try:
+            await get_renders_resolver().prefetch()
+        except Exception as exc:
+            logger.warning("[RENDERS] prefetch failed (renders will be fetched on demand): %s", exc)
+
+    asyncio.get_running_loop().create_task(_run())
+
+
 @app.on_event("startup")
 async def startup_event():
     """Initialize the application components"""
@@ -1144,6 +1199,20 @@ async def startup_event():
     global terrain_analyzer, mobility_classifier, los_calculator, geoint_utils, GEOINT_AVAILABLE
     
     logger.info("[LAUNCH] PLANETARY EXPLORER CONTAINER STARTING UP")
+
+    # Open the pooled upstream sessions (STAC, Pro, geocoder, Open-Meteo)
+    # on the app loop before any handler or warm-up task needs them.
+    try:
+        await http_pool.startup()
+    except Exception as e:
+        logger.warning(f"[HTTP-POOL] startup failed (pools will lazy-init): {e}")
+
+    # GDAL reads its cache sizes once, so export the raster profile before
+    # the first rasterio.open anywhere in the process.
+    try:
+        raster_env.apply_profile()
+    except Exception as e:
+        logger.warning(f"[RASTER] profile not applied: {e}")
     
     try:
         # Initialize Semantic Translator components with environment variables
@@ -1216,6 +1285,12 @@ async def startup_event():
         # Log quick start cache status
         qs_stats = get_quickstart_stats()
         logger.info(f"[LAUNCH] Quick Start Cache: {qs_stats['total_queries']} queries, {len(qs_stats['collections_covered'])} collections")
+        qu_stats = get_query_understanding_stats()
+        if qu_stats.get("enabled"):
+            logger.info(
+                f"[LAUNCH] Query-understanding cache: {qu_stats['entries']}/{qu_stats['max_entries']} learned, "
+                f"ttl={qu_stats['ttl_s']:.0f}s, persistent={qu_stats['persistent']}"
+            )
         
         # Initialize Teams Bot (optional)
         global teams_bot, teams_bot_adapter
@@ -2121,70 +2196,53 @@ def calculate_zoom_level(bbox: List[float]) -> int:
         return 12
 
 
-async def _prewarm_mosaic_tiles(
-    tilejson_url: Optional[str],
-    bbox: Optional[List[float]],
-    zooms: tuple = (6, 8),
+def _schedule_tile_prefetch(
+    session_id: Optional[str],
+    viewport: Optional[List[float]],
+    mosaic: Optional[Dict[str, Any]] = None,
+    tile_urls: Optional[List[Dict[str, Any]]] = None,
 ) -> None:
-    """
-    Fire-and-forget warmup of TiTiler mosaic tile cache.
-
-    Issues a small number of GET requests against representative tiles so that
-    by the time the browser asks for them the renderer has already cached the
-    output. Purely additive — wrapped in a broad try/except so any failure is
-    logged and silently dropped. Never raises and never blocks the caller
-    (intended to be scheduled via asyncio.create_task).
+    """Warm the tiles the map will request first (see :mod:`tile_prefetcher`).
 
-    Args:
-        tilejson_url: The mosaic tilejson URL returned by get_mosaic_tilejson_url.
-                      Must contain ".../tilejson.json" — we substitute the tile path.
-        bbox: [west, south, east, north]. Used to pick the center tile.
-        zooms: Zoom levels to prewarm. Defaults to (6, 8) — typical first-paint zooms.
+    Covers the viewport at the zoom the SPA opens at
+    (``calculate_zoom_level``) plus one zoom deeper, mosaic layer first,
+    then each item layer within its footprint. Bounded, deduplicated
+    across users, and replaces the session's previous prefetch. Never
+    raises and never blocks the response.
+    """
+    prefetcher = get_tile_prefetcher()
+    if prefetcher is None or not viewport or len(viewport) != 4:
+        return
+    layers = []
+    if mosaic and mosaic.get("tilejson_url"):
+        layers.append((mosaic["tilejson_url"], None))
+    layers.extend((t.get("tilejson_url"), t.get("bbox")) for t in (tile_urls or []))
+    prefetcher.schedule(session_id, layers, viewport, calculate_zoom_level(viewport))
+
+
+async def warm_render_configs(stac_results: Dict[str, Any], is_pro: bool = False) -> None:
+    """Resolve the STAC renders blocks of a result set's collections.
+
+    Await this before :func:`clean_tilejson_urls`: the renders lookups it
+    makes are synchronous and, on the event loop, never fetch (a miss
+    just falls back to the static render tiers). Fetching the missing
+    blocks here, concurrently and off the blocking path, keeps preset
+    selection live for cold collections.
     """
     try:
-        if not tilejson_url or not bbox or len(bbox) != 4:
-            return
-        if "tilejson.json" not in tilejson_url:
-            return
-
-        import math as _math
-
-        west, south, east, north = bbox
-        center_lon = (west + east) / 2.0
-        center_lat = (south + north) / 2.0
-
-        # Clamp lat to web mercator valid range
-        center_lat = max(-85.05, min(85.05, center_lat))
-
-        urls: List[str] = []
-        for z in zooms:
-            n = 2 ** z
-            x = int((center_lon + 180.0) / 360.0 * n)
-            lat_rad = _math.radians(center_lat)
-            y = int(
-                (1.0 - _math.log(_math.tan(lat_rad) + 1.0 / _math.cos(lat_rad)) / _math.pi)
-                / 2.0
-                * n
-            )
-            x = max(0, min(n - 1, x))
-            y = max(0, min(n - 1, y))
-            tile_path = f"tiles/{z}/{x}/{y}"
-            urls.append(tilejson_url.replace("tilejson.json", tile_path, 1))
-
-        timeout = aiohttp.ClientTimeout(total=10)
-        async with aiohttp.ClientSession(timeout=timeout) as session:
-            async def _fetch(u: str):
-                try:
-                    async with session.get(u) as resp:
-                        # Drain to ensure TiTiler actually renders the tile
-                        await resp.read()
-                        logger.info(f"[PREWARM] {resp.status} {u[:120]}")
-                except Exception as _e:
-                    logger.debug(f"[PREWARM] miss {_e}")
-
-            await asyncio.gather(*(_fetch(u) for u in urls), return_exceptions=True)
-    except Exception as e:
-        logger.debug(f"[PREWARM] skipped: {e}")
+        from pro_stac_client import feature_is_pro as _feature_is_pro
+    except Exception:
+        _feature_is_pro = lambda _f: False  # type: ignore[assignment]
+    try:
+        features = (stac_results or {}).get("features") or []
+        keys = {
+            (f.get("collection"), bool(is_pro) or _feature_is_pro(f))
+            for f in features
+            if isinstance(f, dict) and f.get("collection")
+        }
+        await get_renders_resolver().ensure(keys)
+    except Exception as exc:  # pragma: no cover - defensive
+        logger.debug(f"[RENDERS] warm-up skipped: {exc}")
 
 
 def clean_tilejson_urls(stac_results: Dict[str, Any], is_pro: bool = False, user_query: Optional[str] = None, explicit_preset: Optional[str] = None) -> Dict[str, Any]:
@@ -2446,6 +2504,85 @@ async def teams_bot_messages(request: Request):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _tile_cache_stats() -> Dict[str, Any]:
+    try:
+        from tile_cache import get_tile_cache
+        return get_tile_cache().stats()
+    except Exception as exc:  # pragma: no cover - defensive
+        return {"error": str(exc)}
+
+
+def _session_store_stats() -> Dict[str, Any]:
+    try:
+        from pipeline.session_store import get_session_backend
+        return get_session_backend().stats()
+    except Exception as exc:  # pragma: no cover - defensive
+        return {"error": str(exc)}
+
+
+def _sas_signer_stats() -> Dict[str, Any]:
+    try:
+        from sas_signer import get_sas_signer
+        return get_sas_signer().stats()
+    except Exception as exc:  # pragma: no cover - defensive
+        return {"error": str(exc)}
+
+
+def _cmip6_refs_stats() -> Dict[str, Any]:
+    try:
+        from geoint import cmip6_refs
+        return cmip6_refs.stats()
+    except Exception as exc:  # pragma: no cover - defensive
+        return {"error": str(exc)}
+
+
+def _result_cache_stats() -> Dict[str, Any]:
+    try:
+        import result_cache
+        return result_cache.stats()
+    except Exception as exc:  # pragma: no cover - defensive
+        return {"error": str(exc)}
+
+
+def _llm_gateway_stats() -> Dict[str, Any]:
+    try:
+        from _framework import llm_client
+        return llm_client.stats()
+    except Exception as exc:  # pragma: no cover - defensive
+        return {"error": str(exc)}
+
+
+def _mosaic_registry_stats() -> Dict[str, Any]:
+    try:
+        import mosaic_registry
+        return mosaic_registry.stats()
+    except Exception as exc:  # pragma: no cover - defensive
+        return {"error": str(exc)}
+
+
+def _tile_prefetch_stats() -> Dict[str, Any]:
+    try:
+        import tile_prefetcher
+        return tile_prefetcher.stats()
+    except Exception as exc:  # pragma: no cover - defensive
+        return {"error": str(exc)}
+
+
+def _renders_resolver_stats() -> Dict[str, Any]:
+    try:
+        return get_renders_resolver().stats()
+    except Exception as exc:  # pragma: no cover - defensive
+        return {"error": str(exc)}
+
+
+def _stac_item_cache_stats() -> Dict[str, Any]:
+    try:
+        from stac_item_cache import get_stac_item_cache
+        return get_stac_item_cache().stats()
+    except Exception as exc:  # pragma: no cover - defensive
+        return {"error": str(exc)}
+
+
 @app.get("/api/health")
 async def health_check():
     """Lightweight health check — no GPT calls, no verbose logging."""
@@ -2464,9 +2601,11 @@ async def health_check():
 
         # 2. STAC API — quick GET, no search
         try:
-            async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=5)) as session:
-                async with session.get(cloud_cfg.stac_catalog_url + "/") as resp:
-                    checks["stac_api"] = {"status": "connected" if resp.status == 200 else "degraded"}
+            session = http_pool.get_session(http_pool.POOL_STAC)
+            async with session.get(
+                cloud_cfg.stac_catalog_url + "/", timeout=aiohttp.ClientTimeout(total=5)
+            ) as resp:
+                checks["stac_api"] = {"status": "connected" if resp.status == 200 else "degraded"}
         except Exception:
             checks["stac_api"] = {"status": "degraded"}
 
@@ -2479,6 +2618,13 @@ async def health_check():
             checks["azure_maps"] = {"status": "misconfigured"}
             all_healthy = False
 
+        # The SQLite stores count their rows (and the registry may connect to
+        # Redis on first use): keep that off the event loop.
+        session_store = await asyncio.to_thread(_session_store_stats)
+        mosaic_registry_stats = await asyncio.to_thread(_mosaic_registry_stats)
+        stac_item_cache_stats = await asyncio.to_thread(_stac_item_cache_stats)
+        result_cache_stats = await asyncio.to_thread(_result_cache_stats)
+
         overall = "healthy" if all_healthy else "degraded"
         logger.info(f"[BLDG] Health: {overall} | openai={checks['azure_openai']['status']} stac={checks['stac_api']['status']} maps={checks['azure_maps']['status']}")
 
@@ -2487,6 +2633,21 @@ async def health_check():
                 "status": overall,
                 "timestamp": datetime.now().strftime("%Y-%m-%dT%H:%M:%SZ"),
                 "checks": checks,
+                # Informational only -- pool / cache counters never flip health.
+                "http_pools": http_pool.stats(),
+                "tile_cache": _tile_cache_stats(),
+                "session_store": session_store,
+                "stac_item_cache": stac_item_cache_stats,
+                "sas_signer": _sas_signer_stats(),
+                "raster_io": raster_env.stats(),
+                "raster_pool": raster_pool.stats(),
+                "cmip6_refs": _cmip6_refs_stats(),
+                "result_cache": result_cache_stats,
+                "llm_gateway": _llm_gateway_stats(),
+                "query_understanding": get_query_understanding_stats(),
+                "renders_resolver": _renders_resolver_stats(),
+                "mosaic_registry": mosaic_registry_stats,
+                "tile_prefetch": _tile_prefetch_stats(),
             },
             status_code=200 if all_healthy else 503,
         )
@@ -2604,7 +2765,7 @@ async def stac_probe(
             content={**report, "error": f"AAD token acquisition failed for audience {PRO_AUDIENCE}: {exc}"},
         )
 
-    async with aiohttp.ClientSession() as session:
+    async with http_pool.session(http_pool.POOL_PRO) as session:
         try:
             payload = await pro_get(session, f"{pro_base}/collections")
             cols = payload.get("collections", []) if isinstance(payload, dict) else []
@@ -2669,8 +2830,7 @@ async def list_pro_collections():
     if not base:
         return {"configured": False, "collections": []}
 
-    async with aiohttp.ClientSession() as session:
-        cols = await pro_list_collections(session)
+    cols = await pro_list_collections(http_pool.get_session(http_pool.POOL_PRO))
 
     return {
         "configured": True,
@@ -2700,6 +2860,9 @@ async def debug_collection_index(mode: Optional[str] = None, q: Optional[str] =
       mode : ``public`` | ``pro`` -- restrict listing to one source
       q    : free-text query; when present, returns ``search()`` ranking
       k    : top-K for ``q`` (default 8)
+
+    ``health`` includes the embedding store and query-embedding cache
+    counters (``query_embedding_cache.hit_rate``).
     """
     try:
         from collection_index import get_collection_index
@@ -2741,7 +2904,7 @@ async def sign_mosaic_url(request: Request):
             return {"signed_url": mosaic_url, "authenticated": False}
         
         try:
-            signed_url = planetary_computer.sign(mosaic_url)
+            signed_url = sas_signer.sign_url(mosaic_url)
         except Exception as sign_error:
             logger.error(f"[LOCK] [SIGN-MOSAIC-URL] sign() failed: {sign_error}")
             signed_url = mosaic_url
@@ -2769,7 +2932,6 @@ async def sign_mosaic_url(request: Request):
 @app.post("/api/proxy-tilejson")
 async def proxy_tilejson(request: Request):
     """Proxy TileJSON requests through the backend to avoid browser CORS/network issues"""
-    import httpx
     try:
         body = await request.json()
         tilejson_url = body.get('url')
@@ -2786,14 +2948,32 @@ async def proxy_tilejson(request: Request):
         # Sign the URL if possible
         if PLANETARY_COMPUTER_AVAILABLE:
             try:
-                tilejson_url = planetary_computer.sign(tilejson_url)
+                tilejson_url = sas_signer.sign_url(tilejson_url)
             except Exception as sign_err:
                 logger.warning(f"[PROXY-TILEJSON] sign() failed: {sign_err}")
         
-        async with httpx.AsyncClient(timeout=15.0) as client:
-            resp = await client.get(tilejson_url)
-            resp.raise_for_status()
-            data = resp.json()
+        client = http_pool.get_httpx_client(http_pool.POOL_STAC)
+        if stream_proxy.streaming_enabled():
+            resp = await client.send(
+                client.build_request("GET", tilejson_url, timeout=15.0), stream=True
+            )
+            if resp.status_code >= 400:
+                # Buffer error bodies so the failure is logged with context.
+                try:
+                    preview = (await resp.aread())[:300].decode("utf-8", errors="replace")
+                finally:
+                    await resp.aclose()
+                logger.error(f"[PROXY-TILEJSON] [FAIL] upstream {resp.status_code}: {preview}")
+                raise HTTPException(
+                    status_code=502,
+                    detail=f"Failed to fetch TileJSON: upstream returned {resp.status_code}",
+                )
+            logger.info(f"[PROXY-TILEJSON] [OK] streaming {resp.status_code} {resp.headers.get('content-type')}")
+            return stream_proxy.stream_httpx(resp)
+
+        resp = await client.get(tilejson_url, timeout=15.0)
+        resp.raise_for_status()
+        data = resp.json()
         
         logger.info(f"[PROXY-TILEJSON] [OK] tiles={len(data.get('tiles', []))} minzoom={data.get('minzoom')} maxzoom={data.get('maxzoom')}")
         return data
@@ -3105,7 +3285,6 @@ async def pro_tilejson_proxy(request: Request):
       color_formula, ... -- forwarded verbatim into the tile URL query
     """
     from pro_stac_client import get_pro_stac_base, get_pro_data_base, pro_get
-    import aiohttp
     from urllib.parse import parse_qs
 
     pro_stac_base = get_pro_stac_base()
@@ -3137,7 +3316,7 @@ async def pro_tilejson_proxy(request: Request):
     pro_render_options: List[Dict[str, Any]] = []
     try:
         item_url = f"{pro_stac_base}/collections/{collection}/items/{item}"
-        async with aiohttp.ClientSession() as session:
+        async with http_pool.session(http_pool.POOL_PRO) as session:
             item_doc = await pro_get(session, item_url, timeout=10.0)
             # Fetch GeoCatalog-stored render-options in the same session.
             # These are authored via the MCP ``configure_personal_collection
@@ -3343,7 +3522,7 @@ async def pro_mosaic_tilejson_proxy(request: Request):
     pro_render_options: List[Dict[str, Any]] = []
     if pro_stac_base:
         try:
-            async with _aiohttp.ClientSession() as session:
+            async with http_pool.session(http_pool.POOL_PRO) as session:
                 pro_render_options = await _fetch_pro_render_options(
                     session, pro_stac_base, collection
                 )
@@ -3480,7 +3659,7 @@ async def pro_mosaic_tilejson_proxy(request: Request):
             import yarl as _yarl
             tj_url = _yarl.URL(f"{upstream_tj}?{upstream_q}", encoded=True)
             tj_headers = await _pro_auth()
-            async with _aiohttp.ClientSession() as session:
+            async with http_pool.session(http_pool.POOL_PRO) as session:
                 async with session.get(
                     tj_url, headers=tj_headers,
                     timeout=_aiohttp.ClientTimeout(total=10.0),
@@ -3543,8 +3722,17 @@ async def pro_tile_proxy(rest: str, request: Request):
     (path layout from the GeoCatalog tilejson, with the host swapped) and
     we forward it to ``{pro_data_base}/{rest}`` with AAD + ``api-version``.
     The raw response bytes (PNG/JPEG/JSON) are streamed back unchanged.
+
+    Successful tiles go through :mod:`tile_cache` (memory LRU + optional
+    disk tier, upstream ``ETag`` revalidation, single-flight misses), and
+    a browser ``If-None-Match`` that matches the tile's ETag gets a 304.
+    Cold misses are streamed through :mod:`stream_proxy` while the cache
+    copy is assembled; error bodies stay buffered so they can be logged,
+    and so do tiles without an upstream ``ETag`` -- the cache derives one
+    from the bytes, and the first response must carry that same value.
     """
     from pro_stac_client import get_pro_data_base, _auth_headers, PRO_API_VERSION
+    from tile_cache import TileResult, UpstreamTile, cache_key, etag_matches, get_tile_cache
     import aiohttp
     import yarl
     from starlette.responses import Response as StarletteResponse
@@ -3570,24 +3758,124 @@ async def pro_tile_proxy(rest: str, request: Request):
     # (no double encoding of '+', ',', '%20', '@', etc.).
     upstream_yarl = yarl.URL(upstream_full, encoded=True)
 
-    try:
+    async def _fetch_upstream(if_none_match: Optional[str]) -> UpstreamTile:
         headers = await _auth_headers()
-        async with aiohttp.ClientSession() as session:
-            async with session.get(
+        if if_none_match:
+            headers["If-None-Match"] = if_none_match
+        session = http_pool.get_session(http_pool.POOL_PRO)
+        async with session.get(
+            upstream_yarl, headers=headers, timeout=aiohttp.ClientTimeout(total=20.0)
+        ) as r:
+            return UpstreamTile(
+                status=r.status,
+                body=await r.read(),
+                content_type=r.headers.get("Content-Type", "application/octet-stream"),
+                etag=r.headers.get("ETag"),
+                cache_control=r.headers.get("Cache-Control"),
+            )
+
+    cache = get_tile_cache()
+    key = cache_key(rest, raw_query)
+
+    async def _stream_miss():
+        """Cold miss: forward the body as it arrives, caching it at the end.
+
+        Returns a ``StreamingResponse`` for 200s with an upstream ETag, or
+        a buffered ``TileResult`` for anything else (error bodies are
+        logged; ETag-less tiles get the cache's content hash as ETag).
+        """
+        fill = cache.begin_fill(key)
+        try:
+            headers = await _auth_headers()
+            r = await http_pool.get_session(http_pool.POOL_PRO).get(
                 upstream_yarl, headers=headers, timeout=aiohttp.ClientTimeout(total=20.0)
-            ) as r:
+            )
+        except Exception as exc:
+            fill.fail(exc)
+            raise
+        except BaseException:
+            fill.abort()
+            raise
+        ctype = r.headers.get("Content-Type", "application/octet-stream")
+        if r.status != 200:
+            try:
                 body = await r.read()
-                ctype = r.headers.get("Content-Type", "application/octet-stream")
-                status = r.status
+            finally:
+                r.release()
+            return await fill.complete(
+                UpstreamTile(status=r.status, body=body, content_type=ctype)
+            )
+
+        up_etag = r.headers.get("ETag")
+        cache_control = r.headers.get("Cache-Control")
+        if not up_etag:
+            # Headers go out before the body, so a streamed response could
+            # never carry the sha1 ETag later cache hits are served with.
+            try:
+                body = await r.read()
+            except Exception as exc:
+                fill.fail(exc)
+                raise
+            finally:
+                r.release()
+            return await fill.complete(UpstreamTile(
+                status=200, body=body, content_type=ctype, cache_control=cache_control,
+            ))
+
+        resp_headers = {"ETag": up_etag}
+        if cache_control:
+            resp_headers["Cache-Control"] = cache_control
+        if etag_matches(request.headers.get("if-none-match"), up_etag):
+            r.close()
+            fill.abort()
+            return StarletteResponse(status_code=304, headers=resp_headers)
+
+        async def _store(body: bytes) -> None:
+            await fill.complete(UpstreamTile(
+                status=200, body=body, content_type=ctype,
+                etag=up_etag, cache_control=cache_control,
+            ))
+
+        logger.info("[PRO-TILE] %d %s (streaming) %s", r.status, ctype, rest)
+        return stream_proxy.stream_aiohttp(
+            r, media_type=ctype, headers=resp_headers,
+            on_complete=_store, on_abort=fill.abort,
+        )
+
+    try:
+        if (
+            stream_proxy.streaming_enabled()
+            and not cache.has_entry(key)
+            and not cache.is_inflight(key)
+        ):
+            outcome = await _stream_miss()
+            if not isinstance(outcome, TileResult):
+                return outcome
+            tile = outcome
+        else:
+            tile = await cache.get_or_fetch(key, _fetch_upstream)
+        body, ctype, status = tile.body, tile.content_type, tile.status
         if status >= 400:
             preview = body[:300].decode("utf-8", errors="replace") if body else ""
             logger.warning(
                 "[PRO-TILE] upstream %d for %s | url=%s | body=%s",
                 status, rest, upstream_full, preview,
             )
-        else:
-            logger.info("[PRO-TILE] %d %s (%d bytes) %s", status, ctype, len(body), rest)
-        return StarletteResponse(content=body, status_code=status, media_type=ctype)
+            return StarletteResponse(content=body, status_code=status, media_type=ctype)
+
+        resp_headers = {"ETag": tile.etag} if tile.etag else {}
+        if tile.cache_control:
+            resp_headers["Cache-Control"] = tile.cache_control
+        if etag_matches(request.headers.get("if-none-match"), tile.etag):
+            logger.debug("[PRO-TILE] 304 (%s) %s", tile.source, rest)
+            return StarletteResponse(status_code=304, headers=resp_headers)
+        logger.info(
+            "[PRO-TILE] %d %s (%d bytes, %s) %s",
+            status, ctype, len(body), tile.source, rest,
+        )
+        return StarletteResponse(
+            content=body, status_code=status, media_type=ctype, headers=resp_headers
+        )
     except HTTPException:
         raise
     except Exception as exc:
@@ -3803,6 +4091,60 @@ async def sites_audit(request: Request):
         raise HTTPException(status_code=502, detail=f"Site audit error: {exc}")
 
 
+@app.post("/api/sites/audit/batch")
+async def sites_audit_batch(request: Request):
+    """Audit many candidate sites in one pass; NDJSON in ranked order.
+
+    Body: a list of ``{lat, lng, claimed_mw?, id?}``, ``{"sites": [...]}``,
+    or a GeoJSON ``FeatureCollection`` of Points. Optional top-level keys
+    (object bodies only): ``claimed_mw`` (default for sites without one),
+    ``user_query``, ``include_hazards`` / ``include_precedent`` (default
+    true), ``include_evidence`` (default false), ``top_n``.
+
+    The Fabric tables load once, hazards are sampled per STAC item and
+    precedent is searched once per capacity — see
+    ``agents.site_audit_batch``. Response lines are
+    ``{"type": "site", "rank": n, ...}`` followed by one
+    ``{"type": "summary", ...}`` trailer.
+    """
+    from fastapi.responses import StreamingResponse
+
+    from agents.site_audit_batch import audit_sites_batch, iter_ndjson, parse_sites
+
+    assertion = _require_fabric_assertion(request)
+    body = await request.json()
+    opts = body if isinstance(body, dict) else {}
+
+    def _flag(name: str, default: bool) -> bool:
+        v = opts.get(name, default)
+        return v if isinstance(v, bool) else str(v).lower() in ("1", "true", "yes", "on")
+
+    try:
+        sites = parse_sites(body, default_mw=float(opts.get("claimed_mw") or 200))
+        top_n = int(opts["top_n"]) if opts.get("top_n") is not None else None
+    except (TypeError, ValueError) as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+    try:
+        batch = await audit_sites_batch(
+            user_assertion=assertion,
+            sites=sites,
+            user_query=opts.get("user_query") or opts.get("query"),
+            include_hazards=_flag("include_hazards", True),
+            include_precedent=_flag("include_precedent", True),
+            include_evidence=_flag("include_evidence", False),
+        )
+    except fabric_client.FabricNotConfigured as exc:
+        raise HTTPException(status_code=503, detail=str(exc))
+    except Exception as exc:
+        logger.exception("[SITE_AUDIT] batch failed")
+        raise HTTPException(status_code=502, detail=f"Site audit error: {exc}")
+
+    if top_n is not None:
+        batch["results"] = batch["results"][:max(0, top_n)]
+    return StreamingResponse(iter_ndjson(batch), media_type="application/x-ndjson")
+
+
 @app.post("/api/sites/audit/stream")
 async def sites_audit_stream(request: Request):
     """Streaming variant of :func:`sites_audit` — Server-Sent Events.
@@ -4359,6 +4701,10 @@ async def unified_query_processor(request: Request):
         # Support both 'query' and 'user_query' keys (frontend uses 'user_query')
         natural_query = req_body.get('query') or req_body.get('user_query') or 'No query provided'
         session_id = req_body.get('session_id') or req_body.get('conversation_id')
+        # A new query supersedes the tile prefetch of the session's last map.
+        _tile_prefetcher = get_tile_prefetcher()
+        if _tile_prefetcher is not None:
+            _tile_prefetcher.cancel(session_id)
         pin = req_body.get('pin') or req_body.get('vision_pin')  # Pin {lat, lng} (web-ui sends 'vision_pin')
         selected_model = req_body.get('model', 'gpt-5')  # Model selection from frontend, default to gpt-5
 
@@ -4968,6 +5314,8 @@ async def unified_query_processor(request: Request):
                 except Exception:
                     pass
             
+            _schedule_tile_prefetch(session_id, qs_location['bbox'], mosaic=qs_mosaic, tile_urls=qs_tile_urls)
+            
             # Update session context
             if router_agent and session_id and (qs_tile_urls or qs_features):
                 stac_items_for_session = []
@@ -4994,6 +5342,10 @@ async def unified_query_processor(request: Request):
             _qs_elapsed = (_time.perf_counter() - _qs_start) * 1000
             logger.info(f"[FAST] QUICKSTART FAST PATH completed in {_qs_elapsed:.0f}ms (skipped RouterAgent + translate_query + response GPT)")
             
+            await warm_render_configs(
+                qs_stac_response.get("results", {}),
+                is_pro=(qs_stac_endpoint == "planetary_computer_pro"),
+            )
             cleaned_qs_results = clean_tilejson_urls(
                 qs_stac_response.get("results", {}),
                 is_pro=(qs_stac_endpoint == "planetary_computer_pro"),
@@ -7241,18 +7593,6 @@ async def unified_query_processor(request: Request):
                 
                 if mosaic_result:
                     logger.info(f"[OK] MOSAIC: Successfully registered mosaic for {collection_id}")
-                    # PERF: fire-and-forget tile prewarm — populates TiTiler render cache
-                    # for the bbox center at z=6 and z=8 so the browser's first tile
-                    # requests hit a warm cache instead of triggering cold renders.
-                    # Wrapped in a helper that swallows all exceptions; cannot affect
-                    # the response path.
-                    try:
-                        asyncio.create_task(_prewarm_mosaic_tiles(
-                            mosaic_result.get("tilejson_url"),
-                            stac_query.get("bbox"),
-                        ))
-                    except Exception as _pw_e:
-                        logger.debug(f"[PREWARM] schedule failed: {_pw_e}")
                 else:
                     logger.warning(f"[WARN] MOSAIC: Registration failed for {collection_id}, will use item tiles")
             except Exception as e:
@@ -7386,8 +7726,20 @@ async def unified_query_processor(request: Request):
                         stac_params["bbox"] = union_bbox
                         logger.info(f"[OK] Updated stac_params bbox to union: {union_bbox}")
 
+        # PERF: warm the first-paint tiles (mosaic + item layers) so the
+        # browser's first tile requests hit a warm TiTiler cache.
+        _schedule_tile_prefetch(
+            session_id,
+            (stac_query.get("bbox") if stac_query else None) or (stac_params.get("bbox") if stac_params else None),
+            mosaic=mosaic_result,
+            tile_urls=all_tile_urls,
+        )
         
         # Clean up STAC results to remove problematic asset_bidx parameters
+        await warm_render_configs(
+            stac_response.get("results", {}),
+            is_pro=(stac_endpoint == "planetary_computer_pro"),
+        )
         cleaned_stac_results = clean_tilejson_urls(
             stac_response.get("results", {}),
             is_pro=(stac_endpoint == "planetary_computer_pro"),
@@ -7640,6 +7992,10 @@ async def stac_search(request: Request):
         
         # Clean tilejson URLs in the response
         if stac_response.get("success") and "results" in stac_response:
+            await warm_render_configs(
+                stac_response["results"],
+                is_pro=(stac_endpoint == "planetary_computer_pro"),
+            )
             stac_response["results"] = clean_tilejson_urls(
                 stac_response["results"],
                 is_pro=(stac_endpoint == "planetary_computer_pro"),
@@ -7678,6 +8034,10 @@ async def veda_search(request: Request):
         
         # Clean tilejson URLs in the response
         if stac_response.get("success") and "results" in stac_response:
+            await warm_render_configs(
+                stac_response["results"],
+                is_pro=(stac_endpoint == "planetary_computer_pro"),
+            )
             stac_response["results"] = clean_tilejson_urls(
                 stac_response["results"],
                 is_pro=(stac_endpoint == "planetary_computer_pro"),
@@ -7801,6 +8161,10 @@ async def structured_search(request: Request):
         
         # Clean tilejson URLs
         if "results" in stac_response:
+            await warm_render_configs(
+                stac_response["results"],
+                is_pro=(stac_endpoint == "planetary_computer_pro"),
+            )
             stac_response["results"] = clean_tilejson_urls(
                 stac_response["results"],
                 is_pro=(stac_endpoint == "planetary_computer_pro"),
@@ -8283,49 +8647,38 @@ async def geoint_terrain_analysis(request: Request):
         if agent_result is None:
             logger.info(f"[MTN] [{request_id}] Using direct terrain tool fallback (PE lockdown)")
             from geoint.terrain_tools import get_elevation_analysis, get_slope_analysis, find_flat_areas, analyze_flood_risk, analyze_environmental_sensitivity
-            from openai import AsyncAzureOpenAI
-            from azure.identity import DefaultAzureCredential, get_bearer_token_provider as _gbt
-            _aoai_endpoint = os.getenv("AZURE_AI_PROJECT_ENDPOINT") or os.getenv("AZURE_OPENAI_ENDPOINT")
-            if not _aoai_endpoint:
-                raise ValueError("AZURE_AI_PROJECT_ENDPOINT or AZURE_OPENAI_ENDPOINT environment variable is required")
-            _terrain_client = AsyncAzureOpenAI(
-                azure_endpoint=_aoai_endpoint,
-                api_key=os.environ.get("AZURE_OPENAI_API_KEY"),
-                azure_ad_token_provider=_gbt(
-                    DefaultAzureCredential(), "https://cognitiveservices.azure.com/.default"
-                ) if not os.environ.get("AZURE_OPENAI_API_KEY") else None,
-                api_version="2024-12-01-preview",
-            )
+            from _framework.llm_client import get_llm_client
+            _terrain_client = get_llm_client(os.getenv("AZURE_OPENAI_DEPLOYMENT_NAME", "gpt-5"), api_version="2024-12-01-preview")
             
             tool_results = {}
             tool_calls_made = []
             
             try:
-                tool_results["elevation"] = get_elevation_analysis(latitude, longitude, radius_km)
+                tool_results["elevation"] = await get_elevation_analysis(latitude, longitude, radius_km)
                 tool_calls_made.append("get_elevation_analysis")
             except Exception as te:
                 logger.warning(f"[MTN] [{request_id}] Elevation tool failed: {te}")
             
             try:
-                tool_results["slope"] = get_slope_analysis(latitude, longitude, radius_km)
+                tool_results["slope"] = await get_slope_analysis(latitude, longitude, radius_km)
                 tool_calls_made.append("get_slope_analysis")
             except Exception as te:
                 logger.warning(f"[MTN] [{request_id}] Slope tool failed: {te}")
             
             try:
-                tool_results["flat_areas"] = find_flat_areas(latitude, longitude, radius_km)
+                tool_results["flat_areas"] = await find_flat_areas(latitude, longitude, radius_km)
                 tool_calls_made.append("find_flat_areas")
             except Exception as te:
                 logger.warning(f"[MTN] [{request_id}] Flat areas tool failed: {te}")
             
             try:
-                tool_results["flood_risk"] = analyze_flood_risk(latitude, longitude, radius_km)
+                tool_results["flood_risk"] = await analyze_flood_risk(latitude, longitude, radius_km)
                 tool_calls_made.append("analyze_flood_risk")
             except Exception as te:
                 logger.warning(f"[MTN] [{request_id}] Flood risk tool failed: {te}")
             
             try:
-                tool_results["environment"] = analyze_environmental_sensitivity(latitude, longitude, radius_km)
+                tool_results["environment"] = await analyze_environmental_sensitivity(latitude, longitude, radius_km)
                 tool_calls_made.append("analyze_environmental_sensitivity")
             except Exception as te:
                 logger.warning(f"[MTN] [{request_id}] Environment tool failed: {te}")
@@ -8339,7 +8692,7 @@ async def geoint_terrain_analysis(request: Request):
                     clean_b64 = screenshot
                     if clean_b64.startswith('data:image'):
                         clean_b64 = clean_b64.split(',', 1)[1]
-                    vision_resp = await _terrain_client.chat.completions.create(
+                    vision_resp = await _terrain_client.create(
                         model=os.getenv("AZURE_OPENAI_DEPLOYMENT_NAME", "gpt-5"),
                         messages=[
                             {"role": "system", "content": "You are an expert terrain analyst. Analyze satellite imagery for terrain features. Be concise: respond in <=5 short bullets."},
@@ -8494,12 +8847,14 @@ async def geoint_terrain_chat(request: Request):
         if result is None:
             logger.info(f"[MSG] [{request_id}] Using direct terrain tool fallback (PE lockdown)")
             from geoint.terrain_tools import get_elevation_analysis, get_slope_analysis, find_flat_areas, analyze_flood_risk
+            from _framework.llm_client import get_llm_client
+            _terrain_client = get_llm_client(os.getenv("AZURE_OPENAI_DEPLOYMENT_NAME", "gpt-5"), api_version="2024-12-01-preview")
             
             tool_results = {}
             for name, fn in [("elevation", get_elevation_analysis), ("slope", get_slope_analysis),
                              ("flat_areas", find_flat_areas), ("flood_risk", analyze_flood_risk)]:
                 try:
-                    tool_results[name] = fn(latitude, longitude, radius_km)
+                    tool_results[name] = await fn(latitude, longitude, radius_km)
                 except Exception:
                     pass
             
@@ -8508,7 +8863,7 @@ async def geoint_terrain_chat(request: Request):
             # Synthesize with _terrain_client
             synthesis_prompt = f"User question: {message}\n\nTerrain data for ({latitude:.4f}, {longitude:.4f}):\n{tool_summary}"
             try:
-                synth_resp = await _terrain_client.chat.completions.create(
+                synth_resp = await _terrain_client.create(
                     model=os.getenv("AZURE_OPENAI_DEPLOYMENT_NAME", "gpt-5"),
                     messages=[
                         {"role": "system", "content": "You are a terrain analysis expert. Synthesize the provided DEM/terrain tool data into a clear, concise answer in <=6 short bullets."},
@@ -8991,19 +9346,8 @@ async def geoint_building_damage_analysis(request: Request):
         agent_start = time.time()
         
         # Create vision client for GPT-5 screenshot analysis
-        from openai import AsyncAzureOpenAI
-        from azure.identity import DefaultAzureCredential, get_bearer_token_provider as _gbt
-        _aoai_endpoint = os.getenv("AZURE_AI_PROJECT_ENDPOINT") or os.getenv("AZURE_OPENAI_ENDPOINT")
-        if not _aoai_endpoint:
-            raise ValueError("AZURE_AI_PROJECT_ENDPOINT or AZURE_OPENAI_ENDPOINT environment variable is required")
-        _vision_client = AsyncAzureOpenAI(
-            azure_endpoint=_aoai_endpoint,
-            api_key=os.environ.get("AZURE_OPENAI_API_KEY"),
-            azure_ad_token_provider=_gbt(
-                DefaultAzureCredential(), "https://cognitiveservices.azure.com/.default"
-            ) if not os.environ.get("AZURE_OPENAI_API_KEY") else None,
-            api_version="2024-12-01-preview",
-        )
+        from _framework.llm_client import get_llm_client
+        _vision_client = get_llm_client(os.getenv("AZURE_OPENAI_DEPLOYMENT_NAME", "gpt-5"), api_version="2024-12-01-preview")
         
         # ── PATH 1: Screenshot provided — analyze the loaded map imagery ──
         # When the user has loaded data (NAIP, Sentinel-2, Landsat, etc.) and
@@ -9050,7 +9394,7 @@ async def geoint_building_damage_analysis(request: Request):
                 prompt += f"\nUser question: {user_query}\n"
             
             try:
-                vision_response = await _vision_client.chat.completions.create(
+                vision_response = await _vision_client.create(
                     model=os.getenv("AZURE_OPENAI_DEPLOYMENT_NAME", "gpt-5"),
                     messages=[
                         {"role": "system", "content": "You are a GEOINT Building Damage Assessment expert. Analyze the provided imagery and give structured damage assessments. Keep the response concise."},
@@ -9134,7 +9478,7 @@ async def geoint_building_damage_analysis(request: Request):
                     if clean_b64.startswith('data:image'):
                         clean_b64 = clean_b64.split(',', 1)[1]
                     
-                    vision_response = await _vision_client.chat.completions.create(
+                    vision_response = await _vision_client.create(
                         model=os.getenv("AZURE_OPENAI_DEPLOYMENT_NAME", "gpt-5"),
                         messages=[
                             {"role": "system", "content": "You are an expert in structural damage assessment from satellite imagery. Provide concise, factual analysis (<=6 bullets)."},
@@ -9312,21 +9656,10 @@ async def geoint_extreme_weather_analysis(request: Request):
                             location_name = f"({latitude:.4f}, {longitude:.4f})"
                     
                     # Single LLM call to format the raw data into prose
-                    from openai import AsyncAzureOpenAI
-                    from azure.identity import DefaultAzureCredential, get_bearer_token_provider as _gbt
-                    _aoai_endpoint = os.getenv("AZURE_AI_PROJECT_ENDPOINT") or os.getenv("AZURE_OPENAI_ENDPOINT")
-                    if not _aoai_endpoint:
-                        raise ValueError("AZURE_AI_PROJECT_ENDPOINT or AZURE_OPENAI_ENDPOINT environment variable is required")
-                    _fmt_client = AsyncAzureOpenAI(
-                        azure_endpoint=_aoai_endpoint,
-                        api_key=os.environ.get("AZURE_OPENAI_API_KEY"),
-                        azure_ad_token_provider=_gbt(
-                            DefaultAzureCredential(), "https://cognitiveservices.azure.com/.default"
-                        ) if not os.environ.get("AZURE_OPENAI_API_KEY") else None,
-                        api_version="2024-12-01-preview",
-                    )
+                    from _framework.llm_client import get_llm_client
+                    _fmt_client = get_llm_client(os.environ.get("AZURE_OPENAI_FAST_DEPLOYMENT", "gpt-4o-mini"), api_version="2024-12-01-preview")
                     
-                    fmt_resp = await _fmt_client.chat.completions.create(
+                    fmt_resp = await _fmt_client.create(
                         model=os.environ.get("AZURE_OPENAI_FAST_DEPLOYMENT", "gpt-4o-mini"),
                         messages=[
                             {"role": "system", "content": "You are a climate analyst. Format the provided climate projection data into a clear, informative summary. Use the same style and formatting as your normal extreme weather analysis responses. Include all available metrics with their values and units."},
@@ -9425,21 +9758,10 @@ async def geoint_extreme_weather_analysis(request: Request):
                             location_name = f"({latitude:.4f}, {longitude:.4f})"
                     
                     # Single LLM call to format comparison data into prose
-                    from openai import AsyncAzureOpenAI
-                    from azure.identity import DefaultAzureCredential, get_bearer_token_provider as _gbt
-                    _aoai_endpoint = os.getenv("AZURE_AI_PROJECT_ENDPOINT") or os.getenv("AZURE_OPENAI_ENDPOINT")
-                    if not _aoai_endpoint:
-                        raise ValueError("AZURE_AI_PROJECT_ENDPOINT or AZURE_OPENAI_ENDPOINT environment variable is required")
-                    _fmt_client = AsyncAzureOpenAI(
-                        azure_endpoint=_aoai_endpoint,
-                        api_key=os.environ.get("AZURE_OPENAI_API_KEY"),
-                        azure_ad_token_provider=_gbt(
-                            DefaultAzureCredential(), "https://cognitiveservices.azure.com/.default"
-                        ) if not os.environ.get("AZURE_OPENAI_API_KEY") else None,
-                        api_version="2024-12-01-preview",
-                    )
+                    from _framework.llm_client import get_llm_client
+                    _fmt_client = get_llm_client(os.environ.get("AZURE_OPENAI_FAST_DEPLOYMENT", "gpt-4o-mini"), api_version="2024-12-01-preview")
                     
-                    fmt_resp = await _fmt_client.chat.completions.create(
+                    fmt_resp = await _fmt_client.create(
                         model=os.environ.get("AZURE_OPENAI_FAST_DEPLOYMENT", "gpt-4o-mini"),
                         messages=[
                             {"role": "system", "content": (
@@ -9516,7 +9838,7 @@ async def geoint_extreme_weather_analysis(request: Request):
         
         # ----------------------------------------------------------------
         # If it's a trend query, skip the fast path entirely and let the
-        # agent use the compute_trend tool (5-point linear regression with
+        # agent use the compute_trend tool (multi-year linear regression with
         # R², confidence) instead of the naive 2-year delta comparison.
         # ----------------------------------------------------------------
         if matched_tool and not is_overview_query and not is_comparison_query and not is_trend_query:
@@ -9557,22 +9879,11 @@ async def geoint_extreme_weather_analysis(request: Request):
                     geo_key = f"{latitude:.4f}:{longitude:.4f}"
                     location_name = _reverse_geocode_cache.get(geo_key, f"({latitude:.4f}, {longitude:.4f})")
                     
-                    from openai import AsyncAzureOpenAI
-                    from azure.identity import DefaultAzureCredential, get_bearer_token_provider as _gbt
-                    _aoai_endpoint = os.getenv("AZURE_AI_PROJECT_ENDPOINT") or os.getenv("AZURE_OPENAI_ENDPOINT")
-                    if not _aoai_endpoint:
-                        raise ValueError("AZURE_AI_PROJECT_ENDPOINT or AZURE_OPENAI_ENDPOINT environment variable is required")
-                    _fmt_client = AsyncAzureOpenAI(
-                        azure_endpoint=_aoai_endpoint,
-                        api_key=os.environ.get("AZURE_OPENAI_API_KEY"),
-                        azure_ad_token_provider=_gbt(
-                            DefaultAzureCredential(), "https://cognitiveservices.azure.com/.default"
-                        ) if not os.environ.get("AZURE_OPENAI_API_KEY") else None,
-                        api_version="2024-12-01-preview",
-                    )
+                    from _framework.llm_client import get_llm_client
+                    _fmt_client = get_llm_client(os.environ.get("AZURE_OPENAI_FAST_DEPLOYMENT", "gpt-4o-mini"), api_version="2024-12-01-preview")
                     
                     scenario_desc = "SSP2-4.5 (moderate)" if scenario == "ssp245" else "SSP5-8.5 (worst-case)"
-                    fmt_resp = await _fmt_client.chat.completions.create(
+                    fmt_resp = await _fmt_client.create(
                         model=os.environ.get("AZURE_OPENAI_FAST_DEPLOYMENT", "gpt-4o-mini"),
                         messages=[
                             {"role": "system", "content": (
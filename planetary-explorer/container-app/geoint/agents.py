@@ -16,6 +16,8 @@ import logging
 from typing import Dict, Any, Optional, List
 from datetime import datetime
 
+from raster_env import raster_tool
+
 # LAZY IMPORTS: Agent singletons are created on first use via get_*_agent() functions.
 # Each agent module provides its own singleton accessor.
 
@@ -340,6 +342,7 @@ async def extreme_weather_analysis_agent(
         raise
 
 
+@raster_tool
 async def _download_and_visualize_raster(
     latitude: float,
     longitude: float,
@@ -361,7 +364,7 @@ async def _download_and_visualize_raster(
         Base64-encoded PNG image of the raster data, or None if download fails
     """
     try:
-        import planetary_computer
+        import sas_signer
         import pystac_client
         import rasterio
         from rasterio.windows import from_bounds
@@ -382,7 +385,7 @@ async def _download_and_visualize_raster(
         from cloud_config import cloud_cfg
         catalog = pystac_client.Client.open(
             cloud_cfg.stac_catalog_url,
-            modifier=planetary_computer.sign_inplace
+            modifier=sas_signer.sign_inplace
         )
         
         search = catalog.search(
@@ -412,7 +415,7 @@ async def _download_and_visualize_raster(
             asset_key = list(item.assets.keys())[0]
         
         asset_url = item.assets[asset_key].href
-        signed_url = planetary_computer.sign_url(asset_url)
+        signed_url = sas_signer.sign_url(asset_url)
         
         logger.info(f" Downloading from asset: {asset_key}")
         
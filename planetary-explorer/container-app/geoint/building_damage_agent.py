@@ -17,8 +17,9 @@ import json
 from typing import Dict, Any, Optional, List
 from datetime import datetime
 
-from azure.identity import DefaultAzureCredential, get_bearer_token_provider
-from cloud_config import cloud_cfg
+from azure.identity import DefaultAzureCredential
+from _framework.llm_client import get_llm_client
+from pipeline.session_store import session_map
 
 logger = logging.getLogger(__name__)
 
@@ -102,7 +103,9 @@ class BuildingDamageAgent:
     """
 
     def __init__(self):
-        self.sessions: Dict[str, BuildingDamageSession] = {}
+        # Shared session store (see pipeline.session_store) so any worker or
+        # replica can resume a conversation's Agent Service thread.
+        self.sessions = session_map("building_damage", BuildingDamageSession)
         self._agents_client = None
         self._agent_id: Optional[str] = None
         self._initialized = False
@@ -178,37 +181,33 @@ class BuildingDamageAgent:
         logger.info(f"BuildingDamageAgent initialized: agent_id={agent.id}, model={deployment}")
 
     async def _get_or_create_session(self, session_id: str, latitude: float, longitude: float) -> BuildingDamageSession:
-        if session_id in self.sessions:
-            session = self.sessions[session_id]
+        session = await self.sessions.aget(session_id)
+        if session is not None:
             session.update_location(latitude, longitude)
+            await self.sessions.aset(session_id, session)
             return session
 
         thread = await self._agents_client.threads.create()
         session = BuildingDamageSession(session_id, latitude, longitude, thread.id)
-        self.sessions[session_id] = session
+        await self.sessions.aset(session_id, session)
         logger.info(f"Created new building damage session: {session_id} -> thread: {thread.id}")
         return session
 
     async def _analyze_screenshot_direct(self, screenshot_base64: str, latitude: float, longitude: float) -> Optional[str]:
         """Directly analyze a screenshot using GPT-5 Vision for damage."""
         try:
-            from openai import AsyncAzureOpenAI
-            credential = DefaultAzureCredential()
-            token_provider = get_bearer_token_provider(credential, cloud_cfg.cognitive_services_scope)
-
-            client = AsyncAzureOpenAI(
-                azure_ad_token_provider=token_provider,
+            client = get_llm_client(
+                os.getenv("AZURE_OPENAI_DEPLOYMENT_NAME", "gpt-5"),
                 api_version=os.getenv("AZURE_OPENAI_API_VERSION", "2025-01-01-preview"),
-                azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
-                timeout=120.0
             )
 
             clean_base64 = screenshot_base64
             if screenshot_base64.startswith('data:image'):
                 clean_base64 = screenshot_base64.split(',', 1)[1]
 
-            response = await client.chat.completions.create(
+            response = await client.create(
                 model=os.getenv("AZURE_OPENAI_DEPLOYMENT_NAME", "gpt-5"),
+                timeout=120.0,
                 messages=[
                     {"role": "system", "content": "You are an expert in structural damage assessment from satellite imagery."},
                     {"role": "user", "content": [
@@ -325,7 +324,7 @@ class BuildingDamageAgent:
                         self._initialized = False
                         self._agent_id = None
                         self._agents_client = None
-                        self.sessions.clear()
+                        await self.sessions.adelete(session.session_id)
                         await self._ensure_initialized()
                         continue
                     return {"agent": self.name, "response": f"Error: {run.last_error}", "session_id": session_id}
@@ -356,6 +355,7 @@ class BuildingDamageAgent:
 
                 session.message_count += 2
                 session.last_activity = datetime.utcnow()
+                await self.sessions.aset(session.session_id, session)
 
                 return {
                     "agent": self.name,
@@ -377,7 +377,7 @@ class BuildingDamageAgent:
                     self._initialized = False
                     self._agent_id = None
                     self._agents_client = None
-                    self.sessions.clear()
+                    await self.sessions.adelete(session.session_id)
                     try:
                         await self._ensure_initialized()
                         continue  # Retry with fresh agent
@@ -57,18 +57,11 @@ def _analyze_screenshot_with_vision_sync(screenshot_base64: str, latitude: float
     Uses the high-resolution screenshot the user is actually looking at
     instead of fetching low-res Sentinel-2 imagery.
     """
-    from openai import AzureOpenAI
-    from azure.identity import DefaultAzureCredential, get_bearer_token_provider
-    from cloud_config import cloud_cfg
+    from _framework.llm_client import get_llm_client
 
-    credential = DefaultAzureCredential()
-    token_provider = get_bearer_token_provider(credential, cloud_cfg.cognitive_services_scope)
-
-    client = AzureOpenAI(
-        azure_ad_token_provider=token_provider,
+    client = get_llm_client(
+        os.getenv("AZURE_OPENAI_DEPLOYMENT_NAME", "gpt-5"),
         api_version=os.getenv("AZURE_OPENAI_API_VERSION", "2025-01-01-preview"),
-        azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
-        timeout=60.0,
     )
 
     clean_base64 = screenshot_base64
@@ -97,8 +90,9 @@ def _analyze_screenshot_with_vision_sync(screenshot_base64: str, latitude: float
         "specific observations about building conditions visible in the image."
     )
 
-    response = client.chat.completions.create(
+    response = client.create_sync(
         model=os.getenv("AZURE_OPENAI_DEPLOYMENT_NAME", "gpt-5"),
+        timeout=60.0,
         messages=[
             {"role": "system", "content": system_prompt},
             {"role": "user", "content": [
@@ -27,11 +27,9 @@ import logging
 import os
 import base64
 import aiohttp
-from openai import AzureOpenAI
-from azure.identity import DefaultAzureCredential, get_bearer_token_provider
-from cloud_config import cloud_cfg
+from _framework.llm_client import get_llm_client
 from urllib.parse import urlencode, parse_qs, urlparse
-import planetary_computer
+import sas_signer
 
 logger = logging.getLogger(__name__)
 
@@ -44,34 +42,12 @@ class ChatVisionAnalyzer:
     
     def __init__(self):
         """Initialize chat vision analyzer with Azure OpenAI."""
-        # Support both API key and Managed Identity authentication
-        api_key = os.getenv("AZURE_OPENAI_API_KEY")
-        api_version = os.getenv("AZURE_OPENAI_API_VERSION", "2025-01-01-preview")
-        endpoint = os.getenv("AZURE_OPENAI_ENDPOINT")
-        use_managed_identity = os.getenv("AZURE_OPENAI_USE_MANAGED_IDENTITY", "").lower() == "true"
-        
-        if use_managed_identity or not api_key:
-            # Use Managed Identity authentication (DefaultAzureCredential)
-            logger.info(" ChatVisionAnalyzer: Using Managed Identity for Azure OpenAI authentication")
-            credential = DefaultAzureCredential()
-            token_provider = get_bearer_token_provider(
-                credential, cloud_cfg.cognitive_services_scope
-            )
-            self.client = AzureOpenAI(
-                azure_ad_token_provider=token_provider,
-                api_version=api_version,
-                azure_endpoint=endpoint
-            )
-        else:
-            # Use API key authentication
-            logger.info(" ChatVisionAnalyzer: Using API key for Azure OpenAI authentication")
-            self.client = AzureOpenAI(
-                api_key=api_key,
-                api_version=api_version,
-                azure_endpoint=endpoint
-            )
-        
+        # Shared gateway client (auth: API key or managed identity, see _framework.llm_client)
         self.deployment_name = os.getenv("AZURE_OPENAI_DEPLOYMENT_NAME", "gpt-5")
+        self.client = get_llm_client(
+            self.deployment_name,
+            api_version=os.getenv("AZURE_OPENAI_API_VERSION", "2025-01-01-preview"),
+        )
         
         logger.info(f" ChatVisionAnalyzer initialized with deployment: {self.deployment_name}")
     
@@ -252,7 +228,7 @@ class ChatVisionAnalyzer:
                 
                 # Sign the URL if it's from Planetary Computer
                 if "planetarycomputer.microsoft.com" in imagery_url:
-                    imagery_url = planetary_computer.sign_url(imagery_url)
+                    imagery_url = sas_signer.sign_url(imagery_url)
                 
                 async with aiohttp.ClientSession() as session:
                     async with session.get(imagery_url, timeout=aiohttp.ClientTimeout(total=30)) as response:
@@ -391,7 +367,7 @@ If they ask "what is in this image?" give a comprehensive overview. If they ask
             user_prompt = "\n".join(user_prompt_parts)
             
             # Call GPT-5 Vision
-            response = self.client.chat.completions.create(
+            response = self.client.create_sync(
                 model=self.deployment_name,
                 messages=[
                     {"role": "system", "content": system_prompt},
@@ -0,0 +1,675 @@
+"""
+Chunk Reference Engine for NEX-GDDP-CMIP6 NetCDF assets
+
+``_sample_netcdf``, ``sample_timeseries`` and ``sample_area_stats`` open a
+whole remote NetCDF4 file through fsspec + h5netcdf for every call. Each
+open walks the HDF5 superblock, object headers and chunk B-tree over HTTP
+before a single value is read, and ``.values`` then pulls chunks one
+after another -- which is why the annual paths subsample the daily series
+to ~6-12 days to fit their timeouts. This module indexes an asset once and
+reads only the chunks a request needs:
+
+* **Reference JSON per asset** -- the first read of an asset walks its
+  HDF5 chunk index with h5py (``chunk_iter``) and records, per variable,
+  the Zarr v2 array metadata (shape, chunks, dtype, fill value, zlib /
+  shuffle filters, CF attributes) and the byte range of every chunk, in
+  kerchunk's version-1 reference format. Coordinate variables (lat, lon,
+  time) are small and are inlined, so nearest-cell lookups need no I/O.
+* **Cached on disk** -- references are keyed by the href without its SAS
+  query string and written to ``CMIP6_REFS_DIR`` (plus a small in-memory
+  LRU), so later requests -- and restarts -- skip HDF5 metadata entirely.
+* **Chunk-parallel reads** -- a point or small-area read maps the
+  selection onto chunk keys, fetches those byte ranges in parallel on the
+  shared raster pool and decodes them in NumPy (zlib + HDF5 shuffle), with
+  ``_FillValue`` / ``missing_value`` masked to NaN and ``scale_factor`` /
+  ``add_offset`` applied the way xarray decodes them. Full daily series are
+  read without subsampling.
+* **Fallback** -- every read method returns ``None`` when no reference
+  can be built (other filters, unreachable asset), the variable has an
+  unexpected layout, the read would exceed ``CMIP6_REFS_MAX_READ_MB``, or
+  a chunk cannot be fetched / decoded; callers then use the existing
+  xarray reader. Failed builds are not retried for ``CMIP6_REFS_RETRY_S``.
+
+The reference files can also be opened by kerchunk-aware tooling
+(``xarray.open_dataset("reference://", ...)``) where kerchunk and zarr are
+installed; this module itself needs only h5py and NumPy.
+
+Config:
+  CMIP6_REFS               "0" disables the engine (always use xarray)
+  CMIP6_REFS_DIR           reference cache directory
+                           (default <tmp>/earth-copilot/cmip6-refs)
+  CMIP6_REFS_MEMORY_ITEMS  parsed references kept in memory (default 64)
+  CMIP6_REFS_MAX_READ_MB   largest compressed read served here (default 256)
+  CMIP6_REFS_RETRY_S       back-off after a failed build (default 600)
+"""
+
+import base64
+import hashlib
+import itertools
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from concurrent.futures import CancelledError
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+import raster_env
+import raster_pool
+
+logger = logging.getLogger(__name__)
+
+OpenFile = Callable[[str], Any]  # href -> binary file object
+FetchRange = Callable[[str, int, int], bytes]  # (href, start, end exclusive) -> bytes
+Selection = Union[int, slice]
+
+# Arrays up to this size are stored inline in the reference JSON.
+_INLINE_BYTES = 64 * 1024
+# HDF5 filter ids (H5Zpublic.h) this engine can decode.
+_H5Z_DEFLATE = 1
+_H5Z_SHUFFLE = 2
+# netCDF4 / HDF5 bookkeeping attributes that are not CF metadata.
+_INTERNAL_ATTRS = {
+    "CLASS", "NAME", "REFERENCE_LIST", "DIMENSION_LIST",
+    "_Netcdf4Dimid", "_Netcdf4Coordinates", "_NCProperties", "_nc3_strict",
+}
+
+
+class _TooLarge(Exception):
+    """A read would fetch more than ``max_read_bytes``; served by the xarray reader instead."""
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name) or default)
+    except ValueError:
+        return default
+
+
+def asset_key(href: str) -> str:
+    """Cache key of an asset: its href without the SAS query string."""
+    return href.split("?", 1)[0]
+
+
+# ============================================================
+# REFERENCE BUILDING (h5py)
+# ============================================================
+
+def _json_attr(value: Any) -> Any:
+    if isinstance(value, bytes):
+        return value.decode("utf-8", "replace")
+    if isinstance(value, np.ndarray):
+        value = value.tolist()
+        return value[0] if len(value) == 1 else value
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and not np.isfinite(value):
+        return str(value)
+    return value
+
+
+def _fill_json(value: Any) -> Any:
+    """Zarr v2 ``fill_value`` encoding (NaN / Infinity as strings)."""
+    if value is None:
+        return None
+    value = np.asarray(value).item()
+    if isinstance(value, float):
+        if np.isnan(value):
+            return "NaN"
+        if np.isinf(value):
+            return "Infinity" if value > 0 else "-Infinity"
+    return value
+
+
+def _codecs(dset) -> Optional[Tuple[Optional[dict], List[dict]]]:
+    """Zarr ``(compressor, filters)`` for a dataset's HDF5 filter pipeline, ``None`` if unsupported."""
+    plist = dset.id.get_create_plist()
+    ids = [plist.get_filter(i)[0] for i in range(plist.get_nfilters())]
+    compressor: Optional[dict] = None
+    filters: List[dict] = []
+    for i, code in enumerate(ids):
+        if code == _H5Z_SHUFFLE and compressor is None:
+            filters.append({"id": "shuffle", "elementsize": dset.dtype.itemsize})
+        elif code == _H5Z_DEFLATE and compressor is None:
+            values = plist.get_filter(i)[2]
+            compressor = {"id": "zlib", "level": int(values[0]) if values else 4}
+        else:
+            return None
+    return compressor, filters
+
+
+def _dims(dset) -> List[str]:
+    name = dset.name.rsplit("/", 1)[-1]
+    if dset.ndim == 1 and dset.is_scale:
+        return [name]
+    out = []
+    for i, dim in enumerate(dset.dims):
+        out.append(dim[0].name.rsplit("/", 1)[-1] if len(dim) else f"phony_dim_{i}")
+    return out
+
+
+def _array_refs(name: str, dset, refs: Dict[str, Any]) -> bool:
+    """Add one dataset's metadata and chunk references; ``False`` if it cannot be indexed."""
+    if dset.ndim == 0 or dset.dtype.kind not in "fiub":
+        return False
+    attrs = {k: _json_attr(v) for k, v in dset.attrs.items() if k not in _INTERNAL_ATTRS}
+    fill = dset.attrs.get("_FillValue", dset.fillvalue)
+    attrs["_ARRAY_DIMENSIONS"] = _dims(dset)
+    zarray: Dict[str, Any] = {
+        "zarr_format": 2,
+        "shape": list(dset.shape),
+        "dtype": dset.dtype.str,
+        "fill_value": _fill_json(fill),
+        "order": "C",
+    }
+
+    if dset.size * dset.dtype.itemsize <= _INLINE_BYTES:
+        data = np.ascontiguousarray(dset[()], dtype=dset.dtype)
+        zarray.update(chunks=list(dset.shape), compressor=None, filters=None)
+        refs[f"{name}/" + ".".join("0" * dset.ndim)] = "base64:" + base64.b64encode(data.tobytes()).decode()
+    elif dset.chunks is None:
+        offset = dset.id.get_offset()
+        if offset is None:
+            return False
+        zarray.update(chunks=list(dset.shape), compressor=None, filters=None)
+        refs[f"{name}/" + ".".join("0" * dset.ndim)] = ["{{u}}", int(offset), int(dset.id.get_storage_size())]
+    else:
+        codecs = _codecs(dset)
+        if codecs is None:
+            logger.info(f"[CMIP6-REFS] {name}: unsupported HDF5 filters, not indexed")
+            return False
+        compressor, filters = codecs
+        zarray.update(chunks=list(dset.chunks), compressor=compressor, filters=filters or None)
+        chunks = dset.chunks
+        chunk_refs: Dict[str, list] = {}
+        skipped: List[int] = []
+
+        def _add(info) -> None:
+            if info.filter_mask:
+                skipped.append(1)
+                return
+            key = ".".join(str(o // c) for o, c in zip(info.chunk_offset, chunks))
+            chunk_refs[f"{name}/{key}"] = ["{{u}}", int(info.byte_offset), int(info.size)]
+
+        dset.id.chunk_iter(_add)
+        if skipped:
+            logger.info(f"[CMIP6-REFS] {name}: {len(skipped)} chunks skip a filter, not indexed")
+            return False
+        refs.update(chunk_refs)
+
+    refs[f"{name}/.zarray"] = json.dumps(zarray)
+    refs[f"{name}/.zattrs"] = json.dumps(attrs)
+    return True
+
+
+def build_references(fobj, url: str) -> Dict[str, Any]:
+    """Kerchunk (version 1) reference document for a NetCDF4 / HDF5 file object."""
+    import h5py
+
+    refs: Dict[str, Any] = {".zgroup": json.dumps({"zarr_format": 2})}
+    with h5py.File(fobj, "r") as h5:
+        refs[".zattrs"] = json.dumps({k: _json_attr(v) for k, v in h5.attrs.items() if k not in _INTERNAL_ATTRS})
+        for name, obj in h5.items():
+            if isinstance(obj, h5py.Dataset):
+                _array_refs(name, obj, refs)
+    return {"version": 1, "templates": {"u": asset_key(url)}, "refs": refs}
+
+
+# ============================================================
+# CHUNK DECODING
+# ============================================================
+
+def _unshuffle(raw: bytes, elementsize: int) -> bytes:
+    if elementsize <= 1:
+        return raw
+    n = len(raw) // elementsize
+    body = np.frombuffer(raw, dtype=np.uint8, count=n * elementsize).reshape(elementsize, n)
+    return body.T.tobytes() + raw[n * elementsize:]
+
+
+def decode_chunk(raw: bytes, meta: Dict[str, Any]) -> np.ndarray:
+    """Decode one stored chunk (compressor, then filters in reverse) to its array."""
+    compressor = meta.get("compressor")
+    if compressor:
+        if compressor["id"] != "zlib":
+            raise ValueError(f"unsupported compressor {compressor['id']}")
+        raw = zlib.decompress(raw)
+    for f in reversed(meta.get("filters") or []):
+        if f["id"] != "shuffle":
+            raise ValueError(f"unsupported filter {f['id']}")
+        raw = _unshuffle(raw, int(f["elementsize"]))
+    return np.frombuffer(raw, dtype=np.dtype(meta["dtype"])).reshape(meta["chunks"])
+
+
+class References:
+    """Parsed reference document of one asset (array metadata + decoded inline coordinates)."""
+
+    def __init__(self, doc: Dict[str, Any]) -> None:
+        self.refs: Dict[str, Any] = doc["refs"]
+        self.key = doc.get("templates", {}).get("u", "")
+        self._meta: Dict[str, Optional[Dict[str, Any]]] = {}
+        self._coords: Dict[str, np.ndarray] = {}
+        self._lock = threading.Lock()
+
+    def meta(self, name: str) -> Optional[Dict[str, Any]]:
+        """Zarr array metadata merged with ``attrs`` / ``dims``; ``None`` if the array is not indexed."""
+        with self._lock:
+            if name not in self._meta:
+                zarray = self.refs.get(f"{name}/.zarray")
+                if zarray is None:
+                    self._meta[name] = None
+                else:
+                    meta = json.loads(zarray)
+                    attrs = json.loads(self.refs.get(f"{name}/.zattrs", "{}"))
+                    meta["dims"] = attrs.pop("_ARRAY_DIMENSIONS", [])
+                    meta["attrs"] = attrs
+                    self._meta[name] = meta
+            return self._meta[name]
+
+    def chunk_ref(self, name: str, key: Sequence[int]) -> Any:
+        return self.refs.get(f"{name}/" + ".".join(str(k) for k in key))
+
+    def coord(self, name: str) -> Optional[np.ndarray]:
+        """Values of an inlined 1-D coordinate variable."""
+        with self._lock:
+            if name in self._coords:
+                return self._coords[name]
+        meta = self.meta(name)
+        ref = self.chunk_ref(name, [0])
+        if meta is None or len(meta["shape"]) != 1 or not isinstance(ref, str) or not ref.startswith("base64:"):
+            return None
+        values = decode_chunk(base64.b64decode(ref[7:]), meta)
+        with self._lock:
+            self._coords[name] = values
+        return values
+
+
+def _nearest(coords: np.ndarray, value: float) -> int:
+    """Index xarray's ``sel(..., method="nearest")`` picks (ties go to the larger label)."""
+    dist = np.abs(coords.astype(float) - value)
+    ties = np.flatnonzero(dist == dist.min())
+    increasing = coords.size < 2 or bool(coords[-1] >= coords[0])
+    return int(ties[-1] if increasing else ties[0])
+
+
+def _mask_and_scale(values: np.ndarray, attrs: Dict[str, Any], fill_value: Any) -> np.ndarray:
+    out = values.astype(float)
+    missing = [fill_value, attrs.get("_FillValue"), attrs.get("missing_value")]
+    for m in missing:
+        if m is None or isinstance(m, str):
+            continue
+        for v in np.atleast_1d(np.asarray(m, dtype=values.dtype)):
+            out[values == v] = np.nan
+    scale, offset = attrs.get("scale_factor"), attrs.get("add_offset")
+    if scale is not None:
+        out = out * float(scale)
+    if offset is not None:
+        out = out + float(offset)
+    return out
+
+
+# ============================================================
+# ENGINE
+# ============================================================
+
+class ReferenceEngine:
+    """Builds, caches and reads chunk references for CMIP6 NetCDF assets (thread-safe)."""
+
+    def __init__(
+        self,
+        cache_dir: Optional[str] = None,
+        *,
+        memory_items: int = 64,
+        max_read_bytes: int = 256 * 2**20,
+        retry_after_s: float = 600.0,
+        open_file: Optional[OpenFile] = None,
+        fetch_range: Optional[FetchRange] = None,
+    ) -> None:
+        self.cache_dir = cache_dir
+        self.memory_items = max(1, int(memory_items))
+        self.max_read_bytes = max(1, int(max_read_bytes))
+        self.retry_after_s = retry_after_s
+        self._open_file = open_file or self._default_open
+        self._fetch_range = fetch_range or self._default_fetch
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, References]" = OrderedDict()
+        self._failed: Dict[str, float] = {}
+        self._building: Dict[str, threading.Lock] = {}
+        self._counters = {
+            "built": 0, "build_failures": 0, "memory_hits": 0, "disk_hits": 0,
+            "chunk_reads": 0, "bytes_fetched": 0, "reads": 0, "fallbacks": 0,
+        }
+
+    # ----- remote I/O (overridable) -----------------------------------------
+
+    @staticmethod
+    def _is_remote(href: str) -> bool:
+        return href.startswith(("http://", "https://"))
+
+    def _default_open(self, href: str):
+        if self._is_remote(href):
+            from geoint.extreme_weather_tools import _get_https_fs
+
+            return _get_https_fs().open(href, mode="rb")
+        return open(href, "rb")
+
+    def _default_fetch(self, href: str, start: int, end: int) -> bytes:
+        if self._is_remote(href):
+            from geoint.extreme_weather_tools import _get_https_fs
+
+            return _get_https_fs().cat_file(href, start=start, end=end)
+        with open(href, "rb") as f:
+            f.seek(start)
+            return f.read(end - start)
+
+    def _count(self, **deltas: int) -> None:
+        with self._lock:
+            for k, v in deltas.items():
+                self._counters[k] += v
+
+    # ----- reference cache ----------------------------------------------------
+
+    def _path(self, key: str) -> Optional[str]:
+        if not self.cache_dir:
+            return None
+        return os.path.join(self.cache_dir, hashlib.sha1(key.encode()).hexdigest() + ".json")
+
+    def _remember(self, key: str, refs: References) -> None:
+        with self._lock:
+            self._memory[key] = refs
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_items:
+                self._memory.popitem(last=False)
+
+    def _load(self, key: str) -> Optional[References]:
+        path = self._path(key)
+        if not path or not os.path.exists(path):
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                doc = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"[CMIP6-REFS] Unreadable reference file {path}: {e}")
+            return None
+        if doc.get("templates", {}).get("u") != key:
+            return None
+        return References(doc)
+
+    def _store(self, key: str, doc: Dict[str, Any]) -> None:
+        path = self._path(key)
+        if not path:
+            return
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(doc, f, separators=(",", ":"))
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning(f"[CMIP6-REFS] Could not write {path}: {e}")
+
+    def invalidate(self, href: str) -> None:
+        """Forget an asset's references (memory and disk)."""
+        key = asset_key(href)
+        with self._lock:
+            self._memory.pop(key, None)
+        path = self._path(key)
+        if path:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def references(self, href: str) -> Optional[References]:
+        """References for ``href`` from memory, disk, or a fresh build; ``None`` if none can be built."""
+        key = asset_key(href)
+        with self._lock:
+            refs = self._memory.get(key)
+            if refs is not None:
+                self._memory.move_to_end(key)
+                self._counters["memory_hits"] += 1
+                return refs
+            failed_at = self._failed.get(key)
+            if failed_at is not None and time.time() - failed_at < self.retry_after_s:
+                return None
+            build_lock = self._building.setdefault(key, threading.Lock())
+
+        with build_lock:  # one build per asset; concurrent callers wait for it
+            with self._lock:
+                refs = self._memory.get(key)
+            if refs is not None:
+                return refs
+            refs = self._load(key)
+            if refs is not None:
+                self._count(disk_hits=1)
+            else:
+                t0 = time.time()
+                try:
+                    f = self._open_file(href)
+                    try:
+                        doc = build_references(f, key)
+                    finally:
+                        try:
+                            f.close()
+                        except Exception:
+                            pass
+                except CancelledError:
+                    raise
+                except Exception as e:
+                    logger.warning(f"[CMIP6-REFS] Reference build failed for {key[-80:]}: {type(e).__name__}: {e}")
+                    with self._lock:
+                        self._failed[key] = time.time()
+                        self._counters["build_failures"] += 1
+                        self._building.pop(key, None)
+                    return None
+                n_chunks = sum(1 for v in doc["refs"].values() if isinstance(v, list))
+                logger.info(f"[CMIP6-REFS] Indexed {key.rsplit('/', 1)[-1]}: {n_chunks} chunks in {time.time() - t0:.1f}s")
+                self._store(key, doc)
+                refs = References(doc)
+                self._count(built=1)
+            self._remember(key, refs)
+            with self._lock:
+                self._failed.pop(key, None)
+                self._building.pop(key, None)
+            return refs
+
+    # ----- reading ------------------------------------------------------------
+
+    def _chunk(self, href: str, refs: References, name: str, meta: Dict[str, Any], key: Tuple[int, ...]) -> Optional[np.ndarray]:
+        raster_pool.check_cancelled()
+        ref = refs.chunk_ref(name, key)
+        if ref is None:
+            return None  # never written: fill value
+        if isinstance(ref, str):
+            raw = base64.b64decode(ref[7:]) if ref.startswith("base64:") else ref.encode()
+        else:
+            _, offset, size = ref
+            raw = self._fetch_range(href, offset, offset + size)
+            if len(raw) != size:
+                raise ValueError(f"short read for chunk {key}: {len(raw)} of {size} bytes")
+            raster_env.record_fetch(len(raw))
+            self._count(chunk_reads=1, bytes_fetched=len(raw))
+        return decode_chunk(raw, meta)
+
+    def _read(self, href: str, refs: References, name: str, selection: Sequence[Selection]) -> np.ndarray:
+        """Orthogonal read of ``name[selection]`` (ints and unit-step slices), masked and scaled."""
+        meta = refs.meta(name)
+        shape, chunks = meta["shape"], meta["chunks"]
+        bounds, squeeze = [], []
+        for sel, n in zip(selection, shape):
+            if isinstance(sel, slice):
+                start, stop, _ = sel.indices(n)
+                bounds.append((start, max(start, stop)))
+            else:
+                i = sel + n if sel < 0 else sel
+                if not 0 <= i < n:
+                    raise IndexError(f"index {sel} out of range for {name} axis of size {n}")
+                bounds.append((i, i + 1))
+                squeeze.append(len(bounds) - 1)
+
+        dtype = np.dtype(meta["dtype"])
+        out = np.empty([b - a for a, b in bounds], dtype=dtype)
+        fill = meta.get("fill_value")
+        fill_value = 0 if fill is None else (float(fill) if isinstance(fill, str) else fill)
+        keys = list(itertools.product(*[
+            range(a // c, (b - 1) // c + 1) if b > a else range(0) for (a, b), c in zip(bounds, chunks)
+        ]))
+
+        planned = sum(r[2] for r in (refs.chunk_ref(name, k) for k in keys) if isinstance(r, list))
+        if planned > self.max_read_bytes:
+            raise _TooLarge(f"{name}: {len(keys)} chunks / {planned / 2**20:.0f} MB exceeds CMIP6_REFS_MAX_READ_MB")
+
+        if len(keys) > 1:
+            decoded = [f.result() for f in [raster_pool.submit(self._chunk, href, refs, name, meta, k) for k in keys]]
+        else:
+            decoded = [self._chunk(href, refs, name, meta, k) for k in keys]
+
+        for key, chunk in zip(keys, decoded):
+            src, dst = [], []
+            for k, c, (a, b) in zip(key, chunks, bounds):
+                lo, hi = max(a, k * c), min(b, (k + 1) * c)
+                src.append(slice(lo - k * c, hi - k * c))
+                dst.append(slice(lo - a, hi - a))
+            out[tuple(dst)] = fill_value if chunk is None else chunk[tuple(src)]
+        self._count(reads=1)
+        out = out.squeeze(axis=tuple(squeeze)) if squeeze else out
+        return _mask_and_scale(out, meta["attrs"], fill)
+
+    def _guarded(self, href: str, what: str, fn: Callable[[], Optional[np.ndarray]]) -> Optional[np.ndarray]:
+        try:
+            values = fn()
+        except CancelledError:
+            raise
+        except _TooLarge as e:
+            logger.info(f"[CMIP6-REFS] {what}: {e}, using xarray reader")
+            values = None
+        except (zlib.error, ValueError) as e:
+            logger.warning(f"[CMIP6-REFS] {what}: stale or corrupt references ({e}), dropping them")
+            self.invalidate(href)
+            values = None
+        except Exception as e:
+            logger.warning(f"[CMIP6-REFS] {what} failed: {type(e).__name__}: {e}")
+            values = None
+        if values is None:
+            self._count(fallbacks=1)
+        return values
+
+    def _variable(self, href: str, variable: str) -> Optional[Tuple[References, Dict[str, Any]]]:
+        refs = self.references(href)
+        meta = refs.meta(variable) if refs else None
+        if meta is None:
+            return None
+        dims = meta["dims"]
+        if "lat" not in dims or "lon" not in dims or any(d not in ("time", "lat", "lon") for d in dims):
+            return None
+        if refs.coord("lat") is None or refs.coord("lon") is None:
+            return None
+        return refs, meta
+
+    def dim_size(self, href: str, variable: str, dim: str) -> int:
+        """Length of ``variable``'s ``dim`` axis (1 when it has no such axis or is not indexed)."""
+        refs = self.references(href)
+        meta = refs.meta(variable) if refs else None
+        if meta is None or dim not in meta["dims"]:
+            return 1
+        return int(meta["shape"][meta["dims"].index(dim)])
+
+    def read_point(
+        self, href: str, variable: str, latitude: float, longitude: float, time_index: Optional[int] = None
+    ) -> Optional[np.ndarray]:
+        """Values of the grid cell nearest ``(latitude, longitude)`` (0..360 longitude).
+
+        The whole time axis by default (1-D, one value per timestep), or a
+        single timestep (0-d) for ``time_index``. ``None`` when the caller
+        should use the xarray reader instead.
+        """
+        def _run() -> Optional[np.ndarray]:
+            found = self._variable(href, variable)
+            if found is None:
+                return None
+            refs, meta = found
+            picks = {
+                "lat": _nearest(refs.coord("lat"), latitude),
+                "lon": _nearest(refs.coord("lon"), longitude),
+                "time": slice(None) if time_index is None else time_index,
+            }
+            return self._read(href, refs, variable, [picks[d] for d in meta["dims"]])
+
+        return self._guarded(href, f"{variable} point read", _run)
+
+    def read_area(
+        self,
+        href: str,
+        variable: str,
+        lat_range: Tuple[float, float],
+        lon_range: Tuple[float, float],
+        time_index: int = -1,
+    ) -> Optional[np.ndarray]:
+        """One timestep over the cells with ``lat``/``lon`` inside the inclusive ranges, as ``(lat, lon)``.
+
+        Same cells as ``data.sel(lat=slice(*lat_range), lon=slice(*lon_range))``
+        on ascending coordinates; ``None`` when the caller should use the
+        xarray reader instead.
+        """
+        def _run() -> Optional[np.ndarray]:
+            found = self._variable(href, variable)
+            if found is None:
+                return None
+            refs, meta = found
+            picks: Dict[str, Selection] = {"time": time_index}
+            for dim, (lo, hi) in (("lat", lat_range), ("lon", lon_range)):
+                coords = refs.coord(dim)
+                if coords.size > 1 and coords[-1] < coords[0]:
+                    return None
+                picks[dim] = slice(int(np.searchsorted(coords, lo, "left")), int(np.searchsorted(coords, hi, "right")))
+            values = self._read(href, refs, variable, [picks[d] for d in meta["dims"]])
+            spatial = [d for d in meta["dims"] if d != "time"]
+            return values if spatial == ["lat", "lon"] else values.T
+
+        return self._guarded(href, f"{variable} area read", _run)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self._counters,
+                "memory_entries": len(self._memory),
+                "cache_dir": self.cache_dir,
+            }
+
+
+_engine: Optional[ReferenceEngine] = None
+_engine_lock = threading.Lock()
+
+
+def enabled() -> bool:
+    return (os.getenv("CMIP6_REFS") or "1").strip().lower() not in ("0", "false", "no", "off")
+
+
+def get_reference_engine() -> Optional[ReferenceEngine]:
+    """Process-wide :class:`ReferenceEngine` (lazy); ``None`` when ``CMIP6_REFS`` disables it."""
+    global _engine
+    if not enabled():
+        return None
+    with _engine_lock:
+        if _engine is None:
+            cache_dir = (os.getenv("CMIP6_REFS_DIR") or "").strip() or os.path.join(
+                tempfile.gettempdir(), "earth-copilot", "cmip6-refs"
+            )
+            _engine = ReferenceEngine(
+                cache_dir,
+                memory_items=_env_int("CMIP6_REFS_MEMORY_ITEMS", 64),
+                max_read_bytes=_env_int("CMIP6_REFS_MAX_READ_MB", 256) * 2**20,
+                retry_after_s=_env_int("CMIP6_REFS_RETRY_S", 600),
+            )
+        return _engine
+
+
+def stats() -> Dict[str, Any]:
+    """Engine counters for the health endpoint (``{"enabled": False}`` when off)."""
+    engine = get_reference_engine()
+    return {"enabled": False} if engine is None else {"enabled": True, **engine.stats()}
@@ -17,8 +17,9 @@ import json
 from typing import Dict, Any, Optional, List
 from datetime import datetime
 
-from azure.identity import DefaultAzureCredential, get_bearer_token_provider
-from cloud_config import cloud_cfg
+from azure.identity import DefaultAzureCredential
+from _framework.llm_client import get_llm_client
+from pipeline.session_store import session_map
 
 logger = logging.getLogger(__name__)
 
@@ -116,7 +117,9 @@ class ComparisonAgent:
     """
 
     def __init__(self):
-        self.sessions: Dict[str, ComparisonSession] = {}
+        # Shared session store (see pipeline.session_store) so any worker or
+        # replica can resume a conversation's Agent Service thread.
+        self.sessions = session_map("comparison", ComparisonSession)
         self._agents_client = None
         self._agent_id: Optional[str] = None
         self._initialized = False
@@ -187,14 +190,15 @@ class ComparisonAgent:
         logger.info(f"ComparisonAgent initialized: agent_id={agent.id}, model={deployment}")
 
     async def _get_or_create_session(self, session_id: str) -> ComparisonSession:
-        if session_id in self.sessions:
-            session = self.sessions[session_id]
+        session = await self.sessions.aget(session_id)
+        if session is not None:
             session.last_activity = datetime.utcnow()
+            await self.sessions.aset(session_id, session)
             return session
 
         thread = await self._agents_client.threads.create()
         session = ComparisonSession(session_id, thread.id)
-        self.sessions[session_id] = session
+        await self.sessions.aset(session_id, session)
         logger.info(f"Created new comparison session: {session_id} -> thread: {thread.id}")
         return session
 
@@ -206,20 +210,11 @@ class ComparisonAgent:
     ) -> Optional[str]:
         """Pre-analyze a map screenshot using GPT-5 Vision for comparison context."""
         try:
-            from openai import AsyncAzureOpenAI
-
             logger.info(f"Running visual analysis for comparison context at ({latitude:.4f}, {longitude:.4f})")
 
-            credential = DefaultAzureCredential()
-            token_provider = get_bearer_token_provider(
-                credential, cloud_cfg.cognitive_services_scope
-            )
-
-            client = AsyncAzureOpenAI(
-                azure_ad_token_provider=token_provider,
+            client = get_llm_client(
+                os.getenv("AZURE_OPENAI_DEPLOYMENT_NAME", "gpt-5"),
                 api_version=os.getenv("AZURE_OPENAI_API_VERSION", "2025-01-01-preview"),
-                azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
-                timeout=120.0
             )
 
             clean_base64 = screenshot_base64
@@ -239,8 +234,9 @@ Identify:
 
 Be specific and concise."""
 
-            response = await client.chat.completions.create(
+            response = await client.create(
                 model=os.getenv("AZURE_OPENAI_DEPLOYMENT_NAME", "gpt-5"),
+                timeout=120.0,
                 messages=[
                     {
                         "role": "system",
@@ -353,7 +349,7 @@ Be specific and concise."""
                         self._initialized = False
                         self._agent_id = None
                         self._agents_client = None
-                        self.sessions.clear()
+                        await self.sessions.adelete(session.session_id)
                         await self._ensure_initialized()
                         continue
                     return {"status": "error", "message": f"Comparison analysis error: {run.last_error}"}
@@ -399,6 +395,7 @@ Be specific and concise."""
 
                 session.message_count += 2
                 session.last_activity = datetime.utcnow()
+                await self.sessions.aset(session.session_id, session)
 
                 result = {
                     "status": "success",
@@ -430,7 +427,7 @@ Be specific and concise."""
                     self._initialized = False
                     self._agent_id = None
                     self._agents_client = None
-                    self.sessions.clear()
+                    await self.sessions.adelete(session.session_id)
                     try:
                         await self._ensure_initialized()
                         continue  # Retry with fresh agent
@@ -195,24 +195,29 @@ def _execute_stac_search_sync(collection: str, bbox: List[float], datetime_range
     if stac_collection in ["sentinel-2-l2a", "landsat-c2-l2"]:
         search_body["query"] = {"eo:cloud_cover": {"lt": 30}}
 
-    try:
+    def _post(body: Dict[str, Any]) -> List[Dict[str, Any]]:
         resp = requests.post(
             f"{STAC_URL}/search",
-            json=search_body,
+            json=body,
             headers={"Content-Type": "application/json"},
             timeout=30,
         )
-        if resp.status_code == 200:
-            data = resp.json()
-            features = data.get("features", [])
-            tile_urls = []
-            if features:
-                item_id = features[0].get("id")
-                asset = ASSET_MAP.get(stac_collection, "visual")
-                extra = TILE_EXTRA_PARAMS.get(stac_collection, "")
-                tile_urls.append(f"https://planetarycomputer.microsoft.com/api/data/v1/item/tilejson.json?collection={stac_collection}&item={item_id}&assets={asset}{extra}")
-            return {"features": features, "tile_urls": tile_urls, "collection": stac_collection, "datetime": datetime_range}
-        return {"features": [], "error": f"Status {resp.status_code}"}
+        if resp.status_code != 200:
+            raise RuntimeError(f"Status {resp.status_code}")
+        return resp.json().get("features", [])
+
+    try:
+        from stac_item_cache import get_stac_item_cache
+
+        # Tile URLs go through the data API by item id, so the hrefs are not signed here.
+        features = get_stac_item_cache().get_or_search(STAC_URL, search_body, _post, sign=False)
+        tile_urls = []
+        if features:
+            item_id = features[0].get("id")
+            asset = ASSET_MAP.get(stac_collection, "visual")
+            extra = TILE_EXTRA_PARAMS.get(stac_collection, "")
+            tile_urls.append(f"https://planetarycomputer.microsoft.com/api/data/v1/item/tilejson.json?collection={stac_collection}&item={item_id}&assets={asset}{extra}")
+        return {"features": features, "tile_urls": tile_urls, "collection": stac_collection, "datetime": datetime_range}
     except Exception as e:
         return {"features": [], "error": str(e)}
 
@@ -475,17 +480,8 @@ def analyze_comparison_imagery(location: str, before_tile_url: str, after_tile_u
         if not endpoint:
             return json.dumps({"status": "error", "analysis": "Azure OpenAI endpoint not configured."})
 
-        from azure.identity import DefaultAzureCredential, get_bearer_token_provider
-        from openai import AzureOpenAI
-        credential = DefaultAzureCredential()
-        token_provider = get_bearer_token_provider(credential, cloud_cfg.cognitive_services_scope)
-
-        client = AzureOpenAI(
-            azure_endpoint=endpoint,
-            azure_ad_token_provider=token_provider,
-            api_version="2024-12-01-preview",
-            timeout=120.0,
-        )
+        from _framework.llm_client import get_llm_client
+        client = get_llm_client(deployment, api_version="2024-12-01-preview")
 
         analysis_prompts = {
             "general": f"Compare these two satellite images of {location}. The first is the BEFORE image and the second is the AFTER image. Describe all visible changes: structural, vegetation, water, land use, etc.",
@@ -504,9 +500,10 @@ def analyze_comparison_imagery(location: str, before_tile_url: str, after_tile_u
         if after_image:
             content.append({"type": "image_url", "image_url": {"url": f"data:image/png;base64,{after_image}", "detail": "high"}})
 
-        response = client.chat.completions.create(
+        response = client.create_sync(
             model=deployment,
             messages=[{"role": "user", "content": content}],
+            timeout=120.0,
             max_completion_tokens=1000,
             temperature=1.0,
         )
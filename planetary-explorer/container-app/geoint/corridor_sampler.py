@@ -0,0 +1,243 @@
+"""
+Corridor Sampling Engine for the mobility tools
+
+``_build_elevation_transect`` and ``_sample_corridor_point`` used to read a
+separate COG window for every point along an A→B corridor, each through
+its own ``rasterio.open`` (and, for the transect, its own worker in a
+6-thread pool), although neighbouring points almost always fall in the
+same DEM / WorldCover item. This module samples a whole corridor at once:
+
+* **Group by item** -- every point is assigned to the first STAC item that
+  covers it (the caller passes ``_items_covering_point``), so each COG is
+  opened once per corridor.
+* **One read per chunk** -- the per-point pixel windows of a group are
+  computed in one vectorized pass (CRS transform + inverse affine on the
+  coordinate arrays) and packed, in corridor order, into chunks whose
+  union stays within ``MOBILITY_CORRIDOR_MAX_WINDOW_PX`` on each side;
+  each chunk is one window read. A diagonal corridor across a 1° DEM tile
+  is a handful of reads instead of one read per sample.
+* **Per-point pixels** -- every point gets the pixels of its chunk that
+  its own per-point read returned (GDAL's nearest-neighbour pick for the
+  fractional ``from_bounds`` window, nodata as NaN), so the existing pixel
+  analysers are unchanged. A box hanging off the raster edge keeps its
+  on-raster part instead of failing the read.
+
+Dense transects (hundreds of samples) therefore cost about what ten
+per-point reads did. Items are read in parallel on the shared raster pool.
+
+Config:
+  MOBILITY_CORRIDOR_MAX_WINDOW_PX  max edge of one chunk read (default 1024)
+"""
+
+import logging
+import os
+import threading
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+import raster_pool
+
+logger = logging.getLogger(__name__)
+
+PixelWindow = Tuple[int, int, int, int]  # row0, col0, row1, col1 (exclusive)
+Point = Tuple[float, float]  # (lat, lon)
+
+# Miles per degree of latitude, as used by mobility_tools._calculate_bbox.
+_MILES_PER_DEG = 69.0
+
+
+def point_indices(
+    points: Sequence[Point],
+    radius_miles: float,
+    transform,
+    width: int,
+    height: int,
+    crs=None,
+) -> List[Optional[Tuple[np.ndarray, np.ndarray]]]:
+    """Source (rows, cols) that a per-point read of each ``radius_miles`` box returns.
+
+    ``rasterio.windows.from_bounds`` gives a fractional window, which GDAL
+    reads as a nearest-neighbour resample to ``round(height) x round(width)``
+    pixels; this reproduces those source indices for every point (the
+    bounds transform and the affine math run on the coordinate arrays in
+    one pass), clipped to the raster. ``None`` for a point off the raster.
+    """
+    coords = np.asarray(points, dtype=float).reshape(-1, 2)
+    lats, lons = coords[:, 0], coords[:, 1]
+    lat_d = radius_miles / _MILES_PER_DEG
+    lon_d = radius_miles / (_MILES_PER_DEG * np.cos(np.radians(lats)))
+    west, east = lons - lon_d, lons + lon_d
+    south, north = lats - lat_d, lats + lat_d
+
+    if crs is not None and str(crs) != "EPSG:4326":
+        from rasterio.warp import transform as warp_transform
+
+        # transform_bounds for all boxes at once: project the four corners, take the envelope
+        n = len(lats)
+        xs, ys = warp_transform(
+            "EPSG:4326", crs,
+            np.concatenate([west, east, east, west]),
+            np.concatenate([south, south, north, north]),
+        )
+        xs, ys = np.asarray(xs).reshape(4, n), np.asarray(ys).reshape(4, n)
+        west, east = xs.min(axis=0), xs.max(axis=0)
+        south, north = ys.min(axis=0), ys.max(axis=0)
+
+    inv = ~transform
+    col_a, row_a = inv.a * west + inv.b * north + inv.c, inv.d * west + inv.e * north + inv.f
+    col_b, row_b = inv.a * east + inv.b * south + inv.c, inv.d * east + inv.e * south + inv.f
+    col_off, row_off = np.minimum(col_a, col_b), np.minimum(row_a, row_b)
+    col_len, row_len = np.abs(col_b - col_a), np.abs(row_b - row_a)
+    n_cols, n_rows = np.floor(col_len + 0.5).astype(int), np.floor(row_len + 0.5).astype(int)
+
+    out: List[Optional[Tuple[np.ndarray, np.ndarray]]] = []
+    for i in range(len(coords)):
+        if n_rows[i] < 1 or n_cols[i] < 1:
+            out.append(None)
+            continue
+        rows = np.floor(row_off[i] + (np.arange(n_rows[i]) + 0.5) * row_len[i] / n_rows[i] + 1e-10).astype(np.int64)
+        cols = np.floor(col_off[i] + (np.arange(n_cols[i]) + 0.5) * col_len[i] / n_cols[i] + 1e-10).astype(np.int64)
+        rows = rows[(rows >= 0) & (rows < height)]
+        cols = cols[(cols >= 0) & (cols < width)]
+        out.append((rows, cols) if rows.size and cols.size else None)
+    return out
+
+
+def plan_chunks(
+    indices: Sequence[Optional[Tuple[np.ndarray, np.ndarray]]], max_px: int
+) -> List[Tuple[List[int], PixelWindow]]:
+    """Pack points, in order, into chunks whose pixel union is at most ``max_px`` a side.
+
+    A single point wider than ``max_px`` gets a chunk of its own; points
+    off the raster (``None``) are skipped.
+    """
+    chunks: List[Tuple[List[int], PixelWindow]] = []
+    idx: List[int] = []
+    union: Optional[List[int]] = None
+    for i, rc in enumerate(indices):
+        if rc is None:
+            continue
+        rows, cols = rc
+        r0, c0, r1, c1 = int(rows[0]), int(cols[0]), int(rows[-1]) + 1, int(cols[-1]) + 1
+        if union is not None:
+            merged = [min(union[0], r0), min(union[1], c0), max(union[2], r1), max(union[3], c1)]
+            if merged[2] - merged[0] <= max_px and merged[3] - merged[1] <= max_px:
+                union = merged
+                idx.append(i)
+                continue
+            chunks.append((idx, tuple(union)))
+        idx, union = [i], [r0, c0, r1, c1]
+    if union is not None:
+        chunks.append((idx, tuple(union)))
+    return chunks
+
+
+class CorridorSampler:
+    """Per-point COG windows for a whole corridor, one read per item chunk (thread-safe)."""
+
+    def __init__(self, *, max_window_px: int = 1024) -> None:
+        self.max_window_px = max(1, int(max_window_px))
+        self._lock = threading.Lock()
+        self.points = 0
+        self.items = 0
+        self.reads = 0
+
+    # ----- remote I/O (overridable) -----------------------------------------
+
+    def _open(self, href: str):
+        import rasterio
+
+        import sas_signer
+
+        return rasterio.open(sas_signer.sign_url(href))
+
+    # ----- sampling ---------------------------------------------------------
+
+    def sample_item(
+        self, href: str, points: Sequence[Point], radius_miles: float, band: int = 1
+    ) -> List[Optional[np.ndarray]]:
+        """Pixels of each point's ``radius_miles`` box in one COG (``None`` where off the raster)."""
+        from rasterio.windows import Window
+
+        out: List[Optional[np.ndarray]] = [None] * len(points)
+        with self._open(href) as src:
+            indices = point_indices(points, radius_miles, src.transform, src.width, src.height, src.crs)
+            chunks = plan_chunks(indices, self.max_window_px)
+            for idx, (r0, c0, r1, c1) in chunks:
+                raster_pool.check_cancelled()
+                data = src.read(band, window=Window(c0, r0, c1 - c0, r1 - r0))
+                if src.nodata is not None:
+                    data = data.astype(float)
+                    data[data == src.nodata] = np.nan
+                for i in idx:
+                    rows, cols = indices[i]
+                    out[i] = data[np.ix_(rows - r0, cols - c0)]
+        with self._lock:
+            self.items += 1
+            self.reads += len(chunks)
+        return out
+
+    def sample(
+        self,
+        points: Sequence[Point],
+        items_for_point: Callable[[float, float], list],
+        asset_key: str,
+        radius_miles: float,
+        band: int = 1,
+    ) -> List[Optional[np.ndarray]]:
+        """Pixels of each point's ``radius_miles`` box, from the first item covering it.
+
+        ``items_for_point(lat, lon)`` returns candidate STAC items (e.g.
+        ``_items_covering_point`` over a corridor prefetch). Points without
+        an item / asset, or whose item read fails, get ``None``.
+        """
+        groups: Dict[str, List[int]] = {}
+        for i, (lat, lon) in enumerate(points):
+            items = items_for_point(lat, lon)
+            asset = items[0].assets.get(asset_key) if items else None
+            if asset:
+                groups.setdefault(asset.href, []).append(i)
+        with self._lock:
+            self.points += len(points)
+
+        out: List[Optional[np.ndarray]] = [None] * len(points)
+        if not groups:
+            return out
+
+        def _read(href: str, idx: List[int]) -> None:
+            try:
+                pixels = self.sample_item(href, [points[i] for i in idx], radius_miles, band)
+            except Exception as e:
+                logger.error(f"Corridor read failed for {href.split('?')[0]}: {e}")
+                return
+            for i, px in zip(idx, pixels):
+                out[i] = px
+
+        if len(groups) == 1:
+            _read(*next(iter(groups.items())))
+        else:
+            for f in [raster_pool.submit(_read, href, idx) for href, idx in groups.items()]:
+                f.result()
+        return out
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"points": self.points, "items": self.items, "reads": self.reads}
+
+
+_sampler: Optional[CorridorSampler] = None
+_sampler_lock = threading.Lock()
+
+
+def get_corridor_sampler() -> CorridorSampler:
+    """Process-wide :class:`CorridorSampler` (lazy)."""
+    global _sampler
+    with _sampler_lock:
+        if _sampler is None:
+            try:
+                max_px = int(os.getenv("MOBILITY_CORRIDOR_MAX_WINDOW_PX") or 1024)
+            except ValueError:
+                max_px = 1024
+            _sampler = CorridorSampler(max_window_px=max_px)
+        return _sampler
@@ -0,0 +1,415 @@
+"""
+DEM Tile Service for the terrain tools
+
+``get_elevation_analysis``, ``get_slope_analysis``, ``get_aspect_analysis``
+and ``find_flat_areas`` used to each run their own ``cop-dem-glo-30`` STAC
+search, sign the item, open the COG and read the same window, so a
+terrain chat turn that called three tools paid for three identical remote
+reads. This module does that work once:
+
+* **Window cache** -- decoded DEM windows are cached per STAC item in
+  integer pixel space. A request whose pixel window fits inside a cached
+  window of the same item is a crop of that array (no search, no read),
+  so a 3 km question after a 5 km one is free. A new read that contains
+  older windows of the item replaces them. Bounded by total bytes (LRU).
+* **Terrain kernel** -- one vectorized NumPy pass per (item, window)
+  produces elevation stats, slope, the 8-way aspect histogram and the
+  slope grid the flat-area masks are cut from; the result is memoized so
+  the tools are thin views over it.
+
+The header and window reads go through :mod:`cog_reader` on the event
+loop (rasterio in a worker thread only for encodings it does not
+support); the STAC search and the kernel run on :mod:`raster_pool`.
+Concurrent callers for the same item are serialized on a per-item lock, so
+tools run in parallel by the agent still trigger a single read.
+
+Config:
+  TERRAIN_DEM_CACHE_MB     decoded-window budget (default 256)
+"""
+
+import asyncio
+import logging
+import math
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit, urlunsplit
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEM_COLLECTION = "cop-dem-glo-30"
+
+# Metres per degree of latitude, as used by the original slope tools.
+_M_PER_DEG = 111320.0
+
+# Aspect bins, clockwise from north; each is 45° wide and centred on its heading.
+ASPECT_DIRECTIONS = ("N", "NE", "E", "SE", "S", "SW", "W", "NW")
+
+_METRICS_CACHE_SIZE = 32
+
+PixelWindow = Tuple[int, int, int, int]  # row0, col0, row1, col1 (exclusive)
+
+
+def _unsigned(href: str) -> str:
+    """``href`` without its SAS query string (other query parameters are kept)."""
+    parts = urlsplit(href)
+    if parts.query and set(parse_qs(parts.query)) & {"st", "se", "sp", "sig"}:
+        return urlunsplit(parts._replace(query=""))
+    return href
+
+
+class DemUnavailable(Exception):
+    """No DEM item covers the requested area."""
+
+
+class DemAreaTooSmall(Exception):
+    """The requested area maps to fewer than 2x2 DEM pixels."""
+
+
+@dataclass(frozen=True)
+class DemGrid:
+    """Geo-referencing of one DEM item (north-up COG).
+
+    ``href`` is stored unsigned: grids outlive SAS tokens, so every read
+    signs it again through :mod:`sas_signer`.
+    """
+
+    item_id: str
+    href: str
+    bbox: Tuple[float, float, float, float]
+    # Affine terms: x = c + col * a ; y = f + row * e  (e < 0)
+    a: float
+    c: float
+    e: float
+    f: float
+    width: int
+    height: int
+    nodata: Optional[float]
+
+    def pixel_window(self, bbox: List[float]) -> Optional[PixelWindow]:
+        """Integer pixel window covering ``bbox``, clipped to the item."""
+        west, south, east, north = bbox
+        col0 = math.floor((west - self.c) / self.a + 1e-9)
+        col1 = math.ceil((east - self.c) / self.a - 1e-9)
+        row0 = math.floor((north - self.f) / self.e + 1e-9)
+        row1 = math.ceil((south - self.f) / self.e - 1e-9)
+        col0, row0 = max(col0, 0), max(row0, 0)
+        col1, row1 = min(col1, self.width), min(row1, self.height)
+        if col1 <= col0 or row1 <= row0:
+            return None
+        return (row0, col0, row1, col1)
+
+    def covers(self, bbox: List[float]) -> bool:
+        west, south, east, north = self.bbox
+        return west <= bbox[0] and south <= bbox[1] and bbox[2] <= east and bbox[3] <= north
+
+
+@dataclass
+class _CachedWindow:
+    window: PixelWindow
+    data: np.ndarray
+
+    def contains(self, window: PixelWindow) -> bool:
+        r0, c0, r1, c1 = self.window
+        return r0 <= window[0] and c0 <= window[1] and window[2] <= r1 and window[3] <= c1
+
+    def crop(self, window: PixelWindow) -> np.ndarray:
+        r0, c0 = self.window[0], self.window[1]
+        return self.data[window[0] - r0:window[2] - r0, window[1] - c0:window[3] - c0]
+
+
+@dataclass
+class TerrainMetrics:
+    """Everything the terrain tools report for one DEM window."""
+
+    item_id: str
+    window: PixelWindow
+    cell_size_m: float
+    elevation: Optional[Dict[str, float]]  # min / max / mean over valid pixels
+    slope_deg: np.ndarray
+    aspect_counts: Dict[str, int]
+
+    @property
+    def pixels(self) -> int:
+        return int(self.slope_deg.size)
+
+    def slope_stats(self) -> Dict[str, float]:
+        s = self.slope_deg
+        return {"min": float(s.min()), "max": float(s.max()), "mean": float(s.mean())}
+
+    def flat_mask(self, max_slope_degrees: float = 5.0) -> np.ndarray:
+        return self.slope_deg < max_slope_degrees
+
+    def percent_where(self, mask: np.ndarray) -> float:
+        return float(np.count_nonzero(mask)) / float(self.pixels) * 100.0
+
+
+def compute_terrain_metrics(
+    elevation: np.ndarray,
+    *,
+    nodata: Optional[float],
+    cell_size_m: float,
+    item_id: str = "",
+    window: PixelWindow = (0, 0, 0, 0),
+) -> TerrainMetrics:
+    """Single vectorized pass over a DEM window.
+
+    Elevation stats mask ``nodata`` (or -9999); slope and aspect use the
+    raw grid with a metric cell size on both axes, exactly as the slope
+    tools always did.
+    """
+    masked = np.ma.masked_equal(elevation, nodata or -9999)
+    stats = None
+    if masked.count():
+        stats = {
+            "min": float(masked.min()),
+            "max": float(masked.max()),
+            "mean": float(masked.mean()),
+        }
+
+    grid = elevation.astype(float)
+    dy, dx = np.gradient(grid, cell_size_m)
+    slope = np.degrees(np.arctan(np.hypot(dx, dy)))
+    aspect = np.degrees(np.arctan2(-dx, dy))
+    aspect = np.where(aspect < 0, aspect + 360, aspect)
+    bins = (np.floor(((aspect + 22.5) % 360.0) / 45.0).astype(np.intp)) % 8
+    counts = np.bincount(bins.ravel(), minlength=8)
+    return TerrainMetrics(
+        item_id=item_id,
+        window=window,
+        cell_size_m=cell_size_m,
+        elevation=stats,
+        slope_deg=slope,
+        aspect_counts={d: int(n) for d, n in zip(ASPECT_DIRECTIONS, counts)},
+    )
+
+
+class DemTileService:
+    """Cached DEM window reads + memoized terrain metrics (async, thread-safe caches)."""
+
+    def __init__(self, *, max_bytes: int = 256 * 1024 * 1024) -> None:
+        self.max_bytes = max(1, int(max_bytes))
+        self._lock = threading.Lock()
+        self._item_locks: Dict[str, asyncio.Lock] = {}
+        self._grids: "OrderedDict[str, DemGrid]" = OrderedDict()
+        self._windows: "OrderedDict[Tuple[str, PixelWindow], _CachedWindow]" = OrderedDict()
+        self._metrics: "OrderedDict[Tuple[str, PixelWindow, float], TerrainMetrics]" = OrderedDict()
+        self._bytes = 0
+        self.searches = 0
+        self.reads = 0
+        self.window_hits = 0
+        self.metric_hits = 0
+
+    # ----- remote I/O (overridable) -----------------------------------------
+
+    async def _search_grid(self, bbox: List[float]) -> Optional[DemGrid]:
+        """STAC search + sign + header read for the first item under ``bbox``."""
+        import raster_pool
+        import sas_signer
+        from cog_reader import CogUnsupported, get_cog_reader
+        from geoint.terrain_tools import _search_items
+
+        items = await raster_pool.run(_search_items, DEM_COLLECTION, bbox)
+        if not items:
+            return None
+        item = items[0]
+        href = _unsigned(item.assets["data"].href)
+        signed = sas_signer.sign_url(href)
+        try:
+            header = await get_cog_reader().header(signed)
+        except CogUnsupported as exc:
+            logger.info(f"[DEM] {item.id}: {exc}; reading header with rasterio")
+            return await raster_pool.run(_grid_rasterio, item.id, href, signed, item.bbox)
+        a, _, c, _, e, f = header.transform
+        bounds = item.bbox or (c, f + header.height * e, c + header.width * a, f)
+        return DemGrid(
+            item_id=item.id,
+            href=href,
+            bbox=tuple(bounds),
+            a=a, c=c, e=e, f=f,
+            width=header.width,
+            height=header.height,
+            nodata=header.nodata,
+        )
+
+    async def _read_window(self, grid: DemGrid, window: PixelWindow) -> np.ndarray:
+        import raster_pool
+        import sas_signer
+        from cog_reader import CogUnsupported, get_cog_reader
+
+        signed = sas_signer.sign_url(grid.href)
+        try:
+            return await get_cog_reader().read_window(signed, window)
+        except CogUnsupported as exc:
+            logger.info(f"[DEM] {grid.item_id}: {exc}; reading with rasterio")
+            return await raster_pool.run(_read_window_rasterio, signed, window)
+
+    # ----- cache internals --------------------------------------------------
+
+    async def _grid_for(self, bbox: List[float]) -> Optional[DemGrid]:
+        with self._lock:
+            for grid in reversed(self._grids.values()):
+                if grid.covers(bbox):
+                    self._grids.move_to_end(grid.item_id)
+                    return grid
+            self.searches += 1
+        grid = await self._search_grid(bbox)
+        if grid is not None:
+            with self._lock:
+                self._grids[grid.item_id] = grid
+                while len(self._grids) > 64:
+                    self._grids.popitem(last=False)
+        return grid
+
+    def _cached_crop(self, item_id: str, window: PixelWindow) -> Optional[np.ndarray]:
+        with self._lock:
+            for key, cw in reversed(self._windows.items()):
+                if key[0] == item_id and cw.contains(window):
+                    self._windows.move_to_end(key)
+                    self.window_hits += 1
+                    return cw.crop(window)
+        return None
+
+    def _store(self, item_id: str, window: PixelWindow, data: np.ndarray) -> None:
+        new = _CachedWindow(window, data)
+        with self._lock:
+            for key in [k for k, cw in self._windows.items() if k[0] == item_id and new.contains(cw.window)]:
+                self._bytes -= self._windows.pop(key).data.nbytes
+            self._windows[(item_id, window)] = new
+            self._bytes += data.nbytes
+            while self._bytes > self.max_bytes and len(self._windows) > 1:
+                _, old = self._windows.popitem(last=False)
+                self._bytes -= old.data.nbytes
+
+    def _item_lock(self, item_id: str) -> asyncio.Lock:
+        with self._lock:
+            return self._item_locks.setdefault(item_id, asyncio.Lock())
+
+    # ----- public API -------------------------------------------------------
+
+    async def read(self, bbox: List[float]) -> Tuple[DemGrid, PixelWindow, np.ndarray]:
+        """Return ``(grid, pixel_window, elevation)`` for ``bbox``.
+
+        Raises :class:`DemUnavailable` when no item covers the area and
+        :class:`DemAreaTooSmall` when the window is under 2x2 pixels.
+        """
+        grid = await self._grid_for(bbox)
+        if grid is None:
+            raise DemUnavailable("No DEM data available for this location")
+        window = grid.pixel_window(bbox)
+        if window is None or window[2] - window[0] < 2 or window[3] - window[1] < 2:
+            raise DemAreaTooSmall("Area too small for DEM analysis")
+
+        data = self._cached_crop(grid.item_id, window)
+        if data is not None:
+            return grid, window, data
+        async with self._item_lock(grid.item_id):
+            data = self._cached_crop(grid.item_id, window)  # filled while we waited
+            if data is not None:
+                return grid, window, data
+            with self._lock:
+                self.reads += 1
+            data = await self._read_window(grid, window)
+            self._store(grid.item_id, window, data)
+            logger.info(
+                f"[DEM] read {grid.item_id} window {window} "
+                f"({data.shape[0]}x{data.shape[1]} px)"
+            )
+        return grid, window, data
+
+    async def metrics(self, bbox: List[float], latitude: float) -> TerrainMetrics:
+        """Memoized :func:`compute_terrain_metrics` for ``bbox`` (kernel on the raster pool)."""
+        import raster_pool
+
+        grid, window, data = await self.read(bbox)
+        cell_size_m = abs(grid.a) * _M_PER_DEG * np.cos(np.radians(latitude))
+        key = (grid.item_id, window, round(float(cell_size_m), 6))
+        with self._lock:
+            hit = self._metrics.get(key)
+            if hit is not None:
+                self._metrics.move_to_end(key)
+                self.metric_hits += 1
+                return hit
+        result = await raster_pool.run(
+            compute_terrain_metrics,
+            data,
+            nodata=grid.nodata,
+            cell_size_m=float(cell_size_m),
+            item_id=grid.item_id,
+            window=window,
+        )
+        with self._lock:
+            self._metrics[key] = result
+            while len(self._metrics) > _METRICS_CACHE_SIZE:
+                self._metrics.popitem(last=False)
+        return result
+
+    def clear(self) -> None:
+        with self._lock:
+            self._grids.clear()
+            self._item_locks.clear()
+            self._windows.clear()
+            self._metrics.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "windows": len(self._windows),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "items": len(self._grids),
+                "metrics": len(self._metrics),
+                "searches": self.searches,
+                "reads": self.reads,
+                "window_hits": self.window_hits,
+                "metric_hits": self.metric_hits,
+            }
+
+
+def _grid_rasterio(item_id: str, href: str, signed: str, item_bbox: Any) -> DemGrid:
+    """Blocking header read for encodings :mod:`cog_reader` rejects (worker thread)."""
+    import rasterio
+
+    with rasterio.open(signed) as src:
+        t = src.transform
+        return DemGrid(
+            item_id=item_id,
+            href=href,
+            bbox=tuple(item_bbox or src.bounds),
+            a=t.a, c=t.c, e=t.e, f=t.f,
+            width=src.width,
+            height=src.height,
+            nodata=src.nodata,
+        )
+
+
+def _read_window_rasterio(signed: str, window: PixelWindow) -> np.ndarray:
+    """Blocking window read for encodings :mod:`cog_reader` rejects (worker thread)."""
+    import rasterio
+    from rasterio.windows import Window
+
+    row0, col0, row1, col1 = window
+    with rasterio.open(signed) as src:
+        return src.read(1, window=Window(col0, row0, col1 - col0, row1 - row0))
+
+
+_service: Optional[DemTileService] = None
+_service_lock = threading.Lock()
+
+
+def get_dem_service() -> DemTileService:
+    """Process-wide :class:`DemTileService` (lazy)."""
+    global _service
+    with _service_lock:
+        if _service is None:
+            try:
+                mb = float(os.getenv("TERRAIN_DEM_CACHE_MB") or 256)
+            except ValueError:
+                mb = 256.0
+            _service = DemTileService(max_bytes=int(mb * 1024 * 1024))
+        return _service
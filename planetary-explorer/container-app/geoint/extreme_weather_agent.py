@@ -17,8 +17,9 @@ import json
 from typing import Dict, Any, Optional, List
 from datetime import datetime
 
-from azure.identity import DefaultAzureCredential, get_bearer_token_provider
-from cloud_config import cloud_cfg
+from azure.identity import DefaultAzureCredential
+from _framework.llm_client import get_llm_client
+from pipeline.session_store import session_map
 
 logger = logging.getLogger(__name__)
 
@@ -67,7 +68,7 @@ All data comes from **NASA NEX-GDDP-CMIP6** on Microsoft Planetary Computer:
 - **sample_timeseries**: Extract monthly or seasonal time series for a variable at a point for a given year. Use for seasonal patterns ("when is the hottest month?", "monsoon timing").
 - **sample_area_stats**: Compute spatial statistics (mean, min, max, std, percentiles) across a bounding box. Use for region/city-level questions.
 - **compute_anomaly**: Compute the change between a baseline year and a target year. Use for "how much will X increase by 2050?" questions.
-- **compute_trend**: Fit a linear trend across multiple decades (~5 sample points). Use for "is it getting hotter?", "long-term precipitation trends". Returns slope per decade, R², confidence.
+- **compute_trend**: Fit a linear trend across multiple decades (every year, up to 30). Use for "is it getting hotter?", "long-term precipitation trends". Returns slope per decade with 95% CI, Sen's slope, R², confidence.
 - **calculate_derived**: Evaluate a math expression with named variables (e.g., `precip_mm_day * 365.25`). Use to combine tool outputs into derived values.
 
 ## CRITICAL: Tool Parameters
@@ -107,7 +108,7 @@ If a [Visual Analysis of Current Map View] section is provided, use it to enrich
 ## EFFICIENCY — MINIMIZE TOOL CALLS
 Each tool call samples remote NetCDF data over HTTP. Too many calls will cause timeouts.
 - For temperature questions: call **get_temperature_projection** ONCE (it returns max, min, and mean together).
-- For "Is extreme heat increasing?" or trend questions: prefer **compute_trend** which samples ~5 years and fits a linear regression in ONE call. Only fall back to get_temperature_projection for 2 years if compute_trend is unavailable.
+- For "Is extreme heat increasing?" or trend questions: prefer **compute_trend** which reads every year of the range and fits the trend in ONE call. Only fall back to get_temperature_projection for 2 years if compute_trend is unavailable.
 - For precipitation questions (rainfall, monsoon, flooding): call **get_precipitation_projection** ONCE — it returns mean, peak daily, and annual total across multiple models in a single call.
 - For precipitation trend questions ("is rainfall increasing?", "monsoon projections"): prefer **compute_trend** with variable='pr'. Falls back to get_precipitation_projection for 2 key years.
 - For anomaly / change questions ("how much will temperature increase by 2060?"): call **compute_anomaly** ONCE — it compares two years and returns absolute + percent change.
@@ -149,7 +150,9 @@ class ExtremeWeatherAgent:
     
     def __init__(self):
         """Initialize the extreme weather agent."""
-        self.sessions: Dict[str, ExtremeWeatherAgentSession] = {}
+        # Shared session store (see pipeline.session_store) so any worker or
+        # replica can resume a conversation's Agent Service thread.
+        self.sessions = session_map("extreme_weather", ExtremeWeatherAgentSession)
         self._agents_client = None
         self._agent_id: Optional[str] = None
         self._initialized = False
@@ -227,29 +230,27 @@ class ExtremeWeatherAgent:
         longitude: float
     ) -> ExtremeWeatherAgentSession:
         """Get existing session or create a new one with a new thread."""
-        if session_id in self.sessions:
-            session = self.sessions[session_id]
+        session = await self.sessions.aget(session_id)
+        if session is not None:
             session.update_location(latitude, longitude)
+            await self.sessions.aset(session_id, session)
             return session
         
         thread = await self._agents_client.threads.create()
         
         session = ExtremeWeatherAgentSession(session_id, latitude, longitude, thread.id)
-        self.sessions[session_id] = session
+        await self.sessions.aset(session_id, session)
         logger.info(f"Created new extreme weather session: {session_id} -> thread: {thread.id}")
         return session
     
     def cleanup_old_sessions(self, max_age_minutes: int = 60):
-        """Remove sessions older than max_age_minutes."""
-        now = datetime.utcnow()
-        expired = [
-            sid for sid, session in self.sessions.items()
-            if (now - session.last_activity).total_seconds() > max_age_minutes * 60
-        ]
-        for sid in expired:
-            del self.sessions[sid]
-            logger.info(f"Cleaned up expired extreme weather session: {sid}")
-    
+        """Remove sessions idle for more than max_age_minutes."""
+        # every turn writes the session back, so the store's write time
+        # tracks last_activity without loading each session
+        purged = self.sessions.purge_idle(max_age_minutes * 60)
+        if purged:
+            logger.info(f"Cleaned up {purged} expired extreme weather session(s)")
+
     async def _analyze_screenshot_direct(
         self,
         screenshot_base64: str,
@@ -258,20 +259,11 @@ class ExtremeWeatherAgent:
     ) -> Optional[str]:
         """Pre-analyze a map screenshot using GPT-5 Vision for climate context."""
         try:
-            from openai import AsyncAzureOpenAI
-
             logger.info(f"Running visual analysis for climate context at ({latitude:.4f}, {longitude:.4f})")
 
-            credential = DefaultAzureCredential()
-            token_provider = get_bearer_token_provider(
-                credential, cloud_cfg.cognitive_services_scope
-            )
-
-            client = AsyncAzureOpenAI(
-                azure_ad_token_provider=token_provider,
+            client = get_llm_client(
+                os.getenv("AZURE_OPENAI_DEPLOYMENT_NAME", "gpt-5"),
                 api_version=os.getenv("AZURE_OPENAI_API_VERSION", "2025-01-01-preview"),
-                azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
-                timeout=120.0
             )
 
             clean_base64 = screenshot_base64
@@ -291,8 +283,9 @@ Identify:
 
 Be specific and concise."""
 
-            response = await client.chat.completions.create(
+            response = await client.create(
                 model=os.getenv("AZURE_OPENAI_DEPLOYMENT_NAME", "gpt-5"),
+                timeout=120.0,
                 messages=[
                     {
                         "role": "system",
@@ -440,7 +433,7 @@ Be specific and concise."""
                         self._initialized = False
                         self._agent_id = None
                         self._agents_client = None
-                        self.sessions.clear()
+                        await self.sessions.adelete(session.session_id)
                         await self._ensure_initialized()
                         continue
                     return {
@@ -492,6 +485,7 @@ Be specific and concise."""
                 
                 session.message_count += 2
                 session.last_activity = datetime.utcnow()
+                await self.sessions.aset(session.session_id, session)
                 
                 logger.info(f"Extreme weather agent response ({len(response_content)} chars, {len(tool_calls)} tool calls)")
                 if not response_content:
@@ -515,7 +509,7 @@ Be specific and concise."""
                     self._initialized = False
                     self._agent_id = None
                     self._agents_client = None
-                    self.sessions.clear()
+                    await self.sessions.adelete(session.session_id)
                     try:
                         await self._ensure_initialized()
                         continue
@@ -539,11 +533,10 @@ Be specific and concise."""
     
     async def get_session_history(self, session_id: str) -> List[Dict[str, str]]:
         """Get conversation history for a session from the Agent Service thread."""
-        if session_id not in self.sessions:
+        session = await self.sessions.aget(session_id)
+        if session is None:
             return []
         
-        session = self.sessions[session_id]
-        
         try:
             await self._ensure_initialized()
             from azure.ai.agents.models import ListSortOrder
@@ -569,14 +562,14 @@ Be specific and concise."""
     
     async def clear_session(self, session_id: str) -> bool:
         """Clear a session's memory by deleting the thread."""
-        if session_id in self.sessions:
-            session = self.sessions[session_id]
+        session = await self.sessions.aget(session_id)
+        if session is not None:
             try:
                 await self._ensure_initialized()
                 await self._agents_client.threads.delete(session.thread_id)
             except Exception as e:
                 logger.debug(f"Thread cleanup: {e}")
-            del self.sessions[session_id]
+            await self.sessions.adelete(session_id)
             logger.info(f"Cleared extreme weather session: {session_id}")
             return True
         return False
@@ -28,8 +28,10 @@ import json
 import os
 import time
 from typing import Dict, Any, List, Set, Callable, Optional
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor
 
+import raster_pool
+import result_cache
 from cloud_config import cloud_cfg
 
 logger = logging.getLogger(__name__)
@@ -38,34 +40,21 @@ logger = logging.getLogger(__name__)
 _catalog = None
 _stac_endpoint = cloud_cfg.stac_catalog_url
 
-# ============================================================
-# STAC SEARCH CACHE — avoid redundant identical STAC queries
-# ============================================================
-# CMIP6 items are global (all variables are assets on the same item),
-# so a search for (scenario=ssp585, year=2030) returns the SAME items
-# regardless of which variable we want.  Cache keyed by (scenario, year).
-_stac_search_cache: Dict[str, list] = {}
-_stac_cache_ttl = 300  # seconds
-_stac_cache_timestamps: Dict[str, float] = {}
-
 # ============================================================
 # NETCDF RESULT CACHE — avoid re-reading remote NetCDF data
 # ============================================================
-# CMIP6 projections are static datasets — the same (href, variable,
+# CMIP6 projections are static datasets — the same (asset, variable,
 # lat, lon, aggregate) query always returns identical results.
-_netcdf_result_cache: Dict[str, Dict] = {}
-_netcdf_result_cache_ts: Dict[str, float] = {}
-_netcdf_cache_ttl = 3600  # 1 hour
-
-# Thread pool for parallel NetCDF sampling (reused across tool calls)
-_netcdf_pool = ThreadPoolExecutor(max_workers=6)
-
-# Separate thread pool for xarray .values reads inside _sample_netcdf.
-# MUST be separate from _netcdf_pool to avoid thread starvation:
-# outer model-parallel tasks run on _netcdf_pool, each calling
-# _sample_netcdf which submits .values reads here.  If both pools
-# were the same, timed-out .values threads would hold workers while
-# retries need new workers → deadlock.
+# Bounded LRU + TTL with single-flight fills (see result_cache).
+_netcdf_results = result_cache.namespace("cmip6-point", ttl_s=3600)
+
+# Parallel NetCDF sampling runs on the shared raster pool (see raster_pool).
+
+# Watchdog threads for xarray .values reads inside _sample_netcdf.
+# Kept separate from the raster pool on purpose: a .values read can hang
+# on a cold HTTP range request and is abandoned after a timeout, so it
+# must never run inline on (or hold) a raster worker that the outer
+# per-variable task and its retries need.
 _values_pool = ThreadPoolExecutor(max_workers=4)
 
 # ============================================================
@@ -216,39 +205,24 @@ def _search_cmip6_items(
     """
     Search Planetary Computer for NEX-GDDP-CMIP6 items.
     
-    Returns raw STAC items matching the given scenario and year.
-    Uses an in-memory cache keyed by (scenario, year) since CMIP6 items
-    are GLOBAL and contain ALL climate variables as separate assets.
+    Returns signed STAC items matching the given scenario and year.
+    Searches go through the shared STAC item cache (``stac_item_cache``)
+    keyed by (scenario, year, models) since CMIP6 items are GLOBAL and
+    contain ALL climate variables as separate assets — the same cached
+    items serve every variable.
     
     Filterable properties: cmip6:year, cmip6:model, cmip6:scenario
     (NOT cmip6:variable — variables are asset keys, not item properties).
     """
     import httpx
-    import planetary_computer as pc
+    from stac_item_cache import STATIC_COLLECTION_TTL_S, get_stac_item_cache
 
     target_year = year if year else 2030
-    # Cache key excludes 'limit' — CMIP6 items are global, same results
-    # for any limit.  We always fetch max(limit, 5) and slice in caller.
-    cache_key = f"{scenario}:{target_year}"
-    
-    # Check cache first — same items work for any variable
-    now = time.time()
-    if cache_key in _stac_search_cache:
-        cache_age = now - _stac_cache_timestamps.get(cache_key, 0)
-        if cache_age < _stac_cache_ttl:
-            cached = _stac_search_cache[cache_key]
-            # Filter cached items to those with the requested variable
-            valid = [f for f in cached if variable in f.get("assets", {})][:limit]
-            logger.info(f"[CMIP6] Cache HIT for {scenario}/{target_year}: {len(valid)}/{len(cached)} items have '{variable}' ({cache_age:.0f}s old)")
-            return valid
-        else:
-            # Expired
-            del _stac_search_cache[cache_key]
-            _stac_cache_timestamps.pop(cache_key, None)
     
     search_body: Dict[str, Any] = {
         "collections": [CMIP6_COLLECTION],
-        "limit": max(limit, 5),  # always fetch enough to satisfy any caller
+        # Fixed page size so every caller shares one cache entry; sliced below.
+        "limit": max(limit, 5),
     }
     
     search_body["query"] = {
@@ -260,47 +234,123 @@ def _search_cmip6_items(
     if PREFERRED_MODELS:
         search_body["query"]["cmip6:model"] = {"in": PREFERRED_MODELS}
     
-    try:
-        logger.info(f"[CMIP6] Searching for {variable} asset in {scenario}/{target_year} items (limit={limit})")
-        
+    def _post(body: Dict[str, Any]) -> List[Dict[str, Any]]:
+        logger.info(f"[CMIP6] Searching {scenario}/{target_year} items (limit={body['limit']})")
         with httpx.Client(timeout=30) as client:
             resp = client.post(
                 f"{_stac_endpoint}/search",
-                json=search_body,
+                json=body,
                 headers={"Content-Type": "application/json"}
             )
-            if resp.status_code == 200:
-                features = resp.json().get("features", [])
-                logger.info(f"[CMIP6] Found {len(features)} items for {scenario}/{target_year}")
-                
-                # Sign ALL items and cache them (they contain every variable)
-                signed_features = []
-                for f in features:
-                    try:
-                        signed_features.append(pc.sign(f))
-                    except Exception:
-                        signed_features.append(f)
-                
-                # Store in cache (all variables, not filtered)
-                _stac_search_cache[cache_key] = signed_features
-                _stac_cache_timestamps[cache_key] = now
-                
-                # Filter to items that have the requested variable, slice to caller limit
-                valid_features = [f for f in signed_features if variable in f.get("assets", {})][:limit]
-                
-                if not valid_features and features:
-                    logger.warning(f"[CMIP6] {len(features)} items found but none have '{variable}' asset")
-                    first_assets = list(features[0].get("assets", {}).keys())
-                    logger.warning(f"[CMIP6] Available assets in first item: {first_assets}")
-                
-                logger.info(f"[CMIP6] {len(valid_features)} items have '{variable}' asset (cached {len(signed_features)} items)")
-                return valid_features
-            else:
-                logger.warning(f"STAC search returned {resp.status_code}: {resp.text[:200]}")
-                return []
+        if resp.status_code != 200:
+            raise RuntimeError(f"STAC search returned {resp.status_code}: {resp.text[:200]}")
+        features = resp.json().get("features", [])
+        logger.info(f"[CMIP6] Found {len(features)} items for {scenario}/{target_year}")
+        return features
+    
+    try:
+        features = get_stac_item_cache().get_or_search(
+            _stac_endpoint, search_body, _post, ttl_s=STATIC_COLLECTION_TTL_S
+        )
     except Exception as e:
         logger.error(f"CMIP6 STAC search failed: {e}")
         return []
+    
+    # Filter to items that have the requested variable, slice to caller limit
+    valid_features = [f for f in features if variable in f.get("assets", {})][:limit]
+    
+    if not valid_features and features:
+        logger.warning(f"[CMIP6] {len(features)} items found but none have '{variable}' asset")
+        first_assets = list(features[0].get("assets", {}).keys())
+        logger.warning(f"[CMIP6] Available assets in first item: {first_assets}")
+    
+    logger.info(f"[CMIP6] {len(valid_features)}/{len(features)} items have '{variable}' asset")
+    return valid_features
+
+
+def _annual_point_result(values, n_times: int, variable: str, var_info: Dict[str, Any]) -> Dict[str, Any]:
+    """Annual mean / max / min of a grid cell's daily values (NaN = masked)."""
+    import numpy as np
+
+    valid_mask = ~np.isnan(values)
+    if not valid_mask.any():
+        return {"error": "No data at this location (all days masked)"}
+    valid = values[valid_mask]
+
+    raw_mean = float(np.mean(valid))
+    raw_max = float(np.max(valid))
+    raw_min = float(np.min(valid))
+
+    display_mean = var_info['convert'](raw_mean)
+    display_max = var_info['convert'](raw_max)
+    display_min = var_info['convert'](raw_min)
+
+    result = {
+        "raw_mean": round(raw_mean, 6),
+        "raw_max": round(raw_max, 6),
+        "raw_min": round(raw_min, 6),
+        "display_mean": display_mean,
+        "display_max": display_max,
+        "display_min": display_min,
+        "display_value": display_mean,
+        "display_unit": var_info['display_unit'],
+        "variable_name": var_info['name'],
+        "aggregation": "annual",
+        "days_sampled": int(valid_mask.sum()),
+        "total_days": n_times,
+        "grid_resolution": "0.25° × 0.25°",
+    }
+    logger.info(f"[CMIP6]  NetCDF annual stats: {variable} mean={display_mean}, max={display_max}, min={display_min} {var_info['display_unit']} ({int(valid_mask.sum())} of {n_times} days sampled)")
+    return result
+
+
+def _last_point_result(raw_value: float, total_timesteps: int, variable: str, var_info: Dict[str, Any]) -> Dict[str, Any]:
+    """Single-timestep result for a grid cell value (NaN = masked)."""
+    import numpy as np
+
+    # Check for NaN (masked/fill values become NaN in xarray)
+    if np.isnan(raw_value):
+        return {"error": "No data at this location (masked)"}
+
+    # Validate raw value against expected range
+    vr = var_info.get('valid_range')
+    if vr and not (vr[0] <= raw_value <= vr[1]):
+        return {"error": f"Value {raw_value} outside valid range {vr}"}
+
+    display_value = var_info['convert'](raw_value)
+
+    result = {
+        "raw_value": round(raw_value, 4),
+        "display_value": display_value,
+        "display_unit": var_info['display_unit'],
+        "variable_name": var_info['name'],
+        "band_sampled": total_timesteps,
+        "total_bands": total_timesteps,
+        "grid_resolution": "0.25° × 0.25°",
+    }
+    logger.info(f"[CMIP6]  NetCDF sampled OK: {variable}={display_value}{var_info['display_unit']} (raw={raw_value:.4f}, timestep={total_timesteps})")
+    return result
+
+
+def _sample_with_references(
+    href: str, variable: str, latitude: float, sample_lng: float, aggregate: str, var_info: Dict[str, Any]
+) -> Optional[Dict[str, Any]]:
+    """Point sample through the chunk reference engine; ``None`` to fall back to xarray."""
+    from geoint import cmip6_refs
+
+    engine = cmip6_refs.get_reference_engine()
+    if engine is None:
+        return None
+    t_read_start = time.time()
+    annual = aggregate == "annual"
+    values = engine.read_point(href, variable, latitude, sample_lng, time_index=None if annual else -1)
+    if values is None:
+        return None
+    n_times = engine.dim_size(href, variable, "time")
+    logger.info(f"[CMIP6] Reference read took {time.time() - t_read_start:.1f}s for {values.size} of {n_times} timesteps")
+    if annual and values.ndim == 1:
+        return _annual_point_result(values, n_times, variable, var_info)
+    return _last_point_result(float(values.reshape(-1)[-1]), n_times, variable, var_info)
 
 
 def _sample_netcdf(
@@ -309,6 +359,29 @@ def _sample_netcdf(
     latitude: float,
     longitude: float,
     aggregate: str = "last",
+) -> Dict[str, Any]:
+    """
+    Sample a single NetCDF asset at (lat, lon), cached per asset and grid point.
+
+    The key ignores the SAS query string, so re-signed hrefs hit the same
+    entry; concurrent identical samples share one read. Error results are
+    not cached. See ``_read_netcdf_point`` for the read itself.
+    """
+    sample_lng = _convert_longitude(longitude)
+    cache_key = f"{href.split('?', 1)[0]}:{variable}:{latitude:.4f}:{sample_lng:.4f}:{aggregate}"
+    return _netcdf_results.get_or_compute(
+        cache_key,
+        lambda: _read_netcdf_point(href, variable, latitude, longitude, aggregate),
+        cache_if=lambda result: "error" not in result,
+    )
+
+
+def _read_netcdf_point(
+    href: str,
+    variable: str,
+    latitude: float,
+    longitude: float,
+    aggregate: str = "last",
     _retry_attempt: int = 0,
 ) -> Dict[str, Any]:
     """
@@ -329,7 +402,6 @@ def _sample_netcdf(
     """
     import xarray as xr
     import fsspec
-    import numpy as np
 
     var_info = CLIMATE_VAR_INFO.get(variable, {
         'name': variable, 'unit': 'raw', 'display_unit': '',
@@ -338,21 +410,15 @@ def _sample_netcdf(
 
     sample_lng = _convert_longitude(longitude)
 
-    # --- Result cache: CMIP6 projections are static data, cache for 1 hour ---
-    cache_key = f"{href}:{variable}:{latitude:.4f}:{sample_lng:.4f}:{aggregate}"
-    now = time.time()
-    if cache_key in _netcdf_result_cache:
-        cache_age = now - _netcdf_result_cache_ts.get(cache_key, 0)
-        if cache_age < _netcdf_cache_ttl:
-            logger.info(f"[CMIP6] NetCDF CACHE HIT: {variable} ({cache_age:.0f}s old)")
-            return _netcdf_result_cache[cache_key]
-        else:
-            _netcdf_result_cache.pop(cache_key, None)
-            _netcdf_result_cache_ts.pop(cache_key, None)
-
     logger.info(f"[CMIP6] Sampling NetCDF: variable={variable}, lat={latitude}, lng={longitude}, sample_lng={sample_lng}, aggregate={aggregate}")
     logger.info(f"[CMIP6] href (first 120 chars): {href[:120]}...")
 
+    # Chunk references (geoint.cmip6_refs): only the cell's chunks, full daily series
+    if _retry_attempt == 0:
+        result = _sample_with_references(href, variable, latitude, sample_lng, aggregate, var_info)
+        if result is not None:
+            return result
+
     try:
         # Open remote NetCDF via fsspec HTTP filesystem + h5netcdf engine
         # This bypasses GDAL entirely — no userfaultfd needed
@@ -410,7 +476,7 @@ def _sample_netcdf(
                 t_read_start = time.time()
                 # Wrap .values in a timeout to prevent indefinite blocking
                 # on slow HTTP range requests (cold cache can take 40-60s+)
-                # Uses _values_pool (NOT _netcdf_pool) to avoid thread starvation
+                # Uses _values_pool (NOT the raster pool) so a hung read cannot hold a raster worker
                 _read_future = _values_pool.submit(lambda ps=point_subset: ps.values.astype(float))
                 try:
                     all_values = _read_future.result(timeout=45)
@@ -420,38 +486,7 @@ def _sample_netcdf(
                 t_read_elapsed = time.time() - t_read_start
                 logger.info(f"[CMIP6] NetCDF .values read took {t_read_elapsed:.1f}s for {n_sampled} timesteps")
 
-                valid_mask = ~np.isnan(all_values)
-                if not valid_mask.any():
-                    return {"error": "No data at this location (all days masked)"}
-                valid = all_values[valid_mask]
-
-                raw_mean = float(np.mean(valid))
-                raw_max = float(np.max(valid))
-                raw_min = float(np.min(valid))
-
-                display_mean = var_info['convert'](raw_mean)
-                display_max = var_info['convert'](raw_max)
-                display_min = var_info['convert'](raw_min)
-
-                result = {
-                    "raw_mean": round(raw_mean, 6),
-                    "raw_max": round(raw_max, 6),
-                    "raw_min": round(raw_min, 6),
-                    "display_mean": display_mean,
-                    "display_max": display_max,
-                    "display_min": display_min,
-                    "display_value": display_mean,
-                    "display_unit": var_info['display_unit'],
-                    "variable_name": var_info['name'],
-                    "aggregation": "annual",
-                    "days_sampled": int(valid_mask.sum()),
-                    "total_days": n_times,
-                    "grid_resolution": "0.25° × 0.25°",
-                }
-                logger.info(f"[CMIP6]  NetCDF annual stats: {variable} mean={display_mean}, max={display_max}, min={display_min} {var_info['display_unit']} ({int(valid_mask.sum())} of {n_times} days sampled, read={t_read_elapsed:.1f}s)")
-                _netcdf_result_cache[cache_key] = result
-                _netcdf_result_cache_ts[cache_key] = now
-                return result
+                return _annual_point_result(all_values, n_times, variable, var_info)
 
             else:
                 # Single timestep: last day
@@ -460,7 +495,7 @@ def _sample_netcdf(
 
                 t_read_start = time.time()
                 # Wrap single-timestep read in timeout too
-                # Uses _values_pool (NOT _netcdf_pool) to avoid thread starvation
+                # Uses _values_pool (NOT the raster pool) so a hung read cannot hold a raster worker
                 _read_future = _values_pool.submit(lambda p=point: float(p.values))
                 try:
                     raw_value = _read_future.result(timeout=30)
@@ -470,30 +505,7 @@ def _sample_netcdf(
                 t_read_elapsed = time.time() - t_read_start
                 logger.info(f"[CMIP6] Single-timestep .values read took {t_read_elapsed:.1f}s")
 
-                # Check for NaN (masked/fill values become NaN in xarray)
-                if np.isnan(raw_value):
-                    return {"error": "No data at this location (masked)"}
-
-                # Validate raw value against expected range
-                vr = var_info.get('valid_range')
-                if vr and not (vr[0] <= raw_value <= vr[1]):
-                    return {"error": f"Value {raw_value} outside valid range {vr}"}
-
-                display_value = var_info['convert'](raw_value)
-
-                result = {
-                    "raw_value": round(raw_value, 4),
-                    "display_value": display_value,
-                    "display_unit": var_info['display_unit'],
-                    "variable_name": var_info['name'],
-                    "band_sampled": total_timesteps,
-                    "total_bands": total_timesteps,
-                    "grid_resolution": "0.25° × 0.25°",
-                }
-                logger.info(f"[CMIP6]  NetCDF sampled OK: {variable}={display_value}{var_info['display_unit']} (raw={raw_value:.4f}, timestep={total_timesteps})")
-                _netcdf_result_cache[cache_key] = result
-                _netcdf_result_cache_ts[cache_key] = now
-                return result
+                return _last_point_result(raw_value, total_timesteps, variable, var_info)
         finally:
             try:
                 f.close()
@@ -522,7 +534,7 @@ def _sample_netcdf(
                 global _https_fs
                 with _https_fs_lock:
                     _https_fs = None
-            return _sample_netcdf(href, variable, latitude, longitude, aggregate, _retry_attempt + 1)
+            return _read_netcdf_point(href, variable, latitude, longitude, aggregate, _retry_attempt + 1)
         
         return {"error": str(e)}
 
@@ -550,7 +562,7 @@ def get_temperature_projection(latitude: float, longitude: float, scenario: str
         models_used = set()
         
         # Single STAC search (cache ensures this is only 1 HTTP call for all 3 vars)
-        # Then parallel NetCDF sampling via ThreadPoolExecutor
+        # Then parallel NetCDF sampling on the raster pool
         def _sample_var(var):
             """Sample one variable — runs in a worker thread."""
             items = _search_cmip6_items(latitude, longitude, var, scenario, year, limit=3)
@@ -575,9 +587,9 @@ def get_temperature_projection(latitude: float, longitude: float, scenario: str
             return var, {"error": f"Sampling failed for {var}"}, None
         
         # Submit all 3 variable samples in parallel (with timeout guards)
-        futures = {_netcdf_pool.submit(_sample_var, v): v for v in temp_vars}
+        futures = {raster_pool.submit(_sample_var, v): v for v in temp_vars}
         try:
-            for future in as_completed(futures, timeout=_ENSEMBLE_FUTURE_TIMEOUT):
+            for future in raster_pool.as_completed(futures, timeout=_ENSEMBLE_FUTURE_TIMEOUT):
                 try:
                     var, result, model = future.result(timeout=_ENSEMBLE_RESULT_TIMEOUT)
                     results[var] = result
@@ -664,9 +676,9 @@ def get_precipitation_projection(latitude: float, longitude: float, scenario: st
                 }
             return None
         
-        futures = {_netcdf_pool.submit(_sample_precip_model, name, href): name for name, href in sample_tasks}
+        futures = {raster_pool.submit(_sample_precip_model, name, href): name for name, href in sample_tasks}
         try:
-            for future in as_completed(futures, timeout=_ENSEMBLE_FUTURE_TIMEOUT):
+            for future in raster_pool.as_completed(futures, timeout=_ENSEMBLE_FUTURE_TIMEOUT):
                 try:
                     result = future.result(timeout=_ENSEMBLE_RESULT_TIMEOUT)
                     if result:
@@ -758,9 +770,9 @@ def get_wind_projection(latitude: float, longitude: float, scenario: str = "ssp5
                 }
             return None
         
-        futures = {_netcdf_pool.submit(_sample_wind_model, name, href): name for name, href in sample_tasks}
+        futures = {raster_pool.submit(_sample_wind_model, name, href): name for name, href in sample_tasks}
         try:
-            for future in as_completed(futures, timeout=_ENSEMBLE_FUTURE_TIMEOUT):
+            for future in raster_pool.as_completed(futures, timeout=_ENSEMBLE_FUTURE_TIMEOUT):
                 try:
                     result = future.result(timeout=_ENSEMBLE_RESULT_TIMEOUT)
                     if result:
@@ -857,9 +869,9 @@ def get_humidity_projection(latitude: float, longitude: float, scenario: str = "
                     }, model
             return var, {"error": f"Sampling failed for {var}"}, None
         
-        futures = {_netcdf_pool.submit(_sample_humidity_var, v): v for v in ['hurs', 'huss']}
+        futures = {raster_pool.submit(_sample_humidity_var, v): v for v in ['hurs', 'huss']}
         try:
-            for future in as_completed(futures, timeout=_ENSEMBLE_FUTURE_TIMEOUT):
+            for future in raster_pool.as_completed(futures, timeout=_ENSEMBLE_FUTURE_TIMEOUT):
                 try:
                     var, result, model = future.result(timeout=_ENSEMBLE_RESULT_TIMEOUT)
                     results[var] = result
@@ -920,7 +932,7 @@ def get_climate_overview(latitude: float, longitude: float, scenario: str = "ssp
         # so a single search warms the cache for all 6 variable workers.
         _search_cmip6_items(latitude, longitude, overview_vars[0], scenario, year, limit=1)
         
-        # Parallel sampling of all 6 variables via ThreadPoolExecutor
+        # Parallel sampling of all 6 variables on the raster pool
         def _sample_overview_var(var):
             """Sample one overview variable — runs in a worker thread."""
             items = _search_cmip6_items(latitude, longitude, var, scenario, year, limit=1)
@@ -950,8 +962,8 @@ def get_climate_overview(latitude: float, longitude: float, scenario: str = "ssp
                     return var, None, f"{var}: {sample['error']}", None
             return var, None, f"No href for {var}", None
         
-        futures = {_netcdf_pool.submit(_sample_overview_var, v): v for v in overview_vars}
-        for future in as_completed(futures, timeout=_ENSEMBLE_FUTURE_TIMEOUT):
+        futures = {raster_pool.submit(_sample_overview_var, v): v for v in overview_vars}
+        for future in raster_pool.as_completed(futures, timeout=_ENSEMBLE_FUTURE_TIMEOUT):
             try:
                 var, result, error, model = future.result(timeout=_ENSEMBLE_RESULT_TIMEOUT)
             except Exception as exc:
@@ -1055,9 +1067,9 @@ def compare_climate_scenarios(latitude: float, longitude: float, year: int = 203
         futures = []
         for var in compare_vars:
             for sc in scenarios:
-                futures.append(_netcdf_pool.submit(_sample_comparison, var, sc))
+                futures.append(raster_pool.submit(_sample_comparison, var, sc))
         try:
-            for future in as_completed(futures, timeout=_ENSEMBLE_FUTURE_TIMEOUT):
+            for future in raster_pool.as_completed(futures, timeout=_ENSEMBLE_FUTURE_TIMEOUT):
                 try:
                     var, sc, result = future.result(timeout=_ENSEMBLE_RESULT_TIMEOUT)
                     comparison[var][sc] = result
@@ -1140,9 +1152,9 @@ def get_radiation_projection(latitude: float, longitude: float, scenario: str =
                     }, model
             return var, {"error": f"Sampling failed for {var}"}, None
         
-        futures = {_netcdf_pool.submit(_sample_radiation_var, v): v for v in ['rsds', 'rlds']}
+        futures = {raster_pool.submit(_sample_radiation_var, v): v for v in ['rsds', 'rlds']}
         try:
-            for future in as_completed(futures, timeout=_ENSEMBLE_FUTURE_TIMEOUT):
+            for future in raster_pool.as_completed(futures, timeout=_ENSEMBLE_FUTURE_TIMEOUT):
                 try:
                     var, result, model = future.result(timeout=_ENSEMBLE_RESULT_TIMEOUT)
                     results[var] = result
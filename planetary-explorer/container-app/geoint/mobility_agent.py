@@ -17,8 +17,9 @@ import json
 from typing import Dict, Any, Optional, List
 from datetime import datetime
 
-from azure.identity import DefaultAzureCredential, get_bearer_token_provider
-from cloud_config import cloud_cfg
+from azure.identity import DefaultAzureCredential
+from _framework.llm_client import get_llm_client
+from pipeline.session_store import session_map
 
 logger = logging.getLogger(__name__)
 
@@ -120,7 +121,9 @@ class GeointMobilityAgent:
     """
 
     def __init__(self):
-        self.sessions: Dict[str, MobilityAgentSession] = {}
+        # Shared session store (see pipeline.session_store) so any worker or
+        # replica can resume a conversation's Agent Service thread.
+        self.sessions = session_map("mobility", MobilityAgentSession)
         self._agents_client = None
         self._agent_id: Optional[str] = None
         self._initialized = False
@@ -192,25 +195,25 @@ class GeointMobilityAgent:
 
     async def _get_or_create_session(self, session_id: str, latitude: float, longitude: float) -> MobilityAgentSession:
         """Get existing session or create a new one with a new thread."""
-        if session_id in self.sessions:
-            session = self.sessions[session_id]
+        session = await self.sessions.aget(session_id)
+        if session is not None:
             session.update_location(latitude, longitude)
+            await self.sessions.aset(session_id, session)
             return session
 
         thread = await self._agents_client.threads.create()
         session = MobilityAgentSession(session_id, latitude, longitude, thread.id)
-        self.sessions[session_id] = session
+        await self.sessions.aset(session_id, session)
         logger.info(f"Created new mobility session: {session_id} -> thread: {thread.id}")
         return session
 
     def cleanup_old_sessions(self, max_age_minutes: int = 60):
-        now = datetime.utcnow()
-        expired = [
-            sid for sid, s in self.sessions.items()
-            if (now - s.last_activity).total_seconds() > max_age_minutes * 60
-        ]
-        for sid in expired:
-            del self.sessions[sid]
+        """Remove sessions idle for more than max_age_minutes."""
+        # every turn writes the session back, so the store's write time
+        # tracks last_activity without loading each session
+        purged = self.sessions.purge_idle(max_age_minutes * 60)
+        if purged:
+            logger.info(f"Cleaned up {purged} expired session(s)")
 
     async def _analyze_screenshot_direct(self, screenshot_base64: str, latitude: float, longitude: float) -> Optional[str]:
         """Analyze a screenshot using GPT-5 Vision — infrastructure detection only.
@@ -221,23 +224,18 @@ class GeointMobilityAgent:
         Uses low detail and tight token budget to stay under 8s.
         """
         try:
-            from openai import AsyncAzureOpenAI
-            credential = DefaultAzureCredential()
-            token_provider = get_bearer_token_provider(credential, cloud_cfg.cognitive_services_scope)
-
-            client = AsyncAzureOpenAI(
-                azure_ad_token_provider=token_provider,
+            client = get_llm_client(
+                os.getenv("AZURE_OPENAI_DEPLOYMENT_NAME", "gpt-5"),
                 api_version=os.getenv("AZURE_OPENAI_API_VERSION", "2025-01-01-preview"),
-                azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
-                timeout=15.0
             )
 
             clean_base64 = screenshot_base64
             if screenshot_base64.startswith('data:image'):
                 clean_base64 = screenshot_base64.split(',', 1)[1]
 
-            response = await client.chat.completions.create(
+            response = await client.create(
                 model=os.getenv("AZURE_OPENAI_DEPLOYMENT_NAME", "gpt-5"),
+                timeout=15.0,
                 messages=[
                     {"role": "system", "content": "You identify infrastructure in satellite imagery. Respond in JSON only."},
                     {"role": "user", "content": [
@@ -415,7 +413,7 @@ class GeointMobilityAgent:
                         self._initialized = False
                         self._agent_id = None
                         self._agents_client = None
-                        self.sessions.clear()
+                        await self.sessions.adelete(session.session_id)
                         await self._ensure_initialized()
                         continue
                     return {
@@ -457,6 +455,7 @@ class GeointMobilityAgent:
 
                 session.message_count += 2
                 session.last_activity = datetime.utcnow()
+                await self.sessions.aset(session.session_id, session)
 
                 return {
                     "agent": "geoint_mobility",
@@ -479,7 +478,7 @@ class GeointMobilityAgent:
                     self._initialized = False
                     self._agent_id = None
                     self._agents_client = None
-                    self.sessions.clear()
+                    await self.sessions.adelete(session.session_id)
                     try:
                         await self._ensure_initialized()
                         continue  # Retry with fresh agent
@@ -13,19 +13,21 @@ Usage:
     tool = AsyncFunctionTool(functions)
 """
 
+import asyncio
 import logging
 import json
 import math
 import os
 from typing import Dict, Any, List, Optional, Set, Callable
 from datetime import datetime, timedelta
-from concurrent.futures import ThreadPoolExecutor, as_completed
 
 import numpy as np
-import planetary_computer
-import pystac_client
+import raster_pool
+import sas_signer
 import requests
 from cloud_config import cloud_cfg
+from raster_env import raster_tool
+from stac_item_cache import search_items
 
 logger = logging.getLogger(__name__)
 
@@ -38,6 +40,17 @@ WATER_BACKSCATTER_THRESHOLD = -20  # dB
 VEGETATION_NDVI_DENSE = 0.6
 FIRE_CONFIDENCE_THRESHOLD = 50
 
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name) or default)
+    except ValueError:
+        return default
+
+
+# Elevation transect samples along A→B (read through the corridor engine, so dense is cheap)
+TRANSECT_SAMPLES = max(2, _env_int("MOBILITY_TRANSECT_SAMPLES", 10))
+
 # ESA WorldCover land cover class labels
 WORLDCOVER_CLASSES = {
     10: "Tree cover",
@@ -68,18 +81,6 @@ WORLDCOVER_MOBILITY = {
     100: "GO",      # Moss/lichen — passable
 }
 
-# Lazy-loaded STAC catalog
-_catalog = None
-
-
-def _get_catalog():
-    """Lazy-load STAC catalog (synchronous pystac_client)."""
-    global _catalog
-    if _catalog is None:
-        _catalog = pystac_client.Client.open(STAC_ENDPOINT)
-    return _catalog
-
-
 def _convert_numpy_to_python(obj: Any) -> Any:
     """Recursively convert numpy types to Python native types for JSON serialization."""
     if isinstance(obj, np.ndarray):
@@ -175,20 +176,19 @@ def _prefetch_corridor_stac_items(corridor_bbox: List[float]) -> Dict[str, list]
     ]
 
     results = {}
-    with ThreadPoolExecutor(max_workers=6) as executor:
-        futures = {
-            executor.submit(
-                _query_stac_collection_sync, col, corridor_bbox, dt_range, qparams, 10
-            ): col
-            for col, dt_range, qparams in queries
-        }
-        for f in as_completed(futures):
-            col = futures[f]
-            try:
-                results[col] = f.result()
-            except Exception as e:
-                logger.error(f"Corridor prefetch {col} failed: {e}")
-                results[col] = []
+    futures = {
+        raster_pool.submit(
+            _query_stac_collection_sync, col, corridor_bbox, dt_range, qparams, 10
+        ): col
+        for col, dt_range, qparams in queries
+    }
+    for f in raster_pool.as_completed(futures):
+        col = futures[f]
+        try:
+            results[col] = f.result()
+        except Exception as e:
+            logger.error(f"Corridor prefetch {col} failed: {e}")
+            results[col] = []
     found = sum(1 for v in results.values() if v)
     logger.info(f"Corridor prefetch complete: {found}/6 collections returned data")
     return results
@@ -200,22 +200,16 @@ def _query_stac_collection_sync(
     query_params: Optional[Dict] = None,
     limit: int = 10
 ) -> list:
-    """Query a STAC collection synchronously via pystac_client."""
+    """Query a STAC collection synchronously via the shared STAC item cache."""
     try:
-        catalog = _get_catalog()
-        search_params = {
-            "collections": [collection],
-            "bbox": bbox,
-            "limit": limit,
-        }
-        if datetime_range:
-            search_params["datetime"] = datetime_range
-        if query_params:
-            search_params["query"] = query_params
-
-        search = catalog.search(**search_params)
-        items = list(search.items())
-        return [planetary_computer.sign(item) for item in items]
+        return search_items(
+            STAC_ENDPOINT,
+            collections=[collection],
+            bbox=bbox,
+            limit=limit,
+            datetime=datetime_range or None,
+            query=query_params or None,
+        )
     except Exception as e:
         logger.error(f"STAC query error for {collection}: {e}")
         return []
@@ -228,7 +222,7 @@ def _read_cog_window_sync(asset_url: str, bbox: List[float], band: int = 1) -> O
         from rasterio.windows import from_bounds
         from rasterio.warp import transform_bounds
 
-        signed_url = planetary_computer.sign_url(asset_url)
+        signed_url = sas_signer.sign_url(asset_url)
         with rasterio.open(signed_url) as src:
             # Reproject bbox from EPSG:4326 to raster's native CRS if needed
             if src.crs and str(src.crs) != "EPSG:4326":
@@ -246,6 +240,24 @@ def _read_cog_window_sync(asset_url: str, bbox: List[float], band: int = 1) -> O
         return None
 
 
+async def _read_cog_window(asset_url: str, bbox: List[float], band: int = 1) -> Optional[np.ndarray]:
+    """Read pixels from a Cloud-Optimized GeoTIFF for a bounding box (async, see ``cog_reader``)."""
+    try:
+        from cog_reader import read_bbox
+
+        window = await read_bbox(sas_signer.sign_url(asset_url), bbox, band=band)
+        if window is None:
+            return None
+        data = window.data
+        if window.nodata is not None:
+            data = data.astype(float)
+            data[data == window.nodata] = np.nan
+        return data
+    except Exception as e:
+        logger.error(f"Failed to read COG: {e}")
+        return None
+
+
 def _analyze_fire_pixels(pixels: np.ndarray) -> Dict[str, Any]:
     """Analyze MODIS FireMask pixel values."""
     valid = pixels[~np.isnan(pixels)]
@@ -399,40 +411,75 @@ def _interpolate_points(lat1: float, lon1: float, lat2: float, lon2: float, num_
     return points
 
 
-def _sample_corridor_point(lat: float, lon: float, prefetched_items: Optional[Dict[str, list]] = None) -> Dict[str, Any]:
-    """Lightweight terrain check at a single corridor waypoint.
+def _points_bbox(points: List[tuple], radius_miles: float) -> List[float]:
+    """Bounding box of the ``radius_miles`` boxes around every (lat, lon) point."""
+    boxes = [_calculate_bbox(lat, lon, radius_miles) for lat, lon in points]
+    return [
+        min(b[0] for b in boxes),
+        min(b[1] for b in boxes),
+        max(b[2] for b in boxes),
+        max(b[3] for b in boxes),
+    ]
+
+
+def _corridor_pixels(
+    points: List[tuple], collection: str, asset_key: str, radius_miles: float,
+    prefetched_items: Optional[list] = None,
+) -> List[Optional[np.ndarray]]:
+    """Pixels of each point's ``radius_miles`` box, one COG read per covering item chunk.
+
+    Points are grouped by ``_items_covering_point``; without prefetched items
+    the collection is searched once for the whole point set.
+    """
+    from geoint.corridor_sampler import get_corridor_sampler
+
+    items = prefetched_items or _query_stac_collection_sync(
+        collection, _points_bbox(points, radius_miles), limit=10
+    )
+    if not items:
+        return [None] * len(points)
+    return get_corridor_sampler().sample(
+        points, lambda lat, lon: _items_covering_point(items, lat, lon), asset_key, radius_miles
+    )
+
+
+def _sample_corridor_points(points: List[tuple], prefetched_items: Optional[Dict[str, list]] = None) -> List[Dict[str, Any]]:
+    """Lightweight terrain check at every corridor waypoint.
     Only checks elevation/slope and land cover — fire and water are already
     assessed at the endpoints and don't need re-checking along the corridor.
-    Uses a smaller 2-mile radius. When prefetched_items are provided,
-    skips STAC queries entirely (uses corridor-level pre-fetched items).
+    Uses a smaller 2-mile radius. DEM and land cover are each read once per
+    covering item for all waypoints (see ``geoint.corridor_sampler``);
+    prefetched corridor items skip the STAC queries entirely.
     """
-    bbox = _calculate_bbox(lat, lon, radius_miles=2.0)  # smaller radius for corridor
-    result = {"latitude": lat, "longitude": lon, "status": "GO", "hazards": [], "data": {}}
+    prefetched_items = prefetched_items or {}
+    elev_future = raster_pool.submit(
+        _corridor_pixels, points, "cop-dem-glo-30", "data", 2.0, prefetched_items.get("cop-dem-glo-30")
+    )
+    lc_future = raster_pool.submit(
+        _corridor_pixels, points, "esa-worldcover", "map", 2.0, prefetched_items.get("esa-worldcover")
+    )
+    elevation, landcover = elev_future.result(), lc_future.result()
 
-    def _fetch(col, asset_key):
-        if prefetched_items and col in prefetched_items and prefetched_items[col]:
-            items = _items_covering_point(prefetched_items[col], lat, lon)
-        else:
-            items = _query_stac_collection_sync(col, bbox, limit=3)
-        if items:
-            asset = items[0].assets.get(asset_key)
-            if asset:
-                return _read_cog_window_sync(asset.href, bbox)
-        return None
+    return [
+        _evaluate_corridor_point(lat, lon, elev, lc)
+        for (lat, lon), elev, lc in zip(points, elevation, landcover)
+    ]
+
+
+def _sample_corridor_point(lat: float, lon: float, prefetched_items: Optional[Dict[str, list]] = None) -> Dict[str, Any]:
+    """Lightweight terrain check at a single corridor waypoint (see ``_sample_corridor_points``)."""
+    return _sample_corridor_points([(lat, lon)], prefetched_items)[0]
 
-    # Parallel COG reads (STAC queries skipped when prefetched)
-    fetched = {}
-    with ThreadPoolExecutor(max_workers=2) as executor:
-        futures = {
-            executor.submit(_fetch, "cop-dem-glo-30", "data"): "elevation",
-            executor.submit(_fetch, "esa-worldcover", "map"): "landcover",
-        }
-        for f in as_completed(futures):
-            fetched[futures[f]] = f.result()
+
+def _evaluate_corridor_point(
+    lat: float, lon: float, elevation: Optional[np.ndarray], landcover: Optional[np.ndarray]
+) -> Dict[str, Any]:
+    """Combine elevation/slope and land cover pixels into a waypoint status."""
+    result = {"latitude": lat, "longitude": lon, "status": "GO", "hazards": [], "data": {}}
 
     # Evaluate elevation/slope
-    if fetched.get("elevation") is not None:
-        r = _analyze_elevation_pixels(fetched["elevation"])
+    if elevation is not None:
+        r = _analyze_elevation_pixels(elevation)
         if r["status"] == "NO-GO":
             result["status"] = "NO-GO"
         elif r["status"] == "SLOW-GO":
@@ -442,8 +489,8 @@ def _sample_corridor_point(lat: float, lon: float, prefetched_items: Optional[Di
         result["data"]["elevation"] = r.get("metrics", {})
 
     # Evaluate land cover
-    if fetched.get("landcover") is not None:
-        r = _analyze_landcover_pixels(fetched["landcover"])
+    if landcover is not None:
+        r = _analyze_landcover_pixels(landcover)
         result["data"]["landcover"] = r.get("metrics", {})
         if r["status"] == "NO-GO" and result["status"] != "NO-GO":
             result["status"] = "NO-GO"
@@ -459,8 +506,12 @@ def _sample_corridor_point(lat: float, lon: float, prefetched_items: Optional[Di
 
 def _build_elevation_transect(lat1: float, lon1: float, lat2: float, lon2: float, num_samples: int = 10, prefetched_dem_items: Optional[list] = None) -> Dict[str, Any]:
     """Sample the DEM at points along A→B to produce an elevation profile.
-    When prefetched_dem_items are provided, skips per-point STAC queries (saves ~10 queries).
+    Each sample is the median of a 0.5-mile box. All samples are read through
+    the corridor engine (one window read per DEM item chunk), so hundreds of
+    samples cost about what ten per-point reads did. When prefetched_dem_items
+    are provided, skips the STAC query.
     """
+    num_samples = max(2, num_samples)
     points_coords = [(lat1, lon1)]  # include start
     for i in range(1, num_samples - 1):
         f = i / (num_samples - 1)
@@ -468,27 +519,9 @@ def _build_elevation_transect(lat1: float, lon1: float, lat2: float, lon2: float
     points_coords.append((lat2, lon2))  # include end
 
     elevations = []
-
-    def _sample_elev(lat, lon):
-        bbox = _calculate_bbox(lat, lon, radius_miles=0.5)
-        if prefetched_dem_items:
-            items = _items_covering_point(prefetched_dem_items, lat, lon)
-        else:
-            items = _query_stac_collection_sync("cop-dem-glo-30", bbox, limit=1)
-        if items:
-            asset = items[0].assets.get("data")
-            if asset:
-                px = _read_cog_window_sync(asset.href, bbox)
-                if px is not None:
-                    valid = px[~np.isnan(px)]
-                    if len(valid) > 0:
-                        return float(np.median(valid))
-        return None
-
-    with ThreadPoolExecutor(max_workers=min(num_samples, 6)) as executor:
-        futures = [executor.submit(_sample_elev, lat, lon) for lat, lon in points_coords]
-        for f in futures:
-            elevations.append(f.result())
+    for px in _corridor_pixels(points_coords, "cop-dem-glo-30", "data", 0.5, prefetched_dem_items):
+        valid = px[~np.isnan(px)] if px is not None else ()
+        elevations.append(float(np.median(valid)) if len(valid) > 0 else None)
 
     profile = []
     for i, ((lat, lon), elev) in enumerate(zip(points_coords, elevations)):
@@ -602,10 +635,13 @@ def _get_azure_maps_weather(lat: float, lon: float) -> Optional[Dict[str, Any]]:
 
 # ============================================================================
 # PUBLIC TOOL FUNCTIONS (registered with AsyncFunctionTool)
-# All functions are fully synchronous — no asyncio wrappers.
+# AsyncFunctionTool runs plain functions on the event loop, so every tool is
+# a coroutine: single-layer reads go through the async COG reader, and the
+# multi-layer analyses run on the shared raster pool (see ``raster_pool``).
 # ============================================================================
 
-def analyze_directional_mobility(latitude: float, longitude: float) -> str:
+@raster_tool
+async def analyze_directional_mobility(latitude: float, longitude: float) -> str:
     """Analyze terrain mobility in all four cardinal directions (N, S, E, W) from a location.
     Returns GO / SLOW-GO / NO-GO status for each direction based on fire, water, slope, and vegetation.
     Use this when the user asks about mobility, trafficability, or ground movement.
@@ -616,7 +652,7 @@ def analyze_directional_mobility(latitude: float, longitude: float) -> str:
     """
     try:
         logger.info(f"[TOOL] analyze_directional_mobility at ({latitude:.4f}, {longitude:.4f})")
-        result = _analyze_all_directions_sync(latitude, longitude)
+        result = await raster_pool.run(_analyze_all_directions_sync, latitude, longitude)
         return json.dumps(_convert_numpy_to_python(result))
     except Exception as e:
         logger.error(f"[TOOL] analyze_directional_mobility failed: {e}")
@@ -682,38 +718,36 @@ def _analyze_all_directions_sync(latitude: float, longitude: float, prefetched_i
                 logger.error(f"Collection {col} query failed: {e}")
                 return key, col, None, "error"
 
-        with ThreadPoolExecutor(max_workers=6) as executor:
-            futures = [
-                executor.submit(_fetch_collection, col, dt_range, qparams, key)
-                for (col, dt_range, qparams), key in zip(collection_queries, data_keys)
-            ]
-            for future in as_completed(futures):
-                key, col, result, status = future.result()
-                terrain_data["collection_status"][col] = status
-                if result:
-                    terrain_data[key] = result
-                    terrain_data["sources"].append(col)
-
-    # Analyze directions in parallel pairs (2 at a time to avoid network saturation)
+        futures = [
+            raster_pool.submit(_fetch_collection, col, dt_range, qparams, key)
+            for (col, dt_range, qparams), key in zip(collection_queries, data_keys)
+        ]
+        for future in raster_pool.as_completed(futures):
+            key, col, result, status = future.result()
+            terrain_data["collection_status"][col] = status
+            if result:
+                terrain_data[key] = result
+                terrain_data["sources"].append(col)
+
+    # Analyze directions in parallel (the raster pool's per-request quota bounds the fan-out)
     directions = {}
-    with ThreadPoolExecutor(max_workers=2) as dir_executor:
-        dir_futures = {
-            dir_executor.submit(
-                _analyze_single_direction_sync, name.title(), latitude, longitude, terrain_data, cardinal
-            ): name
-            for name, cardinal in [("north", "N"), ("south", "S"), ("east", "E"), ("west", "W")]
-        }
-        for f in as_completed(dir_futures):
-            name = dir_futures[f]
-            try:
-                directions[name] = f.result()
-            except Exception as e:
-                logger.error(f"Direction {name} analysis failed: {e}")
-                directions[name] = {
-                    "direction": name.title(), "cardinal": name[0].upper(),
-                    "status": "GO", "factors": [f"Analysis error: {e}"],
-                    "confidence": "low", "data_sources_used": [], "metrics": {}
-                }
+    dir_futures = {
+        raster_pool.submit(
+            _analyze_single_direction_sync, name.title(), latitude, longitude, terrain_data, cardinal
+        ): name
+        for name, cardinal in [("north", "N"), ("south", "S"), ("east", "E"), ("west", "W")]
+    }
+    for f in raster_pool.as_completed(dir_futures):
+        name = dir_futures[f]
+        try:
+            directions[name] = f.result()
+        except Exception as e:
+            logger.error(f"Direction {name} analysis failed: {e}")
+            directions[name] = {
+                "direction": name.title(), "cardinal": name[0].upper(),
+                "status": "GO", "factors": [f"Analysis error: {e}"],
+                "confidence": "low", "data_sources_used": [], "metrics": {}
+            }
 
     return {
         "location": {"latitude": latitude, "longitude": longitude},
@@ -776,18 +810,17 @@ def _analyze_single_direction_sync(direction_name: str, lat: float, lon: float,
     # Fetch all COGs concurrently
     fetched = {}
     if fetch_tasks:
-        with ThreadPoolExecutor(max_workers=min(len(fetch_tasks), 6)) as executor:
-            futures = {
-                executor.submit(_read_cog_window_sync, href, bbox, band): key
-                for key, (href, bbox, band) in fetch_tasks.items()
-            }
-            for future in as_completed(futures):
-                key = futures[future]
-                try:
-                    fetched[key] = future.result()
-                except Exception as e:
-                    logger.error(f"COG fetch {key} failed: {e}")
-                    fetched[key] = None
+        futures = {
+            raster_pool.submit(_read_cog_window_sync, href, bbox, band): key
+            for key, (href, bbox, band) in fetch_tasks.items()
+        }
+        for future in raster_pool.as_completed(futures):
+            key = futures[future]
+            try:
+                fetched[key] = future.result()
+            except Exception as e:
+                logger.error(f"COG fetch {key} failed: {e}")
+                fetched[key] = None
 
     # ── Evaluate analysis chain (sequential logic, but data already loaded) ──
 
@@ -872,7 +905,8 @@ def _analyze_single_direction_sync(direction_name: str, lat: float, lon: float,
     }
 
 
-def detect_water_bodies(latitude: float, longitude: float) -> str:
+@raster_tool
+async def detect_water_bodies(latitude: float, longitude: float) -> str:
     """Detect water bodies using JRC Global Surface Water occurrence data.
     Uses global water mapping from 1984-2021 to identify permanent and seasonal water.
     Returns water coverage percentage and classification.
@@ -884,13 +918,13 @@ def detect_water_bodies(latitude: float, longitude: float) -> str:
     try:
         logger.info(f"[TOOL] detect_water_bodies at ({latitude:.4f}, {longitude:.4f})")
         bbox = _calculate_bbox(latitude, longitude, RADIUS_MILES)
-        items = _query_stac_collection_sync("jrc-gsw", bbox, limit=5)
+        items = await raster_pool.run(_query_stac_collection_sync, "jrc-gsw", bbox, limit=5)
         if not items:
             return json.dumps({"status": "no_data", "message": "No JRC Global Surface Water data available"})
         asset = items[0].assets.get("occurrence", None)
         if not asset:
             return json.dumps({"status": "no_data", "message": "No water occurrence asset in JRC GSW"})
-        px = _read_cog_window_sync(asset.href, bbox)
+        px = await _read_cog_window(asset.href, bbox)
         if px is None:
             return json.dumps({"status": "error", "message": "Failed to read water occurrence raster"})
         result = _analyze_jrc_water_pixels(px)
@@ -900,7 +934,8 @@ def detect_water_bodies(latitude: float, longitude: float) -> str:
         return json.dumps({"error": str(e)})
 
 
-def detect_active_fires(latitude: float, longitude: float) -> str:
+@raster_tool
+async def detect_active_fires(latitude: float, longitude: float) -> str:
     """Detect active fires using MODIS thermal anomaly data.
     Returns fire confidence levels and pixel counts.
 
@@ -911,13 +946,13 @@ def detect_active_fires(latitude: float, longitude: float) -> str:
     try:
         logger.info(f"[TOOL] detect_active_fires at ({latitude:.4f}, {longitude:.4f})")
         bbox = _calculate_bbox(latitude, longitude, RADIUS_MILES)
-        items = _query_stac_collection_sync("modis-14A1-061", bbox, limit=5)
+        items = await raster_pool.run(_query_stac_collection_sync, "modis-14A1-061", bbox, limit=5)
         if not items:
             return json.dumps({"status": "no_data", "message": "No MODIS fire data available"})
         asset = items[0].assets.get("FireMask", None)
         if not asset:
             return json.dumps({"status": "no_data", "message": "No FireMask asset"})
-        px = _read_cog_window_sync(asset.href, bbox)
+        px = await _read_cog_window(asset.href, bbox)
         if px is None:
             return json.dumps({"status": "error", "message": "Failed to read fire raster"})
         result = _analyze_fire_pixels(px)
@@ -927,7 +962,8 @@ def detect_active_fires(latitude: float, longitude: float) -> str:
         return json.dumps({"error": str(e)})
 
 
-def analyze_slope_for_mobility(latitude: float, longitude: float) -> str:
+@raster_tool
+async def analyze_slope_for_mobility(latitude: float, longitude: float) -> str:
     """Analyze terrain slope from Copernicus DEM for vehicle mobility.
     Returns slope statistics and GO/SLOW-GO/NO-GO classification.
 
@@ -938,13 +974,13 @@ def analyze_slope_for_mobility(latitude: float, longitude: float) -> str:
     try:
         logger.info(f"[TOOL] analyze_slope_for_mobility at ({latitude:.4f}, {longitude:.4f})")
         bbox = _calculate_bbox(latitude, longitude, RADIUS_MILES)
-        items = _query_stac_collection_sync("cop-dem-glo-30", bbox, limit=5)
+        items = await raster_pool.run(_query_stac_collection_sync, "cop-dem-glo-30", bbox, limit=5)
         if not items:
             return json.dumps({"status": "no_data", "message": "No DEM data available"})
         asset = items[0].assets.get("data", None)
         if not asset:
             return json.dumps({"status": "no_data", "message": "No DEM data asset"})
-        px = _read_cog_window_sync(asset.href, bbox)
+        px = await _read_cog_window(asset.href, bbox)
         if px is None:
             return json.dumps({"status": "error", "message": "Failed to read DEM raster"})
         result = _analyze_elevation_pixels(px)
@@ -954,7 +990,8 @@ def analyze_slope_for_mobility(latitude: float, longitude: float) -> str:
         return json.dumps({"error": str(e)})
 
 
-def analyze_vegetation_density(latitude: float, longitude: float) -> str:
+@raster_tool
+async def analyze_vegetation_density(latitude: float, longitude: float) -> str:
     """Analyze vegetation density using Sentinel-2 NDVI calculation.
     Returns NDVI statistics and vegetation coverage classification.
 
@@ -967,15 +1004,16 @@ def analyze_vegetation_density(latitude: float, longitude: float) -> str:
         bbox = _calculate_bbox(latitude, longitude, RADIUS_MILES)
         end_date = datetime.utcnow()
         dt_range = f"{(end_date - timedelta(days=90)).isoformat()}Z/{end_date.isoformat()}Z"
-        items = _query_stac_collection_sync("sentinel-2-l2a", bbox, dt_range, query_params={"eo:cloud_cover": {"lt": 50}}, limit=5)
+        items = await raster_pool.run(_query_stac_collection_sync, "sentinel-2-l2a", bbox, dt_range, query_params={"eo:cloud_cover": {"lt": 50}}, limit=5)
         if not items:
             return json.dumps({"status": "no_data", "message": "No Sentinel-2 data available (may be cloudy)"})
         red_asset = items[0].assets.get("B04", None)
         nir_asset = items[0].assets.get("B08", None)
         if not red_asset or not nir_asset:
             return json.dumps({"status": "no_data", "message": "No Red/NIR band assets"})
-        red_px = _read_cog_window_sync(red_asset.href, bbox)
-        nir_px = _read_cog_window_sync(nir_asset.href, bbox)
+        red_px, nir_px = await asyncio.gather(
+            _read_cog_window(red_asset.href, bbox), _read_cog_window(nir_asset.href, bbox)
+        )
         if red_px is None or nir_px is None:
             return json.dumps({"status": "error", "message": "Failed to read Sentinel-2 raster"})
         result = _analyze_vegetation_pixels(red_px, nir_px)
@@ -1000,7 +1038,8 @@ def _haversine_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> D
     return {"distance_miles": round(dist_mi, 2), "distance_km": round(dist_mi * 1.60934, 2), "bearing_degrees": round(bearing, 1)}
 
 
-def analyze_two_point_traverse(latitude_a: float, longitude_a: float, latitude_b: float, longitude_b: float) -> str:
+@raster_tool
+async def analyze_two_point_traverse(latitude_a: float, longitude_a: float, latitude_b: float, longitude_b: float) -> str:
     """Analyze terrain traversability between two points (A and B) simultaneously.
     Runs mobility analysis at both endpoints IN PARALLEL, plus corridor waypoint
     sampling, elevation transect, Azure Maps road route, and weather conditions.
@@ -1012,6 +1051,13 @@ def analyze_two_point_traverse(latitude_a: float, longitude_a: float, latitude_b
     :param longitude_b: Destination point (Point B) longitude
     :return: JSON string with mobility assessments for both points, corridor, elevation profile, road route, and weather
     """
+    return await raster_pool.run(
+        _analyze_two_point_traverse_sync, latitude_a, longitude_a, latitude_b, longitude_b
+    )
+
+
+def _analyze_two_point_traverse_sync(latitude_a: float, longitude_a: float, latitude_b: float, longitude_b: float) -> str:
+    """Two-point traverse analysis (blocking; fans out over the raster pool)."""
     try:
         logger.info(f"[TOOL] analyze_two_point_traverse A({latitude_a:.4f}, {longitude_a:.4f}) -> B({latitude_b:.4f}, {longitude_b:.4f})")
         route = _haversine_distance(latitude_a, longitude_a, latitude_b, longitude_b)
@@ -1035,39 +1081,36 @@ def analyze_two_point_traverse(latitude_a: float, longitude_a: float, latitude_b
         dem_items = prefetched.get("cop-dem-glo-30") or None
 
         # Run ALL analyses in PARALLEL with pre-fetched STAC data:
-        with ThreadPoolExecutor(max_workers=6 + num_waypoints) as executor:
-            future_a = executor.submit(_analyze_all_directions_sync, latitude_a, longitude_a, prefetched)
-            future_b = executor.submit(_analyze_all_directions_sync, latitude_b, longitude_b, prefetched)
-            future_transect = executor.submit(_build_elevation_transect, latitude_a, longitude_a, latitude_b, longitude_b, 10, dem_items)
-            future_route = executor.submit(_get_azure_maps_route, latitude_a, longitude_a, latitude_b, longitude_b)
-            future_weather_a = executor.submit(_get_azure_maps_weather, latitude_a, longitude_a)
-            future_weather_b = executor.submit(_get_azure_maps_weather, latitude_b, longitude_b)
-            corridor_futures = [
-                executor.submit(_sample_corridor_point, wp["latitude"], wp["longitude"], prefetched)
-                for wp in waypoints
-            ]
-
-            result_a = future_a.result(timeout=120)
-            result_b = future_b.result(timeout=120)
-
-            # Gather corridor results (tolerate individual failures)
+        future_a = raster_pool.submit(_analyze_all_directions_sync, latitude_a, longitude_a, prefetched)
+        future_b = raster_pool.submit(_analyze_all_directions_sync, latitude_b, longitude_b, prefetched)
+        future_transect = raster_pool.submit(_build_elevation_transect, latitude_a, longitude_a, latitude_b, longitude_b, TRANSECT_SAMPLES, dem_items)
+        future_route = raster_pool.submit(_get_azure_maps_route, latitude_a, longitude_a, latitude_b, longitude_b)
+        future_weather_a = raster_pool.submit(_get_azure_maps_weather, latitude_a, longitude_a)
+        future_weather_b = raster_pool.submit(_get_azure_maps_weather, latitude_b, longitude_b)
+        future_corridor = raster_pool.submit(
+            _sample_corridor_points, [(wp["latitude"], wp["longitude"]) for wp in waypoints], prefetched
+        )
+
+        result_a = future_a.result(timeout=120)
+        result_b = future_b.result(timeout=120)
+
+        # Gather corridor results (all waypoints share one read per COG chunk)
+        try:
+            corridor_results = future_corridor.result(timeout=60)
+        except Exception as e:
+            logger.error(f"Corridor waypoints failed: {e}")
             corridor_results = []
-            for cf in corridor_futures:
-                try:
-                    corridor_results.append(cf.result(timeout=60))
-                except Exception as e:
-                    logger.error(f"Corridor waypoint failed: {e}")
 
-            # Gather supplementary data (non-blocking)
-            try:
-                elevation_transect = future_transect.result(timeout=60)
-            except Exception as e:
-                logger.error(f"Elevation transect failed: {e}")
-                elevation_transect = None
+        # Gather supplementary data (non-blocking)
+        try:
+            elevation_transect = future_transect.result(timeout=60)
+        except Exception as e:
+            logger.error(f"Elevation transect failed: {e}")
+            elevation_transect = None
 
-            road_route = future_route.result(timeout=15)
-            weather_a = future_weather_a.result(timeout=10)
-            weather_b = future_weather_b.result(timeout=10)
+        road_route = future_route.result(timeout=15)
+        weather_a = future_weather_a.result(timeout=10)
+        weather_b = future_weather_b.result(timeout=10)
 
         # Compute corridor summary
         corridor_statuses = [wp.get("status", "GO") for wp in corridor_results]
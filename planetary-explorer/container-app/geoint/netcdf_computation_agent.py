@@ -16,6 +16,7 @@ from typing import Any, Dict, List, Optional
 
 from azure.identity import DefaultAzureCredential
 from cloud_config import cloud_cfg
+from pipeline.session_store import session_map
 
 logger = logging.getLogger(__name__)
 
@@ -44,7 +45,7 @@ You can extract time-series data, compute spatial statistics over areas, detect
 
 ### Change Analysis
 - **compute_anomaly**: Compute the change between a baseline year and a target year. Use for "how much will X increase by 2050?" questions. Returns absolute and percent change.
-- **compute_trend**: Fit a linear trend across multiple decades. Use for "is it getting hotter?", "long-term precipitation trends" questions. Returns slope per decade, R², and confidence rating.
+- **compute_trend**: Fit a linear trend across multiple decades. Use for "is it getting hotter?", "long-term precipitation trends" questions. Returns slope per decade with 95% CI, Sen's slope, R², and confidence rating.
 
 ### Calculator
 - **calculate_derived**: Evaluate a math expression with named variables. Use to combine tool outputs — e.g., compute annual precipitation from daily rate: `precip_mm_day * 365.25`. Supports +, -, *, /, **, abs(), round(), sqrt(), etc.
@@ -113,7 +114,9 @@ class NetCDFComputationAgent:
     """
 
     def __init__(self):
-        self.sessions: Dict[str, NetCDFComputationAgentSession] = {}
+        # Shared session store (see pipeline.session_store) so any worker or
+        # replica can resume a conversation's Agent Service thread.
+        self.sessions = session_map("netcdf_computation", NetCDFComputationAgentSession)
         self._agents_client = None
         self._agent_id: Optional[str] = None
         self._initialized = False
@@ -182,27 +185,25 @@ class NetCDFComputationAgent:
     async def _get_or_create_session(
         self, session_id: str, latitude: float, longitude: float
     ) -> NetCDFComputationAgentSession:
-        if session_id in self.sessions:
-            session = self.sessions[session_id]
+        session = await self.sessions.aget(session_id)
+        if session is not None:
             session.update_location(latitude, longitude)
+            await self.sessions.aset(session_id, session)
             return session
 
         thread = await self._agents_client.threads.create()
         session = NetCDFComputationAgentSession(session_id, latitude, longitude, thread.id)
-        self.sessions[session_id] = session
+        await self.sessions.aset(session_id, session)
         logger.info(f"Created new computation session: {session_id} -> thread: {thread.id}")
         return session
 
     def cleanup_old_sessions(self, max_age_minutes: int = 60):
-        now = datetime.utcnow()
-        expired = [
-            sid
-            for sid, s in self.sessions.items()
-            if (now - s.last_activity).total_seconds() > max_age_minutes * 60
-        ]
-        for sid in expired:
-            del self.sessions[sid]
-            logger.info(f"Cleaned up expired computation session: {sid}")
+        """Remove sessions idle for more than max_age_minutes."""
+        # every turn writes the session back, so the store's write time
+        # tracks last_activity without loading each session
+        purged = self.sessions.purge_idle(max_age_minutes * 60)
+        if purged:
+            logger.info(f"Cleaned up {purged} expired computation session(s)")
 
     async def chat(
         self,
@@ -288,7 +289,7 @@ class NetCDFComputationAgent:
                         self._initialized = False
                         self._agent_id = None
                         self._agents_client = None
-                        self.sessions.clear()
+                        await self.sessions.adelete(session.session_id)
                         await self._ensure_initialized()
                         continue
                     return {
@@ -341,6 +342,7 @@ class NetCDFComputationAgent:
 
                 session.message_count += 2
                 session.last_activity = datetime.utcnow()
+                await self.sessions.aset(session.session_id, session)
 
                 logger.info(f"Computation agent response ({len(response_content)} chars, {len(tool_calls)} tool calls)")
                 return {
@@ -359,7 +361,7 @@ class NetCDFComputationAgent:
                     self._initialized = False
                     self._agent_id = None
                     self._agents_client = None
-                    self.sessions.clear()
+                    await self.sessions.adelete(session.session_id)
                     try:
                         await self._ensure_initialized()
                         continue
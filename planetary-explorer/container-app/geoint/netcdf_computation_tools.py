@@ -18,12 +18,14 @@ import json
 import logging
 import math
 import operator
+import os
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import Any, Callable, Dict, List, Optional, Set
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
 
 import numpy as np
 
+import raster_pool
+import result_cache
 from cloud_config import cloud_cfg
 
 logger = logging.getLogger(__name__)
@@ -35,12 +37,7 @@ from geoint.extreme_weather_tools import (
     PREFERRED_MODELS,
     _convert_longitude,
     _get_https_fs,
-    _netcdf_pool,
-    _netcdf_result_cache,
-    _netcdf_result_cache_ts,
-    _netcdf_cache_ttl,
     _search_cmip6_items,
-    _stac_search_cache,
     _values_pool,
 )
 
@@ -149,6 +146,200 @@ def _safe_eval_node(node: ast.AST, variables: Dict[str, float]) -> float:
     raise ValueError(f"Unsupported expression node: {type(node).__name__}")
 
 
+# ============================================================================
+# MULTI-YEAR EXTRACTION (compute_anomaly / compute_trend)
+# ============================================================================
+# Annual means are memoized per (variable, grid cell, scenario, year), so a
+# 2020-2060 trend reuses the years a 2030 vs 2050 anomaly already read (and
+# the other way round), and any point in the same 0.25° cell shares them.
+# Missing years are fetched concurrently on the raster pool, at most
+# NETCDF_CALC_YEAR_PARALLELISM at a time, then stacked into one array.
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name) or default)
+    except ValueError:
+        return default
+
+
+_YEAR_PARALLELISM = max(1, _env_int("NETCDF_CALC_YEAR_PARALLELISM", 8))
+_TREND_MAX_YEARS = max(2, _env_int("NETCDF_CALC_TREND_MAX_YEARS", 30))
+
+# Annual means per (variable, grid cell, scenario, year); shared by trend and anomaly.
+_annual_mean_memo = result_cache.namespace("cmip6-annual-mean", ttl_s=3600)
+# Finished tool outputs (timeseries, area stats, anomaly, trend); concurrent identical calls compute once.
+_tool_results = result_cache.namespace("netcdf-calc", ttl_s=3600)
+
+
+def _grid_cell(latitude: float, sample_lng: float) -> Tuple[float, float]:
+    """Centre of the 0.25° NEX-GDDP cell nearest to (lat, 0..360 lon), as xarray's nearest picks it."""
+    return (
+        math.floor(latitude * 4) / 4 + 0.125,
+        math.floor(sample_lng * 4) / 4 + 0.125,
+    )
+
+
+def _annual_mean(latitude: float, longitude: float, variable: str, scenario: str, year: int) -> Dict[str, Any]:
+    """Annual mean of one year at a point: ``{"value", "model"}`` or ``{"error"}``."""
+    from geoint.extreme_weather_tools import _sample_netcdf
+
+    items = _search_cmip6_items(latitude, longitude, variable, scenario, year, limit=1)
+    if not items:
+        return {"error": f"No data for {year}"}
+    item = items[0]
+    asset = item.get("assets", {}).get(variable)
+    href = asset.get("href", "") if isinstance(asset, dict) else ""
+    if not href:
+        return {"error": f"No asset for {variable} in {year}"}
+    sample = _sample_netcdf(href, variable, latitude, longitude, aggregate="annual")
+    if "error" in sample:
+        return {"error": sample["error"]}
+    value = sample.get("raw_mean", sample.get("raw_value"))
+    if value is None:
+        return {"error": f"No value for {variable} in {year}"}
+    model = item.get("id", "").split(".")[0] if "." in item.get("id", "") else "unknown"
+    return {"value": float(value), "model": model}
+
+
+def _annual_means(
+    latitude: float,
+    longitude: float,
+    variable: str,
+    scenario: str,
+    years: List[int],
+    timeout: float = 180,
+) -> Dict[int, Dict[str, Any]]:
+    """Annual mean per year (``{"value", "model"}`` or ``{"error"}``), memoized per grid cell.
+
+    Years not in the memo are fetched concurrently with at most
+    ``_YEAR_PARALLELISM`` in flight; years still running at ``timeout`` are
+    reported as errors and cancelled.
+    """
+    cell_lat, cell_lon = _grid_cell(latitude, _convert_longitude(longitude))
+    prefix = f"{variable}:{cell_lat}:{cell_lon}:{scenario}"
+    out: Dict[int, Dict[str, Any]] = {}
+    missing: List[int] = []
+    for yr in dict.fromkeys(years):
+        cached = _annual_mean_memo.get(f"{prefix}:{yr}")
+        if cached is not None:
+            out[yr] = cached
+        else:
+            missing.append(yr)
+    if out:
+        logger.info(f"[NETCDF-CALC] Annual means: {len(out)} years memoized, fetching {len(missing)}")
+
+    deadline = time.time() + timeout
+    running: Dict[Any, int] = {}
+    try:
+        while missing or running:
+            while missing and len(running) < _YEAR_PARALLELISM:
+                yr = missing.pop(0)
+                running[raster_pool.submit(_annual_mean, latitude, longitude, variable, scenario, yr)] = yr
+            done = next(raster_pool.as_completed(list(running), timeout=max(0.1, deadline - time.time())))
+            yr = running.pop(done)
+            try:
+                out[yr] = done.result()
+            except Exception as e:
+                logger.warning(f"[NETCDF-CALC] Annual mean for {yr} failed: {e}")
+                out[yr] = {"error": str(e)}
+                continue
+            if "error" not in out[yr]:
+                _annual_mean_memo.put(f"{prefix}:{yr}", out[yr])
+    except TimeoutError:
+        logger.warning(f"[NETCDF-CALC] Annual means timed out after {timeout:.0f}s, {len(running) + len(missing)} years dropped")
+        for f, yr in running.items():
+            f.cancel()
+            out[yr] = {"error": f"Timed out reading {yr}"}
+        for yr in missing:
+            out[yr] = {"error": f"Timed out reading {yr}"}
+    return out
+
+
+def _trend_years(start_year: int, end_year: int) -> List[int]:
+    """Every year of the range, or ``_TREND_MAX_YEARS`` evenly spaced ones (ends included)."""
+    if end_year - start_year + 1 <= _TREND_MAX_YEARS:
+        return list(range(start_year, end_year + 1))
+    return sorted({int(round(y)) for y in np.linspace(start_year, end_year, _TREND_MAX_YEARS)})
+
+
+def _trend_statistics(years: np.ndarray, values: np.ndarray, confidence: float = 0.95) -> Dict[str, np.ndarray]:
+    """OLS and Theil-Sen trend statistics for one or more series in one pass.
+
+    ``values`` is ``(n_years,)`` or ``(n_years, n_series)``; every entry of
+    the result has one value per series. Slopes are per year. The OLS
+    slope interval uses Student's t with n-2 degrees of freedom; the Sen
+    slope interval and the Mann-Kendall p-value use the normal
+    approximation of the Kendall S statistic (Gilbert 1987). Intervals
+    and p-values are NaN for fewer than three years.
+    """
+    from scipy import stats as st
+
+    x = np.asarray(years, dtype=float)
+    y = np.asarray(values, dtype=float).reshape(len(x), -1)
+    n = len(x)
+
+    dx = x - x.mean()
+    dy = y - y.mean(axis=0)
+    ss_xx = float(np.sum(dx ** 2))
+    ss_xy = dx @ dy
+    ss_yy = np.sum(dy ** 2, axis=0)
+    slope = ss_xy / ss_xx
+    intercept = y.mean(axis=0) - slope * x.mean()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        r_squared = np.where(ss_yy > 0, ss_xy ** 2 / (ss_xx * ss_yy), 0.0)
+
+    dof = n - 2
+    nan = np.full(slope.shape, np.nan)
+    if dof > 0:
+        resid = dy - np.outer(dx, slope)
+        stderr = np.sqrt(np.sum(resid ** 2, axis=0) / dof / ss_xx)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            t_stat = np.where(stderr > 0, slope / stderr, np.inf * np.sign(slope))
+        p_value = 2 * st.t.sf(np.abs(t_stat), dof)
+        half = st.t.ppf(0.5 + confidence / 2, dof) * stderr
+        slope_lo, slope_hi = slope - half, slope + half
+    else:
+        p_value, slope_lo, slope_hi = nan, nan, nan
+
+    # Theil-Sen: median of all pairwise slopes; Mann-Kendall S from their signs
+    i, j = np.triu_indices(n, 1)
+    diffs = y[j] - y[i]
+    pair_slopes = np.sort(diffs / (x[j] - x[i])[:, None], axis=0)
+    sens_slope = np.median(pair_slopes, axis=0)
+    s = np.sum(np.sign(diffs), axis=0)
+    var_s = n * (n - 1) * (2 * n + 5) / 18.0
+    if n > 2:
+        z = np.where(s > 0, (s - 1) / math.sqrt(var_s), np.where(s < 0, (s + 1) / math.sqrt(var_s), 0.0))
+        mk_p_value = 2 * st.norm.sf(np.abs(z))
+        m = len(i)
+        c = st.norm.ppf(0.5 + confidence / 2) * math.sqrt(var_s)
+        lo_idx = int(np.clip(round((m - c) / 2) - 1, 0, m - 1))
+        hi_idx = int(np.clip(round((m + c) / 2), 0, m - 1))
+        sens_lo, sens_hi = pair_slopes[lo_idx], pair_slopes[hi_idx]
+    else:
+        mk_p_value, sens_lo, sens_hi = nan, nan, nan
+
+    return {
+        "slope": slope, "intercept": intercept, "r_squared": r_squared, "p_value": p_value,
+        "slope_lo": slope_lo, "slope_hi": slope_hi,
+        "sens_slope": sens_slope, "sens_lo": sens_lo, "sens_hi": sens_hi,
+        "mk_s": s, "mk_p_value": mk_p_value,
+    }
+
+
+def _display_delta(convert: Callable[[float], float], base: float, delta: float) -> Optional[float]:
+    """A raw-unit change expressed in display units (offset-safe, e.g. K -> °F)."""
+    if not math.isfinite(delta):
+        return None
+    return round(convert(base + delta) - convert(base), 2)
+
+
+def _finite(value: float, digits: int) -> Optional[float]:
+    """JSON-safe rounding (NaN / inf -> None)."""
+    value = float(value)
+    return round(value, digits) if math.isfinite(value) else None
+
+
 # ============================================================================
 # TOOL FUNCTIONS (all return JSON strings)
 # ============================================================================
@@ -213,6 +404,99 @@ def discover_datasets(query: str) -> str:
     })
 
 
+def _point_series(href: str, variable: str, latitude: float, sample_lng: float) -> np.ndarray:
+    """Full daily series of the grid cell nearest (lat, 0..360 lon).
+
+    Read through the chunk references (``geoint.cmip6_refs``) when the asset
+    can be indexed; otherwise through xarray + h5netcdf, subsampled to ~365
+    values so a multi-year file stays within the timeout.
+    """
+    from geoint import cmip6_refs
+
+    engine = cmip6_refs.get_reference_engine()
+    values = engine.read_point(href, variable, latitude, sample_lng) if engine else None
+    if values is not None:
+        if values.ndim != 1 or values.size == 0:
+            raise ValueError("No time dimension in dataset")
+        return values
+
+    import xarray as xr
+
+    fs = _get_https_fs()
+    f = fs.open(href)
+    ds = xr.open_dataset(f, engine="h5netcdf", decode_times=False)
+    try:
+        point = ds[variable].sel(lat=latitude, lon=sample_lng, method="nearest")
+
+        n_times = len(point.time) if "time" in point.dims else 0
+        if n_times == 0:
+            raise ValueError("No time dimension in dataset")
+
+        # Read all values (subsample if >365 to stay in timeout)
+        if n_times > 400:
+            step = max(1, n_times // 365)
+            point = point.isel(time=slice(None, None, step))
+
+        future = _values_pool.submit(lambda p=point: p.values.astype(float))
+        try:
+            return future.result(timeout=60)
+        except TimeoutError:
+            raise TimeoutError("NetCDF read timed out")
+    finally:
+        ds.close()
+        try:
+            f.close()
+        except Exception:
+            pass
+
+
+def _area_snapshot(href: str, variable: str, lat_range: tuple, lon_range: tuple) -> np.ndarray:
+    """Last timestep over the cells inside the box, as a (lat, lon) array.
+
+    ``lon_range`` is in 0..360; a range with min > max wraps the date line.
+    Chunk references when available, xarray + h5netcdf otherwise.
+    """
+    from geoint import cmip6_refs
+
+    lon_parts = [lon_range] if lon_range[0] <= lon_range[1] else [(lon_range[0], 360), (0, lon_range[1])]
+    engine = cmip6_refs.get_reference_engine()
+    if engine is not None:
+        parts = [engine.read_area(href, variable, lat_range, lons) for lons in lon_parts]
+        if all(p is not None for p in parts):
+            return np.concatenate(parts, axis=1)
+
+    import xarray as xr
+
+    fs = _get_https_fs()
+    f = fs.open(href)
+    ds = xr.open_dataset(f, engine="h5netcdf", decode_times=False)
+    try:
+        data = ds[variable]
+
+        # Select spatial subset
+        parts = [data.sel(lat=slice(*lat_range), lon=slice(*lons)) for lons in lon_parts]
+        spatial = parts[0] if len(parts) == 1 else xr.concat(parts, dim="lon")  # wraps the date line
+
+        if "lat" not in spatial.dims or "lon" not in spatial.dims or 0 in spatial.shape:
+            return np.empty((0, 0))
+
+        # For a snapshot: use the last timestep
+        if "time" in spatial.dims:
+            spatial = spatial.isel(time=-1)
+
+        future = _values_pool.submit(lambda s=spatial.transpose("lat", "lon"): s.values.astype(float))
+        try:
+            return future.result(timeout=60)
+        except TimeoutError:
+            raise TimeoutError("NetCDF area read timed out")
+    finally:
+        ds.close()
+        try:
+            f.close()
+        except Exception:
+            pass
+
+
 def sample_timeseries(
     latitude: float,
     longitude: float,
@@ -233,8 +517,6 @@ def sample_timeseries(
     :param aggregation: 'monthly' (12 values) or 'seasonal' (4 values: DJF, MAM, JJA, SON). Default 'monthly'
     :return: JSON string with time series data
     """
-    import xarray as xr
-
     logger.info(f"[NETCDF-CALC] sample_timeseries: {variable} at ({latitude}, {longitude}), {scenario}/{year}, agg={aggregation}")
 
     var_info = CLIMATE_VAR_INFO.get(variable)
@@ -244,146 +526,128 @@ def sample_timeseries(
     # Cache key for the full timeseries
     sample_lng = _convert_longitude(longitude)
     cache_key = f"ts:{variable}:{latitude:.4f}:{sample_lng:.4f}:{scenario}:{year}:{aggregation}"
-    now = time.time()
-    if cache_key in _netcdf_result_cache:
-        age = now - _netcdf_result_cache_ts.get(cache_key, 0)
-        if age < _netcdf_cache_ttl:
-            logger.info(f"[NETCDF-CALC] Timeseries CACHE HIT ({age:.0f}s old)")
-            return json.dumps(_netcdf_result_cache[cache_key])
+    result = _tool_results.get_or_compute(
+        cache_key,
+        lambda: _timeseries(latitude, longitude, variable, scenario, year, aggregation, var_info, sample_lng),
+        cache_if=lambda r: "error" not in r,
+    )
+    return json.dumps(result)
 
+
+def _timeseries(
+    latitude: float,
+    longitude: float,
+    variable: str,
+    scenario: str,
+    year: int,
+    aggregation: str,
+    var_info: Dict[str, Any],
+    sample_lng: float,
+) -> Dict[str, Any]:
+    """Timeseries body of :func:`sample_timeseries`: the result dict or ``{"error"}``."""
     try:
         items = _search_cmip6_items(latitude, longitude, variable, scenario, year, limit=1)
         if not items:
-            return json.dumps({"error": f"No CMIP6 data for {variable}/{scenario}/{year}"})
+            return {"error": f"No CMIP6 data for {variable}/{scenario}/{year}"}
 
         item = items[0]
         assets = item.get("assets", {})
         href = assets.get(variable, {}).get("href", "") if isinstance(assets.get(variable), dict) else ""
         if not href:
-            return json.dumps({"error": f"No asset href for variable '{variable}'"})
+            return {"error": f"No asset href for variable '{variable}'"}
 
         model_id = item.get("id", "").split(".")[0] if "." in item.get("id", "") else "unknown"
 
-        # Read the full year via xarray
-        fs = _get_https_fs()
-        f = fs.open(href)
-        ds = xr.open_dataset(f, engine="h5netcdf", decode_times=False)
-
-        try:
-            data = ds[variable]
-            point = data.sel(lat=latitude, lon=sample_lng, method="nearest")
-
-            n_times = len(point.time) if "time" in point.dims else 0
-            if n_times == 0:
-                return json.dumps({"error": "No time dimension in dataset"})
-
-            # Read all values (subsample if >365 to stay in timeout)
-            if n_times > 400:
-                step = max(1, n_times // 365)
-                point = point.isel(time=slice(None, None, step))
-
-            future = _values_pool.submit(lambda p=point: p.values.astype(float))
-            try:
-                all_values = future.result(timeout=60)
-            except TimeoutError:
-                return json.dumps({"error": "NetCDF read timed out"})
-
-            valid_mask = ~np.isnan(all_values)
-            if not valid_mask.any():
-                return json.dumps({"error": "No valid data at this location"})
-
-            convert = var_info["convert"]
-
-            # Aggregate into periods
-            n_days = len(all_values)
-            if aggregation == "seasonal":
-                # Approximate: DJF=Jan-Feb+Dec, MAM=Mar-May, JJA=Jun-Aug, SON=Sep-Nov
-                season_names = ["DJF (Winter)", "MAM (Spring)", "JJA (Summer)", "SON (Fall)"]
-                # Approximate day boundaries (for a 365-day year)
-                season_slices = [
-                    list(range(0, min(59, n_days))) + list(range(max(0, min(334, n_days)), n_days)),  # DJF
-                    list(range(min(59, n_days), min(151, n_days))),   # MAM
-                    list(range(min(151, n_days), min(243, n_days))),  # JJA
-                    list(range(min(243, n_days), min(334, n_days))),  # SON
-                ]
-                periods = []
-                for name, indices in zip(season_names, season_slices):
-                    if not indices:
-                        continue
-                    vals = all_values[indices]
-                    valid = vals[~np.isnan(vals)]
-                    if len(valid) == 0:
-                        continue
-                    periods.append({
-                        "period": name,
-                        "mean": convert(float(np.mean(valid))),
-                        "max": convert(float(np.max(valid))),
-                        "min": convert(float(np.min(valid))),
-                        "unit": var_info["display_unit"],
-                    })
-            else:
-                # Monthly: split into ~12 equal chunks
-                days_per_month = max(1, n_days // 12)
-                month_names = ["Jan", "Feb", "Mar", "Apr", "May", "Jun",
-                               "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
-                periods = []
-                for m in range(12):
-                    start = m * days_per_month
-                    end = min((m + 1) * days_per_month, n_days)
-                    if start >= n_days:
-                        break
-                    vals = all_values[start:end]
-                    valid = vals[~np.isnan(vals)]
-                    if len(valid) == 0:
-                        continue
-                    periods.append({
-                        "period": month_names[m],
-                        "mean": convert(float(np.mean(valid))),
-                        "max": convert(float(np.max(valid))),
-                        "min": convert(float(np.min(valid))),
-                        "unit": var_info["display_unit"],
-                    })
-
-            # Annual summary
-            valid_all = all_values[valid_mask]
-            annual_summary = {
-                "annual_mean": convert(float(np.mean(valid_all))),
-                "annual_max": convert(float(np.max(valid_all))),
-                "annual_min": convert(float(np.min(valid_all))),
-                "unit": var_info["display_unit"],
-                "days_sampled": int(valid_mask.sum()),
-                "total_days": n_days,
-            }
-
-            result = {
-                "location": {"latitude": latitude, "longitude": longitude},
-                "variable": variable,
-                "variable_name": var_info["name"],
-                "scenario": scenario,
-                "year": year,
-                "model": model_id,
-                "aggregation": aggregation,
-                "periods": periods,
-                "annual_summary": annual_summary,
-                "data_source": "NASA NEX-GDDP-CMIP6",
-                "grid_resolution": "0.25° × 0.25°",
-            }
-
-            _netcdf_result_cache[cache_key] = result
-            _netcdf_result_cache_ts[cache_key] = now
-            logger.info(f"[NETCDF-CALC] Timeseries: {len(periods)} periods for {variable}/{scenario}/{year}")
-            return json.dumps(result)
-
-        finally:
-            ds.close()
-            try:
-                f.close()
-            except Exception:
-                pass
+        # Full daily series: chunk references when available, else xarray
+        all_values = _point_series(href, variable, latitude, sample_lng)
+
+        valid_mask = ~np.isnan(all_values)
+        if not valid_mask.any():
+            return {"error": "No valid data at this location"}
+
+        convert = var_info["convert"]
+
+        # Aggregate into periods
+        n_days = len(all_values)
+        if aggregation == "seasonal":
+            # Approximate: DJF=Jan-Feb+Dec, MAM=Mar-May, JJA=Jun-Aug, SON=Sep-Nov
+            season_names = ["DJF (Winter)", "MAM (Spring)", "JJA (Summer)", "SON (Fall)"]
+            # Approximate day boundaries (for a 365-day year)
+            season_slices = [
+                list(range(0, min(59, n_days))) + list(range(max(0, min(334, n_days)), n_days)),  # DJF
+                list(range(min(59, n_days), min(151, n_days))),   # MAM
+                list(range(min(151, n_days), min(243, n_days))),  # JJA
+                list(range(min(243, n_days), min(334, n_days))),  # SON
+            ]
+            periods = []
+            for name, indices in zip(season_names, season_slices):
+                if not indices:
+                    continue
+                vals = all_values[indices]
+                valid = vals[~np.isnan(vals)]
+                if len(valid) == 0:
+                    continue
+                periods.append({
+                    "period": name,
+                    "mean": convert(float(np.mean(valid))),
+                    "max": convert(float(np.max(valid))),
+                    "min": convert(float(np.min(valid))),
+                    "unit": var_info["display_unit"],
+                })
+        else:
+            # Monthly: split into ~12 equal chunks
+            days_per_month = max(1, n_days // 12)
+            month_names = ["Jan", "Feb", "Mar", "Apr", "May", "Jun",
+                           "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+            periods = []
+            for m in range(12):
+                start = m * days_per_month
+                end = min((m + 1) * days_per_month, n_days)
+                if start >= n_days:
+                    break
+                vals = all_values[start:end]
+                valid = vals[~np.isnan(vals)]
+                if len(valid) == 0:
+                    continue
+                periods.append({
+                    "period": month_names[m],
+                    "mean": convert(float(np.mean(valid))),
+                    "max": convert(float(np.max(valid))),
+                    "min": convert(float(np.min(valid))),
+                    "unit": var_info["display_unit"],
+                })
+
+        # Annual summary
+        valid_all = all_values[valid_mask]
+        annual_summary = {
+            "annual_mean": convert(float(np.mean(valid_all))),
+            "annual_max": convert(float(np.max(valid_all))),
+            "annual_min": convert(float(np.min(valid_all))),
+            "unit": var_info["display_unit"],
+            "days_sampled": int(valid_mask.sum()),
+            "total_days": n_days,
+        }
+
+        result = {
+            "location": {"latitude": latitude, "longitude": longitude},
+            "variable": variable,
+            "variable_name": var_info["name"],
+            "scenario": scenario,
+            "year": year,
+            "model": model_id,
+            "aggregation": aggregation,
+            "periods": periods,
+            "annual_summary": annual_summary,
+            "data_source": "NASA NEX-GDDP-CMIP6",
+            "grid_resolution": "0.25° × 0.25°",
+        }
+
+        logger.info(f"[NETCDF-CALC] Timeseries: {len(periods)} periods for {variable}/{scenario}/{year}")
+        return result
 
     except Exception as e:
         logger.error(f"[NETCDF-CALC] sample_timeseries failed: {e}")
-        return json.dumps({"error": str(e)})
+        return {"error": str(e)}
 
 
 def sample_area_stats(
@@ -408,8 +672,6 @@ def sample_area_stats(
     :param year: Projection year (2015-2100). Default 2030
     :return: JSON string with spatial statistics for the area
     """
-    import xarray as xr
-
     logger.info(f"[NETCDF-CALC] sample_area_stats: {variable} over [{min_lat},{max_lat},{min_lon},{max_lon}], {scenario}/{year}")
 
     var_info = CLIMATE_VAR_INFO.get(variable)
@@ -421,116 +683,92 @@ def sample_area_stats(
     sample_max_lon = _convert_longitude(max_lon)
 
     cache_key = f"area:{variable}:{min_lat:.2f}:{max_lat:.2f}:{sample_min_lon:.2f}:{sample_max_lon:.2f}:{scenario}:{year}"
-    now = time.time()
-    if cache_key in _netcdf_result_cache:
-        age = now - _netcdf_result_cache_ts.get(cache_key, 0)
-        if age < _netcdf_cache_ttl:
-            logger.info(f"[NETCDF-CALC] Area stats CACHE HIT ({age:.0f}s old)")
-            return json.dumps(_netcdf_result_cache[cache_key])
+    result = _tool_results.get_or_compute(
+        cache_key,
+        lambda: _area_stats(
+            min_lat, max_lat, min_lon, max_lon, variable, scenario, year, var_info, sample_min_lon, sample_max_lon
+        ),
+        cache_if=lambda r: "error" not in r,
+    )
+    return json.dumps(result)
 
+
+def _area_stats(
+    min_lat: float,
+    max_lat: float,
+    min_lon: float,
+    max_lon: float,
+    variable: str,
+    scenario: str,
+    year: int,
+    var_info: Dict[str, Any],
+    sample_min_lon: float,
+    sample_max_lon: float,
+) -> Dict[str, Any]:
+    """Area statistics body of :func:`sample_area_stats`: the result dict or ``{"error"}``."""
     try:
         # Use center point for STAC search (items are global anyway)
         center_lat = (min_lat + max_lat) / 2
         center_lon = (min_lon + max_lon) / 2
         items = _search_cmip6_items(center_lat, center_lon, variable, scenario, year, limit=1)
         if not items:
-            return json.dumps({"error": f"No CMIP6 data for {variable}/{scenario}/{year}"})
+            return {"error": f"No CMIP6 data for {variable}/{scenario}/{year}"}
 
         item = items[0]
         assets = item.get("assets", {})
         href = assets.get(variable, {}).get("href", "") if isinstance(assets.get(variable), dict) else ""
         if not href:
-            return json.dumps({"error": f"No asset href for variable '{variable}'"})
+            return {"error": f"No asset href for variable '{variable}'"}
 
         model_id = item.get("id", "").split(".")[0] if "." in item.get("id", "") else "unknown"
 
-        fs = _get_https_fs()
-        f = fs.open(href)
-        ds = xr.open_dataset(f, engine="h5netcdf", decode_times=False)
-
-        try:
-            data = ds[variable]
-
-            # Select spatial subset
-            if sample_min_lon <= sample_max_lon:
-                spatial = data.sel(
-                    lat=slice(min_lat, max_lat),
-                    lon=slice(sample_min_lon, sample_max_lon),
-                )
-            else:
-                # Wraps around date line
-                part1 = data.sel(lat=slice(min_lat, max_lat), lon=slice(sample_min_lon, 360))
-                part2 = data.sel(lat=slice(min_lat, max_lat), lon=slice(0, sample_max_lon))
-                spatial = xr.concat([part1, part2], dim="lon")
-
-            n_lat = len(spatial.lat) if "lat" in spatial.dims else 0
-            n_lon = len(spatial.lon) if "lon" in spatial.dims else 0
-            if n_lat == 0 or n_lon == 0:
-                return json.dumps({"error": "No grid cells in the specified area. Area may be too small for 0.25° grid."})
-
-            # Take the last timestep for a snapshot (or mean across time for annual)
-            if "time" in spatial.dims:
-                # For a snapshot: use the last timestep
-                spatial_snapshot = spatial.isel(time=-1)
-            else:
-                spatial_snapshot = spatial
-
-            future = _values_pool.submit(lambda s=spatial_snapshot: s.values.astype(float))
-            try:
-                values_2d = future.result(timeout=60)
-            except TimeoutError:
-                return json.dumps({"error": "NetCDF area read timed out"})
-
-            valid_mask = ~np.isnan(values_2d)
-            if not valid_mask.any():
-                return json.dumps({"error": "No valid data in the specified area"})
-
-            valid = values_2d[valid_mask]
-            convert = var_info["convert"]
-
-            result = {
-                "location": {
-                    "bbox": [min_lat, max_lat, min_lon, max_lon],
-                    "grid_cells": {"lat": n_lat, "lon": n_lon, "total": n_lat * n_lon},
-                },
-                "variable": variable,
-                "variable_name": var_info["name"],
-                "scenario": scenario,
-                "year": year,
-                "model": model_id,
-                "statistics": {
-                    "mean": convert(float(np.mean(valid))),
-                    "median": convert(float(np.median(valid))),
-                    "min": convert(float(np.min(valid))),
-                    "max": convert(float(np.max(valid))),
-                    "std": round(float(np.std(valid)), 4),
-                    "p10": convert(float(np.percentile(valid, 10))),
-                    "p25": convert(float(np.percentile(valid, 25))),
-                    "p75": convert(float(np.percentile(valid, 75))),
-                    "p90": convert(float(np.percentile(valid, 90))),
-                    "unit": var_info["display_unit"],
-                    "valid_cells": int(valid_mask.sum()),
-                    "total_cells": int(values_2d.size),
-                },
-                "data_source": "NASA NEX-GDDP-CMIP6",
-                "grid_resolution": "0.25° × 0.25°",
-            }
-
-            _netcdf_result_cache[cache_key] = result
-            _netcdf_result_cache_ts[cache_key] = now
-            logger.info(f"[NETCDF-CALC] Area stats: {n_lat}x{n_lon} cells, mean={result['statistics']['mean']}")
-            return json.dumps(result)
+        # Last timestep over the box: chunk references when available, else xarray
+        values_2d = _area_snapshot(href, variable, (min_lat, max_lat), (sample_min_lon, sample_max_lon))
+        n_lat, n_lon = values_2d.shape if values_2d.ndim == 2 else (0, 0)
+        if n_lat == 0 or n_lon == 0:
+            return {"error": "No grid cells in the specified area. Area may be too small for 0.25° grid."}
+
+        valid_mask = ~np.isnan(values_2d)
+        if not valid_mask.any():
+            return {"error": "No valid data in the specified area"}
+
+        valid = values_2d[valid_mask]
+        convert = var_info["convert"]
+
+        result = {
+            "location": {
+                "bbox": [min_lat, max_lat, min_lon, max_lon],
+                "grid_cells": {"lat": n_lat, "lon": n_lon, "total": n_lat * n_lon},
+            },
+            "variable": variable,
+            "variable_name": var_info["name"],
+            "scenario": scenario,
+            "year": year,
+            "model": model_id,
+            "statistics": {
+                "mean": convert(float(np.mean(valid))),
+                "median": convert(float(np.median(valid))),
+                "min": convert(float(np.min(valid))),
+                "max": convert(float(np.max(valid))),
+                "std": round(float(np.std(valid)), 4),
+                "p10": convert(float(np.percentile(valid, 10))),
+                "p25": convert(float(np.percentile(valid, 25))),
+                "p75": convert(float(np.percentile(valid, 75))),
+                "p90": convert(float(np.percentile(valid, 90))),
+                "unit": var_info["display_unit"],
+                "valid_cells": int(valid_mask.sum()),
+                "total_cells": int(values_2d.size),
+            },
+            "data_source": "NASA NEX-GDDP-CMIP6",
+            "grid_resolution": "0.25° × 0.25°",
+        }
 
-        finally:
-            ds.close()
-            try:
-                f.close()
-            except Exception:
-                pass
+        logger.info(f"[NETCDF-CALC] Area stats: {n_lat}x{n_lon} cells, mean={result['statistics']['mean']}")
+        return result
 
     except Exception as e:
         logger.error(f"[NETCDF-CALC] sample_area_stats failed: {e}")
-        return json.dumps({"error": str(e)})
+        return {"error": str(e)}
 
 
 def compute_anomaly(
@@ -560,57 +798,37 @@ def compute_anomaly(
         return json.dumps({"error": f"Unknown variable '{variable}'."})
 
     cache_key = f"anomaly:{variable}:{latitude:.4f}:{_convert_longitude(longitude):.4f}:{baseline_year}:{target_year}:{scenario}"
-    now = time.time()
-    if cache_key in _netcdf_result_cache:
-        age = now - _netcdf_result_cache_ts.get(cache_key, 0)
-        if age < _netcdf_cache_ttl:
-            logger.info(f"[NETCDF-CALC] Anomaly CACHE HIT ({age:.0f}s old)")
-            return json.dumps(_netcdf_result_cache[cache_key])
+    result = _tool_results.get_or_compute(
+        cache_key,
+        lambda: _anomaly(latitude, longitude, variable, baseline_year, target_year, scenario, var_info),
+        cache_if=lambda r: "error" not in r,
+    )
+    return json.dumps(result)
 
-    from geoint.extreme_weather_tools import _sample_netcdf
 
-    def _fetch_year(yr):
-        items = _search_cmip6_items(latitude, longitude, variable, scenario, yr, limit=1)
-        if not items:
-            return yr, {"error": f"No data for {yr}"}
-        item = items[0]
-        href = item.get("assets", {}).get(variable, {}).get("href", "") if isinstance(item.get("assets", {}).get(variable), dict) else ""
-        if not href:
-            return yr, {"error": f"No asset for {variable} in {yr}"}
-        result = _sample_netcdf(href, variable, latitude, longitude, aggregate="annual")
-        model = item.get("id", "").split(".")[0] if "." in item.get("id", "") else "unknown"
-        return yr, result, model
-
-    # Fetch both years in parallel
-    futures = {_netcdf_pool.submit(_fetch_year, y): y for y in [baseline_year, target_year]}
-    year_data = {}
-    model_used = "unknown"
-    for future in as_completed(futures, timeout=120):
-        try:
-            result = future.result(timeout=90)
-            yr = result[0]
-            data = result[1]
-            if len(result) > 2:
-                model_used = result[2]
-            year_data[yr] = data
-        except Exception as e:
-            logger.warning(f"[NETCDF-CALC] Anomaly fetch failed: {e}")
-
-    baseline = year_data.get(baseline_year, {})
-    target = year_data.get(target_year, {})
+def _anomaly(
+    latitude: float,
+    longitude: float,
+    variable: str,
+    baseline_year: int,
+    target_year: int,
+    scenario: str,
+    var_info: Dict[str, Any],
+) -> Dict[str, Any]:
+    """Anomaly body of :func:`compute_anomaly`: the result dict or ``{"error"}``."""
+    # Both years in one batched extraction (shares the per-year memo with compute_trend)
+    year_data = _annual_means(latitude, longitude, variable, scenario, [baseline_year, target_year], timeout=120)
+    baseline = year_data.get(baseline_year, {"error": "not read"})
+    target = year_data.get(target_year, {"error": "not read"})
+    model_used = target.get("model") or baseline.get("model") or "unknown"
 
     if "error" in baseline:
-        return json.dumps({"error": f"Baseline year {baseline_year}: {baseline['error']}"})
+        return {"error": f"Baseline year {baseline_year}: {baseline['error']}"}
     if "error" in target:
-        return json.dumps({"error": f"Target year {target_year}: {target['error']}"})
+        return {"error": f"Target year {target_year}: {target['error']}"}
 
     convert = var_info["convert"]
-    b_raw = baseline.get("raw_mean", baseline.get("raw_value"))
-    t_raw = target.get("raw_mean", target.get("raw_value"))
-
-    if b_raw is None or t_raw is None:
-        return json.dumps({"error": "Could not extract values for comparison"})
-
+    b_raw, t_raw = baseline["value"], target["value"]
     raw_change = t_raw - b_raw
     pct_change = (raw_change / abs(b_raw) * 100) if b_raw != 0 else None
 
@@ -631,7 +849,7 @@ def compute_anomaly(
             "unit": var_info["display_unit"],
         },
         "change": {
-            "absolute": convert(raw_change) if var_info["category"] != "precipitation" else round(raw_change * 86400, 2),
+            "absolute": _display_delta(convert, b_raw, raw_change),
             "absolute_unit": var_info["display_unit"],
             "percent": round(pct_change, 1) if pct_change is not None else None,
             "direction": "increase" if raw_change > 0 else "decrease" if raw_change < 0 else "no change",
@@ -640,10 +858,8 @@ def compute_anomaly(
         "grid_resolution": "0.25° × 0.25°",
     }
 
-    _netcdf_result_cache[cache_key] = result
-    _netcdf_result_cache_ts[cache_key] = now
     logger.info(f"[NETCDF-CALC] Anomaly: {variable} {result['change']['direction']} by {result['change']['percent']}%")
-    return json.dumps(result)
+    return result
 
 
 def compute_trend(
@@ -655,8 +871,10 @@ def compute_trend(
     scenario: str = "ssp585",
 ) -> str:
     """Compute a linear trend for a climate variable across multiple decades.
-    Samples the variable at ~5 evenly spaced years and fits a linear regression.
-    Returns slope (change per decade), R², and whether the trend is significant.
+    Reads the annual mean of every year in the range (up to 30 evenly spaced years)
+    and fits a linear regression plus a Theil-Sen (Sen's slope) estimate.
+    Returns slope (change per decade) with a 95% confidence interval, Sen's slope,
+    R², p-values, and per-year values with their anomaly from the first year.
     Use this when the user asks about long-term trends, 'is it getting hotter/wetter?', or projections over decades.
 
     :param latitude: Latitude of the location (-90 to 90)
@@ -665,7 +883,7 @@ def compute_trend(
     :param start_year: First year of trend analysis (2015-2095). Default 2020
     :param end_year: Last year of trend analysis (2020-2100). Default 2060
     :param scenario: SSP scenario. Default 'ssp585'
-    :return: JSON string with trend slope, R², p-value, and per-year data points
+    :return: JSON string with trend slope, confidence intervals, Sen's slope, R², p-values, and per-year data points
     """
     logger.info(f"[NETCDF-CALC] compute_trend: {variable} at ({latitude}, {longitude}), {start_year}-{end_year}, {scenario}")
 
@@ -677,74 +895,45 @@ def compute_trend(
         return json.dumps({"error": "end_year must be greater than start_year"})
 
     cache_key = f"trend:{variable}:{latitude:.4f}:{_convert_longitude(longitude):.4f}:{start_year}:{end_year}:{scenario}"
-    now = time.time()
-    if cache_key in _netcdf_result_cache:
-        age = now - _netcdf_result_cache_ts.get(cache_key, 0)
-        if age < _netcdf_cache_ttl:
-            logger.info(f"[NETCDF-CALC] Trend CACHE HIT ({age:.0f}s old)")
-            return json.dumps(_netcdf_result_cache[cache_key])
-
-    from geoint.extreme_weather_tools import _sample_netcdf
-
-    # Sample ~5 evenly spaced years (more would be too slow with remote NetCDF)
-    span = end_year - start_year
-    n_points = min(5, max(2, span // 10 + 1))
-    years = [start_year + int(i * span / (n_points - 1)) for i in range(n_points)]
-    # Ensure end_year is included
-    if years[-1] != end_year:
-        years[-1] = end_year
-
-    def _fetch_year(yr):
-        items = _search_cmip6_items(latitude, longitude, variable, scenario, yr, limit=1)
-        if not items:
-            return yr, None
-        item = items[0]
-        href = item.get("assets", {}).get(variable, {}).get("href", "") if isinstance(item.get("assets", {}).get(variable), dict) else ""
-        if not href:
-            return yr, None
-        sample = _sample_netcdf(href, variable, latitude, longitude, aggregate="annual")
-        if "error" in sample:
-            return yr, None
-        return yr, sample.get("raw_mean", sample.get("raw_value"))
-
-    # Pre-warm STAC cache for all years
-    for yr in years:
-        _search_cmip6_items(latitude, longitude, variable, scenario, yr, limit=1)
-
-    # Fetch all years in parallel
-    futures = {_netcdf_pool.submit(_fetch_year, yr): yr for yr in years}
-    data_points = {}
-    for future in as_completed(futures, timeout=180):
-        try:
-            yr, val = future.result(timeout=120)
-            if val is not None:
-                data_points[yr] = val
-        except Exception as e:
-            logger.warning(f"[NETCDF-CALC] Trend year fetch failed: {e}")
+    result = _tool_results.get_or_compute(
+        cache_key,
+        lambda: _trend(latitude, longitude, variable, start_year, end_year, scenario, var_info),
+        cache_if=lambda r: "error" not in r,
+    )
+    return json.dumps(result)
 
-    if len(data_points) < 2:
-        return json.dumps({"error": f"Only {len(data_points)} valid data points. Need at least 2 for trend."})
 
-    # Linear regression
-    sorted_years = sorted(data_points.keys())
+def _trend(
+    latitude: float,
+    longitude: float,
+    variable: str,
+    start_year: int,
+    end_year: int,
+    scenario: str,
+    var_info: Dict[str, Any],
+) -> Dict[str, Any]:
+    """Trend body of :func:`compute_trend`: the result dict or ``{"error"}``."""
+    # Every year of the range (capped at _TREND_MAX_YEARS), batched and memoized per year
+    years = _trend_years(start_year, end_year)
+    year_data = _annual_means(latitude, longitude, variable, scenario, years, timeout=180)
+    sorted_years = [yr for yr in years if "error" not in year_data.get(yr, {"error": ""})]
+
+    if len(sorted_years) < 2:
+        return {"error": f"Only {len(sorted_years)} valid data points. Need at least 2 for trend."}
+
+    # One vectorized pass over the stacked (year, value) series
     x = np.array(sorted_years, dtype=float)
-    y = np.array([data_points[yr] for yr in sorted_years], dtype=float)
+    y = np.array([year_data[yr]["value"] for yr in sorted_years], dtype=float)
+    fit = _trend_statistics(x, y)
+    slope, r_squared = float(fit["slope"][0]), float(fit["r_squared"][0])
+    y_mean = float(np.mean(y))
+    anomalies = y - y[0]
 
-    n = len(x)
-    x_mean = np.mean(x)
-    y_mean = np.mean(y)
-    ss_xy = np.sum((x - x_mean) * (y - y_mean))
-    ss_xx = np.sum((x - x_mean) ** 2)
-    ss_yy = np.sum((y - y_mean) ** 2)
-
-    slope = ss_xy / ss_xx if ss_xx != 0 else 0
-    intercept = y_mean - slope * x_mean
-    r_squared = (ss_xy ** 2) / (ss_xx * ss_yy) if ss_xx != 0 and ss_yy != 0 else 0
-
-    # Slope per decade in display units
+    # Slopes per decade in display units
     convert = var_info["convert"]
-    # For conversion: compute display value at y_mean and y_mean+slope*10
-    display_slope_decade = convert(y_mean + slope * 10) - convert(y_mean)
+    per_decade = {k: _display_delta(convert, y_mean, float(fit[k][0]) * 10) for k in
+                  ("slope", "slope_lo", "slope_hi", "sens_slope", "sens_lo", "sens_hi")}
+    models = sorted({year_data[yr]["model"] for yr in sorted_years})
 
     result = {
         "location": {"latitude": latitude, "longitude": longitude},
@@ -753,32 +942,39 @@ def compute_trend(
         "scenario": scenario,
         "period": f"{start_year}-{end_year}",
         "trend": {
-            "slope_per_decade": round(display_slope_decade, 2),
+            "slope_per_decade": per_decade["slope"],
+            "slope_ci95_per_decade": [per_decade["slope_lo"], per_decade["slope_hi"]],
             "slope_unit": f"{var_info['display_unit']}/decade",
             "r_squared": round(r_squared, 3),
+            "p_value": _finite(fit["p_value"][0], 4),
+            "sens_slope_per_decade": per_decade["sens_slope"],
+            "sens_slope_ci95_per_decade": [per_decade["sens_lo"], per_decade["sens_hi"]],
+            "mann_kendall_p_value": _finite(fit["mk_p_value"][0], 4),
             "direction": "increasing" if slope > 0 else "decreasing" if slope < 0 else "stable",
             "confidence": "high" if r_squared > 0.7 else "moderate" if r_squared > 0.4 else "low",
         },
         "data_points": [
             {
                 "year": yr,
-                "value": convert(data_points[yr]),
+                "value": convert(val),
+                "anomaly": _display_delta(convert, y[0], anom),
                 "unit": var_info["display_unit"],
             }
-            for yr in sorted_years
+            for yr, val, anom in zip(sorted_years, y, anomalies)
         ],
+        "years_sampled": len(sorted_years),
+        "years_requested": len(years),
         "data_source": "NASA NEX-GDDP-CMIP6",
         "grid_resolution": "0.25° × 0.25°",
-        "n_models_sampled": 1,
+        "model": models[0] if len(models) == 1 else models,
+        "n_models_sampled": len(models),
     }
 
-    _netcdf_result_cache[cache_key] = result
-    _netcdf_result_cache_ts[cache_key] = now
     logger.info(
         f"[NETCDF-CALC] Trend: {variable} {result['trend']['direction']} at "
         f"{result['trend']['slope_per_decade']} {var_info['display_unit']}/decade (R²={r_squared:.3f})"
     )
-    return json.dumps(result)
+    return result
 
 
 def calculate_derived(
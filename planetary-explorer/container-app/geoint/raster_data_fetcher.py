@@ -10,13 +10,15 @@ Features:
 - Cloud-Optimized GeoTIFF (COG) window reading for efficiency
 """
 
+import asyncio
 import logging
 import os
 from typing import Dict, Any, Optional, List, Tuple
 import numpy as np
 from io import BytesIO
 import aiohttp
-import planetary_computer
+import raster_pool
+import sas_signer
 from pystac_client import Client
 
 logger = logging.getLogger(__name__)
@@ -69,6 +71,11 @@ class RasterDataFetcher:
             self._catalog = Client.open(self.stac_endpoint)
         return self._catalog
     
+    def _search(self, collection: str, bbox: List[float], **kwargs) -> list:
+        """First matching item of ``collection`` under ``bbox`` (blocking; run in a thread)."""
+        search = self.catalog.search(collections=[collection], bbox=bbox, limit=1, **kwargs)
+        return list(search.items())
+    
     async def fetch_terrain_data(
         self,
         latitude: float,
@@ -169,26 +176,19 @@ class RasterDataFetcher:
     ) -> Dict[str, Any]:
         """
         Fetch DEM data and calculate elevation/slope/aspect statistics.
-        Uses rasterio with windowed reading for efficiency.
+        Uses the async COG reader with windowed reading for efficiency.
         """
         try:
-            import rasterio
-            from rasterio.windows import from_bounds
+            from cog_reader import read_bbox
             
             # Search for DEM item
-            search = self.catalog.search(
-                collections=[DEM_COLLECTION],
-                bbox=bbox,
-                limit=1
-            )
-            
-            items = list(search.items())
+            items = await raster_pool.run(self._search, DEM_COLLECTION, bbox)
             if not items:
                 logger.warning("No DEM data found for location")
                 return {"elevation_stats": {}, "source": "none"}
             
             item = items[0]
-            signed_item = planetary_computer.sign(item)
+            signed_item = sas_signer.sign(item)
             
             # Get DEM asset URL
             dem_asset = signed_item.assets.get("data")
@@ -199,64 +199,53 @@ class RasterDataFetcher:
             dem_url = dem_asset.href
             
             # Read DEM data using windowed reading
-            with rasterio.open(dem_url) as src:
-                # Calculate window from bbox
-                window = from_bounds(*bbox, src.transform)
-                
-                # Ensure window is within bounds
-                window = window.intersection(rasterio.windows.Window(
-                    0, 0, src.width, src.height
-                ))
-                
-                if window.width < 1 or window.height < 1:
-                    logger.warning("DEM window too small")
-                    return {"elevation_stats": {}, "source": DEM_COLLECTION}
-                
-                # Read elevation data
-                elevation = src.read(1, window=window)
-                
-                # Handle nodata
-                nodata = src.nodata or -9999
-                elevation = np.ma.masked_equal(elevation, nodata)
-                
-                if elevation.count() == 0:
-                    logger.warning("No valid DEM data in window")
-                    return {"elevation_stats": {}, "source": DEM_COLLECTION}
-                
-                # Calculate elevation statistics
-                elevation_stats = {
-                    "min": float(elevation.min()),
-                    "max": float(elevation.max()),
-                    "mean": float(elevation.mean()),
-                    "std": float(elevation.std()),
-                    "range": float(elevation.max() - elevation.min())
-                }
-                
-                # Calculate slope and aspect
-                slope, aspect = self._calculate_slope_aspect(
-                    elevation, 
-                    src.res[0]  # pixel resolution in meters
-                )
-                
-                slope_stats = {
-                    "min": float(slope.min()) if slope.size > 0 else 0,
-                    "max": float(slope.max()) if slope.size > 0 else 0,
-                    "mean": float(slope.mean()) if slope.size > 0 else 0,
-                    "std": float(slope.std()) if slope.size > 0 else 0
-                }
-                
-                aspect_stats = self._categorize_aspect(aspect)
-                
-                # Classify terrain type
-                terrain_class = self._classify_terrain(elevation_stats, slope_stats)
-                
-                return {
-                    "elevation_stats": elevation_stats,
-                    "slope_stats": slope_stats,
-                    "aspect_stats": aspect_stats,
-                    "terrain_classification": terrain_class,
-                    "source": DEM_COLLECTION
-                }
+            window = await read_bbox(dem_url, bbox)
+            if window is None:
+                logger.warning("DEM window too small")
+                return {"elevation_stats": {}, "source": DEM_COLLECTION}
+            
+            # Handle nodata
+            nodata = window.nodata or -9999
+            elevation = np.ma.masked_equal(window.data, nodata)
+            
+            if elevation.count() == 0:
+                logger.warning("No valid DEM data in window")
+                return {"elevation_stats": {}, "source": DEM_COLLECTION}
+            
+            # Calculate elevation statistics
+            elevation_stats = {
+                "min": float(elevation.min()),
+                "max": float(elevation.max()),
+                "mean": float(elevation.mean()),
+                "std": float(elevation.std()),
+                "range": float(elevation.max() - elevation.min())
+            }
+            
+            # Calculate slope and aspect
+            slope, aspect = self._calculate_slope_aspect(
+                elevation, 
+                window.res[0]  # pixel resolution in meters
+            )
+            
+            slope_stats = {
+                "min": float(slope.min()) if slope.size > 0 else 0,
+                "max": float(slope.max()) if slope.size > 0 else 0,
+                "mean": float(slope.mean()) if slope.size > 0 else 0,
+                "std": float(slope.std()) if slope.size > 0 else 0
+            }
+            
+            aspect_stats = self._categorize_aspect(aspect)
+            
+            # Classify terrain type
+            terrain_class = self._classify_terrain(elevation_stats, slope_stats)
+            
+            return {
+                "elevation_stats": elevation_stats,
+                "slope_stats": slope_stats,
+                "aspect_stats": aspect_stats,
+                "terrain_classification": terrain_class,
+                "source": DEM_COLLECTION
+            }
                 
         except Exception as e:
             logger.error(f"Error fetching DEM data: {e}")
@@ -354,28 +343,23 @@ class RasterDataFetcher:
         Fetch spectral band data and calculate vegetation indices.
         """
         try:
-            import rasterio
-            from rasterio.windows import from_bounds
-            
             band_mapping = SPECTRAL_BAND_MAPPINGS.get(collection_id, {})
             if not band_mapping:
                 return {"indices": {}, "source": "unsupported_collection"}
             
             # Search for recent imagery
-            search = self.catalog.search(
-                collections=[collection_id],
-                bbox=bbox,
+            items = await raster_pool.run(
+                self._search,
+                collection_id,
+                bbox,
                 sortby=[{"field": "datetime", "direction": "desc"}],
-                limit=1
             )
-            
-            items = list(search.items())
             if not items:
                 logger.warning(f"No imagery found for {collection_id}")
                 return {"indices": {}, "source": "none"}
             
             item = items[0]
-            signed_item = planetary_computer.sign(item)
+            signed_item = sas_signer.sign(item)
             
             indices = {}
             
@@ -421,43 +405,36 @@ class RasterDataFetcher:
     ) -> Optional[Dict[str, float]]:
         """Calculate NDVI from red and NIR bands."""
         try:
-            import rasterio
-            from rasterio.windows import from_bounds
-            
-            with rasterio.open(red_url) as red_src, rasterio.open(nir_url) as nir_src:
-                # Calculate window
-                window = from_bounds(*bbox, red_src.transform)
-                window = window.intersection(rasterio.windows.Window(
-                    0, 0, red_src.width, red_src.height
-                ))
-                
-                if window.width < 1 or window.height < 1:
-                    return None
-                
-                red = red_src.read(1, window=window).astype(float)
-                nir = nir_src.read(1, window=window).astype(float)
-                
-                # Handle nodata
-                red = np.ma.masked_equal(red, red_src.nodata or 0)
-                nir = np.ma.masked_equal(nir, nir_src.nodata or 0)
-                
-                # Calculate NDVI
-                denominator = nir + red
-                ndvi = np.where(
-                    denominator > 0,
-                    (nir - red) / denominator,
-                    0
-                )
-                
-                # Clip to valid range
-                ndvi = np.clip(ndvi, -1, 1)
-                
-                return {
-                    "min": float(np.min(ndvi)),
-                    "max": float(np.max(ndvi)),
-                    "mean": float(np.mean(ndvi)),
-                    "std": float(np.std(ndvi))
-                }
+            from cog_reader import read_bbox
+            
+            red_win, nir_win = await asyncio.gather(read_bbox(red_url, bbox), read_bbox(nir_url, bbox))
+            if red_win is None or nir_win is None:
+                return None
+            
+            red = red_win.data.astype(float)
+            nir = nir_win.data.astype(float)
+            
+            # Handle nodata
+            red = np.ma.masked_equal(red, red_win.nodata or 0)
+            nir = np.ma.masked_equal(nir, nir_win.nodata or 0)
+            
+            # Calculate NDVI
+            denominator = nir + red
+            ndvi = np.where(
+                denominator > 0,
+                (nir - red) / denominator,
+                0
+            )
+            
+            # Clip to valid range
+            ndvi = np.clip(ndvi, -1, 1)
+            
+            return {
+                "min": float(np.min(ndvi)),
+                "max": float(np.max(ndvi)),
+                "mean": float(np.mean(ndvi)),
+                "std": float(np.std(ndvi))
+            }
                 
         except Exception as e:
             logger.error(f"Error calculating NDVI: {e}")
@@ -470,37 +447,33 @@ class RasterDataFetcher:
     ) -> Optional[Dict[str, float]]:
         """Calculate NDVI from NAIP 4-band image (R, G, B, NIR)."""
         try:
-            import rasterio
-            from rasterio.windows import from_bounds
-            
-            with rasterio.open(image_url) as src:
-                window = from_bounds(*bbox, src.transform)
-                window = window.intersection(rasterio.windows.Window(
-                    0, 0, src.width, src.height
-                ))
-                
-                if window.width < 1 or window.height < 1:
-                    return None
-                
-                # NAIP: band 1=R, band 2=G, band 3=B, band 4=NIR
-                red = src.read(1, window=window).astype(float)
-                nir = src.read(4, window=window).astype(float)
-                
-                denominator = nir + red
-                ndvi = np.where(
-                    denominator > 0,
-                    (nir - red) / denominator,
-                    0
-                )
-                
-                ndvi = np.clip(ndvi, -1, 1)
-                
-                return {
-                    "min": float(np.min(ndvi)),
-                    "max": float(np.max(ndvi)),
-                    "mean": float(np.mean(ndvi)),
-                    "std": float(np.std(ndvi))
-                }
+            from cog_reader import read_bbox
+            
+            # NAIP: band 1=R, band 2=G, band 3=B, band 4=NIR
+            red_win, nir_win = await asyncio.gather(
+                read_bbox(image_url, bbox, band=1), read_bbox(image_url, bbox, band=4)
+            )
+            if red_win is None or nir_win is None:
+                return None
+            
+            red = red_win.data.astype(float)
+            nir = nir_win.data.astype(float)
+            
+            denominator = nir + red
+            ndvi = np.where(
+                denominator > 0,
+                (nir - red) / denominator,
+                0
+            )
+            
+            ndvi = np.clip(ndvi, -1, 1)
+            
+            return {
+                "min": float(np.min(ndvi)),
+                "max": float(np.max(ndvi)),
+                "mean": float(np.mean(ndvi)),
+                "std": float(np.std(ndvi))
+            }
                 
         except Exception as e:
             logger.error(f"Error calculating NAIP NDVI: {e}")
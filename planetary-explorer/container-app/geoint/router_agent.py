@@ -5,7 +5,7 @@ Wave 4 retired the Semantic Kernel ChatCompletionAgent that previously drove
 this module. The kernel-function tools were dead code (route_query produced
 the action dict directly via heuristics + two narrow LLM helpers, never
 delegating to the agent). This module now uses direct
-`AsyncAzureOpenAI` calls via `pipeline._aoai.get_aoai_client()` and the
+chat-completions calls via `pipeline._aoai.get_aoai_client()` and the
 shared `SessionContextStore`.
 
 Public API preserved for backward compatibility with `fastapi_app.py`:
@@ -24,7 +24,7 @@ import json
 import logging
 import os
 import re
-from typing import Any, Dict, Optional
+from typing import Any, Dict, MutableMapping, Optional
 
 logger = logging.getLogger(__name__)
 
@@ -77,9 +77,11 @@ class RouterAgentTools:
         self.semantic_translator = None
         self.vision_agent = None
 
-    # Mutable dict view - legacy code reads/writes through this attribute.
+    # Mutable mapping view - legacy code reads/writes through this attribute.
+    # Top-level writes on a context (``ctx["has_screenshot"] = True``) are
+    # persisted even when the store serializes (sqlite/redis backends).
     @property
-    def session_contexts(self) -> Dict[str, Dict[str, Any]]:
+    def session_contexts(self) -> MutableMapping[str, Dict[str, Any]]:
         return self._store.raw
 
     def set_semantic_translator(self, translator: Any) -> None:
@@ -134,7 +136,7 @@ class RouterAgent:
         from pipeline._aoai import get_aoai_client
 
         client = get_aoai_client()
-        resp = await client.chat.completions.create(
+        resp = await client.create(
             model=self._deployment(),
             messages=[{"role": "user", "content": prompt}],
             response_format={"type": "json_object"},
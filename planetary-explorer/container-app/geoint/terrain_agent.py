@@ -17,8 +17,9 @@ import json
 from typing import Dict, Any, Optional, List
 from datetime import datetime
 
-from azure.identity import DefaultAzureCredential, get_bearer_token_provider
-from cloud_config import cloud_cfg
+from azure.identity import DefaultAzureCredential
+from _framework.llm_client import get_llm_client
+from pipeline.session_store import session_map
 
 logger = logging.getLogger(__name__)
 
@@ -125,7 +126,9 @@ class TerrainAgent:
     
     def __init__(self):
         """Initialize the terrain agent."""
-        self.sessions: Dict[str, TerrainAgentSession] = {}
+        # Shared session store (see pipeline.session_store) so any worker or
+        # replica can resume a conversation's Agent Service thread.
+        self.sessions = session_map("terrain", TerrainAgentSession)
         self._agents_client = None
         self._agent_id: Optional[str] = None
         self._initialized = False
@@ -209,30 +212,28 @@ class TerrainAgent:
         longitude: float
     ) -> TerrainAgentSession:
         """Get existing session or create a new one with a new thread."""
-        if session_id in self.sessions:
-            session = self.sessions[session_id]
+        session = await self.sessions.aget(session_id)
+        if session is not None:
             session.update_location(latitude, longitude)
+            await self.sessions.aset(session_id, session)
             return session
         
         # Create a new Agent Service thread
         thread = await self._agents_client.threads.create()
         
         session = TerrainAgentSession(session_id, latitude, longitude, thread.id)
-        self.sessions[session_id] = session
+        await self.sessions.aset(session_id, session)
         logger.info(f"Created new session: {session_id} -> thread: {thread.id}")
         return session
     
     def cleanup_old_sessions(self, max_age_minutes: int = 60):
-        """Remove sessions older than max_age_minutes."""
-        now = datetime.utcnow()
-        expired = [
-            sid for sid, session in self.sessions.items()
-            if (now - session.last_activity).total_seconds() > max_age_minutes * 60
-        ]
-        for sid in expired:
-            del self.sessions[sid]
-            logger.info(f"Cleaned up expired session: {sid}")
-    
+        """Remove sessions idle for more than max_age_minutes."""
+        # every turn writes the session back, so the store's write time
+        # tracks last_activity without loading each session
+        purged = self.sessions.purge_idle(max_age_minutes * 60)
+        if purged:
+            logger.info(f"Cleaned up {purged} expired session(s)")
+
     async def _analyze_screenshot_direct(
         self,
         screenshot_base64: str,
@@ -247,20 +248,11 @@ class TerrainAgent:
         Uses the standard OpenAI client (not Agent Service) for vision.
         """
         try:
-            from openai import AsyncAzureOpenAI
-            
             logger.info(f"Running direct vision analysis at ({latitude:.4f}, {longitude:.4f})")
             
-            credential = DefaultAzureCredential()
-            token_provider = get_bearer_token_provider(
-                credential, cloud_cfg.cognitive_services_scope
-            )
-            
-            client = AsyncAzureOpenAI(
-                azure_ad_token_provider=token_provider,
+            client = get_llm_client(
+                os.getenv("AZURE_OPENAI_DEPLOYMENT_NAME", "gpt-5"),
                 api_version=os.getenv("AZURE_OPENAI_API_VERSION", "2025-01-01-preview"),
-                azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
-                timeout=120.0
             )
             
             # Clean base64 if needed
@@ -281,8 +273,9 @@ Provide a comprehensive analysis covering:
 
 Be specific and quantitative where possible."""
             
-            response = await client.chat.completions.create(
+            response = await client.create(
                 model=os.getenv("AZURE_OPENAI_DEPLOYMENT_NAME", "gpt-5"),
+                timeout=120.0,
                 messages=[
                     {
                         "role": "system",
@@ -427,7 +420,7 @@ Be specific and quantitative where possible."""
                         self._initialized = False
                         self._agent_id = None
                         self._agents_client = None
-                        self.sessions.clear()
+                        await self.sessions.adelete(session.session_id)
                         await self._ensure_initialized()
                         continue
                     logger.error(f"Agent run failed: {run.last_error}")
@@ -482,6 +475,7 @@ Be specific and quantitative where possible."""
                 
                 session.message_count += 2  # user + assistant
                 session.last_activity = datetime.utcnow()
+                await self.sessions.aset(session.session_id, session)
                 
                 logger.info(f"Agent response ({len(response_content)} chars, {len(tool_calls)} tool calls)")
                 
@@ -501,7 +495,7 @@ Be specific and quantitative where possible."""
                     self._initialized = False
                     self._agent_id = None
                     self._agents_client = None
-                    self.sessions.clear()
+                    await self.sessions.adelete(session.session_id)
                     try:
                         await self._ensure_initialized()
                         continue  # Retry with fresh agent
@@ -525,11 +519,10 @@ Be specific and quantitative where possible."""
     
     async def get_session_history(self, session_id: str) -> List[Dict[str, str]]:
         """Get conversation history for a session from the Agent Service thread."""
-        if session_id not in self.sessions:
+        session = await self.sessions.aget(session_id)
+        if session is None:
             return []
         
-        session = self.sessions[session_id]
-        
         try:
             await self._ensure_initialized()
             from azure.ai.agents.models import ListSortOrder
@@ -555,14 +548,14 @@ Be specific and quantitative where possible."""
     
     async def clear_session(self, session_id: str) -> bool:
         """Clear a session's memory by deleting the thread."""
-        if session_id in self.sessions:
-            session = self.sessions[session_id]
+        session = await self.sessions.aget(session_id)
+        if session is not None:
             try:
                 await self._ensure_initialized()
                 await self._agents_client.threads.delete(session.thread_id)
             except Exception as e:
                 logger.debug(f"Thread cleanup: {e}")
-            del self.sessions[session_id]
+            await self.sessions.adelete(session_id)
             logger.info(f"Cleared session: {session_id}")
             return True
         return False
@@ -21,8 +21,9 @@ import logging
 import asyncio
 from datetime import datetime, timedelta
 import numpy as np
-import planetary_computer
+import sas_signer
 import pystac_client
+from raster_env import raster_tool
 import aiohttp
 
 logger = logging.getLogger(__name__)
@@ -530,6 +531,7 @@ class GeospatialTools:
             latitude + lat_delta    # max_lat
         ]
     
+    @raster_tool
     async def _download_raster(
         self,
         collection_id: str,
@@ -564,7 +566,7 @@ class GeospatialTools:
             # Search STAC
             catalog = pystac_client.Client.open(
                 self.stac_endpoint,
-                modifier=planetary_computer.sign_inplace
+                modifier=sas_signer.sign_inplace
             )
             
             search_params = {
@@ -596,7 +598,7 @@ class GeospatialTools:
                     return None
             
             asset_url = item.assets[asset_key].href
-            signed_url = planetary_computer.sign_url(asset_url)
+            signed_url = sas_signer.sign_url(asset_url)
             
             # Download raster
             with rasterio.open(signed_url) as src:
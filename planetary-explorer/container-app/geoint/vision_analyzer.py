@@ -17,9 +17,8 @@ import os
 import base64
 from io import BytesIO
 import aiohttp
-from openai import AzureOpenAI
-from azure.identity import DefaultAzureCredential, get_bearer_token_provider
-import planetary_computer
+from _framework.llm_client import get_llm_client
+import sas_signer
 from cloud_config import cloud_cfg
 from datetime import datetime, timedelta
 from pystac_client import Client
@@ -38,37 +37,12 @@ class VisionAnalyzer:
     
     def __init__(self):
         """Initialize the vision analyzer with Azure OpenAI."""
-        # Support both API key and Managed Identity authentication
-        api_key = os.getenv("AZURE_OPENAI_API_KEY") or os.getenv("AZURE_OPENAI_KEY")
-        api_version = os.getenv("AZURE_OPENAI_API_VERSION", "2025-01-01-preview")
-        endpoint = os.getenv("AZURE_OPENAI_ENDPOINT")
-        use_managed_identity = os.getenv("AZURE_OPENAI_USE_MANAGED_IDENTITY", "").lower() == "true"
-        
-        if use_managed_identity or not api_key:
-            # Use Managed Identity authentication (DefaultAzureCredential)
-            logger.info(" VisionAnalyzer: Using Managed Identity for Azure OpenAI authentication")
-            credential = DefaultAzureCredential()
-            token_provider = get_bearer_token_provider(
-                credential, cloud_cfg.cognitive_services_scope
-            )
-            self.client = AzureOpenAI(
-                azure_ad_token_provider=token_provider,
-                api_version=api_version,
-                azure_endpoint=endpoint,
-                timeout=180.0  # 3 minute timeout for vision API calls
-            )
-        else:
-            # Use API key authentication
-            logger.info(" VisionAnalyzer: Using API key for Azure OpenAI authentication")
-            self.client = AzureOpenAI(
-                api_key=api_key,
-                api_version=api_version,
-                azure_endpoint=endpoint,
-                timeout=180.0  # 3 minute timeout for vision API calls
-            )
-        
-        # Use GPT-5 deployment name (default)
+        # Shared gateway client (auth: API key or managed identity, see _framework.llm_client)
         self.deployment_name = os.getenv("AZURE_OPENAI_DEPLOYMENT_NAME", "gpt-5")
+        self.client = get_llm_client(
+            self.deployment_name,
+            api_version=os.getenv("AZURE_OPENAI_API_VERSION", "2025-01-01-preview"),
+        )
         self.stac_endpoint = cloud_cfg.stac_catalog_url
         
         # OPTIMIZATION: Simple imagery cache to avoid re-fetching same tiles
@@ -187,7 +161,7 @@ class VisionAnalyzer:
             
             catalog = Client.open(
                 self.stac_endpoint,
-                modifier=planetary_computer.sign_inplace
+                modifier=sas_signer.sign_inplace
             )
             
             # Search for recent imagery with minimal cloud cover
@@ -228,7 +202,7 @@ class VisionAnalyzer:
             
             # Get RGB composite tile (512x512 pixels)
             tile_url = f"https://planetarycomputer.microsoft.com/api/data/v1/item/preview.png?collection=sentinel-2-l2a&item={item.id}&assets=visual&width=512&height=512"
-            signed_tile_url = planetary_computer.sign_url(tile_url)
+            signed_tile_url = sas_signer.sign_url(tile_url)
             
             # Fetch the image with timeout
             logger.info(f"⬇ Downloading imagery tile...")
@@ -314,8 +288,9 @@ class VisionAnalyzer:
             # Call GPT-5 Vision
             logger.info(" Calling GPT-5 Vision API (this may take 30-120 seconds)...")
             start_api = time.time()
-            response = self.client.chat.completions.create(
+            response = self.client.create_sync(
                 model=self.deployment_name,
+                timeout=180.0,  # 3 minute timeout for vision API calls
                 messages=[
                     {"role": "system", "content": system_prompt},
                     {
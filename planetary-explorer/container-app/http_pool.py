@@ -0,0 +1,243 @@
+"""App-lifetime pooled HTTP clients for outbound upstream traffic.
+
+Hot paths used to open a throwaway ``aiohttp.ClientSession()`` (or
+``httpx.AsyncClient``) per call -- one per Pro tile, one per geocode,
+one per Open-Meteo forecast. Each of those paid a fresh DNS lookup plus
+a TCP + TLS handshake. This module keeps one long-lived client per
+*upstream* instead, so connections are kept alive and reused:
+
+  - ``stac``        public Planetary Computer STAC + data API
+  - ``pro``         MPC Pro / GeoCatalog STAC + tiler (AAD-protected)
+  - ``geocoder``    Azure Maps, Nominatim, Mapbox
+  - ``open-meteo``  Open-Meteo forecast + air-quality APIs
+  - ``blob``        Azure Blob range reads of COG assets (``cog_reader``)
+
+Each aiohttp pool gets its own ``TCPConnector`` with a total and a
+per-host connection cap, keep-alive and a DNS cache. httpx pools
+negotiate HTTP/2 when the optional ``h2`` package is installed.
+
+Usage::
+
+    import http_pool
+
+    session = http_pool.get_session(http_pool.POOL_PRO)
+    async with session.get(url) as r:
+        ...
+
+    # Drop-in for the old ``async with aiohttp.ClientSession() as s:``
+    # blocks -- the pooled session is *not* closed on exit.
+    async with http_pool.session(http_pool.POOL_STAC) as s:
+        ...
+
+Clients are bound to the event loop that created them. ``startup()`` /
+``shutdown()`` are wired to the FastAPI lifecycle hooks; outside the app
+(scripts, unit tests using ``asyncio.run``) clients are created lazily
+and transparently re-created when the running loop changes.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+import logging
+import os
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, Tuple
+
+import aiohttp
+import httpx
+
+logger = logging.getLogger(__name__)
+
+POOL_STAC = "stac"
+POOL_PRO = "pro"
+POOL_GEOCODER = "geocoder"
+POOL_OPEN_METEO = "open-meteo"
+POOL_BLOB = "blob"
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+@dataclass(frozen=True)
+class PoolConfig:
+    """Connection limits + default timeout for one upstream pool."""
+
+    limit: int
+    limit_per_host: int
+    timeout_s: float
+    keepalive_s: float = 30.0
+
+
+def _pool_config(name: str, limit: int, per_host: int, timeout_s: float) -> PoolConfig:
+    # ``HTTP_POOL_PRO_PER_HOST=128`` etc. lets operators widen a single
+    # upstream without a redeploy of code.
+    env = name.upper().replace("-", "_")
+    return PoolConfig(
+        limit=_env_int(f"HTTP_POOL_{env}_LIMIT", limit),
+        limit_per_host=_env_int(f"HTTP_POOL_{env}_PER_HOST", per_host),
+        timeout_s=timeout_s,
+        keepalive_s=float(_env_int("HTTP_POOL_KEEPALIVE_S", 30)),
+    )
+
+
+# Tile traffic dominates the ``pro`` and ``stac`` pools (a single pan can
+# request 20-40 tiles), so they get the widest per-host caps.
+_POOL_CONFIGS: Dict[str, PoolConfig] = {
+    POOL_STAC: _pool_config(POOL_STAC, limit=128, per_host=64, timeout_s=60.0),
+    POOL_PRO: _pool_config(POOL_PRO, limit=128, per_host=64, timeout_s=60.0),
+    POOL_GEOCODER: _pool_config(POOL_GEOCODER, limit=32, per_host=16, timeout_s=15.0),
+    POOL_OPEN_METEO: _pool_config(POOL_OPEN_METEO, limit=32, per_host=16, timeout_s=15.0),
+    POOL_BLOB: _pool_config(POOL_BLOB, limit=128, per_host=32, timeout_s=60.0),
+}
+
+_DNS_TTL_S = _env_int("HTTP_POOL_DNS_TTL_S", 300)
+
+# HTTP/2 needs the optional ``h2`` package (``httpx[http2]``). aiohttp is
+# HTTP/1.1-only, which is why the httpx pools exist at all.
+_HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+_aiohttp_pools: Dict[str, Tuple[asyncio.AbstractEventLoop, aiohttp.ClientSession]] = {}
+_httpx_pools: Dict[str, Tuple[asyncio.AbstractEventLoop, httpx.AsyncClient]] = {}
+
+
+def _config(name: str) -> PoolConfig:
+    cfg = _POOL_CONFIGS.get(name)
+    if cfg is None:
+        raise KeyError(f"http_pool: unknown upstream pool {name!r}")
+    return cfg
+
+
+def get_session(name: str) -> aiohttp.ClientSession:
+    """Return the pooled ``aiohttp.ClientSession`` for ``name``.
+
+    Must be called from a coroutine. Callers must NOT close the
+    returned session -- its lifetime is owned by this module.
+    """
+    loop = asyncio.get_running_loop()
+    entry = _aiohttp_pools.get(name)
+    if entry is not None:
+        owner, sess = entry
+        if owner is loop and not sess.closed:
+            return sess
+    cfg = _config(name)
+    connector = aiohttp.TCPConnector(
+        limit=cfg.limit,
+        limit_per_host=cfg.limit_per_host,
+        ttl_dns_cache=_DNS_TTL_S,
+        use_dns_cache=True,
+        keepalive_timeout=cfg.keepalive_s,
+    )
+    sess = aiohttp.ClientSession(
+        connector=connector,
+        timeout=aiohttp.ClientTimeout(total=cfg.timeout_s),
+        # shared by every user's requests: never replay upstream cookies
+        cookie_jar=aiohttp.DummyCookieJar(),
+    )
+    _aiohttp_pools[name] = (loop, sess)
+    logger.info(
+        "[HTTP-POOL] aiohttp pool %s created (limit=%d per_host=%d dns_ttl=%ds)",
+        name, cfg.limit, cfg.limit_per_host, _DNS_TTL_S,
+    )
+    return sess
+
+
+@asynccontextmanager
+async def session(name: str) -> AsyncIterator[aiohttp.ClientSession]:
+    """Context-manager view of :func:`get_session` (does not close on exit)."""
+    yield get_session(name)
+
+
+def get_httpx_client(name: str) -> httpx.AsyncClient:
+    """Return the pooled ``httpx.AsyncClient`` for ``name`` (HTTP/2 if available)."""
+    loop = asyncio.get_running_loop()
+    entry = _httpx_pools.get(name)
+    if entry is not None:
+        owner, client = entry
+        if owner is loop and not client.is_closed:
+            return client
+    cfg = _config(name)
+    client = httpx.AsyncClient(
+        http2=_HTTP2_AVAILABLE,
+        timeout=httpx.Timeout(cfg.timeout_s, connect=5.0),
+        limits=httpx.Limits(
+            max_connections=cfg.limit,
+            max_keepalive_connections=cfg.limit_per_host,
+            keepalive_expiry=cfg.keepalive_s,
+        ),
+    )
+    _httpx_pools[name] = (loop, client)
+    logger.info(
+        "[HTTP-POOL] httpx pool %s created (limit=%d http2=%s)",
+        name, cfg.limit, _HTTP2_AVAILABLE,
+    )
+    return client
+
+
+async def startup() -> None:
+    """Create every aiohttp pool up front on the app's event loop."""
+    for name in _POOL_CONFIGS:
+        get_session(name)
+
+
+async def shutdown() -> None:
+    """Close every pool owned by the running loop. Never raises."""
+    loop = asyncio.get_running_loop()
+    for name, (owner, sess) in list(_aiohttp_pools.items()):
+        if owner is loop:
+            try:
+                await sess.close()
+            except Exception as exc:  # pragma: no cover - defensive
+                logger.warning("[HTTP-POOL] closing %s failed: %s", name, exc)
+        _aiohttp_pools.pop(name, None)
+    for name, (owner, client) in list(_httpx_pools.items()):
+        if owner is loop:
+            try:
+                await client.aclose()
+            except Exception as exc:  # pragma: no cover - defensive
+                logger.warning("[HTTP-POOL] closing %s (httpx) failed: %s", name, exc)
+        _httpx_pools.pop(name, None)
+
+
+def _aiohttp_stats(sess: aiohttp.ClientSession) -> Dict[str, Any]:
+    conn = sess.connector
+    # ``_acquired`` / ``_conns`` are private but stable across aiohttp 3.x;
+    # guard with getattr so a future rename degrades to zeros, not a 500.
+    acquired = len(getattr(conn, "_acquired", ()) or ())
+    idle = sum(len(v) for v in (getattr(conn, "_conns", {}) or {}).values())
+    return {
+        "kind": "aiohttp",
+        "closed": sess.closed,
+        "limit": getattr(conn, "limit", None),
+        "limit_per_host": getattr(conn, "limit_per_host", None),
+        "in_use": acquired,
+        "idle": idle,
+    }
+
+
+def _httpx_stats(client: httpx.AsyncClient) -> Dict[str, Any]:
+    pool = getattr(getattr(client, "_transport", None), "_pool", None)
+    conns = list(getattr(pool, "connections", []) or [])
+    idle = sum(1 for c in conns if getattr(c, "is_idle", lambda: False)())
+    return {
+        "kind": "httpx",
+        "closed": client.is_closed,
+        "http2": _HTTP2_AVAILABLE,
+        "in_use": len(conns) - idle,
+        "idle": idle,
+    }
+
+
+def stats() -> Dict[str, Any]:
+    """Pool occupancy snapshot for ``/api/health``."""
+    out: Dict[str, Any] = {}
+    for name, (_, sess) in _aiohttp_pools.items():
+        out[name] = _aiohttp_stats(sess)
+    for name, (_, client) in _httpx_pools.items():
+        out[f"{name}:httpx"] = _httpx_stats(client)
+    return out
@@ -41,6 +41,8 @@ import requests
 
 # Import PC config loader (single source of truth)
 from pc_tasks_config_loader import get_pc_rendering_config, DataType, RenderingConfig
+import result_cache
+from renders_resolver import get_renders_resolver, on_event_loop
 
 logger = logging.getLogger(__name__)
 
@@ -793,13 +795,15 @@ def match_collection_family(collection_id: str) -> Optional[DataType]:
 # ============================================================================
 
 MPC_STAC_API = "https://planetarycomputer.microsoft.com/api/stac/v1"
-METADATA_CACHE: Dict[str, Dict[str, Any]] = {}
+# Bounded, expiring (was an unbounded dict that never expired)
+METADATA_CACHE = result_cache.namespace("stac-collection-metadata", max_entries=512, ttl_s=3600)
 
 
 def fetch_stac_metadata(collection_id: str) -> Optional[Dict[str, Any]]:
-    """Fetch STAC collection metadata with caching"""
-    if collection_id in METADATA_CACHE:
-        return METADATA_CACHE[collection_id]
+    """Fetch STAC collection metadata with caching (blocking; use the async variant on the loop)"""
+    cached = METADATA_CACHE.get(collection_id)
+    if cached is not None:
+        return cached
     
     try:
         url = f"{MPC_STAC_API}/collections/{collection_id}"
@@ -807,7 +811,7 @@ def fetch_stac_metadata(collection_id: str) -> Optional[Dict[str, Any]]:
         
         if response.ok:
             metadata = response.json()
-            METADATA_CACHE[collection_id] = metadata
+            METADATA_CACHE.put(collection_id, metadata)
             return metadata
     except Exception as e:
         logger.error(f"Failed to fetch STAC metadata for {collection_id}: {e}")
@@ -815,6 +819,17 @@ def fetch_stac_metadata(collection_id: str) -> Optional[Dict[str, Any]]:
     return None
 
 
+async def fetch_stac_metadata_async(collection_id: str) -> Optional[Dict[str, Any]]:
+    """Async :func:`fetch_stac_metadata` on the pooled STAC session (same cache)"""
+    cached = METADATA_CACHE.get(collection_id)
+    if cached is not None:
+        return cached
+    metadata = await _fetch_pub_doc_async(collection_id)
+    if metadata is not None:
+        METADATA_CACHE.put(collection_id, metadata)
+    return metadata
+
+
 # ============================================================================
 # TIER-3 RENDER-CONFIG FETCHER: Live STAC ``renders`` extension
 # ============================================================================
@@ -837,28 +852,23 @@ def fetch_stac_metadata(collection_id: str) -> Optional[Dict[str, Any]]:
 #   3. STAC live ``renders``    -- THIS BLOCK (Public PC + Pro fallback)
 #
 # Cache:
-#   In-memory, TTL = ``_STAC_RENDERS_TTL_SEC`` (default 600s = 10 min).
-#   Negative results are cached too (with a shorter TTL) to avoid
-#   hammering the STAC API for collections that simply have no renders
-#   block.
+#   ``renders_resolver.RendersResolver``: bounded LRU keyed by
+#   (collection_id, is_pro), TTL ``RENDERS_TTL_S`` (default 600s) with a
+#   shorter TTL for negative results, stale-while-revalidate, seeded at
+#   startup from the CollectionIndex snapshot. We cache the FULL renders
+#   block (not a pre-picked RenderingConfig) so the intent-aware picker can
+#   choose a different preset per query without re-fetching. is_pro is part
+#   of the key because the same collection id can exist in both Public PC
+#   and a private GeoCatalog with DIFFERENT renders blocks.
 #
-# Auth:
-#   Public PC is anonymous. Pro requires AAD. We use the sync
-#   DefaultAzureCredential here (sibling module pro_stac_client uses the
-#   async one for request hot paths). The token is cached for ~55 min.
+# Auth / I/O:
+#   Public PC is anonymous. Pro requires AAD. On the event loop the
+#   resolver fetches with the async ``*_async`` helpers below (pooled
+#   sessions, pro_stac_client's async token). The blocking ``requests``
+#   helpers and the sync DefaultAzureCredential token (cached ~55 min)
+#   are only used off the loop (scripts, worker threads, tests).
 # ============================================================================
 
-_STAC_RENDERS_TTL_SEC = 600  # 10 minutes — preset edits propagate within
-_STAC_RENDERS_NEG_TTL_SEC = 60
-# {(collection_id, is_pro): (expires_at_epoch, renders_dict | None)}
-# We cache the FULL renders block (not a pre-picked RenderingConfig) so the
-# intent-aware picker can choose a different preset per query without
-# re-fetching. None = collection has no renders block (or fetch failed).
-# is_pro is part of the key because the same collection id can exist in both
-# Public PC and a private GeoCatalog with DIFFERENT renders blocks (e.g. a
-# private mirror that publishes additional presets the public copy lacks).
-_STAC_RENDERS_CACHE: Dict[Tuple[str, bool], Tuple[float, Optional[Dict[str, Any]]]] = {}
-
 _PRO_AUDIENCE = "https://geocatalog.spatio.azure.com"
 _PRO_API_VERSION = "2025-04-30-preview"
 _PRO_TOKEN_CACHE: Dict[str, Tuple[str, float]] = {}
@@ -1168,31 +1178,83 @@ def _fetch_collection_doc(collection_id: str, is_pro: bool = False) -> Optional[
     return _fetch_pub_doc(collection_id) or _fetch_pro_doc(collection_id)
 
 
+async def _fetch_pub_doc_async(collection_id: str) -> Optional[Dict[str, Any]]:
+    """Async :func:`_fetch_pub_doc` on the pooled STAC session."""
+    import aiohttp
+    import http_pool
+
+    pub_url = f"{MPC_STAC_API}/collections/{collection_id}"
+    try:
+        session = http_pool.get_session(http_pool.POOL_STAC)
+        async with session.get(pub_url, timeout=aiohttp.ClientTimeout(total=8)) as r:
+            if r.status == 200:
+                return await r.json()
+            if r.status != 404:
+                logger.debug(f"[RENDERS] Public PC returned {r.status} for {collection_id}")
+    except Exception as exc:
+        logger.debug(f"[RENDERS] Public PC fetch failed for {collection_id}: {exc}")
+    return None
+
+
+async def _fetch_pro_doc_async(collection_id: str) -> Optional[Dict[str, Any]]:
+    """Async :func:`_fetch_pro_doc` (pooled Pro session, async AAD token)."""
+    pro_base = os.getenv("MPC_PRO_STAC_URL")
+    if not pro_base:
+        return None
+    try:
+        import http_pool
+        from pro_stac_client import pro_get
+
+        doc = await pro_get(
+            http_pool.get_session(http_pool.POOL_PRO),
+            f"{pro_base.rstrip('/')}/collections/{collection_id}",
+            timeout=8,
+        )
+    except Exception as exc:
+        logger.debug(f"[RENDERS] Pro fetch failed for {collection_id}: {exc}")
+        return None
+    if not isinstance(doc, dict) or doc.get("__non_json__") or "status" in doc:
+        logger.debug(f"[RENDERS] Pro returned {doc.get('status') if isinstance(doc, dict) else doc!r} for {collection_id}")
+        return None
+    return doc
+
+
+def _renders_of(doc: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    block = doc.get("renders") if doc else None
+    return block if isinstance(block, dict) and block else None
+
+
+async def fetch_renders_block_async(collection_id: str, is_pro: bool = False) -> Optional[Dict[str, Any]]:
+    """Async fetch of a collection's ``renders`` block, same catalog order
+    as :func:`_fetch_collection_doc`. Used by the renders resolver."""
+    first, second = (_fetch_pro_doc_async, _fetch_pub_doc_async) if is_pro else (_fetch_pub_doc_async, _fetch_pro_doc_async)
+    return _renders_of(await first(collection_id) or await second(collection_id))
+
+
 def _get_renders_block(collection_id: str, is_pro: bool = False) -> Optional[Dict[str, Any]]:
     """Return the cached ``renders`` dict for a collection, or None.
 
-    Caches the full renders block (not a picked preset) so per-request
-    intent matching is free after the first fetch. Negative results are
-    cached too with a shorter TTL.
+    Served from the renders resolver (see :mod:`renders_resolver`):
+    stale entries are returned while they refresh in the background. A
+    miss on the event-loop thread never blocks -- the fetch is scheduled
+    and None is returned, so the caller falls through to its static
+    tiers; request handlers ``await get_renders_resolver().ensure(...)``
+    first so that does not happen on the hot path. Off the loop the
+    blocking fetch below fills the cache.
 
     Keyed by ``(collection_id, is_pro)`` so a private mirror with extra
     presets doesn't pollute the Public-mode cache (and vice versa).
     """
-    now = time.time()
-    cache_key = (collection_id, bool(is_pro))
-    cached = _STAC_RENDERS_CACHE.get(cache_key)
-    if cached and cached[0] > now:
-        return cached[1]
-
-    doc = _fetch_collection_doc(collection_id, is_pro=is_pro)
-    renders: Optional[Dict[str, Any]] = None
-    if doc:
-        block = doc.get("renders")
-        if isinstance(block, dict) and block:
-            renders = block
-
-    ttl = _STAC_RENDERS_TTL_SEC if renders else _STAC_RENDERS_NEG_TTL_SEC
-    _STAC_RENDERS_CACHE[cache_key] = (now + ttl, renders)
+    resolver = get_renders_resolver()
+    found, renders = resolver.lookup(collection_id, is_pro)
+    if found:
+        return renders
+    if on_event_loop():
+        resolver.defer(collection_id, is_pro)
+        return None
+
+    renders = _renders_of(_fetch_collection_doc(collection_id, is_pro=is_pro))
+    resolver.store(collection_id, is_pro, renders)
     return renders
 
 
@@ -1249,8 +1311,8 @@ def fetch_renders_config(
     is queried first; when False, Public PC is queried first. See
     :func:`_fetch_collection_doc` for the fallback policy.
 
-    The renders block is cached for :data:`_STAC_RENDERS_TTL_SEC`
-    seconds keyed by (collection_id, is_pro); the preset choice *within*
+    The renders block is cached by the renders resolver keyed by
+    (collection_id, is_pro); the preset choice *within*
     that block is recomputed per call based on ``query_context`` so the
     same collection can serve a true-color tile for one query and a
     SWIR-fire tile for the next without re-fetching STAC.
@@ -1630,60 +1692,121 @@ class HybridRenderingSystem:
 # the entire area.
 # ============================================================================
 
-# Cache for mosaic search_ids to avoid redundant API calls
-# Key: hash of (collections, bbox, datetime_range, query_filters)
-# Value: {"search_id": str, "timestamp": float}
-import hashlib
-import time
-from typing import Tuple
+# Mosaic search ids live in the shared mosaic_registry (memory / SQLite /
+# Redis-protocol store) so replicas and restarts reuse them, concurrent
+# identical registrations coalesce, and nearby views share one search.
+from mosaic_registry import get_mosaic_registry
 
-_mosaic_cache: Dict[str, Dict[str, Any]] = {}
-_MOSAIC_CACHE_TTL = 3600  # 1 hour TTL - mosaic search_ids are stable
+_MOSAIC_REGISTER_URL = "https://planetarycomputer.microsoft.com/api/data/v1/mosaic/register"
 
 
-def _get_mosaic_cache_key(
+def _build_mosaic_search_body(
     collections: List[str],
-    bbox: List[float],
+    bbox: Optional[List[float]],
     datetime_range: Optional[str],
     query_filters: Optional[Dict[str, Any]]
-) -> str:
-    """Generate a cache key for mosaic search parameters."""
-    # Sort collections for consistent hashing
-    sorted_collections = sorted(collections) if collections else []
-    # Round bbox to 2 decimals to allow small variations
-    rounded_bbox = [round(x, 2) for x in bbox] if bbox else []
-    
-    key_data = {
-        "collections": sorted_collections,
-        "bbox": rounded_bbox,
-        "datetime": datetime_range,
-        "filters": query_filters
+) -> Dict[str, Any]:
+    """Build the CQL2-JSON search body for ``/mosaic/register``."""
+    search_body = {
+        "collections": collections,
+        "filter-lang": "cql2-json"
     }
-    key_str = str(key_data)
-    return hashlib.md5(key_str.encode()).hexdigest()
-
-
-def _get_cached_mosaic_search_id(cache_key: str) -> Optional[str]:
-    """Get cached mosaic search_id if valid."""
-    if cache_key in _mosaic_cache:
-        cached = _mosaic_cache[cache_key]
-        if time.time() - cached["timestamp"] < _MOSAIC_CACHE_TTL:
-            logger.info(f"[FAST] Mosaic cache HIT: {cache_key[:8]}... -> {cached['search_id'][:16]}...")
-            return cached["search_id"]
+    
+    # Build CQL2 filter
+    cql_filter = {
+        "op": "and",
+        "args": []
+    }
+    
+    # Add bbox filter
+    if bbox and len(bbox) == 4:
+        cql_filter["args"].append({
+            "op": "s_intersects",
+            "args": [
+                {"property": "geometry"},
+                {
+                    "type": "Polygon",
+                    "coordinates": [[
+                        [bbox[0], bbox[1]],
+                        [bbox[2], bbox[1]],
+                        [bbox[2], bbox[3]],
+                        [bbox[0], bbox[3]],
+                        [bbox[0], bbox[1]]
+                    ]]
+                }
+            ]
+        })
+    
+    # Add datetime filter
+    if datetime_range:
+        # Parse datetime range
+        if "/" in datetime_range:
+            start_dt, end_dt = datetime_range.split("/")
+            cql_filter["args"].append({
+                "op": "t_intersects",
+                "args": [
+                    {"property": "datetime"},
+                    {"interval": [start_dt, end_dt]}
+                ]
+            })
         else:
-            # Expired - remove from cache
-            del _mosaic_cache[cache_key]
-            logger.info(f"[TIME] Mosaic cache EXPIRED: {cache_key[:8]}...")
-    return None
+            cql_filter["args"].append({
+                "op": "t_intersects",
+                "args": [
+                    {"property": "datetime"},
+                    {"interval": [datetime_range, datetime_range]}
+                ]
+            })
+    
+    # Add cloud cover filter if specified
+    if query_filters and "eo:cloud_cover" in query_filters:
+        cloud_filter = query_filters["eo:cloud_cover"]
+        if "lt" in cloud_filter:
+            cql_filter["args"].append({
+                "op": "<",
+                "args": [
+                    {"property": "eo:cloud_cover"},
+                    cloud_filter["lt"]
+                ]
+            })
+        elif "lte" in cloud_filter:
+            cql_filter["args"].append({
+                "op": "<=",
+                "args": [
+                    {"property": "eo:cloud_cover"},
+                    cloud_filter["lte"]
+                ]
+            })
+    
+    # Only add filter if we have conditions
+    if cql_filter["args"]:
+        search_body["filter"] = cql_filter
+    
+    return search_body
 
 
-def _cache_mosaic_search_id(cache_key: str, search_id: str) -> None:
-    """Cache a mosaic search_id."""
-    _mosaic_cache[cache_key] = {
-        "search_id": search_id,
-        "timestamp": time.time()
-    }
-    logger.info(f"[SAVE] Mosaic cache SET: {cache_key[:8]}... -> {search_id[:16]}...")
+async def _post_mosaic_register(search_body: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """POST a search to the public mosaic API on the pooled STAC client.
+
+    Returns ``{"search_id": ...}`` or None on failure (not cached).
+    """
+    import http_pool
+
+    client = http_pool.get_httpx_client(http_pool.POOL_STAC)
+    resp = await client.post(
+        _MOSAIC_REGISTER_URL,
+        json=search_body,
+        headers={"Content-Type": "application/json"},
+        timeout=10.0,
+    )
+    logger.info(f"[LAUNCH] Mosaic registration: {resp.status_code}")
+    if resp.status_code != 200:
+        logger.error(f"[FAIL] Mosaic registration failed: {resp.status_code} - {resp.text}")
+        return None
+    result = resp.json()
+    search_id = result.get("searchid") or result.get("search_id")
+    logger.info(f"[OK] Mosaic search registered: search_id={search_id}")
+    return {"search_id": search_id} if search_id else None
 
 
 async def register_mosaic_search(
@@ -1700,7 +1823,9 @@ async def register_mosaic_search(
     useful for large areas (countries, continents) where a single date's
     imagery doesn't cover the entire region.
     
-    Uses caching to avoid redundant API calls for repeated queries.
+    Search ids come from the shared mosaic registry: the bbox is snapped
+    outward to a grid so nearby views reuse one search, and a repeat (on
+    any replica sharing the registry store) skips the register call.
     
     Args:
         collections: List of STAC collection IDs (e.g., ["hls2-l30", "hls2-s30"])
@@ -1712,152 +1837,21 @@ async def register_mosaic_search(
         search_id if registration successful, None otherwise
     """
     try:
-        # Check cache first
-        cache_key = _get_mosaic_cache_key(collections, bbox, datetime_range, query_filters)
-        cached_search_id = _get_cached_mosaic_search_id(cache_key)
-        if cached_search_id:
-            return cached_search_id
-        
-        mosaic_register_url = "https://planetarycomputer.microsoft.com/api/data/v1/mosaic/register"
-        
-        # Build the search payload
-        search_body = {
-            "collections": collections,
-            "filter-lang": "cql2-json"
-        }
-        
-        # Build CQL2 filter
-        cql_filter = {
-            "op": "and",
-            "args": []
-        }
-        
-        # Add bbox filter
-        if bbox and len(bbox) == 4:
-            cql_filter["args"].append({
-                "op": "s_intersects",
-                "args": [
-                    {"property": "geometry"},
-                    {
-                        "type": "Polygon",
-                        "coordinates": [[
-                            [bbox[0], bbox[1]],
-                            [bbox[2], bbox[1]],
-                            [bbox[2], bbox[3]],
-                            [bbox[0], bbox[3]],
-                            [bbox[0], bbox[1]]
-                        ]]
-                    }
-                ]
-            })
-        
-        # Add datetime filter
-        if datetime_range:
-            # Parse datetime range
-            if "/" in datetime_range:
-                start_dt, end_dt = datetime_range.split("/")
-                cql_filter["args"].append({
-                    "op": "t_intersects",
-                    "args": [
-                        {"property": "datetime"},
-                        {"interval": [start_dt, end_dt]}
-                    ]
-                })
-            else:
-                cql_filter["args"].append({
-                    "op": "t_intersects",
-                    "args": [
-                        {"property": "datetime"},
-                        {"interval": [datetime_range, datetime_range]}
-                    ]
-                })
-        
-        # Add cloud cover filter if specified
-        if query_filters and "eo:cloud_cover" in query_filters:
-            cloud_filter = query_filters["eo:cloud_cover"]
-            if "lt" in cloud_filter:
-                cql_filter["args"].append({
-                    "op": "<",
-                    "args": [
-                        {"property": "eo:cloud_cover"},
-                        cloud_filter["lt"]
-                    ]
-                })
-            elif "lte" in cloud_filter:
-                cql_filter["args"].append({
-                    "op": "<=",
-                    "args": [
-                        {"property": "eo:cloud_cover"},
-                        cloud_filter["lte"]
-                    ]
-                })
-        
-        # Only add filter if we have conditions
-        if cql_filter["args"]:
-            search_body["filter"] = cql_filter
-        
-        logger.info(f"[GLOBE] Registering mosaic search: collections={collections}, bbox={bbox}")
-        
-        # Try httpx first (async), fall back to urllib (sync)
-        import asyncio
-        import json as json_lib
-        
-        response = None
-        
-        # Try httpx first (async, faster), fall back to urllib (sync)
-        try:
-            import httpx
-            # Use async httpx for better performance - reduced timeout
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                resp = await client.post(
-                    mosaic_register_url,
-                    json=search_body,
-                    headers={"Content-Type": "application/json"}
-                )
-                response = {"status_code": resp.status_code, "text": resp.text}
-                logger.info(f"[LAUNCH] Mosaic registration via httpx: {resp.status_code}")
-        except ImportError:
-            # Fallback to urllib if httpx not available
-            import urllib.request
-            import urllib.error
-            
-            def _make_request():
-                data = json_lib.dumps(search_body).encode('utf-8')
-                req = urllib.request.Request(
-                    mosaic_register_url,
-                    data=data,
-                    headers={"Content-Type": "application/json"},
-                    method='POST'
-                )
-                try:
-                    with urllib.request.urlopen(req, timeout=15) as resp:
-                        return {
-                            "status_code": resp.getcode(),
-                            "text": resp.read().decode('utf-8')
-                        }
-                except urllib.error.HTTPError as e:
-                    return {
-                        "status_code": e.code,
-                        "text": e.read().decode('utf-8')
-                    }
-            
-            response = await asyncio.to_thread(_make_request)
-            logger.info(f"[SLOW] Mosaic registration via urllib fallback: {response['status_code']}")
-        
-        if response["status_code"] == 200:
-            result = json_lib.loads(response["text"])
-            search_id = result.get("searchid") or result.get("search_id")
-            logger.info(f"[OK] Mosaic search registered: search_id={search_id}")
-            
-            # Cache the search_id for future requests
-            if search_id:
-                _cache_mosaic_search_id(cache_key, search_id)
-            
-            return search_id
-        else:
-            logger.error(f"[FAIL] Mosaic registration failed: {response['status_code']} - {response['text']}")
-            return None
-                    
+        registry = get_mosaic_registry()
+        snapped = registry.snap(bbox)
+        search_body = _build_mosaic_search_body(collections, snapped, datetime_range, query_filters)
+        logger.info(f"[GLOBE] Mosaic search: collections={collections}, bbox={bbox} -> {snapped}")
+        entry = await registry.get_or_register(
+            "public",
+            {
+                "collections": sorted(collections or []),
+                "bbox": snapped,
+                "datetime": datetime_range,
+                "filters": query_filters,
+            },
+            lambda: _post_mosaic_register(search_body),
+        )
+        return entry["search_id"] if entry else None
     except Exception as e:
         logger.error(f"[FAIL] Mosaic registration error: {e}")
         return None
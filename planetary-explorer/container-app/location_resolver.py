@@ -16,6 +16,7 @@ import os
 import re
 
 from cloud_config import cloud_cfg  # [CLOUD] Cloud environment configuration
+import http_pool  # Shared keep-alive sessions for geocoder traffic
 
 # Load environment variables
 try:
@@ -1174,7 +1175,7 @@ class EnhancedLocationResolver:
             "countrySet": "US,CA,MX",  # default to North America; relaxes to global below if no hit
         })
         try:
-            async with aiohttp.ClientSession() as session:
+            async with http_pool.session(http_pool.POOL_GEOCODER) as session:
                 async with session.get(url, params=params, headers=headers) as resp:
                     if resp.status != 200:
                         self.logger.debug(f"Landmark search HTTP {resp.status} for '{location_name}'")
@@ -1189,7 +1190,7 @@ class EnhancedLocationResolver:
                     "limit": 10,
                     "entityType": "POI",
                 })
-                async with aiohttp.ClientSession() as session:
+                async with http_pool.session(http_pool.POOL_GEOCODER) as session:
                     async with session.get(url, params=params2, headers=headers2) as resp2:
                         if resp2.status == 200:
                             data2 = await resp2.json()
@@ -1232,7 +1233,7 @@ class EnhancedLocationResolver:
         })
         
         try:
-            async with aiohttp.ClientSession() as session:
+            async with http_pool.session(http_pool.POOL_GEOCODER) as session:
                 async with session.get(url, params=params, headers=headers) as response:
                     if response.status == 200:
                         data = await response.json()
@@ -1458,7 +1459,7 @@ class EnhancedLocationResolver:
         })
         
         try:
-            async with aiohttp.ClientSession() as session:
+            async with http_pool.session(http_pool.POOL_GEOCODER) as session:
                 async with session.get(url, params=params, headers=headers) as response:
                     if response.status == 200:
                         data = await response.json()
@@ -1506,7 +1507,7 @@ class EnhancedLocationResolver:
             })
         
         try:
-            async with aiohttp.ClientSession() as session:
+            async with http_pool.session(http_pool.POOL_GEOCODER) as session:
                 async with session.get(url, params=params, headers=headers) as response:
                     if response.status == 200:
                         data = await response.json()
@@ -1544,7 +1545,7 @@ class EnhancedLocationResolver:
         })
         
         try:
-            async with aiohttp.ClientSession() as session:
+            async with http_pool.session(http_pool.POOL_GEOCODER) as session:
                 async with session.get(url, params=params, headers=headers) as response:
                     if response.status == 200:
                         data = await response.json()
@@ -1686,7 +1687,7 @@ Location: {location_name}"""
         }
         
         try:
-            async with aiohttp.ClientSession() as session:
+            async with http_pool.session(http_pool.POOL_GEOCODER) as session:
                 async with session.get(url, params=params) as response:
                     if response.status == 200:
                         data = await response.json()
@@ -1733,7 +1734,7 @@ Location: {location_name}"""
         headers = {"User-Agent": "PlanetaryExplorer/2.0 (geographic-analysis)"}
         
         try:
-            async with aiohttp.ClientSession() as session:
+            async with http_pool.session(http_pool.POOL_GEOCODER) as session:
                 async with session.get(url, params=params) as response:
                     if response.status == 200:
                         data = await response.json()
@@ -2166,7 +2167,7 @@ Location: {location_name}"""
         headers = {"User-Agent": "PlanetaryExplorer/2.1 (enhanced-international-geocoding)"}
         
         try:
-            async with aiohttp.ClientSession() as session:
+            async with http_pool.session(http_pool.POOL_GEOCODER) as session:
                 async with session.get(url, params=params) as response:
                     if response.status == 200:
                         data = await response.json()
@@ -0,0 +1,305 @@
+"""Shared registry of mosaic search ids (public PC and MPC Pro).
+
+Rendering a mosaic layer starts with ``POST .../mosaic/register``, which
+sits directly on the time-to-first-tile path. The search ids used to be
+kept in per-process dicts (``hybrid_rendering_system._mosaic_cache`` and
+``pro_mosaic._search_cache``), so every replica -- and every restart --
+registered the same searches again; each registration also opened a new
+httpx client, and two users opening the same view at once both
+registered it.
+
+This module keeps one registry instead:
+
+  - **pluggable, shared store**: the :mod:`pipeline.session_store`
+    backends -- ``memory`` (per process), ``sqlite`` (shared by the
+    workers on a host) or ``redis`` (any Redis-protocol server, shared by
+    all replicas) -- so a search registered anywhere is reused everywhere
+  - **single-flight**: concurrent identical registrations share one
+    upstream call
+  - **bbox snapping**: the search bbox is expanded outward to a grid
+    whose cell is a power-of-two multiple of ``MOSAIC_BBOX_SNAP_DEG``
+    (about 1/8 of the view span), so nearby views and small pans reuse
+    one search id. A larger search area does not change the rendered
+    tiles -- each tile composites only the items that intersect it
+  - **refresh-ahead**: an entry used within ``MOSAIC_REGISTRY_REFRESH_S``
+    of its expiry is re-registered in the background while the current
+    id keeps being served
+  - **metered**: hits / misses / registrations / coalesced waiters,
+    reported in ``/api/health``
+
+Failed registrations are never stored. Registration itself (payload,
+endpoint, auth) stays with the callers; the registry only decides
+whether it has to run. Reads and writes against the sqlite / redis
+stores run in a worker thread so a slow store never stalls the event
+loop; the Redis client gets short socket timeouts and is pinged at
+startup, falling back to the memory store when the server is down.
+
+Config:
+  MOSAIC_REGISTRY_BACKEND      memory | sqlite | redis   (default memory)
+  MOSAIC_REGISTRY_TTL_S        upper bound on entry lifetime (default 3600)
+  MOSAIC_REGISTRY_REFRESH_S    re-register this long before expiry (default 300)
+  MOSAIC_REGISTRY_MAX_ENTRIES  memory/sqlite size cap   (default 5000)
+  MOSAIC_REGISTRY_SQLITE_PATH  sqlite file (default <tmp>/earth-copilot/mosaic_registry.sqlite3)
+  MOSAIC_REGISTRY_REDIS_URL    defaults to SESSION_STORE_REDIS_URL
+  MOSAIC_REGISTRY_REDIS_PREFIX key prefix               (default earthcopilot:mosaic:)
+  MOSAIC_REGISTRY_REDIS_TIMEOUT_S  socket connect/read timeout (default 0.5)
+  MOSAIC_BBOX_SNAP_DEG         base snapping grid in degrees (default 0.25, 0 = off)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import math
+import os
+import tempfile
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from pipeline.session_store import (
+    MemorySessionBackend,
+    RedisSessionBackend,
+    SessionBackend,
+    SQLiteSessionBackend,
+)
+
+logger = logging.getLogger(__name__)
+
+RegisterFn = Callable[[], Awaitable[Optional[Dict[str, Any]]]]
+
+_SNAP_CELLS = 8
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name) or default)
+    except ValueError:
+        return default
+
+
+def snap_bbox(bbox: Optional[List[float]], base_deg: float = 0.25) -> Optional[List[float]]:
+    """Expand ``bbox`` outward to a grid of roughly ``span / 8`` cells.
+
+    The cell is the smallest power-of-two multiple of ``base_deg`` that
+    splits the longer side into at most 8 cells. Bboxes crossing the
+    antimeridian (west > east) and ``base_deg <= 0`` are returned as-is.
+    """
+    if not bbox or len(bbox) != 4:
+        return list(bbox) if bbox else None
+    west, south, east, north = (float(v) for v in bbox)
+    if base_deg <= 0 or west > east or south > north:
+        return [west, south, east, north]
+    span = max(east - west, north - south, base_deg)
+    step = float(base_deg)
+    while span / step > _SNAP_CELLS:
+        step *= 2
+    return [
+        round(max(-180.0, math.floor(west / step) * step), 6),
+        round(max(-90.0, math.floor(south / step) * step), 6),
+        round(min(180.0, math.ceil(east / step) * step), 6),
+        round(min(90.0, math.ceil(north / step) * step), 6),
+    ]
+
+
+class MosaicRegistry:
+    """``(catalog, search parameters) -> registration`` over a session backend.
+
+    A registration is whatever the caller's ``register`` coroutine
+    returns (at least ``{"search_id": ...}``); the registry adds
+    ``registered_at`` / ``expires_at``.
+    """
+
+    def __init__(
+        self,
+        backend: SessionBackend,
+        *,
+        ttl_s: float = 3600.0,
+        refresh_ahead_s: float = 300.0,
+        snap_deg: float = 0.25,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self._backend = backend
+        self.ttl_s = float(ttl_s)
+        self.refresh_ahead_s = float(refresh_ahead_s)
+        self.snap_deg = float(snap_deg)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.registrations = 0
+        self.refreshes = 0
+        self.failures = 0
+
+    def snap(self, bbox: Optional[List[float]]) -> Optional[List[float]]:
+        return snap_bbox(bbox, self.snap_deg)
+
+    @staticmethod
+    def key(catalog: str, params: Dict[str, Any]) -> str:
+        raw = json.dumps([catalog, params], sort_keys=True, default=str)
+        return f"mosaic:{catalog}:{hashlib.sha256(raw.encode('utf-8')).hexdigest()[:32]}"
+
+    async def get_or_register(
+        self,
+        catalog: str,
+        params: Dict[str, Any],
+        register: RegisterFn,
+        *,
+        ttl_s: Optional[float] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """The live registration for ``params``, registering it at most once.
+
+        ``params`` must already carry the snapped bbox (see :meth:`snap`)
+        and everything else that changes the search body.
+        """
+        key = self.key(catalog, params)
+        ttl = min(self.ttl_s, ttl_s) if ttl_s else self.ttl_s
+        now = self._clock()
+        entry = await self._io(self._read, key)
+        if entry is not None and now < float(entry.get("expires_at", 0)):
+            with self._lock:
+                self.hits += 1
+            if now >= float(entry["expires_at"]) - min(self.refresh_ahead_s, ttl / 4):
+                self._start(key, register, ttl, refresh=True)
+            logger.info(f"[FAST] Mosaic registry HIT ({catalog}): {key[-8:]} -> {str(entry['search_id'])[:16]}")
+            return entry
+
+        task = self._inflight.get(key)
+        if task is not None and not task.done() and task.get_loop() is asyncio.get_running_loop():
+            with self._lock:
+                self.coalesced += 1
+            return await asyncio.shield(task)
+        with self._lock:
+            self.misses += 1
+        return await asyncio.shield(self._start(key, register, ttl))
+
+    def _start(self, key: str, register: RegisterFn, ttl: float, *, refresh: bool = False) -> asyncio.Task:
+        loop = asyncio.get_running_loop()
+        task = self._inflight.get(key)
+        if task is None or task.done() or task.get_loop() is not loop:
+            task = self._inflight[key] = loop.create_task(self._register(key, register, ttl, refresh))
+        return task
+
+    async def _register(self, key: str, register: RegisterFn, ttl: float, refresh: bool) -> Optional[Dict[str, Any]]:
+        try:
+            result = await register()
+        except Exception as exc:
+            logger.warning(f"[FAIL] Mosaic registration error for {key[-8:]}: {exc}")
+            result = None
+        finally:
+            if self._inflight.get(key) is asyncio.current_task():
+                self._inflight.pop(key, None)
+        if not result or not result.get("search_id"):
+            with self._lock:
+                self.failures += 1
+            return None
+        now = self._clock()
+        entry = dict(result, registered_at=now, expires_at=now + ttl)
+        try:
+            await self._io(self._backend.set, key, entry)
+        except Exception as exc:
+            logger.warning(f"[MOSAIC-REGISTRY] store write failed ({self._backend.name}): {exc}")
+        with self._lock:
+            self.registrations += 1
+            if refresh:
+                self.refreshes += 1
+        logger.info(f"[SAVE] Mosaic registry SET: {key[-8:]} -> {str(entry['search_id'])[:16]}{' (refresh)' if refresh else ''}")
+        return entry
+
+    async def _io(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run a store call off the event loop (the in-process memory store runs inline)."""
+        if isinstance(self._backend, MemorySessionBackend):
+            return fn(*args)
+        return await asyncio.to_thread(fn, *args)
+
+    def _read(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            entry = self._backend.get(key)
+        except Exception as exc:
+            logger.warning(f"[MOSAIC-REGISTRY] store read failed ({self._backend.name}): {exc}")
+            return None
+        return entry if isinstance(entry, dict) and entry.get("search_id") else None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            out = {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+                "coalesced": self.coalesced,
+                "registrations": self.registrations,
+                "refreshes": self.refreshes,
+                "failures": self.failures,
+                "inflight": len(self._inflight),
+                "ttl_s": self.ttl_s,
+                "snap_deg": self.snap_deg,
+            }
+        try:
+            out["store"] = self._backend.stats()
+        except Exception as exc:  # pragma: no cover - defensive
+            out["store"] = {"backend": self._backend.name, "error": str(exc)}
+        return out
+
+
+# ---------------------------------------------------------------------------
+# Module singleton
+# ---------------------------------------------------------------------------
+
+_registry: Optional[MosaicRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def _build_backend(ttl_s: float) -> SessionBackend:
+    kind = (os.getenv("MOSAIC_REGISTRY_BACKEND") or "memory").strip().lower()
+    max_entries = int(_env_float("MOSAIC_REGISTRY_MAX_ENTRIES", 5000))
+    try:
+        if kind == "sqlite":
+            path = os.getenv("MOSAIC_REGISTRY_SQLITE_PATH") or os.path.join(
+                tempfile.gettempdir(), "earth-copilot", "mosaic_registry.sqlite3"
+            )
+            return SQLiteSessionBackend(path, max_entries=max_entries, ttl_s=ttl_s)
+        if kind == "redis":
+            import redis  # optional dependency; only needed for this backend
+
+            timeout = _env_float("MOSAIC_REGISTRY_REDIS_TIMEOUT_S", 0.5)
+            client = redis.Redis.from_url(
+                os.getenv("MOSAIC_REGISTRY_REDIS_URL") or os.getenv("SESSION_STORE_REDIS_URL") or "redis://localhost:6379/0",
+                socket_timeout=timeout,
+                socket_connect_timeout=timeout,
+            )
+            client.ping()  # from_url does not connect; fail here so the memory fallback applies
+            return RedisSessionBackend(
+                client,
+                prefix=os.getenv("MOSAIC_REGISTRY_REDIS_PREFIX") or "earthcopilot:mosaic:",
+                ttl_s=ttl_s,
+            )
+        if kind != "memory":
+            logger.warning(f"[MOSAIC-REGISTRY] unknown MOSAIC_REGISTRY_BACKEND={kind!r}; using memory")
+    except Exception as exc:
+        logger.warning(f"[MOSAIC-REGISTRY] {kind} backend unavailable ({exc}); using memory")
+    return MemorySessionBackend(max_entries=max_entries, ttl_s=ttl_s)
+
+
+def get_mosaic_registry() -> MosaicRegistry:
+    """Return the process-wide :class:`MosaicRegistry` (built from env on first use)."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            ttl_s = _env_float("MOSAIC_REGISTRY_TTL_S", 3600.0)
+            _registry = MosaicRegistry(
+                _build_backend(ttl_s),
+                ttl_s=ttl_s,
+                refresh_ahead_s=_env_float("MOSAIC_REGISTRY_REFRESH_S", 300.0),
+                snap_deg=_env_float("MOSAIC_BBOX_SNAP_DEG", 0.25),
+            )
+            logger.info(f"[MOSAIC-REGISTRY] backend={_registry._backend.name}")
+        return _registry
+
+
+def stats() -> Dict[str, Any]:
+    return get_mosaic_registry().stats()
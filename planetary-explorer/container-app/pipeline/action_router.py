@@ -79,7 +79,7 @@ class ActionRouter:
         client = get_aoai_client()
         started = time.time()
         try:
-            resp = await client.chat.completions.create(
+            resp = await client.create(
                 model=self._deployment,
                 messages=[
                     {"role": "system", "content": ACTION_ROUTER_SYSTEM_PROMPT},
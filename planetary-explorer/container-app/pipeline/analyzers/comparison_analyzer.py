@@ -197,7 +197,7 @@ class ComparisonAnalyzer(Analyzer):
                 f"Delta (max-min): {delta}\n"
                 f"User question: {request.question}"
             )
-            resp = await client.chat.completions.create(
+            resp = await client.create(
                 model=self._deployment,
                 messages=[
                     {"role": "system", "content": _NARRATIVE_SYSTEM},
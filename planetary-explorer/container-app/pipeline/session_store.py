@@ -1,72 +1,623 @@
 """
 Session context store.
 
-Plain in-process dict wrapper that holds per-session routing/render state
-(last_bbox, last_location, last_collections, last_stac_items, query_count,
-has_rendered_map, has_screenshot, pending_clarification, ...).
+Holds per-session routing/render state (last_bbox, last_location,
+last_collections, last_stac_items, query_count, has_rendered_map,
+has_screenshot, pending_clarification, ...) plus every other piece of
+per-conversation state the app keeps: the SemanticQueryTranslator's
+conversation contexts and each GEOINT agent's session -> thread map.
 
 Was previously bolted onto `RouterAgentTools.session_contexts` when the
 router was a Semantic Kernel agent. Wave 4 retires that SK agent; this
 module is the single source of truth so both the legacy router shim and
 the new pipeline executors can read/write the same state without
 depending on Semantic Kernel.
+
+Storage is pluggable so more than one uvicorn worker / replica can serve
+the same conversation:
+
+  * ``memory`` (default) -- in-process LRU. Stores objects by reference,
+    so in-place mutation keeps working exactly as before.
+  * ``sqlite`` -- one SQLite file (WAL) shared by workers on the host.
+  * ``redis``  -- any Redis-protocol server (Redis, Azure Cache for
+    Redis, Garnet, ...), shared across replicas. Size is bounded by the
+    server's ``maxmemory-policy``.
+
+All backends apply an idle TTL (time since last write) and the local
+ones a size cap. Serializing backends store compact JSON (zlib-packed
+above ~512 bytes) with tagged ``datetime`` / ``set`` values.
+
+Values are namespaced (``router``, ``conversation``, ``terrain``, ...).
+Callers get either a :class:`SessionContextStore` (dict contexts with
+``get``/``update``) or a :class:`SessionMap` (a ``MutableMapping`` of
+session objects). With a serializing backend, values read from the map
+are copies -- write them back with ``sessions[sid] = session`` after
+mutating. Plain dict values read through ``SessionContextStore.raw``
+write themselves back on top-level assignment. Async callers use the
+map's ``aget`` / ``aset`` / ``adelete``, which run sqlite / redis round
+trips in a worker thread (the memory backend stays inline).
+
+Config:
+  SESSION_STORE_BACKEND      memory | sqlite | redis   (default memory)
+  SESSION_STORE_TTL_S        idle TTL in seconds       (default 3600)
+  SESSION_STORE_MAX_ENTRIES  memory/sqlite size cap    (default 10000)
+  SESSION_STORE_SQLITE_PATH  sqlite file (default <tmp>/earth-copilot/sessions.sqlite3)
+  SESSION_STORE_REDIS_URL    e.g. rediss://:key@host:6380/0
+  SESSION_STORE_REDIS_PREFIX key prefix                (default earthcopilot:session:)
+  SESSION_STORE_REDIS_TIMEOUT_S  socket connect/read timeout (default 1.0)
 """
 
 from __future__ import annotations
 
+import asyncio
+import json
 import logging
-from datetime import datetime
-from typing import Any, Dict, Optional
+import os
+import sqlite3
+import struct
+import tempfile
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from datetime import date, datetime
+from typing import Any, Dict, Iterator, List, MutableMapping, Optional, Tuple, Type
 
 logger = logging.getLogger(__name__)
 
 
+# ---------------------------------------------------------------------------
+# Compact serialization
+# ---------------------------------------------------------------------------
+
+_ZLIB_MIN_BYTES = 512
+
+
+def _json_default(obj: Any) -> Any:
+    if isinstance(obj, datetime):
+        return {"$dt": obj.isoformat()}
+    if isinstance(obj, date):
+        return {"$date": obj.isoformat()}
+    if isinstance(obj, (set, frozenset)):
+        return {"$set": list(obj)}
+    if hasattr(obj, "tolist"):  # numpy arrays / scalars
+        return obj.tolist()
+    return str(obj)
+
+
+def _json_hook(d: Dict[str, Any]) -> Any:
+    if len(d) == 1:
+        if "$dt" in d:
+            return datetime.fromisoformat(d["$dt"])
+        if "$date" in d:
+            return date.fromisoformat(d["$date"])
+        if "$set" in d:
+            return set(d["$set"])
+    return d
+
+
+def dumps(value: Any) -> bytes:
+    """Serialize ``value`` to compact JSON, zlib-packed when it pays off."""
+    raw = json.dumps(
+        value, separators=(",", ":"), ensure_ascii=False, default=_json_default
+    ).encode("utf-8")
+    if len(raw) >= _ZLIB_MIN_BYTES:
+        packed = zlib.compress(raw, 6)
+        if len(packed) < len(raw):
+            return b"z" + packed
+    return b"j" + raw
+
+
+def loads(blob: bytes) -> Any:
+    tag, body = blob[:1], blob[1:]
+    if tag == b"z":
+        body = zlib.decompress(body)
+    return json.loads(body.decode("utf-8"), object_hook=_json_hook)
+
+
+# ---------------------------------------------------------------------------
+# Backends
+# ---------------------------------------------------------------------------
+
+class SessionBackend:
+    """Key/value contract shared by all backends. Keys are ``namespace:id``."""
+
+    name = "base"
+    # True when values are held by reference (no serialization round-trip).
+    stores_references = False
+
+    def get(self, key: str) -> Optional[Any]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: Any) -> None:
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    def keys(self, prefix: str = "") -> List[str]:
+        raise NotImplementedError
+
+    def purge_idle(self, max_idle_s: float, prefix: str = "") -> int:
+        """Delete entries under ``prefix`` not written for ``max_idle_s``."""
+        raise NotImplementedError
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": self.name}
+
+
+class MemorySessionBackend(SessionBackend):
+    """Thread-safe in-process LRU with an idle TTL."""
+
+    name = "memory"
+    stores_references = True
+
+    def __init__(self, *, max_entries: int = 10000, ttl_s: float = 3600.0) -> None:
+        self.max_entries = max(1, int(max_entries))
+        self.ttl_s = float(ttl_s)
+        self._data: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.RLock()
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            if time.time() - entry[0] > self.ttl_s:
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._data[key] = (time.time(), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def keys(self, prefix: str = "") -> List[str]:
+        now = time.time()
+        with self._lock:
+            return [
+                k for k, (ts, _) in self._data.items()
+                if k.startswith(prefix) and now - ts <= self.ttl_s
+            ]
+
+    def purge_idle(self, max_idle_s: float, prefix: str = "") -> int:
+        cutoff = time.time() - min(max_idle_s, self.ttl_s)
+        with self._lock:
+            stale = [k for k, (ts, _) in self._data.items() if k.startswith(prefix) and ts < cutoff]
+            for k in stale:
+                del self._data[k]
+        return len(stale)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": self.name,
+            "entries": len(self._data),
+            "max_entries": self.max_entries,
+            "ttl_s": self.ttl_s,
+            "evictions": self.evictions,
+        }
+
+
+class SQLiteSessionBackend(SessionBackend):
+    """SQLite-file backend; WAL lets several worker processes share it."""
+
+    name = "sqlite"
+    _PRUNE_EVERY = 64
+
+    def __init__(self, path: str, *, max_entries: int = 10000, ttl_s: float = 3600.0) -> None:
+        self.path = path
+        self.max_entries = max(1, int(max_entries))
+        self.ttl_s = float(ttl_s)
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=5.0, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            " key TEXT PRIMARY KEY, value BLOB NOT NULL, updated_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS sessions_updated ON sessions(updated_at)")
+        self._conn.commit()
+        self._lock = threading.Lock()
+        self._writes = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM sessions WHERE key = ? AND updated_at >= ?",
+                (key, time.time() - self.ttl_s),
+            ).fetchone()
+        return loads(row[0]) if row else None
+
+    def set(self, key: str, value: Any) -> None:
+        blob = dumps(value)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sessions (key, value, updated_at) VALUES (?, ?, ?)",
+                (key, blob, time.time()),
+            )
+            self._writes += 1
+            if self._writes % self._PRUNE_EVERY == 0:
+                self._prune_locked()
+            self._conn.commit()
+
+    def _prune_locked(self) -> None:
+        self._conn.execute(
+            "DELETE FROM sessions WHERE updated_at < ?", (time.time() - self.ttl_s,)
+        )
+        self._conn.execute(
+            "DELETE FROM sessions WHERE key IN ("
+            " SELECT key FROM sessions ORDER BY updated_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM sessions WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def keys(self, prefix: str = "") -> List[str]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key FROM sessions WHERE substr(key, 1, ?) = ? AND updated_at >= ?",
+                (len(prefix), prefix, time.time() - self.ttl_s),
+            ).fetchall()
+        return [r[0] for r in rows]
+
+    def purge_idle(self, max_idle_s: float, prefix: str = "") -> int:
+        with self._lock:
+            cur = self._conn.execute(
+                "DELETE FROM sessions WHERE substr(key, 1, ?) = ? AND updated_at < ?",
+                (len(prefix), prefix, time.time() - max_idle_s),
+            )
+            self._conn.commit()
+        return cur.rowcount or 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            count = self._conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+        return {
+            "backend": self.name,
+            "path": self.path,
+            "entries": int(count),
+            "max_entries": self.max_entries,
+            "ttl_s": self.ttl_s,
+        }
+
+
+class RedisSessionBackend(SessionBackend):
+    """Redis-protocol backend over a ``redis.Redis``-compatible client.
+
+    Each value is stored as ``<8-byte write time><dumps(value)>`` with
+    ``EX=ttl`` so the server expires idle sessions on its own; the
+    timestamp only serves :meth:`purge_idle` for shorter windows. Any
+    object exposing ``get``/``set(ex=)``/``delete``/``scan_iter`` works,
+    which is how the tests run it against a local stand-in.
+    """
+
+    name = "redis"
+    _TS = struct.Struct(">d")
+
+    def __init__(
+        self,
+        client: Any = None,
+        *,
+        url: Optional[str] = None,
+        prefix: str = "earthcopilot:session:",
+        ttl_s: float = 3600.0,
+        timeout_s: float = 1.0,
+    ) -> None:
+        if client is None:
+            import redis  # optional dependency; only needed for this backend
+
+            client = redis.Redis.from_url(
+                url or "redis://localhost:6379/0",
+                socket_timeout=timeout_s,
+                socket_connect_timeout=timeout_s,
+            )
+        self._client = client
+        self.prefix = prefix
+        self.ttl_s = float(ttl_s)
+
+    def _k(self, key: str) -> str:
+        return self.prefix + key
+
+    def ping(self) -> None:
+        """Raise when the server is unreachable (``from_url`` never connects)."""
+        self._client.ping()
+
+    def get(self, key: str) -> Optional[Any]:
+        blob = self._client.get(self._k(key))
+        if not blob:
+            return None
+        return loads(bytes(blob[self._TS.size:]))
+
+    def set(self, key: str, value: Any) -> None:
+        blob = self._TS.pack(time.time()) + dumps(value)
+        self._client.set(self._k(key), blob, ex=max(1, int(self.ttl_s)))
+
+    def delete(self, key: str) -> None:
+        self._client.delete(self._k(key))
+
+    def keys(self, prefix: str = "") -> List[str]:
+        out: List[str] = []
+        for raw in self._client.scan_iter(match=self._k(prefix) + "*"):
+            k = raw.decode("utf-8") if isinstance(raw, bytes) else str(raw)
+            out.append(k[len(self.prefix):])
+        return out
+
+    def purge_idle(self, max_idle_s: float, prefix: str = "") -> int:
+        if max_idle_s >= self.ttl_s:
+            return 0  # the server's EX already expires these
+        cutoff = time.time() - max_idle_s
+        purged = 0
+        for key in self.keys(prefix):
+            # only the 8-byte write time, not the whole value
+            head = self._client.getrange(self._k(key), 0, self._TS.size - 1)
+            if head and len(head) == self._TS.size and self._TS.unpack(bytes(head))[0] < cutoff:
+                self._client.delete(self._k(key))
+                purged += 1
+        return purged
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": self.name, "prefix": self.prefix, "ttl_s": self.ttl_s}
+
+
+# ---------------------------------------------------------------------------
+# Namespaced views
+# ---------------------------------------------------------------------------
+
+class _WriteBackDict(dict):
+    """Dict copy from a serializing backend that saves top-level writes."""
+
+    def __init__(self, owner: "SessionMap", session_id: str, data: Dict[str, Any]) -> None:
+        super().__init__(data)
+        self._owner = owner
+        self._sid = session_id
+
+    def _save(self) -> None:
+        self._owner[self._sid] = dict(self)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        super().__setitem__(key, value)
+        self._save()
+
+    def __delitem__(self, key: str) -> None:
+        super().__delitem__(key)
+        self._save()
+
+    def update(self, *args: Any, **kwargs: Any) -> None:
+        super().update(*args, **kwargs)
+        self._save()
+
+    def setdefault(self, key: str, default: Any = None) -> Any:
+        had = key in self
+        value = super().setdefault(key, default)
+        if not had:
+            self._save()
+        return value
+
+    def pop(self, key: str, *default: Any) -> Any:
+        value = super().pop(key, *default)
+        self._save()
+        return value
+
+
+class SessionMap(MutableMapping):
+    """``MutableMapping`` of session id -> value for one namespace.
+
+    ``cls`` (optional) is a plain attribute-bag class (the agents'
+    ``*Session`` objects); serializing backends store its ``__dict__``
+    and rebuild instances without calling ``__init__``. Without ``cls``
+    values are dicts.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        cls: Optional[Type[Any]] = None,
+        *,
+        backend: Optional[SessionBackend] = None,
+    ) -> None:
+        self.namespace = namespace
+        self._cls = cls
+        self._backend = backend or get_session_backend()
+        self._prefix = f"{namespace}:"
+
+    @property
+    def backend(self) -> SessionBackend:
+        return self._backend
+
+    def _decode(self, session_id: str, value: Any) -> Any:
+        if self._backend.stores_references:
+            return value
+        if self._cls is not None:
+            obj = self._cls.__new__(self._cls)
+            obj.__dict__.update(value)
+            return obj
+        return _WriteBackDict(self, session_id, value)
+
+    def _encode(self, value: Any) -> Any:
+        if self._backend.stores_references:
+            return value
+        if self._cls is not None:
+            return dict(vars(value))
+        return dict(value)
+
+    def __getitem__(self, session_id: str) -> Any:
+        value = self._backend.get(self._prefix + session_id)
+        if value is None:
+            raise KeyError(session_id)
+        return self._decode(session_id, value)
+
+    def __setitem__(self, session_id: str, value: Any) -> None:
+        self._backend.set(self._prefix + session_id, self._encode(value))
+
+    def __delitem__(self, session_id: str) -> None:
+        if self._backend.get(self._prefix + session_id) is None:
+            raise KeyError(session_id)
+        self._backend.delete(self._prefix + session_id)
+
+    def __contains__(self, session_id: object) -> bool:
+        return isinstance(session_id, str) and self._backend.get(self._prefix + session_id) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        n = len(self._prefix)
+        return iter([k[n:] for k in self._backend.keys(self._prefix)])
+
+    def __len__(self) -> int:
+        return len(self._backend.keys(self._prefix))
+
+    def clear(self) -> None:
+        for key in self._backend.keys(self._prefix):
+            self._backend.delete(key)
+
+    def purge_idle(self, max_idle_s: float) -> int:
+        """Drop sessions not written for ``max_idle_s`` (no values are loaded)."""
+        return self._backend.purge_idle(max_idle_s, self._prefix)
+
+    # ----- async access -----------------------------------------------------
+
+    async def _io(self, fn: Any, *args: Any) -> Any:
+        if self._backend.stores_references:
+            return fn(*args)
+        return await asyncio.to_thread(fn, *args)
+
+    async def aget(self, session_id: str, default: Any = None) -> Any:
+        """``get`` off the event loop -- one backend read, unlike ``in`` + ``[]``."""
+        return await self._io(self.get, session_id, default)
+
+    async def aset(self, session_id: str, value: Any) -> None:
+        await self._io(self.__setitem__, session_id, value)
+
+    async def adelete(self, session_id: str) -> None:
+        """Delete ``session_id`` if present (no read first)."""
+        await self._io(self._backend.delete, self._prefix + session_id)
+
+
 class SessionContextStore:
-    """Thread-unsafe per-session dict store. Single-process FastAPI is fine."""
+    """Per-session dict contexts for one namespace, on a shared backend."""
 
-    def __init__(self) -> None:
-        self._contexts: Dict[str, Dict[str, Any]] = {}
-        self._last_seen: Dict[str, datetime] = {}
+    def __init__(
+        self,
+        backend: Optional[SessionBackend] = None,
+        *,
+        namespace: str = "router",
+    ) -> None:
+        self._map = SessionMap(namespace, backend=backend)
 
-    # The raw dict is exposed so legacy code that reads
+    # The mapping is exposed so legacy code that reads
     # `router_agent.tools.session_contexts.get(sid, {})` keeps working
     # without modification.
     @property
-    def raw(self) -> Dict[str, Dict[str, Any]]:
-        return self._contexts
+    def raw(self) -> SessionMap:
+        return self._map
+
+    @property
+    def backend(self) -> SessionBackend:
+        return self._map.backend
 
     def get(self, session_id: str) -> Dict[str, Any]:
-        return self._contexts.get(session_id, {})
+        return self._map.get(session_id, {})
 
     def update(self, session_id: str, partial: Dict[str, Any]) -> Dict[str, Any]:
-        existing = self._contexts.get(session_id, {})
+        existing = self._map.get(session_id)
+        if existing is None:
+            existing = {}
+        elif not self.backend.stores_references:
+            existing = dict(existing)
         existing.update(partial)
-        self._contexts[session_id] = existing
-        self._last_seen[session_id] = datetime.utcnow()
+        self._map[session_id] = existing
         return existing
 
     def delete(self, session_id: str) -> None:
-        self._contexts.pop(session_id, None)
-        self._last_seen.pop(session_id, None)
+        self._map.pop(session_id, None)
 
     def cleanup_older_than(self, max_age_minutes: int = 60) -> int:
-        now = datetime.utcnow()
-        expired = [
-            sid for sid, ts in self._last_seen.items()
-            if (now - ts).total_seconds() > max_age_minutes * 60
-        ]
-        for sid in expired:
-            self.delete(sid)
-        if expired:
-            logger.info("[SessionStore] cleaned %d expired sessions", len(expired))
-        return len(expired)
-
-
-_store: Optional[SessionContextStore] = None
-
-
-def get_session_store() -> SessionContextStore:
-    global _store
-    if _store is None:
-        _store = SessionContextStore()
-    return _store
+        purged = self._map.purge_idle(max_age_minutes * 60)
+        if purged:
+            logger.info("[SessionStore] cleaned %d expired sessions", purged)
+        return purged
+
+
+# ---------------------------------------------------------------------------
+# Process-wide backend + accessors
+# ---------------------------------------------------------------------------
+
+_backend: Optional[SessionBackend] = None
+_stores: Dict[str, SessionContextStore] = {}
+_backend_lock = threading.Lock()
+
+
+def _env_number(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name) or default)
+    except ValueError:
+        return default
+
+
+def _build_backend() -> SessionBackend:
+    kind = (os.getenv("SESSION_STORE_BACKEND") or "memory").strip().lower()
+    ttl_s = _env_number("SESSION_STORE_TTL_S", 3600.0)
+    max_entries = int(_env_number("SESSION_STORE_MAX_ENTRIES", 10000))
+    try:
+        if kind == "sqlite":
+            path = os.getenv("SESSION_STORE_SQLITE_PATH") or os.path.join(
+                tempfile.gettempdir(), "earth-copilot", "sessions.sqlite3"
+            )
+            return SQLiteSessionBackend(path, max_entries=max_entries, ttl_s=ttl_s)
+        if kind == "redis":
+            backend = RedisSessionBackend(
+                url=os.getenv("SESSION_STORE_REDIS_URL"),
+                prefix=os.getenv("SESSION_STORE_REDIS_PREFIX") or "earthcopilot:session:",
+                ttl_s=ttl_s,
+                timeout_s=_env_number("SESSION_STORE_REDIS_TIMEOUT_S", 1.0),
+            )
+            backend.ping()  # fail here so the memory fallback below applies
+            return backend
+        if kind != "memory":
+            logger.warning("[SessionStore] unknown SESSION_STORE_BACKEND=%r; using memory", kind)
+    except Exception as exc:
+        logger.warning("[SessionStore] %s backend unavailable (%s); using memory", kind, exc)
+    return MemorySessionBackend(max_entries=max_entries, ttl_s=ttl_s)
+
+
+def get_session_backend() -> SessionBackend:
+    """Return the process-wide backend (built from env on first use)."""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = _build_backend()
+                logger.info("[SessionStore] backend=%s", _backend.name)
+    return _backend
+
+
+def get_session_store(namespace: str = "router") -> SessionContextStore:
+    store = _stores.get(namespace)
+    if store is None:
+        store = _stores[namespace] = SessionContextStore(
+            get_session_backend(), namespace=namespace
+        )
+    return store
+
+
+def session_map(namespace: str, cls: Optional[Type[Any]] = None) -> SessionMap:
+    """Shorthand for a :class:`SessionMap` on the process-wide backend."""
+    return SessionMap(namespace, cls, backend=get_session_backend())
+
+
+def reset_session_store_for_tests(backend: Optional[SessionBackend] = None) -> None:
+    """Swap the process-wide backend. Tests only -- do not call from app code."""
+    global _backend
+    _backend = backend
+    _stores.clear()
@@ -11,7 +11,9 @@ seamlessly composited from every matching item.
 Microsoft Planetary Computer Pro inherits the same titiler-pgstac data
 plane. We probe ``{data}/mosaic/register`` first (matches public PC) and
 fall back to ``{data}/searches/register`` (newer titiler-pgstac), caching
-which path worked per-process.
+which path worked per-process. Search ids are kept in the shared
+:mod:`mosaic_registry` (catalog ``"pro"``), so replicas reuse each
+other's registrations and concurrent identical requests register once.
 
 This module mirrors :mod:`hybrid_rendering_system.register_mosaic_search`
 but talks to the AAD-protected Pro data API and synthesizes a same-origin
@@ -24,12 +26,12 @@ from __future__ import annotations
 import json
 import logging
 import os
-import time
 from typing import Any, Dict, List, Optional, Tuple
-import hashlib
 
 import aiohttp
 
+import http_pool
+from mosaic_registry import get_mosaic_registry
 from pro_stac_client import (
     PRO_API_VERSION,
     _auth_headers,
@@ -49,34 +51,29 @@ _register_path_cache: Optional[str] = None
 _register_path_unavailable: bool = False
 
 
-# Cache of (cache_key) -> (search_id, register_path, timestamp). We re-use
-# the search_id for repeated identical queries (same collections + bbox +
-# datetime + filters) so we don't hammer ``/mosaic/register`` on every
-# repeat user query.
+# Registered search ids are re-used for repeated identical queries (same
+# collections + snapped bbox + datetime + items + filters) so we don't
+# hammer ``/mosaic/register`` on every repeat user query. Entries live in
+# the shared mosaic registry; this caps their lifetime for Pro.
 _MOSAIC_TTL_SECONDS = 600.0  # 10 minutes
-_search_cache: Dict[str, Tuple[str, str, float]] = {}
 
 
-def _cache_key(
+def _registry_params(
     collections: List[str],
     bbox: Optional[List[float]],
     datetime_range: Optional[str],
     item_ids: Optional[List[str]],
     extra_filters: Optional[Dict[str, Any]],
-) -> str:
-    """Deterministic cache key for a mosaic registration."""
-    payload = json.dumps(
-        {
-            "c": sorted(collections or []),
-            "b": [round(float(x), 4) for x in (bbox or [])],
-            "d": datetime_range or "",
-            "i": sorted(item_ids or []),
-            "f": extra_filters or {},
-        },
-        sort_keys=True,
-        default=str,
-    )
-    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:24]
+) -> Dict[str, Any]:
+    """Everything that changes the registered search (``bbox`` already snapped)."""
+    return {
+        "c": sorted(collections or []),
+        "b": bbox or [],
+        "d": datetime_range or "",
+        "i": sorted(item_ids or []),
+        "f": extra_filters or {},
+        "base": get_pro_data_base(),
+    }
 
 
 def _build_search_body(
@@ -204,8 +201,6 @@ async def register_pro_mosaic_search(
     (``"mosaic/register"`` or ``"searches/register"``); callers must use
     the matching tile path layout when synthesizing tilejson URLs.
     """
-    global _register_path_cache, _register_path_unavailable
-
     if not collections:
         logger.warning("[PRO-MOSAIC] register: no collections provided")
         return None
@@ -219,15 +214,29 @@ async def register_pro_mosaic_search(
         # Both paths failed previously this process; don't keep probing.
         return None
 
-    cache_key = _cache_key(collections, bbox, datetime_range, item_ids, extra_filters)
-    cached = _search_cache.get(cache_key)
-    if cached:
-        sid, rpath, ts = cached
-        if (time.time() - ts) < _MOSAIC_TTL_SECONDS:
-            logger.info(
-                "[PRO-MOSAIC] cache hit %s -> %s (path=%s)", cache_key, sid[:16], rpath
-            )
-            return sid, rpath
+    registry = get_mosaic_registry()
+    bbox = registry.snap(bbox)
+    entry = await registry.get_or_register(
+        "pro",
+        _registry_params(collections, bbox, datetime_range, item_ids, extra_filters),
+        lambda: _register(pro_data_base, collections, bbox, datetime_range, item_ids, extra_filters),
+        ttl_s=_MOSAIC_TTL_SECONDS,
+    )
+    if not entry:
+        return None
+    return entry["search_id"], entry["register_path"]
+
+
+async def _register(
+    pro_data_base: str,
+    collections: List[str],
+    bbox: Optional[List[float]],
+    datetime_range: Optional[str],
+    item_ids: Optional[List[str]],
+    extra_filters: Optional[Dict[str, Any]],
+) -> Optional[Dict[str, str]]:
+    """POST the search, probing the register path; ``{"search_id", "register_path"}`` or None."""
+    global _register_path_cache, _register_path_unavailable
 
     body = _build_search_body(collections, bbox, datetime_range, item_ids, extra_filters)
 
@@ -237,7 +246,7 @@ async def register_pro_mosaic_search(
     else:
         paths_to_try = _REGISTER_PATH_PROBE_ORDER
 
-    async with aiohttp.ClientSession() as session:
+    async with http_pool.session(http_pool.POOL_PRO) as session:
         last_status = -1
         last_preview = ""
         for path in paths_to_try:
@@ -258,12 +267,11 @@ async def register_pro_mosaic_search(
                     )
                     continue
                 _register_path_cache = path
-                _search_cache[cache_key] = (search_id, path, time.time())
                 logger.info(
                     "[PRO-MOSAIC] registered via %s -> search_id=%s collections=%s",
                     path, str(search_id)[:16], collections,
                 )
-                return search_id, path
+                return {"search_id": search_id, "register_path": path}
 
             # 404 / 405 -> try next probe path.
             if status in (404, 405):
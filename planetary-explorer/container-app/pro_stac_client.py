@@ -16,7 +16,7 @@ Usage::
     from pro_stac_client import is_pro_url, pro_get, pro_post
 
     if is_pro_url(url):
-        payload = await pro_get(session, url)
+        payload = await pro_get(http_pool.get_session(http_pool.POOL_PRO), url)
     else:
         async with session.get(url) as r:
             payload = await r.json()
@@ -33,6 +33,8 @@ from urllib.parse import urlparse, urlencode, parse_qsl
 
 import aiohttp
 
+import http_pool
+
 logger = logging.getLogger(__name__)
 
 PRO_HOST_SUFFIX = ".geocatalog.spatio.azure.com"
@@ -228,8 +230,7 @@ async def get_pro_collections_cached(ttl_seconds: float = 300.0) -> list[Dict[st
         return inv
     if not get_pro_stac_base():
         return []
-    async with aiohttp.ClientSession() as session:
-        cols = await pro_list_collections(session)
+    cols = await pro_list_collections(http_pool.get_session(http_pool.POOL_PRO))
     inv = [c for c in cols if isinstance(c, dict) and c.get("id")]
     _collection_inventory_cache = (now, inv)
     return inv
@@ -293,8 +294,7 @@ async def get_pro_collection_ids(ttl_seconds: float = 300.0) -> list[str]:
 
     if not get_pro_stac_base():
         return []
-    async with aiohttp.ClientSession() as session:
-        cols = await pro_list_collections(session)
+    cols = await pro_list_collections(http_pool.get_session(http_pool.POOL_PRO))
     ids = [c["id"] for c in cols if isinstance(c, dict) and c.get("id")]
     _collection_ids_cache = (now, ids)
     return ids
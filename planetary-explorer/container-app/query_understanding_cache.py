@@ -0,0 +1,195 @@
+"""
+Learned query-understanding cache for SemanticQueryTranslator.
+
+Every new query pays for five GPT calls before a STAC search can run:
+the unified intent classifier and the collection mapper (in parallel),
+then the location, datetime and cloud-filter agents inside
+``build_stac_query_agent``. ``quickstart_cache`` only short-circuits the
+hardcoded demo queries, while real traffic repeats the same phrasings
+("show sentinel-2 imagery of seattle", "recent fires in california").
+
+This module remembers what the agents concluded the last time:
+
+  - **keyed on the normalized query** (lowercase, collapsed whitespace,
+    trailing punctuation dropped) plus a **date bucket**: queries with
+    relative time words ("recent", "last month", "this year", "ago") are
+    bucketed by the current day so the datetime they resolved to is
+    never reused tomorrow; absolute queries ("2017", "june 2025") share
+    one bucket
+  - **filled from successful agent output only**: each agent stores its
+    own result on its success path, so keyword/basic fallbacks (kernel
+    down, GPT error, no valid collections) are never learned
+  - **per agent**: ``intent`` (classifier), ``collections`` (mapper) and
+    ``stac`` (the query built by location + datetime + cloud agents,
+    including the geocoded bbox), so direct callers of
+    ``build_stac_query_agent`` benefit as well
+  - **bounded**: LRU + TTL via :mod:`result_cache`; optional SQLite
+    persistence (write-through) so the learned answers survive restarts
+  - **metered**: hits / misses per agent and the number of GPT calls
+    saved, reported next to ``get_quickstart_stats``
+
+Values are deep-copied on the way in and out because the translator
+mutates the STAC query it receives (pin / session bbox overrides).
+
+Config:
+  QUERY_UNDERSTANDING_CACHE              set to off/false/0 to disable
+  QUERY_UNDERSTANDING_CACHE_MAX_ENTRIES  entry cap (default 2000)
+  QUERY_UNDERSTANDING_CACHE_TTL_S        entry lifetime (default 86400)
+  QUERY_UNDERSTANDING_CACHE_PATH         sqlite file for persistence (unset/off = memory only)
+"""
+
+from __future__ import annotations
+
+import copy
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from datetime import date
+from typing import Any, Callable, Dict, Optional
+
+from result_cache import ResultCache
+
+logger = logging.getLogger(__name__)
+
+_DISABLED_VALUES = {"0", "false", "no", "off", "none"}
+
+# GPT calls a hit saves, per agent entry.
+AGENT_CALLS = {"intent": 1, "collections": 1, "stac": 3}
+
+_RELATIVE_TIME = re.compile(
+    r"\b(?:today|tonight|yesterday|tomorrow|now|current(?:ly)?|recent(?:ly)?|latest|newest|"
+    r"last|past|previous|this|next|ago|ytd|so far|to date)\b",
+    re.IGNORECASE,
+)
+_TRAILING_PUNCT = re.compile(r"[\s?.!]+$")
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+def normalize_query(query: str) -> str:
+    """Lowercase, collapse whitespace, drop surrounding quotes and trailing punctuation."""
+    text = " ".join((query or "").lower().split()).strip("\"'")
+    return _TRAILING_PUNCT.sub("", text)
+
+
+def date_bucket(query: str, today: Optional[date] = None) -> str:
+    """``YYYY-MM-DD`` for queries with relative time words, ``"abs"`` otherwise."""
+    if _RELATIVE_TIME.search(query or ""):
+        return (today or date.today()).isoformat()
+    return "abs"
+
+
+class QueryUnderstandingCache:
+    """Per-agent ``(normalized query, date bucket, extra) -> output`` cache (thread-safe)."""
+
+    def __init__(
+        self,
+        *,
+        max_entries: int = 2000,
+        ttl_s: float = 86400.0,
+        sqlite_path: Optional[str] = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self._clock = clock
+        self._ns = ResultCache(
+            max_entries=max_entries, ttl_s=ttl_s, sqlite_path=sqlite_path, clock=clock
+        ).namespace("query-understanding", write_through=True)
+        self._lock = threading.Lock()
+        self._counts: Dict[str, Dict[str, int]] = {
+            agent: {"hits": 0, "misses": 0, "stores": 0} for agent in AGENT_CALLS
+        }
+
+    def key(self, agent: str, query: str, extra: Any = None) -> str:
+        today = date.fromtimestamp(self._clock())
+        raw = json.dumps(
+            [agent, normalize_query(query), date_bucket(query, today), extra],
+            sort_keys=True,
+            default=str,
+        )
+        return f"{agent}:{hashlib.sha256(raw.encode('utf-8')).hexdigest()}"
+
+    def get(self, agent: str, query: str, extra: Any = None) -> Optional[Any]:
+        """The learned output of ``agent`` for this query (a private copy), or ``None``."""
+        value = self._ns.get(self.key(agent, query, extra))
+        with self._lock:
+            self._counts[agent]["hits" if value is not None else "misses"] += 1
+        if value is not None:
+            logger.info(f"[QUERY-CACHE] {agent} hit for '{normalize_query(query)}' (saved {AGENT_CALLS[agent]} GPT call(s))")
+        return copy.deepcopy(value)
+
+    def put(self, agent: str, query: str, value: Any, extra: Any = None) -> None:
+        if value is None:
+            return
+        self._ns.put(self.key(agent, query, extra), copy.deepcopy(value))
+        with self._lock:
+            self._counts[agent]["stores"] += 1
+
+    def clear(self) -> None:
+        self._ns.clear()
+        with self._lock:
+            for counts in self._counts.values():
+                counts.update(hits=0, misses=0, stores=0)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            by_agent = {agent: dict(counts) for agent, counts in self._counts.items()}
+        hits = sum(c["hits"] for c in by_agent.values())
+        lookups = hits + sum(c["misses"] for c in by_agent.values())
+        ns = self._ns.stats()
+        return {
+            "enabled": True,
+            "entries": ns["entries"],
+            "max_entries": ns["max_entries"],
+            "ttl_s": ns["ttl_s"],
+            "persistent": self._ns.write_through,
+            "hits": hits,
+            "lookups": lookups,
+            "hit_rate": round(hits / lookups, 3) if lookups else None,
+            "llm_calls_saved": sum(c["hits"] * AGENT_CALLS[a] for a, c in by_agent.items()),
+            "by_agent": by_agent,
+        }
+
+
+# ---------------------------------------------------------------------------
+# Module singleton
+# ---------------------------------------------------------------------------
+
+_cache: Optional[QueryUnderstandingCache] = None
+_cache_lock = threading.Lock()
+
+
+def _configured_path() -> Optional[str]:
+    raw = (os.getenv("QUERY_UNDERSTANDING_CACHE_PATH") or "").strip()
+    if not raw or raw.lower() in _DISABLED_VALUES:
+        return None
+    return raw
+
+
+def get_query_understanding_cache() -> Optional[QueryUnderstandingCache]:
+    """Return the process-wide cache (lazy), or ``None`` when disabled."""
+    global _cache
+    if (os.getenv("QUERY_UNDERSTANDING_CACHE") or "on").strip().lower() in _DISABLED_VALUES:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = QueryUnderstandingCache(
+                max_entries=int(_env_float("QUERY_UNDERSTANDING_CACHE_MAX_ENTRIES", 2000)),
+                ttl_s=_env_float("QUERY_UNDERSTANDING_CACHE_TTL_S", 86400.0),
+                sqlite_path=_configured_path(),
+            )
+        return _cache
+
+
+def get_query_understanding_stats() -> Dict[str, Any]:
+    """Hit rate and size of the learned cache (mirrors ``get_quickstart_stats``)."""
+    cache = get_query_understanding_cache()
+    return cache.stats() if cache is not None else {"enabled": False}
@@ -0,0 +1,314 @@
+"""Process-wide GDAL/rasterio I/O profile + per-tool-call read instrumentation.
+
+Every ``rasterio.open`` in the raster tools used to run with GDAL's
+defaults (a directory listing per open, 16 KiB range chunks, a 16 MiB
+``/vsicurl/`` cache, no HTTP/2), apart from one ad-hoc ``rasterio.Env``
+in ``agents.vision_tools``. This module applies one named profile to the
+whole process at startup instead:
+
+  - ``latency``     (default) interactive tool calls reading small windows:
+                    one 64 KiB request for the COG header, modest caches,
+                    short timeouts.
+  - ``throughput``  batch audits / wide windows: large merged ranges,
+                    bigger ``/vsicurl/`` + block caches, multi-threaded
+                    decode, longer timeouts.
+  - ``off``         leave GDAL's defaults alone.
+
+Options are exported as environment variables with ``setdefault``, so an
+explicit ``GDAL_*`` / ``CPL_*`` / ``VSI_*`` variable in the container
+still wins, and they reach every thread (``asyncio.to_thread`` workers
+included) without a ``rasterio.Env`` per call. GDAL reads the cache sizes
+once, so ``apply_profile()`` runs from the FastAPI startup hook, before
+the first read; tool wrappers call it too (it is idempotent) so scripts
+and tests get the same settings.
+
+Instrumentation: :func:`raster_tool` wraps a tool function (sync or
+async) in a read scope. Range requests are attributed to the innermost
+scope through a context variable -- GDAL's own ``VSICURL: Downloading``
+debug records for rasterio reads (only with ``RASTER_IO_STATS`` on, as
+they need ``CPL_DEBUG``), :mod:`cog_reader` fetches directly.
+When a scope ends, every registered hook (:func:`add_read_hook`) gets a
+:class:`ReadStats`; the default hook logs one ``[RASTER]`` line per call.
+Work submitted to a plain ``ThreadPoolExecutor`` does not inherit context
+variables; wrap it with :func:`bind` to keep it attributed.
+
+Config:
+  RASTER_ENV_PROFILE   latency | throughput | off (default latency)
+  RASTER_IO_STATS      1 to count GDAL range requests per tool call (default 0;
+                       turns on CPL_DEBUG, so meant for benchmarks)
+"""
+
+from __future__ import annotations
+
+import contextvars
+import functools
+import inspect
+import logging
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_COMMON: Dict[str, str] = {
+    # COG hrefs are single files: never list the container on open.
+    "GDAL_DISABLE_READDIR_ON_OPEN": "EMPTY_DIR",
+    "GDAL_HTTP_MERGE_CONSECUTIVE_RANGES": "YES",
+    "GDAL_HTTP_MULTIPLEX": "YES",
+    "GDAL_HTTP_VERSION": "2",
+    "GDAL_HTTP_MAX_RETRY": "3",
+    "GDAL_HTTP_RETRY_DELAY": "1",
+    "VSI_CACHE": "TRUE",
+}
+
+PROFILES: Dict[str, Dict[str, str]] = {
+    "latency": {
+        **_COMMON,
+        "GDAL_INGESTED_BYTES_AT_OPEN": "65536",
+        "CPL_VSIL_CURL_CHUNK_SIZE": "65536",
+        "CPL_VSIL_CURL_CACHE_SIZE": str(64 * 1024 * 1024),
+        "VSI_CACHE_SIZE": str(16 * 1024 * 1024),
+        "GDAL_CACHEMAX": "256",
+        "GDAL_HTTP_TIMEOUT": "30",
+    },
+    "throughput": {
+        **_COMMON,
+        "GDAL_INGESTED_BYTES_AT_OPEN": "131072",
+        "CPL_VSIL_CURL_CHUNK_SIZE": "524288",
+        "CPL_VSIL_CURL_CACHE_SIZE": str(256 * 1024 * 1024),
+        "VSI_CACHE_SIZE": str(64 * 1024 * 1024),
+        "GDAL_CACHEMAX": "1024",
+        "GDAL_NUM_THREADS": "ALL_CPUS",
+        "GDAL_HTTP_TIMEOUT": "60",
+        "GDAL_HTTP_MAX_RETRY": "5",
+    },
+    "off": {},
+}
+
+_applied: Optional[str] = None
+_apply_lock = threading.Lock()
+
+
+def _stats_enabled() -> bool:
+    return os.getenv("RASTER_IO_STATS", "0").strip().lower() in ("1", "true", "yes", "on")
+
+
+def apply_profile(name: Optional[str] = None) -> Dict[str, str]:
+    """Export the named profile (default ``RASTER_ENV_PROFILE``) once per process.
+
+    Returns the options that were set; later calls are no-ops.
+    """
+    global _applied
+    with _apply_lock:
+        if _applied is not None:
+            return PROFILES.get(_applied, {})
+        name = (name or os.getenv("RASTER_ENV_PROFILE", "latency")).strip().lower()
+        if name not in PROFILES:
+            logger.warning(f"[RASTER] Unknown RASTER_ENV_PROFILE={name!r}; using 'latency'")
+            name = "latency"
+        options = PROFILES[name]
+        for key, value in options.items():
+            os.environ.setdefault(key, value)
+        if _stats_enabled():
+            _install_gdal_counter()
+        _applied = name
+        logger.info(f"[RASTER] GDAL profile '{name}' applied ({len(options)} options)")
+        return options
+
+
+def active_profile() -> Optional[str]:
+    return _applied
+
+
+def gdal_env(**overrides: Any):
+    """``rasterio.Env`` for call-specific options on top of the process profile."""
+    import rasterio
+
+    apply_profile()
+    return rasterio.Env(**overrides)
+
+
+# ---------------------------------------------------------------------------
+# Per-tool-call read stats
+# ---------------------------------------------------------------------------
+
+
+@dataclass
+class ReadStats:
+    """Remote reads attributed to one tool call."""
+
+    tool: str
+    range_requests: int = 0
+    bytes_fetched: int = 0
+    started: float = field(default_factory=time.perf_counter)
+    elapsed_ms: float = 0.0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def add(self, nbytes: int, requests: int = 1) -> None:
+        with self._lock:
+            self.range_requests += requests
+            self.bytes_fetched += nbytes
+
+
+_current: contextvars.ContextVar[Optional[ReadStats]] = contextvars.ContextVar("raster_read_stats", default=None)
+_hooks: List[Callable[[ReadStats], None]] = []
+_totals: Dict[str, Dict[str, float]] = {}
+_totals_lock = threading.Lock()
+
+
+def record_fetch(nbytes: int, requests: int = 1) -> None:
+    """Attribute ``requests`` range requests totalling ``nbytes`` to the current scope."""
+    stats = _current.get()
+    if stats is not None:
+        stats.add(nbytes, requests)
+
+
+def add_read_hook(hook: Callable[[ReadStats], None]) -> None:
+    """Call ``hook(stats)`` after every instrumented tool call."""
+    _hooks.append(hook)
+
+
+def remove_read_hook(hook: Callable[[ReadStats], None]) -> None:
+    if hook in _hooks:
+        _hooks.remove(hook)
+
+
+def _log_stats(stats: ReadStats) -> None:
+    if stats.range_requests:
+        logger.info(
+            f"[RASTER] {stats.tool}: {stats.range_requests} range requests, "
+            f"{stats.bytes_fetched / 1024:.0f} KiB in {stats.elapsed_ms:.0f} ms"
+        )
+
+
+add_read_hook(_log_stats)
+
+
+def _finish(stats: ReadStats) -> None:
+    stats.elapsed_ms = (time.perf_counter() - stats.started) * 1e3
+    with _totals_lock:
+        total = _totals.setdefault(stats.tool, {"calls": 0, "range_requests": 0, "bytes_fetched": 0})
+        total["calls"] += 1
+        total["range_requests"] += stats.range_requests
+        total["bytes_fetched"] += stats.bytes_fetched
+    for hook in list(_hooks):
+        try:
+            hook(stats)
+        except Exception as e:
+            logger.warning(f"[RASTER] read hook failed: {e}")
+
+
+def raster_tool(fn: Callable) -> Callable:
+    """Run ``fn`` under the raster profile with its reads counted per call.
+
+    Keeps the name, docstring and signature (``FunctionTool`` reads them)
+    and the sync/async nature of ``fn``.
+    """
+    name = fn.__name__
+
+    if inspect.iscoroutinefunction(fn):
+
+        @functools.wraps(fn)
+        async def async_wrapper(*args, **kwargs):
+            apply_profile()
+            stats = ReadStats(name)
+            token = _current.set(stats)
+            try:
+                return await fn(*args, **kwargs)
+            finally:
+                _current.reset(token)
+                _finish(stats)
+
+        return async_wrapper
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        apply_profile()
+        stats = ReadStats(name)
+        token = _current.set(stats)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _current.reset(token)
+            _finish(stats)
+
+    return wrapper
+
+
+def bind(fn: Callable) -> Callable:
+    """Wrap ``fn`` to run in a copy of the caller's context (for executor submits).
+
+    The copy is taken here and a context can only be entered by one thread
+    at a time, so bind once per ``submit``.
+    """
+    ctx = contextvars.copy_context()
+
+    @functools.wraps(fn)
+    def bound(*args, **kwargs):
+        return ctx.run(fn, *args, **kwargs)
+
+    return bound
+
+
+def stats() -> Dict[str, Any]:
+    """Profile name + cumulative per-tool read counters."""
+    with _totals_lock:
+        tools = {k: dict(v) for k, v in _totals.items()}
+    return {"profile": _applied, "io_stats": _stats_enabled(), "tools": tools}
+
+
+# ---------------------------------------------------------------------------
+# GDAL /vsicurl/ request counting
+# ---------------------------------------------------------------------------
+
+_DOWNLOAD_RE = re.compile(r"VSICURL: Downloading (\S+) \(")
+_RANGE_RE = re.compile(r"(\d+)-(\d+)")
+# rasterio forwards GDAL CPLE_Debug messages to these loggers
+_GDAL_LOGGERS = ("rasterio._env", "rasterio._err")
+
+
+class _GdalDownloadCounter(logging.Filter):
+    """Counts GDAL range downloads; passes records on only at the logger's old level."""
+
+    def __init__(self, floor: int) -> None:
+        super().__init__()
+        self.floor = floor
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno < logging.INFO:
+            match = _DOWNLOAD_RE.search(record.getMessage())
+            if match:
+                spans = _RANGE_RE.findall(match.group(1))
+                record_fetch(sum(int(b) - int(a) + 1 for a, b in spans), 1)
+        return record.levelno >= self.floor
+
+
+def _install_gdal_counter() -> None:
+    # GDAL only emits the download messages with CPL_DEBUG on; the filter
+    # keeps them (and the rest of GDAL's debug chatter) out of the logs
+    # unless these loggers were already at DEBUG.
+    os.environ.setdefault("CPL_DEBUG", "ON")
+    for name in _GDAL_LOGGERS:
+        gdal_logger = logging.getLogger(name)
+        if any(isinstance(f, _GdalDownloadCounter) for f in gdal_logger.filters):
+            continue
+        gdal_logger.addFilter(_GdalDownloadCounter(gdal_logger.getEffectiveLevel()))
+        gdal_logger.setLevel(logging.DEBUG)
+
+
+__all__ = [
+    "PROFILES",
+    "ReadStats",
+    "active_profile",
+    "add_read_hook",
+    "apply_profile",
+    "bind",
+    "gdal_env",
+    "raster_tool",
+    "record_fetch",
+    "remove_read_hook",
+    "stats",
+]
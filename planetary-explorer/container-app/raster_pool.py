@@ -0,0 +1,484 @@
+"""Process-wide bounded worker pool for raster / NetCDF work.
+
+The geoint tools used to create executors wherever they needed
+parallelism: ``_analyze_all_directions_sync`` ran a 2-worker pool whose
+tasks each opened a 6-worker pool, the corridor prefetch, transect and
+traverse opened more, and two module-level NetCDF pools sat beside them.
+Every concurrent request multiplied those pools, so a handful of chats
+could have a hundred threads all reading COGs through the same GDAL
+block and ``/vsicurl/`` caches. This module replaces them with one pool:
+
+* **Bounded** -- ``RASTER_POOL_WORKERS`` threads in total, started on
+  demand.
+* **Fair share** -- work is queued per :class:`RasterSession` (one per
+  HTTP request, see :class:`RasterRequestMiddleware`; scripts share a
+  default session). Sessions with queued work are served round-robin and
+  each runs at most ``min(RASTER_POOL_REQUEST_QUOTA, ceil(workers /
+  active sessions))`` tasks at once, so one wide traverse cannot starve
+  a single-point query.
+* **Nesting without deadlock** -- a worker that waits on a future still
+  in the queue (``future.result()`` or :meth:`RasterPool.as_completed`)
+  runs it inline instead of blocking a second worker, so tasks can fan
+  out into sub-tasks the way the old nested executors did.
+* **Cancellation** -- when the client of a request goes away, its session
+  is cancelled: queued tasks are dropped, later submits come back
+  cancelled, and long loops can call :func:`check_cancelled`. Awaiting
+  :func:`run` from a cancelled coroutine also cancels the queued task.
+* **Metrics** -- :func:`stats` reports queue depth (current / peak),
+  busy workers, active sessions, wait times and task outcomes
+  (``/api/health`` -> ``raster_pool``).
+
+Submitted callables run in a copy of the submitter's context, so
+``raster_env`` per-tool read stats and the session follow the work.
+
+Config:
+  RASTER_POOL_WORKERS        worker threads (default 16)
+  RASTER_POOL_REQUEST_QUOTA  max concurrent tasks per request (default 8)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import contextvars
+import logging
+import math
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import CancelledError, Future
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+class RasterSession:
+    """Unit of fair sharing and cancellation (normally one HTTP request)."""
+
+    def __init__(self, name: str = "default", *, quota: Optional[int] = None) -> None:
+        self.name = name
+        self.quota = quota
+        self.queue: Deque["_Task"] = deque()
+        self.running = 0
+        self.cancelled = False
+        self.reason = ""
+        self._pool: Optional["RasterPool"] = None
+
+    def cancel(self, reason: str = "cancelled") -> int:
+        """Cancel queued work and refuse new work; returns the number of dropped tasks."""
+        self.cancelled = True
+        self.reason = reason
+        pool = self._pool
+        return pool._cancel_session(self) if pool is not None else 0
+
+    def __repr__(self) -> str:
+        return f"RasterSession({self.name!r}, queued={len(self.queue)}, running={self.running})"
+
+
+_session: contextvars.ContextVar[Optional[RasterSession]] = contextvars.ContextVar("raster_session", default=None)
+
+
+def current_session() -> Optional[RasterSession]:
+    return _session.get()
+
+
+def check_cancelled() -> None:
+    """Raise ``CancelledError`` if the current request's raster work was cancelled."""
+    session = _session.get()
+    if session is not None and session.cancelled:
+        raise CancelledError(session.reason)
+
+
+class session_scope:
+    """Run the enclosed code (and everything it submits) in a new session.
+
+    Leaving the scope cancels whatever the session still has queued.
+    """
+
+    def __init__(self, name: str, *, quota: Optional[int] = None) -> None:
+        self.session = RasterSession(name, quota=quota)
+        self._token: Optional[contextvars.Token] = None
+
+    def __enter__(self) -> RasterSession:
+        self._token = _session.set(self.session)
+        return self.session
+
+    def __exit__(self, *exc) -> None:
+        _session.reset(self._token)
+        if self.session.queue:
+            self.session.cancel("session closed")
+
+
+class _Task:
+    __slots__ = ("fn", "args", "kwargs", "ctx", "future", "session", "enqueued")
+
+    def __init__(self, fn, args, kwargs, ctx, future, session) -> None:
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.ctx = ctx
+        self.future = future
+        self.session = session
+        self.enqueued = time.perf_counter()
+
+
+class RasterFuture(Future):
+    """``Future`` whose ``result()`` runs the task inline when a pool worker waits on it."""
+
+    _pool: Optional["RasterPool"] = None
+    _task: Optional[_Task] = None
+
+    def result(self, timeout: Optional[float] = None) -> Any:
+        if not self.done() and self._pool is not None:
+            self._pool._help(self)
+        return super().result(timeout)
+
+
+class RasterPool:
+    """Bounded, session-fair worker pool (thread-safe)."""
+
+    def __init__(self, *, max_workers: int = 16, request_quota: int = 8) -> None:
+        self.max_workers = max(1, int(max_workers))
+        self.request_quota = max(1, int(request_quota))
+        self._cv = threading.Condition()
+        self._ready: "OrderedDict[RasterSession, None]" = OrderedDict()
+        self._active: Dict[RasterSession, None] = {}
+        self._threads: list = []
+        self._idle = 0
+        self._shutdown = False
+        self._local = threading.local()
+        self.default_session = RasterSession("default")
+        # metrics
+        self.queued = 0
+        self.max_queue_depth = 0
+        self.busy = 0
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.cancelled = 0
+        self.inline = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._started = 0
+
+    # ----- submission -------------------------------------------------------
+
+    def submit(self, fn: Callable, *args: Any, **kwargs: Any) -> RasterFuture:
+        """Queue ``fn(*args, **kwargs)`` under the caller's session."""
+        session = _session.get() or self.default_session
+        future = RasterFuture()
+        future._pool = self
+        task = _Task(fn, args, kwargs, contextvars.copy_context(), future, session)
+        future._task = task
+        with self._cv:
+            if self._shutdown:
+                raise RuntimeError("raster pool is shut down")
+            self.submitted += 1
+            if session.cancelled:
+                self.cancelled += 1
+                future.cancel()
+                return future
+            session._pool = self
+            session.queue.append(task)
+            self._ready[session] = None
+            self._active[session] = None
+            self.queued += 1
+            self.max_queue_depth = max(self.max_queue_depth, self.queued)
+            if self._idle == 0 and len(self._threads) < self.max_workers:
+                self._start_worker()
+            self._cv.notify()
+        return future
+
+    def map(self, fn: Callable, *iterables: Iterable) -> Iterator[Any]:
+        """Like ``Executor.map``: submit all, yield results in order."""
+        futures = [self.submit(fn, *args) for args in zip(*iterables)]
+        return (f.result() for f in futures)
+
+    def as_completed(self, futures: Iterable[Future], timeout: Optional[float] = None) -> Iterator[Future]:
+        """``concurrent.futures.as_completed`` that is safe to call from a pool worker."""
+        futures = list(futures)
+        if getattr(self._local, "worker", False):
+            for f in futures:
+                if isinstance(f, RasterFuture):
+                    self._help(f)
+        return concurrent.futures.as_completed(futures, timeout=timeout)
+
+    # ----- scheduling -------------------------------------------------------
+
+    def _quota(self, session: RasterSession) -> int:
+        fair = max(1, math.ceil(self.max_workers / max(1, len(self._active))))
+        return min(session.quota or self.request_quota, fair)
+
+    def _next_task(self) -> Optional[_Task]:
+        # caller holds self._cv
+        for session in list(self._ready):
+            if session.running >= self._quota(session):
+                continue
+            task = session.queue.popleft()
+            if session.queue:
+                self._ready.move_to_end(session)
+            else:
+                del self._ready[session]
+            session.running += 1
+            self.queued -= 1
+            return task
+        return None
+
+    def _start_worker(self) -> None:
+        self._started += 1
+        t = threading.Thread(target=self._worker, name=f"raster-{self._started}", daemon=True)
+        self._threads.append(t)
+        t.start()
+
+    def _worker(self) -> None:
+        self._local.worker = True
+        while True:
+            with self._cv:
+                task = self._next_task()
+                while task is None:
+                    if self._shutdown:
+                        self._threads.remove(threading.current_thread())
+                        return
+                    self._idle += 1
+                    self._cv.wait()
+                    self._idle -= 1
+                    task = self._next_task()
+            self._run(task)
+
+    def _run(self, task: _Task, *, inline: bool = False) -> None:
+        future = task.future
+        waited = time.perf_counter() - task.enqueued
+        if future.set_running_or_notify_cancel():
+            with self._cv:
+                self.busy += 1
+                self._wait_total += waited
+                self._wait_max = max(self._wait_max, waited)
+                if inline:
+                    self.inline += 1
+            try:
+                result = task.ctx.run(task.fn, *task.args, **task.kwargs)
+            except BaseException as e:
+                future.set_exception(e)
+                outcome = "failed"
+            else:
+                future.set_result(result)
+                outcome = "completed"
+            del task.fn, task.args, task.kwargs
+        else:
+            outcome = "cancelled"
+        with self._cv:
+            if outcome != "cancelled":
+                self.busy -= 1
+            setattr(self, outcome, getattr(self, outcome) + 1)
+            session = task.session
+            session.running -= 1
+            if not session.running and not session.queue:
+                self._active.pop(session, None)
+            if self.queued:
+                self._cv.notify_all()
+
+    def _help(self, future: RasterFuture) -> None:
+        """Run ``future``'s task on this thread if it is still queued and we are a worker."""
+        if not getattr(self._local, "worker", False):
+            return
+        task = future._task
+        if task is None:
+            return
+        with self._cv:
+            session = task.session
+            try:
+                session.queue.remove(task)
+            except ValueError:
+                return  # already running or done
+            if not session.queue:
+                self._ready.pop(session, None)
+            session.running += 1
+            self.queued -= 1
+        self._run(task, inline=True)
+
+    def _cancel_session(self, session: RasterSession) -> int:
+        with self._cv:
+            dropped = list(session.queue)
+            session.queue.clear()
+            self._ready.pop(session, None)
+            self.queued -= len(dropped)
+            self.cancelled += len(dropped)
+            if not session.running:
+                self._active.pop(session, None)
+        for task in dropped:
+            task.future.cancel()
+        if dropped:
+            logger.info(f"[RASTER] {session.name}: {session.reason}, dropped {len(dropped)} queued raster tasks")
+        return len(dropped)
+
+    # ----- lifecycle / metrics ----------------------------------------------
+
+    def shutdown(self) -> None:
+        with self._cv:
+            self._shutdown = True
+            sessions = list(self._ready)
+            self._cv.notify_all()
+        for session in sessions:
+            session.cancel("pool shut down")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cv:
+            started = self.completed + self.failed
+            return {
+                "workers": self.max_workers,
+                "threads": len(self._threads),
+                "request_quota": self.request_quota,
+                "busy": self.busy,
+                "queued": self.queued,
+                "max_queue_depth": self.max_queue_depth,
+                "active_sessions": len(self._active),
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "failed": self.failed,
+                "cancelled": self.cancelled,
+                "inline": self.inline,
+                "avg_wait_ms": round(self._wait_total / started * 1e3, 1) if started else 0.0,
+                "max_wait_ms": round(self._wait_max * 1e3, 1),
+            }
+
+_pool: Optional[RasterPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_raster_pool() -> RasterPool:
+    """Process-wide :class:`RasterPool` (lazy)."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = RasterPool(
+                max_workers=_env_int("RASTER_POOL_WORKERS", 16),
+                request_quota=_env_int("RASTER_POOL_REQUEST_QUOTA", 8),
+            )
+        return _pool
+
+
+def submit(fn: Callable, *args: Any, **kwargs: Any) -> RasterFuture:
+    return get_raster_pool().submit(fn, *args, **kwargs)
+
+
+def as_completed(futures: Iterable[Future], timeout: Optional[float] = None) -> Iterator[Future]:
+    return get_raster_pool().as_completed(futures, timeout=timeout)
+
+
+async def run(fn: Callable, *args: Any, **kwargs: Any) -> Any:
+    """Await ``fn(*args, **kwargs)`` on the raster pool (the pool's ``asyncio.to_thread``)."""
+    return await asyncio.wrap_future(get_raster_pool().submit(fn, *args, **kwargs))
+
+
+def stats() -> Dict[str, Any]:
+    return get_raster_pool().stats() if _pool is not None else {"workers": 0, "threads": 0}
+
+
+def shutdown() -> None:
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown()
+
+
+class RasterRequestMiddleware:
+    """ASGI middleware: one :class:`RasterSession` per HTTP request.
+
+    Once the request body has been read (immediately, for requests without
+    one) a pump task becomes the only reader of ``receive`` and forwards
+    messages to the app, so the ``http.disconnect`` of an abandoned request
+    is seen even while the handler is busy; it cancels the session. Work
+    still queued when the request finishes is dropped too.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        session = RasterSession(f"{scope.get('method', '')} {scope.get('path', '')}")
+        inbox: "asyncio.Queue[dict]" = asyncio.Queue()
+        pump: Optional[asyncio.Task] = None
+        responded = False
+        disconnected = False
+
+        def on_disconnect() -> None:
+            nonlocal disconnected
+            disconnected = True
+            if not responded:
+                session.cancel("client disconnected")
+
+        async def pump_receive() -> None:
+            while True:
+                message = await receive()
+                await inbox.put(message)
+                if message["type"] == "http.disconnect":
+                    on_disconnect()
+                    return
+
+        def start_pump() -> None:
+            nonlocal pump
+            if pump is None:
+                pump = asyncio.ensure_future(pump_receive())
+
+        async def wrapped_receive():
+            if pump is None:
+                message = await receive()
+                if message["type"] == "http.disconnect":
+                    on_disconnect()
+                elif not message.get("more_body", False):
+                    start_pump()
+                return message
+            if disconnected and inbox.empty():
+                return {"type": "http.disconnect"}
+            return await inbox.get()
+
+        async def wrapped_send(message) -> None:
+            nonlocal responded
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                responded = True
+            await send(message)
+
+        headers = dict(scope.get("headers") or [])
+        if headers.get(b"content-length", b"0") in (b"0", b"") and b"transfer-encoding" not in headers:
+            start_pump()  # no body for the app to read first
+
+        token = _session.set(session)
+        try:
+            await self.app(scope, wrapped_receive, wrapped_send)
+        finally:
+            _session.reset(token)
+            responded = True
+            if pump is not None:
+                pump.cancel()
+            if session.queue:
+                session.cancel("request finished")
+
+
+__all__ = [
+    "RasterFuture",
+    "RasterPool",
+    "RasterRequestMiddleware",
+    "RasterSession",
+    "as_completed",
+    "check_cancelled",
+    "current_session",
+    "get_raster_pool",
+    "run",
+    "session_scope",
+    "shutdown",
+    "stats",
+    "submit",
+]
@@ -0,0 +1,313 @@
+"""Non-blocking resolver for STAC ``renders`` blocks (render presets).
+
+``HybridRenderingSystem.get_render_config`` reads each collection's live
+STAC ``renders`` block (tiers -1, 0 and 3). The lookup used blocking
+``requests`` (8s per catalog, plus a sync ``DefaultAzureCredential``
+token for Pro) and is reached from ``clean_tilejson_urls`` inside async
+request handlers, so a cold collection stalled the whole event loop for
+every concurrent request. The cache behind it was a plain dict with no
+size bound.
+
+This module owns that cache instead:
+
+  - **startup prefetch**: seeded from the ``CollectionIndex`` snapshot,
+    whose raw collection documents already carry ``renders``, so every
+    indexed collection resolves from memory without extra HTTP
+  - **bounded TTL cache**: LRU over ``(collection_id, is_pro)``; blocks
+    stay fresh for ``RENDERS_TTL_S``, "no renders block" answers for the
+    shorter ``RENDERS_NEG_TTL_S``
+  - **stale-while-revalidate**: past its TTL an entry is still served
+    (for up to ``RENDERS_STALE_S``) while one background refresh per key
+    runs on the app loop
+  - **async fetch**: misses are fetched on the pooled ``http_pool``
+    sessions (AAD for Pro via ``pro_stac_client``); request handlers
+    ``await ensure(...)`` for a result set's collections before the sync
+    ``clean_tilejson_urls`` pass, so its lookups hit memory
+  - **never blocks the loop**: a sync lookup that misses on the
+    event-loop thread schedules the fetch and reports "unknown" (the
+    caller falls through to its static tiers). Only code running off the
+    loop (scripts, worker threads, unit tests) does a blocking fetch.
+
+A failed refresh keeps the stale block rather than replacing it with a
+negative answer.
+
+Config:
+  RENDERS_CACHE_MAX_ENTRIES  entry cap (default 2048)
+  RENDERS_TTL_S              fresh lifetime of a renders block (default 600)
+  RENDERS_NEG_TTL_S          fresh lifetime of "no renders block" (default 60)
+  RENDERS_STALE_S            how long past its TTL an entry may be served (default 86400)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+Key = Tuple[str, bool]
+FetchFn = Callable[[str, bool], Awaitable[Optional[Dict[str, Any]]]]
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+def on_event_loop() -> bool:
+    """True when called from a thread that is running an asyncio loop."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+@dataclass
+class _Entry:
+    renders: Optional[Dict[str, Any]]
+    fresh_until: float
+    stale_until: float
+
+
+class RendersResolver:
+    """Bounded ``(collection_id, is_pro) -> renders | None`` cache with async refresh."""
+
+    def __init__(
+        self,
+        fetch: FetchFn,
+        *,
+        max_entries: int = 2048,
+        ttl_s: float = 600.0,
+        neg_ttl_s: float = 60.0,
+        stale_s: float = 86400.0,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self._fetch = fetch
+        self.max_entries = max(1, int(max_entries))
+        self.ttl_s = float(ttl_s)
+        self.neg_ttl_s = float(neg_ttl_s)
+        self.stale_s = float(stale_s)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Key, _Entry]" = OrderedDict()
+        self._inflight: Dict[Key, asyncio.Task] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.deferred = 0
+        self.refreshes = 0
+        self.fetch_errors = 0
+        self.seeded = 0
+        self.evictions = 0
+
+    # ----- cache ------------------------------------------------------------
+
+    def store(self, collection_id: str, is_pro: bool, renders: Optional[Dict[str, Any]]) -> None:
+        now = self._clock()
+        ttl = self.ttl_s if renders else self.neg_ttl_s
+        key = (collection_id, bool(is_pro))
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = _Entry(renders, now + ttl, now + ttl + self.stale_s)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def lookup(self, collection_id: str, is_pro: bool = False) -> Tuple[bool, Optional[Dict[str, Any]]]:
+        """``(found, renders)`` from memory, without I/O.
+
+        A stale entry is returned and a background refresh is scheduled;
+        when no loop can run the refresh it counts as a miss so sync
+        callers refetch, as before.
+        """
+        key = (collection_id, bool(is_pro))
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now < entry.stale_until:
+                self._entries.move_to_end(key)
+                if now < entry.fresh_until:
+                    self.hits += 1
+                    return True, entry.renders
+                stale = entry.renders
+            else:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return False, None
+        if self.schedule(collection_id, is_pro):
+            with self._lock:
+                self.stale_hits += 1
+            return True, stale
+        with self._lock:
+            self.misses += 1
+        return False, None
+
+    def defer(self, collection_id: str, is_pro: bool = False) -> bool:
+        """Schedule a fetch for a miss seen on the loop thread (never blocks)."""
+        scheduled = self.schedule(collection_id, is_pro)
+        if scheduled:
+            with self._lock:
+                self.deferred += 1
+            logger.info(f"[RENDERS] {collection_id} (is_pro={is_pro}) not cached yet - fetching in background")
+        return scheduled
+
+    # ----- async fetch ------------------------------------------------------
+
+    def schedule(self, collection_id: str, is_pro: bool = False) -> bool:
+        """Start a background refresh on the running (or the app's) loop."""
+        key = (collection_id, bool(is_pro))
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            loop = self._loop
+            if loop is None or loop.is_closed() or not loop.is_running():
+                return False
+            loop.call_soon_threadsafe(self._start_refresh, key)
+            return True
+        self._start_refresh(key)
+        return True
+
+    def _start_refresh(self, key: Key) -> asyncio.Task:
+        # runs on the loop thread
+        loop = asyncio.get_running_loop()
+        if self._loop is None or self._loop.is_closed():
+            self._loop = loop
+        task = self._inflight.get(key)
+        if task is None or task.done() or task.get_loop() is not loop:
+            task = self._inflight[key] = loop.create_task(self._refresh(key))
+        return task
+
+    async def _refresh(self, key: Key) -> Optional[Dict[str, Any]]:
+        collection_id, is_pro = key
+        try:
+            renders = await self._fetch(collection_id, is_pro)
+        except Exception as exc:
+            with self._lock:
+                self.fetch_errors += 1
+                entry = self._entries.get(key)
+            logger.debug(f"[RENDERS] refresh failed for {collection_id} (is_pro={is_pro}): {exc}")
+            if entry is not None:
+                return entry.renders  # keep serving the stale block
+            renders = None
+        finally:
+            if self._inflight.get(key) is asyncio.current_task():
+                self._inflight.pop(key, None)
+        with self._lock:
+            self.refreshes += 1
+        self.store(collection_id, is_pro, renders)
+        return renders
+
+    async def resolve(self, collection_id: str, is_pro: bool = False) -> Optional[Dict[str, Any]]:
+        """The renders block, fetching it (once per key) on a miss."""
+        found, renders = self.lookup(collection_id, is_pro)
+        if found:
+            return renders
+        return await asyncio.shield(self._start_refresh((collection_id, bool(is_pro))))
+
+    async def ensure(self, keys: Iterable[Key]) -> None:
+        """Resolve several ``(collection_id, is_pro)`` keys concurrently."""
+        unique = {(cid, bool(pro)) for cid, pro in keys if cid}
+        if unique:
+            await asyncio.gather(*(self.resolve(cid, pro) for cid, pro in unique), return_exceptions=True)
+
+    # ----- prefetch ---------------------------------------------------------
+
+    def seed(self, metas: Iterable[Any]) -> int:
+        """Store the ``renders`` carried by ``CollectionMeta`` rows.
+
+        Public-mode keys prefer the public document and Pro-mode keys the
+        Pro one, mirroring the catalog order of the live fetch.
+        """
+        by_source: Dict[str, Dict[str, Dict[str, Any]]] = {"public": {}, "pro": {}}
+        for meta in metas:
+            block = (getattr(meta, "raw", None) or {}).get("renders")
+            if isinstance(block, dict) and block and meta.source in by_source:
+                by_source[meta.source][meta.id] = block
+        seeded = 0
+        for cid in set(by_source["public"]) | set(by_source["pro"]):
+            pub, pro = by_source["public"].get(cid), by_source["pro"].get(cid)
+            self.store(cid, False, pub or pro)
+            self.store(cid, True, pro or pub)
+            seeded += 2
+        with self._lock:
+            self.seeded += seeded
+        return seeded
+
+    async def prefetch(self) -> int:
+        """Seed the cache from the ``CollectionIndex`` snapshot (both modes)."""
+        self._loop = asyncio.get_running_loop()
+        from collection_index import get_collection_index
+
+        idx = await get_collection_index()
+        seeded = self.seed(await idx.snapshot())
+        logger.info(f"[RENDERS] prefetched {seeded} renders entries from the collection index")
+        return seeded
+
+    # ----- admin ------------------------------------------------------------
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        now = self._clock()
+        with self._lock:
+            fresh = sum(1 for e in self._entries.values() if now < e.fresh_until)
+            return {
+                "entries": len(self._entries),
+                "fresh": fresh,
+                "max_entries": self.max_entries,
+                "ttl_s": self.ttl_s,
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "deferred": self.deferred,
+                "refreshes": self.refreshes,
+                "fetch_errors": self.fetch_errors,
+                "seeded": self.seeded,
+                "evictions": self.evictions,
+                "inflight": len(self._inflight),
+            }
+
+
+# ---------------------------------------------------------------------------
+# Module singleton
+# ---------------------------------------------------------------------------
+
+_resolver: Optional[RendersResolver] = None
+_resolver_lock = threading.Lock()
+
+
+def get_renders_resolver() -> RendersResolver:
+    """Return the process-wide :class:`RendersResolver` (lazy)."""
+    global _resolver
+    with _resolver_lock:
+        if _resolver is None:
+            from hybrid_rendering_system import fetch_renders_block_async
+
+            _resolver = RendersResolver(
+                fetch_renders_block_async,
+                max_entries=int(_env_float("RENDERS_CACHE_MAX_ENTRIES", 2048)),
+                ttl_s=_env_float("RENDERS_TTL_S", 600.0),
+                neg_ttl_s=_env_float("RENDERS_NEG_TTL_S", 60.0),
+                stale_s=_env_float("RENDERS_STALE_S", 86400.0),
+            )
+        return _resolver
+
+
+def stats() -> Dict[str, Any]:
+    return get_renders_resolver().stats()
+
+
+__all__: List[str] = ["RendersResolver", "get_renders_resolver", "on_event_loop", "stats"]
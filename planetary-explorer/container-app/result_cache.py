@@ -0,0 +1,495 @@
+"""Bounded, metered cache for computed tool results.
+
+The climate tools memoized their results in module-level dicts
+(``_netcdf_result_cache`` + ``_netcdf_result_cache_ts`` in
+``extreme_weather_tools``, shared with ``netcdf_computation_tools``, and
+the per-year annual-mean memo). Those dicts had no size cap and entries
+only expired when the same key was read again, so memory grew with every
+distinct lat/lon a user asked about, and concurrent identical requests
+(parallel tool calls, agent retries) each paid for the same remote read.
+
+This module replaces them with one shared component:
+
+  - **namespaces**: each caller gets its own ``CacheNamespace`` (own
+    entry cap, TTL and counters) from the process-wide ``ResultCache``
+  - **LRU + TTL**: entries expire after the namespace TTL; expired entries
+    are swept on writes, and the least recently used entry is evicted once
+    the namespace holds ``max_entries``
+  - **single-flight**: ``get_or_compute`` runs one computation per key;
+    concurrent callers for the same key wait for it and share its result
+  - **disk spill** (optional, ``RESULT_CACHE_PATH``): entries evicted from
+    memory while still fresh are written to one SQLite WAL file and
+    promoted back on the next hit; capped at ``RESULT_CACHE_DISK_MAX_ROWS``.
+    ``write_through`` namespaces write every entry instead, so they
+    survive a restart; ``memory_only`` namespaces never touch the file
+  - **counters**: hits, disk hits, misses, coalesced waits, evictions,
+    expirations and spills per namespace, reported on ``/api/health``
+
+Values must be JSON-serializable to be spilled (others stay memory-only).
+Any SQLite error is logged and treated as a miss.
+
+Config:
+  RESULT_CACHE_MAX_ENTRIES    default entries per namespace (default 2048)
+  RESULT_CACHE_TTL_S          default entry lifetime (default 3600)
+  RESULT_CACHE_PATH           sqlite file for spilled entries (unset/off = memory only)
+  RESULT_CACHE_DISK_MAX_ROWS  sqlite row cap (default 50000)
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_DISABLED_VALUES = {"0", "false", "no", "off", "none"}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    ns         TEXT NOT NULL,
+    key        TEXT NOT NULL,
+    expires_at REAL NOT NULL,
+    stored_at  REAL NOT NULL,
+    body       BLOB NOT NULL,
+    PRIMARY KEY (ns, key)
+)
+"""
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+# ---------------------------------------------------------------------------
+# SQLite spill tier
+# ---------------------------------------------------------------------------
+
+
+class _SqliteTier:
+    """``(namespace, key) -> (expires_at, packed JSON)`` rows in one WAL file."""
+
+    def __init__(self, path: str, *, max_rows: int = 50000) -> None:
+        self.path = Path(path)
+        self.max_rows = max(1, int(max_rows))
+        self.errors = 0
+        self._ready = False
+        self._writes = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        if not self._ready:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.path), timeout=5.0)
+        if not self._ready:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(_SCHEMA)
+            conn.commit()
+            self._ready = True
+        return conn
+
+    def take(self, ns: str, key: str, now: float, *, keep: bool = False) -> Optional[Tuple[float, bytes]]:
+        """Fetch a fresh row; it is deleted (moves back to the memory tier) unless ``keep``."""
+        try:
+            conn = self._connect()
+            try:
+                row = conn.execute(
+                    "SELECT expires_at, body FROM results WHERE ns = ? AND key = ?", (ns, key)
+                ).fetchone()
+                if row is not None and not keep:
+                    conn.execute("DELETE FROM results WHERE ns = ? AND key = ?", (ns, key))
+                    conn.commit()
+            finally:
+                conn.close()
+        except (sqlite3.Error, OSError) as exc:
+            self.errors += 1
+            logger.warning("[RESULT-CACHE] sqlite read failed (%s): %s", self.path, exc)
+            return None
+        if row is None or row[0] <= now:
+            return None
+        return float(row[0]), bytes(row[1])
+
+    def put_many(self, ns: str, rows: List[Tuple[str, float, bytes]], now: float) -> None:
+        try:
+            conn = self._connect()
+            try:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO results (ns, key, expires_at, stored_at, body) VALUES (?, ?, ?, ?, ?)",
+                    [(ns, key, expires_at, now, body) for key, expires_at, body in rows],
+                )
+                self._writes += len(rows)
+                if self._writes >= 64:
+                    self._writes = 0
+                    conn.execute("DELETE FROM results WHERE expires_at <= ?", (now,))
+                    conn.execute(
+                        "DELETE FROM results WHERE rowid IN ("
+                        " SELECT rowid FROM results ORDER BY stored_at DESC LIMIT -1 OFFSET ?)",
+                        (self.max_rows,),
+                    )
+                conn.commit()
+            finally:
+                conn.close()
+        except (sqlite3.Error, OSError) as exc:
+            self.errors += 1
+            logger.warning("[RESULT-CACHE] sqlite write failed (%s): %s", self.path, exc)
+
+    def delete(self, ns: str, key: Optional[str] = None) -> None:
+        try:
+            conn = self._connect()
+            try:
+                if key is None:
+                    conn.execute("DELETE FROM results WHERE ns = ?", (ns,))
+                else:
+                    conn.execute("DELETE FROM results WHERE ns = ? AND key = ?", (ns, key))
+                conn.commit()
+            finally:
+                conn.close()
+        except (sqlite3.Error, OSError) as exc:
+            logger.warning("[RESULT-CACHE] sqlite delete failed (%s): %s", self.path, exc)
+
+    def count(self) -> Optional[int]:
+        try:
+            conn = self._connect()
+            try:
+                return int(conn.execute("SELECT COUNT(*) FROM results").fetchone()[0])
+            finally:
+                conn.close()
+        except (sqlite3.Error, OSError):
+            return None
+
+
+def _pack(value: Any) -> Optional[bytes]:
+    try:
+        return zlib.compress(json.dumps(value, separators=(",", ":")).encode("utf-8"))
+    except (TypeError, ValueError):
+        return None
+
+
+def _unpack(body: bytes) -> Any:
+    return json.loads(zlib.decompress(body).decode("utf-8"))
+
+
+# ---------------------------------------------------------------------------
+# Namespaces
+# ---------------------------------------------------------------------------
+
+
+class _Flight:
+    """One in-progress computation that concurrent callers wait on."""
+
+    def __init__(self) -> None:
+        self.owner = threading.get_ident()
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class CacheNamespace:
+    """LRU + TTL ``key -> value`` map with single-flight fills (thread-safe)."""
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        max_entries: int,
+        ttl_s: float,
+        disk: Optional[_SqliteTier] = None,
+        write_through: bool = False,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.name = name
+        self.max_entries = max(1, int(max_entries))
+        self.ttl_s = float(ttl_s)
+        self._disk = disk
+        self.write_through = bool(write_through and disk is not None)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._flights: Dict[str, _Flight] = {}
+        self._next_sweep = 0.0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.expired = 0
+        self.spills = 0
+
+    # ----- memory tier ------------------------------------------------------
+
+    def _sweep(self, now: float) -> None:
+        # caller holds self._lock
+        if now < self._next_sweep:
+            return
+        for key in [k for k, (expires_at, _) in self._entries.items() if expires_at <= now]:
+            del self._entries[key]
+            self.expired += 1
+        self._next_sweep = now + min(self.ttl_s, 60.0)
+
+    def _store(self, key: str, expires_at: float, value: Any, now: float, *, persist: bool = True) -> None:
+        spilled: List[Tuple[str, float, bytes]] = []
+        if self.write_through and persist:
+            body = _pack(value)
+            if body is not None:
+                spilled.append((key, expires_at, body))
+        with self._lock:
+            self._sweep(now)
+            self._entries.pop(key, None)
+            self._entries[key] = (expires_at, value)
+            while len(self._entries) > self.max_entries:
+                old_key, (old_expires, old_value) = self._entries.popitem(last=False)
+                self.evictions += 1
+                if self._disk is not None and not self.write_through and old_expires > now:
+                    body = _pack(old_value)
+                    if body is not None:
+                        spilled.append((old_key, old_expires, body))
+            if not self.write_through:
+                self.spills += len(spilled)
+        if spilled:
+            self._disk.put_many(self.name, spilled, now)
+
+    # ----- public API -------------------------------------------------------
+
+    def get(self, key: str) -> Optional[Any]:
+        """Cached value for ``key`` (``None`` on a miss)."""
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                del self._entries[key]
+                self.expired += 1
+        if self._disk is not None:
+            row = self._disk.take(self.name, key, now, keep=self.write_through)
+            if row is not None:
+                value = _unpack(row[1])
+                with self._lock:
+                    self.disk_hits += 1
+                self._store(key, row[0], value, now, persist=False)
+                return value
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, value: Any, *, ttl_s: Optional[float] = None) -> None:
+        now = self._clock()
+        self._store(key, now + (self.ttl_s if ttl_s is None else float(ttl_s)), value, now)
+
+    def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Any],
+        *,
+        cache_if: Optional[Callable[[Any], bool]] = None,
+        ttl_s: Optional[float] = None,
+    ) -> Any:
+        """Cached value for ``key``, computing it once on a miss.
+
+        Concurrent callers for a key that is being computed wait and get
+        the same value (or exception). The value is stored unless
+        ``cache_if`` rejects it (e.g. error results); a re-entrant call
+        from the computing thread computes directly.
+        """
+        value = self.get(key)
+        if value is not None:
+            return value
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+            elif flight.owner != threading.get_ident():
+                self.coalesced += 1
+        if not leader:
+            if flight.owner == threading.get_ident():
+                return compute()
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+        try:
+            flight.value = compute()
+            if flight.value is not None and (cache_if is None or cache_if(flight.value)):
+                self.put(key, flight.value, ttl_s=ttl_s)
+            return flight.value
+        except BaseException as exc:
+            flight.error = exc
+            raise
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.done.set()
+
+    def invalidate(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+        if self._disk is not None:
+            self._disk.delete(self.name, key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+        if self._disk is not None:
+            self._disk.delete(self.name)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_s": self.ttl_s,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round((self.hits + self.disk_hits) / lookups, 3) if lookups else None,
+                "coalesced": self.coalesced,
+                "evictions": self.evictions,
+                "expired": self.expired,
+                "spills": self.spills,
+            }
+
+
+# ---------------------------------------------------------------------------
+# Cache
+# ---------------------------------------------------------------------------
+
+
+class ResultCache:
+    """Process-wide registry of :class:`CacheNamespace` objects sharing one spill file."""
+
+    def __init__(
+        self,
+        *,
+        max_entries: int = 2048,
+        ttl_s: float = 3600.0,
+        sqlite_path: Optional[str] = None,
+        sqlite_max_rows: int = 50000,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.max_entries = max(1, int(max_entries))
+        self.ttl_s = float(ttl_s)
+        self._disk = _SqliteTier(sqlite_path, max_rows=sqlite_max_rows) if sqlite_path else None
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._namespaces: Dict[str, CacheNamespace] = {}
+
+    def namespace(
+        self,
+        name: str,
+        *,
+        max_entries: Optional[int] = None,
+        ttl_s: Optional[float] = None,
+        write_through: bool = False,
+        memory_only: bool = False,
+    ) -> CacheNamespace:
+        """The namespace called ``name``, created with the given (or default) cap and TTL.
+
+        ``write_through`` namespaces also write every entry to the SQLite
+        file (when configured) so they survive restarts, not just evictions.
+        ``memory_only`` namespaces skip the file entirely -- for values that
+        never JSON-pack, where every disk lookup would be a wasted SELECT.
+        """
+        with self._lock:
+            ns = self._namespaces.get(name)
+            if ns is None:
+                ns = self._namespaces[name] = CacheNamespace(
+                    name,
+                    max_entries=self.max_entries if max_entries is None else max_entries,
+                    ttl_s=self.ttl_s if ttl_s is None else ttl_s,
+                    disk=None if memory_only else self._disk,
+                    write_through=write_through,
+                    clock=self._clock,
+                )
+            return ns
+
+    def clear(self) -> None:
+        with self._lock:
+            namespaces = list(self._namespaces.values())
+        for ns in namespaces:
+            ns.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            namespaces = dict(self._namespaces)
+        out: Dict[str, Any] = {"namespaces": {name: ns.stats() for name, ns in sorted(namespaces.items())}}
+        if self._disk is not None:
+            out["sqlite"] = {
+                "path": str(self._disk.path),
+                "rows": self._disk.count(),
+                "max_rows": self._disk.max_rows,
+                "errors": self._disk.errors,
+            }
+        return out
+
+
+# ---------------------------------------------------------------------------
+# Module singleton
+# ---------------------------------------------------------------------------
+
+_cache: Optional[ResultCache] = None
+_cache_lock = threading.Lock()
+
+
+def _configured_path() -> Optional[str]:
+    raw = (os.getenv("RESULT_CACHE_PATH") or "").strip()
+    if not raw or raw.lower() in _DISABLED_VALUES:
+        return None
+    return raw
+
+
+def get_result_cache() -> ResultCache:
+    """Return the process-wide :class:`ResultCache` (lazy)."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResultCache(
+                max_entries=int(_env_float("RESULT_CACHE_MAX_ENTRIES", 2048)),
+                ttl_s=_env_float("RESULT_CACHE_TTL_S", 3600.0),
+                sqlite_path=_configured_path(),
+                sqlite_max_rows=int(_env_float("RESULT_CACHE_DISK_MAX_ROWS", 50000)),
+            )
+        return _cache
+
+
+def namespace(
+    name: str,
+    *,
+    max_entries: Optional[int] = None,
+    ttl_s: Optional[float] = None,
+    write_through: bool = False,
+    memory_only: bool = False,
+) -> CacheNamespace:
+    """Shortcut for ``get_result_cache().namespace(...)``."""
+    return get_result_cache().namespace(
+        name, max_entries=max_entries, ttl_s=ttl_s, write_through=write_through, memory_only=memory_only
+    )
+
+
+def stats() -> Dict[str, Any]:
+    return get_result_cache().stats()
+
+
+__all__ = [
+    "CacheNamespace",
+    "ResultCache",
+    "get_result_cache",
+    "namespace",
+    "stats",
+]
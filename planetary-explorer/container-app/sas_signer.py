@@ -0,0 +1,379 @@
+"""SAS token service for Planetary Computer blob hrefs.
+
+``planetary_computer.sign`` keeps a per-(account, container) token cache,
+but it only refreshes a token once it is within a minute of expiring, and
+it does so inline: the unlucky request that trips the refresh pays for a
+blocking round-trip to the SAS endpoint (with up to ten retries), and a
+batch of items spread over several containers pays for one fetch per
+container, one after another.
+
+This module keeps that cache warm instead:
+
+* **Per-container tokens** -- fetched once per ``(account, container)``
+  and shared by every caller in the process.
+* **Refresh ahead** -- a token inside ``SAS_SIGNER_REFRESH_AHEAD_S`` of
+  expiry (default 600 s, capped at half its lifetime) is refreshed on a
+  background thread while callers keep signing with the current one. Only
+  a cold or already-expiring token is fetched inline.
+* **Batch signing** -- :func:`sign` accepts an href, an item (pystac or
+  GeoJSON dict), a FeatureCollection / ItemCollection or a list of any of
+  these. The distinct containers are collected first and the missing
+  tokens fetched concurrently, then everything is signed in one pass.
+
+Signing itself is still delegated to ``planetary_computer.sign`` (same
+rules for which hrefs get signed, item cloning, ``msft:expiry``, fsspec
+``storage_options``); each token we hold is also placed in the SDK's
+token cache, so that call never has to fetch.
+
+:func:`sign_inplace` is a drop-in for ``planetary_computer.sign_inplace``
+as a ``pystac_client`` ``modifier``.
+
+Config:
+  SAS_SIGNER_REFRESH_AHEAD_S  refresh window before expiry (default 600)
+  SAS_SIGNER_MAX_WORKERS      concurrent token fetches (default 4)
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, Optional, Set, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+logger = logging.getLogger(__name__)
+
+_BLOB_DOMAIN = ".blob.core.windows.net"
+# Public thumbnails; the SDK never signs these either.
+_PUBLIC_ACCOUNTS = {"ai4edatasetspublicassets"}
+# Below this many seconds of validity a token is refetched inline.
+_MIN_TTL_S = 60.0
+
+ContainerKey = Tuple[str, str]  # (account, container)
+FetchToken = Callable[[str, str], Tuple[str, float]]  # -> (token, expires_at epoch)
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+@dataclass(frozen=True)
+class _Token:
+    token: str
+    expires_at: float
+    fetched_at: float
+
+    def ttl(self, now: float) -> float:
+        return self.expires_at - now
+
+
+# ---------------------------------------------------------------------------
+# Href parsing
+# ---------------------------------------------------------------------------
+
+
+def container_for_href(href: str) -> Optional[ContainerKey]:
+    """``(account, container)`` for a blob href that needs a token, else ``None``."""
+    if not isinstance(href, str):
+        return None
+    parts = urlsplit(href.rstrip("/"))
+    if not parts.netloc.endswith(_BLOB_DOMAIN):
+        return None
+    account = parts.netloc.split(".", 1)[0]
+    if account in _PUBLIC_ACCOUNTS:
+        return None
+    if parts.query and set(parse_qs(parts.query)) & {"st", "se", "sp"}:
+        return None  # already signed
+    segments = parts.path.lstrip("/").split("/", 1)
+    if len(segments) < 2 or not segments[0]:
+        return None
+    return account, segments[0]
+
+
+def _fsspec_container(asset: Mapping) -> Optional[ContainerKey]:
+    href = asset.get("href") or ""
+    if not href.startswith(("abfs://", "az://")):
+        return None
+    for key in ("table:storage_options", "xarray:storage_options"):
+        if key in asset:
+            options = asset[key]
+            break
+    else:
+        kwargs = asset.get("xarray:open_kwargs") or {}
+        options = kwargs.get("storage_options") or (kwargs.get("backend_kwargs") or {}).get("storage_options")
+    account = (options or {}).get("account_name")
+    container = urlsplit(href).netloc
+    return (account, container) if account and container else None
+
+
+def _collect(obj: Any, out: Set[ContainerKey]) -> None:
+    if isinstance(obj, str):
+        key = container_for_href(obj)
+        if key:
+            out.add(key)
+        return
+    if isinstance(obj, Mapping):
+        for feature in obj.get("features") or ():
+            _collect(feature, out)
+        for asset in (obj.get("assets") or {}).values():
+            if isinstance(asset, Mapping):
+                _collect(asset.get("href"), out)
+                key = _fsspec_container(asset)
+                if key:
+                    out.add(key)
+        return
+    if isinstance(obj, (list, tuple)):
+        for child in obj:
+            _collect(child, out)
+        return
+    items = getattr(obj, "items", None)
+    if isinstance(items, list):  # pystac ItemCollection
+        for item in items:
+            _collect(item, out)
+        return
+    assets = getattr(obj, "assets", None)
+    if isinstance(assets, Mapping):  # pystac Item / Collection
+        for asset in assets.values():
+            _collect(getattr(asset, "href", None), out)
+            extra = getattr(asset, "extra_fields", None)
+            if isinstance(extra, Mapping):
+                key = _fsspec_container({**extra, "href": getattr(asset, "href", "")})
+                if key:
+                    out.add(key)
+
+
+# ---------------------------------------------------------------------------
+# Token fetch
+# ---------------------------------------------------------------------------
+
+_http_session = None
+
+
+def _fetch_token(account: str, container: str) -> Tuple[str, float]:
+    """GET a token from the Planetary Computer SAS endpoint."""
+    global _http_session
+    import requests
+    import urllib3
+    from planetary_computer.sas import SASToken
+    from planetary_computer.settings import Settings
+
+    if _http_session is None:
+        session = requests.Session()
+        retry = urllib3.util.retry.Retry(
+            total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504]
+        )
+        session.mount("https://", requests.adapters.HTTPAdapter(max_retries=retry))
+        _http_session = session
+    settings = Settings.get()
+    headers = {"Ocp-Apim-Subscription-Key": settings.subscription_key} if settings.subscription_key else None
+    resp = _http_session.get(f"{settings.sas_url}/{account}/{container}", headers=headers, timeout=15)
+    resp.raise_for_status()
+    token = SASToken(**resp.json())
+    return token.token, token.expiry.timestamp()
+
+
+def _seed_sdk_cache(account: str, container: str, token: _Token) -> None:
+    """Put ``token`` in planetary_computer's own cache so its sign path never fetches."""
+    try:
+        from planetary_computer import sas
+        from planetary_computer.settings import Settings
+
+        sas.TOKEN_CACHE[f"{Settings.get().sas_url}/{account}/{container}"] = sas.SASToken(
+            token=token.token,
+            expiry=datetime.fromtimestamp(token.expires_at, tz=timezone.utc),
+        )
+    except Exception as exc:  # noqa: BLE001 — the SDK just fetches for itself
+        logger.debug(f"[SAS] could not seed SDK token cache: {exc}")
+
+
+# ---------------------------------------------------------------------------
+# Signer
+# ---------------------------------------------------------------------------
+
+
+class SasSigner:
+    """Refresh-ahead ``(account, container) -> SAS token`` cache (thread-safe)."""
+
+    def __init__(
+        self,
+        *,
+        refresh_ahead_s: float = 600.0,
+        max_workers: int = 4,
+        fetch_token: FetchToken = _fetch_token,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.refresh_ahead_s = float(refresh_ahead_s)
+        self._fetch = fetch_token
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._key_locks: Dict[ContainerKey, threading.Lock] = {}
+        self._tokens: Dict[ContainerKey, _Token] = {}
+        self._refreshing: Set[ContainerKey] = set()
+        self._pool = ThreadPoolExecutor(max_workers=max(1, int(max_workers)), thread_name_prefix="sas-signer")
+        self.hits = 0
+        self.fetches = 0
+        self.background_refreshes = 0
+        self.errors = 0
+
+    # ----- token cache ------------------------------------------------------
+
+    def _key_lock(self, key: ContainerKey) -> threading.Lock:
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def _refresh_due(self, token: _Token, now: float) -> bool:
+        lifetime = token.expires_at - token.fetched_at
+        return token.ttl(now) < min(self.refresh_ahead_s, lifetime / 2)
+
+    def _fetch_into_cache(self, key: ContainerKey) -> _Token:
+        account, container = key
+        value, expires_at = self._fetch(account, container)
+        token = _Token(value, float(expires_at), self._clock())
+        with self._lock:
+            self._tokens[key] = token
+            self.fetches += 1
+        _seed_sdk_cache(account, container, token)
+        return token
+
+    def _background_refresh(self, key: ContainerKey) -> None:
+        try:
+            with self._key_lock(key):
+                self._fetch_into_cache(key)
+            self.background_refreshes += 1
+        except Exception as exc:  # noqa: BLE001 — current token stays usable
+            self.errors += 1
+            logger.warning(f"[SAS] background refresh of {key[0]}/{key[1]} failed: {exc}")
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def _cached(self, key: ContainerKey, now: float) -> Optional[_Token]:
+        """The cached token if still usable; schedules a refresh when due."""
+        with self._lock:
+            token = self._tokens.get(key)
+            if token is None or token.ttl(now) < _MIN_TTL_S:
+                return None
+            self.hits += 1
+            schedule = self._refresh_due(token, now) and key not in self._refreshing
+            if schedule:
+                self._refreshing.add(key)
+        if schedule:
+            self._pool.submit(self._background_refresh, key)
+        return token
+
+    def token(self, account: str, container: str) -> str:
+        """SAS token for ``account``/``container``, fetching only when cold or expiring."""
+        key = (account, container)
+        token = self._cached(key, self._clock())
+        if token is not None:
+            return token.token
+        with self._key_lock(key):
+            token = self._cached(key, self._clock())  # fetched while we waited
+            if token is None:
+                token = self._fetch_into_cache(key)
+        return token.token
+
+    def prefetch(self, keys: Iterable[ContainerKey]) -> None:
+        """Make sure every ``(account, container)`` has a usable token, fetching concurrently."""
+        now = self._clock()
+        missing = [key for key in set(keys) if self._cached(key, now) is None]
+
+        def fill(key: ContainerKey) -> None:
+            try:
+                self.token(*key)
+            except Exception as exc:  # noqa: BLE001 — the SDK retries these itself
+                self.errors += 1
+                logger.warning(f"[SAS] token fetch for {key[0]}/{key[1]} failed: {exc}")
+
+        if len(missing) == 1:
+            fill(missing[0])
+        elif missing:
+            list(self._pool.map(fill, missing))
+
+    # ----- signing ----------------------------------------------------------
+
+    def sign(self, obj: Any) -> Any:
+        """Signed copy of an href, item, item collection or list of them."""
+        import planetary_computer
+
+        keys: Set[ContainerKey] = set()
+        _collect(obj, keys)
+        self.prefetch(keys)
+        if isinstance(obj, (list, tuple)):
+            return [planetary_computer.sign(o) for o in obj]
+        return planetary_computer.sign(obj)
+
+    def sign_inplace(self, obj: Any) -> Any:
+        """``pystac_client`` modifier: sign ``obj`` in place."""
+        import planetary_computer
+
+        keys: Set[ContainerKey] = set()
+        _collect(obj, keys)
+        self.prefetch(keys)
+        return planetary_computer.sign_inplace(obj)
+
+    def stats(self) -> Dict[str, Any]:
+        now = self._clock()
+        with self._lock:
+            return {
+                "containers": len(self._tokens),
+                "min_ttl_s": round(min((t.ttl(now) for t in self._tokens.values()), default=0.0), 1),
+                "hits": self.hits,
+                "fetches": self.fetches,
+                "background_refreshes": self.background_refreshes,
+                "errors": self.errors,
+            }
+
+
+# ---------------------------------------------------------------------------
+# Module singleton
+# ---------------------------------------------------------------------------
+
+_signer: Optional[SasSigner] = None
+_signer_lock = threading.Lock()
+
+
+def get_sas_signer() -> SasSigner:
+    """Return the process-wide :class:`SasSigner` (lazy)."""
+    global _signer
+    if _signer is None:
+        with _signer_lock:
+            if _signer is None:
+                _signer = SasSigner(
+                    refresh_ahead_s=_env_float("SAS_SIGNER_REFRESH_AHEAD_S", 600.0),
+                    max_workers=int(_env_float("SAS_SIGNER_MAX_WORKERS", 4)),
+                )
+    return _signer
+
+
+def sign(obj: Any) -> Any:
+    """Shared-signer drop-in for ``planetary_computer.sign`` (also takes lists)."""
+    return get_sas_signer().sign(obj)
+
+
+def sign_url(href: str) -> str:
+    """Shared-signer drop-in for ``planetary_computer.sign_url``."""
+    return get_sas_signer().sign(href)
+
+
+def sign_inplace(obj: Any) -> Any:
+    """Shared-signer drop-in for ``planetary_computer.sign_inplace``."""
+    return get_sas_signer().sign_inplace(obj)
+
+
+__all__ = [
+    "SasSigner",
+    "container_for_href",
+    "get_sas_signer",
+    "sign",
+    "sign_inplace",
+    "sign_url",
+]
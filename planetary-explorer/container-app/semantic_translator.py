@@ -2,6 +2,7 @@
 # Licensed under the MIT license.
 
 import asyncio
+import contextvars
 import json
 import logging
 import math
@@ -18,11 +19,24 @@ import traceback
 # Import the consolidated location resolver
 from location_resolver import EnhancedLocationResolver
 from cloud_config import cloud_cfg  # [CLOUD] Cloud environment configuration
+from pipeline.session_store import session_map
+from query_understanding_cache import get_query_understanding_cache
 
 # Initialize logger first
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
 
+# Agents that fell back (GPT error -> None / keyword result) while building
+# the current STAC query; a degraded query is not learned by the
+# query-understanding cache.
+_agent_fallbacks: contextvars.ContextVar[Optional[List[str]]] = contextvars.ContextVar("agent_fallbacks", default=None)
+
+
+def _note_agent_fallback(agent: str) -> None:
+    fallbacks = _agent_fallbacks.get()
+    if fallbacks is not None:
+        fallbacks.append(agent)
+
 # ============================================================================
 # [SEARCH] PIPELINE LOGGING HELPER - Structured logging for debugging queries
 # ============================================================================
@@ -695,7 +709,9 @@ class SemanticQueryTranslator:
         self.location_cache = LocationCache()
         
         # [BRAIN] CONVERSATION CONTEXT MANAGEMENT
-        self.conversation_contexts = {}  # conversation_id -> context data
+        # conversation_id -> context data, on the shared session store so
+        # follow-ups work across workers/replicas (see pipeline.session_store)
+        self.conversation_contexts = session_map("conversation")
         
         # 🆔 SESSION TRACKING for log correlation
         self.current_session_id = None
@@ -808,6 +824,10 @@ class SemanticQueryTranslator:
                 "has_rendered_map": False
             }
         return self.conversation_contexts[conversation_id]
+
+    def save_conversation_context(self, conversation_id: str, context: Dict[str, Any]) -> None:
+        """Write a (possibly mutated) context back to the session store."""
+        self.conversation_contexts[conversation_id] = context
     
     def update_conversation_context(self, conversation_id: str, query: str, response_data: Dict[str, Any]) -> None:
         """Update conversation context with new query and response"""
@@ -847,6 +867,10 @@ class SemanticQueryTranslator:
         # Keep only the last 10 exchanges (20 messages) to manage memory
         if len(context["chat_history"]) > 20:
             context["chat_history"] = context["chat_history"][-20:]
+        # Same bound for the raw query/response log -- full response payloads
+        # are large and previously grew for the lifetime of the session.
+        context["queries"] = context["queries"][-10:]
+        context["responses"] = context["responses"][-10:]
         
         # Update map-related context if response contains map data
         if response_data.get("data", {}).get("features"):
@@ -869,6 +893,7 @@ class SemanticQueryTranslator:
         if query_type not in context["context_topics"]:
             context["context_topics"].append(query_type)
         
+        self.save_conversation_context(conversation_id, context)
         logger.info(f"[BRAIN] Updated conversation context for {conversation_id}: {context['query_count']} queries, {len(context.get('chat_history', []))} messages in history")
 
     def get_recent_chat_history(self, conversation_id: str, max_exchanges: int = 3) -> str:
@@ -892,8 +917,7 @@ class SemanticQueryTranslator:
 
     def reset_conversation_context(self, conversation_id: str) -> None:
         """Reset/clear conversation context for session restart"""
-        if conversation_id in self.conversation_contexts:
-            del self.conversation_contexts[conversation_id]
+        self.conversation_contexts.pop(conversation_id, None)
 
     def set_model(self, model_name: str) -> None:
         """Set model override for runtime model switching.
@@ -1068,7 +1092,16 @@ class SemanticQueryTranslator:
                 "reasoning": str,
                 "query": str
             }
+
+        Classifications of context-free queries are learned by the
+        query-understanding cache, so a repeated query skips the GPT call.
         """
+        learned = get_query_understanding_cache() if not conversation_id else None
+        if learned is not None:
+            cached = learned.get("intent", query)
+            if cached is not None:
+                return cached
+
         try:
             # Get conversation context if available
             context_info = ""
@@ -1289,6 +1322,8 @@ Response: {{"intent_type": "stac", "needs_satellite_data": true, "needs_vision_a
             logger.info(f"   Confidence: {classification.get('confidence', 0)}")
             logger.info(f"   Reasoning: {classification.get('reasoning', 'N/A')}")
             
+            if learned is not None:
+                learned.put("intent", query, classification)
             return classification
                 
         except json.JSONDecodeError as e:
@@ -1815,6 +1850,13 @@ Query: "{query}"
             return keyword_matched
         # ========================================================================
         
+        # Learned answer from an earlier successful LLM mapping of this query
+        learned = get_query_understanding_cache()
+        if learned is not None:
+            cached = learned.get("collections", query)
+            if cached:
+                return cached
+        
         await self._ensure_kernel_initialized()
         
         logger.info(f"[SEARCH] AGENT 1 DEBUG: Kernel initialized? {self._kernel_initialized}")
@@ -2039,6 +2081,8 @@ Format: ["collection-id"]"""
             for i, coll in enumerate(valid_collections, 1):
                 logger.info(f"  {i}. {coll}")
             logger.info("=" * 80)
+            if learned is not None:
+                learned.put("collections", query, valid_collections)
             return valid_collections
             
         except Exception as e:
@@ -2518,8 +2562,19 @@ ESSENTIAL FIRE:
         
         Returns:
             Complete STAC query dict ready for API
+
+        Queries built by the full agent path are learned by the
+        query-understanding cache (keyed on query + collections + date
+        bucket); a repeat skips the three agents and the geocode. The
+        basic fallback builder is never learned.
         """
         
+        learned = get_query_understanding_cache()
+        if learned is not None:
+            cached = learned.get("stac", query, extra=sorted(collections or []))
+            if cached is not None:
+                return cached
+        
         await self._ensure_kernel_initialized()
         
         print(f"[ALERT] DEBUG: After _ensure_kernel_initialized() - _kernel_initialized={self._kernel_initialized}, kernel={self.kernel is not None}")
@@ -2555,11 +2610,16 @@ ESSENTIAL FIRE:
             cloud_task = self.cloud_filtering_agent(query, collections)
             
             # Wait for all to complete
-            entities, datetime_range, cloud_filter = await asyncio.gather(
-                entities_task,
-                datetime_task,
-                cloud_task
-            )
+            fallbacks: List[str] = []
+            fallbacks_token = _agent_fallbacks.set(fallbacks)
+            try:
+                entities, datetime_range, cloud_filter = await asyncio.gather(
+                    entities_task,
+                    datetime_task,
+                    cloud_task
+                )
+            finally:
+                _agent_fallbacks.reset(fallbacks_token)
             
             print(f"[OK] DEBUG: AGENT 2 - PARALLEL execution complete")
             
@@ -2730,6 +2790,8 @@ ESSENTIAL FIRE:
             print(f"  - Agent 2.2 (Datetime): {'[OK]' if datetime_range else 'ℹ️ skipped'}")
             print(f"  - Agent 2.3 (Cloud): {'[OK]' if cloud_filter else 'ℹ️ skipped'}")
             print(f"  - Final STAC query: {stac_query}")
+            if learned is not None and not fallbacks:
+                learned.put("stac", query, stac_query, extra=sorted(collections or []))
             return stac_query
             
         except Exception as e:
@@ -4458,11 +4520,13 @@ IMPORTANT:
             logger.error(f"[FAIL] Datetime agent JSON parse error: {e}")
             logger.error(f"Raw content: {content}")
             print(f"[FAIL] ERROR: JSON parse failed - {e}")
+            _note_agent_fallback("datetime")
             return None
             
         except Exception as e:
             logger.error(f"[FAIL] Datetime translation failed: {e}")
             print(f"[FAIL] ERROR: Datetime agent failed - {e}")
+            _note_agent_fallback("datetime")
             return None
     
     def _build_single_datetime_prompt(self, current_date: str, current_year: int, query: str) -> str:
@@ -4924,6 +4988,7 @@ Return ONLY a JSON object with "cloud_intent", "threshold", and "reasoning". No
         except json.JSONDecodeError as e:
             logger.error(f"[FAIL] Cloud agent JSON parse error: {e}")
             print(f"[FAIL] ERROR: JSON parse failed - {e}")
+            _note_agent_fallback("cloud")
             # [TOOL] FALLBACK: Try keyword detection on JSON parse failure
             keyword_result = await self._detect_cloud_cover_intent(query)
             if keyword_result and filterable:
@@ -4942,6 +5007,7 @@ Return ONLY a JSON object with "cloud_intent", "threshold", and "reasoning". No
         except Exception as e:
             logger.error(f"[FAIL] Cloud filtering agent failed: {e}")
             print(f"[FAIL] ERROR: Cloud agent failed - {e}")
+            _note_agent_fallback("cloud")
             # [TOOL] FALLBACK: Try keyword detection on any GPT failure
             keyword_result = await self._detect_cloud_cover_intent(query)
             if keyword_result and filterable:
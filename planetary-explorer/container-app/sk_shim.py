@@ -178,7 +178,7 @@ def _build_kwargs(settings: Optional[AzureChatPromptExecutionSettings]) -> Dict[
 
 
 class AzureChatCompletion:
-    """Holds a deployment + an AsyncAzureOpenAI client keyed by ``service_id``."""
+    """Holds a deployment + its shared gateway client, keyed by ``service_id``."""
 
     def __init__(
         self,
@@ -211,28 +211,18 @@ class AzureChatCompletion:
             endpoint_root = endpoint_root[: -len("/openai")]
         self.azure_endpoint = endpoint_root.rstrip("/")
 
-        # Lazy client (AsyncAzureOpenAI is cheap to build but we delay until first call).
-        self._client = None
 
     def _get_client(self):
-        if self._client is not None:
-            return self._client
-        from openai import AsyncAzureOpenAI
-
-        if self.api_key:
-            self._client = AsyncAzureOpenAI(
-                azure_endpoint=self.azure_endpoint,
-                api_key=self.api_key,
-                api_version=self.api_version,
-            )
-        else:
-            assert self.ad_token_provider is not None
-            self._client = AsyncAzureOpenAI(
-                azure_endpoint=self.azure_endpoint,
-                azure_ad_token_provider=self.ad_token_provider,
-                api_version=self.api_version,
-            )
-        return self._client
+        # Shared per-deployment client from the process-wide LLM gateway
+        # (pooled connections, response cache, metrics). Auth is resolved
+        # from the same AZURE_OPENAI_* env the translator reads.
+        from _framework.llm_client import get_llm_client
+
+        return get_llm_client(
+            self.deployment_name,
+            api_version=self.api_version,
+            endpoint=self.azure_endpoint,
+        )
 
     async def _chat(
         self,
@@ -241,7 +231,7 @@ class AzureChatCompletion:
     ) -> str:
         client = self._get_client()
         kwargs = _build_kwargs(settings)
-        resp = await client.chat.completions.create(
+        resp = await client.create(
             model=self.deployment_name,
             messages=messages,
             **kwargs,
@@ -0,0 +1,547 @@
+"""Shared STAC item-search cache.
+
+The GEOINT tools look up the same items over and over: the terrain tools
+search ``jrc-gsw`` / ``esa-worldcover`` / ``cop-dem-glo-30`` for the bbox
+around a point, the mobility corridor prefetch runs six collection
+searches per leg, the site audit probes three anchor collections at the
+audit point and the CMIP6 tools re-query the same (scenario, year) items
+for every variable. Each used to pay a catalog round-trip (and, for
+``pystac_client``, a landing-page ``Client.open``) every time.
+
+Entries are keyed by the *normalized* search:
+
+    (endpoint, collections, bbox snapped outward to a
+     ``STAC_ITEM_CACHE_GRID_DEG`` grid, intersects geometry, datetime
+     window, query filters, sortby, limit / max_items)
+
+The snapped bbox is also what gets sent to the catalog, so the cached
+items are exactly the answer for the key and nearby questions (the same
+site a few metres over, a re-run of the same audit) share one entry.
+
+Items are stored *unsigned* (any SAS query string is stripped) as
+zlib-packed JSON, and are signed on the way out by the shared
+:mod:`sas_signer`, which holds one refresh-ahead token per container, so
+a cached entry that outlives its SAS token is transparently re-signed
+instead of handing out dead hrefs.
+
+Two tiers:
+
+  - memory: byte-bounded LRU (``STAC_ITEM_CACHE_MEMORY_MB``, default 64)
+  - sqlite: optional, enabled by ``STAC_ITEM_CACHE_PATH``; one WAL file
+            shared by the workers on a host (and across restarts when it
+            lives on a mounted volume), capped at
+            ``STAC_ITEM_CACHE_MAX_ROWS`` rows, oldest first
+
+Both tiers honour ``STAC_ITEM_CACHE_TTL_S`` (default 3600); searches of
+static collections (DEM, surface water, land cover) pass
+``ttl_s=STATIC_COLLECTION_TTL_S`` instead. Failed searches
+raise through and are never cached. Concurrent misses for the same key
+are serialized on a per-key lock so parallel tool calls share one search.
+Any SQLite error is logged and treated as a miss.
+
+Config:
+  STAC_ITEM_CACHE_MEMORY_MB     memory tier budget (default 64; 0 disables caching)
+  STAC_ITEM_CACHE_TTL_S         default entry lifetime (default 3600)
+  STAC_ITEM_CACHE_STATIC_TTL_S  lifetime for static collections (default 86400)
+  STAC_ITEM_CACHE_GRID_DEG      bbox snap grid in degrees (default 0.01)
+  STAC_ITEM_CACHE_PATH          sqlite file for the persistent tier (unset/off = memory only)
+  STAC_ITEM_CACHE_MAX_ROWS      sqlite row cap (default 20000)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import math
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+from urllib.parse import urlsplit, urlunsplit
+
+logger = logging.getLogger(__name__)
+
+_DISABLED_VALUES = {"off", "none", "false", "0"}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS stac_items (
+    key TEXT PRIMARY KEY,
+    expires_at REAL NOT NULL,
+    stored_at REAL NOT NULL,
+    body BLOB NOT NULL
+)
+"""
+
+# Keys that never change which items a search returns.
+_IGNORED_PARAMS = {"modifier"}
+
+FetchFn = Callable[[Dict[str, Any]], List[Dict[str, Any]]]
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+STATIC_COLLECTION_TTL_S = _env_float("STAC_ITEM_CACHE_STATIC_TTL_S", 86400.0)
+
+
+# ---------------------------------------------------------------------------
+# Key normalization
+# ---------------------------------------------------------------------------
+
+
+def snap_bbox(bbox: Any, grid_deg: float) -> List[float]:
+    """Snap ``[west, south, east, north]`` outward to a ``grid_deg`` grid."""
+    west, south, east, north = (float(v) for v in bbox)
+    if grid_deg <= 0:
+        return [west, south, east, north]
+    eps = 1e-9
+    snapped = [
+        math.floor(west / grid_deg + eps) * grid_deg,
+        math.floor(south / grid_deg + eps) * grid_deg,
+        math.ceil(east / grid_deg - eps) * grid_deg,
+        math.ceil(north / grid_deg - eps) * grid_deg,
+    ]
+    snapped = [
+        max(-180.0, snapped[0]),
+        max(-90.0, snapped[1]),
+        min(180.0, snapped[2]),
+        min(90.0, snapped[3]),
+    ]
+    return [round(v, 6) for v in snapped]
+
+
+def _round_coords(value: Any) -> Any:
+    if isinstance(value, float):
+        return round(value, 6)
+    if isinstance(value, (list, tuple)):
+        return [_round_coords(v) for v in value]
+    if isinstance(value, Mapping):
+        return {k: _round_coords(v) for k, v in value.items()}
+    return value
+
+
+def normalize_search(
+    endpoint: str, params: Mapping[str, Any], *, grid_deg: float = 0.01
+) -> Tuple[Dict[str, Any], str]:
+    """Return ``(params_to_send, cache_key)`` for a STAC search.
+
+    ``collections`` may be a string or a list; ``bbox`` is snapped outward
+    to ``grid_deg``; ``intersects`` is keyed on its coordinates rounded to
+    six decimals (~0.1 m) but sent as given. ``None`` values are dropped.
+    """
+    search: Dict[str, Any] = {}
+    for name, value in params.items():
+        if value is None or name in _IGNORED_PARAMS:
+            continue
+        if name == "collections" and isinstance(value, str):
+            value = [value]
+        elif name == "bbox":
+            value = snap_bbox(value, grid_deg)
+        search[name] = value
+
+    keyed = dict(search)
+    if "collections" in keyed:
+        keyed["collections"] = list(keyed["collections"])
+    if "intersects" in keyed:
+        keyed["intersects"] = _round_coords(keyed["intersects"])
+    keyed["endpoint"] = endpoint.rstrip("/")
+    raw = json.dumps(keyed, sort_keys=True, separators=(",", ":"), default=str)
+    return search, hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+# ---------------------------------------------------------------------------
+# Signing
+# ---------------------------------------------------------------------------
+
+
+def _strip_sas(href: str) -> str:
+    parts = urlsplit(href)
+    if parts.query and parts.netloc.endswith(".blob.core.windows.net"):
+        return urlunsplit(parts._replace(query=""))
+    return href
+
+
+def strip_signatures(item: Dict[str, Any]) -> Dict[str, Any]:
+    """Drop SAS query strings from an item's blob-storage asset hrefs (in place)."""
+    for asset in (item.get("assets") or {}).values():
+        href = asset.get("href") if isinstance(asset, dict) else None
+        if href:
+            asset["href"] = _strip_sas(href)
+    return item
+
+
+def _sign(items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    from sas_signer import sign
+
+    return sign(items)
+
+
+def _pack(items: List[Dict[str, Any]]) -> bytes:
+    return zlib.compress(json.dumps(items, separators=(",", ":"), default=str).encode("utf-8"))
+
+
+def _unpack(body: bytes) -> List[Dict[str, Any]]:
+    return json.loads(zlib.decompress(body).decode("utf-8"))
+
+
+def _fetch_unsigned(fetch: FetchFn, search: Dict[str, Any]) -> List[Dict[str, Any]]:
+    # JSON round-trip: detaches the items from the caller and flattens datetimes.
+    items = json.loads(json.dumps(list(fetch(search)), default=str))
+    return [strip_signatures(item) for item in items]
+
+
+# ---------------------------------------------------------------------------
+# SQLite tier
+# ---------------------------------------------------------------------------
+
+
+class _SqliteTier:
+    """``key -> (expires_at, packed items)`` rows in one WAL file."""
+
+    def __init__(self, path: str, *, max_rows: int = 20000) -> None:
+        self.path = Path(path)
+        self.max_rows = max(1, int(max_rows))
+        self.errors = 0
+        self._ready = False
+        self._writes = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        if not self._ready:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.path), timeout=5.0)
+        if not self._ready:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(_SCHEMA)
+            conn.commit()
+            self._ready = True
+        return conn
+
+    def get(self, key: str, now: float) -> Optional[Tuple[float, bytes]]:
+        try:
+            conn = self._connect()
+            try:
+                row = conn.execute(
+                    "SELECT expires_at, body FROM stac_items WHERE key = ?", (key,)
+                ).fetchone()
+            finally:
+                conn.close()
+        except (sqlite3.Error, OSError) as exc:
+            self.errors += 1
+            logger.warning("[STAC-CACHE] sqlite read failed (%s): %s", self.path, exc)
+            return None
+        if row is None or row[0] <= now:
+            return None
+        return float(row[0]), bytes(row[1])
+
+    def put(self, key: str, expires_at: float, body: bytes, now: float) -> None:
+        try:
+            conn = self._connect()
+            try:
+                conn.execute(
+                    "INSERT OR REPLACE INTO stac_items (key, expires_at, stored_at, body) VALUES (?, ?, ?, ?)",
+                    (key, expires_at, now, body),
+                )
+                self._writes += 1
+                if self._writes % 64 == 1:
+                    conn.execute("DELETE FROM stac_items WHERE expires_at <= ?", (now,))
+                    conn.execute(
+                        "DELETE FROM stac_items WHERE key IN ("
+                        " SELECT key FROM stac_items ORDER BY stored_at DESC LIMIT -1 OFFSET ?)",
+                        (self.max_rows,),
+                    )
+                conn.commit()
+            finally:
+                conn.close()
+        except (sqlite3.Error, OSError) as exc:
+            self.errors += 1
+            logger.warning("[STAC-CACHE] sqlite write failed (%s): %s", self.path, exc)
+
+    def count(self) -> Optional[int]:
+        try:
+            conn = self._connect()
+            try:
+                return int(conn.execute("SELECT COUNT(*) FROM stac_items").fetchone()[0])
+            finally:
+                conn.close()
+        except (sqlite3.Error, OSError):
+            return None
+
+    def clear(self) -> None:
+        try:
+            conn = self._connect()
+            try:
+                conn.execute("DELETE FROM stac_items")
+                conn.commit()
+            finally:
+                conn.close()
+        except (sqlite3.Error, OSError) as exc:
+            logger.warning("[STAC-CACHE] sqlite clear failed (%s): %s", self.path, exc)
+
+
+# ---------------------------------------------------------------------------
+# Cache
+# ---------------------------------------------------------------------------
+
+
+class StacItemCache:
+    """Two-tier ``normalized search -> items`` cache (thread-safe).
+
+    Callers run in worker threads (the tools are synchronous), so this is
+    guarded by a plain lock plus one lock per in-flight key.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_bytes: int = 64 * 1024 * 1024,
+        ttl_s: float = 3600.0,
+        grid_deg: float = 0.01,
+        sqlite_path: Optional[str] = None,
+        sqlite_max_rows: int = 20000,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.max_bytes = max(0, int(max_bytes))
+        self.ttl_s = float(ttl_s)
+        self.grid_deg = float(grid_deg)
+        self._clock = clock
+        self._disk = _SqliteTier(sqlite_path, max_rows=sqlite_max_rows) if sqlite_path else None
+        self._lock = threading.Lock()
+        self._key_locks: Dict[str, threading.Lock] = {}
+        self._entries: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    # ----- memory tier ------------------------------------------------------
+
+    def _mem_get(self, key: str, now: float) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= now:
+                self._bytes -= len(self._entries.pop(key)[1])
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def _mem_put(self, key: str, expires_at: float, body: bytes) -> None:
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old[1])
+            self._entries[key] = (expires_at, body)
+            self._bytes += len(body)
+            while self._bytes > self.max_bytes and self._entries:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+                self.evictions += 1
+
+    def _lookup(self, key: str, now: float) -> Optional[bytes]:
+        body = self._mem_get(key, now)
+        if body is not None:
+            self.hits += 1
+            return body
+        if self._disk is not None:
+            row = self._disk.get(key, now)
+            if row is not None:
+                self.disk_hits += 1
+                self._mem_put(key, row[0], row[1])
+                return row[1]
+        return None
+
+    def _key_lock(self, key: str) -> threading.Lock:
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    # ----- public API -------------------------------------------------------
+
+    def get_or_search(
+        self,
+        endpoint: str,
+        params: Mapping[str, Any],
+        fetch: FetchFn,
+        *,
+        sign: bool = True,
+        ttl_s: Optional[float] = None,
+    ) -> List[Dict[str, Any]]:
+        """Return the item dicts for a STAC search, searching on a miss.
+
+        ``fetch`` receives the normalized parameters (snapped bbox) and
+        must return GeoJSON item dicts; exceptions propagate and nothing
+        is cached. Returned items are fresh copies, signed when ``sign``.
+        """
+        search, key = normalize_search(endpoint, params, grid_deg=self.grid_deg)
+        if not self.enabled:
+            self.misses += 1
+            return self._finish(_fetch_unsigned(fetch, search), sign)
+
+        body = self._lookup(key, self._clock())
+        if body is not None:
+            return self._finish(_unpack(body), sign)
+
+        lock = self._key_lock(key)
+        with lock:
+            body = self._lookup(key, self._clock())  # filled while we waited
+            if body is not None:
+                items = _unpack(body)
+            else:
+                self.misses += 1
+                items = _fetch_unsigned(fetch, search)
+                body = _pack(items)
+                stored = self._clock()
+                expires_at = stored + (self.ttl_s if ttl_s is None else float(ttl_s))
+                self._mem_put(key, expires_at, body)
+                if self._disk is not None:
+                    self._disk.put(key, expires_at, body, stored)
+                logger.info(
+                    f"[STAC-CACHE] miss {search.get('collections')} -> "
+                    f"{len(items)} items ({len(body)} B)"
+                )
+        with self._lock:
+            if self._key_locks.get(key) is lock:
+                del self._key_locks[key]
+        return self._finish(items, sign)
+
+    @staticmethod
+    def _finish(items: List[Dict[str, Any]], sign: bool) -> List[Dict[str, Any]]:
+        if not sign or not items:
+            return items
+        try:
+            return _sign(items)
+        except Exception as exc:  # noqa: BLE001 — unsigned beats nothing
+            logger.warning(f"[STAC-CACHE] signing {len(items)} items failed: {exc}")
+            return items
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._key_locks.clear()
+            self._bytes = 0
+        if self._disk is not None:
+            self._disk.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            out: Dict[str, Any] = {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "ttl_s": self.ttl_s,
+                "grid_deg": self.grid_deg,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+        if self._disk is not None:
+            out["sqlite"] = {
+                "path": str(self._disk.path),
+                "rows": self._disk.count(),
+                "max_rows": self._disk.max_rows,
+                "errors": self._disk.errors,
+            }
+        return out
+
+
+# ---------------------------------------------------------------------------
+# pystac_client convenience
+# ---------------------------------------------------------------------------
+
+_clients: Dict[str, Any] = {}
+_clients_lock = threading.Lock()
+
+
+def _open_client(endpoint: str) -> Any:
+    with _clients_lock:
+        client = _clients.get(endpoint)
+        if client is None:
+            from pystac_client import Client
+
+            client = _clients[endpoint] = Client.open(endpoint)
+        return client
+
+
+def _pystac_fetch(endpoint: str) -> FetchFn:
+    def fetch(search: Dict[str, Any]) -> List[Dict[str, Any]]:
+        return [item.to_dict() for item in _open_client(endpoint).search(**search).items()]
+
+    return fetch
+
+
+def search_items(
+    endpoint: str,
+    *,
+    sign: bool = True,
+    ttl_s: Optional[float] = None,
+    **params: Any,
+) -> List[Any]:
+    """Cached ``pystac_client`` search returning signed ``pystac.Item`` objects.
+
+    ``params`` are ``Client.search`` keyword arguments (``collections``,
+    ``bbox``, ``intersects``, ``datetime``, ``query``, ``limit``,
+    ``max_items``, ...). The client for ``endpoint`` is opened once and
+    only on a miss.
+    """
+    import pystac
+
+    features = get_stac_item_cache().get_or_search(
+        endpoint, params, _pystac_fetch(endpoint), sign=sign, ttl_s=ttl_s
+    )
+    return [pystac.Item.from_dict(f, preserve_dict=False) for f in features]
+
+
+# ---------------------------------------------------------------------------
+# Module singleton
+# ---------------------------------------------------------------------------
+
+_cache: Optional[StacItemCache] = None
+
+
+def _configured_path() -> Optional[str]:
+    raw = (os.getenv("STAC_ITEM_CACHE_PATH") or "").strip()
+    if not raw or raw.lower() in _DISABLED_VALUES:
+        return None
+    return raw
+
+
+def get_stac_item_cache() -> StacItemCache:
+    """Return the process-wide :class:`StacItemCache` (lazy)."""
+    global _cache
+    if _cache is None:
+        _cache = StacItemCache(
+            max_bytes=int(_env_float("STAC_ITEM_CACHE_MEMORY_MB", 64) * 1024 * 1024),
+            ttl_s=_env_float("STAC_ITEM_CACHE_TTL_S", 3600.0),
+            grid_deg=_env_float("STAC_ITEM_CACHE_GRID_DEG", 0.01),
+            sqlite_path=_configured_path(),
+            sqlite_max_rows=int(_env_float("STAC_ITEM_CACHE_MAX_ROWS", 20000)),
+        )
+    return _cache
+
+
+__all__ = [
+    "STATIC_COLLECTION_TTL_S",
+    "StacItemCache",
+    "get_stac_item_cache",
+    "normalize_search",
+    "search_items",
+    "snap_bbox",
+    "strip_signatures",
+]
@@ -0,0 +1,127 @@
+"""Streaming pass-through for proxied upstream bodies.
+
+The tile and TileJSON proxies used to ``await r.read()`` the whole
+upstream body before building a response. For ``@2x`` PNGs and
+multi-band JPEG tiles that adds the full upstream transfer time to
+time-to-first-byte and holds every body in memory at once. The helpers
+here wrap an *open* upstream response in a ``StreamingResponse`` that
+forwards chunks as they arrive, with the upstream status and content
+type preserved.
+
+If the browser goes away mid-body, Starlette cancels the body iterator;
+the ``finally`` below then closes the upstream response (dropping the
+connection instead of draining it), so the upstream read stops too.
+
+Error bodies are *not* streamed -- callers read those fully so they can
+log a preview, exactly as before. Set ``PROXY_STREAMING=false`` to fall
+back to buffered responses everywhere.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+from typing import AsyncIterator, Awaitable, Callable, Dict, Optional
+
+import aiohttp
+import httpx
+from starlette.responses import StreamingResponse
+
+logger = logging.getLogger(__name__)
+
+STREAM_CHUNK_BYTES = int(os.getenv("PROXY_STREAM_CHUNK_BYTES", str(64 * 1024)))
+
+_TRUE_VALUES = {"1", "true", "yes", "on"}
+
+
+def streaming_enabled() -> bool:
+    return os.getenv("PROXY_STREAMING", "true").strip().lower() in _TRUE_VALUES
+
+
+OnComplete = Callable[[bytes], Awaitable[None]]
+
+
+async def _tee(
+    chunks: AsyncIterator[bytes],
+    *,
+    close: Callable[[bool], Awaitable[None]],
+    on_complete: Optional[OnComplete],
+    on_abort: Optional[Callable[[], None]],
+) -> AsyncIterator[bytes]:
+    """Yield ``chunks``; hand the full body to ``on_complete`` if it finished."""
+    collected: Optional[list] = [] if on_complete is not None else None
+    finished = False
+    try:
+        async for chunk in chunks:
+            if collected is not None:
+                collected.append(chunk)
+            yield chunk
+        finished = True
+    finally:
+        await close(finished)
+        if not finished and on_abort is not None:
+            on_abort()
+    if on_complete is not None and collected is not None:
+        try:
+            await on_complete(b"".join(collected))
+        except Exception as exc:  # body already sent; never fail the stream
+            logger.warning("[STREAM-PROXY] on_complete failed: %s", exc)
+
+
+def stream_aiohttp(
+    resp: aiohttp.ClientResponse,
+    *,
+    media_type: Optional[str] = None,
+    headers: Optional[Dict[str, str]] = None,
+    on_complete: Optional[OnComplete] = None,
+    on_abort: Optional[Callable[[], None]] = None,
+) -> StreamingResponse:
+    """Stream an open ``aiohttp`` response (not used as a context manager)."""
+
+    async def _close(finished: bool) -> None:
+        # release() returns a drained connection to the pool; close()
+        # drops a half-read one so the upstream stops sending.
+        if finished:
+            resp.release()
+        else:
+            resp.close()
+
+    body = _tee(
+        resp.content.iter_chunked(STREAM_CHUNK_BYTES),
+        close=_close,
+        on_complete=on_complete,
+        on_abort=on_abort,
+    )
+    return StreamingResponse(
+        body,
+        status_code=resp.status,
+        media_type=media_type or resp.headers.get("Content-Type", "application/octet-stream"),
+        headers=headers,
+    )
+
+
+def stream_httpx(
+    resp: httpx.Response,
+    *,
+    media_type: Optional[str] = None,
+    headers: Optional[Dict[str, str]] = None,
+    on_complete: Optional[OnComplete] = None,
+    on_abort: Optional[Callable[[], None]] = None,
+) -> StreamingResponse:
+    """Stream an ``httpx`` response opened with ``client.send(..., stream=True)``."""
+
+    async def _close(finished: bool) -> None:
+        await resp.aclose()
+
+    body = _tee(
+        resp.aiter_bytes(STREAM_CHUNK_BYTES),
+        close=_close,
+        on_complete=on_complete,
+        on_abort=on_abort,
+    )
+    return StreamingResponse(
+        body,
+        status_code=resp.status_code,
+        media_type=media_type or resp.headers.get("content-type", "application/octet-stream"),
+        headers=headers,
+    )
@@ -0,0 +1,194 @@
+"""Benchmark: async ``cog_reader`` vs blocking rasterio reads on the event loop.
+
+Writes a synthetic tiled DEFLATE COG, serves it from a local HTTP server
+that honours ``Range`` and adds a fixed per-request latency (standing in
+for blob-storage round trips), then runs ``--requests`` concurrent
+window reads as an event-loop handler would:
+
+  * ``rasterio`` -- ``rasterio.open(url).read(window=...)`` called straight
+                    from the coroutine, which is what the raster tools did:
+                    the loop is blocked for every read, so the "concurrent"
+                    requests run back to back.
+  * ``cog``      -- ``cog_reader.read_bbox`` under ``asyncio.gather``: range
+                    requests overlap on the pooled session, decode runs in
+                    the decode pool.
+
+Reports wall time and the longest event-loop stall seen by a 5 ms
+heartbeat task. Each request carries a distinct query string so GDAL's
+``/vsicurl/`` block cache cannot serve repeats (the async reader keys its
+header cache without the query string, as it does for SAS-signed hrefs).
+
+Usage:
+  python tests/bench_cog_reader.py
+  python tests/bench_cog_reader.py --size 4096 --window 1024 --requests 16 --latency-ms 40
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import multiprocessing
+import time
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import cog_reader  # noqa: E402
+import http_pool  # noqa: E402
+
+
+class _RangeHandler(SimpleHTTPRequestHandler):
+    latency_s = 0.0
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        with self.counter.get_lock():
+            self.counter.value += 1
+        time.sleep(self.latency_s)
+        path = self.translate_path(self.path.split("?", 1)[0])
+        size = os.path.getsize(path)
+        rng = self.headers.get("Range")
+        with open(path, "rb") as f:
+            if rng and rng.startswith("bytes="):
+                start_s, end_s = rng[6:].split("-")
+                start = int(start_s)
+                end = min(int(end_s) if end_s else size - 1, size - 1)
+                f.seek(start)
+                body = f.read(end - start + 1)
+                self.send_response(206)
+                self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+            else:
+                body = f.read()
+                self.send_response(200)
+            self.send_header("Accept-Ranges", "bytes")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    def do_HEAD(self):
+        path = self.translate_path(self.path.split("?", 1)[0])
+        self.send_response(200)
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("Content-Length", str(os.path.getsize(path)))
+        self.end_headers()
+
+
+def _write_cog(path: str, size: int) -> None:
+    import rasterio
+    from rasterio.transform import from_origin
+
+    rng = np.random.default_rng(7)
+    data = np.cumsum(rng.normal(0, 1, (size, size)), axis=1).astype("float32")
+    with rasterio.open(
+        path, "w", driver="GTiff", height=size, width=size, count=1, dtype="float32",
+        crs="EPSG:4326", transform=from_origin(-98.0, 31.0, 1.0 / 3600, 1.0 / 3600),
+        tiled=True, blockxsize=512, blockysize=512, compress="deflate", predictor=3,
+    ) as dst:
+        dst.write(data, 1)
+
+
+def _bbox(window_px: int, i: int, size: int):
+    res = 1.0 / 3600
+    off = (i * 97) % max(1, size - window_px)
+    west = -98.0 + off * res
+    north = 31.0 - off * res
+    return [west, north - window_px * res, west + window_px * res, north]
+
+
+async def _heartbeat(stop: asyncio.Event, out: list) -> None:
+    loop = asyncio.get_running_loop()
+    worst = 0.0
+    while not stop.is_set():
+        t0 = loop.time()
+        await asyncio.sleep(0.005)
+        worst = max(worst, loop.time() - t0 - 0.005)
+    out.append(worst)
+
+
+def _serve(directory: str, latency_s: float, counter, port) -> None:
+    # Separate process, so serving bytes does not compete with the
+    # benchmarked event loop for the GIL.
+    _RangeHandler.latency_s = latency_s
+    _RangeHandler.counter = counter
+    server = ThreadingHTTPServer(("127.0.0.1", 0), partial(_RangeHandler, directory=directory))
+    port.value = server.server_address[1]
+    server.serve_forever()
+
+
+async def _run(label: str, url: str, args, read, counter) -> None:
+    stop, stall = asyncio.Event(), []
+    beat = asyncio.create_task(_heartbeat(stop, stall))
+    await asyncio.sleep(0.02)
+    counter.value = 0
+    t0 = time.perf_counter()
+    results = await asyncio.gather(*(
+        read(f"{url}?n={label}{i}", _bbox(args.window, i, args.size)) for i in range(args.requests)
+    ))
+    wall = (time.perf_counter() - t0) * 1e3
+    stop.set()
+    await beat
+    shapes = {r.shape for r in results}
+    print(
+        f"  {label:<9} wall={wall:8.1f} ms  max_loop_stall={stall[0] * 1e3:8.1f} ms  "
+        f"http_requests={counter.value:4d}  shapes={sorted(shapes)}"
+    )
+
+
+async def _rasterio_read(url: str, bbox):
+    # The old tool body: blocking GDAL I/O directly inside the coroutine.
+    return cog_reader._read_bbox_rasterio(url, bbox, 1, "EPSG:4326").data
+
+
+async def _cog_read(url: str, bbox):
+    return (await cog_reader.read_bbox(url, bbox)).data
+
+
+async def _main(args, url: str, counter) -> None:
+    await _run("rasterio", url, args, _rasterio_read, counter)
+    await _run("cog", url, args, _cog_read, counter)
+    print(f"  reader stats: {cog_reader.get_cog_reader().stats()}")
+    await http_pool.shutdown()
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--size", type=int, default=4096, help="COG width/height in pixels")
+    ap.add_argument("--window", type=int, default=768, help="read window edge in pixels")
+    ap.add_argument("--requests", type=int, default=12, help="concurrent reads")
+    ap.add_argument("--latency-ms", type=float, default=25.0, help="added per HTTP request")
+    args = ap.parse_args()
+
+    os.environ.setdefault("GDAL_DISABLE_READDIR_ON_OPEN", "EMPTY_DIR")
+    with tempfile.TemporaryDirectory() as tmp:
+        _write_cog(os.path.join(tmp, "dem.tif"), args.size)
+        counter, port = multiprocessing.Value("i", 0), multiprocessing.Value("i", 0)
+        server = multiprocessing.Process(
+            target=_serve, args=(tmp, args.latency_ms / 1e3, counter, port), daemon=True
+        )
+        server.start()
+        while not port.value:
+            time.sleep(0.01)
+        url = f"http://127.0.0.1:{port.value}/dem.tif"
+        print(
+            f"size={args.size} window={args.window} requests={args.requests} "
+            f"latency={args.latency_ms:.0f} ms"
+        )
+        try:
+            asyncio.run(_main(args, url, counter))
+        finally:
+            server.terminate()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,113 @@
+"""Microbenchmark: vectorized ``_SearchIndex`` vs the original per-row loop.
+
+Builds a synthetic inventory (ids/titles/keywords drawn from a small
+vocabulary, random unit embeddings) and times one query against:
+
+  * ``loop``   -- the pre-vectorization ``search`` body: pure-Python
+                  ``_cosine`` / ``_lexical_score`` per row, re-tokenizing
+                  every row's fields on every call, then a full sort.
+  * ``index``  -- ``_SearchIndex.rank`` (one mat-vec + posting lookups +
+                  ``argpartition`` top-K). Index build time is reported
+                  separately since it runs once per refresh.
+
+Both a semantic run (all rows embedded) and a lexical run (embeddings
+off) are measured. No network, no AOAI.
+
+Usage:
+  python tests/bench_collection_index.py
+  python tests/bench_collection_index.py --rows 500 --dim 1536 --repeat 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import collection_index as ci  # noqa: E402
+
+_VOCAB = (
+    "sentinel landsat modis naip aster cop dem elevation fire burn swir "
+    "reflectance temperature land cover ocean chlorophyll snow ice aerosol "
+    "precipitation radar sar vegetation ndvi urban flood drought soil "
+    "moisture biomass forest crop water night lights population"
+).split()
+
+
+def _rows(n: int, dim: int, embedded: bool, rng: random.Random):
+    rows = []
+    for i in range(n):
+        words = rng.sample(_VOCAB, 6)
+        vec = tuple(rng.gauss(0.0, 1.0) for _ in range(dim)) if embedded else None
+        rows.append(ci.CollectionMeta(
+            id=f"{words[0]}-{words[1]}-{i}",
+            title=" ".join(words[:3]).title(),
+            description=" ".join(rng.choices(_VOCAB, k=40)),
+            keywords=tuple(words[2:]),
+            render_presets=(),
+            source="public",
+            embedding=vec,
+        ))
+    return tuple(rows)
+
+
+def _loop(rows, query, query_vec, k):
+    q_tokens = ci._token_set(query)
+    out = []
+    for r in rows:
+        if query_vec is not None and r.embedding is not None:
+            score = ci._cosine(query_vec, r.embedding)
+        else:
+            score = ci._lexical_score(q_tokens, r)
+        if score > 0:
+            out.append((r, score))
+    out.sort(key=lambda c: c[1], reverse=True)
+    return out[:k]
+
+
+def _time(fn, repeat: int) -> float:
+    fn()  # warm
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - t0) / repeat * 1e3
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--rows", type=int, default=200)
+    ap.add_argument("--dim", type=int, default=1536)
+    ap.add_argument("--k", type=int, default=8)
+    ap.add_argument("--repeat", type=int, default=50)
+    args = ap.parse_args()
+
+    rng = random.Random(7)
+    query = "sentinel swir fire burn reflectance over california"
+    print(f"rows={args.rows} dim={args.dim} k={args.k} repeat={args.repeat}")
+    for label, embedded in (("semantic", True), ("lexical", False)):
+        rows = _rows(args.rows, args.dim, embedded, rng)
+        qvec = [rng.gauss(0.0, 1.0) for _ in range(args.dim)] if embedded else None
+        t0 = time.perf_counter()
+        index = ci._SearchIndex.build(rows)
+        build_ms = (time.perf_counter() - t0) * 1e3
+        q_tokens = ci._token_set(query)
+
+        want = [r.id for r, _ in _loop(rows, query, qvec, args.k)]
+        got = [c.meta.id for c in index.rank(q_tokens, qvec, k=args.k)]
+        loop_ms = _time(lambda: _loop(rows, query, qvec, args.k), args.repeat)
+        index_ms = _time(lambda: index.rank(ci._token_set(query), qvec, k=args.k), args.repeat)
+        print(
+            f"  {label:<8} loop={loop_ms:8.3f} ms  index={index_ms:7.3f} ms  "
+            f"speedup={loop_ms / index_ms:6.1f}x  build={build_ms:7.1f} ms  "
+            f"same_top_k={got == want}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,182 @@
+"""Unit tests for geoint.cmip6_refs (chunk reference engine for CMIP6 NetCDF).
+
+Small NEX-GDDP-like NetCDF4 files (0.25° grid, daily time axis, zlib +
+shuffle chunks) are written with xarray / h5netcdf and read by local path,
+so no network. Every engine read is compared with the xarray selection
+that the tools used before.
+
+Coverage focus:
+  * nearest-cell series, single timesteps and area boxes identical to
+    xarray (fill values as NaN, packed int16 scale/offset, label ties)
+  * only the chunks under the selection are fetched
+  * references are cached on disk and reused by a fresh engine
+  * unsupported filters / stale references fall back (``None``)
+  * ``_sample_netcdf`` and ``sample_timeseries`` read the full daily series
+"""
+
+from __future__ import annotations
+
+import json
+
+import numpy as np
+import pytest
+import xarray as xr
+
+from geoint import cmip6_refs, extreme_weather_tools, netcdf_computation_tools
+
+_FILL = np.float32(1e20)
+
+
+def _write(path, *, days=365, encoding=None, data=None, seed=0):
+    lat = np.arange(-59.875, -59.875 + 80 * 0.25, 0.25)
+    lon = np.arange(0.125, 0.125 + 120 * 0.25, 0.25)
+    if data is None:
+        rng = np.random.default_rng(seed)
+        data = (285 + 10 * np.sin(np.arange(days) / 58.0)[:, None, None] + rng.normal(0, 2, (days, 80, 120))).astype("float32")
+        data[:, 5, 5] = _FILL
+    ds = xr.Dataset(
+        {"tas": (("time", "lat", "lon"), data)},
+        coords={"time": np.arange(days, dtype=float), "lat": lat, "lon": lon},
+    )
+    enc = {"zlib": True, "shuffle": True, "chunksizes": (73, 40, 40), "_FillValue": _FILL}
+    ds.to_netcdf(path, engine="h5netcdf", encoding={"tas": encoding or enc})
+    return str(path)
+
+
+def _xr(path):
+    return xr.open_dataset(path, engine="h5netcdf", decode_times=False)["tas"]
+
+
+@pytest.fixture
+def nc(tmp_path):
+    return _write(tmp_path / "tas_day_ACCESS-CM2_ssp585_r1i1p1f1_gn_2030.nc")
+
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    e = cmip6_refs.ReferenceEngine(str(tmp_path / "refs"))
+    monkeypatch.setattr(cmip6_refs, "_engine", e)
+    monkeypatch.delenv("CMIP6_REFS", raising=False)
+    return e
+
+
+def test_point_reads_match_xarray(nc, engine):
+    tas = _xr(nc)
+    # arbitrary cell, fill-value cell, a label tie (-45.0 between two rows), off the grid
+    for lat, lon in [(-50.3, 10.7), (-59.875 + 5 * 0.25, 0.125 + 5 * 0.25), (-45.0, 3.0), (10.0, 200.0)]:
+        series = engine.read_point(nc, "tas", lat, lon)
+        np.testing.assert_array_equal(series, tas.sel(lat=lat, lon=lon, method="nearest").values.astype(float))
+        last = engine.read_point(nc, "tas", lat, lon, time_index=-1)
+        assert last.ndim == 0
+        np.testing.assert_array_equal(last, series[-1])
+    assert np.isnan(engine.read_point(nc, "tas", -58.625, 1.375)).all()
+    assert engine.stats()["built"] == 1 and engine.stats()["fallbacks"] == 0
+
+
+def test_only_needed_chunks_are_fetched(nc, tmp_path):
+    fetched = []
+
+    def fetch(href, start, end):
+        fetched.append((start, end))
+        with open(href, "rb") as f:
+            f.seek(start)
+            return f.read(end - start)
+
+    engine = cmip6_refs.ReferenceEngine(str(tmp_path / "refs"), fetch_range=fetch)
+    engine.read_point(nc, "tas", -50.3, 10.7)
+    assert len(fetched) == 5  # 365 days / 73-day chunks, one spatial chunk
+    fetched.clear()
+    engine.read_point(nc, "tas", -50.3, 10.7, time_index=0)
+    assert len(fetched) == 1
+
+
+def test_area_reads_match_xarray(nc, engine):
+    tas = _xr(nc)
+    box = engine.read_area(nc, "tas", (-55.0, -48.0), (5.0, 16.0))
+    expected = tas.sel(lat=slice(-55.0, -48.0), lon=slice(5.0, 16.0)).isel(time=-1).values
+    assert box.shape == expected.shape == (28, 44)  # spans four spatial chunks
+    np.testing.assert_array_equal(box, expected)
+    assert engine.read_area(nc, "tas", (-55.0, -54.99), (5.0, 5.01)).size == 0
+
+    # sample_area_stats' snapshot helper, including a box across the 0/360 seam
+    snap = netcdf_computation_tools._area_snapshot(nc, "tas", (-55.0, -48.0), (25.0, 3.0))
+    parts = [tas.sel(lat=slice(-55.0, -48.0), lon=slice(*r)).isel(time=-1).values for r in [(25.0, 360), (0, 3.0)]]
+    np.testing.assert_array_equal(snap, np.concatenate(parts, axis=1))
+
+
+def test_packed_int16_is_scaled_like_xarray(tmp_path, engine):
+    raw = np.random.default_rng(4).integers(-20000, 20000, (30, 80, 120)).astype("int16")
+    raw[:, 0, 0] = -32767
+    path = _write(
+        tmp_path / "packed.nc", days=30, data=raw,
+        encoding={"zlib": True, "chunksizes": (10, 80, 120), "_FillValue": np.int16(-32767)},
+    )
+    ds = xr.open_dataset(path, engine="h5netcdf", decode_times=False, mask_and_scale=False)
+    ds["tas"].attrs.update(scale_factor=0.01, add_offset=280.0)
+    scaled = tmp_path / "scaled.nc"
+    ds.to_netcdf(scaled, engine="h5netcdf", encoding={"tas": {"zlib": True, "chunksizes": (10, 80, 120)}})
+
+    tas = xr.open_dataset(scaled, engine="h5netcdf", decode_times=False)["tas"]
+    for lat, lon in [(-59.875, 0.125), (-50.0, 12.0)]:
+        np.testing.assert_allclose(
+            engine.read_point(str(scaled), "tas", lat, lon),
+            tas.sel(lat=lat, lon=lon, method="nearest").values.astype(float),
+        )
+
+
+def test_references_are_cached_on_disk(nc, engine, tmp_path):
+    engine.read_point(nc, "tas", -50.0, 10.0)
+    files = list((tmp_path / "refs").glob("*.json"))
+    assert len(files) == 1
+    doc = json.loads(files[0].read_text())
+    assert doc["version"] == 1 and doc["templates"]["u"] == nc
+    assert json.loads(doc["refs"]["tas/.zarray"])["compressor"]["id"] == "zlib"
+    assert doc["refs"]["lat/0"].startswith("base64:")  # coordinates inlined
+
+    def no_open(href):
+        raise AssertionError("metadata must come from the cache")
+
+    def fetch(href, start, end):  # a signed URL serves the same bytes
+        with open(href.split("?")[0], "rb") as f:
+            f.seek(start)
+            return f.read(end - start)
+
+    fresh = cmip6_refs.ReferenceEngine(str(tmp_path / "refs"), open_file=no_open, fetch_range=fetch)
+    np.testing.assert_array_equal(
+        fresh.read_point(nc + "?se=2030&sig=abc", "tas", -50.0, 10.0),  # new SAS token, same asset
+        engine.read_point(nc, "tas", -50.0, 10.0),
+    )
+    assert fresh.stats()["disk_hits"] == 1 and fresh.stats()["built"] == 0
+
+
+def test_unsupported_filters_and_stale_references_fall_back(tmp_path, engine):
+    lzf = _write(tmp_path / "lzf.nc", encoding={"compression": "lzf", "chunksizes": (73, 40, 40)})
+    assert engine.read_point(lzf, "tas", -50.0, 10.0) is None
+    assert engine.read_point(lzf, "missing", -50.0, 10.0) is None
+    assert engine.stats()["fallbacks"] == 2
+
+    nc = _write(tmp_path / "a.nc")
+    assert engine.read_point(nc, "tas", -50.0, 10.0) is not None
+    _write(tmp_path / "a.nc", encoding={"zlib": True, "shuffle": True, "chunksizes": (5, 80, 120)}, seed=9)
+    assert engine.read_point(nc, "tas", -50.0, 10.0) is None  # offsets no longer match: dropped
+    np.testing.assert_array_equal(
+        engine.read_point(nc, "tas", -50.0, 10.0),
+        _xr(nc).sel(lat=-50.0, lon=10.0, method="nearest").values.astype(float),
+    )
+
+
+def test_tools_read_the_full_daily_series(nc, engine, monkeypatch):
+    extreme_weather_tools._netcdf_results.clear()
+    netcdf_computation_tools._tool_results.clear()
+    tas = _xr(nc).sel(lat=-55.0, lon=12.3, method="nearest").values.astype(float)
+
+    annual = extreme_weather_tools._sample_netcdf(nc, "tas", -55.0, 12.3, aggregate="annual")
+    assert annual["days_sampled"] == annual["total_days"] == 365
+    assert annual["raw_mean"] == round(float(np.mean(tas)), 6)
+    last = extreme_weather_tools._sample_netcdf(nc, "tas", -55.0, 12.3)
+    assert last["raw_value"] == round(float(tas[-1]), 4) and last["total_bands"] == 365
+
+    item = {"id": "ACCESS-CM2.ssp585.2030", "assets": {"tas": {"href": nc}}}
+    monkeypatch.setattr(netcdf_computation_tools, "_search_cmip6_items", lambda *a, **k: [item])
+    ts = json.loads(netcdf_computation_tools.sample_timeseries(-55.0, 12.3, "tas"))
+    assert ts["annual_summary"]["total_days"] == 365 and len(ts["periods"]) == 12
@@ -0,0 +1,158 @@
+"""Unit tests for cog_reader (async COG window reads).
+
+Synthetic GeoTIFFs are written with rasterio and read back through a
+local-file ``fetch_range``; every read is compared to rasterio's own
+window read of the same pixels, so no network:
+
+  * DEFLATE with horizontal (2) and floating-point (3) predictors
+  * pixel- and band-interleaved multiband, stripped (untiled) layout
+  * PixelIsPoint georeferencing, reprojected bbox, bbox off the image
+  * header cache + merged range requests
+  * unsupported compression raises, and ``read_bbox`` falls back to rasterio
+"""
+
+from __future__ import annotations
+
+import asyncio
+
+import numpy as np
+import pytest
+import rasterio
+from rasterio.transform import from_origin
+from rasterio.windows import Window
+
+import cog_reader
+
+
+def _write(path, data, *, crs="EPSG:4326", transform=None, **profile):
+    bands, height, width = data.shape
+    meta = {
+        "driver": "GTiff",
+        "height": height,
+        "width": width,
+        "count": bands,
+        "dtype": data.dtype.name,
+        "crs": crs,
+        "transform": transform or from_origin(-98.0, 31.0, 0.001, 0.001),
+        "tiled": True,
+        "blockxsize": 64,
+        "blockysize": 64,
+        "compress": "deflate",
+    }
+    meta.update(profile)
+    with rasterio.open(path, "w", **meta) as dst:
+        dst.write(data)
+    return str(path)
+
+
+class _LocalFetch:
+    def __init__(self):
+        self.calls = []
+
+    async def __call__(self, href, start, end):
+        self.calls.append((start, end))
+        with open(href.split("?", 1)[0], "rb") as f:
+            f.seek(start)
+            return f.read(end - start)
+
+
+def _read(reader, href, window, band=1):
+    return asyncio.run(reader.read_window(href, window, band=band))
+
+
+def _expected(href, window, band=1):
+    row0, col0, row1, col1 = window
+    with rasterio.open(href) as src:
+        return src.read(band, window=Window(col0, row0, col1 - col0, row1 - row0))
+
+
+@pytest.fixture
+def rng():
+    return np.random.default_rng(7)
+
+
+@pytest.mark.parametrize(
+    "dtype,predictor",
+    [("int16", 1), ("int16", 2), ("uint8", 2), ("float32", 3), ("float64", 3), ("uint32", 1)],
+)
+def test_window_matches_rasterio(tmp_path, rng, dtype, predictor):
+    data = (rng.random((1, 200, 150)) * 1000).astype(dtype)
+    href = _write(tmp_path / "a.tif", data, predictor=predictor)
+    reader = cog_reader.CogReader(fetch_range=_LocalFetch())
+    window = (37, 11, 171, 149)  # spans partial edge tiles
+    np.testing.assert_array_equal(_read(reader, href, window), _expected(href, window))
+
+
+@pytest.mark.parametrize("interleave", ["pixel", "band"])
+def test_multiband_interleave(tmp_path, rng, interleave):
+    data = rng.integers(0, 5000, (3, 130, 90), dtype=np.uint16)
+    href = _write(tmp_path / "m.tif", data, interleave=interleave, predictor=2)
+    reader = cog_reader.CogReader(fetch_range=_LocalFetch())
+    for band in (1, 2, 3):
+        np.testing.assert_array_equal(_read(reader, href, (5, 5, 120, 80), band), data[band - 1, 5:120, 5:80])
+
+
+def test_stripped_layout(tmp_path, rng):
+    data = rng.random((1, 101, 77)).astype("float32")
+    href = _write(tmp_path / "s.tif", data, tiled=False, blockysize=16)
+    reader = cog_reader.CogReader(fetch_range=_LocalFetch())
+    window = (90, 0, 101, 77)  # includes the short last strip
+    np.testing.assert_array_equal(_read(reader, href, window), data[0, 90:101])
+
+
+def test_bounds_read_pixel_is_point_and_reprojection(tmp_path, rng):
+    data = rng.integers(0, 100, (1, 120, 120), dtype=np.int16)
+    href = _write(tmp_path / "p.tif", data, AREA_OR_POINT="Point")
+    reader = cog_reader.CogReader(fetch_range=_LocalFetch())
+    header = asyncio.run(reader.header(href))
+    with rasterio.open(href) as src:
+        assert header.transform == pytest.approx(tuple(src.transform)[:6])
+    assert header.epsg == 4326
+
+    bbox = (-97.95, 30.93, -97.91, 30.96)
+    arr, _, window = asyncio.run(reader.read_bounds(href, bbox))
+    np.testing.assert_array_equal(arr, _expected(href, window))
+
+    utm = _write(
+        tmp_path / "u.tif", data, crs="EPSG:32614", transform=from_origin(600000.0, 3400000.0, 30.0, 30.0)
+    )
+    arr, header, window = asyncio.run(reader.read_bounds(utm, (-97.95, 30.71, -97.94, 30.72)))
+    assert header.epsg == 32614 and arr is not None
+    np.testing.assert_array_equal(arr, _expected(utm, window))
+
+    assert asyncio.run(reader.read_bounds(href, (10.0, 10.0, 11.0, 11.0)))[0] is None
+
+
+def test_header_cached_and_ranges_merged(tmp_path, rng):
+    data = rng.integers(0, 100, (1, 256, 256), dtype=np.uint8)
+    href = _write(tmp_path / "c.tif", data)
+    fetch = _LocalFetch()
+    reader = cog_reader.CogReader(fetch_range=fetch)
+
+    _read(reader, href, (0, 0, 256, 256))
+    _read(reader, href + "?sig=other", (0, 0, 10, 10))
+    stats = reader.stats()
+    assert stats["header_fetches"] == 1 and stats["header_hits"] == 1
+    # 16 adjacent tiles coalesce into one range request after the header
+    assert stats["range_requests"] == 3 and stats["blocks_decoded"] == 17
+
+    # no gap allowed: only byte-adjacent tiles (one tile row each) share a request
+    unmerged = cog_reader.CogReader(fetch_range=fetch, merge_gap=0, max_concurrency=2)
+    unmerged._headers = reader._headers
+    fetch.calls.clear()
+    np.testing.assert_array_equal(_read(unmerged, href, (0, 0, 128, 128)), data[0, :128, :128])
+    assert len(fetch.calls) == 2
+
+
+def test_unsupported_compression_falls_back_to_rasterio(tmp_path, rng, monkeypatch):
+    data = rng.integers(0, 100, (1, 64, 64), dtype=np.int16)
+    href = _write(tmp_path / "l.tif", data, compress="lzw", nodata=-1)
+    reader = cog_reader.CogReader(fetch_range=_LocalFetch())
+    with pytest.raises(cog_reader.CogUnsupported):
+        asyncio.run(reader.header(href))
+
+    monkeypatch.setattr(cog_reader, "_reader", reader)
+    out = asyncio.run(cog_reader.read_bbox(href, (-97.99, 30.95, -97.97, 30.99)))
+    assert out.nodata == -1
+    assert out.transform == pytest.approx((0.001, 0.0, -97.99, 0.0, -0.001, 30.99))
+    np.testing.assert_array_equal(out.data, data[0, 10:50, 10:30])
@@ -11,6 +11,8 @@ and deterministically. They assert the core invariants from
   * Embedding failures fall back to the lexical scorer without raising.
   * Public-source vs Pro-source rows are isolated per mode.
   * TTL freshness flips correctly.
+  * A new index builds from the persisted collection lists before any
+    catalog fetch.
 """
 
 from __future__ import annotations
@@ -104,7 +106,9 @@ def _patch_loaders(monkeypatch, *, public=PUBLIC_PAYLOAD, pro=PRO_PAYLOAD, pro_c
 
 
 @pytest.fixture(autouse=True)
-def _reset_singleton():
+def _reset_singleton(monkeypatch, tmp_path):
+    # Keep the on-disk embedding store per-test so runs never share vectors.
+    monkeypatch.setenv("COLLECTION_EMBED_CACHE_PATH", str(tmp_path / "embeddings.sqlite3"))
     reset_collection_index_for_tests()
     yield
     reset_collection_index_for_tests()
@@ -237,3 +241,211 @@ async def test_render_presets_extracted_from_both_keys(monkeypatch):
     meta = await idx.get("legacy-collection", "public")
     assert meta is not None
     assert meta.render_presets == ("ndvi", "true-color")
+
+
+# ---------------------------------------------------------------------------
+# Vectorized search index
+# ---------------------------------------------------------------------------
+
+def _loop_search(rows, query, query_vec, k):
+    """The pre-vectorization ``search`` loop, kept as the parity oracle."""
+    q_tokens = ci_mod._token_set(query)
+    out = []
+    for r in rows:
+        if query_vec is not None and r.embedding is not None:
+            score, method = ci_mod._cosine(query_vec, r.embedding), "semantic"
+        else:
+            score, method = ci_mod._lexical_score(q_tokens, r), "lexical"
+        if score > 0:
+            out.append((r.id, score, method))
+    out.sort(key=lambda c: c[1], reverse=True)
+    return out[:k]
+
+
+def _embedded_rows(payload, vectors):
+    rows = [ci_mod._to_meta(c, "public") for c in payload]
+    return tuple(
+        CollectionMeta(
+            id=r.id, title=r.title, description=r.description, keywords=r.keywords,
+            render_presets=r.render_presets, source=r.source, raw=r.raw,
+            embedding=tuple(v) if v is not None else None,
+        )
+        for r, v in zip(rows, vectors)
+    )
+
+
+def test_search_index_lexical_matches_loop():
+    rows = tuple(ci_mod._to_meta(c, "public") for c in PUBLIC_PAYLOAD)
+    index = ci_mod._SearchIndex.build(rows)
+    for query in ("Sentinel-2 SWIR fire", "aerial imagery usda", "landsat temperature", "zzz"):
+        got = [(c.meta.id, c.score, c.method) for c in index.rank(ci_mod._token_set(query), None, k=5)]
+        want = _loop_search(rows, query, None, 5)
+        assert [g[0] for g in got] == [w[0] for w in want]
+        assert [g[1] for g in got] == pytest.approx([w[1] for w in want])
+
+
+def test_search_index_mixed_embeddings_match_loop():
+    # naip has no embedding -> scored lexically, exactly like the loop.
+    rows = _embedded_rows(PUBLIC_PAYLOAD, [[1.0, 0.0, 0.0], [0.6, 0.8, 0.0], None])
+    index = ci_mod._SearchIndex.build(rows)
+    query, qvec = "naip aerial", [0.0, 1.0, 0.0]
+    got = [(c.meta.id, c.score, c.method) for c in index.rank(ci_mod._token_set(query), qvec, k=3)]
+    want = _loop_search(rows, query, qvec, 3)
+    assert [(g[0], g[2]) for g in got] == [(w[0], w[2]) for w in want]
+    assert [g[1] for g in got] == pytest.approx([w[1] for w in want], rel=1e-6)
+
+
+def test_top_k_keeps_snapshot_order_on_ties():
+    scores = ci_mod.np.array([0.5, 0.9, 0.5, 0.0, 0.5, 0.9])
+    assert list(ci_mod._top_k(scores, 3)) == [1, 5, 0]
+    assert list(ci_mod._top_k(scores, 10)) == [1, 5, 0, 2, 4]
+
+
+@pytest.mark.asyncio
+async def test_search_rrf_fusion_labels_hybrid(monkeypatch):
+    _patch_loaders(monkeypatch)
+    monkeypatch.setenv("AZURE_OPENAI_EMBEDDING_DEPLOYMENT", "embed")
+    vectors = {"sentinel-2-l2a": [1.0, 0.0], "landsat-c2-l2": [0.0, 1.0], "naip": [0.7, 0.7]}
+
+    async def fake_embed(texts):
+        return [vectors.get(t.split("\n", 1)[0], [1.0, 0.1]) for t in texts]
+
+    monkeypatch.setattr(ci_mod, "_embed_texts", fake_embed)
+    idx = CollectionIndex(ttl_seconds=60)
+    await idx.refresh()
+
+    raw = await idx.search("Sentinel-2 SWIR fire", "public", k=3, fusion="raw")
+    assert all(c.method == "semantic" for c in raw)
+    hybrid = await idx.search("Sentinel-2 SWIR fire", "public", k=3, fusion="rrf")
+    assert hybrid[0].meta.id == "sentinel-2-l2a"
+    assert all(c.method == "hybrid" for c in hybrid)
+    # Top row is first in both rankings: 2 / (rrf_k + 1).
+    assert hybrid[0].score == pytest.approx(2.0 / 61.0)
+
+
+# ---------------------------------------------------------------------------
+# On-disk embedding store
+# ---------------------------------------------------------------------------
+
+class _CountingEmbedder:
+    """Fake ``_embed_texts``: deterministic 2-d vectors, records every text."""
+
+    def __init__(self) -> None:
+        self.calls: List[List[str]] = []
+
+    async def __call__(self, texts):
+        self.calls.append(list(texts))
+        return [[float(len(t)), 1.0] for t in texts]
+
+
+@pytest.mark.asyncio
+async def test_refresh_only_embeds_new_or_changed_collections(monkeypatch):
+    _patch_loaders(monkeypatch)
+    monkeypatch.setenv("AZURE_OPENAI_EMBEDDING_DEPLOYMENT", "embed")
+    embedder = _CountingEmbedder()
+    monkeypatch.setattr(ci_mod, "_embed_texts", embedder)
+
+    idx = CollectionIndex(ttl_seconds=60)
+    await idx.refresh()
+    assert len(embedder.calls) == 1 and len(embedder.calls[0]) == 5
+
+    # Unchanged inventory: nothing goes to AOAI.
+    await idx.refresh()
+    assert len(embedder.calls) == 1
+
+    # One edited description -> exactly one text re-embedded.
+    edited = [dict(PUBLIC_PAYLOAD[0], description="Updated description.")] + PUBLIC_PAYLOAD[1:]
+    _patch_loaders(monkeypatch, public=edited)
+    monkeypatch.setenv("AZURE_OPENAI_EMBEDDING_DEPLOYMENT", "embed")
+    snap = await idx.refresh()
+    assert len(embedder.calls) == 2 and len(embedder.calls[1]) == 1
+    assert "Updated description." in embedder.calls[1][0]
+    assert all(m.embedding is not None for m in snap.by_mode["public"])
+
+
+@pytest.mark.asyncio
+async def test_new_index_warms_embeddings_from_disk(monkeypatch):
+    _patch_loaders(monkeypatch)
+    monkeypatch.setenv("AZURE_OPENAI_EMBEDDING_DEPLOYMENT", "embed")
+    embedder = _CountingEmbedder()
+    monkeypatch.setattr(ci_mod, "_embed_texts", embedder)
+    first = await CollectionIndex(ttl_seconds=60).refresh()
+
+    # A "new replica": fresh index + fresh store object, same file.
+    monkeypatch.setattr("embedding_store._store", None)
+    second = await CollectionIndex(ttl_seconds=60).refresh()
+    assert len(embedder.calls) == 1
+    assert [m.embedding for m in second.by_mode["pro"]] == [
+        m.embedding for m in first.by_mode["pro"]
+    ]
+
+    # A different deployment is a different key space.
+    monkeypatch.setenv("AZURE_OPENAI_EMBEDDING_DEPLOYMENT", "embed-v2")
+    await CollectionIndex(ttl_seconds=60).refresh()
+    assert len(embedder.calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_new_index_loads_persisted_collection_lists(monkeypatch):
+    _patch_loaders(monkeypatch)
+    await CollectionIndex(ttl_seconds=60).refresh()
+
+    fetches = []
+
+    async def counting_load_public(self, session):  # noqa: ARG001
+        fetches.append("public")
+        return ([], "offline")
+
+    monkeypatch.setattr(CollectionIndex, "_load_public", counting_load_public)
+    monkeypatch.setattr("embedding_store._store", None)
+
+    # Fresh lists: served from disk, no catalog round trip.
+    snap = await CollectionIndex(ttl_seconds=60).ensure_loaded()
+    assert [m.id for m in snap.by_mode["public"]] == [c["id"] for c in PUBLIC_PAYLOAD]
+    assert len(snap.by_mode["pro"]) == 2
+    assert fetches == []
+
+    # Older than the TTL: still served, with a refresh in the background.
+    idx = CollectionIndex(ttl_seconds=0)
+    snap = await idx.ensure_loaded()
+    assert len(snap.by_mode["public"]) == 3
+    await idx._refresh_task
+    assert fetches == ["public"]
+
+
+@pytest.mark.asyncio
+async def test_embedding_store_disabled_passes_through(monkeypatch):
+    _patch_loaders(monkeypatch)
+    monkeypatch.setenv("AZURE_OPENAI_EMBEDDING_DEPLOYMENT", "embed")
+    monkeypatch.setenv("COLLECTION_EMBED_CACHE_PATH", "off")
+    embedder = _CountingEmbedder()
+    monkeypatch.setattr(ci_mod, "_embed_texts", embedder)
+    idx = CollectionIndex(ttl_seconds=60)
+    await idx.refresh()
+    await idx.refresh()
+    assert len(embedder.calls) == 2
+    assert (await idx.health())["embedding_store"] is None
+
+
+# ---------------------------------------------------------------------------
+# Query embedding cache
+# ---------------------------------------------------------------------------
+
+@pytest.mark.asyncio
+async def test_repeated_query_is_embedded_once(monkeypatch):
+    _patch_loaders(monkeypatch)
+    monkeypatch.setenv("AZURE_OPENAI_EMBEDDING_DEPLOYMENT", "embed")
+    embedder = _CountingEmbedder()
+    monkeypatch.setattr(ci_mod, "_embed_texts", embedder)
+    idx = CollectionIndex(ttl_seconds=60)
+    await idx.refresh()
+    embedder.calls.clear()
+
+    await idx.search("Sentinel-2 SWIR fire", "public")
+    await idx.search("  sentinel-2   swir FIRE ", "pro")
+    await asyncio.gather(*(idx.search("naip aerial", "public") for _ in range(4)))
+    assert embedder.calls == [["Sentinel-2 SWIR fire"], ["naip aerial"]]
+
+    stats = (await idx.health())["query_embedding_cache"]
+    assert stats["hits"] == 1 and stats["misses"] == 2 and stats["coalesced"] == 3
+    assert stats["hit_rate"] == pytest.approx(4 / 6, abs=1e-4)
@@ -96,7 +96,9 @@ def _patch_index(monkeypatch):
 
 
 @pytest.fixture(autouse=True)
-def _reset():
+def _reset(monkeypatch, tmp_path):
+    # Per-test store: the index would otherwise warm from another run's lists.
+    monkeypatch.setenv("COLLECTION_EMBED_CACHE_PATH", str(tmp_path / "embeddings.sqlite3"))
     reset_collection_index_for_tests()
     yield
     reset_collection_index_for_tests()
@@ -0,0 +1,137 @@
+"""Unit tests for geoint.corridor_sampler (one COG read per corridor chunk).
+
+Synthetic 1°x1° GeoTIFF tiles stand in for ``cop-dem-glo-30`` items (local
+paths as hrefs, so no network). Every per-point window the engine returns
+is compared with the per-point ``_read_cog_window_sync`` read it replaced.
+
+Coverage focus:
+  * identical pixels for geographic and projected (UTM) rasters, nodata
+    as NaN, points near / off the tile edge
+  * points grouped by covering item, reads packed into bounded chunks
+  * the elevation transect and corridor waypoints keep their output shape
+    while hundreds of samples cost a handful of reads
+"""
+
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+import rasterio
+from rasterio.transform import from_origin
+
+from geoint import corridor_sampler, mobility_tools
+
+_PX = 1200
+_RES = 1.0 / _PX
+
+
+def _write_tile(path, west, north, *, crs="EPSG:4326", res=_RES, nodata=-9999.0, seed=0):
+    rng = np.random.default_rng(seed)
+    rows, cols = np.mgrid[0:_PX, 0:_PX]
+    data = (300 + 50 * np.sin(rows / 40.0) + 30 * np.cos(cols / 25.0) + rng.normal(0, 2, (_PX, _PX))).astype("float32")
+    data[100:110, 100:110] = nodata
+    with rasterio.open(
+        path, "w", driver="GTiff", height=_PX, width=_PX, count=1, dtype="float32", crs=crs,
+        transform=from_origin(west, north, res, res), tiled=True, blockxsize=256, blockysize=256,
+        compress="deflate", nodata=nodata,
+    ) as dst:
+        dst.write(data, 1)
+    return str(path)
+
+
+def _item(href, bbox):
+    return SimpleNamespace(id=href, bbox=list(bbox), assets={"data": SimpleNamespace(href=href)})
+
+
+def _line(lat1, lon1, lat2, lon2, n):
+    return [(lat1 + f * (lat2 - lat1), lon1 + f * (lon2 - lon1)) for f in np.linspace(0, 1, n)]
+
+
+def _assert_same(got, expected):
+    if expected is None:  # box hangs off the tile: the per-point read failed, the engine clips
+        assert got is None or got.size > 0
+    else:
+        np.testing.assert_array_equal(got, expected)
+
+
+@pytest.fixture
+def tiles(tmp_path):
+    a = _write_tile(tmp_path / "a.tif", -98.0, 31.0, seed=1)
+    b = _write_tile(tmp_path / "b.tif", -97.0, 31.0, seed=2)
+    return [_item(a, (-98.0, 30.0, -97.0, 31.0)), _item(b, (-97.0, 30.0, -96.0, 31.0))]
+
+
+@pytest.fixture
+def sampler(monkeypatch):
+    s = corridor_sampler.CorridorSampler(max_window_px=512)
+    monkeypatch.setattr(corridor_sampler, "_sampler", s)
+    return s
+
+
+def test_pixels_match_per_point_reads(tiles, sampler):
+    points = _line(30.2, -97.9, 30.9, -96.1, 60) + [(30.004, -97.5), (30.5, -97.0)]
+    pick = lambda lat, lon: mobility_tools._items_covering_point(tiles, lat, lon)  # noqa: E731
+    got = sampler.sample(points, pick, "data", 0.5)
+    for (lat, lon), px in zip(points, got):
+        href = pick(lat, lon)[0].assets["data"].href
+        _assert_same(px, mobility_tools._read_cog_window_sync(href, mobility_tools._calculate_bbox(lat, lon, 0.5)))
+    assert sampler.stats()["items"] == 2
+    assert sampler.stats()["reads"] < 10
+
+
+def test_nodata_and_off_raster_points(tiles, sampler):
+    href = tiles[0].assets["data"].href
+    lat, lon = 31.0 - 105 * _RES, -98.0 + 105 * _RES  # centred on the nodata block
+    near, off = sampler.sample_item(href, [(lat, lon), (35.0, -90.0)], 0.1)
+    assert np.isnan(near).all()
+    assert off is None
+
+
+def test_projected_raster_matches_per_point_reads(tmp_path, sampler):
+    href = _write_tile(tmp_path / "u.tif", 560000.0, 3430000.0, crs="EPSG:32614", res=30.0)
+    points = _line(30.7, -98.3, 30.85, -98.05, 25)
+    got = sampler.sample_item(href, points, 0.5)
+    for (lat, lon), px in zip(points, got):
+        _assert_same(px, mobility_tools._read_cog_window_sync(href, mobility_tools._calculate_bbox(lat, lon, 0.5)))
+
+
+def test_chunks_bounded_and_in_order():
+    box = lambda r0, c0, r1, c1: (np.arange(r0, r1), np.arange(c0, c1))  # noqa: E731
+    indices = [box(0, 0, 10, 10), box(5, 5, 20, 20), None, box(400, 400, 420, 420), box(410, 410, 430, 430)]
+    chunks = corridor_sampler.plan_chunks(indices, max_px=100)
+    assert chunks == [([0, 1], (0, 0, 20, 20)), ([3, 4], (400, 400, 430, 430))]
+    assert corridor_sampler.plan_chunks([box(0, 0, 300, 300)], 100) == [([0], (0, 0, 300, 300))]
+
+
+def test_dense_transect_costs_a_few_reads(tiles, sampler):
+    transect = mobility_tools._build_elevation_transect(30.2, -97.9, 30.9, -96.1, 300, tiles)
+    assert len(transect["profile"]) == 300
+    assert all(p["elevation_m"] is not None for p in transect["profile"])
+    assert sampler.stats() == {"points": 300, "items": 2, "reads": sampler.stats()["reads"]}
+    assert sampler.stats()["reads"] <= 12
+
+    # same medians as the per-point reads for a sparse transect
+    sparse = mobility_tools._build_elevation_transect(30.2, -97.9, 30.9, -96.1, 10, tiles)
+    for p, (lat, lon) in zip(sparse["profile"], _line(30.2, -97.9, 30.9, -96.1, 10)):
+        href = mobility_tools._items_covering_point(tiles, lat, lon)[0].assets["data"].href
+        px = mobility_tools._read_cog_window_sync(href, mobility_tools._calculate_bbox(lat, lon, 0.5))
+        assert p["elevation_m"] == round(float(np.nanmedian(px)), 1)
+
+
+def test_corridor_waypoints_share_reads(tiles, sampler, monkeypatch):
+    lc = [_item(it.assets["data"].href, it.bbox) for it in tiles]
+    for it in lc:
+        it.assets["map"] = it.assets.pop("data")
+    monkeypatch.setattr(mobility_tools, "_analyze_landcover_pixels", lambda px: {"status": "GO", "metrics": {"n": px.size}})
+
+    points = _line(30.3, -97.8, 30.6, -97.2, 5)
+    results = mobility_tools._sample_corridor_points(points, {"cop-dem-glo-30": tiles, "esa-worldcover": lc})
+    assert [(r["latitude"], r["longitude"]) for r in results] == points
+    assert all("elevation" in r["data"] and r["data"]["landcover"]["n"] > 0 for r in results)
+    # the waypoints span ~720 px: two 512 px chunks per collection instead of five reads each
+    assert sampler.stats()["reads"] == 4
+
+    single = mobility_tools._sample_corridor_point(*points[0], {"cop-dem-glo-30": tiles, "esa-worldcover": lc})
+    assert single == results[0]
@@ -0,0 +1,182 @@
+"""Unit tests for geoint.dem_tiles (shared DEM windows + terrain kernel).
+
+The STAC search and COG read are replaced by a synthetic 1°x1° DEM tile
+(subclass overriding ``_search_grid`` / ``_read_window``), so no network.
+The real overrides are checked against a fake :mod:`cog_reader`.
+
+Coverage focus:
+  * the single-pass kernel matches the per-tool formulas it replaced
+  * elevation / slope / aspect / flat-area tools share one search + read
+  * a smaller radius is a crop of a cached superset window; a larger
+    radius reads once and supersedes the contained windows
+  * error paths (no item, area too small) keep the tools' JSON contract
+  * cached grids keep the unsigned href (signed again at read time)
+  * header and window reads go through ``cog_reader``, not rasterio
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from geoint import dem_tiles, terrain_tools
+
+_TILE_PX = 3600
+_RES = 1.0 / _TILE_PX
+
+
+def _synthetic_dem() -> np.ndarray:
+    rows, cols = np.mgrid[0:_TILE_PX, 0:_TILE_PX]
+    return (200 + 40 * np.sin(rows / 90.0) + 25 * np.cos(cols / 60.0) + (rows // 7) % 3).astype(np.float32)
+
+
+_DEM = _synthetic_dem()
+
+
+class _FakeDemService(dem_tiles.DemTileService):
+    def __init__(self, *, covered=True, **kw):
+        super().__init__(**kw)
+        self.covered = covered
+        self.read_windows = []
+
+    async def _search_grid(self, bbox):
+        if not self.covered:
+            return None
+        return dem_tiles.DemGrid(
+            item_id="Copernicus_DSM_N30_W098",
+            href="memory://dem",
+            bbox=(-98.0, 30.0, -97.0, 31.0),
+            a=_RES, c=-98.0, e=-_RES, f=31.0,
+            width=_TILE_PX, height=_TILE_PX, nodata=-32767.0,
+        )
+
+    async def _read_window(self, grid, window):
+        self.read_windows.append(window)
+        r0, c0, r1, c1 = window
+        return _DEM[r0:r1, c0:c1].copy()
+
+
+@pytest.fixture
+def service(monkeypatch):
+    svc = _FakeDemService()
+    monkeypatch.setattr(dem_tiles, "_service", svc)
+    return svc
+
+
+def test_kernel_matches_original_tool_formulas():
+    elev = _DEM[100:400, 200:500]
+    cell_m = _RES * 111320 * np.cos(np.radians(30.5))
+    m = dem_tiles.compute_terrain_metrics(elev, nodata=None, cell_size_m=cell_m)
+
+    dy, dx = np.gradient(elev.astype(float), cell_m)
+    slope = np.degrees(np.arctan(np.sqrt(dx**2 + dy**2)))
+    aspect = np.degrees(np.arctan2(-dx, dy))
+    aspect = np.where(aspect < 0, aspect + 360, aspect)
+    want_dirs = {
+        "N": int(((aspect >= 337.5) | (aspect < 22.5)).sum()),
+        "NE": int(((aspect >= 22.5) & (aspect < 67.5)).sum()),
+        "E": int(((aspect >= 67.5) & (aspect < 112.5)).sum()),
+        "SE": int(((aspect >= 112.5) & (aspect < 157.5)).sum()),
+        "S": int(((aspect >= 157.5) & (aspect < 202.5)).sum()),
+        "SW": int(((aspect >= 202.5) & (aspect < 247.5)).sum()),
+        "W": int(((aspect >= 247.5) & (aspect < 292.5)).sum()),
+        "NW": int(((aspect >= 292.5) & (aspect < 337.5)).sum()),
+    }
+    assert m.aspect_counts == want_dirs
+    np.testing.assert_allclose(m.slope_deg, slope, rtol=1e-12)
+    assert m.percent_where(m.flat_mask(5.0)) == pytest.approx(float(np.sum(slope < 5) / slope.size * 100))
+    assert m.elevation == pytest.approx({"min": float(elev.min()), "max": float(elev.max()), "mean": float(elev.mean())})
+
+
+def test_terrain_tools_share_one_search_and_read(service):
+    out = [
+        json.loads(asyncio.run(terrain_tools.get_elevation_analysis(30.5, -97.5, 5.0))),
+        json.loads(asyncio.run(terrain_tools.get_slope_analysis(30.5, -97.5, 5.0))),
+        json.loads(asyncio.run(terrain_tools.get_aspect_analysis(30.5, -97.5, 5.0))),
+        json.loads(asyncio.run(terrain_tools.find_flat_areas(30.5, -97.5, 5.0, max_slope_degrees=3.0))),
+    ]
+    assert all("error" not in o for o in out), out
+    stats = service.stats()
+    assert (stats["searches"], stats["reads"]) == (1, 1)
+    assert stats["metric_hits"] == 3
+    assert out[0]["terrain_type"] in {"flat plains", "gently rolling hills"}
+    assert sum(out[2]["direction_distribution_percent"].values()) == pytest.approx(100.0, abs=0.5)
+    assert out[3]["slope_threshold_degrees"] == 3.0
+
+
+def test_smaller_radius_is_a_crop_and_larger_supersedes(service):
+    asyncio.run(terrain_tools.get_slope_analysis(30.5, -97.5, 5.0))
+    asyncio.run(terrain_tools.get_slope_analysis(30.5, -97.5, 2.0))
+    asyncio.run(terrain_tools.get_elevation_analysis(30.51, -97.49, 1.0))  # overlapping, inside the 5 km read
+    assert len(service.read_windows) == 1
+    assert service.stats()["window_hits"] == 2
+
+    asyncio.run(terrain_tools.get_slope_analysis(30.5, -97.5, 8.0))
+    assert len(service.read_windows) == 2
+    assert service.stats()["windows"] == 1  # the 5 km window was contained, so dropped
+
+    grid = asyncio.run(service._search_grid(None))
+    small = grid.pixel_window(terrain_tools._calculate_bbox(30.5, -97.5, 2.0))
+    _, _, crop = asyncio.run(service.read(terrain_tools._calculate_bbox(30.5, -97.5, 2.0)))
+    np.testing.assert_array_equal(crop, _DEM[small[0]:small[2], small[1]:small[3]])
+
+
+def test_byte_budget_evicts_lru_windows(monkeypatch):
+    svc = _FakeDemService(max_bytes=1)
+    asyncio.run(svc.read(terrain_tools._calculate_bbox(30.2, -97.8, 1.0)))
+    asyncio.run(svc.read(terrain_tools._calculate_bbox(30.8, -97.2, 1.0)))
+    assert svc.stats()["windows"] == 1
+
+
+def test_error_contracts(monkeypatch):
+    monkeypatch.setattr(dem_tiles, "_service", _FakeDemService(covered=False))
+    assert json.loads(asyncio.run(terrain_tools.get_elevation_analysis(0.0, 0.0))) == {"error": "No DEM data available for this location"}
+    assert json.loads(asyncio.run(terrain_tools.get_slope_analysis(0.0, 0.0))) == {"error": "No DEM data available"}
+
+    monkeypatch.setattr(dem_tiles, "_service", _FakeDemService())
+    # pixel-centred point, radius well under one 30 m cell
+    tiny = json.loads(asyncio.run(terrain_tools.find_flat_areas(30.5 - _RES / 2, -97.5 + _RES / 2, radius_km=0.001)))
+    assert tiny == {"error": "Area too small for DEM analysis"}
+
+
+def test_cached_grid_href_is_unsigned():
+    blob = "https://ai4edatasetspublicassets.blob.core.windows.net/cop-dem/tile.tif"
+    assert dem_tiles._unsigned(blob + "?st=2026-01-01&se=2026-01-02&sp=rl&sig=abc") == blob
+    assert dem_tiles._unsigned(blob + "?version=2") == blob + "?version=2"
+
+
+def test_reads_go_through_cog_reader(monkeypatch):
+    import cog_reader
+    import sas_signer
+
+    blob = "https://ai4edatasetspublicassets.blob.core.windows.net/cop-dem/tile.tif"
+    item = SimpleNamespace(
+        id="Copernicus_DSM_N30_W098", bbox=None,
+        assets={"data": SimpleNamespace(href=blob + "?st=old&se=old&sp=rl&sig=old")},
+    )
+    header = SimpleNamespace(transform=(_RES, 0.0, -98.0, 0.0, -_RES, 31.0), width=_TILE_PX, height=_TILE_PX, nodata=-32767.0)
+    calls = []
+
+    class _Reader:
+        async def header(self, href):
+            calls.append(("header", href))
+            return header
+
+        async def read_window(self, href, window):
+            calls.append(("read", href, window))
+            r0, c0, r1, c1 = window
+            return _DEM[r0:r1, c0:c1].copy()
+
+    monkeypatch.setattr(terrain_tools, "_search_items", lambda collection, bbox: [item])
+    monkeypatch.setattr(sas_signer, "sign_url", lambda href: href + "?sig=fresh")
+    monkeypatch.setattr(cog_reader, "get_cog_reader", lambda: _Reader())
+
+    svc = dem_tiles.DemTileService()
+    grid, window, data = asyncio.run(svc.read(terrain_tools._calculate_bbox(30.5, -97.5, 2.0)))
+    assert grid.href == blob and grid.bbox == pytest.approx((-98.0, 30.0, -97.0, 31.0))
+    assert calls == [("header", blob + "?sig=fresh"), ("read", blob + "?sig=fresh", window)]
+    np.testing.assert_array_equal(data, _DEM[window[0]:window[2], window[1]:window[3]])
@@ -0,0 +1,101 @@
+"""Unit tests for embedding_store (on-disk embedding cache).
+
+  - round-trip of float32 vectors and hit/miss counters
+  - row cap prunes least-recently-used vectors first
+  - an unusable path degrades to misses instead of raising
+"""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+import embedding_store as es
+
+
+def test_round_trip_and_counters(tmp_path):
+    store = es.EmbeddingStore(str(tmp_path / "e.sqlite3"))
+    k1, k2 = es.embedding_key("dep", "a"), es.embedding_key("dep", "b")
+
+    async def go():
+        await store.put_many({k1: [0.5, -1.25, 3.0]})
+        return await store.get_many([k1, k2])
+
+    found = asyncio.run(go())
+    assert found == {k1: pytest.approx([0.5, -1.25, 3.0])}
+    assert store.stats()["entries"] == 1
+    assert (store.hits, store.misses, store.writes) == (1, 1, 1)
+    assert es.embedding_key("dep", "a") != es.embedding_key("dep2", "a")
+
+
+def test_row_cap_prunes_least_recently_used(tmp_path, monkeypatch):
+    store = es.EmbeddingStore(str(tmp_path / "e.sqlite3"), max_rows=2)
+    clock = iter(range(100))
+    monkeypatch.setattr(es.time, "time", lambda: float(next(clock)))
+
+    async def go():
+        await store.put_many({"a": [1.0]})
+        await store.put_many({"b": [2.0]})
+        await store.get_many(["a"])  # touch a
+        await store.put_many({"c": [3.0]})  # evicts b
+        return await store.get_many(["a", "b", "c"])
+
+    assert set(asyncio.run(go())) == {"a", "c"}
+
+
+def test_unwritable_path_degrades_to_misses(tmp_path):
+    blocker = tmp_path / "file"
+    blocker.write_text("not a directory")
+    store = es.EmbeddingStore(str(blocker / "e.sqlite3"))
+
+    async def go():
+        await store.put_many({"a": [1.0]})
+        return await store.get_many(["a"])
+
+    assert asyncio.run(go()) == {}
+    assert store.errors == 2
+
+
+def test_query_cache_ttl_lru_and_failures_not_cached():
+    now = [0.0]
+    cache = es.QueryEmbeddingCache(max_entries=2, ttl_s=10.0, clock=lambda: now[0])
+    calls: list = []
+
+    async def embed(text):
+        calls.append(text)
+        return None if text == "fail" else [float(len(text))]
+
+    async def go():
+        await cache.get_or_embed("d", "a", embed)
+        await cache.get_or_embed("d", "A ", embed)  # normalized hit
+        await cache.get_or_embed("d2", "a", embed)  # other deployment
+        await cache.get_or_embed("d", "bb", embed)  # evicts ("d", "a")
+        await cache.get_or_embed("d", "fail", embed)
+        await cache.get_or_embed("d", "fail", embed)
+        now[0] = 11.0
+        await cache.get_or_embed("d", "bb", embed)  # expired
+
+    asyncio.run(go())
+    assert calls == ["a", "a", "bb", "fail", "fail", "bb"]
+    assert cache.stats()["evictions"] >= 1
+
+
+def test_query_cache_waiter_cancellation_does_not_cancel_shared_call():
+    cache = es.QueryEmbeddingCache()
+    calls: list = []
+
+    async def slow(text):
+        calls.append(text)
+        await asyncio.sleep(0.02)
+        return [1.0]
+
+    async def go():
+        first = asyncio.create_task(cache.get_or_embed("d", "q", slow))
+        second = asyncio.create_task(cache.get_or_embed("d", "q", slow))
+        await asyncio.sleep(0)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(go()) == [1.0]
+    assert calls == ["q"]
@@ -0,0 +1,134 @@
+"""Unit tests for http_pool.
+
+Covers the lifecycle surface without touching the network:
+  - one session per upstream, reused across calls on the same loop
+  - transparent re-creation when the running loop changes
+  - connector limits / DNS cache come from the pool config
+  - pooled sessions never store upstream cookies
+  - shutdown closes aiohttp + httpx pools and empties the registry
+  - stats() shape used by /api/health
+"""
+
+from __future__ import annotations
+
+import asyncio
+
+import aiohttp
+import pytest
+
+import http_pool
+
+
+@pytest.fixture(autouse=True)
+def _clean_registry():
+    http_pool._aiohttp_pools.clear()
+    http_pool._httpx_pools.clear()
+    yield
+    http_pool._aiohttp_pools.clear()
+    http_pool._httpx_pools.clear()
+
+
+def test_get_session_reuses_one_session_per_upstream():
+    async def go():
+        a = http_pool.get_session(http_pool.POOL_PRO)
+        b = http_pool.get_session(http_pool.POOL_PRO)
+        c = http_pool.get_session(http_pool.POOL_STAC)
+        same, other = a is b, a is not c
+        await http_pool.shutdown()
+        return same, other
+
+    same, other = asyncio.run(go())
+    assert same
+    assert other
+
+
+def test_get_session_applies_pool_limits_and_dns_cache():
+    async def go():
+        sess = http_pool.get_session(http_pool.POOL_GEOCODER)
+        conn = sess.connector
+        out = (conn.limit, conn.limit_per_host, conn.use_dns_cache)
+        await http_pool.shutdown()
+        return out
+
+    limit, per_host, dns = asyncio.run(go())
+    cfg = http_pool._POOL_CONFIGS[http_pool.POOL_GEOCODER]
+    assert limit == cfg.limit
+    assert per_host == cfg.limit_per_host
+    assert dns is True
+
+
+def test_pooled_sessions_do_not_keep_cookies():
+    async def go():
+        jar = http_pool.get_session(http_pool.POOL_PRO).cookie_jar
+        jar.update_cookies({"session": "user-a"})
+        out = (isinstance(jar, aiohttp.DummyCookieJar), len(jar))
+        await http_pool.shutdown()
+        return out
+
+    assert asyncio.run(go()) == (True, 0)
+
+
+def test_session_is_recreated_on_a_new_event_loop():
+    async def grab():
+        return http_pool.get_session(http_pool.POOL_STAC)
+
+    first = asyncio.run(grab())
+
+    async def regrab():
+        second = http_pool.get_session(http_pool.POOL_STAC)
+        await first.close()
+        await http_pool.shutdown()
+        return second
+
+    second = asyncio.run(regrab())
+    assert first is not second
+
+
+def test_closed_session_is_recreated():
+    async def go():
+        first = http_pool.get_session(http_pool.POOL_PRO)
+        await first.close()
+        second = http_pool.get_session(http_pool.POOL_PRO)
+        await http_pool.shutdown()
+        return first, second
+
+    first, second = asyncio.run(go())
+    assert first is not second
+
+
+def test_unknown_pool_raises():
+    async def go():
+        http_pool.get_session("not-a-pool")
+
+    with pytest.raises(KeyError):
+        asyncio.run(go())
+
+
+def test_context_manager_does_not_close_pooled_session():
+    async def go():
+        async with http_pool.session(http_pool.POOL_PRO) as s:
+            pass
+        closed_after_block = s.closed
+        await http_pool.shutdown()
+        return closed_after_block, s.closed
+
+    after_block, after_shutdown = asyncio.run(go())
+    assert after_block is False
+    assert after_shutdown is True
+
+
+def test_startup_and_shutdown_lifecycle_and_stats():
+    async def go():
+        await http_pool.startup()
+        http_pool.get_httpx_client(http_pool.POOL_OPEN_METEO)
+        snapshot = http_pool.stats()
+        await http_pool.shutdown()
+        return snapshot, dict(http_pool._aiohttp_pools), dict(http_pool._httpx_pools)
+
+    snapshot, aio_left, httpx_left = asyncio.run(go())
+    for name in (http_pool.POOL_STAC, http_pool.POOL_PRO, http_pool.POOL_GEOCODER):
+        assert snapshot[name]["kind"] == "aiohttp"
+        assert snapshot[name]["in_use"] == 0
+    assert snapshot[f"{http_pool.POOL_OPEN_METEO}:httpx"]["kind"] == "httpx"
+    assert aio_left == {}
+    assert httpx_left == {}
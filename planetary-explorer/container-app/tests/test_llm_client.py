@@ -0,0 +1,189 @@
+"""Unit tests for the process-wide LLM gateway in _framework.llm_client.
+
+The SDK classes are replaced by a fake that counts client constructions
+and upstream calls, so no network:
+
+  * one pooled client per deployment (``get_llm_client`` / ``from_env``)
+  * temperature-0 prompts are cached exact-match; sampled prompts are not
+  * identical in-flight prompts share one upstream call (async and sync);
+    errors reach every waiter and are not cached
+  * per-deployment request / token / latency metrics; restricted models
+    still have sampling params stripped
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from _framework import llm_client
+
+
+class _FakeCompletions:
+    def __init__(self, owner):
+        self.owner = owner
+
+    def _respond(self, kwargs):
+        self.owner.calls.append(kwargs)
+        if self.owner.fail:
+            raise RuntimeError("upstream 500")
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=f"answer {len(self.owner.calls)}"))],
+            usage=SimpleNamespace(prompt_tokens=10, completion_tokens=5),
+        )
+
+
+class _AsyncCompletions(_FakeCompletions):
+    async def create(self, **kwargs):
+        await asyncio.sleep(self.owner.delay)
+        return self._respond(kwargs)
+
+
+class _SyncCompletions(_FakeCompletions):
+    def create(self, **kwargs):
+        time.sleep(self.owner.delay)
+        return self._respond(kwargs)
+
+
+class _FakeSdk:
+    """Stands in for both AsyncAzureOpenAI and AzureOpenAI."""
+
+    def __init__(self):
+        self.built = []
+        self.calls = []
+        self.delay = 0.0
+        self.fail = False
+
+    def async_cls(self, **kwargs):
+        self.built.append(("async", kwargs))
+        return SimpleNamespace(chat=SimpleNamespace(completions=_AsyncCompletions(self)))
+
+    def sync_cls(self, **kwargs):
+        self.built.append(("sync", kwargs))
+        return SimpleNamespace(chat=SimpleNamespace(completions=_SyncCompletions(self)))
+
+
+@pytest.fixture
+def sdk(monkeypatch):
+    fake = _FakeSdk()
+    monkeypatch.setattr(llm_client, "AsyncAzureOpenAI", fake.async_cls)
+    monkeypatch.setattr(llm_client, "AzureOpenAI", fake.sync_cls)
+    monkeypatch.setattr(llm_client, "_SDK_AVAILABLE", True)
+    monkeypatch.setattr(llm_client, "_clients", {})
+    monkeypatch.setattr(llm_client, "_metrics", {})
+    monkeypatch.setenv("AZURE_OPENAI_ENDPOINT", "https://example.openai.azure.com/")
+    monkeypatch.setenv("AZURE_OPENAI_API_KEY", "test-key")
+    monkeypatch.setenv("AZURE_OPENAI_DEPLOYMENT", "gpt-4o-mini")
+    monkeypatch.delenv("LLM_RESPONSE_CACHE", raising=False)
+    cache = llm_client._response_cache()
+    cache.clear()
+    yield fake
+    cache.clear()
+
+
+def _messages(text="hello"):
+    return [{"role": "user", "content": text}]
+
+
+def test_one_pooled_client_per_deployment(sdk):
+    a = llm_client.get_llm_client("gpt-4o-mini")
+    assert llm_client.get_llm_client("gpt-4o-mini") is a
+    assert llm_client.LlmClient.from_env() is a
+    assert llm_client.get_llm_client("gpt-5") is not a
+
+    async def calls():
+        for i in range(3):
+            await a.create(messages=_messages(str(i)), temperature=0.7)
+
+    asyncio.run(calls())
+    a.create_sync(messages=_messages(), temperature=0.7)
+    a.create_sync(messages=_messages("again"), temperature=0.7)
+    assert [kind for kind, _ in sdk.built] == ["async", "sync"]
+    assert sdk.built[0][1]["api_key"] == "test-key"
+
+
+def test_deterministic_prompts_are_cached(sdk):
+    llm = llm_client.get_llm_client()
+
+    async def run():
+        first = await llm.create(messages=_messages(), temperature=0, timeout=30)
+        again = await llm.create(messages=_messages(), temperature=0, timeout=60)  # transport option: same key
+        other = await llm.create(messages=_messages("other"), temperature=0)
+        sampled = [await llm.create(messages=_messages(), temperature=0.7) for _ in range(2)]
+        return first, again, other, sampled
+
+    first, again, other, sampled = asyncio.run(run())
+    assert again is first and other is not first
+    assert sampled[0] is not sampled[1]
+    assert llm.create_sync(messages=_messages(), temperature=0) is first  # shared with the sync path
+    assert len(sdk.calls) == 4
+
+    stats = llm_client.stats()["deployments"]["gpt-4o-mini"]
+    assert (stats["requests"], stats["cache_hits"], stats["upstream_calls"]) == (6, 2, 4)
+    assert (stats["prompt_tokens"], stats["completion_tokens"]) == (40, 20)
+    assert stats["latency_ms_p50"] is not None
+
+
+def test_identical_in_flight_prompts_coalesce(sdk):
+    llm = llm_client.get_llm_client()
+    sdk.delay = 0.05
+
+    async def run():
+        same = [llm.create(messages=_messages(), temperature=0.7) for _ in range(5)]
+        return await asyncio.gather(*same, llm.create(messages=_messages("different"), temperature=0.7))
+
+    results = asyncio.run(run())
+    assert len(sdk.calls) == 2 and all(r is results[0] for r in results[:5])
+
+    sdk.calls.clear()
+    misses = llm_client._response_cache().stats()["misses"]
+    out = []
+    threads = [threading.Thread(target=lambda: out.append(llm.create_sync(messages=_messages("t"), temperature=0.7))) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(sdk.calls) == 1 and len(out) == 4
+    assert llm_client.stats()["deployments"]["gpt-4o-mini"]["coalesced"] == 7
+    assert llm_client._response_cache().stats()["misses"] == misses  # sampled prompts never touch the cache
+
+
+def test_errors_reach_every_waiter_and_are_not_cached(sdk):
+    llm = llm_client.get_llm_client()
+    sdk.delay, sdk.fail = 0.02, True
+
+    async def run():
+        return await asyncio.gather(*[llm.create(messages=_messages(), temperature=0) for _ in range(3)], return_exceptions=True)
+
+    assert all(isinstance(r, RuntimeError) for r in asyncio.run(run()))
+    assert len(sdk.calls) == 1
+    sdk.fail = False
+    asyncio.run(llm.create(messages=_messages(), temperature=0))
+    assert len(sdk.calls) == 2
+    assert llm_client.stats()["deployments"]["gpt-4o-mini"]["errors"] == 1
+
+
+def test_restricted_models_strip_sampling_params_and_streams_bypass(sdk):
+    llm = llm_client.get_llm_client("gpt-5")
+
+    async def run():
+        await llm.chat(_messages(), temperature=0, top_p=0.5, max_tokens=10)
+        await llm.chat(_messages(), temperature=0, top_p=0.5, max_tokens=10)
+        await llm.create(messages=_messages(), temperature=0, stream=True)
+
+    asyncio.run(run())
+    assert "temperature" not in sdk.calls[0] and "top_p" not in sdk.calls[0]
+    assert sdk.calls[0]["model"] == "gpt-5" and sdk.calls[0]["max_tokens"] == 10
+    assert len(sdk.calls) == 2  # the repeat was cached (caller asked for temperature 0); the stream was not
+
+
+def test_cache_can_be_disabled(sdk, monkeypatch):
+    monkeypatch.setenv("LLM_RESPONSE_CACHE", "off")
+    llm = llm_client.get_llm_client()
+    for _ in range(2):
+        llm.create_sync(messages=_messages(), temperature=0)
+    assert len(sdk.calls) == 2
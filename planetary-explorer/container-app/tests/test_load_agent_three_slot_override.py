@@ -70,7 +70,7 @@ async def _run_with_mocked_llm(
     fake_choice.message.content = json.dumps(mocked_plan_dict)
     fake_response = MagicMock()
     fake_response.choices = [fake_choice]
-    fake_client.chat.completions.create = AsyncMock(return_value=fake_response)
+    fake_client.create = AsyncMock(return_value=fake_response)
     with patch.object(agent, "_get_client", return_value=fake_client), patch(
         "agents.load_agent.load_agent._fetch_catalog_candidates",
         new=AsyncMock(return_value=[]),
@@ -0,0 +1,204 @@
+"""Unit tests for mosaic_registry (shared mosaic search-id registry).
+
+Registration is a counting async stub (or a fake pooled httpx client for
+the public PC path), so no network:
+
+  * bbox snapping: nearby views share one grid-aligned bbox
+  * concurrent identical registrations share one upstream call;
+    failures are not stored
+  * a second "replica" on the same SQLite file / Redis stand-in reuses
+    the search id; an unreachable Redis falls back to the memory store
+  * refresh-ahead re-registers in the background near expiry
+  * ``register_mosaic_search`` and ``register_pro_mosaic_search`` go
+    through the registry
+"""
+
+from __future__ import annotations
+
+import asyncio
+import fnmatch
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import hybrid_rendering_system as hrs
+import mosaic_registry
+import pro_mosaic
+from mosaic_registry import MosaicRegistry, snap_bbox
+from pipeline import session_store as ss
+
+
+class _FakeRedis:
+    """Minimal stand-in for ``redis.Redis``: get / set(ex=) / delete / scan_iter."""
+
+    def __init__(self) -> None:
+        self.data: dict = {}
+
+    def get(self, key):
+        entry = self.data.get(key)
+        if entry and entry[1] < time.time():
+            del self.data[key]
+            return None
+        return entry[0] if entry else None
+
+    def set(self, key, value, ex=None):
+        self.data[key] = (value, time.time() + (ex or 1e9))
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+    def scan_iter(self, match="*"):
+        return [k.encode() for k in list(self.data) if fnmatch.fnmatch(k, match)]
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1_000.0
+
+    def __call__(self):
+        return self.now
+
+
+class _Register:
+    def __init__(self, delay=0.0):
+        self.calls = 0
+        self.delay = delay
+        self.fail = False
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return None if self.fail else {"search_id": f"sid-{self.calls}"}
+
+
+_PARAMS = {"collections": ["sentinel-2-l2a"], "bbox": [-123.0, 47.0, -122.0, 48.0], "datetime": None}
+
+
+def test_snap_bbox_groups_nearby_views():
+    a = snap_bbox([-122.46, 47.48, -122.22, 47.73])
+    b = snap_bbox([-122.44, 47.49, -122.20, 47.70])  # small pan
+    assert a == b == [-122.5, 47.25, -122.0, 47.75]
+    country = snap_bbox([-124.4, 32.5, -114.1, 42.0])  # ~10 deg -> 2 deg grid
+    assert country == [-126.0, 32.0, -114.0, 42.0]
+    assert snap_bbox([170.0, -10.0, -170.0, 10.0]) == [170.0, -10.0, -170.0, 10.0]  # antimeridian
+    assert snap_bbox([-180.0, -90.0, 180.0, 90.0]) == [-180.0, -90.0, 180.0, 90.0]
+    assert snap_bbox([1.01, 2.02, 1.03, 2.04], base_deg=0) == [1.01, 2.02, 1.03, 2.04]
+
+
+def test_concurrent_identical_registrations_coalesce():
+    registry = MosaicRegistry(ss.MemorySessionBackend())
+    register = _Register(delay=0.02)
+
+    async def run():
+        return await asyncio.gather(*[registry.get_or_register("public", _PARAMS, register) for _ in range(5)])
+
+    results = asyncio.run(run())
+    assert register.calls == 1 and {r["search_id"] for r in results} == {"sid-1"}
+    assert asyncio.run(registry.get_or_register("public", _PARAMS, register))["search_id"] == "sid-1"
+    assert asyncio.run(registry.get_or_register("pro", _PARAMS, register))["search_id"] == "sid-2"  # catalogs separate
+    stats = registry.stats()
+    assert (stats["misses"], stats["coalesced"], stats["hits"], stats["registrations"]) == (2, 4, 1, 2)
+
+
+def test_failures_are_not_stored():
+    registry = MosaicRegistry(ss.MemorySessionBackend())
+    register = _Register()
+    register.fail = True
+    assert asyncio.run(registry.get_or_register("public", _PARAMS, register)) is None
+    register.fail = False
+    assert asyncio.run(registry.get_or_register("public", _PARAMS, register))["search_id"] == "sid-2"
+    assert registry.stats()["failures"] == 1
+
+
+@pytest.mark.parametrize("kind", ["sqlite", "redis"])
+def test_replicas_share_registrations(kind, tmp_path):
+    if kind == "sqlite":
+        path = str(tmp_path / "mosaic.sqlite3")
+        replica_a, replica_b = ss.SQLiteSessionBackend(path), ss.SQLiteSessionBackend(path)
+    else:
+        server = _FakeRedis()
+        replica_a, replica_b = (ss.RedisSessionBackend(server, prefix="test:mosaic:") for _ in range(2))
+    register = _Register()
+    first = asyncio.run(MosaicRegistry(replica_a).get_or_register("public", _PARAMS, register))
+    again = asyncio.run(MosaicRegistry(replica_b).get_or_register("public", _PARAMS, register))
+    assert register.calls == 1 and again["search_id"] == first["search_id"]
+
+
+def test_refresh_ahead_and_expiry():
+    clock = _Clock()
+    registry = MosaicRegistry(ss.MemorySessionBackend(), ttl_s=600, refresh_ahead_s=120, clock=clock)
+    register = _Register()
+
+    async def run():
+        await registry.get_or_register("public", _PARAMS, register, ttl_s=400)
+        clock.now += 250  # outside the refresh window (min(120, 400 / 4) = 100s)
+        assert (await registry.get_or_register("public", _PARAMS, register))["search_id"] == "sid-1"
+        assert register.calls == 1
+        clock.now += 60  # inside it: current id served, re-registered in the background
+        assert (await registry.get_or_register("public", _PARAMS, register))["search_id"] == "sid-1"
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        assert register.calls == 2
+        clock.now += 99
+        assert (await registry.get_or_register("public", _PARAMS, register))["search_id"] == "sid-2"
+
+    asyncio.run(run())
+    assert registry.stats()["refreshes"] == 1
+
+
+class _FakeHttpx:
+    def __init__(self):
+        self.posts = []
+
+    async def post(self, url, json=None, headers=None, timeout=None):
+        self.posts.append(json)
+        await asyncio.sleep(0.01)
+        return SimpleNamespace(status_code=200, text="", json=lambda: {"searchid": "pc-search"})
+
+
+def test_register_mosaic_search_uses_registry_and_pooled_client(monkeypatch):
+    import http_pool
+
+    client = _FakeHttpx()
+    monkeypatch.setattr(http_pool, "get_httpx_client", lambda name: client)
+    monkeypatch.setattr(mosaic_registry, "_registry", MosaicRegistry(ss.MemorySessionBackend()))
+
+    async def run():
+        views = [[-122.46, 47.48, -122.22, 47.73], [-122.44, 47.49, -122.20, 47.70]] * 2
+        return await asyncio.gather(*[hrs.register_mosaic_search(["hls2-l30"], v, "2025-06-01/2025-06-30") for v in views])
+
+    assert asyncio.run(run()) == ["pc-search"] * 4
+    assert len(client.posts) == 1
+    polygon = client.posts[0]["filter"]["args"][0]["args"][1]["coordinates"][0]
+    assert polygon[0] == [-122.5, 47.25]  # registered with the snapped bbox
+
+
+def test_pro_registration_goes_through_registry(monkeypatch):
+    monkeypatch.setattr(mosaic_registry, "_registry", MosaicRegistry(ss.MemorySessionBackend()))
+    monkeypatch.setattr(pro_mosaic, "get_pro_data_base", lambda: "https://geocatalog.example/data")
+    monkeypatch.setattr(pro_mosaic, "_register_path_unavailable", False)
+    calls = []
+
+    async def fake_register(base, collections, bbox, *rest):
+        calls.append(bbox)
+        return {"search_id": "pro-search", "register_path": "searches/register"}
+
+    monkeypatch.setattr(pro_mosaic, "_register", fake_register)
+
+    async def run():
+        return [
+            await pro_mosaic.register_pro_mosaic_search(["naip"], bbox=[-122.46, 47.48, -122.22, 47.73])
+            for _ in range(2)
+        ]
+
+    assert asyncio.run(run()) == [("pro-search", "searches/register")] * 2
+    assert calls == [[-122.5, 47.25, -122.0, 47.75]]
+
+
+def test_unreachable_redis_falls_back_to_memory(monkeypatch):
+    pytest.importorskip("redis")
+    monkeypatch.setenv("MOSAIC_REGISTRY_BACKEND", "redis")
+    monkeypatch.setenv("MOSAIC_REGISTRY_REDIS_URL", "redis://127.0.0.1:1/0")  # nothing listens here
+    monkeypatch.setattr(mosaic_registry, "_registry", None)
+    assert mosaic_registry.get_mosaic_registry()._backend.name == "memory"
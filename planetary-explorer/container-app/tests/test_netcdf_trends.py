@@ -0,0 +1,148 @@
+"""Unit tests for the multi-year path of geoint.netcdf_computation_tools.
+
+``_annual_mean`` (one STAC search + ``_sample_netcdf`` per year) is
+replaced by a synthetic per-year series, so no network.
+
+Coverage focus:
+  * ``_trend_statistics`` agrees with scipy (linregress, theilslopes) and
+    is vectorized over several series
+  * missing years are fetched with bounded parallelism; annual means are
+    memoized per grid cell so overlapping ranges reuse years
+  * compute_trend / compute_anomaly output (CI, Sen's slope, anomalies,
+    display-unit deltas), JSON-safe for two-year trends
+  * concurrent identical tool calls share one computation
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+from scipy import stats
+
+import raster_pool
+from geoint import netcdf_computation_tools as nct
+
+
+@pytest.fixture
+def annual(monkeypatch):
+    """Fake per-year annual means: 290 K + 0.03 K/yr with a wobble; records calls and concurrency."""
+    state = {"calls": [], "now": 0, "peak": 0}
+    lock = threading.Lock()
+
+    def fake(latitude, longitude, variable, scenario, year):
+        with lock:
+            state["calls"].append(year)
+            state["now"] += 1
+            state["peak"] = max(state["peak"], state["now"])
+        time.sleep(0.005)
+        with lock:
+            state["now"] -= 1
+        if year == 2041:
+            return {"error": "No data for 2041"}
+        return {"value": 290.0 + 0.03 * (year - 2020) + 0.2 * np.sin(year), "model": "ACCESS-CM2"}
+
+    monkeypatch.setattr(nct, "_annual_mean", fake)
+    nct._annual_mean_memo.clear()
+    nct._tool_results.clear()
+    monkeypatch.setattr(nct, "_YEAR_PARALLELISM", 3)
+    monkeypatch.setattr(raster_pool, "_pool", raster_pool.RasterPool(max_workers=6))
+    yield state
+    raster_pool.shutdown()
+
+
+def test_trend_statistics_match_scipy():
+    rng = np.random.default_rng(7)
+    years = np.arange(2020, 2051, dtype=float)
+    series = np.stack([0.04 * years + rng.normal(0, 0.3, years.size), -0.01 * years + rng.normal(0, 0.1, years.size)], axis=1)
+
+    fit = nct._trend_statistics(years, series)
+    for k in range(series.shape[1]):
+        ref = stats.linregress(years, series[:, k])
+        assert fit["slope"][k] == pytest.approx(ref.slope)
+        assert fit["r_squared"][k] == pytest.approx(ref.rvalue ** 2)
+        assert fit["p_value"][k] == pytest.approx(ref.pvalue)
+        half = stats.t.ppf(0.975, years.size - 2) * ref.stderr
+        assert (fit["slope_lo"][k], fit["slope_hi"][k]) == pytest.approx((ref.slope - half, ref.slope + half))
+
+        sen = stats.theilslopes(series[:, k], years, alpha=0.95)
+        assert fit["sens_slope"][k] == pytest.approx(sen.slope)
+        assert (fit["sens_lo"][k], fit["sens_hi"][k]) == pytest.approx((sen.low_slope, sen.high_slope))
+        tau = stats.kendalltau(years, series[:, k]).statistic
+        assert fit["mk_s"][k] == pytest.approx(tau * years.size * (years.size - 1) / 2)
+        assert fit["mk_p_value"][k] < 1e-3
+
+    single = nct._trend_statistics(years, series[:, 0])
+    assert single["slope"].shape == (1,) and single["slope"][0] == pytest.approx(fit["slope"][0])
+
+    two = nct._trend_statistics(np.array([2020.0, 2050.0]), np.array([1.0, 4.0]))
+    assert two["slope"][0] == pytest.approx(0.1) and np.isnan(two["p_value"][0]) and np.isnan(two["sens_lo"][0])
+
+
+def test_years_fetched_with_bounded_parallelism_and_memoized(annual):
+    out = nct._annual_means(30.27, -97.74, "tas", "ssp585", list(range(2020, 2040)))
+    assert sorted(out) == list(range(2020, 2040)) and annual["peak"] <= 3
+    assert len(annual["calls"]) == 20
+
+    # overlapping range, a different point in the same 0.25° cell: only the new years are read
+    annual["calls"].clear()
+    out = nct._annual_means(30.30, -97.70, "tas", "ssp585", list(range(2030, 2045)))
+    assert annual["calls"] == [2040, 2041, 2042, 2043, 2044]
+    assert out[2041] == {"error": "No data for 2041"}
+
+    # failed years are not memoized, other cells / scenarios are separate
+    annual["calls"].clear()
+    nct._annual_means(30.30, -97.70, "tas", "ssp585", [2041])
+    nct._annual_means(30.30, -97.70, "tas", "ssp245", [2030])
+    nct._annual_means(31.0, -97.70, "tas", "ssp585", [2030])
+    assert annual["calls"] == [2041, 2030, 2030]
+
+
+def test_compute_trend_reads_every_year(annual):
+    result = json.loads(nct.compute_trend(30.27, -97.74, "tas", 2020, 2045))
+    trend = result["trend"]
+    assert result["years_requested"] == 26 and result["years_sampled"] == 25  # 2041 has no data
+    assert [p["year"] for p in result["data_points"]][:3] == [2020, 2021, 2022]
+    # 0.3 K/decade = 0.54 °F/decade
+    assert trend["slope_per_decade"] == pytest.approx(0.54, abs=0.1)
+    assert trend["slope_ci95_per_decade"][0] <= trend["slope_per_decade"] <= trend["slope_ci95_per_decade"][1]
+    assert trend["sens_slope_ci95_per_decade"][0] <= trend["sens_slope_per_decade"] <= trend["sens_slope_ci95_per_decade"][1]
+    assert trend["direction"] == "increasing" and trend["p_value"] < 0.001
+    assert result["data_points"][0]["anomaly"] == 0.0
+    assert result["data_points"][-1]["anomaly"] == pytest.approx(0.03 * 25 * 1.8, abs=0.8)
+
+    # the anomaly tool reuses the memoized years: no new reads
+    annual["calls"].clear()
+    anomaly = json.loads(nct.compute_anomaly(30.27, -97.74, "tas", 2020, 2045))
+    assert annual["calls"] == []
+    raw = (0.03 * 25 + 0.2 * (np.sin(2045) - np.sin(2020))) * 1.8
+    assert anomaly["change"]["absolute"] == pytest.approx(raw, abs=0.15)  # a delta, not an absolute °F
+
+
+def test_long_ranges_are_capped_and_two_year_trends_are_json_safe(annual):
+    years = nct._trend_years(2015, 2100)
+    assert len(years) == nct._TREND_MAX_YEARS and years[0] == 2015 and years[-1] == 2100
+
+    result = json.loads(nct.compute_trend(30.27, -97.74, "pr", 2020, 2021))
+    assert result["years_sampled"] == 2
+    assert result["trend"]["p_value"] is None and result["trend"]["sens_slope_ci95_per_decade"] == [None, None]
+
+
+def test_concurrent_identical_tool_calls_compute_once(annual, monkeypatch):
+    runs = []
+    real = nct._trend
+
+    def counted(*args):
+        runs.append(args)
+        time.sleep(0.05)
+        return real(*args)
+
+    monkeypatch.setattr(nct, "_trend", counted)
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        outs = list(pool.map(lambda _: nct.compute_trend(30.27, -97.74, "tas", 2020, 2030), range(4)))
+    assert len(runs) == 1 and len(set(outs)) == 1
+    assert nct._tool_results.stats()["coalesced"] >= 1
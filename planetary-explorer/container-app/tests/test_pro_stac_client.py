@@ -283,18 +283,9 @@ def test_get_pro_collection_ids_caches(monkeypatch):
 
     session = _CountingSession({"collections": [{"id": "naip-test"}]})
 
-    # Patch aiohttp.ClientSession context manager used internally so
-    # both calls share our counting session.
-    import aiohttp as _aiohttp
-
-    class _CtxSession:
-        async def __aenter__(self_inner):
-            return session
-
-        async def __aexit__(self_inner, *_):
-            return False
-
-    monkeypatch.setattr(_aiohttp, "ClientSession", lambda *a, **kw: _CtxSession())
+    # Patch the pooled-session lookup used internally so both calls
+    # share our counting session.
+    monkeypatch.setattr(psc.http_pool, "get_session", lambda name: session)
 
     async def go():
         a = await psc.get_pro_collection_ids()
@@ -0,0 +1,147 @@
+"""Unit tests for query_understanding_cache (learned per-agent query answers).
+
+A fake clock drives TTL and the date bucket; the translator's GPT agents
+are replaced by counting stubs, so no network:
+
+  * normalization, relative-date buckets roll over with the day
+  * TTL / write-through persistence / private copies / per-agent counters
+  * ``build_stac_query_agent`` learns the full-agent result and skips the
+    location / datetime / cloud agents on a repeat, but never learns a
+    query built while an agent fell back
+"""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import date, datetime
+
+import pytest
+
+import query_understanding_cache as quc
+import semantic_translator
+
+
+class _Clock:
+    def __init__(self):
+        self.now = datetime(2026, 3, 14, 12, 0).timestamp()
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return _Clock()
+
+
+def test_normalization_and_date_buckets():
+    assert quc.normalize_query("  Show   HLS imagery of Athens?! ") == "show hls imagery of athens"
+    today = date(2026, 3, 14)
+    assert quc.date_bucket("show sentinel-2 of seattle from last month", today) == "2026-03-14"
+    assert quc.date_bucket("recent fires in california", today) == "2026-03-14"
+    assert quc.date_bucket("show mtbs burn severity for california in 2017", today) == "abs"
+
+
+def test_relative_queries_expire_with_the_day(clock):
+    cache = quc.QueryUnderstandingCache(ttl_s=7 * 86400, clock=clock)
+    cache.put("stac", "Landsat of Austin last month", {"datetime": "2026-02-01/2026-02-28"})
+    cache.put("stac", "Landsat of Austin in 2020", {"datetime": "2020-01-01/2020-12-31"})
+    assert cache.get("stac", "landsat of austin last month") == {"datetime": "2026-02-01/2026-02-28"}
+
+    clock.now += 86400
+    assert cache.get("stac", "landsat of austin last month") is None
+    assert cache.get("stac", "landsat of austin in 2020") is not None
+    assert cache.get("intent", "landsat of austin in 2020") is None  # agents are separate
+
+    clock.now += 7 * 86400
+    assert cache.get("stac", "landsat of austin in 2020") is None  # TTL
+
+
+def test_values_are_private_copies_and_counted(clock):
+    cache = quc.QueryUnderstandingCache(clock=clock)
+    stac = {"collections": ["naip"], "bbox": [1, 2, 3, 4]}
+    cache.put("stac", "naip of paradise", stac, extra=["naip"])
+    stac["bbox"] = None
+    first = cache.get("stac", "naip of paradise", extra=["naip"])
+    first["bbox"] = [0, 0, 0, 0]  # pin override on the caller's copy
+    assert cache.get("stac", "naip of paradise", extra=["naip"])["bbox"] == [1, 2, 3, 4]
+    assert cache.get("stac", "naip of paradise", extra=["sentinel-2-l2a"]) is None
+
+    stats = cache.stats()
+    assert stats["by_agent"]["stac"] == {"hits": 2, "misses": 1, "stores": 1}
+    assert stats["hit_rate"] == pytest.approx(2 / 3, abs=1e-3) and stats["llm_calls_saved"] == 6
+
+
+def test_persistence_survives_a_restart(tmp_path, clock):
+    path = str(tmp_path / "queries.sqlite")
+    quc.QueryUnderstandingCache(sqlite_path=path, clock=clock).put("collections", "hls of houston", ["hls2-l30", "hls2-s30"])
+    restarted = quc.QueryUnderstandingCache(sqlite_path=path, clock=clock)
+    assert restarted.get("collections", "HLS of Houston") == ["hls2-l30", "hls2-s30"]
+    assert restarted.stats()["persistent"] is True
+    assert quc.QueryUnderstandingCache(sqlite_path=path, clock=clock).get("collections", "hls of houston")  # still on disk
+
+
+def test_disabled_by_env(monkeypatch):
+    monkeypatch.setenv("QUERY_UNDERSTANDING_CACHE", "off")
+    assert quc.get_query_understanding_cache() is None
+    assert quc.get_query_understanding_stats() == {"enabled": False}
+
+
+@pytest.fixture
+def translator(monkeypatch):
+    """A SemanticQueryTranslator with counting stubs for the three Agent 2 sub-agents."""
+    monkeypatch.setattr(quc, "_cache", quc.QueryUnderstandingCache())
+    monkeypatch.delenv("QUERY_UNDERSTANDING_CACHE", raising=False)
+    t = object.__new__(semantic_translator.SemanticQueryTranslator)
+    t._kernel_initialized, t.kernel, t.current_session_id = True, object(), "test"
+    t.calls = []
+    t.datetime_fails = False
+
+    async def ready():
+        return None
+
+    async def location(query):
+        t.calls.append("location")
+        return {"location": {"name": "Seattle", "type": "city", "confidence": 0.9}}
+
+    async def when(query, collections):
+        t.calls.append("datetime")
+        if t.datetime_fails:
+            semantic_translator._note_agent_fallback("datetime")
+            return None
+        return "2025-06-01/2025-06-30"
+
+    async def cloud(query, collections):
+        t.calls.append("cloud")
+        return None
+
+    async def geocode(name, kind="region"):
+        t.calls.append("geocode")
+        return [-122.46, 47.48, -122.22, 47.73]
+
+    t._ensure_kernel_initialized = ready
+    t.location_extraction_agent = location
+    t.datetime_translation_agent = when
+    t.cloud_filtering_agent = cloud
+    t.resolve_location_to_bbox = geocode
+    return t
+
+
+def test_build_stac_query_agent_learns_successful_queries(translator):
+    first = asyncio.run(translator.build_stac_query_agent("Sentinel-2 of Seattle June 2025", ["sentinel-2-l2a"]))
+    assert first["datetime"] == "2025-06-01/2025-06-30" and first["bbox"][0] == -122.46
+    assert sorted(translator.calls) == ["cloud", "datetime", "geocode", "location"]
+
+    translator.calls.clear()
+    again = asyncio.run(translator.build_stac_query_agent("sentinel-2 of seattle june 2025.", ["sentinel-2-l2a"]))
+    assert again == first and translator.calls == []
+    assert quc.get_query_understanding_stats()["by_agent"]["stac"]["hits"] == 1
+
+
+def test_degraded_agent_results_are_not_learned(translator):
+    translator.datetime_fails = True
+    asyncio.run(translator.build_stac_query_agent("Sentinel-2 of Seattle June 2025", ["sentinel-2-l2a"]))
+    translator.calls.clear()
+    asyncio.run(translator.build_stac_query_agent("Sentinel-2 of Seattle June 2025", ["sentinel-2-l2a"]))
+    assert "datetime" in translator.calls
+    assert quc.get_query_understanding_stats()["by_agent"]["stac"]["stores"] == 0
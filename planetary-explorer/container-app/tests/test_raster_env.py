@@ -0,0 +1,214 @@
+"""Unit tests for raster_env (GDAL profile + per-tool read instrumentation).
+
+Coverage focus:
+  * profiles are exported once, explicit environment variables win,
+    unknown names fall back to ``latency``
+  * ``raster_tool`` keeps name / docstring / signature / sync-vs-async and
+    reports one ``ReadStats`` per call to every hook
+  * ``bind`` carries the scope into plain executor threads
+  * cog_reader fetches and real GDAL ``/vsicurl/`` reads (local HTTP
+    server with Range support) are both attributed to the calling tool
+"""
+
+from __future__ import annotations
+
+import asyncio
+import inspect
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pytest
+
+import raster_env
+
+_KEYS = {k for options in raster_env.PROFILES.values() for k in options} | {
+    "CPL_DEBUG", "RASTER_ENV_PROFILE", "RASTER_IO_STATS",
+}
+
+
+@pytest.fixture(autouse=True)
+def fresh_profile(monkeypatch):
+    for key in _KEYS:
+        monkeypatch.delenv(key, raising=False)
+    monkeypatch.setattr(raster_env, "_applied", None)
+    monkeypatch.setattr(raster_env, "_totals", {})
+    loggers = [logging.getLogger(n) for n in raster_env._GDAL_LOGGERS]
+    saved = [(lg, list(lg.filters), lg.level) for lg in loggers]
+    yield
+    for lg, filters, level in saved:
+        lg.filters[:] = filters
+        lg.setLevel(level)
+
+
+@pytest.fixture
+def captured():
+    calls = []
+    raster_env.add_read_hook(calls.append)
+    yield calls
+    raster_env.remove_read_hook(calls.append)
+
+
+def test_profile_exported_once_and_explicit_env_wins(monkeypatch):
+    monkeypatch.setenv("GDAL_CACHEMAX", "64")
+    monkeypatch.setenv("RASTER_ENV_PROFILE", "throughput")
+    raster_env.apply_profile()
+    assert os.environ["GDAL_NUM_THREADS"] == "ALL_CPUS"
+    assert os.environ["GDAL_DISABLE_READDIR_ON_OPEN"] == "EMPTY_DIR"
+    assert os.environ["GDAL_CACHEMAX"] == "64"
+    assert "CPL_DEBUG" not in os.environ  # GDAL read counting is opt-in
+
+    raster_env.apply_profile("latency")  # already applied: no-op
+    assert raster_env.active_profile() == "throughput"
+    assert raster_env.stats()["profile"] == "throughput"
+
+
+def test_unknown_profile_falls_back_and_off_sets_nothing(monkeypatch):
+    raster_env.apply_profile("bogus")
+    assert raster_env.active_profile() == "latency"
+
+    monkeypatch.setattr(raster_env, "_applied", None)
+    monkeypatch.delenv("GDAL_CACHEMAX")
+    raster_env.apply_profile("off")
+    assert "GDAL_CACHEMAX" not in os.environ
+
+
+def test_raster_tool_keeps_tool_metadata_and_counts_per_call(captured):
+    @raster_env.raster_tool
+    def sync_tool(latitude: float, radius_km: float = 5.0) -> str:
+        """Sync tool.
+
+        :param latitude: Center latitude
+        """
+        raster_env.record_fetch(100)
+        raster_env.record_fetch(50)
+        return "ok"
+
+    @raster_env.raster_tool
+    async def async_tool(latitude: float) -> str:
+        """Async tool."""
+        raster_env.record_fetch(10, requests=2)
+        return "ok"
+
+    assert sync_tool.__name__ == "sync_tool" and "Center latitude" in sync_tool.__doc__
+    assert list(inspect.signature(sync_tool).parameters) == ["latitude", "radius_km"]
+    assert inspect.iscoroutinefunction(async_tool) and not inspect.iscoroutinefunction(sync_tool)
+
+    assert sync_tool(1.0) == "ok" and asyncio.run(async_tool(1.0)) == "ok"
+    assert [(s.tool, s.range_requests, s.bytes_fetched) for s in captured] == [
+        ("sync_tool", 2, 150), ("async_tool", 2, 10),
+    ]
+    raster_env.record_fetch(999)  # outside any scope: dropped
+    assert raster_env.stats()["tools"]["sync_tool"] == {"calls": 1, "range_requests": 2, "bytes_fetched": 150}
+
+
+def test_bind_carries_scope_into_executor_threads(captured):
+    @raster_env.raster_tool
+    def fan_out() -> None:
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            list(pool.map(lambda f: f(), [raster_env.bind(lambda: raster_env.record_fetch(7)) for _ in range(3)]))
+            pool.submit(raster_env.record_fetch, 1000).result()  # unbound: not attributed
+
+    fan_out()
+    assert (captured[0].range_requests, captured[0].bytes_fetched) == (3, 21)
+
+
+def test_cog_reader_fetches_are_attributed(tmp_path, captured):
+    import rasterio
+    from rasterio.transform import from_origin
+
+    import cog_reader
+
+    path = str(tmp_path / "a.tif")
+    with rasterio.open(
+        path, "w", driver="GTiff", height=128, width=128, count=1, dtype="uint8", crs="EPSG:4326",
+        transform=from_origin(0, 1, 0.01, 0.01), tiled=True, blockxsize=64, blockysize=64, compress="deflate",
+    ) as dst:
+        dst.write(np.ones((1, 128, 128), dtype="uint8"))
+
+    async def fetch(href, start, end):
+        with open(href, "rb") as f:
+            f.seek(start)
+            return f.read(end - start)
+
+    reader = cog_reader.CogReader(fetch_range=fetch)
+
+    @raster_env.raster_tool
+    async def tool():
+        return await reader.read_window(path, (0, 0, 128, 128))
+
+    asyncio.run(tool())
+    assert captured[0].range_requests == reader.stats()["range_requests"]
+    assert captured[0].bytes_fetched == reader.stats()["bytes_fetched"]
+
+
+class _RangeHandler(BaseHTTPRequestHandler):
+    body = b""
+
+    def log_message(self, *args):
+        pass
+
+    def _headers(self, code, length, extra=()):
+        self.send_response(code)
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("Content-Length", str(length))
+        for k, v in extra:
+            self.send_header(k, v)
+        self.end_headers()
+
+    def do_HEAD(self):
+        self._headers(200, len(self.body))
+
+    def do_GET(self):
+        rng = self.headers.get("Range", "")
+        if rng.startswith("bytes="):
+            start, end = rng[6:].split("-")
+            start, end = int(start), min(int(end or len(self.body) - 1), len(self.body) - 1)
+            chunk = self.body[start:end + 1]
+            self._headers(206, len(chunk), [("Content-Range", f"bytes {start}-{end}/{len(self.body)}")])
+            self.wfile.write(chunk)
+        else:
+            self._headers(200, len(self.body))
+            self.wfile.write(self.body)
+
+
+def test_gdal_vsicurl_reads_are_counted_and_not_logged(tmp_path, captured, caplog, monkeypatch):
+    import rasterio
+    from rasterio.transform import from_origin
+    from rasterio.windows import Window
+
+    path = tmp_path / "b.tif"
+    with rasterio.open(
+        path, "w", driver="GTiff", height=512, width=512, count=1, dtype="float32", crs="EPSG:4326",
+        transform=from_origin(0, 1, 0.001, 0.001), tiled=True, blockxsize=256, blockysize=256,
+        compress="deflate",
+    ) as dst:
+        dst.write(np.random.default_rng(3).random((1, 512, 512), dtype="float32"))
+    _RangeHandler.body = path.read_bytes()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _RangeHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/b.tif?n=1"
+
+    monkeypatch.setenv("RASTER_IO_STATS", "1")
+    raster_env.apply_profile("latency")
+    assert os.environ["CPL_DEBUG"] == "ON"
+
+    @raster_env.raster_tool
+    def read_tool():
+        with rasterio.open(url) as src:
+            return src.read(1, window=Window(0, 0, 512, 512))
+
+    try:
+        with caplog.at_level(logging.INFO):
+            data = read_tool()
+    finally:
+        server.shutdown()
+    assert data.shape == (512, 512)
+    stats = captured[0]
+    assert stats.range_requests >= 2  # header + tiles
+    assert len(_RangeHandler.body) * 0.9 < stats.bytes_fetched <= len(_RangeHandler.body) + 65536
+    assert not [r for r in caplog.records if "VSICURL" in r.getMessage()]
+    assert any("[RASTER] read_tool:" in r.getMessage() for r in caplog.records)
@@ -0,0 +1,180 @@
+"""Unit tests for raster_pool (shared bounded worker pool for geoint raster work).
+
+Coverage focus:
+  * never more than ``max_workers`` threads / concurrent tasks
+  * nested fan-out (tasks waiting on sub-tasks) completes on a tiny pool
+  * sessions are served round-robin under a fair-share quota
+  * cancelling a session drops its queue and refuses new work; the
+    request middleware cancels on client disconnect
+  * the submitter's context (raster_env read scope) follows the task
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from concurrent.futures import CancelledError
+
+import pytest
+
+import raster_env
+import raster_pool
+
+
+@pytest.fixture
+def pool():
+    p = raster_pool.RasterPool(max_workers=3, request_quota=8)
+    yield p
+    p.shutdown()
+
+
+class _Gauge:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.now = 0
+        self.peak = 0
+
+    def __call__(self, seconds=0.01):
+        with self.lock:
+            self.now += 1
+            self.peak = max(self.peak, self.now)
+        time.sleep(seconds)
+        with self.lock:
+            self.now -= 1
+
+
+def test_bounded_concurrency_and_metrics(pool):
+    gauge = _Gauge()
+    futures = [pool.submit(gauge) for _ in range(24)]
+    for f in futures:
+        f.result(timeout=5)
+    stats = pool.stats()
+    assert gauge.peak <= 3 and stats["threads"] <= 3
+    assert stats["submitted"] == stats["completed"] == 24
+    assert stats["max_queue_depth"] >= 20 and stats["queued"] == 0 and stats["busy"] == 0
+
+
+def test_nested_fan_out_does_not_deadlock(pool):
+    def leaf(i):
+        time.sleep(0.005)
+        return i
+
+    def middle(i):
+        return sum(f.result() for f in [pool.submit(leaf, i * 10 + j) for j in range(4)])
+
+    def outer():
+        futures = [pool.submit(middle, i) for i in range(4)]
+        return sum(f.result() for f in pool.as_completed(futures, timeout=5))
+
+    tops = [pool.submit(outer) for _ in range(3)]  # every worker busy waiting on sub-tasks
+    assert all(t.result(timeout=10) == sum(i * 10 + j for i in range(4) for j in range(4)) for t in tops)
+    assert pool.stats()["inline"] > 0 and pool.stats()["threads"] <= 3
+
+
+def test_sessions_get_fair_share(pool):
+    starts = []
+    lock = threading.Lock()
+
+    def task(tag):
+        with lock:
+            starts.append(tag)
+        time.sleep(0.02)
+
+    def request(name, n, delay):
+        time.sleep(delay)
+        with raster_pool.session_scope(name):
+            for f in [pool.submit(task, name) for _ in range(n)]:
+                f.result(timeout=5)
+
+    clients = [
+        threading.Thread(target=request, args=("wide", 18, 0)),
+        threading.Thread(target=request, args=("point", 2, 0.005)),
+    ]
+    for t in clients:
+        t.start()
+    for t in clients:
+        t.join()
+    assert starts.count("wide") == 18 and starts.count("point") == 2
+    # the late single-point request does not wait for the wide one's queue to drain
+    assert max(i for i, tag in enumerate(starts) if tag == "point") < 8
+
+
+def test_cancel_session_drops_queue_and_refuses_new_work(pool):
+    gate = threading.Event()
+    seen = []
+
+    def blocked():
+        gate.wait(5)
+        try:
+            raster_pool.check_cancelled()
+        except CancelledError:
+            seen.append("cancelled")
+
+    with raster_pool.session_scope("req") as session:
+        running = [pool.submit(blocked) for _ in range(3)]
+        time.sleep(0.05)
+        queued = [pool.submit(blocked) for _ in range(5)]
+        assert session.cancel("client disconnected") == 5
+        late = pool.submit(blocked)
+    gate.set()
+    for f in running:
+        f.result(timeout=5)
+    assert all(f.cancelled() for f in queued + [late])
+    assert seen == ["cancelled"] * 3
+    assert pool.stats()["cancelled"] == 6
+
+
+def test_run_keeps_raster_env_scope(monkeypatch):
+    monkeypatch.setattr(raster_pool, "_pool", raster_pool.RasterPool(max_workers=2))
+    captured = []
+    raster_env.add_read_hook(captured.append)
+
+    @raster_env.raster_tool
+    async def tool():
+        def read():
+            raster_env.record_fetch(64)
+            return [raster_pool.submit(raster_env.record_fetch, 32) for _ in range(2)]
+
+        for f in await raster_pool.run(read):
+            f.result()
+
+    try:
+        asyncio.run(tool())
+    finally:
+        raster_env.remove_read_hook(captured.append)
+        raster_pool.shutdown()
+    assert (captured[0].range_requests, captured[0].bytes_fetched) == (3, 128)
+
+
+def test_middleware_cancels_work_on_client_disconnect(monkeypatch):
+    pool = raster_pool.RasterPool(max_workers=1)
+    monkeypatch.setattr(raster_pool, "_pool", pool)
+    state = {}
+
+    async def app(scope, receive, send):
+        state["session"] = raster_pool.current_session()
+        futures = [raster_pool.submit(time.sleep, 0.05) for _ in range(10)]
+        await asyncio.sleep(0.2)  # client leaves meanwhile
+        state["cancelled"] = sum(f.cancelled() for f in futures)
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    messages = [{"type": "http.request", "body": b"", "more_body": False}]
+
+    async def receive():
+        if messages:
+            return messages.pop()
+        await asyncio.sleep(0.03)
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        pass
+
+    scope = {"type": "http", "method": "GET", "path": "/api/query", "headers": []}
+    try:
+        asyncio.run(raster_pool.RasterRequestMiddleware(app)(scope, receive, send))
+    finally:
+        raster_pool.shutdown()
+    assert state["session"].cancelled and state["session"].reason == "client disconnected"
+    assert state["cancelled"] >= 8
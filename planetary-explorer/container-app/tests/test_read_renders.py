@@ -59,7 +59,7 @@ def _patch_catalog(monkeypatch, public=PUBLIC_S2, pro=PRO_S2):
 
     monkeypatch.setattr(hrs, "_fetch_pub_doc", fake_pub, raising=True)
     monkeypatch.setattr(hrs, "_fetch_pro_doc", fake_pro, raising=True)
-    hrs._STAC_RENDERS_CACHE.clear()
+    hrs.get_renders_resolver().clear()
 
 
 def test_read_renders_returns_named_preset(monkeypatch):
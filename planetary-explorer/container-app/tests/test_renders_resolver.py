@@ -0,0 +1,173 @@
+"""Unit tests for renders_resolver (non-blocking STAC renders cache).
+
+The STAC fetch is a counting async stub and a fake clock drives the TTLs,
+so no network:
+
+  * fresh / negative TTLs, LRU bound
+  * stale entries are served while one background refresh runs; a
+    failed refresh keeps the stale block
+  * a miss on the event-loop thread is deferred instead of fetched
+    inline (``_get_renders_block`` falls back to the static tiers)
+  * ``ensure`` fetches each key once; ``seed`` prefers the mode's catalog
+"""
+
+from __future__ import annotations
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+import hybrid_rendering_system as hrs
+import renders_resolver
+from renders_resolver import RendersResolver
+
+_TRUE_COLOR = {"true-color": {"assets": ["B04", "B03", "B02"]}}
+_SWIR = {"swir": {"assets": ["B12", "B8A", "B04"]}}
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1_000.0
+
+    def __call__(self):
+        return self.now
+
+
+class _Fetcher:
+    def __init__(self, renders=None, delay=0.0):
+        self.renders = renders if renders is not None else {"sentinel-2-l2a": _TRUE_COLOR}
+        self.delay = delay
+        self.calls = []
+        self.fail = False
+
+    async def __call__(self, collection_id, is_pro):
+        self.calls.append((collection_id, is_pro))
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("stac down")
+        return self.renders.get(collection_id)
+
+
+@pytest.fixture
+def clock():
+    return _Clock()
+
+
+def _resolver(fetch, clock, **kw):
+    kw.setdefault("ttl_s", 600)
+    kw.setdefault("neg_ttl_s", 60)
+    kw.setdefault("stale_s", 3600)
+    return RendersResolver(fetch, clock=clock, **kw)
+
+
+def test_ttls_negative_answers_and_lru(clock):
+    r = _resolver(_Fetcher(), clock, max_entries=2)
+    r.store("sentinel-2-l2a", False, _TRUE_COLOR)
+    r.store("no-renders", False, None)
+    assert r.lookup("sentinel-2-l2a") == (True, _TRUE_COLOR)
+    assert r.lookup("no-renders") == (True, None)
+    assert r.lookup("sentinel-2-l2a", is_pro=True) == (False, None)  # modes are separate
+
+    r.store("landsat-c2-l2", False, _SWIR)  # evicts the least recently used
+    assert r.lookup("sentinel-2-l2a") == (False, None)
+    assert r.stats()["evictions"] == 1
+
+    clock.now += 61  # negative answers expire sooner
+    assert r.lookup("no-renders") == (False, None)
+    assert r.lookup("landsat-c2-l2") == (True, _SWIR)
+
+
+def test_stale_is_served_while_refreshing(clock):
+    fetch = _Fetcher({"sentinel-2-l2a": _SWIR})
+    r = _resolver(fetch, clock)
+
+    async def run():
+        r.store("sentinel-2-l2a", False, _TRUE_COLOR)
+        clock.now += 601
+        served = [r.lookup("sentinel-2-l2a") for _ in range(3)]
+        await asyncio.sleep(0.01)
+        return served, r.lookup("sentinel-2-l2a")
+
+    served, after = asyncio.run(run())
+    assert served == [(True, _TRUE_COLOR)] * 3
+    assert after == (True, _SWIR) and fetch.calls == [("sentinel-2-l2a", False)]
+    assert r.stats()["stale_hits"] == 3
+
+
+def test_failed_refresh_keeps_stale_block(clock):
+    fetch = _Fetcher()
+    fetch.fail = True
+    r = _resolver(fetch, clock)
+
+    async def run():
+        r.store("sentinel-2-l2a", False, _SWIR)
+        clock.now += 601
+        r.lookup("sentinel-2-l2a")
+        await asyncio.sleep(0.01)
+        return r.lookup("sentinel-2-l2a")
+
+    assert asyncio.run(run()) == (True, _SWIR)
+    assert r.stats()["fetch_errors"] == 1
+
+
+def test_ensure_fetches_each_key_once(clock):
+    fetch = _Fetcher(delay=0.02)
+    r = _resolver(fetch, clock)
+
+    async def run():
+        keys = [("sentinel-2-l2a", False)] * 5 + [("sentinel-2-l2a", True), ("unknown", False)]
+        await asyncio.gather(r.ensure(keys), r.resolve("sentinel-2-l2a"))
+
+    asyncio.run(run())
+    assert sorted(fetch.calls) == [("sentinel-2-l2a", False), ("sentinel-2-l2a", True), ("unknown", False)]
+    assert r.lookup("sentinel-2-l2a") == (True, _TRUE_COLOR)
+    assert r.lookup("unknown") == (True, None)
+
+
+def test_seed_prefers_the_modes_catalog(clock):
+    r = _resolver(_Fetcher(), clock)
+    metas = [
+        SimpleNamespace(id="sentinel-2-l2a", source="public", raw={"renders": _TRUE_COLOR}),
+        SimpleNamespace(id="sentinel-2-l2a", source="pro", raw={"renders": _SWIR}),
+        SimpleNamespace(id="naip", source="public", raw={"renders": _TRUE_COLOR}),
+        SimpleNamespace(id="plain", source="public", raw={}),
+    ]
+    assert r.seed(metas) == 4
+    assert r.lookup("sentinel-2-l2a", False) == (True, _TRUE_COLOR)
+    assert r.lookup("sentinel-2-l2a", True) == (True, _SWIR)
+    assert r.lookup("naip", True) == (True, _TRUE_COLOR)
+    assert r.lookup("plain") == (False, None)
+
+
+def test_loop_thread_miss_is_deferred_not_fetched_inline(monkeypatch, clock):
+    fetch = _Fetcher({"sentinel-2-l2a": _SWIR})
+    monkeypatch.setattr(renders_resolver, "_resolver", _resolver(fetch, clock))
+
+    def blocking(*_a, **_kw):
+        raise AssertionError("blocking fetch on the event loop")
+
+    monkeypatch.setattr(hrs, "_fetch_collection_doc", blocking)
+
+    async def run():
+        first = hrs._get_renders_block("sentinel-2-l2a")
+        await asyncio.sleep(0.01)
+        return first, hrs._get_renders_block("sentinel-2-l2a")
+
+    first, second = asyncio.run(run())
+    assert first is None and second == _SWIR
+    assert renders_resolver.stats()["deferred"] == 1
+
+
+def test_sync_miss_off_loop_fetches_and_caches(monkeypatch, clock):
+    monkeypatch.setattr(renders_resolver, "_resolver", _resolver(_Fetcher(), clock))
+    calls = []
+
+    def doc(collection_id, is_pro=False):
+        calls.append(collection_id)
+        return {"id": collection_id, "renders": _SWIR}
+
+    monkeypatch.setattr(hrs, "_fetch_collection_doc", doc)
+    assert hrs._get_renders_block("sentinel-2-l2a") == _SWIR
+    assert hrs._get_renders_block("sentinel-2-l2a") == _SWIR
+    assert calls == ["sentinel-2-l2a"]
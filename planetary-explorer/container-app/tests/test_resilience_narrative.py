@@ -101,11 +101,7 @@ async def test_ensure_narrative_synthesises_when_thin(
     fake_resp = SimpleNamespace(
         choices=[SimpleNamespace(message=SimpleNamespace(content=synthesized))]
     )
-    fake_client = SimpleNamespace(
-        chat=SimpleNamespace(
-            completions=SimpleNamespace(create=AsyncMock(return_value=fake_resp))
-        )
-    )
+    fake_client = SimpleNamespace(create=AsyncMock(return_value=fake_resp))
 
     executor = PlannerExecutor()
     with patch(
@@ -135,7 +131,7 @@ async def test_ensure_narrative_synthesises_when_thin(
     assert out["narrative"] == synthesized
     assert len(out["narrative"]) >= MIN_NARRATIVE_CHARS
     # And the LLM was actually invoked exactly once.
-    fake_client.chat.completions.create.assert_awaited_once()
+    fake_client.create.assert_awaited_once()
 
 
 @pytest.mark.asyncio
@@ -0,0 +1,111 @@
+"""Unit tests for the Open-Meteo adapter's batched fetch mode.
+
+The shared ``open-meteo`` httpx client is swapped for one backed by
+``httpx.MockTransport`` that answers multi-location requests the way
+Open-Meteo does (a JSON list in request order), so no network is used.
+
+Coverage focus:
+  * points are packed into chunked multi-coordinate requests
+  * near-identical coordinates are deduplicated on the grid
+  * results fan back out in input order, and match per-point mode
+  * ``_CACHE`` is shared across chunks / calls
+  * a failed chunk only blanks the facilities in that chunk
+"""
+
+from __future__ import annotations
+
+import httpx
+import pytest
+
+from agents.resilience import weather
+
+
+def _daily_for(lat: float) -> dict:
+    return {"time": ["2026-07-01"], "temperature_2m_max": [round(lat, 4)]}
+
+
+def _hourly_for(lat: float) -> dict:
+    return {"time": ["2026-07-01T00:00", "2026-07-01T01:00"], "pm2_5": [1.0, 2.0], "us_aqi": [10, round(lat)]}
+
+
+class _FakeOpenMeteo:
+    def __init__(self, fail_when=None) -> None:
+        self.calls: list[tuple[str, int]] = []
+        self.fail_when = fail_when
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        lats = [float(v) for v in request.url.params["latitude"].split(",")]
+        kind = "aqi" if "air-quality" in str(request.url) else "fc"
+        self.calls.append((kind, len(lats)))
+        if self.fail_when and self.fail_when(kind, lats):
+            return httpx.Response(503)
+        if kind == "fc":
+            body = [{"latitude": lat, "daily": _daily_for(lat)} for lat in lats]
+        else:
+            body = [{"latitude": lat, "hourly": _hourly_for(lat)} for lat in lats]
+        return httpx.Response(200, json=body if len(body) > 1 else body[0])
+
+
+@pytest.fixture
+def fake(monkeypatch):
+    server = _FakeOpenMeteo()
+    client = httpx.AsyncClient(transport=httpx.MockTransport(server))
+    monkeypatch.setattr(weather.http_pool, "get_httpx_client", lambda name: client)
+    monkeypatch.setattr(weather, "_CACHE", {})
+    monkeypatch.setenv("RESILIENCE_OPEN_METEO_BATCH_SIZE", "4")
+    return server
+
+
+def _points(n: int) -> list[dict]:
+    return [{"facility_id": f"f{i}", "lat": 30.0 + i * 0.1, "lng": -97.0} for i in range(n)]
+
+
+@pytest.mark.asyncio
+async def test_batched_packs_points_into_chunks(fake):
+    out = await weather.fetch_forecasts(_points(10), include_aqi=True, batched=True)
+    assert [f.facility_id for f in out] == [f"f{i}" for i in range(10)]
+    assert [f.daily["temperature_2m_max"][0] for f in out] == [round(30.0 + i * 0.1, 4) for i in range(10)]
+    assert all(f.aqi_daily["us_aqi_max"] == [round(f.lat)] for f in out)
+    assert sorted(fake.calls) == [("aqi", 2), ("aqi", 4), ("aqi", 4), ("fc", 2), ("fc", 4), ("fc", 4)]
+
+
+@pytest.mark.asyncio
+async def test_batched_dedups_near_identical_points(fake):
+    points = [
+        {"facility_id": "a", "lat": 30.0001, "lng": -97.0001},
+        {"facility_id": "b", "lat": 31.0, "lng": -97.0},
+        {"facility_id": "c", "lat": 30.0002, "lng": -96.9999},  # same cell as a
+    ]
+    out = await weather.fetch_forecasts(points, include_aqi=False, batched=True)
+    assert fake.calls == [("fc", 2)]
+    assert out[0].daily == out[2].daily
+    assert (out[2].lat, out[2].lng) == (30.0002, -96.9999)
+
+
+@pytest.mark.asyncio
+async def test_batched_matches_per_point_mode(fake):
+    points = _points(5)
+    batched = await weather.fetch_forecasts(points, include_aqi=True, batched=True)
+    weather._CACHE.clear()
+    single = await weather.fetch_forecasts(points, include_aqi=True, batched=False)
+    assert [(f.daily, f.aqi_daily) for f in batched] == [(f.daily, f.aqi_daily) for f in single]
+
+
+@pytest.mark.asyncio
+async def test_cache_is_shared_across_chunks_and_calls(fake):
+    await weather.fetch_forecasts(_points(3), include_aqi=False, batched=True)
+    fake.calls.clear()
+    out = await weather.fetch_forecasts(_points(6), include_aqi=False, batched=True)
+    assert fake.calls == [("fc", 3)]  # only the 3 new cells
+    assert all(f.error is None for f in out)
+    fake.calls.clear()
+    await weather.fetch_forecasts(_points(6), include_aqi=False, batched=False)
+    assert fake.calls == []  # per-point mode reads the same cache
+
+
+@pytest.mark.asyncio
+async def test_failed_chunk_only_affects_its_points(fake):
+    fake.fail_when = lambda kind, lats: kind == "fc" and 30.0 in lats
+    out = await weather.fetch_forecasts(_points(6), include_aqi=False, batched=True)
+    assert [f.error is None for f in out] == [False] * 4 + [True] * 2
+    assert len(weather._CACHE) == 2  # failures are not cached
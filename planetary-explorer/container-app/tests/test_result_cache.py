@@ -0,0 +1,145 @@
+"""Unit tests for result_cache (bounded, metered cache for tool results).
+
+A fake clock drives TTL expiry, so no sleeping:
+
+  * LRU eviction at the namespace cap, TTL expiry, expired entries swept
+  * single-flight: concurrent identical keys share one computation (and
+    its exception); rejected values (``cache_if``) are not stored
+  * sqlite spill: evicted entries come back from disk, shared by a second
+    cache instance (another worker)
+  * per-namespace counters; ``_sample_netcdf`` routes through its namespace
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+
+import pytest
+
+import result_cache
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return _Clock()
+
+
+def test_lru_and_ttl(clock):
+    ns = result_cache.ResultCache(max_entries=3, ttl_s=60, clock=clock).namespace("a")
+    for k in "abc":
+        ns.put(k, {"v": k})
+    assert ns.get("a") == {"v": "a"}  # "a" becomes most recent
+    ns.put("d", {"v": "d"})
+    assert ns.get("b") is None and len(ns) == 3
+
+    clock.now += 61
+    assert ns.get("a") is None
+    ns.put("e", 1)  # write sweeps the remaining expired entries
+    stats = ns.stats()
+    assert len(ns) == 1 and stats["expired"] == 3 and stats["evictions"] == 1
+    assert (stats["hits"], stats["misses"]) == (1, 2)
+
+
+def test_namespaces_are_separate(clock):
+    cache = result_cache.ResultCache(max_entries=8, ttl_s=60, clock=clock)
+    cache.namespace("a").put("k", 1)
+    b = cache.namespace("b", max_entries=1, ttl_s=5)
+    assert b.get("k") is None and cache.namespace("a") is not b
+    assert (b.max_entries, b.ttl_s) == (1, 5.0)
+    assert set(cache.stats()["namespaces"]) == {"a", "b"}
+
+
+def test_single_flight_shares_one_computation():
+    ns = result_cache.ResultCache(max_entries=8, ttl_s=60).namespace("sf")
+    calls = []
+    gate = threading.Event()
+
+    def compute():
+        calls.append(1)
+        gate.wait(5)
+        return {"value": 42}
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(ns.get_or_compute("k", compute))) for _ in range(6)]
+    for t in threads:
+        t.start()
+    time.sleep(0.05)
+    gate.set()
+    for t in threads:
+        t.join()
+    assert len(calls) == 1 and results == [{"value": 42}] * 6
+    assert ns.stats()["coalesced"] == 5
+    assert ns.get_or_compute("k", compute) == {"value": 42} and len(calls) == 1
+
+
+def test_errors_and_rejected_values_are_not_cached():
+    ns = result_cache.ResultCache(max_entries=8, ttl_s=60).namespace("err")
+
+    def boom():
+        raise ValueError("remote read failed")
+
+    with pytest.raises(ValueError):
+        ns.get_or_compute("k", boom)
+    assert ns.get_or_compute("k", lambda: {"error": "no data"}, cache_if=lambda r: "error" not in r) == {"error": "no data"}
+    assert ns.get("k") is None
+    assert ns.get_or_compute("k", lambda: {"ok": 1}, cache_if=lambda r: "error" not in r) == {"ok": 1}
+    assert ns.get("k") == {"ok": 1}
+
+
+def test_evicted_entries_spill_to_sqlite(tmp_path, clock):
+    path = str(tmp_path / "results.sqlite")
+    cache = result_cache.ResultCache(max_entries=2, ttl_s=60, sqlite_path=path, clock=clock)
+    ns = cache.namespace("spill")
+    for k in "abc":
+        ns.put(k, {"v": k})
+    assert ns.stats()["spills"] == 1 and cache.stats()["sqlite"]["rows"] == 1
+    assert ns.get("a") == {"v": "a"} and ns.stats()["disk_hits"] == 1  # promoted back
+
+    ns.put("d", {"v": "d"})  # spills "b"
+    other = result_cache.ResultCache(max_entries=2, ttl_s=60, sqlite_path=path, clock=clock).namespace("spill")
+    assert other.get("b") == {"v": "b"}
+    assert result_cache.ResultCache(sqlite_path=path, clock=clock).namespace("other").get("c") is None
+
+    ns.put("e", {"v": "e"})
+    ns.put("f", {"v": "f"})
+    clock.now += 61
+    assert other.get("a") is None  # expired on disk too
+
+
+def test_sample_netcdf_uses_its_namespace(monkeypatch):
+    from geoint import extreme_weather_tools as ewt
+
+    ewt._netcdf_results.clear()
+    reads = []
+
+    def fake_read(href, variable, latitude, longitude, aggregate="last"):
+        reads.append(href)
+        return {"raw_value": 290.0} if variable == "tas" else {"error": "missing"}
+
+    monkeypatch.setattr(ewt, "_read_netcdf_point", fake_read)
+    href = "https://acct.blob.core.windows.net/nex/tas_2030.nc"
+    assert ewt._sample_netcdf(href + "?sig=one", "tas", 30.0, -97.0) == {"raw_value": 290.0}
+    assert ewt._sample_netcdf(href + "?sig=two", "tas", 30.0, -97.0) == {"raw_value": 290.0}
+    ewt._sample_netcdf(href, "pr", 30.0, -97.0)
+    ewt._sample_netcdf(href, "pr", 30.0, -97.0)
+    assert len(reads) == 3  # re-signed href hits; errors are re-read
+    assert "cmip6-point" in result_cache.stats()["namespaces"]
+    ewt._netcdf_results.clear()
+
+
+def test_module_namespace_forwards_disk_options(monkeypatch, tmp_path):
+    cache = result_cache.ResultCache(max_entries=8, ttl_s=60, sqlite_path=str(tmp_path / "rc.sqlite3"))
+    monkeypatch.setattr(result_cache, "_cache", cache)
+    assert result_cache.namespace("durable", write_through=True).write_through is True
+    assert result_cache.namespace("plain").write_through is False
+    assert result_cache.namespace("local", memory_only=True)._disk is None
+    assert result_cache.namespace("plain")._disk is not None
@@ -0,0 +1,138 @@
+"""Unit tests for sas_signer (shared refresh-ahead SAS token cache).
+
+The SAS endpoint is a counting fake and the SDK's own token cache is
+swapped for an empty dict, so every token ``planetary_computer.sign``
+uses must have been seeded by the signer -- no network.
+
+Coverage focus:
+  * which hrefs need a token (blob, already signed, public, non-blob)
+  * one fetch per (account, container), shared by every later sign
+  * a batch over several containers fetches each once
+  * refresh-ahead happens in the background with the old token still served;
+    an expiring token is refetched inline; a failed refresh keeps the old one
+"""
+
+from __future__ import annotations
+
+import time
+from datetime import datetime, timezone
+
+import pystac
+import pytest
+from planetary_computer import sas
+
+import sas_signer
+
+_A = "https://acct.blob.core.windows.net/cont-a/dir/tile.tif"
+_B = "https://acct.blob.core.windows.net/cont-b/tile.tif"
+
+
+class _Endpoint:
+    def __init__(self, lifetime_s=3600.0, clock=time.time):
+        self.lifetime_s = lifetime_s
+        self.clock = clock
+        self.calls = []
+        self.fail = False
+
+    def __call__(self, account, container):
+        if self.fail:
+            raise RuntimeError("SAS endpoint down")
+        self.calls.append((account, container))
+        n = self.calls.count((account, container))
+        return f"sv=1&se=x&sp=r&sig={container}-{n}", self.clock() + self.lifetime_s
+
+
+class _Clock:
+    def __init__(self):
+        self.now = time.time()
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture(autouse=True)
+def empty_sdk_cache(monkeypatch):
+    monkeypatch.setattr(sas, "TOKEN_CACHE", {})
+
+
+def _drain(signer):
+    # single-worker pool: once this runs, earlier background work has finished
+    signer._pool.submit(lambda: None).result()
+
+
+def test_container_for_href():
+    assert sas_signer.container_for_href(_A) == ("acct", "cont-a")
+    assert sas_signer.container_for_href(_A + "?st=1&se=2&sp=r&sig=x") is None
+    assert sas_signer.container_for_href("https://ai4edatasetspublicassets.blob.core.windows.net/a/b.png") is None
+    assert sas_signer.container_for_href("https://example.com/a/b.tif") is None
+
+
+def test_tokens_are_fetched_once_per_container_and_shared():
+    endpoint = _Endpoint()
+    signer = sas_signer.SasSigner(fetch_token=endpoint)
+
+    assert signer.sign(_A) == f"{_A}?sv=1&se=x&sp=r&sig=cont-a-1"
+    item = {
+        "type": "Feature", "stac_version": "1.0.0", "id": "i", "geometry": None,
+        "properties": {}, "links": [],
+        "assets": {"red": {"href": _A}, "nir": {"href": _A.replace("tile", "nir")}},
+    }
+    signed = signer.sign(item)
+    assert signed["assets"]["nir"]["href"].endswith("sig=cont-a-1")
+    assert item["assets"]["red"]["href"] == _A  # copy, not in place
+    assert endpoint.calls == [("acct", "cont-a")]
+    assert signer.stats()["fetches"] == 1
+
+
+def test_batch_fetches_each_missing_container_once():
+    endpoint = _Endpoint()
+    signer = sas_signer.SasSigner(fetch_token=endpoint)
+    items = [
+        pystac.Item(id=f"i{n}", geometry=None, bbox=None,
+                    datetime=datetime(2024, 1, 1, tzinfo=timezone.utc), properties={})
+        for n in range(4)
+    ]
+    for n, item in enumerate(items):
+        item.add_asset("data", pystac.Asset(href=_A if n % 2 else _B))
+
+    signed = signer.sign(items)
+    assert sorted(endpoint.calls) == [("acct", "cont-a"), ("acct", "cont-b")]
+    assert [s.assets["data"].href.rsplit("sig=", 1)[1] for s in signed] == ["cont-b-1", "cont-a-1"] * 2
+    assert items[0].assets["data"].href == _B
+
+
+def test_refresh_ahead_runs_in_background():
+    clock = _Clock()
+    endpoint = _Endpoint(clock=clock)
+    signer = sas_signer.SasSigner(refresh_ahead_s=600, max_workers=1, fetch_token=endpoint, clock=clock)
+
+    first = signer.token("acct", "cont-a")
+    clock.now += 3100  # 500 s left: inside the refresh window, still valid
+    assert signer.token("acct", "cont-a") == first  # served without waiting
+    _drain(signer)
+    assert len(endpoint.calls) == 2
+    assert signer.token("acct", "cont-a") != first
+    assert signer.stats()["background_refreshes"] == 1
+
+
+def test_expiring_token_is_refetched_inline():
+    clock = _Clock()
+    endpoint = _Endpoint(clock=clock)
+    signer = sas_signer.SasSigner(fetch_token=endpoint, clock=clock)
+    first = signer.token("acct", "cont-a")
+    clock.now += 3570  # 30 s left
+    assert signer.token("acct", "cont-a") != first
+    assert len(endpoint.calls) == 2
+
+
+def test_failed_background_refresh_keeps_current_token():
+    clock = _Clock()
+    endpoint = _Endpoint(clock=clock)
+    signer = sas_signer.SasSigner(max_workers=1, fetch_token=endpoint, clock=clock)
+    first = signer.token("acct", "cont-a")
+    endpoint.fail = True
+    clock.now += 3300
+    assert signer.token("acct", "cont-a") == first
+    _drain(signer)
+    assert signer.token("acct", "cont-a") == first
+    assert signer.stats()["errors"] == 1
@@ -0,0 +1,229 @@
+"""Unit tests for pipeline.session_store (pluggable session backends).
+
+Every backend runs the same contract suite -- memory, a SQLite file, and
+the Redis backend against an in-process stand-in client (no server):
+  - dict contexts: get / update / delete, namespace isolation
+  - idle TTL expiry and purge_idle (cleanup_older_than)
+  - SessionMap round-trips agent session objects
+Plus backend-specific checks: write-back of legacy ``raw[sid]["k"] = v``
+mutations, LRU / row caps, compact serialization, cross-"worker"
+visibility through one SQLite file, and env-driven backend selection.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import fnmatch
+import time
+from datetime import datetime
+
+import pytest
+
+from pipeline import session_store as ss
+
+
+class _FakeRedis:
+    """Minimal stand-in for ``redis.Redis``: get / set(ex=) / delete / scan_iter."""
+
+    def __init__(self) -> None:
+        self.data: dict = {}
+
+    def _live(self, key):
+        entry = self.data.get(key)
+        if entry and entry[1] is not None and entry[1] < time.time():
+            del self.data[key]
+            return None
+        return entry
+
+    def get(self, key):
+        entry = self._live(key)
+        return entry[0] if entry else None
+
+    def set(self, key, value, ex=None):
+        self.data[key] = (value, time.time() + ex if ex else None)
+
+    def getrange(self, key, start, end):
+        entry = self._live(key)
+        return entry[0][start:end + 1] if entry else b""
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+    def scan_iter(self, match="*"):
+        return [k.encode() for k in list(self.data) if self._live(k) and fnmatch.fnmatch(k, match)]
+
+
+class _AgentSession:
+    def __init__(self, session_id, thread_id):
+        self.session_id = session_id
+        self.thread_id = thread_id
+        self.created_at = datetime(2026, 5, 20, 12, 0, 0)
+        self.message_count = 0
+
+
+def _make(kind, tmp_path, **kw):
+    if kind == "memory":
+        return ss.MemorySessionBackend(**kw)
+    if kind == "sqlite":
+        return ss.SQLiteSessionBackend(str(tmp_path / "s.sqlite3"), **kw)
+    kw.pop("max_entries", None)
+    return ss.RedisSessionBackend(_FakeRedis(), **kw)
+
+
+@pytest.fixture(params=["memory", "sqlite", "redis"])
+def backend(request, tmp_path):
+    return _make(request.param, tmp_path)
+
+
+# ---------------------------------------------------------------------------
+# contract (all backends)
+# ---------------------------------------------------------------------------
+
+def test_context_store_get_update_delete(backend):
+    store = ss.SessionContextStore(backend, namespace="router")
+    assert store.get("s1") == {}
+    store.update("s1", {"last_bbox": [1, 2, 3, 4], "query_count": 1})
+    merged = store.update("s1", {"query_count": 2})
+    assert merged == {"last_bbox": [1, 2, 3, 4], "query_count": 2}
+    assert store.get("s1")["query_count"] == 2
+    store.delete("s1")
+    assert store.get("s1") == {}
+
+
+def test_namespaces_are_isolated(backend):
+    router = ss.SessionContextStore(backend, namespace="router")
+    conv = ss.SessionContextStore(backend, namespace="conversation")
+    router.update("s1", {"a": 1})
+    assert conv.get("s1") == {}
+    assert list(router.raw) == ["s1"]
+    assert list(conv.raw) == []
+
+
+def test_legacy_raw_mutation_is_persisted(backend):
+    store = ss.SessionContextStore(backend)
+    store.update("s1", {"has_rendered_map": False})
+    store.raw["s1"]["has_rendered_map"] = True
+    assert store.get("s1")["has_rendered_map"] is True
+    assert store.raw.get("missing", {}) == {}
+    assert "s1" in store.raw and "missing" not in store.raw
+
+
+def test_session_map_round_trips_agent_objects(backend):
+    sessions = ss.SessionMap("terrain", _AgentSession, backend=backend)
+    sessions["s1"] = _AgentSession("s1", "thread-1")
+    got = sessions["s1"]
+    assert isinstance(got, _AgentSession)
+    assert (got.thread_id, got.created_at) == ("thread-1", datetime(2026, 5, 20, 12, 0, 0))
+    got.message_count += 2
+    sessions["s1"] = got
+    assert sessions["s1"].message_count == 2
+    assert [sid for sid, _ in sessions.items()] == ["s1"]
+    sessions.clear()
+    assert len(sessions) == 0
+
+
+def test_session_map_async_accessors(backend):
+    sessions = ss.SessionMap("mobility", _AgentSession, backend=backend)
+
+    async def run():
+        assert await sessions.aget("s1") is None
+        await sessions.aset("s1", _AgentSession("s1", "thread-1"))
+        got = await sessions.aget("s1")
+        assert got.thread_id == "thread-1"
+        await sessions.adelete("s1")
+        await sessions.adelete("s1")  # missing is fine
+        return await sessions.aget("s1", "gone")
+
+    assert asyncio.run(run()) == "gone"
+
+
+def test_purge_idle_drops_only_old_entries(backend, monkeypatch):
+    store = ss.SessionContextStore(backend)
+    clock = [1000.0]
+    monkeypatch.setattr(ss.time, "time", lambda: clock[0])
+    store.update("old", {"x": 1})
+    clock[0] += 600
+    store.update("new", {"x": 2})
+    clock[0] += 60
+    assert store.cleanup_older_than(max_age_minutes=5) == 1
+    assert set(store.raw) == {"new"}
+
+
+def test_ttl_expires_idle_sessions(tmp_path, monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(ss.time, "time", lambda: clock[0])
+    for kind in ("memory", "sqlite"):
+        store = ss.SessionContextStore(_make(kind, tmp_path, ttl_s=30), namespace=kind)
+        store.update("s1", {"x": 1})
+        clock[0] += 31
+        assert store.get("s1") == {}, kind
+
+
+# ---------------------------------------------------------------------------
+# backend specifics
+# ---------------------------------------------------------------------------
+
+def test_memory_backend_keeps_live_references_and_lru_cap():
+    backend = ss.MemorySessionBackend(max_entries=2)
+    sessions = ss.SessionMap("vision", _AgentSession, backend=backend)
+    live = _AgentSession("a", "t")
+    sessions["a"] = live
+    sessions["a"].message_count = 5  # in-place, as legacy code does
+    assert live.message_count == 5
+    sessions["b"] = _AgentSession("b", "t")
+    _ = sessions["a"]  # touch a
+    sessions["c"] = _AgentSession("c", "t")  # evicts b
+    assert set(sessions) == {"a", "c"}
+    assert backend.stats()["evictions"] == 1
+
+
+def test_sqlite_file_is_shared_between_workers(tmp_path):
+    path = str(tmp_path / "shared.sqlite3")
+    worker_a = ss.SessionMap("mobility", _AgentSession, backend=ss.SQLiteSessionBackend(path))
+    worker_b = ss.SessionMap("mobility", _AgentSession, backend=ss.SQLiteSessionBackend(path))
+    worker_a["s1"] = _AgentSession("s1", "thread-42")
+    assert worker_b["s1"].thread_id == "thread-42"
+
+
+def test_sqlite_row_cap(tmp_path, monkeypatch):
+    backend = ss.SQLiteSessionBackend(str(tmp_path / "s.sqlite3"), max_entries=3)
+    monkeypatch.setattr(ss.SQLiteSessionBackend, "_PRUNE_EVERY", 1)
+    for i in range(6):
+        backend.set(f"router:s{i}", {"i": i})
+    assert backend.stats()["entries"] == 3
+    assert backend.get("router:s5") == {"i": 5}
+    assert backend.get("router:s0") is None
+
+
+def test_serialization_is_compact_and_typed():
+    value = {
+        "session_start": datetime(2026, 5, 20, 8, 30),
+        "topics": {"fire"},
+        "chat_history": [{"role": "user", "content": "burn scars " * 200}],
+    }
+    blob = ss.dumps(value)
+    assert blob[:1] == b"z" and len(blob) < 400
+    back = ss.loads(blob)
+    assert back["session_start"] == datetime(2026, 5, 20, 8, 30)
+    assert back["topics"] == {"fire"}
+    assert ss.dumps({"a": 1}) == b'j{"a":1}'
+
+
+def test_backend_selection_from_env(monkeypatch, tmp_path):
+    monkeypatch.setenv("SESSION_STORE_BACKEND", "sqlite")
+    monkeypatch.setenv("SESSION_STORE_SQLITE_PATH", str(tmp_path / "env.sqlite3"))
+    try:
+        ss.reset_session_store_for_tests()
+        assert ss.get_session_backend().name == "sqlite"
+        assert ss.get_session_store("router") is ss.get_session_store("router")
+
+        monkeypatch.setenv("SESSION_STORE_BACKEND", "bogus")
+        ss.reset_session_store_for_tests()
+        assert ss.get_session_backend().name == "memory"
+
+        monkeypatch.setenv("SESSION_STORE_BACKEND", "redis")
+        monkeypatch.setenv("SESSION_STORE_REDIS_URL", "redis://127.0.0.1:1/0")  # nothing listens here
+        ss.reset_session_store_for_tests()
+        assert ss.get_session_backend().name == "memory"
+    finally:
+        ss.reset_session_store_for_tests()
@@ -0,0 +1,199 @@
+"""Unit tests for agents.site_audit_batch (bulk site audit helpers).
+
+No Fabric, MPC or Open-Meteo calls — the data sources are replaced by
+counting stubs:
+  * request parsing: bare list, ``{"sites": [...]}``, GeoJSON
+    FeatureCollection, and the 400-worthy error cases
+  * per-STAC-item grouping of points (first intersecting item wins,
+    matching the single-site sampler's ``items[0]``)
+  * ranking and the NDJSON wire format
+  * ``audit_sites_batch`` end to end: ranked order, per-site read errors
+    in that site's line, and one MPC sampling pass / one climatology call
+    per ERA5 cell / one precedent search per capacity for the whole batch
+    (needs ``agents.site_audit``'s deps: pandas, deltalake)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from agents import site_audit_batch as batch
+
+
+# ── parse_sites ──────────────────────────────────────────────────────────
+
+
+def test_parse_list_and_sites_object():
+    body = [{"lat": 30, "lng": -97, "id": "a"}, {"lat": "31.5", "lng": -96, "claimed_mw": 500}]
+    sites = batch.parse_sites(body, default_mw=250)
+    assert [(s.site_id, s.lat, s.lng, s.claimed_mw) for s in sites] == [
+        ("a", 30.0, -97.0, 250.0),
+        ("site-1", 31.5, -96.0, 500.0),
+    ]
+    assert batch.parse_sites({"sites": body})[1].claimed_mw == 500.0
+
+
+def test_parse_feature_collection():
+    fc = {
+        "type": "FeatureCollection",
+        "features": [
+            {"type": "Feature", "id": 7, "geometry": {"type": "Point", "coordinates": [-97.1, 30.2]},
+             "properties": {"name": "Taylor", "claimed_mw": 300}},
+            {"type": "Feature", "geometry": {"type": "Point", "coordinates": [-96.0, 31.0]},
+             "properties": {"name": "Temple"}},
+        ],
+    }
+    sites = batch.parse_sites(fc)
+    assert [(s.site_id, s.lat, s.lng, s.claimed_mw) for s in sites] == [
+        ("7", 30.2, -97.1, 300.0),
+        ("Temple", 31.0, -96.0, batch.DEFAULT_CLAIMED_MW),
+    ]
+    assert sites[0].properties["name"] == "Taylor"
+
+
+@pytest.mark.parametrize("body,msg", [
+    ([], "no sites"),
+    ({"foo": 1}, "expected a list"),
+    ([{"lat": 1}], "site 0"),
+    ([{"lat": 95, "lng": 0}], "out of range"),
+    ({"type": "FeatureCollection", "features": [
+        {"geometry": {"type": "Polygon", "coordinates": []}}]}, "Point"),
+])
+def test_parse_rejects_bad_input(body, msg):
+    with pytest.raises(ValueError, match=msg):
+        batch.parse_sites(body)
+
+
+def test_parse_enforces_batch_cap(monkeypatch):
+    monkeypatch.setenv("SITE_AUDIT_BATCH_MAX_SITES", "2")
+    with pytest.raises(ValueError, match="batch too large"):
+        batch.parse_sites([{"lat": 0, "lng": 0}] * 3)
+
+
+# ── per-item grouping ────────────────────────────────────────────────────
+
+
+def _box_item(item_id, west, south, east, north):
+    ring = [[west, south], [east, south], [east, north], [west, north], [west, south]]
+    return SimpleNamespace(id=item_id, geometry={"type": "Polygon", "coordinates": [ring]})
+
+
+def test_points_grouped_by_first_intersecting_item():
+    points = [(30.5, -97.5), (30.2, -97.2), (35.0, -90.0), (30.5, -96.5)]
+    items = [
+        _box_item("newest-west", -98, 30, -97, 31),
+        _box_item("older-west", -98, 30, -97, 31),    # same tile, later in search order
+        _box_item("east", -97, 30, -96, 31),          # shares the -97 edge
+    ]
+    groups = batch._group_points_by_item(points, items)
+    assert [(item.id, idxs) for item, idxs in groups] == [
+        ("newest-west", [0, 1]),
+        ("east", [3]),
+    ]
+
+
+# ── ranking + NDJSON ─────────────────────────────────────────────────────
+
+
+def test_rank_results_orders_by_overall_then_input():
+    rows = [
+        {"site_id": "a", "scores": {"overall": 60.0}},
+        {"site_id": "b", "scores": {"overall": 80.0}},
+        {"site_id": "c", "scores": {"overall": 60.0}},
+    ]
+    ranked = batch.rank_results(rows)
+    assert [(r["rank"], r["site_id"]) for r in ranked] == [(1, "b"), (2, "a"), (3, "c")]
+
+
+def test_iter_ndjson_emits_sites_then_summary():
+    payload = {
+        "results": batch.rank_results([
+            {"site_id": "a", "scores": {"overall": 50.0, "water": float("nan")}},
+            {"site_id": "b", "scores": {"overall": 70.0}},
+        ]),
+        "weights": {"power": 0.35},
+        "elapsed_ms": 12.5,
+    }
+    lines = [json.loads(line) for line in b"".join(batch.iter_ndjson(payload)).splitlines()]
+    assert [(l["type"], l.get("site_id")) for l in lines] == [("site", "b"), ("site", "a"), ("summary", None)]
+    assert lines[1]["scores"]["water"] is None
+    assert lines[2]["sites"] == 2 and lines[2]["weights"] == {"power": 0.35}
+
+
+# ── audit_sites_batch ────────────────────────────────────────────────────
+
+
+@pytest.fixture
+def sources(monkeypatch):
+    """Stub every data source ``audit_sites_batch`` touches; records the calls."""
+    site_audit = pytest.importorskip("agents.site_audit", exc_type=ImportError)
+    pd = pytest.importorskip("pandas")
+    import http_pool
+    import weather_client
+
+    calls = {"tables": [], "samples": [], "climate": [], "precedent": []}
+    land_cover = {(30.0, -97.0): "water", (31.0, -96.0): "built_area", (31.05, -96.05): "crops"}
+
+    async def load_table(table, user_assertion, workspace_id, lakehouse_id):
+        calls["tables"].append(table)
+        return pd.DataFrame()
+
+    def sample(points, extra=None):
+        calls["samples"].append(list(points))
+        out = []
+        for point in points:
+            cls = land_cover.get(point)
+            out.append(
+                {"lulc": {"class_code": 1, "class_name": cls, "collection": "io-lulc-9-class", "item_id": "lulc-1"}}
+                if cls else {"lulc_error": "HTTP 403 reading COG"}
+            )
+        return out
+
+    async def climate(lat, lng, *, session=None, **_kw):
+        calls["climate"].append((lat, lng))
+        return None
+
+    async def precedent(user_assertion, workspace_id, claimed_mw):
+        calls["precedent"].append(claimed_mw)
+        return [], None
+
+    monkeypatch.setattr(site_audit, "_load_table", load_table)
+    monkeypatch.setattr(site_audit, "_discover_dynamic_collections", lambda query: [])
+    monkeypatch.setattr(site_audit, "_fetch_precedent_hits", precedent)
+    monkeypatch.setattr(batch, "_sample_mpc_pixels_batch_blocking", sample)
+    monkeypatch.setattr(weather_client, "fetch_climate_indicators", climate)
+    monkeypatch.setattr(http_pool, "get_session", lambda name: object())
+    return calls
+
+
+def test_audit_sites_batch_ranks_reports_errors_and_shares_fetches(sources):
+    sites = batch.parse_sites([
+        {"id": "a", "lat": 30.0, "lng": -97.0},
+        {"id": "b", "lat": 31.0, "lng": -96.0, "claimed_mw": 500},
+        {"id": "c", "lat": 32.0, "lng": -95.0},                        # COG read fails
+        {"id": "d", "lat": 31.05, "lng": -96.05, "claimed_mw": 500},   # same ERA5 cell as b
+    ])
+    result = asyncio.run(batch.audit_sites_batch(user_assertion="token", sites=sites))
+
+    ranked = result["results"]
+    assert [(r["rank"], r["site_id"]) for r in ranked] == [(1, "b"), (2, "d"), (3, "c"), (4, "a")]
+    by_id = {r["site_id"]: r for r in ranked}
+    assert by_id["b"]["scores"]["hazards"] == 90.0 and by_id["a"]["scores"]["hazards"] == 5.0
+    assert "land-cover read failed" in by_id["c"]["summaries"]["hazards"]
+    assert by_id["c"]["scores"]["hazards"] == 70.0  # neutral default, the rest of the row still scored
+
+    assert sources["samples"] == [[(s.lat, s.lng) for s in sites]]  # one MPC pass for the batch
+    assert len(sources["climate"]) == 3                               # b and d share a call
+    assert sorted(sources["precedent"]) == [batch.DEFAULT_CLAIMED_MW, 500.0]
+    assert len(sources["tables"]) == 4
+
+    lines = [json.loads(line) for line in b"".join(batch.iter_ndjson(result)).splitlines()]
+    assert [(l["type"], l.get("site_id")) for l in lines] == [
+        ("site", "b"), ("site", "d"), ("site", "c"), ("site", "a"), ("summary", None),
+    ]
+    assert "land-cover read failed" in lines[2]["summaries"]["hazards"]
+    assert lines[-1]["sites"] == 4
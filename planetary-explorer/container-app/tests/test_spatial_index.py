@@ -0,0 +1,107 @@
+"""Unit tests for agents.spatial_index (site-audit nearest/radius lookups).
+
+Every query is checked against the reference the site-audit scorers used
+before the index existed: copy the frame, add a per-row haversine
+``distance_mi`` column, filter by radius, ``nsmallest(k)``. Both the
+BallTree backend (large frames) and the numpy scan (small frames) must
+return the same rows in the same order.
+"""
+
+from __future__ import annotations
+
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from agents.spatial_index import EARTH_RADIUS_MI, SpatialIndex
+
+
+def _reference_mi(lat, lng, lats, lngs):
+    lat1, lon1 = math.radians(lat), math.radians(lng)
+    lat2 = pd.Series(lats).astype(float).map(math.radians)
+    lon2 = pd.Series(lngs).astype(float).map(math.radians)
+    a = ((lat2 - lat1) / 2).map(math.sin) ** 2 + math.cos(lat1) * lat2.map(math.cos) * (
+        ((lon2 - lon1) / 2).map(math.sin) ** 2
+    )
+    return 2 * EARTH_RADIUS_MI * a.clip(0, 1).map(math.sqrt).map(math.asin)
+
+
+def _reference(df, lat, lng, *, k=None, radius_mi=None):
+    out = df.copy()
+    out["distance_mi"] = _reference_mi(lat, lng, out["latitude"], out["longitude"])
+    if radius_mi is not None:
+        out = out[out["distance_mi"] <= radius_mi]
+    if k is None:
+        return out.sort_values("distance_mi", kind="stable")
+    return out.nsmallest(k, "distance_mi")
+
+
+def _frame(n, seed=3):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "asset_id": [f"a{i}" for i in range(n)],
+        "latitude": rng.uniform(29.0, 33.0, n).round(3),
+        "longitude": rng.uniform(-99.0, -95.0, n).round(3),
+        "type": rng.choice(["substation", "transmission_line"], n),
+    })
+    # exact duplicates exercise the row-order tiebreak
+    df.loc[n - 1, ["latitude", "longitude"]] = df.loc[0, ["latitude", "longitude"]].to_numpy()
+    df.loc[n - 2, ["latitude", "longitude"]] = df.loc[0, ["latitude", "longitude"]].to_numpy()
+    return df.set_index(pd.Index(range(1000, 1000 + n)))
+
+
+@pytest.mark.parametrize("n,backend", [(60, "numpy"), (3000, "balltree")])
+def test_queries_match_reference_scan(n, backend):
+    df = _frame(n)
+    index = SpatialIndex(df)
+    assert index.backend == backend
+    probes = [(31.0, -97.0), tuple(df.iloc[0][["latitude", "longitude"]])]
+    for lat, lng in probes:
+        for kw in ({"k": 5}, {"radius_mi": 25.0}, {"k": 3, "radius_mi": 40.0}, {"k": 20, "radius_mi": 50.0}):
+            got = index.query(lat, lng, **kw)
+            want = _reference(df, lat, lng, **kw)
+            assert list(got.index) == list(want.index), kw
+            np.testing.assert_allclose(got["distance_mi"], want["distance_mi"], rtol=1e-12, atol=1e-9)
+
+
+def test_subset_matches_filtered_reference():
+    df = _frame(2000)
+    subs = SpatialIndex(df).subset("type", "substation")
+    want = _reference(df[df["type"] == "substation"], 31.0, -97.0, k=5)
+    assert list(subs.query(31.0, -97.0, k=5).index) == list(want.index)
+
+
+def test_row_order_and_no_copy_of_unmatched_rows():
+    df = _frame(600)
+    index = SpatialIndex(df)
+    got = index.query(31.0, -97.0, radius_mi=30.0, sort_by_distance=False)
+    assert list(got.index) == sorted(got.index)
+    assert len(got) < len(df)
+    assert "distance_mi" not in df.columns  # source frame untouched
+
+
+def test_missing_coordinates_are_skipped_and_empty_results_keep_columns():
+    df = pd.DataFrame({
+        "latitude": [30.0, None, "bad", 30.1],
+        "longitude": [-97.0, -97.0, -97.0, None],
+        "name": ["ok", "no-lat", "bad-lat", "no-lng"],
+    })
+    index = SpatialIndex(df)
+    assert len(index) == 1
+    assert list(index.query(30.0, -97.0, k=10)["name"]) == ["ok"]
+    empty = index.query(0.0, 0.0, radius_mi=1.0)
+    assert empty.empty and {"name", "distance_mi"} <= set(empty.columns)
+    with pytest.raises(ValueError):
+        index.query(0.0, 0.0)
+
+
+def test_rebind_points_subsets_at_reloaded_frame():
+    df = _frame(100)
+    index = SpatialIndex(df, version=7)
+    sub = index.subset("type", "substation")
+    reloaded = df.copy()
+    index.rebind(reloaded)
+    assert index.frame is reloaded and sub.frame is reloaded
+    assert index.subset("type", "substation") is sub
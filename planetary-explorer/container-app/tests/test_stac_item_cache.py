@@ -0,0 +1,171 @@
+"""Unit tests for stac_item_cache (shared STAC item-search cache).
+
+The catalog is a counting ``fetch`` callable and signing is replaced by a
+fake that appends a token, so no network:
+
+  * key normalization: outward bbox snapping, nearby bboxes share a key,
+    the snapped bbox is what gets searched
+  * memory tier: hit/miss, TTL expiry, byte-budget LRU eviction
+  * SAS handling: hrefs are stored unsigned and re-signed on every read
+  * sqlite tier: a second cache instance (another worker) hits the file
+  * failed searches are not cached
+"""
+
+from __future__ import annotations
+
+import pytest
+
+import stac_item_cache as sic
+
+ENDPOINT = "https://example.test/api/stac/v1"
+_BLOB = "https://acct.blob.core.windows.net/container/tile.tif"
+
+
+class _Catalog:
+    def __init__(self, n_items: int = 2):
+        self.n_items = n_items
+        self.calls = []
+
+    def __call__(self, search):
+        self.calls.append(search)
+        return [
+            {
+                "type": "Feature",
+                "stac_version": "1.0.0",
+                "id": f"item-{i}",
+                "geometry": None,
+                "properties": {"datetime": "2024-01-01T00:00:00Z"},
+                "links": [],
+                # arrives pre-signed, as from a catalog opened with a signing modifier
+                "assets": {"data": {"href": f"{_BLOB}?st=old&sig=stale"}},
+            }
+            for i in range(self.n_items)
+        ]
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture(autouse=True)
+def fake_signing(monkeypatch):
+    tokens = iter(range(1, 1000))
+
+    def sign(items):
+        token = next(tokens)
+        for item in items:
+            for asset in item["assets"].values():
+                asset["href"] = f"{asset['href']}?sig=token{token}"
+        return items
+
+    monkeypatch.setattr(sic, "_sign", sign)
+
+
+def _search(bbox=(-97.5031, 30.4972, -97.4912, 30.5066)):
+    return {"collections": "jrc-gsw", "bbox": list(bbox), "limit": 1, "datetime": None}
+
+
+def test_snap_bbox_is_outward_and_stable():
+    assert sic.snap_bbox([-97.5031, 30.4972, -97.4912, 30.5066], 0.01) == [-97.51, 30.49, -97.49, 30.51]
+    # already on the grid: unchanged, not grown by float error
+    assert sic.snap_bbox([-97.5, 30.5, -97.49, 30.51], 0.01) == [-97.5, 30.5, -97.49, 30.51]
+    assert sic.snap_bbox([-180.0, -90.0, 180.0, 90.0], 0.25) == [-180.0, -90.0, 180.0, 90.0]
+
+
+def test_nearby_bboxes_share_one_search():
+    cache = sic.StacItemCache()
+    catalog = _Catalog()
+    first = cache.get_or_search(ENDPOINT, _search(), catalog)
+    second = cache.get_or_search(ENDPOINT, _search((-97.5029, 30.4975, -97.4915, 30.5061)), catalog)
+
+    assert len(catalog.calls) == 1
+    assert catalog.calls[0] == {"collections": ["jrc-gsw"], "bbox": [-97.51, 30.49, -97.49, 30.51], "limit": 1}
+    assert [f["id"] for f in first] == [f["id"] for f in second] == ["item-0", "item-1"]
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+    # a different datetime window or endpoint is a different search
+    cache.get_or_search(ENDPOINT, {**_search(), "datetime": "2024-01-01/2024-02-01"}, catalog)
+    cache.get_or_search(ENDPOINT + "/other", _search(), catalog)
+    assert len(catalog.calls) == 3
+
+
+def test_hrefs_are_stored_unsigned_and_resigned_per_read():
+    cache = sic.StacItemCache()
+    catalog = _Catalog(n_items=1)
+    a = cache.get_or_search(ENDPOINT, _search(), catalog)[0]["assets"]["data"]["href"]
+    b = cache.get_or_search(ENDPOINT, _search(), catalog)[0]["assets"]["data"]["href"]
+    assert a == f"{_BLOB}?sig=token1"
+    assert b == f"{_BLOB}?sig=token2"
+
+    raw = cache.get_or_search(ENDPOINT, _search(), catalog, sign=False)[0]["assets"]["data"]["href"]
+    assert raw == _BLOB
+
+
+def test_ttl_expiry_and_per_call_ttl():
+    clock = _Clock()
+    cache = sic.StacItemCache(ttl_s=60, clock=clock)
+    catalog = _Catalog()
+    cache.get_or_search(ENDPOINT, _search(), catalog)
+    cache.get_or_search(ENDPOINT, {**_search(), "collections": "cop-dem-glo-30"}, catalog, ttl_s=3600)
+    clock.now += 61
+    cache.get_or_search(ENDPOINT, _search(), catalog)
+    cache.get_or_search(ENDPOINT, {**_search(), "collections": "cop-dem-glo-30"}, catalog)
+    assert [c["collections"] for c in catalog.calls] == [["jrc-gsw"], ["cop-dem-glo-30"], ["jrc-gsw"]]
+
+
+def test_byte_budget_evicts_lru():
+    catalog = _Catalog()
+    probe = sic.StacItemCache()
+    probe.get_or_search(ENDPOINT, _search(), catalog)
+    entry_bytes = probe.stats()["bytes"]
+
+    cache = sic.StacItemCache(max_bytes=int(entry_bytes * 2.5))
+    for col in ("a", "b", "c"):
+        cache.get_or_search(ENDPOINT, {**_search(), "collections": col}, catalog)
+    stats = cache.stats()
+    assert stats["entries"] == 2 and stats["evictions"] == 1 and stats["bytes"] <= cache.max_bytes
+
+
+def test_sqlite_tier_is_shared_across_instances(tmp_path):
+    path = str(tmp_path / "stac-items.sqlite3")
+    catalog = _Catalog()
+    sic.StacItemCache(sqlite_path=path).get_or_search(ENDPOINT, _search(), catalog)
+
+    other_worker = sic.StacItemCache(sqlite_path=path)
+    items = other_worker.get_or_search(ENDPOINT, _search(), catalog)
+    assert len(catalog.calls) == 1
+    assert items[0]["assets"]["data"]["href"].startswith(f"{_BLOB}?sig=token")
+    stats = other_worker.stats()
+    assert stats["disk_hits"] == 1 and stats["sqlite"]["rows"] == 1
+
+    # promoted into memory: the next read does not touch the file
+    other_worker.get_or_search(ENDPOINT, _search(), catalog)
+    assert other_worker.stats()["hits"] == 1
+
+
+def test_failed_searches_are_not_cached():
+    cache = sic.StacItemCache()
+    calls = []
+
+    def flaky(search):
+        calls.append(search)
+        if len(calls) == 1:
+            raise RuntimeError("Status 503")
+        return []
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_search(ENDPOINT, _search(), flaky)
+    assert cache.get_or_search(ENDPOINT, _search(), flaky) == []
+    assert len(calls) == 2
+
+
+def test_disabled_cache_always_searches():
+    cache = sic.StacItemCache(max_bytes=0)
+    catalog = _Catalog()
+    cache.get_or_search(ENDPOINT, _search(), catalog)
+    cache.get_or_search(ENDPOINT, _search(), catalog)
+    assert len(catalog.calls) == 2
@@ -0,0 +1,184 @@
+"""Unit tests for stream_proxy (chunked pass-through for proxied bodies).
+
+No network -- the upstream is an in-process async iterator:
+  - chunks are forwarded in order and ``close`` sees a finished body
+  - ``on_complete`` receives the whole body only when the stream finished
+  - a client disconnect (generator closed mid-body) closes upstream and
+    fires ``on_abort`` instead of ``on_complete``
+  - an aborted TileFill makes coalesced waiters fetch again
+  - a Pro tile without an upstream ETag is buffered, so its first response
+    carries the same ETag as later cache hits
+"""
+
+from __future__ import annotations
+
+import asyncio
+
+import stream_proxy
+import tile_cache as tc
+
+
+async def _chunks(*parts: bytes):
+    for part in parts:
+        await asyncio.sleep(0)
+        yield part
+
+
+class _Recorder:
+    def __init__(self) -> None:
+        self.closed_with: list = []
+        self.completed: list = []
+        self.aborted = 0
+
+    async def close(self, finished: bool) -> None:
+        self.closed_with.append(finished)
+
+    async def on_complete(self, body: bytes) -> None:
+        self.completed.append(body)
+
+    def on_abort(self) -> None:
+        self.aborted += 1
+
+
+def test_tee_forwards_chunks_and_reports_full_body():
+    rec = _Recorder()
+
+    async def go():
+        gen = stream_proxy._tee(
+            _chunks(b"ab", b"cd", b"e"),
+            close=rec.close, on_complete=rec.on_complete, on_abort=rec.on_abort,
+        )
+        return [c async for c in gen]
+
+    assert asyncio.run(go()) == [b"ab", b"cd", b"e"]
+    assert rec.closed_with == [True]
+    assert rec.completed == [b"abcde"]
+    assert rec.aborted == 0
+
+
+def test_tee_disconnect_closes_upstream_and_aborts():
+    rec = _Recorder()
+
+    async def go():
+        gen = stream_proxy._tee(
+            _chunks(b"ab", b"cd", b"e"),
+            close=rec.close, on_complete=rec.on_complete, on_abort=rec.on_abort,
+        )
+        first = await gen.__anext__()
+        await gen.aclose()  # what Starlette does when the client goes away
+        return first
+
+    assert asyncio.run(go()) == b"ab"
+    assert rec.closed_with == [False]
+    assert rec.completed == []
+    assert rec.aborted == 1
+
+
+def test_tee_on_complete_failure_does_not_break_stream():
+    rec = _Recorder()
+
+    async def bad_complete(_body: bytes) -> None:
+        raise RuntimeError("disk full")
+
+    async def go():
+        gen = stream_proxy._tee(
+            _chunks(b"x"), close=rec.close, on_complete=bad_complete, on_abort=None,
+        )
+        return [c async for c in gen]
+
+    assert asyncio.run(go()) == [b"x"]
+    assert rec.closed_with == [True]
+
+
+def test_streaming_enabled_env_toggle(monkeypatch):
+    monkeypatch.delenv("PROXY_STREAMING", raising=False)
+    assert stream_proxy.streaming_enabled() is True
+    monkeypatch.setenv("PROXY_STREAMING", "false")
+    assert stream_proxy.streaming_enabled() is False
+
+
+def test_streamed_fill_populates_cache_for_next_request():
+    cache = tc.TileCache(memory_bytes=1024, default_ttl=60.0)
+
+    async def never(_):
+        raise AssertionError("cached tile should not refetch")
+
+    async def go():
+        fill = cache.begin_fill("k")
+        assert cache.is_inflight("k")
+        await fill.complete(tc.UpstreamTile(200, b"streamed", "image/png", '"v1"'))
+        return await cache.get_or_fetch("k", never)
+
+    result = asyncio.run(go())
+    assert result.source == "memory" and result.body == b"streamed"
+    assert cache.has_entry("k") and not cache.is_inflight("k")
+
+
+def test_aborted_fill_sends_waiters_back_upstream():
+    cache = tc.TileCache(memory_bytes=1024, default_ttl=60.0)
+    calls: list = []
+
+    async def fetch(validator):
+        calls.append(validator)
+        return tc.UpstreamTile(200, b"fresh", "image/png")
+
+    async def go():
+        fill = cache.begin_fill("k")
+        waiter = asyncio.create_task(cache.get_or_fetch("k", fetch))
+        await asyncio.sleep(0)
+        fill.abort()
+        return await waiter
+
+    result = asyncio.run(go())
+    assert result.body == b"fresh"
+    assert calls == [None]
+
+
+def test_pro_tile_without_upstream_etag_is_served_with_the_cached_etag(monkeypatch):
+    import fastapi_app
+    import http_pool
+    import pro_stac_client
+    from starlette.requests import Request
+
+    upstream: list = []
+
+    class _Resp:
+        status = 200
+        headers = {"Content-Type": "image/png", "Cache-Control": "max-age=60"}
+
+        async def read(self):
+            return b"tile-bytes"
+
+        def release(self):
+            pass
+
+    class _Session:
+        async def get(self, url, **kw):
+            upstream.append(str(url))
+            return _Resp()
+
+    async def no_auth():
+        return {}
+
+    monkeypatch.setattr(pro_stac_client, "get_pro_data_base", lambda: "https://pro.example/data")
+    monkeypatch.setattr(pro_stac_client, "_auth_headers", no_auth)
+    monkeypatch.setattr(http_pool, "get_session", lambda name: _Session())
+    monkeypatch.setattr(tc, "_tile_cache", tc.TileCache(memory_bytes=1 << 20, default_ttl=60.0))
+    monkeypatch.setenv("PROXY_STREAMING", "true")
+
+    def request(if_none_match=None):
+        headers = [(b"if-none-match", if_none_match.encode())] if if_none_match else []
+        return Request({"type": "http", "query_string": b"", "headers": headers})
+
+    async def go():
+        first = await fastapi_app.pro_tile_proxy("tiles/WebMercatorQuad/3/2/1", request())
+        second = await fastapi_app.pro_tile_proxy("tiles/WebMercatorQuad/3/2/1", request())
+        etag = first.headers.get("etag")
+        again = await fastapi_app.pro_tile_proxy("tiles/WebMercatorQuad/3/2/1", request(etag))
+        return first, second, again
+
+    first, second, again = asyncio.run(go())
+    assert len(upstream) == 1
+    assert first.body == b"tile-bytes"
+    assert first.headers["etag"] and first.headers["etag"] == second.headers["etag"]
+    assert again.status_code == 304
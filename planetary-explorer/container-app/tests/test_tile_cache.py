@@ -0,0 +1,235 @@
+"""Unit tests for tile_cache (Pro tile proxy byte cache).
+
+Exercises the cache with an in-process fake fetcher -- no network:
+  - key normalization, Cache-Control parsing, If-None-Match matching
+  - memory hit / miss counters and byte-bounded LRU eviction
+  - stale entry revalidation via upstream ETag + 304
+  - no-store responses and upstream errors are never cached
+  - concurrent identical misses collapse into one upstream fetch
+  - disk tier survives a fresh TileCache instance and is size-bounded
+"""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+import tile_cache as tc
+
+
+class _Upstream:
+    """Scripted fetcher: returns queued UpstreamTiles, records validators."""
+
+    def __init__(self, *responses: tc.UpstreamTile, delay: float = 0.0) -> None:
+        self.responses = list(responses)
+        self.validators: list = []
+        self.delay = delay
+
+    async def __call__(self, if_none_match):
+        self.validators.append(if_none_match)
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        return self.responses.pop(0) if len(self.responses) > 1 else self.responses[0]
+
+
+def _png(body: bytes = b"png-bytes", **kw) -> tc.UpstreamTile:
+    return tc.UpstreamTile(status=200, body=body, content_type="image/png", **kw)
+
+
+def _cache(**kw) -> tc.TileCache:
+    kw.setdefault("memory_bytes", 1024)
+    kw.setdefault("default_ttl", 60.0)
+    return tc.TileCache(**kw)
+
+
+# ---------------------------------------------------------------------------
+# pure helpers
+# ---------------------------------------------------------------------------
+
+def test_cache_key_sorts_query_pairs_and_strips_slashes():
+    a = tc.cache_key("/tiles/1/2/3@1x", "rescale=0,4000&assets=B04&api-version=x")
+    b = tc.cache_key("tiles/1/2/3@1x/", "assets=B04&api-version=x&rescale=0,4000")
+    assert a == b
+
+
+@pytest.mark.parametrize(
+    "header,expected",
+    [
+        (None, 60.0),
+        ("public, max-age=120", 120.0),
+        ("max-age=120, s-maxage=30", 30.0),
+        ("no-store", None),
+        ("no-cache", 0.0),
+        ("public", 60.0),
+    ],
+)
+def test_parse_ttl(header, expected):
+    assert tc.parse_ttl(header, 60.0) == expected
+
+
+def test_etag_matches_weak_and_lists():
+    assert tc.etag_matches('"abc"', '"abc"')
+    assert tc.etag_matches('W/"abc"', '"abc"')
+    assert tc.etag_matches('"x", "abc"', '"abc"')
+    assert tc.etag_matches("*", '"abc"')
+    assert not tc.etag_matches('"zzz"', '"abc"')
+    assert not tc.etag_matches(None, '"abc"')
+
+
+# ---------------------------------------------------------------------------
+# memory tier
+# ---------------------------------------------------------------------------
+
+def test_second_request_is_a_memory_hit():
+    cache = _cache()
+    upstream = _Upstream(_png(etag='"v1"'))
+
+    async def go():
+        first = await cache.get_or_fetch("k", upstream)
+        second = await cache.get_or_fetch("k", upstream)
+        return first, second
+
+    first, second = asyncio.run(go())
+    assert first.source == "upstream"
+    assert second.source == "memory"
+    assert second.etag == '"v1"'
+    assert len(upstream.validators) == 1
+    stats = cache.stats()
+    assert stats["misses"] == 1 and stats["hits_memory"] == 1
+    assert stats["bytes_served_from_cache"] == len(b"png-bytes")
+
+
+def test_missing_upstream_etag_gets_content_hash():
+    cache = _cache()
+
+    async def go():
+        return await cache.get_or_fetch("k", _Upstream(_png()))
+
+    result = asyncio.run(go())
+    assert result.etag and result.etag.startswith('"')
+
+
+def test_memory_tier_is_byte_bounded_lru():
+    cache = _cache(memory_bytes=20)
+
+    async def go():
+        await cache.get_or_fetch("a", _Upstream(_png(b"a" * 10)))
+        await cache.get_or_fetch("b", _Upstream(_png(b"b" * 10)))
+        await cache.get_or_fetch("a", _Upstream(_png(b"a" * 10)))  # touch a
+        await cache.get_or_fetch("c", _Upstream(_png(b"c" * 10)))  # evicts b
+
+    asyncio.run(go())
+    assert list(cache._mem) == ["a", "c"]
+    assert cache.stats()["evictions_memory"] == 1
+
+
+def test_stale_entry_revalidates_with_upstream_etag():
+    cache = _cache()
+    upstream = _Upstream(
+        _png(etag='"v1"', cache_control="max-age=0"),
+        tc.UpstreamTile(status=304, body=b"", content_type="", cache_control="max-age=60"),
+    )
+
+    async def go():
+        await cache.get_or_fetch("k", upstream)
+        again = await cache.get_or_fetch("k", upstream)
+        third = await cache.get_or_fetch("k", upstream)
+        return again, third
+
+    again, third = asyncio.run(go())
+    assert upstream.validators == [None, '"v1"']
+    assert again.source == "revalidated" and again.body == b"png-bytes"
+    assert third.source == "memory"
+    assert cache.stats()["revalidated"] == 1
+
+
+def test_no_store_and_errors_are_not_cached():
+    cache = _cache()
+    no_store = _Upstream(_png(cache_control="no-store"))
+    error = _Upstream(tc.UpstreamTile(status=424, body=b"nope", content_type="text/plain"))
+
+    async def go():
+        await cache.get_or_fetch("ns", no_store)
+        await cache.get_or_fetch("ns", no_store)
+        err = await cache.get_or_fetch("err", error)
+        await cache.get_or_fetch("err", error)
+        return err
+
+    err = asyncio.run(go())
+    assert len(no_store.validators) == 2
+    assert len(error.validators) == 2
+    assert err.status == 424 and err.etag is None
+    assert cache.stats()["stores"] == 0
+
+
+def test_concurrent_identical_misses_share_one_fetch():
+    cache = _cache()
+    upstream = _Upstream(_png(), delay=0.05)
+
+    async def go():
+        return await asyncio.gather(*(cache.get_or_fetch("k", upstream) for _ in range(5)))
+
+    results = asyncio.run(go())
+    assert len(upstream.validators) == 1
+    assert all(r.body == b"png-bytes" for r in results)
+    assert cache.stats()["coalesced"] == 4
+
+
+def test_fetch_failure_propagates_to_coalesced_waiters():
+    cache = _cache()
+
+    async def boom(_):
+        await asyncio.sleep(0.01)
+        raise RuntimeError("tiler down")
+
+    async def go():
+        return await asyncio.gather(
+            cache.get_or_fetch("k", boom),
+            cache.get_or_fetch("k", boom),
+            return_exceptions=True,
+        )
+
+    results = asyncio.run(go())
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert cache.stats()["inflight"] == 0
+
+
+# ---------------------------------------------------------------------------
+# disk tier
+# ---------------------------------------------------------------------------
+
+def test_disk_tier_survives_new_instance(tmp_path):
+    first = _cache(disk_dir=str(tmp_path), disk_bytes=10_000)
+
+    async def seed():
+        await first.get_or_fetch("k", _Upstream(_png(etag='"v1"')))
+
+    asyncio.run(seed())
+
+    second = _cache(disk_dir=str(tmp_path), disk_bytes=10_000)
+    never = _Upstream(_png(b"should-not-fetch"))
+
+    async def go():
+        return await second.get_or_fetch("k", never)
+
+    result = asyncio.run(go())
+    assert result.source == "disk"
+    assert result.body == b"png-bytes"
+    assert result.etag == '"v1"'
+    assert never.validators == []
+
+
+def test_disk_tier_evicts_oldest_when_over_budget(tmp_path):
+    # Each file is body + small JSON header; budget fits roughly two.
+    cache = _cache(memory_bytes=0, disk_dir=str(tmp_path), disk_bytes=700)
+
+    async def go():
+        for key in ("a", "b", "c"):
+            await cache.get_or_fetch(key, _Upstream(_png(key.encode() * 200)))
+
+    asyncio.run(go())
+    stats = cache.stats()
+    assert stats["evictions_disk"] >= 1
+    assert stats["disk_bytes"] <= 700
+    assert len(list(tmp_path.glob("*.tile"))) == stats["disk_entries"]
@@ -0,0 +1,145 @@
+"""Unit tests for tile_prefetcher (viewport tile warm-up).
+
+Tile requests go to a fake aiohttp-style session that records URLs and
+the peak number in flight, so no network:
+
+  * tile math: viewport cover, center-out order, deeper ring, footprints
+  * global concurrency budget and max-tiles cap
+  * dedup across sessions viewing the same area (in flight and recent)
+  * a new query cancels the session's job; shared tiles keep going
+  * time-to-first-tile / viewport-warm metrics (failed tiles do not count)
+"""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+import tile_prefetcher
+from tile_prefetcher import TilePrefetcher, tiles_for_bbox, viewport_pyramid
+
+_MOSAIC = "https://planetarycomputer.microsoft.com/api/data/v1/mosaic/abc/tilejson.json?collection=sentinel-2-l2a"
+_ITEM = "https://planetarycomputer.microsoft.com/api/data/v1/item/tilejson.json?collection=naip&item=x"
+_SEATTLE = [-122.46, 47.48, -122.22, 47.73]
+
+
+class _Response:
+    def __init__(self, owner):
+        self.owner = owner
+        self.status = owner.status
+
+    async def __aenter__(self):
+        self.owner.active += 1
+        self.owner.peak = max(self.owner.peak, self.owner.active)
+        await asyncio.sleep(self.owner.delay)
+        return self
+
+    async def __aexit__(self, *exc):
+        self.owner.active -= 1
+
+    async def read(self):
+        return b"png"
+
+
+class _Session:
+    def __init__(self, delay=0.01, status=200):
+        self.delay = delay
+        self.status = status
+        self.urls = []
+        self.active = 0
+        self.peak = 0
+
+    def get(self, url, timeout=None):
+        self.urls.append(url)
+        return _Response(self)
+
+
+def test_tiles_cover_viewport_center_out():
+    tiles = tiles_for_bbox(_SEATTLE, 10)
+    assert len(tiles) == 4 and all(t[0] == 10 for t in tiles)
+    big = tiles_for_bbox([-124.4, 32.5, -114.1, 42.0], 6)
+    assert len(big) == 9
+    assert big[0] == (6, 10, 24)  # tile containing the center comes first
+    pyramid = viewport_pyramid(_SEATTLE, 10)
+    assert [t[0] for t in pyramid] == [10] * 4 + [11] * 6
+    assert len(tiles_for_bbox([-180, -90, 180, 90], 2)) == 16  # clamped to the tile grid
+
+
+def test_plan_orders_zoom_then_layer_and_clips_item_footprints():
+    p = TilePrefetcher(max_tiles=100)
+    far_away = [10.0, 10.0, 11.0, 11.0]
+    urls = p.plan([(_MOSAIC, None), (_ITEM, [-122.30, 47.60, -122.25, 47.65]), (_ITEM.replace("x", "y"), far_away)], _SEATTLE, 10)
+    assert urls[0].startswith(_MOSAIC.split("tilejson.json")[0] + "tiles/10/")
+    zooms = [int(u.split("/tiles/")[1].split("/")[0]) for u in urls]
+    assert zooms == sorted(zooms)
+    assert not any("item=y" in u for u in urls)  # footprint outside the viewport
+    assert any("/item/tiles/11/" in u for u in urls)
+    assert p.plan([("/api/pro/mosaic/tilejson?search_id=1", None)], _SEATTLE, 10) == []  # proxied: skipped
+    assert len(TilePrefetcher(max_tiles=3).plan([(_MOSAIC, None)], [-124.4, 32.5, -114.1, 42.0], 5)) == 3
+
+
+def test_global_budget_and_dedup_across_sessions():
+    session = _Session()
+    p = TilePrefetcher(concurrency=3, session_factory=lambda: session)
+    viewport = [-124.4, 32.5, -114.1, 42.0]
+
+    async def run():
+        a = p.schedule("alice", [(_MOSAIC, None)], viewport, 6)
+        b = p.schedule("bob", [(_MOSAIC, None)], viewport, 6)
+        await asyncio.gather(a, b)
+        c = p.schedule("carol", [(_MOSAIC, None)], viewport, 6)  # recently warmed
+        await c
+
+    asyncio.run(run())
+    planned = p.plan([(_MOSAIC, None)], viewport, 6)
+    assert sorted(session.urls) == sorted(planned)  # each tile rendered once
+    assert session.peak <= 3
+    stats = p.stats()
+    assert stats["tiles_fetched"] == len(planned)
+    assert stats["tiles_shared"] + stats["tiles_skipped"] == 2 * len(planned)
+    assert stats["first_tile_ms_p50"] is not None and stats["viewport_warm_ms_p95"] is not None
+
+
+def test_new_query_cancels_the_sessions_job():
+    session = _Session(delay=0.05)
+    p = TilePrefetcher(concurrency=2, session_factory=lambda: session)
+    viewport = [-124.4, 32.5, -114.1, 42.0]
+
+    async def run():
+        first = p.schedule("alice", [(_MOSAIC, None)], viewport, 6)
+        await asyncio.sleep(0.01)
+        p.schedule("alice", [(_ITEM, None)], _SEATTLE, 10)  # the user asked something else
+        await asyncio.sleep(0)
+        assert first.cancelled()
+        await asyncio.sleep(0.2)
+
+    asyncio.run(run())
+    mosaic_tiles = [u for u in session.urls if "/mosaic/" in u]
+    assert len(mosaic_tiles) == 2  # only the two already in flight were rendered
+    assert any("/item/" in u for u in session.urls)
+    assert p.stats()["cancelled"] == 1
+    assert p.cancel(None) is False
+
+
+def test_failed_tiles_do_not_count_as_first_tile():
+    p = TilePrefetcher(session_factory=lambda: _Session(status=503))
+
+    async def run():
+        await p.schedule("alice", [(_MOSAIC, None)], _SEATTLE, 10)
+
+    asyncio.run(run())
+    stats = p.stats()
+    assert stats["tile_errors"] == len(p.plan([(_MOSAIC, None)], _SEATTLE, 10))
+    assert stats["first_tile_ms_p50"] is None and stats["viewport_warm_ms_p95"] is not None
+
+
+def test_disabled_by_env(monkeypatch):
+    monkeypatch.setenv("TILE_PREFETCH", "off")
+    assert tile_prefetcher.get_tile_prefetcher() is None
+    assert tile_prefetcher.stats() == {"enabled": False}
+
+
+@pytest.mark.parametrize("viewport", [None, [1, 2, 3]])
+def test_schedule_ignores_bad_viewports(viewport):
+    assert TilePrefetcher().schedule("s", [(_MOSAIC, None)], viewport, 6) is None
@@ -0,0 +1,503 @@
+"""Byte cache for proxied MPC Pro tiles (``/api/pro/tile/{rest}``).
+
+Every pan of the map re-requests the same z/x/y tiles, and before this
+cache each one went back to the GeoCatalog tiler. Tiles are keyed by the
+*normalized* upstream path + query (query parameters sorted so
+``assets=a&rescale=0,1`` and ``rescale=0,1&assets=a`` share an entry)
+and held in two tiers:
+
+  - memory: byte-bounded LRU (``PRO_TILE_CACHE_MEMORY_MB``, default 128)
+  - disk:   optional, enabled by ``PRO_TILE_CACHE_DIR``; size-bounded by
+            ``PRO_TILE_CACHE_DISK_MB`` (default 1024) with LRU eviction
+
+Freshness follows the upstream ``Cache-Control`` header (``max-age`` /
+``s-maxage``; ``no-store`` is never cached; ``no-cache`` is stored but
+revalidated on every use). Without the header we fall back to
+``PRO_TILE_CACHE_DEFAULT_TTL_S`` (default 300). Stale entries that carry
+an upstream ``ETag`` are revalidated with ``If-None-Match`` -- a 304
+just extends the entry's lifetime.
+
+Concurrent misses for the same key are collapsed into one upstream
+fetch (single-flight). Tiles are shared across users: the proxy always
+authenticates to the tiler with the app's own identity, so the bytes do
+not depend on who asked.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+@dataclass
+class UpstreamTile:
+    """Result of one upstream tile fetch (what the fetcher returns)."""
+
+    status: int
+    body: bytes
+    content_type: str
+    etag: Optional[str] = None
+    cache_control: Optional[str] = None
+
+
+@dataclass
+class CachedTile:
+    body: bytes
+    content_type: str
+    # ETag we hand to browsers. Upstream's when it sent one, otherwise a
+    # content hash so browser-side 304s work regardless.
+    etag: str
+    upstream_etag: Optional[str]
+    cache_control: Optional[str]
+    expires_at: float
+
+    def fresh(self, now: Optional[float] = None) -> bool:
+        return (now if now is not None else time.time()) < self.expires_at
+
+
+@dataclass
+class TileResult:
+    """What the proxy renders: a cached/fresh tile or an upstream error."""
+
+    status: int
+    body: bytes
+    content_type: str
+    etag: Optional[str] = None
+    cache_control: Optional[str] = None
+    source: str = "upstream"  # upstream | memory | disk | revalidated | coalesced
+
+
+@dataclass
+class TileCacheStats:
+    hits_memory: int = 0
+    hits_disk: int = 0
+    misses: int = 0
+    revalidated: int = 0
+    coalesced: int = 0
+    stores: int = 0
+    evictions_memory: int = 0
+    evictions_disk: int = 0
+    bytes_served_from_cache: int = 0
+    bytes_fetched_upstream: int = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return dict(self.__dict__)
+
+
+_MAX_AGE_RE = re.compile(r"(?:^|[,\s])(s-maxage|max-age)\s*=\s*(\d+)", re.IGNORECASE)
+
+
+def cache_key(path: str, raw_query: str) -> str:
+    """Normalize ``path?query`` into a stable cache key.
+
+    Parameter *order* is irrelevant to the tiler, so pairs are sorted;
+    the raw encoding of each pair is kept verbatim (``rescale=0,4000``
+    and ``rescale=0%2C4000`` stay distinct, matching what we forward).
+    """
+    pairs = sorted(p for p in (raw_query or "").split("&") if p)
+    return f"{path.strip('/')}?{'&'.join(pairs)}"
+
+
+def parse_ttl(cache_control: Optional[str], default_ttl: float) -> Optional[float]:
+    """Seconds an entry stays fresh, or ``None`` when it must not be stored."""
+    if not cache_control:
+        return default_ttl
+    cc = cache_control.lower()
+    if "no-store" in cc:
+        return None
+    if "no-cache" in cc:
+        return 0.0
+    ages = {m.group(1).lower(): int(m.group(2)) for m in _MAX_AGE_RE.finditer(cc)}
+    if "s-maxage" in ages:
+        return float(ages["s-maxage"])
+    if "max-age" in ages:
+        return float(ages["max-age"])
+    return default_ttl
+
+
+def etag_matches(if_none_match: Optional[str], etag: Optional[str]) -> bool:
+    """RFC 7232 weak comparison of an ``If-None-Match`` header against ``etag``."""
+    if not if_none_match or not etag:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    want = etag.strip().removeprefix("W/")
+    return any(
+        tag.strip().removeprefix("W/") == want for tag in if_none_match.split(",")
+    )
+
+
+class _DiskTier:
+    """Flat directory of ``<sha>.tile`` files with an in-memory LRU index.
+
+    File layout: 4-byte big-endian header length, JSON metadata, body.
+    All filesystem I/O runs in a worker thread via ``asyncio.to_thread``.
+    """
+
+    def __init__(self, root: Path, max_bytes: int) -> None:
+        self.root = root
+        self.max_bytes = max_bytes
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._index: "OrderedDict[str, int]" = OrderedDict()
+        self.bytes = 0
+        files = sorted(self.root.glob("*.tile"), key=lambda p: p.stat().st_mtime)
+        for f in files:
+            size = f.stat().st_size
+            self._index[f.stem] = size
+            self.bytes += size
+
+    def _path(self, key: str) -> Path:
+        return self.root / f"{hashlib.sha256(key.encode('utf-8')).hexdigest()}.tile"
+
+    def _read(self, key: str) -> Optional[CachedTile]:
+        path = self._path(key)
+        try:
+            raw = path.read_bytes()
+        except OSError:
+            return None
+        hlen = int.from_bytes(raw[:4], "big")
+        meta = json.loads(raw[4:4 + hlen].decode("utf-8"))
+        if meta.get("key") != key:
+            return None
+        return CachedTile(
+            body=raw[4 + hlen:],
+            content_type=meta["content_type"],
+            etag=meta["etag"],
+            upstream_etag=meta.get("upstream_etag"),
+            cache_control=meta.get("cache_control"),
+            expires_at=float(meta["expires_at"]),
+        )
+
+    def _write(self, key: str, tile: CachedTile) -> int:
+        meta = json.dumps({
+            "key": key,
+            "content_type": tile.content_type,
+            "etag": tile.etag,
+            "upstream_etag": tile.upstream_etag,
+            "cache_control": tile.cache_control,
+            "expires_at": tile.expires_at,
+        }).encode("utf-8")
+        path = self._path(key)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_bytes(len(meta).to_bytes(4, "big") + meta + tile.body)
+        os.replace(tmp, path)
+        return path.stat().st_size
+
+    def has(self, key: str) -> bool:
+        return self._path(key).stem in self._index
+
+    def _unlink(self, stem: str) -> None:
+        try:
+            (self.root / f"{stem}.tile").unlink()
+        except OSError:
+            pass
+
+    async def get(self, key: str) -> Optional[CachedTile]:
+        stem = self._path(key).stem
+        if stem not in self._index:
+            return None
+        try:
+            tile = await asyncio.to_thread(self._read, key)
+        except Exception as exc:  # corrupt file -- drop it
+            logger.debug("[TILE-CACHE] disk read %s failed: %s", stem[:12], exc)
+            tile = None
+        if tile is None:
+            self.bytes -= self._index.pop(stem, 0)
+            return None
+        self._index.move_to_end(stem)
+        return tile
+
+    async def put(self, key: str, tile: CachedTile) -> int:
+        """Store ``tile``; returns the number of files evicted."""
+        if len(tile.body) > self.max_bytes:
+            return 0
+        stem = self._path(key).stem
+        try:
+            size = await asyncio.to_thread(self._write, key, tile)
+        except Exception as exc:
+            logger.warning("[TILE-CACHE] disk write failed: %s", exc)
+            return 0
+        self.bytes += size - self._index.pop(stem, 0)
+        self._index[stem] = size
+        evicted = 0
+        while self.bytes > self.max_bytes and self._index:
+            old, old_size = self._index.popitem(last=False)
+            self.bytes -= old_size
+            await asyncio.to_thread(self._unlink, old)
+            evicted += 1
+        return evicted
+
+
+class TileCache:
+    """Two-tier (memory LRU + optional disk) tile cache with single-flight."""
+
+    def __init__(
+        self,
+        *,
+        memory_bytes: int,
+        default_ttl: float,
+        disk_dir: Optional[str] = None,
+        disk_bytes: int = 0,
+    ) -> None:
+        self.memory_max_bytes = memory_bytes
+        self.default_ttl = default_ttl
+        self._mem: "OrderedDict[str, CachedTile]" = OrderedDict()
+        self._mem_bytes = 0
+        self._inflight: Dict[str, "asyncio.Future[Optional[TileResult]]"] = {}
+        self._disk: Optional[_DiskTier] = None
+        if disk_dir and disk_bytes > 0:
+            try:
+                self._disk = _DiskTier(Path(disk_dir), disk_bytes)
+            except OSError as exc:
+                logger.warning("[TILE-CACHE] disk tier disabled (%s): %s", disk_dir, exc)
+        self.stats_counters = TileCacheStats()
+
+    # ------------------------------------------------------------------ memory
+    def _mem_get(self, key: str) -> Optional[CachedTile]:
+        tile = self._mem.get(key)
+        if tile is not None:
+            self._mem.move_to_end(key)
+        return tile
+
+    def _mem_put(self, key: str, tile: CachedTile) -> None:
+        if self.memory_max_bytes <= 0 or len(tile.body) > self.memory_max_bytes:
+            return
+        old = self._mem.pop(key, None)
+        if old is not None:
+            self._mem_bytes -= len(old.body)
+        self._mem[key] = tile
+        self._mem_bytes += len(tile.body)
+        while self._mem_bytes > self.memory_max_bytes and self._mem:
+            _, evicted = self._mem.popitem(last=False)
+            self._mem_bytes -= len(evicted.body)
+            self.stats_counters.evictions_memory += 1
+
+    async def _lookup(self, key: str) -> Tuple[Optional[CachedTile], str]:
+        tile = self._mem_get(key)
+        if tile is not None:
+            return tile, "memory"
+        if self._disk is not None:
+            tile = await self._disk.get(key)
+            if tile is not None:
+                self._mem_put(key, tile)
+                return tile, "disk"
+        return None, ""
+
+    async def _store(self, key: str, tile: CachedTile) -> None:
+        self._mem_put(key, tile)
+        if self._disk is not None:
+            self.stats_counters.evictions_disk += await self._disk.put(key, tile)
+        self.stats_counters.stores += 1
+
+    # ------------------------------------------------------------------ API
+    def _served(self, tile: CachedTile, source: str) -> TileResult:
+        self.stats_counters.bytes_served_from_cache += len(tile.body)
+        return TileResult(
+            status=200,
+            body=tile.body,
+            content_type=tile.content_type,
+            etag=tile.etag,
+            cache_control=tile.cache_control,
+            source=source,
+        )
+
+    def has_entry(self, key: str) -> bool:
+        """True when either tier holds ``key`` (fresh or stale)."""
+        if key in self._mem:
+            return True
+        return self._disk is not None and self._disk.has(key)
+
+    def is_inflight(self, key: str) -> bool:
+        return key in self._inflight
+
+    def begin_fill(self, key: str) -> "TileFill":
+        """Claim ``key`` for a caller that fetches the tile itself.
+
+        Used by the streaming proxy path: concurrent requests for the
+        same key wait on the returned :class:`TileFill` instead of
+        issuing their own upstream fetch.
+        """
+        return TileFill(self, key)
+
+    async def get_or_fetch(
+        self,
+        key: str,
+        fetch: Callable[[Optional[str]], Awaitable[UpstreamTile]],
+    ) -> TileResult:
+        """Return the tile for ``key``, calling ``fetch`` only on a miss.
+
+        ``fetch(if_none_match)`` performs the upstream request; it gets
+        the stale entry's upstream ETag (or ``None``) so it can send a
+        conditional request.
+        """
+        while True:
+            tile, tier = await self._lookup(key)
+            if tile is not None and tile.fresh():
+                if tier == "memory":
+                    self.stats_counters.hits_memory += 1
+                else:
+                    self.stats_counters.hits_disk += 1
+                return self._served(tile, tier)
+
+            pending = self._inflight.get(key)
+            if pending is None:
+                break
+            self.stats_counters.coalesced += 1
+            result = await asyncio.shield(pending)
+            if result is not None:
+                return TileResult(**{**result.__dict__, "source": "coalesced"})
+            # The fill was abandoned (streaming client went away before
+            # the body completed) -- look again and fetch ourselves.
+
+        fill = self.begin_fill(key)
+        try:
+            validator = tile.upstream_etag if tile is not None else None
+            result = await self._accept(key, tile, await fetch(validator))
+        except BaseException as exc:
+            fill.fail(exc)
+            raise
+        fill.resolve(result)
+        return result
+
+    async def _accept(
+        self,
+        key: str,
+        stale: Optional[CachedTile],
+        up: UpstreamTile,
+    ) -> TileResult:
+        """Fold one upstream response into the cache and render it."""
+        now = time.time()
+
+        if up.status == 304 and stale is not None:
+            ttl = parse_ttl(up.cache_control or stale.cache_control, self.default_ttl)
+            stale.expires_at = now + (ttl or 0.0)
+            await self._store(key, stale)
+            self.stats_counters.revalidated += 1
+            return self._served(stale, "revalidated")
+
+        self.stats_counters.misses += 1
+        self.stats_counters.bytes_fetched_upstream += len(up.body)
+        if up.status != 200:
+            return TileResult(status=up.status, body=up.body, content_type=up.content_type)
+
+        etag = up.etag or f'"{hashlib.sha1(up.body).hexdigest()[:20]}"'
+        ttl = parse_ttl(up.cache_control, self.default_ttl)
+        if ttl is not None:
+            await self._store(key, CachedTile(
+                body=up.body,
+                content_type=up.content_type,
+                etag=etag,
+                upstream_etag=up.etag,
+                cache_control=up.cache_control,
+                expires_at=now + ttl,
+            ))
+        return TileResult(
+            status=200,
+            body=up.body,
+            content_type=up.content_type,
+            etag=etag,
+            cache_control=up.cache_control,
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        out = self.stats_counters.as_dict()
+        lookups = out["hits_memory"] + out["hits_disk"] + out["revalidated"] + out["misses"]
+        hits = lookups - out["misses"]
+        out["hit_rate"] = round(hits / lookups, 4) if lookups else None
+        out["memory_entries"] = len(self._mem)
+        out["memory_bytes"] = self._mem_bytes
+        out["memory_max_bytes"] = self.memory_max_bytes
+        out["inflight"] = len(self._inflight)
+        if self._disk is not None:
+            out["disk_entries"] = len(self._disk._index)
+            out["disk_bytes"] = self._disk.bytes
+            out["disk_max_bytes"] = self._disk.max_bytes
+        return out
+
+
+class TileFill:
+    """In-flight claim on one cache key (see :meth:`TileCache.begin_fill`).
+
+    Exactly one of :meth:`complete`, :meth:`resolve`, :meth:`fail` or
+    :meth:`abort` should end it; later calls are no-ops.
+    """
+
+    def __init__(self, cache: TileCache, key: str) -> None:
+        self._cache = cache
+        self.key = key
+        self.future: "asyncio.Future[Optional[TileResult]]" = (
+            asyncio.get_running_loop().create_future()
+        )
+        cache._inflight[key] = self.future
+
+    def _release(self) -> None:
+        if self._cache._inflight.get(self.key) is self.future:
+            self._cache._inflight.pop(self.key, None)
+
+    def resolve(self, result: Optional[TileResult]) -> None:
+        if not self.future.done():
+            self.future.set_result(result)
+        self._release()
+
+    def fail(self, exc: BaseException) -> None:
+        if not self.future.done():
+            self.future.set_exception(exc)
+            # Waiters re-raise; mark retrieved so a lone fetch does not
+            # log "exception was never retrieved".
+            self.future.exception()
+        self._release()
+
+    def abort(self) -> None:
+        """Give up without a result; waiters retry on their own."""
+        self.resolve(None)
+
+    async def complete(self, up: UpstreamTile) -> TileResult:
+        """Store a fully-read upstream response and wake any waiters."""
+        try:
+            result = await self._cache._accept(self.key, None, up)
+        except BaseException as exc:
+            self.fail(exc)
+            raise
+        self.resolve(result)
+        return result
+
+
+_tile_cache: Optional[TileCache] = None
+
+
+def get_tile_cache() -> TileCache:
+    """Process-wide tile cache, configured from env on first use."""
+    global _tile_cache
+    if _tile_cache is None:
+        disk_dir = (os.getenv("PRO_TILE_CACHE_DIR") or "").strip() or None
+        _tile_cache = TileCache(
+            memory_bytes=int(_env_float("PRO_TILE_CACHE_MEMORY_MB", 128) * 1024 * 1024),
+            default_ttl=_env_float("PRO_TILE_CACHE_DEFAULT_TTL_S", 300),
+            disk_dir=disk_dir,
+            disk_bytes=int(_env_float("PRO_TILE_CACHE_DISK_MB", 1024) * 1024 * 1024),
+        )
+        logger.info(
+            "[TILE-CACHE] initialized (memory=%dMB disk=%s ttl=%ds)",
+            _tile_cache.memory_max_bytes // (1024 * 1024),
+            disk_dir or "off",
+            int(_tile_cache.default_ttl),
+        )
+    return _tile_cache
@@ -0,0 +1,408 @@
+"""Viewport-aware tile prefetch for mosaic and item layers.
+
+The first map paint waits on cold TiTiler renders. The old warm-up
+(``fastapi_app._prewarm_mosaic_tiles``) rendered only the single center
+tile at zooms 6 and 8 -- usually not the zoom the map actually opens at
+-- opened a fresh ``aiohttp.ClientSession`` per query, and ran as an
+unbounded fire-and-forget task, so a burst of queries fanned out
+without limit and kept rendering for users who had already moved on.
+
+This module schedules the warm-up instead:
+
+  - **viewport pyramid**: every tile covering the initial viewport at the
+    zoom the map opens at (``calculate_zoom_level(bbox)``) plus the tiles
+    one zoom deeper, where the first zoom-in lands; item layers only
+    warm the tiles that intersect their footprint
+  - **center-out priority**: tiles are issued nearest-to-center first,
+    all opening-zoom tiles before the deeper ring, mosaic before items
+  - **global budget**: at most ``TILE_PREFETCH_CONCURRENCY`` requests in
+    flight across all users, on the pooled ``stac`` session
+  - **dedup across users**: a tile already in flight is shared, and one
+    warmed within ``TILE_PREFETCH_RECENT_S`` is skipped, so concurrent
+    users viewing the same area render it once
+  - **cancelled on a new query**: each session has at most one job; a
+    new query (or :meth:`TilePrefetcher.cancel`) stops the old job from
+    issuing further requests
+  - **metered**: time to first warmed tile and to a fully warmed
+    viewport per job (p50 / p95), plus tile counts, in ``/api/health``
+
+Tile URLs are derived from the tilejson URL the same way as before
+(``tilejson.json`` -> ``tiles/{z}/{x}/{y}``); relative (proxied) URLs are
+not prefetched.
+
+Config:
+  TILE_PREFETCH                 set to off/false/0 to disable
+  TILE_PREFETCH_CONCURRENCY     global in-flight tile requests (default 8)
+  TILE_PREFETCH_MAX_TILES       tiles per job (default 48)
+  TILE_PREFETCH_TIMEOUT_S       per-tile timeout (default 15)
+  TILE_PREFETCH_RECENT_S        skip tiles warmed this recently (default 300)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+Tile = Tuple[int, int, int]
+Layer = Tuple[str, Optional[Sequence[float]]]  # (tilejson_url, footprint bbox or None)
+
+_DISABLED_VALUES = {"0", "false", "no", "off", "none"}
+_MAX_LAT = 85.0511
+_MAX_ZOOM = 18
+_RECENT_MAX = 4096
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+# ---------------------------------------------------------------------------
+# Tile math
+# ---------------------------------------------------------------------------
+
+def _tile_xy(lon: float, lat: float, z: int) -> Tuple[float, float]:
+    """Fractional Web Mercator tile coordinates of a point."""
+    n = 2 ** z
+    lat = max(-_MAX_LAT, min(_MAX_LAT, lat))
+    lat_rad = math.radians(lat)
+    x = (lon + 180.0) / 360.0 * n
+    y = (1.0 - math.log(math.tan(lat_rad) + 1.0 / math.cos(lat_rad)) / math.pi) / 2.0 * n
+    return x, y
+
+
+def tiles_for_bbox(bbox: Sequence[float], z: int) -> List[Tile]:
+    """Tiles covering ``bbox`` at zoom ``z``, nearest-to-center first."""
+    west, south, east, north = (float(v) for v in bbox)
+    if west > east or south > north:
+        return []
+    n = 2 ** z
+    x0, y0 = _tile_xy(west, north, z)
+    x1, y1 = _tile_xy(east, south, z)
+    cx, cy = (x0 + x1) / 2.0, (y0 + y1) / 2.0
+    xs = range(max(0, int(x0)), min(n - 1, int(x1)) + 1)
+    ys = range(max(0, int(y0)), min(n - 1, int(y1)) + 1)
+    tiles = [(z, x, y) for x in xs for y in ys]
+    tiles.sort(key=lambda t: (t[1] + 0.5 - cx) ** 2 + (t[2] + 0.5 - cy) ** 2)
+    return tiles
+
+
+def viewport_pyramid(bbox: Sequence[float], zoom: int, *, deeper: int = 1) -> List[Tile]:
+    """Opening-zoom tiles for ``bbox`` followed by the ``deeper`` zoom ring(s)."""
+    out: List[Tile] = []
+    for z in range(zoom, min(_MAX_ZOOM, zoom + deeper) + 1):
+        out.extend(tiles_for_bbox(bbox, z))
+    return out
+
+
+def _intersect(a: Sequence[float], b: Optional[Sequence[float]]) -> Optional[List[float]]:
+    if not b or len(b) != 4:
+        return list(a)
+    west, south = max(a[0], b[0]), max(a[1], b[1])
+    east, north = min(a[2], b[2]), min(a[3], b[3])
+    if west >= east or south >= north:
+        return None
+    return [west, south, east, north]
+
+
+def tile_url(tilejson_url: str, tile: Tile) -> str:
+    z, x, y = tile
+    return tilejson_url.replace("tilejson.json", f"tiles/{z}/{x}/{y}", 1)
+
+
+# ---------------------------------------------------------------------------
+# Scheduler
+# ---------------------------------------------------------------------------
+
+@dataclass
+class _Job:
+    session_id: Optional[str]
+    urls: List[str]
+    started: float
+    task: Optional[asyncio.Task] = None
+    first_tile_ms: Optional[float] = None
+    issued: int = 0
+    shared: int = 0
+    skipped: int = 0
+    pending: Set[asyncio.Task] = field(default_factory=set)
+
+
+class TilePrefetcher:
+    """Bounded, deduplicated, cancellable viewport tile warm-up."""
+
+    def __init__(
+        self,
+        *,
+        concurrency: int = 8,
+        max_tiles: int = 48,
+        timeout_s: float = 15.0,
+        recent_s: float = 300.0,
+        session_factory: Optional[Callable[[], Any]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.concurrency = max(1, int(concurrency))
+        self.max_tiles = max(1, int(max_tiles))
+        self.timeout_s = float(timeout_s)
+        self.recent_s = float(recent_s)
+        self._session_factory = session_factory
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._sem: Optional[asyncio.Semaphore] = None
+        self._sem_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._recent: "OrderedDict[str, float]" = OrderedDict()
+        self._jobs: Dict[str, _Job] = {}
+        self._ttft_ms: Deque[float] = deque(maxlen=256)
+        self._warm_ms: Deque[float] = deque(maxlen=256)
+        self.jobs = 0
+        self.cancelled = 0
+        self.tiles_fetched = 0
+        self.tiles_shared = 0
+        self.tiles_skipped = 0
+        self.tile_errors = 0
+
+    # ----- planning ---------------------------------------------------------
+
+    def plan(self, layers: Iterable[Layer], viewport: Sequence[float], zoom: int) -> List[str]:
+        """Tile URLs to warm for ``layers`` over ``viewport``, highest priority first.
+
+        ``zoom`` is the zoom the map opens at (``calculate_zoom_level``).
+        """
+        ranked: List[Tuple[int, int, int, str]] = []
+        for layer_idx, (tilejson_url, footprint) in enumerate(layers):
+            if not tilejson_url or "tilejson.json" not in tilejson_url or not tilejson_url.startswith("http"):
+                continue
+            area = _intersect(viewport, footprint)
+            if area is None:
+                continue
+            for order, tile in enumerate(viewport_pyramid(area, zoom)):
+                ranked.append((tile[0], layer_idx, order, tile_url(tilejson_url, tile)))
+        # zoom first, then layer order (mosaic first), then center-out
+        ranked.sort(key=lambda r: r[:3])
+        urls: List[str] = []
+        seen: Set[str] = set()
+        for *_, url in ranked:
+            if url not in seen:
+                seen.add(url)
+                urls.append(url)
+                if len(urls) >= self.max_tiles:
+                    break
+        return urls
+
+    # ----- jobs -------------------------------------------------------------
+
+    def schedule(
+        self,
+        session_id: Optional[str],
+        layers: Iterable[Layer],
+        viewport: Optional[Sequence[float]],
+        zoom: int,
+    ) -> Optional[asyncio.Task]:
+        """Start warming ``layers`` for ``session_id``, replacing its previous job.
+
+        Must be called on the event loop. Never raises.
+        """
+        try:
+            if not viewport or len(viewport) != 4:
+                return None
+            urls = self.plan(layers, viewport, zoom)
+            self.cancel(session_id)
+            if not urls:
+                return None
+            job = _Job(session_id, urls, self._clock())
+            job.task = asyncio.get_running_loop().create_task(self._run(job))
+            with self._lock:
+                self.jobs += 1
+                if session_id:
+                    self._jobs[session_id] = job
+            logger.info(f"[PREWARM] scheduled {len(urls)} tiles (session={session_id})")
+            return job.task
+        except Exception as exc:
+            logger.debug(f"[PREWARM] schedule failed: {exc}")
+            return None
+
+    def cancel(self, session_id: Optional[str]) -> bool:
+        """Stop the session's job from issuing more requests (in-flight tiles finish)."""
+        if not session_id:
+            return False
+        with self._lock:
+            job = self._jobs.pop(session_id, None)
+        if job is None or job.task is None or job.task.done():
+            return False
+        job.task.cancel()
+        with self._lock:
+            self.cancelled += 1
+        return True
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._sem is None or self._sem_loop is not loop:
+            self._sem, self._sem_loop = asyncio.Semaphore(self.concurrency), loop
+        return self._sem
+
+    def _is_recent(self, url: str) -> bool:
+        with self._lock:
+            ts = self._recent.get(url)
+            if ts is None:
+                return False
+            if self._clock() - ts > self.recent_s:
+                del self._recent[url]
+                return False
+            return True
+
+    async def _run(self, job: _Job) -> None:
+        sem = self._semaphore()
+        loop = asyncio.get_running_loop()
+        try:
+            for url in job.urls:
+                if self._is_recent(url):
+                    job.skipped += 1
+                    continue
+                task = self._inflight.get(url)
+                if task is None:
+                    await sem.acquire()  # global budget; a cancel here stops the job
+                    # another job may have started or finished it meanwhile
+                    task = self._inflight.get(url)
+                    if task is None and self._is_recent(url):
+                        sem.release()
+                        job.skipped += 1
+                        continue
+                    if task is None:
+                        task = self._inflight[url] = loop.create_task(self._fetch(url, sem))
+                        job.issued += 1
+                    else:
+                        sem.release()
+                        job.shared += 1
+                else:
+                    job.shared += 1
+                task.add_done_callback(lambda t, job=job: self._tile_done(job, t))
+                job.pending.add(task)
+            if job.pending:
+                await asyncio.wait(job.pending)  # unlike gather, never cancels shared tiles
+            elapsed = (self._clock() - job.started) * 1000.0
+            with self._lock:
+                self._warm_ms.append(elapsed)
+                self.tiles_skipped += job.skipped
+                self.tiles_shared += job.shared
+            logger.info(
+                f"[PREWARM] viewport warm in {elapsed:.0f}ms "
+                f"(issued={job.issued} shared={job.shared} skipped={job.skipped}, "
+                f"first tile {job.first_tile_ms or 0:.0f}ms)"
+            )
+        except asyncio.CancelledError:
+            logger.info(f"[PREWARM] cancelled after {job.issued} tiles (session={job.session_id})")
+            raise
+        finally:
+            with self._lock:
+                if job.session_id and self._jobs.get(job.session_id) is job:
+                    del self._jobs[job.session_id]
+
+    def _tile_done(self, job: _Job, task: asyncio.Task) -> None:
+        # only a tile that actually rendered counts towards time-to-first-tile
+        if task.cancelled() or not task.result():
+            return
+        if job.first_tile_ms is None:
+            job.first_tile_ms = (self._clock() - job.started) * 1000.0
+            with self._lock:
+                self._ttft_ms.append(job.first_tile_ms)
+
+    async def _fetch(self, url: str, sem: asyncio.Semaphore) -> bool:
+        try:
+            if self._session_factory is not None:
+                session = self._session_factory()
+            else:
+                import http_pool
+
+                session = http_pool.get_session(http_pool.POOL_STAC)
+            import aiohttp
+
+            async with session.get(url, timeout=aiohttp.ClientTimeout(total=self.timeout_s)) as resp:
+                await resp.read()  # drain so TiTiler actually renders the tile
+                ok = resp.status < 500
+                logger.debug(f"[PREWARM] {resp.status} {url[:120]}")
+        except Exception as exc:
+            ok = False
+            logger.debug(f"[PREWARM] miss {url[:120]}: {exc}")
+        finally:
+            sem.release()
+            self._inflight.pop(url, None)
+        with self._lock:
+            if ok:
+                self.tiles_fetched += 1
+                self._recent[url] = self._clock()
+                self._recent.move_to_end(url)
+                while len(self._recent) > _RECENT_MAX:
+                    self._recent.popitem(last=False)
+            else:
+                self.tile_errors += 1
+        return ok
+
+    # ----- metrics ----------------------------------------------------------
+
+    @staticmethod
+    def _pct(values: Sequence[float], q: float) -> Optional[float]:
+        if not values:
+            return None
+        ordered = sorted(values)
+        return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], 1)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            ttft, warm = list(self._ttft_ms), list(self._warm_ms)
+            return {
+                "enabled": True,
+                "concurrency": self.concurrency,
+                "max_tiles": self.max_tiles,
+                "jobs": self.jobs,
+                "active_jobs": len(self._jobs),
+                "cancelled": self.cancelled,
+                "inflight": len(self._inflight),
+                "tiles_fetched": self.tiles_fetched,
+                "tiles_shared": self.tiles_shared,
+                "tiles_skipped": self.tiles_skipped,
+                "tile_errors": self.tile_errors,
+                "first_tile_ms_p50": self._pct(ttft, 0.5),
+                "first_tile_ms_p95": self._pct(ttft, 0.95),
+                "viewport_warm_ms_p50": self._pct(warm, 0.5),
+                "viewport_warm_ms_p95": self._pct(warm, 0.95),
+            }
+
+
+# ---------------------------------------------------------------------------
+# Module singleton
+# ---------------------------------------------------------------------------
+
+_prefetcher: Optional[TilePrefetcher] = None
+_prefetcher_lock = threading.Lock()
+
+
+def get_tile_prefetcher() -> Optional[TilePrefetcher]:
+    """Return the process-wide :class:`TilePrefetcher` (lazy), or ``None`` when disabled."""
+    global _prefetcher
+    if (os.getenv("TILE_PREFETCH") or "on").strip().lower() in _DISABLED_VALUES:
+        return None
+    with _prefetcher_lock:
+        if _prefetcher is None:
+            _prefetcher = TilePrefetcher(
+                concurrency=int(_env_float("TILE_PREFETCH_CONCURRENCY", 8)),
+                max_tiles=int(_env_float("TILE_PREFETCH_MAX_TILES", 48)),
+                timeout_s=_env_float("TILE_PREFETCH_TIMEOUT_S", 15.0),
+                recent_s=_env_float("TILE_PREFETCH_RECENT_S", 300.0),
+            )
+        return _prefetcher
+
+
+def stats() -> Dict[str, Any]:
+    prefetcher = get_tile_prefetcher()
+    return prefetcher.stats() if prefetcher is not None else {"enabled": False}